@@ -0,0 +1,69 @@
+"""Add binary/delta checkpoint columns to langgraph_checkpoints.
+
+v5.9.10: PostgresCheckpointer writes compact binary checkpoints that store only
+the channels changed since the previous checkpoint of the chain.
+
+Adds:
+- checkpoint_format: 0 = legacy JSON, 1 = binary full, 2 = binary delta
+- checkpoint_blob: Binary (msgpack + zstd) payload for formats 1 and 2
+- base_checkpoint_id: Full checkpoint the delta chain starts from
+- delta_parent_id: Checkpoint a delta was computed against
+- chain_depth: Position in the delta chain (0 = full)
+
+Revision ID: 20261018_0004
+Revises: 20241216_0003
+Create Date: 2026-10-18
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '20261018_0004'
+down_revision: Union[str, None] = '20241216_0003'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Add delta checkpoint columns."""
+    op.add_column(
+        'langgraph_checkpoints',
+        sa.Column('checkpoint_format', sa.SmallInteger(), nullable=True, server_default='0'),
+    )
+    op.add_column(
+        'langgraph_checkpoints',
+        sa.Column('checkpoint_blob', sa.LargeBinary(), nullable=True),
+    )
+    op.add_column(
+        'langgraph_checkpoints',
+        sa.Column('base_checkpoint_id', sa.String(255), nullable=True),
+    )
+    op.add_column(
+        'langgraph_checkpoints',
+        sa.Column('delta_parent_id', sa.String(255), nullable=True),
+    )
+    op.add_column(
+        'langgraph_checkpoints',
+        sa.Column('chain_depth', sa.Integer(), nullable=True, server_default='0'),
+    )
+
+    # Chain lookups when rebuilding a delta checkpoint
+    op.create_index(
+        'idx_checkpoints_base',
+        'langgraph_checkpoints',
+        ['thread_id', 'base_checkpoint_id'],
+    )
+
+
+def downgrade() -> None:
+    """Remove delta checkpoint columns."""
+    op.drop_index('idx_checkpoints_base', table_name='langgraph_checkpoints')
+    op.drop_column('langgraph_checkpoints', 'chain_depth')
+    op.drop_column('langgraph_checkpoints', 'delta_parent_id')
+    op.drop_column('langgraph_checkpoints', 'base_checkpoint_id')
+    op.drop_column('langgraph_checkpoints', 'checkpoint_blob')
+    op.drop_column('langgraph_checkpoints', 'checkpoint_format')
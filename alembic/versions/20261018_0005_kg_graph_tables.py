@@ -0,0 +1,71 @@
+"""Create kg_nodes / kg_relations tables for TWS graph expansion.
+
+v5.9.10: TWSGraphExpander persists expansions with set-based merges
+(COPY into staging + INSERT ... ON CONFLICT) and only writes rows whose
+content_hash changed since the previous expansion.
+
+Adds:
+- kg_nodes: one row per (node_id, tenant_id)
+- kg_relations: one row per (from_node, to_node, relation_type, tenant_id)
+
+tenant_id is NOT NULL (empty string = global) so the unique keys work with
+ON CONFLICT.
+
+Revision ID: 20261018_0005
+Revises: 20261018_0004
+Create Date: 2026-10-18
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+
+# revision identifiers, used by Alembic.
+revision: str = '20261018_0005'
+down_revision: Union[str, None] = '20261018_0004'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Create knowledge graph tables."""
+    op.create_table(
+        'kg_nodes',
+        sa.Column('node_id', sa.String(255), nullable=False),
+        sa.Column('tenant_id', sa.String(100), nullable=False, server_default=''),
+        sa.Column('node_type', sa.String(50), nullable=False),
+        sa.Column('name', sa.String(255), nullable=False),
+        sa.Column('properties', postgresql.JSONB(), nullable=False, server_default='{}'),
+        sa.Column('content_hash', sa.String(32), nullable=False),
+        sa.Column('created_at', sa.DateTime(), nullable=False, server_default=sa.func.now()),
+        sa.Column('updated_at', sa.DateTime(), nullable=False, server_default=sa.func.now()),
+        sa.PrimaryKeyConstraint('node_id', 'tenant_id'),
+    )
+    op.create_index('idx_kg_nodes_type', 'kg_nodes', ['tenant_id', 'node_type'])
+
+    op.create_table(
+        'kg_relations',
+        sa.Column('from_node', sa.String(255), nullable=False),
+        sa.Column('to_node', sa.String(255), nullable=False),
+        sa.Column('relation_type', sa.String(50), nullable=False),
+        sa.Column('tenant_id', sa.String(100), nullable=False, server_default=''),
+        sa.Column('properties', postgresql.JSONB(), nullable=False, server_default='{}'),
+        sa.Column('weight', sa.Float(), nullable=False, server_default='1.0'),
+        sa.Column('content_hash', sa.String(32), nullable=False),
+        sa.Column('created_at', sa.DateTime(), nullable=False, server_default=sa.func.now()),
+        sa.Column('updated_at', sa.DateTime(), nullable=False, server_default=sa.func.now()),
+        sa.PrimaryKeyConstraint('from_node', 'to_node', 'relation_type', 'tenant_id'),
+    )
+    # Reverse traversal (impact analysis) queries by to_node
+    op.create_index('idx_kg_relations_to', 'kg_relations', ['tenant_id', 'to_node'])
+
+
+def downgrade() -> None:
+    """Drop knowledge graph tables."""
+    op.drop_index('idx_kg_relations_to', table_name='kg_relations')
+    op.drop_table('kg_relations')
+    op.drop_index('idx_kg_nodes_type', table_name='kg_nodes')
+    op.drop_table('kg_nodes')
@@ -0,0 +1,52 @@
+"""Install NOTIFY triggers on tables read through the query cache.
+
+v5.9.10: QueryCacheManager keeps repository reads in-process and drops them
+when PostgresChangeListener receives a "table:op" notification on the
+resync_table_changes channel. The notifications come from statement-level
+triggers installed here on every table in CACHED_TABLES (tws.tws_job_status).
+
+Tables that do not exist yet (created later by initialize_database) are
+skipped; initialize_database installs the triggers itself.
+
+Revision ID: 20261018_0006
+Revises: 20261018_0005
+Create Date: 2026-10-18
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+from resync.core.cache.query_cache import CACHED_TABLES, change_trigger_statements
+
+
+# revision identifiers, used by Alembic.
+revision: str = '20261018_0006'
+down_revision: Union[str, None] = '20261018_0005'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def _existing_tables() -> list[str]:
+    inspector = sa.inspect(op.get_bind())
+    existing = []
+    for table in CACHED_TABLES:
+        schema, _, name = table.rpartition('.')
+        if inspector.has_table(name, schema=schema or None):
+            existing.append(table)
+    return existing
+
+
+def upgrade() -> None:
+    """Create the notify function and the change triggers."""
+    for statement in change_trigger_statements(_existing_tables()):
+        op.execute(statement)
+
+
+def downgrade() -> None:
+    """Drop the change triggers and the notify function."""
+    for table in _existing_tables():
+        trigger = f"resync_change_notify_{table.replace('.', '_')}"
+        op.execute(f"DROP TRIGGER IF EXISTS {trigger} ON {table}")
+    op.execute("DROP FUNCTION IF EXISTS resync_notify_table_change()")
@@ -23,12 +23,14 @@ Environment Variables:
     BIND_PORT: Port to bind (default: 8000)
     UVICORN_LIMIT_CONCURRENCY: Max concurrent requests per worker (default: 15)
     TRUSTED_PROXY_IPS: Comma-separated proxy IPs (default: private ranges)
+    RESYNC_METRICS_MULTIPROC_DIR: Shared metrics segments (default: /tmp/resync_metrics)
 
 References:
     https://medium.com/@hashblock/uvicorn-gunicorn-fastapi-production
 """
 
 import gc
+import glob
 import multiprocessing
 import os
 import sys
@@ -231,6 +233,11 @@ def post_fork(server, worker):
     - Concurrency limit for back-pressure
     - Proxy headers for load balancer deployments
     """
+    # preload_app: the metrics registry was imported by the master; give the
+    # worker its own segments (inherited values stay in the master's)
+    if "resync.core.metrics_internal" in sys.modules:
+        sys.modules["resync.core.metrics_internal"].registry.enable_multiprocess()
+
     # Force collection to clean up any pre-fork garbage
     gc.collect(2)
 
@@ -302,9 +309,21 @@ def worker_abort(worker):
     worker.log.warning(f"Worker aborted (pid: {worker.pid})")
 
 
+def on_starting(server):
+    """Called just before the master process is initialized."""
+    # Stale segments from a previous run would skew the aggregated metrics
+    for pattern in ("sketches_*.json", "counters_*.db", "gauges_*.db"):
+        for segment in glob.glob(os.path.join(METRICS_MULTIPROC_DIR, pattern)):
+            os.unlink(segment)
+
+
 def child_exit(server, worker):
     """Called when a worker process exits."""
     server.log.info(f"Worker exited (pid: {worker.pid})")
+    from resync.core.metrics_multiprocess import mark_process_dead
+
+    # Counters of the exited worker move to the archive; its segments are removed
+    mark_process_dead(worker.pid, METRICS_MULTIPROC_DIR)
 
 
 def on_exit(server):
@@ -313,7 +332,11 @@ def on_exit(server):
 
 
 # =============================================================================
-# Prometheus Metrics (for multi-worker)
+# Internal Metrics (multi-worker)
 # =============================================================================
-# Set this environment variable for proper metrics aggregation
-# os.environ["PROMETHEUS_MULTIPROC_DIR"] = "/tmp/prometheus_multiproc"
+# Workers mirror counters/gauges into mmap segments and write histogram
+# sketches to this directory; /metrics aggregates the whole process group.
+METRICS_MULTIPROC_DIR = os.environ.setdefault(
+    "RESYNC_METRICS_MULTIPROC_DIR", "/tmp/resync_metrics"
+)
+os.makedirs(METRICS_MULTIPROC_DIR, exist_ok=True)
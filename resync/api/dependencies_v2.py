@@ -11,6 +11,7 @@ from collections.abc import AsyncGenerator
 
 from sqlalchemy.ext.asyncio import AsyncSession
 
+from resync.core.cache.query_cache import get_repository_query_cache
 from resync.core.database import get_db_session
 from resync.core.database.repositories import (
     ContextStore,
@@ -67,7 +68,7 @@ async def get_tws_store() -> TWSStore:
             # Double-check pattern: verify again after acquiring lock
             if _tws_store is None:
                 logger.info("Initializing TWSStore singleton...")
-                store = TWSStore()
+                store = TWSStore(query_cache=get_repository_query_cache())
                 await store.initialize()
                 _tws_store = store
                 logger.info("TWSStore singleton initialized successfully")
@@ -94,6 +94,9 @@ class CoreHealthResponse(BaseModel):
 # Core components that are critical for system operation
 CORE_COMPONENTS = {"database", "redis", "connection_pools", "file_system"}
 
+# Dependencies that gate the readiness probe
+READINESS_COMPONENTS = ("database", "redis")
+
 
 @router.get("/", response_model=HealthSummaryResponse)
 async def get_health_summary(
@@ -299,14 +302,15 @@ async def readiness_probe_detailed() -> dict[str, Any]:
     Kubernetes readiness probe endpoint (detailed version).
 
     Returns 503 Service Unavailable if core components are unhealthy,
-    200 OK if system is ready to serve requests.
+    200 OK if system is ready to serve requests. Served from cached component
+    state (no downstream I/O).
 
     Returns:
         dict[str, Any]: Readiness status with core component details
     """
     try:
         health_service = await get_health_check_service()
-        health_result = await health_service.perform_comprehensive_health_check()
+        health_result = health_service.get_cached_health_result()
 
         # Check only core components for readiness
         core_components = {
@@ -315,8 +319,8 @@ async def readiness_probe_detailed() -> dict[str, Any]:
             if name in CORE_COMPONENTS
         }
 
-        # System is ready if all core components are healthy
-        ready = all(
+        # System is ready if all core components are healthy (and were checked)
+        ready = bool(core_components) and all(
             component.status == HealthStatus.HEALTHY for component in core_components.values()
         )
 
@@ -628,44 +632,32 @@ async def readiness_probe():
     - PostgreSQL database
     - Redis cache
     
+    Lê o último resultado em cache do agendador de health checks (sem I/O
+    para as dependências); um componente ainda não verificado ou com
+    resultado vencido conta como não pronto.
+    
     Usado para decidir se direcionar tráfego para esta instância.
     
     Returns:
         Status 200 se pronto, 503 se não pronto
     """
     from fastapi.responses import JSONResponse
-    from sqlalchemy import text
+    
+    health_service = await get_health_check_service()
+    components = health_service.scheduler.snapshot(READINESS_COMPONENTS)
     
     checks = {}
     all_ready = True
-    
-    # Verifica PostgreSQL
-    try:
-        from resync.core.database.engine import get_engine
-        engine = get_engine()
-        async with engine.connect() as conn:
-            await conn.scalar(text("SELECT 1"))
-        checks["database"] = {"status": "ok", "type": "postgresql"}
-    except Exception as e:
-        checks["database"] = {
-            "status": "error",
-            "error": str(e),
-            "type": "postgresql"
-        }
-        all_ready = False
-    
-    # Verifica Redis
-    try:
-        from resync.core.redis_init import get_redis_client
-        redis = get_redis_client()
-        await redis.ping()
-        checks["redis"] = {"status": "ok"}
-    except Exception as e:
-        checks["redis"] = {
-            "status": "error", 
-            "error": str(e)
-        }
-        all_ready = False
+    for name in READINESS_COMPONENTS:
+        component = components.get(name)
+        if component is None:
+            checks[name] = {"status": "error", "error": "not checked yet"}
+            all_ready = False
+        elif component.status in (HealthStatus.UNHEALTHY, HealthStatus.UNKNOWN):
+            checks[name] = {"status": "error", "error": component.message}
+            all_ready = False
+        else:
+            checks[name] = {"status": "ok"}
     
     if all_ready:
         return {
@@ -6,9 +6,14 @@ This middleware provides comprehensive protection against SQL injection attacks:
 - Query string sanitization
 - Database operation monitoring
 - Automatic audit logging
+
+v5.9.10: All patterns are compiled once into a single alternation
+(SQL_INJECTION_REGEX); request bodies already parsed by
+RequestInspectionMiddleware are reused instead of being parsed again.
 """
 
 import logging
+import re
 from collections.abc import Callable
 from typing import Any
 
@@ -20,47 +25,95 @@ from resync.core.database_security import DatabaseAuditor, log_database_access
 logger = logging.getLogger(__name__)
 
 
+# SQL injection patterns to detect (case-insensitive)
+SQL_INJECTION_PATTERNS = [
+    # Basic injection patterns
+    r"(\bunion\b.*\bselect\b)",
+    r"(\bselect\b.*\bfrom\b)",
+    r"(\binsert\b.*\binto\b)",
+    r"(\bupdate\b.*\bset\b)",
+    r"(\bdelete\b.*\bfrom\b)",
+    r"(\bdrop\b.*\btable\b)",
+    r"(\bcreate\b.*\btable\b)",
+    r"(\balter\b.*\btable\b)",
+    # Advanced injection patterns
+    r"(\bexec\b.*\()",
+    r"(\bexecute\b.*\()",
+    r"(\bsp_\w+\b)",
+    r"(\bxp_\w+\b)",
+    r"(\bwaitfor\b.*\bdelay\b)",
+    r"(\bconvert\b.*\bint\b)",
+    # Comment-based attacks
+    r"(--|\#|/\*|\*/)",
+    # Quote-based attacks
+    r"(').*(')",
+    r"(\').*(\|)*(\|)*(')",
+    # Time-based attacks
+    r"(\bsleep\b.*\()",
+    r"(\bbenchmark\b.*\()",
+    # Boolean-based attacks
+    r"(\band\b.*\=.*\bor\b)",
+    r"(\bor\b.*\=.*\band\b)",
+    # Error-based attacks
+    r"(\bconvert\b.*\bchar\b)",
+    r"(\bcast\b.*\bas\b)",
+]
+
+# Characters/tokens that are rejected anywhere in a value
+SQL_DANGEROUS_TOKENS = ["'", '"', ";", "--", "/*", "*/", "xp_", "sp_"]
+
+# One precompiled alternation: a single scan per value instead of one
+# re.search() per pattern
+SQL_INJECTION_REGEX = re.compile(
+    "|".join(
+        [f"(?:{p})" for p in SQL_INJECTION_PATTERNS]
+        + [re.escape(token) for token in SQL_DANGEROUS_TOKENS]
+    ),
+    re.IGNORECASE | re.DOTALL,
+)
+
+# Patterns only, without the bare tokens: for headers, where ';' and quotes
+# are normal (every browser User-Agent contains ';')
+SQL_INJECTION_PATTERN_REGEX = re.compile(
+    "|".join(f"(?:{p})" for p in SQL_INJECTION_PATTERNS), re.IGNORECASE | re.DOTALL
+)
+
+
+def contains_sql_injection(value: Any) -> bool:
+    """
+    Checks if a value (or any nested value) contains SQL injection patterns.
+
+    Args:
+        value: String, number, or JSON-like structure
+
+    Returns:
+        True if SQL injection is detected
+    """
+    if value is None:
+        return False
+    if isinstance(value, dict):
+        return any(
+            contains_sql_injection(k) or contains_sql_injection(v) for k, v in value.items()
+        )
+    if isinstance(value, list | tuple):
+        return any(contains_sql_injection(v) for v in value)
+    return SQL_INJECTION_REGEX.search(str(value)) is not None
+
+
 class DatabaseSecurityMiddleware(BaseHTTPMiddleware):
     """
     Middleware for detecting and preventing SQL injection attacks.
 
     Monitors all HTTP requests for potential SQL injection patterns
     and blocks suspicious requests before they reach the application.
+
+    Superseded by the pure ASGI RequestInspectionMiddleware, which
+    create_database_security_middleware() now returns; kept for callers that
+    install this class directly.
     """
 
-    # SQL injection patterns to detect
-    SQL_INJECTION_PATTERNS = [
-        # Basic injection patterns
-        r"(?i)(\bunion\b.*\bselect\b)",
-        r"(?i)(\bselect\b.*\bfrom\b)",
-        r"(?i)(\binsert\b.*\binto\b)",
-        r"(?i)(\bupdate\b.*\bset\b)",
-        r"(?i)(\bdelete\b.*\bfrom\b)",
-        r"(?i)(\bdrop\b.*\btable\b)",
-        r"(?i)(\bcreate\b.*\btable\b)",
-        r"(?i)(\balter\b.*\btable\b)",
-        # Advanced injection patterns
-        r"(?i)(\bexec\b.*\()",
-        r"(?i)(\bexecute\b.*\()",
-        r"(?i)(\bsp_\w+\b)",
-        r"(?i)(\bxp_\w+\b)",
-        r"(?i)(\bwaitfor\b.*\bdelay\b)",
-        r"(?i)(\bconvert\b.*\bint\b)",
-        # Comment-based attacks
-        r"(?i)(--|\#|/\*|\*/)",
-        # Quote-based attacks
-        r"(?i)(').*(')",
-        r"(?i)(\').*(\|)*(\|)*(')",
-        # Time-based attacks
-        r"(?i)(\bsleep\b.*\()",
-        r"(?i)(\bbenchmark\b.*\()",
-        # Boolean-based attacks
-        r"(?i)(\band\b.*\=.*\bor\b)",
-        r"(?i)(\bor\b.*\=.*\band\b)",
-        # Error-based attacks
-        r"(?i)(\bconvert\b.*\bchar\b)",
-        r"(?i)(\bcast\b.*\bas\b)",
-    ]
+    # Individual patterns (compiled), kept for introspection and stats
+    SQL_INJECTION_PATTERNS = [re.compile(p, re.IGNORECASE) for p in SQL_INJECTION_PATTERNS]
 
     def __init__(self, app: Callable, enabled: bool = True):
         """
@@ -179,7 +232,19 @@ class DatabaseSecurityMiddleware(BaseHTTPMiddleware):
 
         # Try to get body data for POST/PUT requests
         try:
-            if request.method in ["POST", "PUT", "PATCH"]:
+            # Lazy import: request_inspection depends on this module
+            from resync.api.middleware.request_inspection import FormBody, get_parsed_body
+
+            parsed = get_parsed_body(request)
+            if parsed is not None:
+                if isinstance(parsed, dict):
+                    prefix = "form" if isinstance(parsed, FormBody) else "body"
+                    for key, value in parsed.items():
+                        data[f"{prefix}.{key}"] = value
+                else:
+                    data["body"] = parsed
+
+            elif request.method in ["POST", "PUT", "PATCH"]:
                 content_type = request.headers.get("content-type", "")
 
                 if "application/json" in content_type:
@@ -210,22 +275,7 @@ class DatabaseSecurityMiddleware(BaseHTTPMiddleware):
         Returns:
             True if SQL injection is detected
         """
-        if value is None:
-            return False
-
-        # Convert to string for pattern matching
-        str_value = str(value)
-
-        # Check against all injection patterns
-        import re
-
-        for pattern in self.SQL_INJECTION_PATTERNS:
-            if re.search(pattern, str_value):
-                return True
-
-        # Additional checks for common attack vectors
-        dangerous_chars = ["'", '"', ";", "--", "/*", "*/", "xp_", "sp_"]
-        return any(char.lower() in str_value.lower() for char in dangerous_chars)
+        return contains_sql_injection(value)
 
     def _log_request_outcome(self, request: Request, success: bool, error: str = None) -> None:
         """
@@ -328,20 +378,24 @@ class DatabaseConnectionSecurityMiddleware(BaseHTTPMiddleware):
 
 
 # Factory functions for easy middleware setup
-def create_database_security_middleware(
-    app: Callable, enabled: bool = True
-) -> DatabaseSecurityMiddleware:
+def create_database_security_middleware(app: Callable, enabled: bool = True) -> Any:
     """
-    Creates database security middleware instance.
+    Creates the SQL injection protection layer.
+
+    Returns the pure ASGI RequestInspectionMiddleware in blocking mode, so
+    the body is parsed once and there is a single detection layer.
 
     Args:
         app: ASGI application
         enabled: Whether middleware should be enabled
 
     Returns:
-        DatabaseSecurityMiddleware instance
+        RequestInspectionMiddleware instance
     """
-    return DatabaseSecurityMiddleware(app, enabled=enabled)
+    # Lazy import: request_inspection depends on this module
+    from resync.api.middleware.request_inspection import RequestInspectionMiddleware
+
+    return RequestInspectionMiddleware(app, enabled=enabled, block_on_detection=True)
 
 
 def create_database_connection_security_middleware(
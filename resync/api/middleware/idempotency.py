@@ -7,7 +7,9 @@ múltiplas vezes.
 
 Características:
 - Validação automática de chaves de idempotência
-- Bloqueio de processamento concorrente
+- Bloqueio de processamento concorrente (check-or-claim atômico via Lua)
+- Duplicatas em andamento podem aguardar a conclusão (pub/sub) em vez de 409
+- Chave reutilizada com payload diferente retorna 422 (nunca executa)
 - Cache automático de respostas
 - Integração com sistema de logging estruturado
 - Headers customizáveis
@@ -23,8 +25,9 @@ from fastapi import HTTPException, Request, Response
 from fastapi.responses import JSONResponse
 from starlette.middleware.base import BaseHTTPMiddleware
 
+from resync.api.middleware.request_inspection import get_parsed_body, get_request_body
 from resync.core.context import get_correlation_id
-from resync.core.idempotency import IdempotencyManager
+from resync.core.idempotency import ClaimStatus, IdempotencyManager
 from resync.core.structured_logger import get_logger
 
 logger = get_logger(__name__)
@@ -114,24 +117,24 @@ class IdempotencyMiddleware(BaseHTTPMiddleware):
         )
 
         try:
-            # Verificar se já existe resposta em cache
-            cached_response = await self.idempotency_manager.get_cached_response(
-                idempotency_key, await self._extract_request_data(request)
-            )
+            request_data = await self._extract_request_data(request)
+
+            # Um round trip: resposta cacheada ou aquisição atômica da marca
+            # de processamento (opcionalmente aguardando duplicata em andamento)
+            claim = await self.idempotency_manager.check_or_claim(idempotency_key, request_data)
 
-            if cached_response:
+            if claim.status is ClaimStatus.CACHED:
                 logger.info(
                     "Returning cached response for idempotency key",
                     idempotency_key=idempotency_key,
-                    status_code=cached_response["status_code"],
+                    status_code=claim.cached_response["status_code"],
                     correlation_id=correlation_id,
                 )
 
                 # Retornar resposta cacheada
-                return self._create_response_from_cache(cached_response)
+                return self._create_response_from_cache(claim.cached_response)
 
-            # Verificar se operação já está em processamento
-            if await self.idempotency_manager.is_processing(idempotency_key):
+            if claim.status is ClaimStatus.PROCESSING:
                 logger.warning(
                     "Operation already in progress for idempotency key",
                     idempotency_key=idempotency_key,
@@ -140,29 +143,30 @@ class IdempotencyMiddleware(BaseHTTPMiddleware):
 
                 raise HTTPException(status_code=409, detail="Operation already in progress")
 
-            # Marcar como em processamento
-            marked = await self.idempotency_manager.mark_processing(idempotency_key)
-            if not marked:
-                logger.error(
-                    "Failed to mark operation as processing",
+            if claim.status is ClaimStatus.CONFLICT:
+                logger.warning(
+                    "Idempotency key reused with a different request payload",
                     idempotency_key=idempotency_key,
                     correlation_id=correlation_id,
                 )
-                # Continua mesmo se falhar, para não bloquear operação
 
+                raise HTTPException(
+                    status_code=422,
+                    detail="Idempotency key already used with a different request payload",
+                )
+
+            response = None
             try:
                 # Executar operação
                 response = await call_next(request)
-
-                # Cache da resposta se for bem-sucedida
-                if self._should_cache_response(response):
-                    await self._cache_response(idempotency_key, response, request)
-
                 return response
 
             finally:
-                # Sempre limpar marca de processamento
-                await self.idempotency_manager.clear_processing(idempotency_key)
+                # Um round trip: cache da resposta (se bem-sucedida) e
+                # liberação da marca de processamento
+                await self._complete_request(
+                    idempotency_key, claim.token, response, request, request_data
+                )
 
         except HTTPException:
             # Re-lançar exceções HTTP sem modificação
@@ -235,7 +239,19 @@ class IdempotencyMiddleware(BaseHTTPMiddleware):
         try:
             # Para requisições com body, incluir no hash
             if request.method in {"POST", "PUT", "PATCH"}:
-                body = await request.body()
+                # Reuse the body parsed once by RequestInspectionMiddleware
+                parsed = get_parsed_body(request)
+                if parsed is not None:
+                    return {
+                        "method": request.method,
+                        "path": str(request.url.path),
+                        "query_params": dict(request.query_params),
+                        "body": parsed,
+                    }
+
+                body = get_request_body(request)
+                if body is None:
+                    body = await request.body()
                 if body:
                     try:
                         json_data = json.loads(body)
@@ -279,18 +295,30 @@ class IdempotencyMiddleware(BaseHTTPMiddleware):
         # Só cachear respostas de sucesso
         return 200 <= response.status_code < 300
 
-    async def _cache_response(
-        self, idempotency_key: str, response: Response, request: Request
+    async def _complete_request(
+        self,
+        idempotency_key: str,
+        token: str | None,
+        response: Response | None,
+        request: Request,
+        request_data: dict,
     ) -> None:
         """
-        Cache da resposta para idempotency
+        Cache da resposta (se bem-sucedida) e liberação da marca de processamento
 
         Args:
             idempotency_key: Chave de idempotência
-            response: Resposta HTTP
+            token: Token da marca de processamento
+            response: Resposta HTTP (None se a operação falhou)
             request: Requisição original
+            request_data: Dados da requisição para hash
         """
         try:
+            if response is None or not self._should_cache_response(response):
+                # Apenas liberar a marca (duplicatas em espera reexecutam)
+                await self.idempotency_manager.complete_and_release(idempotency_key, token)
+                return
+
             # Extrair dados da resposta
             response_data = await self._extract_response_data(response)
 
@@ -302,12 +330,12 @@ class IdempotencyMiddleware(BaseHTTPMiddleware):
                 "correlation_id": get_correlation_id(),
             }
 
-            # Cache da resposta
-            success = await self.idempotency_manager.cache_response(
-                idempotency_key=idempotency_key,
+            success = await self.idempotency_manager.complete_and_release(
+                idempotency_key,
+                token,
                 response_data=response_data,
                 status_code=response.status_code,
-                request_data=await self._extract_request_data(request),
+                request_data=request_data,
                 metadata=metadata,
             )
 
@@ -0,0 +1,298 @@
+"""Pure ASGI request-inspection middleware.
+
+Buffers and parses the request body once, shares the result with everything
+downstream, and runs SQL injection detection with a single precompiled
+regex (SQL_INJECTION_REGEX).
+
+Shared through the ASGI scope:
+- scope["resync.body"]: raw body bytes (None when not buffered)
+- scope["resync.parsed_body"]: parsed JSON value or FormBody
+
+Downstream code (routes, IdempotencyMiddleware, DatabaseSecurityMiddleware)
+reads them with get_request_body() / get_parsed_body() instead of calling
+request.json() / request.form() again. The buffered body is replayed to the
+app, so endpoints can still read it normally.
+
+This is the single SQL injection layer: ApplicationFactory installs it
+(opt-in, request_inspection_enabled) and create_database_security_middleware()
+returns it instead of the legacy DatabaseSecurityMiddleware. Headers are not
+inspected by default; configured headers are matched against the patterns
+only, because ';' and quotes are normal there.
+
+PERFORMANCE: Pure ASGI implementation, no BaseHTTPMiddleware response
+stream wrapping; one regex scan per inspected value.
+"""
+
+import json
+from collections.abc import Iterator
+from typing import Any
+from urllib.parse import parse_qsl
+
+from starlette.responses import JSONResponse
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+from resync.api.middleware.database_security_middleware import (
+    SQL_INJECTION_PATTERN_REGEX,
+    SQL_INJECTION_REGEX,
+)
+from resync.core.database_security import DatabaseAuditor
+from resync.core.structured_logger import get_logger
+
+logger = get_logger(__name__)
+
+SCOPE_BODY_KEY = "resync.body"
+SCOPE_PARSED_BODY_KEY = "resync.parsed_body"
+
+BODY_METHODS = frozenset({"POST", "PUT", "PATCH", "DELETE"})
+DEFAULT_INSPECTED_HEADERS: tuple[bytes, ...] = ()
+
+
+class FormBody(dict):
+    """Parsed application/x-www-form-urlencoded body (repeated keys -> last value)."""
+
+
+def get_request_body(request_or_scope: Any) -> bytes | None:
+    """Raw body buffered by RequestInspectionMiddleware, if any."""
+    scope = getattr(request_or_scope, "scope", request_or_scope)
+    if not isinstance(scope, dict):
+        return None
+    return scope.get(SCOPE_BODY_KEY)
+
+
+def get_parsed_body(request_or_scope: Any) -> Any | None:
+    """Parsed JSON/form body shared by RequestInspectionMiddleware, if any."""
+    scope = getattr(request_or_scope, "scope", request_or_scope)
+    if not isinstance(scope, dict):
+        return None
+    return scope.get(SCOPE_PARSED_BODY_KEY)
+
+
+def _iter_values(prefix: str, value: Any) -> Iterator[tuple[str, str]]:
+    """Flatten a parsed body into (location, string value) pairs."""
+    if isinstance(value, dict):
+        for key, item in value.items():
+            location = f"{prefix}.{key}"
+            yield location, str(key)
+            yield from _iter_values(location, item)
+    elif isinstance(value, list | tuple):
+        for index, item in enumerate(value):
+            yield from _iter_values(f"{prefix}[{index}]", item)
+    elif value is not None and not isinstance(value, bool | int | float):
+        yield prefix, str(value)
+
+
+class RequestInspectionMiddleware:
+    """Pure ASGI middleware that parses the body once and inspects the request.
+
+    Attributes:
+        enabled: Whether inspection is active
+        block_on_detection: Reject with 400 (True) or only record (False)
+        max_body_bytes: Larger bodies are streamed through uninspected
+    """
+
+    def __init__(
+        self,
+        app: ASGIApp,
+        enabled: bool = True,
+        block_on_detection: bool = True,
+        max_body_bytes: int = 1_048_576,
+        inspect_headers: tuple[bytes, ...] = DEFAULT_INSPECTED_HEADERS,
+        exclude_paths: tuple[str, ...] = ("/health", "/metrics", "/static"),
+    ):
+        """Initialize the middleware.
+
+        Args:
+            app: ASGI application
+            enabled: Whether inspection is active
+            block_on_detection: Reject suspicious requests instead of only recording them
+            max_body_bytes: Max body size buffered for inspection
+            inspect_headers: Inspected headers (lowercase bytes); none by default
+            exclude_paths: Path prefixes that skip inspection
+        """
+        self.app = app
+        self.enabled = enabled
+        self.block_on_detection = block_on_detection
+        self.max_body_bytes = max_body_bytes
+        self.inspect_headers = frozenset(inspect_headers)
+        self.exclude_paths = exclude_paths
+
+        self.total_requests = 0
+        self.flagged_requests = 0
+        self.blocked_requests = 0
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        """ASGI interface implementation."""
+        if scope["type"] != "http" or not self.enabled:
+            await self.app(scope, receive, send)
+            return
+
+        path = scope.get("path", "")
+        if path.startswith(self.exclude_paths):
+            await self.app(scope, receive, send)
+            return
+
+        self.total_requests += 1
+
+        content_type = b""
+        content_length = None
+        header_values: list[tuple[str, str]] = []
+        for name, value in scope["headers"]:
+            if name == b"content-type":
+                content_type = value
+            elif name == b"content-length":
+                try:
+                    content_length = int(value)
+                except ValueError:
+                    content_length = None
+            if name in self.inspect_headers:
+                header_values.append(
+                    (f"header.{name.decode('latin-1')}", value.decode("latin-1"))
+                )
+
+        if scope.get("method") in BODY_METHODS and self._is_parsable(content_type):
+            receive = await self._buffer_body(scope, receive, content_type, content_length)
+
+        violation = self._find_violation(scope, header_values)
+        if violation is not None:
+            self.flagged_requests += 1
+            location, value = violation
+            DatabaseAuditor.log_security_violation(
+                "sql_injection_detected",
+                f"{location}={value[:200]}",
+                scope.get("state", {}).get("user_id"),
+            )
+            logger.warning(
+                "sql_injection_detected",
+                location=location,
+                value_preview=value[:100],
+                path=path,
+                blocked=self.block_on_detection,
+            )
+            if self.block_on_detection:
+                self.blocked_requests += 1
+                response = JSONResponse(
+                    {"detail": "Potential SQL injection detected. Request blocked."},
+                    status_code=400,
+                )
+                await response(scope, receive, send)
+                return
+
+        await self.app(scope, receive, send)
+
+    @staticmethod
+    def _is_parsable(content_type: bytes) -> bool:
+        return b"application/json" in content_type or (
+            b"application/x-www-form-urlencoded" in content_type
+        )
+
+    async def _buffer_body(
+        self,
+        scope: Scope,
+        receive: Receive,
+        content_type: bytes,
+        content_length: int | None,
+    ) -> Receive:
+        """Read the body once, parse it into the scope, return a replaying receive."""
+        if content_length is not None and content_length > self.max_body_bytes:
+            return receive
+
+        chunks: list[bytes] = []
+        pending: list[Message] = []
+        size = 0
+        while True:
+            message = await receive()
+            if message["type"] != "http.request":
+                # Client disconnected: replay what we have, then the disconnect
+                pending.append(message)
+                break
+            chunks.append(message.get("body", b""))
+            size += len(chunks[-1])
+            if not message.get("more_body", False):
+                break
+            if size > self.max_body_bytes:
+                # Too large to inspect: stream the rest through untouched
+                return self._replay(b"".join(chunks), receive, more_body=True, pending=pending)
+
+        body = b"".join(chunks)
+        scope[SCOPE_BODY_KEY] = body
+        parsed = self._parse(body, content_type)
+        if parsed is not None:
+            scope[SCOPE_PARSED_BODY_KEY] = parsed
+
+        return self._replay(body, receive, more_body=False, pending=pending)
+
+    @staticmethod
+    def _replay(
+        body: bytes,
+        receive: Receive,
+        more_body: bool,
+        pending: list[Message],
+    ) -> Receive:
+        sent = False
+
+        async def replay_receive() -> Message:
+            nonlocal sent
+            if not sent:
+                sent = True
+                return {"type": "http.request", "body": body, "more_body": more_body}
+            if pending:
+                return pending.pop(0)
+            return await receive()
+
+        return replay_receive
+
+    @staticmethod
+    def _parse(body: bytes, content_type: bytes) -> Any | None:
+        if not body:
+            return None
+        try:
+            if b"application/json" in content_type:
+                return json.loads(body)
+            return FormBody(parse_qsl(body.decode("utf-8"), keep_blank_values=True))
+        except (ValueError, UnicodeDecodeError):
+            return None
+
+    def _find_violation(
+        self, scope: Scope, header_values: list[tuple[str, str]]
+    ) -> tuple[str, str] | None:
+        """Return (location, value) of the first suspicious value, if any."""
+        search = SQL_INJECTION_REGEX.search
+
+        query_string = scope.get("query_string", b"")
+        if query_string:
+            for key, value in parse_qsl(query_string.decode("latin-1"), keep_blank_values=True):
+                if search(value):
+                    return f"query.{key}", value
+
+        for location, value in header_values:
+            if SQL_INJECTION_PATTERN_REGEX.search(value):
+                return location, value
+
+        parsed = scope.get(SCOPE_PARSED_BODY_KEY)
+        if parsed is not None:
+            prefix = "form" if isinstance(parsed, FormBody) else "body"
+            for location, value in _iter_values(prefix, parsed):
+                if search(value):
+                    return location, value
+
+        return None
+
+    def get_stats(self) -> dict[str, Any]:
+        """Gets inspection statistics for monitoring."""
+        return {
+            "total_requests": self.total_requests,
+            "flagged_requests": self.flagged_requests,
+            "blocked_requests": self.blocked_requests,
+            "block_on_detection": self.block_on_detection,
+            "middleware_enabled": self.enabled,
+        }
+
+
+__all__ = [
+    "FormBody",
+    "RequestInspectionMiddleware",
+    "SCOPE_BODY_KEY",
+    "SCOPE_PARSED_BODY_KEY",
+    "get_parsed_body",
+    "get_request_body",
+]
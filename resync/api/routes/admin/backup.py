@@ -13,7 +13,9 @@ Endpoints:
     POST   /api/v1/admin/backup/full         - Create full backup
     GET    /api/v1/admin/backup/list         - List all backups
     GET    /api/v1/admin/backup/{id}         - Get backup details
-    GET    /api/v1/admin/backup/{id}/download - Download backup file
+    GET    /api/v1/admin/backup/{id}/download - Download backup file (full: tar archive)
+    POST   /api/v1/admin/backup/{id}/verify   - Verify backup end to end
+    POST   /api/v1/admin/backup/{id}/restore  - Restore full backup files on the server
     DELETE /api/v1/admin/backup/{id}         - Delete backup
 
     GET    /api/v1/admin/backup/schedules          - List schedules
@@ -28,7 +30,7 @@ Endpoints:
 from typing import Any
 
 from fastapi import APIRouter, BackgroundTasks, Depends, HTTPException, Query
-from fastapi.responses import FileResponse
+from fastapi.responses import FileResponse, StreamingResponse
 from pydantic import BaseModel, Field
 
 from resync.core.backup import (
@@ -36,6 +38,7 @@ from resync.core.backup import (
     BackupSchedule,
     BackupStatus,
     BackupType,
+    RepositoryIntegrityError,
     get_backup_service,
 )
 from resync.core.structured_logger import get_logger
@@ -197,7 +200,8 @@ async def create_database_backup(
     """
     Create a PostgreSQL database backup.
 
-    The backup is created using pg_dump and compressed with gzip.
+    The backup is created using pg_dump and streamed through zstd
+    (gzip when zstandard is not installed).
     """
     service = get_backup_service()
 
@@ -237,7 +241,8 @@ async def create_full_backup(request: CreateBackupRequest):
     """
     Create a full backup (database + config).
 
-    Creates both backups and packages them into a single ZIP file.
+    Stored as a deduplicated snapshot: only chunks changed since earlier
+    backups are written.
     """
     service = get_backup_service()
 
@@ -307,6 +312,9 @@ async def get_backup(backup_id: str):
 async def download_backup(backup_id: str):
     """
     Download a backup file.
+
+    Full backups are stored as deduplicated snapshots and are streamed as a
+    tar archive rebuilt (and verified) from their chunks.
     """
     service = get_backup_service()
 
@@ -314,13 +322,28 @@ async def download_backup(backup_id: str):
     if not backup:
         raise HTTPException(status_code=404, detail="Backup not found")
 
+    if backup.metadata.get("storage") == "dedup":
+        try:
+            archive = service.export_backup(backup_id)
+        except ValueError as e:
+            raise HTTPException(status_code=409, detail=str(e)) from e
+        return StreamingResponse(
+            archive,
+            media_type="application/x-tar",
+            headers={"Content-Disposition": f'attachment; filename="{backup_id}.tar"'},
+        )
+
     filepath = service.get_backup_filepath(backup_id)
     if not filepath:
         raise HTTPException(status_code=404, detail="Backup file not found")
 
     # Determine media type
-    if backup.filename.endswith(".sql.gz"):
+    if backup.filename.endswith(".sql.zst"):
+        media_type = "application/zstd"
+    elif backup.filename.endswith(".sql.gz"):
         media_type = "application/gzip"
+    elif backup.filename.endswith(".json"):
+        media_type = "application/json"
     elif backup.filename.endswith(".zip"):
         media_type = "application/zip"
     else:
@@ -333,6 +356,41 @@ async def download_backup(backup_id: str):
     )
 
 
+@router.post("/{backup_id}/verify")
+async def verify_backup(backup_id: str):
+    """
+    Verify a backup end to end (every chunk and file checksum).
+    """
+    service = get_backup_service()
+
+    if not service.get_backup(backup_id):
+        raise HTTPException(status_code=404, detail="Backup not found")
+
+    return await service.verify_backup(backup_id)
+
+
+@router.post("/{backup_id}/restore")
+async def restore_backup(backup_id: str):
+    """
+    Restore the files of a full backup on the server.
+
+    Files are verified and written under the backup directory
+    (``restores/<backup id>``); load ``database/resync_db.sql`` with psql.
+    """
+    service = get_backup_service()
+
+    if not service.get_backup(backup_id):
+        raise HTTPException(status_code=404, detail="Backup not found")
+
+    try:
+        return await service.restore_backup(backup_id)
+    except ValueError as e:
+        raise HTTPException(status_code=409, detail=str(e)) from e
+    except RepositoryIntegrityError as e:
+        logger.error("restore_backup_failed", backup_id=backup_id, error=str(e))
+        raise HTTPException(status_code=500, detail=f"Backup is damaged: {e}") from e
+
+
 @router.delete("/{backup_id}")
 async def delete_backup(backup_id: str):
     """
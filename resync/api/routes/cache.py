@@ -5,6 +5,7 @@ including cache statistics, cache clearing, and cache health monitoring.
 It supports both memory and Redis-based caching with detailed metrics.
 """
 
+import asyncio
 import logging
 import secrets
 
@@ -27,6 +28,7 @@ from pydantic import BaseModel
 from redis import Redis
 from redis.exceptions import ConnectionError, TimeoutError
 
+from resync.core.cache_invalidation import KEY_INDEXES_PREFIX, PREFIX_INDEX_PREFIX, glob_prefix
 from resync.core.fastapi_di import get_tws_client
 from resync.core.interfaces import ITWSClient
 from resync.core.rate_limiter import authenticated_rate_limit
@@ -195,27 +197,72 @@ class RedisCacheManager:
             logger.error(f"Error deleting cache: {e}")
             return False
 
-    def clear_pattern(self, pattern: str) -> int:
+    def clear_pattern(self, pattern: str, batch_size: int = 500) -> int:
         """
         Delete multiple keys matching a pattern.
 
+        Plain prefix patterns ("tws:jobs:*") are served from the prefix index
+        kept by AdvancedCacheManager and EnhancedCacheManager; other globs
+        fall back to SCAN.
+
         Args:
             pattern: The pattern to match (e.g., "tws:*")
+            batch_size: Keys per UNLINK of the SCAN fallback
 
         Returns:
             Number of keys deleted
         """
+        prefix = glob_prefix(pattern)
+        if prefix is not None:
+            return self.clear_prefix(prefix, batch_size)
+
         try:
             # Use SCAN to avoid blocking Redis in production
             total_deleted = 0
+            batch = []
             for key in self.redis_client.scan_iter(match=pattern, count=1000):
-                total_deleted += int(self.redis_client.delete(key))
+                batch.append(key)
+                if len(batch) >= batch_size:
+                    total_deleted += int(self.redis_client.unlink(*batch))
+                    batch.clear()
+            if batch:
+                total_deleted += int(self.redis_client.unlink(*batch))
             logger.debug(f"Cleared {total_deleted} keys matching pattern: {pattern}")
             return total_deleted
         except Exception as e:
             logger.error(f"Error clearing pattern: {e}")
             return 0
 
+    def clear_prefix(self, prefix: str, batch_size: int = 500) -> int:
+        """
+        Delete the indexed keys under a ":"-terminated prefix.
+
+        One SMEMBERS on the prefix index set, then pipelined UNLINKs of the
+        keys (and their own index sets) in chunks of ``batch_size``.
+
+        Args:
+            prefix: Key prefix ending in ":" (e.g., "tws:jobs:")
+
+        Returns:
+            Number of keys deleted
+        """
+        index_key = PREFIX_INDEX_PREFIX + prefix
+        try:
+            keys = list(self.redis_client.smembers(index_key))
+            total_deleted = 0
+            for start in range(0, len(keys), batch_size):
+                chunk = keys[start : start + batch_size]
+                pipe = self.redis_client.pipeline(transaction=False)
+                pipe.unlink(*chunk)
+                pipe.unlink(*(KEY_INDEXES_PREFIX + key for key in chunk))
+                total_deleted += int(pipe.execute()[0])
+            self.redis_client.unlink(index_key)
+            logger.debug(f"Cleared {total_deleted} keys with prefix: {prefix}")
+            return total_deleted
+        except Exception as e:
+            logger.error(f"Error clearing prefix: {e}")
+            return 0
+
     def get_cache_stats(self) -> CacheStats:
         """
         Get cache statistics.
@@ -345,7 +392,7 @@ async def invalidate_tws_cache(
         if scope == "system":
             # Use Redis manager to clear all TWS-related keys if available
             if redis_manager:
-                redis_manager.clear_pattern("tws:*")
+                await asyncio.to_thread(redis_manager.clear_pattern, "tws:*")
 
             await tws_client.invalidate_system_cache()
             logger.info("Full TWS system cache invalidated successfully")
@@ -355,7 +402,7 @@ async def invalidate_tws_cache(
         if scope == "jobs":
             # Use Redis manager to clear job-related keys if available
             if redis_manager:
-                redis_manager.clear_pattern("tws:jobs:*")
+                await asyncio.to_thread(redis_manager.clear_pattern, "tws:jobs:*")
 
             await tws_client.invalidate_all_jobs()
             logger.info("All jobs list cache invalidated successfully")
@@ -365,7 +412,7 @@ async def invalidate_tws_cache(
         if scope == "workstations":
             # Use Redis manager to clear workstation-related keys if available
             if redis_manager:
-                redis_manager.clear_pattern("tws:workstations:*")
+                await asyncio.to_thread(redis_manager.clear_pattern, "tws:workstations:*")
 
             await tws_client.invalidate_all_workstations()
             logger.info("All workstations list cache invalidated successfully")
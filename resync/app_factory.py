@@ -133,6 +133,44 @@ class ApplicationFactory:
 
             app_logger.info("application_startup_initiated", component="resync_hwa_dashboard")
 
+            # Shared TWS API cache tier (one fetch per key per TTL for all workers)
+            if settings.tws_cache_shared_enabled:
+                try:
+                    from resync.core.cache.redis_config import RedisDatabase, get_redis_client
+                    from resync.services.tws_cache import get_tws_cache
+
+                    cache_redis = await get_redis_client(
+                        RedisDatabase.CACHE, decode_responses=False
+                    )
+                    await get_tws_cache().enable_shared_tier(cache_redis)
+                    app_logger.info("tws_cache_shared_tier_started")
+                except Exception as e:
+                    app_logger.warning(
+                        "tws_cache_shared_tier_failed",
+                        error=str(e),
+                        hint="TWS API cache will be per-worker only",
+                    )
+
+            # Query cache for repository reads, invalidated by LISTEN/NOTIFY
+            # (before the stores that read through it are created)
+            if settings.query_cache_enabled:
+                try:
+                    from resync.core.cache.query_cache import (
+                        PostgresChangeListener,
+                        query_cache_manager,
+                    )
+
+                    await query_cache_manager.initialize(
+                        change_source=PostgresChangeListener(query_cache_manager)
+                    )
+                    app_logger.info("query_cache_started")
+                except Exception as e:
+                    app_logger.warning(
+                        "query_cache_start_failed",
+                        error=str(e),
+                        hint="Cached reads will rely on TTLs and local writes",
+                    )
+
             # Outras inicializações...
 
             # Initialize proactive monitoring system
@@ -150,6 +188,21 @@ class ApplicationFactory:
                     hint="Monitoring will be unavailable but app will continue",
                 )
 
+            # Background health checks (per-component cadence, cached results
+            # served to /health and the probes)
+            try:
+                from resync.core.health import get_health_check_service
+
+                health_service = await get_health_check_service()
+                await health_service.start_monitoring()
+                app_logger.info("health_check_scheduler_started")
+            except Exception as e:
+                app_logger.warning(
+                    "health_check_scheduler_start_failed",
+                    error=str(e),
+                    hint="Health endpoints will check components on demand",
+                )
+
             # Initialize metrics collector for monitoring dashboard
             # (migrado de @router.on_event("startup"))
             try:
@@ -346,6 +399,20 @@ class ApplicationFactory:
                 except Exception as e:
                     app_logger.warning("unified_config_shutdown_error", error=str(e))
 
+                try:
+                    from resync.services.tws_cache import get_tws_cache
+
+                    await get_tws_cache().disable_shared_tier()
+                except Exception as e:
+                    app_logger.warning("tws_cache_shared_tier_stop_error", error=str(e))
+
+                try:
+                    from resync.core.cache.query_cache import query_cache_manager
+
+                    await query_cache_manager.shutdown()
+                except Exception as e:
+                    app_logger.warning("query_cache_stop_error", error=str(e))
+
                 await shutdown_tws_monitor()
                 logger.info("application_shutdown_completed")
                 app_logger.info("application_shutdown_successful")
@@ -481,6 +548,18 @@ class ApplicationFactory:
         # 1. Correlation ID (must be first)
         self.app.add_middleware(CorrelationIdMiddleware)
 
+        # 1.2. Request inspection (pure ASGI, opt-in): the only SQL injection
+        # layer (replaces DatabaseSecurityMiddleware); parses the body once
+        # into the scope for downstream consumers
+        if settings.request_inspection_enabled:
+            from resync.api.middleware.request_inspection import RequestInspectionMiddleware
+
+            self.app.add_middleware(
+                RequestInspectionMiddleware,
+                block_on_detection=settings.request_inspection_block,
+                max_body_bytes=settings.request_inspection_max_body_bytes,
+            )
+
         # 1.5. Rate Limiting (após Correlation ID, antes de Exception Handler)
         # Apenas em produção para não interferir em desenvolvimento
         if settings.is_production:
@@ -0,0 +1,354 @@
+"""
+Append-only segment storage for encrypted audit blocks.
+
+Blocks are appended to segment files as length-prefixed binary records and
+indexed in a sidecar file by time range and search terms, so forensic
+queries only read (and decrypt) the blocks that can contain matches.
+
+Record layout (big-endian):
+    magic (4 bytes) | header length (u32) | payload length (u32) | header | payload
+
+The header is the JSON block metadata (the same document the index keeps);
+the payload is the block ciphertext. The sidecar index (``segments.idx``)
+has one JSON line per block with the header plus its position, and can be
+rebuilt from the segments alone. File writes and fsyncs run in a worker
+thread, never on the event loop.
+
+Usage:
+    store = AuditSegmentStore(Path("data/audit_logs"))
+    ref = await store.append("block_000001", ciphertext, meta, terms, min_ts, max_ts)
+    for ref in store.find(start_time, end_time, terms=["event:login"]):
+        payload = await store.read(ref)
+"""
+
+from __future__ import annotations
+
+import asyncio
+import json
+import os
+import struct
+from collections.abc import Iterable
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Any
+
+from resync.core.structured_logger import get_logger
+
+logger = get_logger(__name__)
+
+RECORD_MAGIC = b"RSA1"
+_RECORD_HEADER = struct.Struct(">4sII")
+
+INDEX_FILE_NAME = "segments.idx"
+
+
+@dataclass
+class SegmentRef:
+    """Position and index data of one stored block."""
+
+    block_id: str
+    segment: int
+    offset: int
+    length: int
+    min_ts: float
+    max_ts: float
+    terms: frozenset[str] = field(default_factory=frozenset)
+    meta: dict[str, Any] = field(default_factory=dict)
+
+    def overlaps(self, start_time: float | None, end_time: float | None) -> bool:
+        """Whether the block's time range intersects [start_time, end_time]."""
+        if start_time is not None and self.max_ts < start_time:
+            return False
+        return not (end_time is not None and self.min_ts > end_time)
+
+    def to_index_record(self) -> dict[str, Any]:
+        """Index line for this block."""
+        return {
+            "block_id": self.block_id,
+            "segment": self.segment,
+            "offset": self.offset,
+            "length": self.length,
+            "min_ts": self.min_ts,
+            "max_ts": self.max_ts,
+            "terms": sorted(self.terms),
+            "meta": self.meta,
+        }
+
+    @classmethod
+    def from_index_record(cls, data: dict[str, Any]) -> SegmentRef:
+        """Create a ref from an index line."""
+        return cls(
+            block_id=data["block_id"],
+            segment=data["segment"],
+            offset=data["offset"],
+            length=data["length"],
+            min_ts=data["min_ts"],
+            max_ts=data["max_ts"],
+            terms=frozenset(data.get("terms", ())),
+            meta=data.get("meta", {}),
+        )
+
+
+class AuditSegmentStore:
+    """
+    Append-only, indexed block storage in rotating segment files.
+
+    Features:
+    - Length-prefixed binary records (no base64/JSON wrapping of ciphertext)
+    - Sidecar index by time range and arbitrary terms (event type, user...)
+    - Crash recovery: torn tail records are truncated, unindexed records
+      are re-indexed from their headers
+    - Writes and fsyncs in a worker thread
+    """
+
+    def __init__(
+        self,
+        directory: Path,
+        max_segment_bytes: int = 64 * 1024 * 1024,
+        fsync: bool = True,
+    ):
+        self.directory = Path(directory)
+        self.directory.mkdir(parents=True, exist_ok=True)
+        self.max_segment_bytes = max_segment_bytes
+        self.fsync = fsync
+
+        self._refs: list[SegmentRef] = []
+        self._by_term: dict[str, list[int]] = {}
+        self._by_block_id: dict[str, int] = {}
+        self._segment = 0
+        self._segment_size = 0
+        self._write_lock = asyncio.Lock()
+
+        self._load()
+
+    # ------------------------------------------------------------------
+    # Write path
+    # ------------------------------------------------------------------
+
+    async def append(
+        self,
+        block_id: str,
+        payload: bytes,
+        meta: dict[str, Any],
+        terms: Iterable[str],
+        min_ts: float,
+        max_ts: float,
+    ) -> SegmentRef:
+        """
+        Append a block and index it.
+
+        The record is written and fsynced before its index line, so the
+        index never points at data that is not on disk.
+
+        Returns:
+            Reference to the stored block
+        """
+        async with self._write_lock:
+            if self._segment_size and self._segment_size >= self.max_segment_bytes:
+                self._segment += 1
+                self._segment_size = 0
+
+            ref = SegmentRef(
+                block_id=block_id,
+                segment=self._segment,
+                offset=self._segment_size,
+                length=0,
+                min_ts=min_ts,
+                max_ts=max_ts,
+                terms=frozenset(terms),
+                meta=meta,
+            )
+            header = json.dumps(
+                {k: v for k, v in ref.to_index_record().items() if k not in ("offset", "length")},
+                separators=(",", ":"),
+            ).encode()
+            record = _RECORD_HEADER.pack(RECORD_MAGIC, len(header), len(payload)) + header + payload
+            ref.length = len(record)
+
+            await asyncio.to_thread(self._write_record, ref, record)
+
+            self._segment_size += len(record)
+            self._add_ref(ref)
+            return ref
+
+    def _write_record(self, ref: SegmentRef, record: bytes) -> None:
+        segment_path = self.segment_path(ref.segment)
+        index_path = self.directory / INDEX_FILE_NAME
+        index_size = index_path.stat().st_size if index_path.exists() else 0
+        try:
+            with open(segment_path, "ab") as f:
+                f.write(record)
+                f.flush()
+                if self.fsync:
+                    os.fsync(f.fileno())
+
+            line = json.dumps(ref.to_index_record(), separators=(",", ":")) + "\n"
+            with open(index_path, "a", encoding="utf-8") as f:
+                f.write(line)
+                f.flush()
+                if self.fsync:
+                    os.fsync(f.fileno())
+        except BaseException:
+            # Back to the old sizes: the next record is written at ref.offset
+            for path, size in ((segment_path, ref.offset), (index_path, index_size)):
+                try:
+                    if path.exists() and path.stat().st_size > size:
+                        os.truncate(path, size)
+                except OSError as e:
+                    logger.error(f"Failed to truncate {path.name} after a failed append: {e}")
+            raise
+
+    # ------------------------------------------------------------------
+    # Read path
+    # ------------------------------------------------------------------
+
+    def find(
+        self,
+        start_time: float | None = None,
+        end_time: float | None = None,
+        terms: Iterable[str] = (),
+    ) -> list[SegmentRef]:
+        """
+        Blocks that may hold entries in the time range carrying every term.
+
+        Returns:
+            Candidate blocks, newest first
+        """
+        terms = list(terms)
+        if terms:
+            postings = sorted((self._by_term.get(term, []) for term in terms), key=len)
+            positions = set(postings[0])
+            for posting in postings[1:]:
+                positions.intersection_update(posting)
+                if not positions:
+                    break
+            candidates = sorted(positions, reverse=True)
+        else:
+            candidates = range(len(self._refs) - 1, -1, -1)
+
+        return [
+            self._refs[pos] for pos in candidates if self._refs[pos].overlaps(start_time, end_time)
+        ]
+
+    def get(self, block_id: str) -> SegmentRef | None:
+        """Reference of a block by id."""
+        pos = self._by_block_id.get(block_id)
+        return self._refs[pos] if pos is not None else None
+
+    def refs(self) -> list[SegmentRef]:
+        """All blocks in append order."""
+        return list(self._refs)
+
+    async def read(self, ref: SegmentRef) -> bytes:
+        """Read a block's payload."""
+        return await asyncio.to_thread(self.read_sync, ref)
+
+    def read_sync(self, ref: SegmentRef) -> bytes:
+        """Read a block's payload (blocking; for worker threads/processes)."""
+        with open(self.segment_path(ref.segment), "rb") as f:
+            f.seek(ref.offset)
+            record = f.read(ref.length)
+        magic, header_len, payload_len = _RECORD_HEADER.unpack_from(record)
+        if magic != RECORD_MAGIC:
+            raise ValueError(f"Corrupt audit segment record for block {ref.block_id}")
+        start = _RECORD_HEADER.size + header_len
+        return record[start : start + payload_len]
+
+    def segment_path(self, segment: int) -> Path:
+        """Path of a segment file."""
+        return self.directory / f"segment_{segment:06d}.seg"
+
+    def get_statistics(self) -> dict[str, Any]:
+        """Store statistics."""
+        return {
+            "indexed_blocks": len(self._refs),
+            "indexed_terms": len(self._by_term),
+            "segments": self._segment + 1 if self._refs else 0,
+            "current_segment_bytes": self._segment_size,
+        }
+
+    def __len__(self) -> int:
+        return len(self._refs)
+
+    # ------------------------------------------------------------------
+    # Index maintenance
+    # ------------------------------------------------------------------
+
+    def _add_ref(self, ref: SegmentRef) -> None:
+        pos = len(self._refs)
+        self._refs.append(ref)
+        self._by_block_id[ref.block_id] = pos
+        for term in ref.terms:
+            self._by_term.setdefault(term, []).append(pos)
+
+    def _load(self) -> None:
+        """Load the sidecar index and reconcile it with the segment files."""
+        index_file = self.directory / INDEX_FILE_NAME
+        if index_file.exists():
+            with open(index_file, encoding="utf-8") as f:
+                for line in f:
+                    try:
+                        self._add_ref(SegmentRef.from_index_record(json.loads(line)))
+                    except (ValueError, KeyError):
+                        # Torn last line from a crash; the record is re-indexed below
+                        logger.warning(f"Skipping unreadable audit index line in {index_file}")
+            # Terminate a torn last line so the next append starts a new one
+            with open(index_file, "rb+") as f:
+                size = f.seek(0, os.SEEK_END)
+                if size:
+                    f.seek(size - 1)
+                    if f.read(1) != b"\n":
+                        f.write(b"\n")
+
+        segments = sorted(
+            int(path.stem.split("_")[1]) for path in self.directory.glob("segment_*.seg")
+        )
+        if not segments:
+            return
+
+        # Re-index records written after the last index line (crash between
+        # the segment fsync and the index append)
+        recovered = 0
+        indexed_ends = {ref.segment: ref.offset + ref.length for ref in self._refs}
+        for segment in segments:
+            if segment < (self._refs[-1].segment if self._refs else 0):
+                continue
+            recovered += self._recover_segment(segment, indexed_ends.get(segment, 0))
+
+        self._segment = segments[-1]
+        self._segment_size = self.segment_path(self._segment).stat().st_size
+        if recovered:
+            logger.warning(f"Re-indexed {recovered} audit blocks missing from {index_file}")
+
+    def _recover_segment(self, segment: int, offset: int) -> int:
+        path = self.segment_path(segment)
+        recovered = 0
+        with open(path, "r+b") as f:
+            f.seek(offset)
+            while True:
+                head = f.read(_RECORD_HEADER.size)
+                if not head:
+                    break
+                if len(head) < _RECORD_HEADER.size:
+                    self._truncate(f, offset)
+                    break
+                magic, header_len, payload_len = _RECORD_HEADER.unpack(head)
+                body = f.read(header_len + payload_len)
+                if magic != RECORD_MAGIC or len(body) < header_len + payload_len:
+                    self._truncate(f, offset)
+                    break
+                data = json.loads(body[:header_len])
+                length = _RECORD_HEADER.size + header_len + payload_len
+                ref = SegmentRef.from_index_record({**data, "offset": offset, "length": length})
+                if ref.block_id not in self._by_block_id:
+                    self._add_ref(ref)
+                    with open(self.directory / INDEX_FILE_NAME, "a", encoding="utf-8") as idx:
+                        idx.write(json.dumps(ref.to_index_record(), separators=(",", ":")) + "\n")
+                    recovered += 1
+                offset += length
+        return recovered
+
+    @staticmethod
+    def _truncate(f: Any, offset: int) -> None:
+        logger.warning(f"Truncating torn audit segment record at offset {offset}")
+        f.truncate(offset)
@@ -0,0 +1,517 @@
+"""
+Incremental integrity verification for encrypted audit blocks.
+
+Each stored block is verified once: its entries are decrypted, their
+hashes, hash-chain links and HMAC signatures recomputed, and the block
+hash and Merkle root of the entry hashes checked. The result is recorded
+as a signed checkpoint; checkpoints are chained (each signature covers the
+previous one), so later runs only verify blocks added after the last
+checkpoint and cheaply re-check the checkpoints themselves.
+
+Block verification is CPU-bound (decrypt, decompress, SHA-256, HMAC) and
+runs in a process pool; the per-block function is module-level and takes
+plain bytes/dicts so it can be pickled.
+
+Merkle tree (RFC 6962 style domain separation):
+    leaf = SHA256(0x00 || entry hash)
+    node = SHA256(0x01 || left || right)
+    an odd node at the end of a level is carried up unchanged
+
+Usage:
+    verifier = AuditVerifier(trail)
+    report = await verifier.verify()          # new blocks only
+    report = await verifier.verify(full=True)  # every block
+    proof = merkle_proof(leaf_hashes, index)
+    assert verify_merkle_proof(leaf_hashes[index], proof, root)
+"""
+
+from __future__ import annotations
+
+import asyncio
+import base64
+import gzip
+import hashlib
+import hmac
+import json
+import multiprocessing
+import time
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from dataclasses import asdict, dataclass
+from pathlib import Path
+from typing import TYPE_CHECKING, Any
+
+from cryptography.fernet import Fernet
+
+from resync.core.structured_logger import get_logger
+
+if TYPE_CHECKING:
+    from resync.core.audit_segments import SegmentRef
+    from resync.core.encrypted_audit import EncryptedAuditTrail
+
+logger = get_logger(__name__)
+
+CHECKPOINT_FILE_NAME = "checkpoints.jsonl"
+
+_ENTRY_CONTENT_FIELDS = (
+    "entry_id",
+    "timestamp",
+    "event_type",
+    "user_id",
+    "resource_id",
+    "action",
+    "details",
+    "ip_address",
+    "user_agent",
+    "session_id",
+)
+
+
+def entry_content_hash(data: dict[str, Any]) -> str:
+    """SHA-256 of an audit entry's content fields (canonical JSON)."""
+    content = {name: data.get(name) for name in _ENTRY_CONTENT_FIELDS}
+    content_str = json.dumps(content, sort_keys=True, separators=(",", ":"))
+    return hashlib.sha256(content_str.encode()).hexdigest()
+
+
+def chain_hash(previous_hash: str, hash_value: str) -> str:
+    """Running hash-chain value of an entry."""
+    if not previous_hash:
+        return hash_value
+    return hashlib.sha256(f"{previous_hash}:{hash_value}".encode()).hexdigest()
+
+
+def entry_signature(hmac_key: bytes, entry_id: str, hash_value: str, chain_value: str) -> str:
+    """HMAC signature of an entry."""
+    content = f"{entry_id}:{hash_value}:{chain_value}"
+    return hmac.new(hmac_key, content.encode(), hashlib.sha256).hexdigest()
+
+
+def block_hash(
+    block_id: str, created_at: float, entry_hashes: list[str], previous_block_hash: str
+) -> str:
+    """Hash of a block (same document as AuditLogBlock.generate_block_hash)."""
+    content = {
+        "block_id": block_id,
+        "created_at": created_at,
+        "entries": entry_hashes,
+        "previous_block_hash": previous_block_hash,
+    }
+    content_str = json.dumps(content, sort_keys=True, separators=(",", ":"))
+    return hashlib.sha256(content_str.encode()).hexdigest()
+
+
+# =============================================================================
+# Merkle tree
+# =============================================================================
+
+
+def _leaf(entry_hash: str) -> bytes:
+    return hashlib.sha256(b"\x00" + bytes.fromhex(entry_hash)).digest()
+
+
+def _node(left: bytes, right: bytes) -> bytes:
+    return hashlib.sha256(b"\x01" + left + right).digest()
+
+
+def merkle_root(entry_hashes: list[str]) -> str:
+    """Merkle root (hex) over entry hashes, in order."""
+    if not entry_hashes:
+        return hashlib.sha256(b"").hexdigest()
+    level = [_leaf(h) for h in entry_hashes]
+    while len(level) > 1:
+        level = [
+            _node(level[i], level[i + 1]) if i + 1 < len(level) else level[i]
+            for i in range(0, len(level), 2)
+        ]
+    return level[0].hex()
+
+
+def merkle_proof(entry_hashes: list[str], index: int) -> list[list[str]]:
+    """
+    Inclusion proof for the entry at ``index``.
+
+    Returns:
+        [side, sibling hash] pairs from leaf to root; side is "L" when the
+        sibling is on the left
+    """
+    if not 0 <= index < len(entry_hashes):
+        raise IndexError(f"leaf index {index} out of range")
+    proof = []
+    level = [_leaf(h) for h in entry_hashes]
+    while len(level) > 1:
+        sibling = index ^ 1
+        if sibling < len(level):
+            proof.append(["L" if sibling < index else "R", level[sibling].hex()])
+        level = [
+            _node(level[i], level[i + 1]) if i + 1 < len(level) else level[i]
+            for i in range(0, len(level), 2)
+        ]
+        index //= 2
+    return proof
+
+
+def verify_merkle_proof(entry_hash: str, proof: list[list[str]], root: str) -> bool:
+    """Check an inclusion proof against a Merkle root."""
+    node = _leaf(entry_hash)
+    for side, sibling in proof:
+        sibling_bytes = bytes.fromhex(sibling)
+        node = _node(sibling_bytes, node) if side == "L" else _node(node, sibling_bytes)
+    return hmac.compare_digest(node.hex(), root)
+
+
+# =============================================================================
+# Block verification (runs in worker processes)
+# =============================================================================
+
+
+def verify_block_payload(
+    meta: dict[str, Any],
+    payload: bytes,
+    fernet_key: bytes,
+    hmac_key: bytes,
+    check_signatures: bool = True,
+) -> dict[str, Any]:
+    """
+    Decrypt a stored block and verify it.
+
+    Checks every entry hash, the hash-chain links inside the block, entry
+    signatures and the block hash, and computes the Merkle root.
+
+    Returns:
+        Dict with block_id, valid, issues, merkle_root, entries,
+        first_previous_hash and last_chain_hash
+    """
+    block_id = meta["block_id"]
+    issues: list[str] = []
+
+    data = Fernet(fernet_key).decrypt(base64.urlsafe_b64encode(payload))
+    if meta.get("compressed"):
+        data = gzip.decompress(data)
+    entries = json.loads(data)
+
+    hashes = []
+    previous = entries[0].get("previous_hash", "") if entries else ""
+    for position, entry in enumerate(entries):
+        hash_value = entry_content_hash(entry)
+        if hash_value != entry.get("hash_value"):
+            issues.append(f"{block_id}:{position}:entry_hash_mismatch")
+        if entry.get("chain_hash"):
+            if entry.get("previous_hash", "") != previous:
+                issues.append(f"{block_id}:{position}:chain_link_broken")
+            if chain_hash(entry.get("previous_hash", ""), hash_value) != entry["chain_hash"]:
+                issues.append(f"{block_id}:{position}:chain_hash_mismatch")
+            previous = entry["chain_hash"]
+        if check_signatures and entry.get("signature"):
+            expected = entry_signature(
+                hmac_key, entry["entry_id"], hash_value, entry.get("chain_hash", "")
+            )
+            if not hmac.compare_digest(expected, entry["signature"]):
+                issues.append(f"{block_id}:{position}:signature_invalid")
+        hashes.append(entry.get("hash_value", ""))
+
+    expected_block_hash = block_hash(
+        block_id, meta["created_at"], hashes, meta.get("previous_block_hash", "")
+    )
+    if expected_block_hash != meta.get("block_hash"):
+        issues.append(f"{block_id}:block_hash_mismatch")
+
+    return {
+        "block_id": block_id,
+        "valid": not issues,
+        "issues": issues,
+        "merkle_root": merkle_root(hashes) if hashes and not issues else "",
+        "entries": len(entries),
+        "first_previous_hash": entries[0].get("previous_hash", "") if entries else "",
+        "last_chain_hash": entries[-1].get("chain_hash", "") if entries else "",
+    }
+
+
+# =============================================================================
+# Checkpoints
+# =============================================================================
+
+
+@dataclass
+class BlockCheckpoint:
+    """Signed record of a verified block."""
+
+    block_id: str
+    block_hash: str
+    merkle_root: str
+    entries: int
+    last_chain_hash: str
+    verified_at: float
+    signature: str = ""
+
+    def signing_content(self, previous_signature: str) -> bytes:
+        """Bytes covered by the signature (chained to the previous checkpoint)."""
+        return (
+            f"{previous_signature}:{self.block_id}:{self.block_hash}:"
+            f"{self.merkle_root}:{self.entries}:{self.last_chain_hash}"
+        ).encode()
+
+
+class AuditVerifier:
+    """
+    Incremental, parallel verifier for an EncryptedAuditTrail's stored blocks.
+
+    Features:
+    - Signed, chained Merkle checkpoints per block (checkpoints.jsonl)
+    - Only blocks after the last checkpoint are decrypted and hashed
+    - Block verification spread across a process pool (spawned once, reused
+      across runs; close() shuts it down)
+    - Inclusion proofs for single events
+    """
+
+    def __init__(self, trail: EncryptedAuditTrail, max_workers: int | None = None):
+        self.trail = trail
+        self.max_workers = max_workers
+        self._executor: ProcessPoolExecutor | None = None
+        self.checkpoint_file = Path(trail.audit_log_dir) / CHECKPOINT_FILE_NAME
+        self.checkpoints: dict[str, BlockCheckpoint] = {}
+        self._order: list[str] = []
+        self._lock = asyncio.Lock()
+        self._load_checkpoints()
+
+    def _load_checkpoints(self) -> None:
+        if not self.checkpoint_file.exists():
+            return
+        for line in self.checkpoint_file.read_text(encoding="utf-8").splitlines():
+            try:
+                checkpoint = BlockCheckpoint(**json.loads(line))
+            except (ValueError, TypeError):
+                logger.warning(f"Skipping unreadable audit checkpoint in {self.checkpoint_file}")
+                continue
+            self.checkpoints[checkpoint.block_id] = checkpoint
+            self._order.append(checkpoint.block_id)
+
+    def _sign(self, checkpoint: BlockCheckpoint, previous_signature: str) -> str:
+        return hmac.new(
+            self.trail.key_manager.hmac_key,
+            checkpoint.signing_content(previous_signature),
+            hashlib.sha256,
+        ).hexdigest()
+
+    def verify_checkpoints(self) -> list[str]:
+        """
+        Re-check checkpoint signatures and that checkpointed blocks are unchanged.
+
+        Cheap: no decryption, only HMACs and index metadata.
+
+        Returns:
+            Issues found
+        """
+        issues = []
+        previous_signature = ""
+        store = self.trail.segment_store
+        for block_id in self._order:
+            checkpoint = self.checkpoints[block_id]
+            expected = self._sign(checkpoint, previous_signature)
+            if not hmac.compare_digest(expected, checkpoint.signature):
+                issues.append(f"{block_id}:checkpoint_signature_invalid")
+            ref = store.get(block_id)
+            if ref is None:
+                issues.append(f"{block_id}:checkpointed_block_missing")
+            elif ref.meta.get("block_hash") != checkpoint.block_hash:
+                issues.append(f"{block_id}:checkpointed_block_changed")
+            previous_signature = checkpoint.signature
+        return issues
+
+    async def verify(self, full: bool = False) -> dict[str, Any]:
+        """
+        Verify stored blocks and checkpoint the valid ones.
+
+        Args:
+            full: Re-verify every block, not only those after the last checkpoint
+
+        Returns:
+            Dict with valid, issues, blocks_verified, entries_verified and
+            checkpointed_blocks
+        """
+        async with self._lock:
+            issues = self.verify_checkpoints()
+            refs = self.trail.segment_store.refs()
+            if not full:
+                refs = [ref for ref in refs if ref.block_id not in self.checkpoints]
+
+            results = await self._verify_blocks(refs)
+            link_issues = self._check_links(results)
+
+            # Checkpoint valid blocks up to the first problem
+            broken = bool(issues)
+            new_checkpoints = []
+            for ref, result in zip(refs, results, strict=True):
+                block_issues = result["issues"] + link_issues.get(ref.block_id, [])
+                checkpoint = self.checkpoints.get(ref.block_id)
+                if checkpoint is not None and result["valid"]:
+                    if checkpoint.merkle_root != result["merkle_root"]:
+                        block_issues.append(f"{ref.block_id}:merkle_root_mismatch")
+                issues.extend(block_issues)
+                broken = broken or bool(block_issues)
+                if checkpoint is None and not broken:
+                    new_checkpoints.append(
+                        BlockCheckpoint(
+                            block_id=ref.block_id,
+                            block_hash=ref.meta["block_hash"],
+                            merkle_root=result["merkle_root"],
+                            entries=result["entries"],
+                            last_chain_hash=result["last_chain_hash"],
+                            verified_at=time.time(),
+                        )
+                    )
+
+            if new_checkpoints:
+                await self._append_checkpoints(new_checkpoints)
+
+        return {
+            "valid": not issues,
+            "issues": issues,
+            "blocks_verified": len(refs),
+            "entries_verified": sum(result["entries"] for result in results),
+            "checkpointed_blocks": len(self.checkpoints),
+        }
+
+    async def _verify_blocks(self, refs: list[SegmentRef]) -> list[dict[str, Any]]:
+        """Verify blocks concurrently; decryption and hashing in worker processes."""
+        if not refs:
+            return []
+
+        loop = asyncio.get_running_loop()
+        hmac_key = self.trail.key_manager.hmac_key
+        check_signatures = self.trail.config.enable_signatures
+
+        async def verify_one(executor: ProcessPoolExecutor | None, ref: SegmentRef):
+            key = self.trail.key_manager.get_key_by_id(ref.meta.get("encryption_key_id", ""))
+            if key is None:
+                return self._failed(ref, "encryption_key_unavailable")
+            try:
+                payload = await self.trail.segment_store.read(ref)
+                return await loop.run_in_executor(
+                    executor,
+                    verify_block_payload,
+                    ref.meta,
+                    payload,
+                    key.get_fernet_key(),
+                    hmac_key,
+                    check_signatures,
+                )
+            except BrokenProcessPool:
+                # A worker died: the pool is unusable, the next run starts a new one
+                if self._executor is executor:
+                    self._executor = None
+                    executor.shutdown(wait=False)
+                logger.warning(f"Audit block {ref.block_id} not verified: worker pool broke")
+                return self._failed(ref, "unreadable")
+            except Exception as e:
+                logger.warning(f"Audit block {ref.block_id} failed verification: {e}")
+                return self._failed(ref, "unreadable")
+
+        # A pool only pays off with several blocks; one block runs in a thread
+        if len(refs) == 1 or self.max_workers == 0:
+            return [await verify_one(None, ref) for ref in refs]
+
+        executor = self._get_executor()
+        return list(await asyncio.gather(*(verify_one(executor, ref) for ref in refs)))
+
+    def _get_executor(self) -> ProcessPoolExecutor:
+        if self._executor is None:
+            # spawn, not fork: workers must not inherit the event loop, locks
+            # and threads of the server process
+            self._executor = ProcessPoolExecutor(
+                max_workers=self.max_workers, mp_context=multiprocessing.get_context("spawn")
+            )
+        return self._executor
+
+    async def close(self) -> None:
+        """Shut the worker pool down (off the event loop)."""
+        executor, self._executor = self._executor, None
+        if executor is not None:
+            await asyncio.to_thread(executor.shutdown, wait=True, cancel_futures=True)
+
+    @staticmethod
+    def _failed(ref: SegmentRef, reason: str) -> dict[str, Any]:
+        return {
+            "block_id": ref.block_id,
+            "valid": False,
+            "issues": [f"{ref.block_id}:{reason}"],
+            "merkle_root": "",
+            "entries": 0,
+            "first_previous_hash": "",
+            "last_chain_hash": "",
+        }
+
+    def _check_links(self, results: list[dict[str, Any]]) -> dict[str, list[str]]:
+        """Check the chain links between consecutive blocks, per block id."""
+        issues: dict[str, list[str]] = {}
+        if not results:
+            return issues
+
+        store = self.trail.segment_store
+        refs = store.refs()
+        position = [ref.block_id for ref in refs].index(results[0]["block_id"])
+        # Link the first verified block to the block stored before it
+        previous_block_hash = refs[position - 1].meta.get("block_hash") if position else None
+
+        for result in results:
+            block_id = result["block_id"]
+            ref = store.get(block_id)
+            if result["valid"]:
+                # The block closes the entry chain it carries...
+                if result["last_chain_hash"] and (
+                    ref.meta.get("previous_block_hash") != result["last_chain_hash"]
+                ):
+                    issues.setdefault(block_id, []).append(f"{block_id}:block_chain_mismatch")
+                # ...and its first entry continues from the previous block
+                if previous_block_hash is not None and result["first_previous_hash"] not in (
+                    previous_block_hash,
+                    "",
+                ):
+                    issues.setdefault(block_id, []).append(f"{block_id}:block_link_broken")
+            previous_block_hash = ref.meta.get("block_hash")
+        return issues
+
+    async def _append_checkpoints(self, checkpoints: list[BlockCheckpoint]) -> None:
+        previous_signature = self.checkpoints[self._order[-1]].signature if self._order else ""
+        lines = []
+        for checkpoint in checkpoints:
+            checkpoint.signature = self._sign(checkpoint, previous_signature)
+            previous_signature = checkpoint.signature
+            self.checkpoints[checkpoint.block_id] = checkpoint
+            self._order.append(checkpoint.block_id)
+            lines.append(json.dumps(asdict(checkpoint), separators=(",", ":")) + "\n")
+        await asyncio.to_thread(self._write_lines, "".join(lines))
+
+    def _write_lines(self, text: str) -> None:
+        with open(self.checkpoint_file, "a", encoding="utf-8") as f:
+            f.write(text)
+
+    def inclusion_proof(
+        self, block_id: str, entry_hashes: list[str], index: int
+    ) -> dict[str, Any]:
+        """
+        Inclusion proof of one entry of a stored block.
+
+        The root is the checkpointed one when the block has been verified,
+        so the proof ties the event to a signed checkpoint.
+        """
+        root = merkle_root(entry_hashes)
+        checkpoint = self.checkpoints.get(block_id)
+        return {
+            "block_id": block_id,
+            "leaf_index": index,
+            "leaf_hash": entry_hashes[index],
+            "merkle_root": checkpoint.merkle_root if checkpoint else root,
+            "checkpointed": checkpoint is not None,
+            "checkpoint_signature": checkpoint.signature if checkpoint else "",
+            "proof": merkle_proof(entry_hashes, index),
+        }
+
+    def get_statistics(self) -> dict[str, Any]:
+        """Verifier statistics."""
+        last = self.checkpoints[self._order[-1]] if self._order else None
+        return {
+            "checkpointed_blocks": len(self.checkpoints),
+            "last_checkpoint_block": last.block_id if last else None,
+            "last_checkpoint_at": last.verified_at if last else None,
+        }
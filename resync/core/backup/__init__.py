@@ -5,6 +5,7 @@ Provides database and configuration backup capabilities:
 - PostgreSQL database backup via pg_dump
 - System configuration backup
 - Scheduled backups with retention policy
+- Deduplicated full backups with verified restore
 - Backup listing and management
 
 Usage:
@@ -22,6 +23,12 @@ from resync.core.backup.backup_service import (
     BackupType,
     get_backup_service,
 )
+from resync.core.backup.dedup_repository import (
+    ContentDefinedChunker,
+    DedupRepository,
+    RepositoryIntegrityError,
+    Snapshot,
+)
 
 __all__ = [
     "BackupService",
@@ -30,4 +37,8 @@ __all__ = [
     "BackupType",
     "BackupStatus",
     "get_backup_service",
+    "ContentDefinedChunker",
+    "DedupRepository",
+    "RepositoryIntegrityError",
+    "Snapshot",
 ]
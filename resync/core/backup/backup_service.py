@@ -2,8 +2,9 @@
 Backup Service for PostgreSQL and System Configuration.
 
 Provides:
-- PostgreSQL database backup (pg_dump compressed)
+- PostgreSQL database backup (pg_dump streamed through multi-threaded zstd)
 - System configuration backup (YAML, ENV, configs)
+- Deduplicated full backups (content-defined chunks, verified restore)
 - Scheduled backups with cron-like expressions
 - Backup listing, download, and cleanup
 
@@ -26,22 +27,37 @@ from __future__ import annotations
 
 import asyncio
 import contextlib
+import gzip
 import hashlib
+import io
 import json
 import os
 import subprocess
 import zipfile
+from collections.abc import AsyncIterable, AsyncIterator, Iterator
 from dataclasses import dataclass, field
 from datetime import datetime, timedelta
 from enum import Enum
 from pathlib import Path
 from typing import Any
 
+from resync.core.backup.dedup_repository import DedupRepository
 from resync.core.database.config import get_database_config
 from resync.core.structured_logger import get_logger
 
+try:
+    import zstandard
+
+    ZSTD_AVAILABLE = True
+except ImportError:
+    zstandard = None
+    ZSTD_AVAILABLE = False
+
 logger = get_logger(__name__)
 
+# pg_dump output is read in blocks of up to this size
+STREAM_READ_SIZE = 1024 * 1024
+
 
 class BackupType(str, Enum):
     """Type of backup."""
@@ -150,6 +166,33 @@ def _calculate_sha256(filepath: str) -> str:
     return sha256_hash.hexdigest()
 
 
+class _HashingWriter(io.RawIOBase):
+    """
+    Write-through file wrapper that hashes what is written.
+
+    It is deliberately not seekable, so zipfile/gzip/zstd write their output
+    strictly sequentially and the checksum is complete when writing ends.
+    """
+
+    def __init__(self, fileobj: Any):
+        self._fileobj = fileobj
+        self._sha256 = hashlib.sha256()
+        self.bytes_written = 0
+
+    def writable(self) -> bool:
+        return True
+
+    def write(self, data: Any) -> int:
+        self._sha256.update(data)
+        self._fileobj.write(data)
+        size = memoryview(data).nbytes
+        self.bytes_written += size
+        return size
+
+    def hexdigest(self) -> str:
+        return self._sha256.hexdigest()
+
+
 class BackupService:
     """
     Service for managing database and configuration backups.
@@ -157,7 +200,8 @@ class BackupService:
     Features:
     - PostgreSQL backup via pg_dump
     - Configuration files backup
-    - Automatic compression (ZIP/GZIP)
+    - Streaming compression (zstd, ZIP) with inline checksums
+    - Deduplicated full backups with verified restore
     - Scheduled backups
     - Retention policy
     """
@@ -188,6 +232,12 @@ class BackupService:
         # Backup metadata file
         self._metadata_file = self._backup_dir / "backups.json"
 
+        # Deduplicating chunk repository used by full backups
+        self._compression_level = int(os.getenv("BACKUP_COMPRESSION_LEVEL", "3"))
+        self._repository = DedupRepository(
+            self._backup_dir / "repository", compression_level=self._compression_level
+        )
+
         # Schedules
         self._schedules: dict[str, BackupSchedule] = {}
         self._scheduler_task: asyncio.Task | None = None
@@ -196,7 +246,8 @@ class BackupService:
         self._backups: dict[str, BackupInfo] = {}
         self._load_metadata()
 
-        # Configuration paths to backup
+        # Configuration paths to backup (relative to the project root)
+        self._project_root = Path(__file__).parent.parent.parent.parent
         self._config_paths = [
             "config/",
             "resync/prompts/",
@@ -279,6 +330,84 @@ class BackupService:
         except Exception as e:
             logger.error("backup_metadata_save_failed", error=str(e))
 
+    def _pg_dump_command(self, db_config: Any) -> tuple[list[str], dict[str, str]]:
+        """pg_dump command line and environment for a plain SQL dump."""
+        env = os.environ.copy()
+        env["PGPASSWORD"] = db_config.password
+
+        return [
+            "pg_dump",
+            "-h",
+            db_config.host,
+            "-p",
+            str(db_config.port),
+            "-U",
+            db_config.user,
+            "-d",
+            db_config.name,
+            "--format=plain",
+            "--no-owner",
+            "--no-privileges",
+        ], env
+
+    async def _stream_pg_dump(self, db_config: Any) -> AsyncIterator[bytes]:
+        """
+        Yield pg_dump output as it is produced.
+
+        Raises:
+            RuntimeError: if pg_dump exits with an error
+        """
+        cmd, env = self._pg_dump_command(db_config)
+        pg_dump = await asyncio.create_subprocess_exec(
+            *cmd,
+            stdout=subprocess.PIPE,
+            stderr=subprocess.PIPE,
+            env=env,
+            limit=STREAM_READ_SIZE,
+        )
+        stderr_task = asyncio.create_task(pg_dump.stderr.read())
+        try:
+            while data := await pg_dump.stdout.read(STREAM_READ_SIZE):
+                yield data
+
+            stderr = await stderr_task
+            if await pg_dump.wait() != 0:
+                raise RuntimeError(f"pg_dump failed: {stderr.decode(errors='replace')}")
+        finally:
+            if pg_dump.returncode is None:
+                pg_dump.kill()
+                await pg_dump.wait()
+            stderr_task.cancel()
+
+    async def _write_stream(
+        self, stream: AsyncIterable[bytes], filepath: Path, compress: bool
+    ) -> str:
+        """
+        Write a stream to a file, compressing and hashing in the same pass.
+
+        Compression uses zstd with one worker thread per core when available
+        (gzip otherwise) and runs off the event loop.
+
+        Returns:
+            SHA-256 of the written file
+        """
+        with open(filepath, "wb") as f:
+            sink = _HashingWriter(f)
+            if not compress:
+                writer: Any = sink
+            elif ZSTD_AVAILABLE:
+                compressor = zstandard.ZstdCompressor(level=self._compression_level, threads=-1)
+                writer = compressor.stream_writer(sink, closefd=False)
+            else:
+                writer = gzip.GzipFile(fileobj=sink, mode="wb", compresslevel=6)
+
+            async for data in stream:
+                await asyncio.to_thread(writer.write, data)
+            if writer is not sink:
+                await asyncio.to_thread(writer.close)
+
+        return sink.hexdigest()
+
     async def create_database_backup(
         self,
         description: str = "",
@@ -287,7 +416,8 @@ class BackupService:
         """
         Create a PostgreSQL database backup.
 
-        Uses pg_dump to create a SQL dump, then compresses with gzip.
+        Streams pg_dump output through zstd (gzip when zstandard is not
+        installed), computing the checksum while writing.
 
         Args:
             description: Optional description for the backup
@@ -303,7 +433,8 @@ class BackupService:
         db_config = get_database_config()
 
         # Determine filename
-        extension = ".sql.gz" if compress else ".sql"
+        compression = ("zstd" if ZSTD_AVAILABLE else "gzip") if compress else None
+        extension = {"zstd": ".sql.zst", "gzip": ".sql.gz", None: ".sql"}[compression]
         filename = f"resync_db_{timestamp}{extension}"
         filepath = self._db_backup_dir / filename
 
@@ -313,77 +444,27 @@ class BackupService:
             status=BackupStatus.IN_PROGRESS,
             filename=filename,
             filepath=str(filepath),
-            metadata={"description": description, "database": db_config.name},
+            metadata={
+                "description": description,
+                "database": db_config.name,
+                "compression": compression,
+            },
         )
         self._backups[backup_id] = backup
 
         start_time = datetime.utcnow()
 
         try:
-            # Build pg_dump command
-            env = os.environ.copy()
-            env["PGPASSWORD"] = db_config.password
-
-            pg_dump_cmd = [
-                "pg_dump",
-                "-h",
-                db_config.host,
-                "-p",
-                str(db_config.port),
-                "-U",
-                db_config.user,
-                "-d",
-                db_config.name,
-                "--format=plain",
-                "--no-owner",
-                "--no-privileges",
-            ]
-
             logger.info("database_backup_started", backup_id=backup_id, database=db_config.name)
 
-            if compress:
-                # Pipe to gzip
-                with open(filepath, "wb") as f:
-                    pg_dump = await asyncio.create_subprocess_exec(
-                        *pg_dump_cmd,
-                        stdout=subprocess.PIPE,
-                        stderr=subprocess.PIPE,
-                        env=env,
-                    )
-                    gzip_proc = await asyncio.create_subprocess_exec(
-                        "gzip",
-                        "-9",
-                        stdin=pg_dump.stdout,
-                        stdout=f,
-                        stderr=subprocess.PIPE,
-                    )
-
-                    _, pg_stderr = await pg_dump.communicate()
-                    _, gzip_stderr = await gzip_proc.communicate()
-
-                    if pg_dump.returncode != 0:
-                        raise RuntimeError(f"pg_dump failed: {pg_stderr.decode()}")
-                    if gzip_proc.returncode != 0:
-                        raise RuntimeError(f"gzip failed: {gzip_stderr.decode()}")
-            else:
-                # Direct output
-                with open(filepath, "w") as f:
-                    pg_dump = await asyncio.create_subprocess_exec(
-                        *pg_dump_cmd,
-                        stdout=f,
-                        stderr=subprocess.PIPE,
-                        env=env,
-                    )
-                    _, stderr = await pg_dump.communicate()
-
-                    if pg_dump.returncode != 0:
-                        raise RuntimeError(f"pg_dump failed: {stderr.decode()}")
+            backup.checksum_sha256 = await self._write_stream(
+                self._stream_pg_dump(db_config), filepath, compress
+            )
 
             # Get file info
             stat = os.stat(filepath)
             backup.size_bytes = stat.st_size
             backup.size_human = _human_size(stat.st_size)
-            backup.checksum_sha256 = _calculate_sha256(str(filepath))
             backup.status = BackupStatus.COMPLETED
             backup.completed_at = datetime.utcnow()
             backup.duration_seconds = (backup.completed_at - start_time).total_seconds()
@@ -409,6 +490,49 @@ class BackupService:
         self._save_metadata()
         return backup
 
+    def _iter_config_files(self, include_env: bool) -> Iterator[tuple[str, Path]]:
+        """Yield (archive name, path) of every configuration file to back up."""
+        project_root = self._project_root
+
+        for config_path in self._config_paths:
+            full_path = project_root / config_path
+
+            # Skip .env files if not included
+            if not include_env and config_path.startswith(".env"):
+                continue
+
+            if full_path.is_file():
+                yield config_path, full_path
+
+            elif full_path.is_dir():
+                for file_path in sorted(full_path.rglob("*")):
+                    if file_path.is_file() and "__pycache__" not in str(file_path):
+                        yield file_path.relative_to(project_root).as_posix(), file_path
+
+    def _write_config_zip(
+        self, filepath: Path, backup_id: str, include_env: bool, description: str
+    ) -> tuple[list[str], str]:
+        """Write the configuration ZIP; returns (files added, SHA-256 of the archive)."""
+        files_added = []
+
+        with open(filepath, "wb") as f:
+            sink = _HashingWriter(f)
+            with zipfile.ZipFile(sink, "w", zipfile.ZIP_DEFLATED) as zf:
+                for arcname, path in self._iter_config_files(include_env):
+                    zf.write(path, arcname)
+                    files_added.append(arcname)
+
+                # Add manifest
+                manifest = {
+                    "backup_id": backup_id,
+                    "created_at": datetime.utcnow().isoformat(),
+                    "files": files_added,
+                    "description": description,
+                }
+                zf.writestr("MANIFEST.json", json.dumps(manifest, indent=2))
+
+        return files_added, sink.hexdigest()
+
     async def create_config_backup(
         self,
         description: str = "",
@@ -449,45 +573,15 @@ class BackupService:
         start_time = datetime.utcnow()
 
         try:
-            # Get project root
-            project_root = Path(__file__).parent.parent.parent.parent
-
-            files_added = []
-
-            with zipfile.ZipFile(filepath, "w", zipfile.ZIP_DEFLATED) as zf:
-                for config_path in self._config_paths:
-                    full_path = project_root / config_path
-
-                    # Skip .env files if not included
-                    if not include_env and config_path.startswith(".env"):
-                        continue
-
-                    if full_path.is_file():
-                        arcname = config_path
-                        zf.write(full_path, arcname)
-                        files_added.append(arcname)
-
-                    elif full_path.is_dir() and full_path.exists():
-                        for file_path in full_path.rglob("*"):
-                            if file_path.is_file() and "__pycache__" not in str(file_path):
-                                arcname = str(file_path.relative_to(project_root))
-                                zf.write(file_path, arcname)
-                                files_added.append(arcname)
-
-                # Add manifest
-                manifest = {
-                    "backup_id": backup_id,
-                    "created_at": datetime.utcnow().isoformat(),
-                    "files": files_added,
-                    "description": description,
-                }
-                zf.writestr("MANIFEST.json", json.dumps(manifest, indent=2))
+            # Zipping is blocking file I/O: keep it off the event loop
+            files_added, backup.checksum_sha256 = await asyncio.to_thread(
+                self._write_config_zip, filepath, backup_id, include_env, description
+            )
 
             # Get file info
             stat = os.stat(filepath)
             backup.size_bytes = stat.st_size
             backup.size_human = _human_size(stat.st_size)
-            backup.checksum_sha256 = _calculate_sha256(str(filepath))
             backup.status = BackupStatus.COMPLETED
             backup.completed_at = datetime.utcnow()
             backup.duration_seconds = (backup.completed_at - start_time).total_seconds()
@@ -517,74 +611,63 @@ class BackupService:
         """
         Create a full backup (database + config).
 
-        Creates both backups and packages them together.
+        Stored as a snapshot of the deduplicating repository: the database
+        dump and configuration files are split into content-defined chunks
+        and only chunks not already stored by earlier backups are written,
+        so repeated full backups cost roughly the size of what changed.
         """
         backup_id = _generate_backup_id()
-        timestamp = datetime.utcnow().strftime("%Y%m%d_%H%M%S")
-
-        filename = f"resync_full_{timestamp}.zip"
-        filepath = self._backup_dir / filename
+        filepath = self._repository.snapshot_path(backup_id)
 
         backup = BackupInfo(
             id=backup_id,
             type=BackupType.FULL,
             status=BackupStatus.IN_PROGRESS,
-            filename=filename,
+            filename=filepath.name,
             filepath=str(filepath),
-            metadata={"description": description},
+            metadata={"description": description, "storage": "dedup"},
         )
         self._backups[backup_id] = backup
 
         start_time = datetime.utcnow()
 
         try:
-            # Create individual backups
-            db_backup = await self.create_database_backup(
-                description=f"Part of full backup {backup_id}"
-            )
-            config_backup = await self.create_config_backup(
-                description=f"Part of full backup {backup_id}"
-            )
-
-            # Package together
-            with zipfile.ZipFile(filepath, "w", zipfile.ZIP_DEFLATED) as zf:
-                if db_backup.status == BackupStatus.COMPLETED:
-                    zf.write(db_backup.filepath, f"database/{db_backup.filename}")
-
-                if config_backup.status == BackupStatus.COMPLETED:
-                    zf.write(config_backup.filepath, f"config/{config_backup.filename}")
-
-                # Add manifest
-                manifest = {
-                    "backup_id": backup_id,
-                    "type": "full",
-                    "created_at": datetime.utcnow().isoformat(),
-                    "components": {
-                        "database": db_backup.to_dict()
-                        if db_backup.status == BackupStatus.COMPLETED
-                        else None,
-                        "config": config_backup.to_dict()
-                        if config_backup.status == BackupStatus.COMPLETED
-                        else None,
-                    },
-                }
-                zf.writestr("MANIFEST.json", json.dumps(manifest, indent=2))
+            db_config = get_database_config()
+            backup.metadata["database"] = db_config.name
+
+            async with self._repository.create_snapshot(
+                backup_id, metadata={"description": description, "database": db_config.name}
+            ) as snapshot:
+                database = await snapshot.add_stream(
+                    "database/resync_db.sql", self._stream_pg_dump(db_config)
+                )
+                config_files = await asyncio.to_thread(
+                    lambda: list(self._iter_config_files(include_env=True))
+                )
+                for arcname, path in config_files:
+                    await snapshot.add_file(f"config/{arcname}", path)
 
-            # Get file info
-            stat = os.stat(filepath)
-            backup.size_bytes = stat.st_size
-            backup.size_human = _human_size(stat.st_size)
-            backup.checksum_sha256 = _calculate_sha256(str(filepath))
+            manifest = snapshot.snapshot
+            backup.size_bytes = manifest.new_bytes
+            backup.size_human = _human_size(manifest.new_bytes)
+            backup.checksum_sha256 = await asyncio.to_thread(_calculate_sha256, str(filepath))
             backup.status = BackupStatus.COMPLETED
             backup.completed_at = datetime.utcnow()
             backup.duration_seconds = (backup.completed_at - start_time).total_seconds()
-            backup.metadata["db_backup_id"] = db_backup.id
-            backup.metadata["config_backup_id"] = config_backup.id
+            backup.metadata.update(
+                {
+                    "logical_size_bytes": manifest.logical_size,
+                    "new_chunks": manifest.new_chunks,
+                    "files_count": len(config_files),
+                    "database_sha256": database.sha256,
+                }
+            )
 
             logger.info(
                 "full_backup_completed",
                 backup_id=backup_id,
                 size=backup.size_human,
+                logical_size=_human_size(manifest.logical_size),
             )
 
         except Exception as e:
@@ -597,6 +680,81 @@ class BackupService:
         self._save_metadata()
         return backup
 
+    async def verify_backup(self, backup_id: str) -> dict[str, Any]:
+        """
+        Verify a backup end to end.
+
+        Full backups are restored chunk by chunk (without writing files) and
+        every chunk and file checksum is checked; single-file backups are
+        re-hashed and compared to the recorded checksum.
+
+        Returns:
+            Verification result with a ``verified`` flag
+        """
+        backup = self._backups.get(backup_id)
+        if not backup:
+            raise KeyError(backup_id)
+
+        try:
+            if backup.metadata.get("storage") == "dedup":
+                result = await self._repository.verify(backup_id)
+            else:
+                checksum = await asyncio.to_thread(_calculate_sha256, backup.filepath)
+                if checksum != backup.checksum_sha256:
+                    raise RuntimeError("checksum mismatch")
+                result = {"verified": True, "bytes": os.stat(backup.filepath).st_size}
+        except Exception as e:
+            logger.error("backup_verification_failed", backup_id=backup_id, error=str(e))
+            return {"backup_id": backup_id, "verified": False, "error": str(e)}
+
+        logger.info("backup_verified", backup_id=backup_id)
+        return {**result, "backup_id": backup_id}
+
+    def _get_snapshot_backup(self, backup_id: str) -> BackupInfo:
+        backup = self._backups.get(backup_id)
+        if not backup:
+            raise KeyError(backup_id)
+        if backup.metadata.get("storage") != "dedup":
+            raise ValueError(f"Backup {backup_id} is a single file; download it instead")
+        if backup.status != BackupStatus.COMPLETED:
+            raise ValueError(f"Backup {backup_id} is {backup.status.value}")
+        return backup
+
+    async def restore_backup(
+        self, backup_id: str, target_dir: str | Path | None = None
+    ) -> dict[str, Any]:
+        """
+        Restore the files of a full backup into ``target_dir``.
+
+        Every chunk and file is verified before it is moved into place; the
+        database dump is restored as ``database/resync_db.sql``. Without
+        ``target_dir`` the files go to ``<backup dir>/restores/<backup id>``.
+
+        Raises:
+            KeyError: if the backup does not exist
+            ValueError: if the backup is not a completed deduplicated full backup
+            RepositoryIntegrityError: if the backup is damaged
+        """
+        self._get_snapshot_backup(backup_id)
+        target = Path(target_dir) if target_dir else self._backup_dir / "restores" / backup_id
+
+        result = await self._repository.restore(backup_id, target)
+        return {**result, "target_dir": str(target)}
+
+    def export_backup(self, backup_id: str) -> AsyncIterator[bytes]:
+        """
+        Stream a full backup as a tar archive rebuilt from its chunks.
+
+        The backup is checked before streaming starts; damaged chunks abort
+        the stream with RepositoryIntegrityError.
+
+        Raises:
+            KeyError: if the backup does not exist
+            ValueError: if the backup is not a completed deduplicated full backup
+        """
+        self._get_snapshot_backup(backup_id)
+        return self._repository.export_archive(backup_id)
+
     async def list_backups(
         self,
         backup_type: BackupType | None = None,
@@ -680,8 +838,10 @@ class BackupService:
         if not backup:
             return False
 
-        # Delete file
-        if backup.filepath:
+        # Delete file (snapshots also release chunks no other backup uses)
+        if backup.metadata.get("storage") == "dedup":
+            await self._repository.delete_snapshot(backup_id)
+        elif backup.filepath:
             path = Path(backup.filepath)
             if path.exists():
                 path.unlink()
@@ -924,6 +1084,7 @@ class BackupService:
             "by_type": by_type,
             "active_schedules": sum(1 for s in self._schedules.values() if s.enabled),
             "backup_directory": str(self._backup_dir),
+            "repository": self._repository.get_statistics(),
         }
 
 
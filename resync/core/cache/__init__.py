@@ -55,10 +55,13 @@ from .mixins import (
 
 # Query cache for database results
 from .query_cache import (
+    ChangeLogPoller,
+    PostgresChangeListener,
     QueryCacheManager,
     QueryFingerprint,
     QueryResult,
     get_query_cache_manager,
+    get_repository_query_cache,
 )
 from .semantic_cache import SemanticCache
 
@@ -75,6 +78,9 @@ __all__ = [
     "QueryFingerprint",
     "QueryResult",
     "get_query_cache_manager",
+    "get_repository_query_cache",
+    "ChangeLogPoller",
+    "PostgresChangeListener",
     # Hierarchy
     "CacheHierarchy",
     "get_cache_hierarchy",
@@ -8,22 +8,35 @@ This module provides an intelligent caching system with:
 - Cache warming and predictive loading
 - Performance metrics and monitoring
 - Cascade invalidation for related data
+
+With Redis enabled, tags, ":" key prefixes and dependencies are also indexed
+in Redis (RedisTagIndex), so every worker sees the same dependency graph and
+tag/prefix invalidation never scans the keyspace. Invalidated keys are
+broadcast so other workers drop their memory copies.
 """
 
 import asyncio
 import contextlib
 import json
+import re
 import time
+import uuid
 from collections import defaultdict
-from collections.abc import Callable
+from collections.abc import Callable, Collection
 from dataclasses import dataclass, field
 from typing import Any
 
+from resync.core.cache_invalidation import TAG_INDEX_PREFIX, RedisTagIndex
 from resync.core.redis_init import get_redis_initializer
 from resync.core.structured_logger import get_logger
 
 logger = get_logger(__name__)
 
+INVALIDATION_CHANNEL = "cache:invalidate"
+
+# Regex metacharacters that end the literal prefix of a pattern
+_REGEX_META = frozenset(".^$*+?{}[]\\|()")
+
 
 @dataclass
 class CacheEntry:
@@ -215,10 +228,13 @@ class AdvancedCacheManager:
         # Redis integration
         self.redis_client = None
         self.redis_enabled = False
+        self.tag_index: RedisTagIndex | None = None
+        self._instance_id = uuid.uuid4().hex
 
         # Background tasks
         self._cleanup_task: asyncio.Task | None = None
         self._warming_task: asyncio.Task | None = None
+        self._listener_task: asyncio.Task | None = None
         self._running = False
 
         # Configuration
@@ -244,8 +260,7 @@ class AdvancedCacheManager:
         # Initialize Redis client
         try:
             redis_init = await get_redis_initializer()
-            self.redis_client = await redis_init.initialize()
-            self.redis_enabled = True
+            self.enable_redis(await redis_init.initialize())
             logger.info("Redis integration enabled for advanced caching")
         except Exception as e:
             logger.warning(f"Redis not available for caching: {e}")
@@ -256,6 +271,8 @@ class AdvancedCacheManager:
         # Start background tasks
         self._cleanup_task = asyncio.create_task(self._cleanup_loop())
         self._warming_task = asyncio.create_task(self._warming_loop())
+        if self.redis_enabled:
+            self._listener_task = asyncio.create_task(self._listen_invalidations())
 
         logger.info("Advanced cache manager initialized")
 
@@ -276,6 +293,11 @@ class AdvancedCacheManager:
             with contextlib.suppress(asyncio.CancelledError):
                 await self._warming_task
 
+        if self._listener_task:
+            self._listener_task.cancel()
+            with contextlib.suppress(asyncio.CancelledError):
+                await self._listener_task
+
         # Clear caches
         async with self._lock:
             self.memory_cache.clear()
@@ -285,6 +307,12 @@ class AdvancedCacheManager:
 
         logger.info("Advanced cache manager shutdown")
 
+    def enable_redis(self, redis_client: Any) -> None:
+        """Use a Redis client (decoding responses to str) as the shared layer."""
+        self.redis_client = redis_client
+        self.tag_index = RedisTagIndex(redis_client)
+        self.redis_enabled = True
+
     async def get(
         self,
         key: str,
@@ -319,7 +347,16 @@ class AdvancedCacheManager:
             value = await self._get_from_redis(key)
             if value is not None:
                 # Promote to memory cache
-                await self._set_memory(key, value, ttl or 300, dependencies, tags)
+                await self._set_memory_entry(
+                    CacheEntry(
+                        key=key,
+                        value=value,
+                        ttl=ttl or 300,
+                        dependencies=set(dependencies or []),
+                        tags=set(tags or []),
+                        size_bytes=self._calculate_size(value),
+                    )
+                )
                 self._record_hit("redis", time.time() - start_time)
                 return value
 
@@ -369,7 +406,7 @@ class AdvancedCacheManager:
 
         # Set in Redis if enabled
         if self.redis_enabled:
-            await self._set_redis(key, value, ttl)
+            await self._set_redis(key, value, ttl, dependencies, tags)
 
         # Update dependency graph
         if dependencies:
@@ -390,66 +427,138 @@ class AdvancedCacheManager:
         """
         Invalidate cache entry with optional cascade invalidation.
 
+        Dependents are resolved from the local graph and, with Redis enabled,
+        from the shared dependency index, so entries cached by other workers
+        are cascaded too.
+
         Returns:
             Number of entries invalidated
         """
-        invalidated = 0
-
-        async with self._lock:
-            # Direct invalidation
-            if key in self.memory_cache:
-                del self.memory_cache[key]
-                invalidated += 1
-
+        keys = {key}
+        if cascade:
+            keys |= self.dependency_graph.cascade_invalidate(key)
             if self.redis_enabled:
-                await self.redis_client.delete(key)
+                try:
+                    keys |= await self.tag_index.dependents([key])
+                except Exception as e:
+                    logger.warning(f"Redis dependency lookup failed for key {key}: {e}")
 
-            # Cascade invalidation
-            if cascade:
-                cascade_keys = self.dependency_graph.cascade_invalidate(key)
-                for cascade_key in cascade_keys:
-                    if cascade_key in self.memory_cache:
-                        del self.memory_cache[cascade_key]
-                        invalidated += 1
-
-                    if self.redis_enabled:
-                        await self.redis_client.delete(cascade_key)
-
-                # Clean up dependency graph
-                self.dependency_graph.remove_key(key)
-                for cascade_key in cascade_keys:
-                    self.dependency_graph.remove_key(cascade_key)
-
-        self.stats.invalidation_count += invalidated
+        invalidated = await self._invalidate_keys(keys)
         logger.info(f"Invalidated {invalidated} cache entries for key {key}")
         return invalidated
 
     async def invalidate_by_tag(self, tag: str) -> int:
-        """Invalidate all entries with a specific tag."""
-        keys_to_invalidate = self.dependency_graph.get_keys_by_tag(tag)
-        invalidated = 0
-
-        for key in keys_to_invalidate:
-            invalidated += await self.invalidate(key, cascade=False)
+        """Invalidate all entries with a specific tag, in every worker."""
+        keys = set(self.dependency_graph.get_keys_by_tag(tag))
+        drop_sets = []
+        if self.redis_enabled:
+            try:
+                keys |= await self.tag_index.keys_for_tags([tag])
+                drop_sets = [TAG_INDEX_PREFIX + tag]
+            except Exception as e:
+                logger.warning(f"Redis tag lookup failed for tag {tag}: {e}")
 
+        invalidated = await self._invalidate_keys(keys, drop_sets)
         logger.info(f"Invalidated {invalidated} entries with tag {tag}")
         return invalidated
 
+    async def invalidate_by_prefix(self, prefix: str) -> int:
+        """
+        Invalidate all entries whose key starts with a ":"-terminated prefix.
+
+        Served from the Redis prefix index (e.g. "tws:jobs:"), so the cost is
+        the number of matching keys, not the size of the keyspace.
+        """
+        keys = {key for key in self.memory_cache if key.startswith(prefix)}
+        if self.redis_enabled:
+            try:
+                keys |= await self.tag_index.keys_for_prefix(prefix)
+            except Exception as e:
+                logger.warning(f"Redis prefix lookup failed for prefix {prefix}: {e}")
+
+        invalidated = await self._invalidate_keys(keys)
+        logger.info(f"Invalidated {invalidated} entries with prefix {prefix}")
+        return invalidated
+
     async def invalidate_by_pattern(self, pattern: str) -> int:
-        """Invalidate entries matching a pattern."""
-        import re
+        """
+        Invalidate entries matching a regex pattern.
 
+        Redis entries are only considered when the pattern starts with a
+        literal ":"-terminated prefix (e.g. "^tws:jobs:.*_ABEND$"); their
+        candidates come from the prefix index.
+        """
         regex = re.compile(pattern)
 
-        keys_to_invalidate = [key for key in self.memory_cache if regex.match(key)]
-
-        invalidated = 0
-        for key in keys_to_invalidate:
-            invalidated += await self.invalidate(key, cascade=False)
+        keys = {key for key in self.memory_cache if regex.match(key)}
+        prefix = _literal_prefix(pattern)
+        if self.redis_enabled and prefix:
+            try:
+                candidates = await self.tag_index.keys_for_prefix(prefix)
+                keys |= {key for key in candidates if regex.match(key)}
+            except Exception as e:
+                logger.warning(f"Redis prefix lookup failed for pattern {pattern}: {e}")
 
+        invalidated = await self._invalidate_keys(keys)
         logger.info(f"Invalidated {invalidated} entries matching pattern {pattern}")
         return invalidated
 
+    async def _invalidate_keys(
+        self, keys: Collection[str], drop_sets: list[str] | None = None
+    ) -> int:
+        """Drop keys from memory, Redis and the index, and tell the other workers."""
+        async with self._lock:
+            invalidated = set(self._evict_memory(keys))
+
+        if self.redis_enabled and (keys or drop_sets):
+            try:
+                invalidated |= await self.tag_index.unlink(keys, drop_sets or ())
+                if keys:
+                    await self.redis_client.publish(
+                        INVALIDATION_CHANNEL,
+                        json.dumps({"origin": self._instance_id, "keys": sorted(keys)}),
+                    )
+            except Exception as e:
+                logger.warning(f"Redis invalidation failed for {len(keys)} keys: {e}")
+
+        self.stats.invalidation_count += len(invalidated)
+        return len(invalidated)
+
+    def _evict_memory(self, keys: Collection[str]) -> list[str]:
+        """Drop keys from the memory layer and the local graph. Caller holds the lock."""
+        evicted = []
+        for key in keys:
+            if self.memory_cache.pop(key, None) is not None:
+                evicted.append(key)
+            self.dependency_graph.remove_key(key)
+        return evicted
+
+    async def _listen_invalidations(self) -> None:
+        """Drop memory copies of keys invalidated by other workers."""
+        while self._running:
+            pubsub = None
+            try:
+                pubsub = self.redis_client.pubsub()
+                await pubsub.subscribe(INVALIDATION_CHANNEL)
+                while self._running:
+                    message = await pubsub.get_message(ignore_subscribe_messages=True, timeout=1.0)
+                    if message is None or message.get("type") != "message":
+                        continue
+                    payload = json.loads(message["data"])
+                    if payload.get("origin") == self._instance_id:
+                        continue
+                    async with self._lock:
+                        self._evict_memory(payload.get("keys", ()))
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                logger.warning(f"Cache invalidation listener error: {e}")
+                await asyncio.sleep(1.0)
+            finally:
+                if pubsub is not None:
+                    with contextlib.suppress(Exception):
+                        await pubsub.aclose()
+
     async def warm_cache(self, warming_keys: list[dict[str, Any]]) -> int:
         """
         Warm cache with predefined keys.
@@ -519,6 +628,7 @@ class AdvancedCacheManager:
             "layers": {
                 "memory_enabled": True,
                 "redis_enabled": self.redis_enabled,
+                "redis_tag_index": self.tag_index is not None,
                 "database_enabled": True,
             },
         }
@@ -568,14 +678,24 @@ class AdvancedCacheManager:
 
         return None
 
-    async def _set_redis(self, key: str, value: Any, ttl: int) -> None:
-        """Set value in Redis cache."""
+    async def _set_redis(
+        self,
+        key: str,
+        value: Any,
+        ttl: int,
+        dependencies: list[str] | None = None,
+        tags: list[str] | None = None,
+    ) -> None:
+        """Set value in Redis cache together with its index entries (one MULTI)."""
         if not self.redis_enabled or not self.redis_client:
             return
 
         try:
             value_json = json.dumps(value)
-            await self.redis_client.set(key, value_json, ex=ttl)
+            pipe = self.redis_client.pipeline(transaction=True)
+            pipe.set(key, value_json, ex=ttl)
+            self.tag_index.record(pipe, key, ttl, tags or (), dependencies or ())
+            await pipe.execute()
         except Exception as e:
             logger.warning(f"Redis set error for key {key}: {e}")
 
@@ -707,6 +827,17 @@ class AdvancedCacheManager:
                 logger.error(f"Cache warming error: {e}")
 
 
+def _literal_prefix(pattern: str) -> str:
+    """Literal ":"-terminated prefix of a regex ("^tws:jobs:J.*" -> "tws:jobs:")."""
+    literal = []
+    for char in pattern.removeprefix("^"):
+        if char in _REGEX_META:
+            break
+        literal.append(char)
+    prefix = "".join(literal)
+    return prefix[: prefix.rfind(":") + 1]
+
+
 # Global cache manager instance
 advanced_cache_manager = AdvancedCacheManager()
 
@@ -1,12 +1,11 @@
-import asyncio
 import logging
 from dataclasses import dataclass
 from time import time as time_func
 from typing import Any
 
-from cachetools import LRUCache
-
+from resync.core.cache_codec import CacheCodecError, CacheKeyring, CacheValueCodec
 from resync.core.metrics_compat import Counter, Histogram
+from resync.core.utils.data_structures import WTinyLFUCache
 from resync.settings import settings
 
 from .async_cache import AsyncTTLCache
@@ -31,6 +30,7 @@ class CacheMetrics:
     total_gets: int = 0
     total_sets: int = 0
     l1_evictions: int = 0
+    l2_decode_failures: int = 0
     l1_get_latency: float = 0.0
     l2_get_latency: float = 0.0
     miss_latency: float = 0.0
@@ -57,80 +57,60 @@ class CacheMetrics:
 
 class L1Cache:
     """
-    In-memory L1 cache with LRU eviction using cachetools and sharded asyncio.Lock protection.
+    In-memory L1 cache with a W-TinyLFU admission/eviction policy.
+
+    Reads take no lock: the event loop is single-threaded and no operation
+    awaits halfway through, so every get/set/delete is atomic with respect
+    to other coroutines.
     """
 
     def __init__(self, max_size: int = 1000, num_shards: int = 16):
         """
         Initialize L1 cache.
-        """
-        if max_size > 0 and num_shards > max_size:
-            num_shards = 1  # Use a single shard for small caches to make eviction predictable
-        if num_shards <= 0:
-            raise ValueError("num_shards must be a positive integer")
 
+        Args:
+            max_size: Maximum number of entries
+            num_shards: Accepted for backward compatibility; the policy
+                needs a single structure to compare frequencies globally
+        """
         self.max_size = max_size
-        self.num_shards = num_shards
-        # Use cachetools LRUCache for better performance and built-in LRU functionality
-        self.shards: list[LRUCache] = [
-            LRUCache(maxsize=max_size // num_shards if num_shards > 0 else max_size)
-            for _ in range(num_shards)
-        ]
-        self.shard_locks = [asyncio.Lock() for _ in range(num_shards)]
-
-    def _get_shard(self, key: str) -> tuple[LRUCache, asyncio.Lock]:
-        """Get the shard and lock for a given key."""
-        shard_index = hash(key) % self.num_shards
-        return self.shards[shard_index], self.shard_locks[shard_index]
+        self.num_shards = 1
+        self.cache: WTinyLFUCache[str, Any] = WTinyLFUCache(max(max_size, 1))
+
+    def get_nowait(self, key: str) -> Any | None:
+        """Get value from L1 cache without going through a coroutine."""
+        return self.cache.get(key)
 
     async def get(self, key: str) -> Any | None:
         """
         Get value from L1 cache.
         """
-        shard, lock = self._get_shard(key)
-        async with lock:
-            try:
-                value = shard[key]
-                logger.debug("L1 cache HIT for key: %s", key)
-                return value
-            except KeyError:
-                logger.debug("L1 cache MISS for key: %s", key)
-                return None
+        return self.cache.get(key)
 
     async def set(self, key: str, value: Any) -> None:
         """
-        Set value in L1 cache with LRU eviction if needed.
+        Set value in L1 cache; the policy decides what to evict.
         """
-        shard, lock = self._get_shard(key)
-        async with lock:
-            # cachetools.LRUCache automatically handles eviction when maxsize is reached
-            shard[key] = value
+        self.cache.put(key, value)
 
     async def delete(self, key: str) -> bool:
         """
         Delete key from L1 cache.
         """
-        shard, lock = self._get_shard(key)
-        async with lock:
-            try:
-                del shard[key]
-                logger.debug("L1 cache DELETE for key: %s", key)
-                return True
-            except KeyError:
-                return False
+        return self.cache.remove(key)
 
     async def clear(self) -> None:
         """Clear all entries from L1 cache."""
-        for i in range(self.num_shards):
-            shard = self.shards[i]
-            lock = self.shard_locks[i]
-            async with lock:
-                shard.clear()
+        self.cache.clear()
         logger.debug("L1 cache CLEARED")
 
     def size(self) -> int:
         """Get current size of L1 cache."""
-        return sum(len(shard) for shard in self.shards)
+        return len(self.cache)
+
+    @property
+    def evictions(self) -> int:
+        return self.cache.evictions
 
 
 class CacheHierarchy:
@@ -145,6 +125,7 @@ class CacheHierarchy:
         l2_cleanup_interval: int = 30,
         enable_encryption: bool = False,
         key_prefix: str = "cache:",
+        codec: CacheValueCodec | None = None,
     ):
         """
         Initialize cache hierarchy.
@@ -153,10 +134,23 @@ class CacheHierarchy:
             l1_max_size: Maximum size for L1 cache
             l2_ttl_seconds: TTL for L2 cache entries
             l2_cleanup_interval: Cleanup interval for L2 cache
-            enable_encryption: Whether to enable cache encryption
+            enable_encryption: Whether to encrypt L2 entries (keys from
+                CACHE_ENCRYPTION_KEYS, see resync.core.cache_codec)
             key_prefix: Prefix for cache keys
+            codec: Codec for L2 entries (overrides the one built from
+                enable_encryption)
+
+        L1 holds live objects; only L2 holds serialized (and sealed) values.
         """
         self.enable_encryption = enable_encryption
+        if codec is None and enable_encryption:
+            codec = CacheValueCodec(
+                CacheKeyring.from_env(),
+                cipher=getattr(settings.CACHE_HIERARCHY, "CACHE_ENCRYPTION_CIPHER", "aes-gcm"),
+            )
+        self.codec = codec
+        if self.enable_encryption and not (codec and codec.encrypted):
+            raise CacheCodecError("enable_encryption requires a codec with a keyring")
         self.key_prefix = key_prefix
 
         self.l1_cache = L1Cache(max_size=l1_max_size)
@@ -179,42 +173,18 @@ class CacheHierarchy:
             return f"{self.key_prefix}{key}"
         return key
 
-    def _encrypt_value(self, value: Any) -> Any:
-        """Encrypt value if encryption is enabled."""
-        if self.enable_encryption:
-            try:
-                import base64
-                import json
-
-                # Simple encryption using base64 encoding
-                # For production, use cryptography.fernet or similar
-                value_str = json.dumps(value, default=str)
-                encoded = base64.b64encode(value_str.encode()).decode()
-                return {"__encrypted__": True, "data": encoded}
-            except Exception as e:
-                logger.warning(
-                    "encryption_failed",
-                    error=str(e),
-                    value_type=type(value).__name__,
-                )
-        return value
-
-    def _decrypt_value(self, value: Any) -> Any:
-        """Decrypt value if encryption is enabled."""
-        if self.enable_encryption and isinstance(value, dict) and value.get("__encrypted__"):
-            try:
-                import base64
-                import json
-
-                encoded = value.get("data", "")
-                decoded = base64.b64decode(encoded.encode()).decode()
-                return json.loads(decoded)
-            except Exception as e:
-                logger.warning(
-                    "decryption_failed",
-                    error=str(e),
-                )
-        return value
+    def _encode_for_l2(self, key: str, value: Any) -> Any:
+        """Serialize (and seal) a value for L2; the cache key is bound as AAD."""
+        if self.codec is None:
+            return value
+        return self.codec.encode(value, key.encode())
+
+    def _decode_from_l2(self, key: str, stored: Any) -> Any:
+        """Decode an L2 entry; raises CacheCodecError if it cannot be trusted."""
+        if self.codec is None:
+            return stored
+        # Entries from the old base64 scheme are not bytes and are rejected here
+        return self.codec.decode(stored, key.encode())
 
     async def start(self) -> None:
         """Start the cache hierarchy."""
@@ -232,27 +202,35 @@ class CacheHierarchy:
     async def get(self, key: str) -> Any | None:
         """
         Get value from cache hierarchy with priority L1 → L2.
-        Applies key prefix and decryption as needed.
+        Applies key prefix; L2 entries are decoded (and verified) on the way up.
         """
         prefixed_key = self._apply_key_prefix(key)
         start_time = time_func()
         self.metrics.total_gets += 1
 
-        l1_value = await self.l1_cache.get(prefixed_key)
+        l1_value = self.l1_cache.get_nowait(prefixed_key)
         if l1_value is not None:
             self.metrics.l1_hits += 1
             cache_hits.labels(cache_level="l1").inc()
             cache_latency.labels(cache_level="l1").observe(time_func() - start_time)
-            return self._decrypt_value(l1_value)
+            return l1_value
 
         self.metrics.l1_misses += 1
         l2_value = await self.l2_cache.get(prefixed_key)
         if l2_value is not None:
-            self.metrics.l2_hits += 1
-            cache_hits.labels(cache_level="l2").inc()
-            await self.l1_cache.set(prefixed_key, l2_value)
-            cache_latency.labels(cache_level="l2").observe(time_func() - start_time)
-            return self._decrypt_value(l2_value)
+            try:
+                value = self._decode_from_l2(prefixed_key, l2_value)
+            except CacheCodecError as e:
+                # Tampered, foreign-key or undecodable entry: treat as a miss
+                logger.warning(f"Discarding undecodable L2 entry {prefixed_key}: {e}")
+                await self.l2_cache.delete(prefixed_key)
+                self.metrics.l2_decode_failures += 1
+            else:
+                self.metrics.l2_hits += 1
+                cache_hits.labels(cache_level="l2").inc()
+                await self.l1_cache.set(prefixed_key, value)
+                cache_latency.labels(cache_level="l2").observe(time_func() - start_time)
+                return value
 
         self.metrics.l2_misses += 1
         cache_misses.labels(cache_level="l2").inc()
@@ -261,14 +239,14 @@ class CacheHierarchy:
     async def set(self, key: str, value: Any, ttl_seconds: int | None = None) -> None:
         """
         Set value in cache hierarchy with write-through pattern.
-        Applies key prefix and encryption as needed.
+        Applies key prefix; L1 keeps the object, L2 the encoded value.
         """
         prefixed_key = self._apply_key_prefix(key)
-        encrypted_value = self._encrypt_value(value)
+        encoded_value = self._encode_for_l2(prefixed_key, value)
 
         self.metrics.total_sets += 1
-        await self.l2_cache.set(prefixed_key, encrypted_value, ttl_seconds)
-        await self.l1_cache.set(prefixed_key, encrypted_value)
+        await self.l2_cache.set(prefixed_key, encoded_value, ttl_seconds)
+        await self.l1_cache.set(prefixed_key, value)
         logger.debug("cache_hierarchy_set", key=prefixed_key)
 
     async def set_from_source(self, key: str, value: Any, ttl_seconds: int | None = None) -> None:
@@ -302,6 +280,7 @@ class CacheHierarchy:
     def get_metrics(self) -> dict[str, Any]:
         """Get comprehensive cache metrics."""
         l1_size, l2_size = self.size()
+        self.metrics.l1_evictions = self.l1_cache.evictions
         return {
             "l1_size": l1_size,
             "l2_size": l2_size,
@@ -311,6 +290,8 @@ class CacheHierarchy:
             "total_gets": self.metrics.total_gets,
             "total_sets": self.metrics.total_sets,
             "l1_evictions": self.metrics.l1_evictions,
+            "l2_decode_failures": self.metrics.l2_decode_failures,
+            "l2_encrypted": bool(self.codec and self.codec.encrypted),
         }
 
     async def __aenter__(self) -> "CacheHierarchy":
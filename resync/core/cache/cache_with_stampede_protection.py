@@ -1,4 +1,21 @@
+"""
+Loader cache with stampede protection.
+
+- Per-key single flight: concurrent misses for one key share one load task;
+  there is no cache-wide lock, so a slow loader only delays its own key
+- Stale-while-revalidate: for ``stale_ttl`` seconds after expiry the old
+  value is served while a background refresh runs; background refreshes
+  are bounded by ``max_concurrent_loads``
+- Probabilistic early expiration (XFetch) for the AGGRESSIVE level: hot keys
+  refresh shortly before they expire, weighted by how long they take to load
+- Negative caching: a failed load is remembered (and re-raised) for an
+  exponentially growing, jittered backoff instead of hammering the source
+"""
+
 import asyncio
+import inspect
+import math
+import random
 import time
 from collections.abc import Callable
 from dataclasses import dataclass
@@ -13,21 +30,35 @@ T = TypeVar("T")
 
 
 class CacheEntry:
-    """Represents a cache entry with metadata."""
-
-    def __init__(self, value: Any, expiry: float, is_loading: bool = False):
+    """Represents a cache entry with metadata (times are time.monotonic())."""
+
+    def __init__(
+        self,
+        value: Any,
+        expiry: float,
+        is_loading: bool = False,
+        stale_until: float | None = None,
+        delta: float = 0.0,
+        error: BaseException | None = None,
+        failures: int = 0,
+    ):
         self.value = value
         self.expiry = expiry
         self.is_loading = is_loading
+        self.stale_until = expiry if stale_until is None else stale_until
+        self.delta = delta  # how long the load took, for early refresh
+        self.error = error
+        self.failures = failures
+        self.refresh_after = 0.0  # backoff for refreshes after a failed revalidation
         self.created_at = time.time()
 
 
 class StampedeProtectionLevel(Enum):
     """Levels of stampede protection."""
 
-    NONE = "none"
-    BASIC = "basic"
-    AGGRESSIVE = "aggressive"
+    NONE = "none"  # every miss calls the loader
+    BASIC = "basic"  # single flight + stale-while-revalidate
+    AGGRESSIVE = "aggressive"  # BASIC + probabilistic early refresh
 
 
 @dataclass
@@ -36,8 +67,13 @@ class CacheConfig:
 
     default_ttl: int = 300  # 5 minutes
     stampede_protection_level: StampedeProtectionLevel = StampedeProtectionLevel.BASIC
-    max_concurrent_loads: int = 3
+    max_concurrent_loads: int = 3  # background refresh budget
     load_timeout: int = 30  # seconds
+    stale_ttl: int = 60  # serve stale (while revalidating) this long after expiry
+    early_refresh_beta: float = 1.0  # XFetch beta; > 1 refreshes earlier
+    negative_ttl: float = 5.0  # first backoff after a failed load
+    negative_ttl_max: float = 300.0
+    negative_ttl_jitter: float = 0.2  # +/- fraction of the backoff
 
 
 class CacheWithStampedeProtection(Generic[T]):
@@ -46,119 +82,176 @@ class CacheWithStampedeProtection(Generic[T]):
     def __init__(self, config: CacheConfig | None = None):
         self.config = config or CacheConfig()
         self._cache: dict[str, CacheEntry] = {}
-        self._loading: dict[str, asyncio.Event] = {}
-        self._lock = asyncio.Lock()
+        self._loading: dict[str, asyncio.Task] = {}
+        self._background_refreshes = 0
+
+        self.hits = 0
+        self.stale_hits = 0
+        self.misses = 0
+        self.negative_hits = 0
+        self.loads = 0
+        self.load_failures = 0
+        self.early_refreshes = 0
+        self.refreshes_skipped = 0
 
     async def get(self, key: str, loader: Callable[[], T], ttl: int | None = None) -> T:
         """Get value from cache or load it with stampede protection."""
-
-        current_time = time.time()
         ttl = ttl or self.config.default_ttl
-        expiry = current_time + ttl
-
-        # Check if we have a valid cached value
-        if key in self._cache:
-            entry = self._cache[key]
-            if current_time < entry.expiry and not entry.is_loading:
+        level = self.config.stampede_protection_level
+        now = time.monotonic()
+
+        entry = self._cache.get(key)
+        if entry is not None:
+            if entry.error is not None:
+                if now < entry.expiry:
+                    self.negative_hits += 1
+                    raise entry.error
+            elif now < entry.expiry:
+                self.hits += 1
+                if level is StampedeProtectionLevel.AGGRESSIVE and self._should_refresh_early(
+                    entry, now
+                ):
+                    self.early_refreshes += 1
+                    self._refresh_in_background(key, loader, ttl)
+                return entry.value
+            elif now < entry.stale_until and level is not StampedeProtectionLevel.NONE:
+                self.stale_hits += 1
+                if now >= entry.refresh_after:
+                    self._refresh_in_background(key, loader, ttl)
                 return entry.value
 
-        # Implement stampede protection
-        if self.config.stampede_protection_level != StampedeProtectionLevel.NONE:
-            return await self._get_with_stampede_protection(key, loader, expiry)
-        return await self._get_without_protection(key, loader, expiry)
+        self.misses += 1
+        if level is StampedeProtectionLevel.NONE:
+            return await self._load_value(key, loader, ttl)
+        return await self._get_with_stampede_protection(key, loader, ttl)
 
     async def _get_with_stampede_protection(
-        self, key: str, loader: Callable[[], T], expiry: float
+        self, key: str, loader: Callable[[], T], ttl: float
+    ) -> T:
+        """Join the in-flight load for this key, or start one."""
+        task = self._loading.get(key) or self._start_load(key, loader, ttl)
+        # shield: a cancelled caller must not cancel the load other callers share
+        return await asyncio.shield(task)
+
+    def _start_load(self, key: str, loader: Callable[[], T], ttl: float) -> asyncio.Task:
+        task = asyncio.create_task(self._load_value(key, loader, ttl, single_flight=True))
+        self._loading[key] = task
+        task.add_done_callback(lambda done: self._load_done(key, done))
+        return task
+
+    def _load_done(self, key: str, task: asyncio.Task) -> None:
+        if self._loading.get(key) is task:
+            del self._loading[key]
+        if not task.cancelled():
+            task.exception()  # retrieved here even if every caller went away
+
+    def _refresh_in_background(self, key: str, loader: Callable[[], T], ttl: float) -> None:
+        """Revalidate without making the caller wait (bounded by the refresh budget)."""
+        if key in self._loading:
+            return
+        if self._background_refreshes >= self.config.max_concurrent_loads:
+            self.refreshes_skipped += 1
+            return
+        self._background_refreshes += 1
+        task = self._start_load(key, loader, ttl)
+        task.add_done_callback(self._background_refresh_done)
+
+    def _background_refresh_done(self, task: asyncio.Task) -> None:
+        self._background_refreshes -= 1
+
+    def _should_refresh_early(self, entry: CacheEntry, now: float) -> bool:
+        """XFetch: refresh when now - delta * beta * ln(rand) passes the expiry."""
+        beta = self.config.early_refresh_beta
+        if beta <= 0 or entry.delta <= 0 or now < entry.refresh_after:
+            return False
+        return now - entry.delta * beta * math.log(1.0 - random.random()) >= entry.expiry
+
+    def _backoff(self, failures: int) -> float:
+        base = min(
+            self.config.negative_ttl * 2 ** (failures - 1), self.config.negative_ttl_max
+        )
+        jitter = self.config.negative_ttl_jitter
+        return base * random.uniform(1 - jitter, 1 + jitter)
+
+    async def _load_value(
+        self, key: str, loader: Callable[[], T], ttl: float, single_flight: bool = False
     ) -> T:
-        """Get with stampede protection."""
-
-        async with self._lock:
-            current_time = time.time()
-
-            # Check again after acquiring lock
-            if key in self._cache:
-                entry = self._cache[key]
-                if current_time < entry.expiry and not entry.is_loading:
-                    return entry.value
-
-            # Check if already loading
-            if key in self._loading:
-                # Wait for the loading to complete
-                event = self._loading[key]
-                await event.wait()
-
-                # Return the cached value
-                if key in self._cache:
-                    entry = self._cache[key]
-                    if current_time < entry.expiry:
-                        return entry.value
-                # If loading failed, try again
-                return await self._load_value(key, loader, expiry)
-
-            # Start loading
-            event = asyncio.Event()
-            self._loading[key] = event
-
-        try:
-            return await self._load_value(key, loader, expiry)
-        finally:
-            # Signal that loading is complete
-            event.set()
-            if key in self._loading:
-                del self._loading[key]
-
-    async def _get_without_protection(self, key: str, loader: Callable[[], T], expiry: float) -> T:
-        """Get without stampede protection."""
-
-        return await self._load_value(key, loader, expiry)
-
-    async def _load_value(self, key: str, loader: Callable[[], T], expiry: float) -> T:
         """Load value and cache it."""
-
+        self.loads += 1
+        start = time.monotonic()
         try:
-            if asyncio.iscoroutinefunction(loader):
-                value = await loader()
-            else:
-                # Run sync function in thread pool
-                loop = asyncio.get_event_loop()
-                value = await loop.run_in_executor(None, loader)
-
-            # Cache the value
-            entry = CacheEntry(value, expiry, is_loading=False)
-            self._cache[key] = entry
-
-            return value
-
+            async with asyncio.timeout(self.config.load_timeout):
+                if inspect.iscoroutinefunction(loader) or inspect.iscoroutinefunction(
+                    getattr(loader, "__call__", None)
+                ):
+                    value = await loader()
+                else:
+                    # Run sync function in thread pool
+                    loop = asyncio.get_running_loop()
+                    value = await loop.run_in_executor(None, loader)
+                    if inspect.isawaitable(value):  # e.g. a lambda returning a coroutine
+                        value = await value
         except Exception as e:
-            logger.error(f"Failed to load cache key {key}: {e}")
-            # Cache the exception for a short time to prevent repeated failures
-            error_entry = CacheEntry(e, time.time() + 30, is_loading=False)
-            self._cache[key] = error_entry
+            self.load_failures += 1
+            if single_flight and self._loading.get(key) is not asyncio.current_task():
+                raise  # invalidated while loading
+            now = time.monotonic()
+            previous = self._cache.get(key)
+            failures = previous.failures + 1 if previous else 1
+            backoff = self._backoff(failures)
+            if previous is not None and previous.error is None and now < previous.stale_until:
+                # Keep serving the stale value; retry the refresh after the backoff
+                previous.failures = failures
+                previous.refresh_after = now + backoff
+            else:
+                self._cache[key] = CacheEntry(None, now + backoff, error=e, failures=failures)
+            logger.error(
+                f"Failed to load cache key {key} (attempt {failures}, "
+                f"retry in {backoff:.1f}s): {e}"
+            )
             raise
 
-    def invalidate(self, key: str):
-        """Invalidate a cache entry."""
+        now = time.monotonic()
+        if not single_flight or self._loading.get(key) is asyncio.current_task():
+            self._cache[key] = CacheEntry(
+                value,
+                now + ttl,
+                stale_until=now + ttl + self.config.stale_ttl,
+                delta=now - start,
+            )
+        return value
 
-        with self._lock:
-            self._cache.pop(key, None)
-            self._loading.pop(key, None)
+    def invalidate(self, key: str):
+        """Invalidate a cache entry (an in-flight load for it will not be stored)."""
+        self._cache.pop(key, None)
+        self._loading.pop(key, None)
 
     def clear(self):
         """Clear all cache entries."""
-
-        with self._lock:
-            self._cache.clear()
-            self._loading.clear()
+        self._cache.clear()
+        self._loading.clear()
 
     def get_stats(self) -> dict[str, Any]:
         """Get cache statistics."""
-
-        current_time = time.time()
-        valid_entries = sum(1 for entry in self._cache.values() if current_time < entry.expiry)
+        current_time = time.monotonic()
+        valid_entries = sum(
+            1
+            for entry in self._cache.values()
+            if entry.error is None and current_time < entry.expiry
+        )
 
         return {
             "total_entries": len(self._cache),
             "valid_entries": valid_entries,
             "loading_operations": len(self._loading),
+            "background_refreshes": self._background_refreshes,
             "stampede_protection_level": self.config.stampede_protection_level.value,
+            "hits": self.hits,
+            "stale_hits": self.stale_hits,
+            "negative_hits": self.negative_hits,
+            "misses": self.misses,
+            "loads": self.loads,
+            "load_failures": self.load_failures,
+            "early_refreshes": self.early_refreshes,
+            "refreshes_skipped": self.refreshes_skipped,
         }
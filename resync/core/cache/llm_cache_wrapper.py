@@ -30,7 +30,10 @@ from dataclasses import dataclass
 from datetime import datetime, timezone
 from typing import Any, TypeVar
 
+from resync.core.cache_invalidation import entity_tags
+
 from .semantic_cache import CacheResult, SemanticCache, get_semantic_cache
+from .single_flight import get_llm_single_flight
 
 logger = logging.getLogger(__name__)
 
@@ -146,11 +149,18 @@ async def cached_llm_call(
     cache: SemanticCache | None = None,
     ttl: int | None = None,
     metadata: dict[str, Any] | None = None,
+    single_flight: bool = True,
+    coalesce_similar: bool = False,
+    tags: list[str] | None = None,
     **kwargs: Any,
 ) -> CachedResponse:
     """
     Execute LLM call with semantic caching.
 
+    On a cache miss, concurrent calls for the same normalized query are
+    coalesced (single-flight): one caller generates, the rest wait for its
+    result, both within this worker and across workers via Redis.
+
     Args:
         query: User's query (used as cache key)
         llm_func: Async function that calls the LLM
@@ -159,6 +169,9 @@ async def cached_llm_call(
         cache: SemanticCache instance (uses singleton if None)
         ttl: TTL override (None = auto-classify)
         metadata: Additional metadata to store with cache entry
+        single_flight: Coalesce concurrent identical queries on a miss
+        coalesce_similar: Also coalesce near-duplicates within the cache threshold
+        tags: Invalidation tags of the answer (None = TWS object names in the query)
         **kwargs: Keyword arguments for llm_func
 
     Returns:
@@ -215,23 +228,35 @@ async def cached_llm_call(
             logger.warning(f"Cache lookup failed, proceeding to LLM: {e}")
 
     # Cache miss or cache disabled - call LLM
+    coalesced = False
     try:
         llm_start = time.perf_counter()
-        response = await llm_func(*args, **kwargs)
+        if cache_enabled and single_flight:
+            threshold = cache.threshold if coalesce_similar and cache is not None else None
+            flight = await get_llm_single_flight().run(
+                query,
+                lambda: llm_func(*args, **kwargs),
+                similarity_threshold=threshold,
+            )
+            response = flight.value
+            coalesced = flight.shared
+        else:
+            response = await llm_func(*args, **kwargs)
         llm_call_ms = (time.perf_counter() - llm_start) * 1000
 
     except Exception as e:
         logger.error(f"LLM call failed: {e}")
         raise
 
-    # Store in cache for future (async, don't wait)
-    if cache_enabled and effective_ttl:
+    # Store in cache for future (async, don't wait); the leader already stores
+    if cache_enabled and effective_ttl and not coalesced:
         asyncio.create_task(
             _store_in_cache(
                 query=query,
                 response=response,
                 cache=cache,
                 ttl=effective_ttl,
+                tags=entity_tags(query) if tags is None else tags,
                 metadata={
                     **(metadata or {}),
                     "llm_latency_ms": llm_call_ms,
@@ -244,7 +269,7 @@ async def cached_llm_call(
 
     logger.info(
         f"Cache MISS: llm_latency={llm_call_ms:.1f}ms, "
-        f"total={total_ms:.1f}ms, query='{query[:50]}...'"
+        f"total={total_ms:.1f}ms, coalesced={coalesced}, query='{query[:50]}...'"
     )
 
     return CachedResponse(
@@ -258,6 +283,7 @@ async def cached_llm_call(
             "cache_hit": False,
             "llm_latency_ms": llm_call_ms,
             "cache_enabled": cache_enabled,
+            "coalesced": coalesced,
         },
     )
 
@@ -268,12 +294,13 @@ async def _store_in_cache(
     cache: SemanticCache | None,
     ttl: int,
     metadata: dict[str, Any] | None,
+    tags: list[str] | None = None,
 ) -> None:
     """Background task to store response in cache."""
     try:
         if cache is None:
             cache = await get_semantic_cache()
-        await cache.set(query, response, ttl=ttl, metadata=metadata)
+        await cache.set(query, response, ttl=ttl, metadata=metadata, tags=tags)
     except Exception as e:
         logger.warning(f"Failed to store response in cache: {e}")
 
@@ -1,39 +1,95 @@
 """
 Intelligent Query Cache with Dynamic TTL.
 
-This module provides specialized caching for database queries with:
-- Query result caching with automatic invalidation
+This module provides a read-through cache for SQL results executed through
+the async SQLAlchemy session used by the repositories:
+- Results keyed on the normalized statement plus its bound parameters
+- Table-level invalidation from trigger-driven PostgreSQL LISTEN/NOTIFY
+  (PostgresChangeListener) or from a local change-log table (ChangeLogPoller)
 - Dynamic TTL adjustment based on data change patterns
-- Query performance monitoring and optimization
-- Batch query caching and deduplication
-- Prepared statement result caching
+- Single flight for concurrent identical queries
+- Query performance monitoring
+
+Invalidation is version based: every table has a change counter, each
+result remembers the counters it was computed against (captured before the
+query ran), and a result is only served while all of them are unchanged.
+A notification that arrives while a query is still running therefore also
+invalidates that query's result.
 """
 
 import asyncio
+import contextlib
 import hashlib
+import random
+import re
 import time
-from collections import defaultdict
+from collections.abc import Callable, Mapping
 from dataclasses import dataclass, field
+from functools import lru_cache
 from typing import Any
 
+from sqlalchemy import TableClause, TextClause, text
+from sqlalchemy.sql import visitors
+from sqlalchemy.sql.base import Executable
+from sqlalchemy.sql.dml import UpdateBase
+
 from resync.core.structured_logger import get_logger
+from resync.core.utils.data_structures import WTinyLFUCache
+
+try:
+    import asyncpg
 
-from .advanced_cache import get_advanced_cache_manager
+    ASYNCPG_AVAILABLE = True
+except ImportError:
+    asyncpg = None
+    ASYNCPG_AVAILABLE = False
 
 logger = get_logger(__name__)
 
+CHANGE_CHANNEL = "resync_table_changes"
+
+# Tables read through the query cache; their NOTIFY triggers are installed by
+# the 20261018_0006 migration and by initialize_database on fresh databases
+CACHED_TABLES = ["tws.tws_job_status"]
+
 
 # =============================================================================
 # PRE-COMPILED REGEX PATTERNS (Performance optimization)
 # =============================================================================
 # Compiled once at module load, not on every call
-import re as _re
 
-_FROM_PATTERN = _re.compile(r"\bfrom\s+(\w+)", _re.IGNORECASE)
-_JOIN_PATTERN = _re.compile(r"\bjoin\s+(\w+)", _re.IGNORECASE)
+_IDENTIFIER = r'(?:"[^"]+"|\w+)(?:\s*\.\s*(?:"[^"]+"|\w+))?'
+_FROM_PATTERN = re.compile(rf"\bfrom\s+({_IDENTIFIER})", re.IGNORECASE)
+_JOIN_PATTERN = re.compile(rf"\bjoin\s+({_IDENTIFIER})", re.IGNORECASE)
+_DML_PATTERN = re.compile(rf"^\s*(?:insert\s+into|update|delete\s+from)\s+({_IDENTIFIER})", re.I)
+_SQL_TOKENS = re.compile(r"'(?:[^']|'')*'|\"(?:[^\"]|\"\")*\"|\s+|[^\s'\"]+")
+_SAFE_IDENTIFIER = re.compile(r"^[A-Za-z_]\w*(?:\.[A-Za-z_]\w*)?$")
 
-# LRU cache for table extraction (avoids recomputing for same SQL)
-from functools import lru_cache
+
+def _bare_table_name(identifier: str) -> str:
+    """'tws.tws_job_status' / '"TWS"."Jobs"' -> table name without schema."""
+    name = identifier.rsplit(".", 1)[-1].strip()
+    return name[1:-1] if name.startswith('"') else name.lower()
+
+
+@lru_cache(maxsize=1024)
+def normalize_sql(sql: str) -> str:
+    """
+    Normalize SQL text for cache keys.
+
+    Whitespace runs collapse to one space, unquoted text is lower-cased
+    (PostgreSQL folds unquoted identifiers and keywords) and a trailing
+    semicolon is dropped. String literals and quoted identifiers are kept.
+    """
+    parts = []
+    for token in _SQL_TOKENS.findall(sql.strip().rstrip(";")):
+        if token.isspace():
+            parts.append(" ")
+        elif token[0] in "'\"":
+            parts.append(token)
+        else:
+            parts.append(token.lower())
+    return "".join(parts).strip()
 
 
 @lru_cache(maxsize=1024)
@@ -46,24 +102,38 @@ def _extract_table_names(sql: str) -> frozenset[str]:
     """
     tables = set()
 
-    # Find tables in FROM clauses
-    for match in _FROM_PATTERN.finditer(sql):
-        tables.add(match.group(1).lower())
-
-    # Find tables in JOIN clauses
-    for match in _JOIN_PATTERN.finditer(sql):
-        tables.add(match.group(1).lower())
+    # Find tables in FROM / JOIN clauses and DML targets
+    for pattern in (_FROM_PATTERN, _JOIN_PATTERN, _DML_PATTERN):
+        for match in pattern.finditer(sql):
+            tables.add(_bare_table_name(match.group(1)))
 
     return frozenset(tables)
 
 
+def _statement_tables(statement: Executable) -> frozenset[str]:
+    """Tables referenced anywhere in a SQLAlchemy statement (joins, subqueries)."""
+    return frozenset(
+        element.name
+        for element in visitors.iterate(statement)
+        if isinstance(element, TableClause)
+    )
+
+
+def _canonical_parameters(parameters: Any) -> tuple:
+    if isinstance(parameters, Mapping):
+        return tuple(sorted((str(k), repr(v)) for k, v in parameters.items()))
+    return tuple(repr(v) for v in parameters or ())
+
+
 @dataclass
 class QueryFingerprint:
     """Fingerprint of a database query for caching."""
 
     sql: str
-    parameters: tuple[Any, ...]
+    parameters: tuple[Any, ...] | Mapping[str, Any]
     connection_id: str
+    tables: frozenset[str] | None = None  # known tables (SQLAlchemy statements)
+    is_read: bool = True
 
     # Cached values (computed lazily)
     _cache_key: str | None = field(default=None, repr=False, compare=False)
@@ -71,10 +141,13 @@ class QueryFingerprint:
 
     @property
     def cache_key(self) -> str:
-        """Generate cache key from query fingerprint using BLAKE2b."""
+        """Generate cache key from normalized SQL and parameters using BLAKE2b."""
         if self._cache_key is None:
             # Create deterministic key from SQL and parameters
-            key_data = f"{self.sql}|{self.parameters}|{self.connection_id}"
+            key_data = (
+                f"{normalize_sql(self.sql)}|{_canonical_parameters(self.parameters)}"
+                f"|{self.connection_id}"
+            )
             # Use BLAKE2b instead of MD5 for better security
             hash_value = hashlib.blake2b(key_data.encode(), digest_size=16).hexdigest()
             object.__setattr__(self, "_cache_key", f"query:{hash_value}")
@@ -83,17 +156,39 @@ class QueryFingerprint:
     @property
     def table_names(self) -> set[str]:
         """
-        Extract table names from SQL query.
+        Tables the query depends on.
 
-        Uses pre-compiled regex and module-level cache for performance.
-        Results are cached per-instance to avoid repeated lookups.
+        Taken from the statement itself when available, otherwise extracted
+        from the SQL text with pre-compiled regex (module-level cache).
         """
         if self._table_names is None:
-            # Use cached extraction function
-            frozen = _extract_table_names(self.sql)
+            frozen = self.tables if self.tables is not None else _extract_table_names(self.sql)
             object.__setattr__(self, "_table_names", set(frozen))
         return self._table_names
 
+    @classmethod
+    def from_statement(
+        cls,
+        statement: str | Executable,
+        parameters: Mapping[str, Any] | None = None,
+        connection_id: str = "default",
+    ) -> "QueryFingerprint":
+        """Fingerprint raw SQL or a SQLAlchemy statement (compiled for its SQL and binds)."""
+        if isinstance(statement, str):
+            sql = statement
+            return cls(sql, dict(parameters or {}), connection_id, is_read=_is_read_sql(sql))
+
+        compiled = statement.compile()
+        binds = {**compiled.params, **(parameters or {})}
+        is_read = not isinstance(statement, UpdateBase) and _is_read_sql(str(compiled))
+        tables = None if isinstance(statement, TextClause) else _statement_tables(statement)
+        return cls(str(compiled), binds, connection_id, tables=tables, is_read=is_read)
+
+
+def _is_read_sql(sql: str) -> bool:
+    head = normalize_sql(sql)[:10]
+    return head.startswith(("select", "with", "values", "table", "show", "explain"))
+
 
 @dataclass
 class QueryExecutionStats:
@@ -147,6 +242,9 @@ class QueryResult:
     result_hash: str = ""
     row_count: int = 0
     execution_stats: QueryExecutionStats | None = None
+    from_cache: bool = False
+    expires_at: float = 0.0  # time.monotonic()
+    table_versions: dict[str, int] = field(default_factory=dict)
 
     def __post_init__(self):
         """Calculate result hash and row count after initialization."""
@@ -168,7 +266,7 @@ class TableChangeTracker:
 
     table_name: str
     last_change_timestamp: float = 0.0
-    change_count: int = 0
+    change_count: int = 0  # also the table's version for cached results
     tracked_queries: set[str] = field(default_factory=set)  # Query fingerprints affected
 
     def record_change(self) -> None:
@@ -184,49 +282,79 @@ class TableChangeTracker:
 
 class QueryCacheManager:
     """
-    Intelligent query cache manager with dynamic TTL and change tracking.
+    Read-through query cache with dynamic TTL and change tracking.
 
     Features:
-    - Query result caching with automatic invalidation
+    - Query result caching with table-level invalidation
     - Dynamic TTL based on execution patterns and data stability
-    - Table change tracking for smart invalidation
-    - Batch query optimization
+    - Table change tracking fed by database change notifications
+    - Single flight for concurrent identical queries
     - Performance monitoring and analytics
+
+    Results are kept in-process (bounded W-TinyLFU store): every worker runs
+    its own change listener, so no shared layer is needed to invalidate.
     """
 
-    def __init__(self):
-        self.cache_manager = None
+    def __init__(
+        self,
+        session_factory: Callable[[], Any] | None = None,
+        max_entries: int = 10_000,
+    ):
+        """
+        Args:
+            session_factory: Async session factory (defaults to the engine's get_session)
+            max_entries: Maximum number of cached results
+        """
+        self._session_factory = session_factory
+        self.results: WTinyLFUCache[str, QueryResult] = WTinyLFUCache(max_entries)
         self.query_stats: dict[str, QueryExecutionStats] = {}
         self.table_trackers: dict[str, TableChangeTracker] = {}
-        self.batch_queries: dict[str, list[asyncio.Future]] = defaultdict(list)
+        self._in_flight: dict[str, asyncio.Task] = {}
+        self.change_source: "PostgresChangeListener | ChangeLogPoller | None" = None
+        self._initialized = False
 
         # Configuration
         self.enable_change_tracking = True
         self.max_batch_size = 10
         self.ttl_override_threshold = 3600  # 1 hour
+        self.default_ttl = 300  # first execution of a query, before stats exist
 
         # Statistics
-        self.total_queries_cached = 0
-        self.total_queries_executed = 0
+        self.total_queries_cached = 0  # served from cache
+        self.total_queries_executed = 0  # sent to the database
+        self.total_invalidations = 0
         self.cache_hit_ratio = 0.0
 
-        # Thread safety
-        self._lock = asyncio.Lock()
+    async def initialize(self, change_source: Any = None) -> None:
+        """
+        Initialize the query cache manager.
 
-    async def initialize(self) -> None:
-        """Initialize the query cache manager."""
-        self.cache_manager = await get_advanced_cache_manager()
+        Args:
+            change_source: Listener feeding table changes; by default a
+                PostgresChangeListener when asyncpg is available
+        """
+        if self._initialized:
+            return
 
         # Set up table change tracking
         if self.enable_change_tracking:
-            await self._setup_change_tracking()
+            await self._setup_change_tracking(change_source)
 
+        self._initialized = True
         logger.info("Query cache manager initialized")
 
+    async def shutdown(self) -> None:
+        """Stop the change source and drop cached results."""
+        if self.change_source is not None:
+            await self.change_source.stop()
+            self.change_source = None
+        self.results.clear()
+        self._initialized = False
+
     async def execute_query(
         self,
-        sql: str,
-        parameters: tuple[Any, ...] = (),
+        sql: str | Executable,
+        parameters: Mapping[str, Any] | None = None,
         connection_id: str = "default",
         force_refresh: bool = False,
         ttl_override: int | None = None,
@@ -234,67 +362,49 @@ class QueryCacheManager:
         """
         Execute query with intelligent caching.
 
+        Reads are served from cache while none of their tables changed;
+        writes are executed, committed and invalidate their tables.
+
         Args:
-            sql: SQL query string
-            parameters: Query parameters
+            sql: SQL query string or SQLAlchemy statement
+            parameters: Named query parameters
             connection_id: Database connection identifier
             force_refresh: Bypass cache
             ttl_override: Override dynamic TTL calculation
 
         Returns:
-            QueryResult with data and metadata
+            QueryResult with data (list of row dicts, or affected rows) and metadata
         """
-        fingerprint = QueryFingerprint(sql, parameters, connection_id)
+        fingerprint = QueryFingerprint.from_statement(sql, parameters, connection_id)
         cache_key = fingerprint.cache_key
 
-        start_time = time.time()
+        if not fingerprint.is_read:
+            return await self._execute_write(sql, parameters, fingerprint)
 
         # Check cache first (unless forced refresh)
         if not force_refresh:
             cached_result = await self._get_cached_result(cache_key)
             if cached_result:
-                execution_time = time.time() - start_time
-                logger.debug(f"Query cache hit for {cache_key[:16]}...")
-                self._update_cache_stats(hit=True, execution_time=execution_time)
+                self._update_cache_stats(hit=True)
                 return cached_result
 
-        # Cache miss or forced refresh - execute query
-        try:
-            # Here we would actually execute the query
-            # For now, simulate execution
-            execution_start = time.time()
-            result_data = await self._simulate_query_execution(sql, parameters)
-            execution_time = time.time() - execution_start
-
-            # Create result object
-            result = QueryResult(
-                data=result_data,
-                execution_time=execution_time,
-                execution_stats=self.query_stats.get(cache_key),
+        task = self._in_flight.get(cache_key)
+        if task is None or force_refresh:
+            task = asyncio.create_task(
+                self._execute_read(sql, parameters, fingerprint, ttl_override)
             )
-
-            # Update query statistics
-            await self._update_query_stats(fingerprint, result, execution_time)
-
-            # Cache the result
-            await self._cache_query_result(cache_key, result, fingerprint, ttl_override)
-
-            # Track table dependencies
-            await self._track_table_dependencies(fingerprint)
-
-            self._update_cache_stats(hit=False, execution_time=execution_time)
-            return result
-
-        except Exception as e:
-            logger.error(f"Query execution failed: {e}")
-            self._update_cache_stats(hit=False, execution_time=time.time() - start_time, error=True)
-            raise
+            self._in_flight[cache_key] = task
+            task.add_done_callback(lambda done: self._read_done(cache_key, done))
+        return await asyncio.shield(task)
 
     async def execute_batch(
-        self, queries: list[tuple[str, tuple[Any, ...]]], connection_id: str = "default"
+        self,
+        queries: list[tuple[str | Executable, Mapping[str, Any] | None]],
+        connection_id: str = "default",
     ) -> list[QueryResult]:
         """
-        Execute multiple queries with batch optimization.
+        Execute multiple queries; cached ones never reach the database and
+        duplicates in the batch share one execution.
 
         Args:
             queries: List of (sql, parameters) tuples
@@ -303,14 +413,9 @@ class QueryCacheManager:
         Returns:
             List of QueryResult objects
         """
-        if len(queries) <= self.max_batch_size:
-            # Execute individually with caching
-            return await asyncio.gather(
-                *[self.execute_query(sql, params, connection_id) for sql, params in queries]
-            )
-
-        # For larger batches, optimize execution
-        return await self._execute_optimized_batch(queries, connection_id)
+        return await asyncio.gather(
+            *[self.execute_query(sql, params, connection_id) for sql, params in queries]
+        )
 
     async def invalidate_table_cache(self, table_name: str) -> int:
         """
@@ -322,24 +427,7 @@ class QueryCacheManager:
         Returns:
             Number of cache entries invalidated
         """
-        async with self._lock:
-            if table_name in self.table_trackers:
-                tracker = self.table_trackers[table_name]
-                tracker.record_change()
-
-                # Invalidate all queries that depend on this table
-                invalidated = 0
-                for query_key in tracker.tracked_queries:
-                    if query_key in self.query_stats and self.cache_manager:
-                        # Invalidate cache entry
-                        invalidated += await self.cache_manager.invalidate(
-                            query_key, cascade=False
-                        )
-
-                logger.info(f"Invalidated {invalidated} queries dependent on table {table_name}")
-                return invalidated
-
-        return 0
+        return self.invalidate_table(table_name)
 
     async def record_table_change(self, table_name: str, change_type: str = "update") -> None:
         """
@@ -347,17 +435,34 @@ class QueryCacheManager:
 
         Args:
             table_name: Name of the changed table
-            change_type: Type of change (insert, update, delete)
+            change_type: Type of change (insert, update, delete, truncate)
         """
-        async with self._lock:
-            if table_name not in self.table_trackers:
-                self.table_trackers[table_name] = TableChangeTracker(table_name)
-
-            self.table_trackers[table_name].record_change()
-
-            # Invalidate dependent queries immediately for critical changes
-            if change_type in ["delete", "update"]:
-                await self.invalidate_table_cache(table_name)
+        self.invalidate_table(table_name)
+
+    def invalidate_table(self, table_name: str) -> int:
+        """Bump a table's version and drop the results that depended on it."""
+        table_name = _bare_table_name(table_name)
+        tracker = self.table_trackers.get(table_name)
+        if tracker is None:
+            tracker = self.table_trackers[table_name] = TableChangeTracker(table_name)
+        tracker.record_change()
+
+        invalidated = sum(self.results.remove(key) for key in tracker.tracked_queries)
+        tracker.tracked_queries.clear()
+        self.total_invalidations += invalidated
+        if invalidated:
+            logger.debug(f"Invalidated {invalidated} queries dependent on table {table_name}")
+        return invalidated
+
+    def invalidate_all(self) -> int:
+        """Drop every cached result (e.g. after missing change notifications)."""
+        invalidated = len(self.results)
+        for tracker in self.table_trackers.values():
+            tracker.record_change()
+            tracker.tracked_queries.clear()
+        self.results.clear()
+        self.total_invalidations += invalidated
+        return invalidated
 
     def get_cache_statistics(self) -> dict[str, Any]:
         """Get comprehensive query cache statistics."""
@@ -369,6 +474,8 @@ class QueryCacheManager:
                 "total_queries": total_queries,
                 "cached_queries": self.total_queries_cached,
                 "executed_queries": self.total_queries_executed,
+                "cached_results": len(self.results),
+                "invalidations": self.total_invalidations,
             },
             "queries": {
                 "tracked_queries": len(self.query_stats),
@@ -384,25 +491,124 @@ class QueryCacheManager:
                 ),
             },
             "ttl_distribution": self._calculate_ttl_distribution(),
+            "change_source": type(self.change_source).__name__ if self.change_source else None,
         }
 
     async def _get_cached_result(self, cache_key: str) -> QueryResult | None:
         """Get cached query result if valid."""
-        if not self.cache_manager:
+        cached = self.results.get(cache_key)
+        if cached is None:
             return None
 
+        # Check if result is still valid based on TTL and table changes
+        if await self._is_result_still_valid(cached, cache_key):
+            return cached
+        self.results.remove(cache_key)
+        return None
+
+    async def _execute_read(
+        self,
+        sql: str | Executable,
+        parameters: Mapping[str, Any] | None,
+        fingerprint: QueryFingerprint,
+        ttl_override: int | None,
+    ) -> QueryResult:
+        cache_key = fingerprint.cache_key
+        # Versions are captured before the query runs: a change notified
+        # while it runs makes this result stale immediately.
+        versions = self._table_versions(fingerprint.table_names)
+
         try:
-            cached = await self.cache_manager.get(cache_key)
-            if cached and isinstance(cached, QueryResult):
-                # Check if result is still valid based on table changes
-                if await self._is_result_still_valid(cached, cache_key):
-                    return cached
-                # Result invalidated due to table changes
-                await self.cache_manager.invalidate(cache_key, cascade=False)
+            execution_start = time.time()
+            result_data = await self._run_statement(sql, parameters)
+            execution_time = time.time() - execution_start
         except Exception as e:
-            logger.warning(f"Cache retrieval error for {cache_key}: {e}")
+            logger.error(f"Query execution failed: {e}")
+            self._update_cache_stats(hit=False)
+            raise
 
-        return None
+        # Create result object
+        result = QueryResult(
+            data=result_data,
+            execution_time=execution_time,
+            execution_stats=self.query_stats.get(cache_key),
+            table_versions=versions,
+        )
+
+        # Update query statistics
+        await self._update_query_stats(fingerprint, result, execution_time)
+
+        # Cache the result (only when its tables are known, so it can be invalidated)
+        if fingerprint.table_names or ttl_override:
+            cached = QueryResult(
+                data=result.data,
+                execution_time=execution_time,
+                execution_stats=self.query_stats.get(cache_key),
+                from_cache=True,
+                table_versions=versions,
+            )
+            await self._cache_query_result(cache_key, cached, fingerprint, ttl_override)
+
+            # Track table dependencies
+            await self._track_table_dependencies(fingerprint)
+
+        self._update_cache_stats(hit=False)
+        return result
+
+    async def _execute_write(
+        self,
+        sql: str | Executable,
+        parameters: Mapping[str, Any] | None,
+        fingerprint: QueryFingerprint,
+    ) -> QueryResult:
+        execution_start = time.time()
+        try:
+            data = await self._run_statement(sql, parameters, commit=True)
+        finally:
+            # Local writes invalidate at once; the notification may lag behind
+            for table_name in fingerprint.table_names:
+                self.invalidate_table(table_name)
+        self._update_cache_stats(hit=False)
+        return QueryResult(data=data, execution_time=time.time() - execution_start)
+
+    async def _run_statement(
+        self,
+        sql: str | Executable,
+        parameters: Mapping[str, Any] | None,
+        commit: bool = False,
+    ) -> Any:
+        """Run the statement on a session; rows come back as plain dicts."""
+        statement = text(sql) if isinstance(sql, str) else sql
+
+        async with self._session() as session:
+            result = await session.execute(statement, parameters or None)
+            if getattr(result, "returns_rows", True):  # ORM results always return rows
+                data = [dict(row) for row in result.mappings().all()]
+            else:
+                data = {"affected_rows": result.rowcount}
+            if commit:
+                await session.commit()
+            return data
+
+    def _session(self):
+        if self._session_factory is not None:
+            return self._session_factory()
+        from resync.core.database.engine import get_session
+
+        return get_session()
+
+    def _read_done(self, cache_key: str, task: asyncio.Task) -> None:
+        if self._in_flight.get(cache_key) is task:
+            del self._in_flight[cache_key]
+        if not task.cancelled():
+            task.exception()  # retrieved even if every caller was cancelled
+
+    def _table_versions(self, table_names: set[str]) -> dict[str, int]:
+        versions = {}
+        for table_name in table_names:
+            tracker = self.table_trackers.get(table_name)
+            versions[table_name] = tracker.change_count if tracker else 0
+        return versions
 
     async def _cache_query_result(
         self,
@@ -412,30 +618,16 @@ class QueryCacheManager:
         ttl_override: int | None,
     ) -> None:
         """Cache query result with appropriate TTL."""
-        if not self.cache_manager:
-            return
-
         # Determine TTL
         if ttl_override:
             ttl = ttl_override
-        elif cache_key in self.query_stats:
+        elif cache_key in self.query_stats and self.query_stats[cache_key].execution_count > 1:
             ttl = self.query_stats[cache_key].calculate_dynamic_ttl()
         else:
-            ttl = 300  # Default 5 minutes
-
-        # Determine dependencies (table names)
-        dependencies = list(fingerprint.table_names)
-
-        # Cache with dependencies for automatic invalidation
-        await self.cache_manager.set(
-            key=cache_key,
-            value=result,
-            ttl=ttl,
-            dependencies=dependencies,
-            tags=["query_cache", "database"],
-        )
+            ttl = self.default_ttl
 
-        self.total_queries_cached += 1
+        result.expires_at = time.monotonic() + ttl
+        self.results.put(cache_key, result)
 
     async def _update_query_stats(
         self, fingerprint: QueryFingerprint, result: QueryResult, execution_time: float
@@ -443,112 +635,57 @@ class QueryCacheManager:
         """Update statistics for a query."""
         cache_key = fingerprint.cache_key
 
-        async with self._lock:
-            if cache_key not in self.query_stats:
-                self.query_stats[cache_key] = QueryExecutionStats(
-                    query_fingerprint=cache_key,
-                    table_dependencies=fingerprint.table_names,
-                )
+        if cache_key not in self.query_stats:
+            self.query_stats[cache_key] = QueryExecutionStats(
+                query_fingerprint=cache_key,
+                table_dependencies=fingerprint.table_names,
+            )
 
-            stats = self.query_stats[cache_key]
-            stats.execution_count += 1
-            stats.total_execution_time += execution_time
-            stats.last_execution_time = time.time()
+        stats = self.query_stats[cache_key]
+        stats.execution_count += 1
+        stats.total_execution_time += execution_time
+        stats.last_execution_time = time.time()
 
-            # Check if result changed
-            if stats.last_result_hash and stats.last_result_hash != result.result_hash:
-                stats.result_change_count += 1
+        # Check if result changed
+        if stats.last_result_hash and stats.last_result_hash != result.result_hash:
+            stats.result_change_count += 1
 
-            stats.last_result_hash = result.result_hash
+        stats.last_result_hash = result.result_hash
 
     async def _is_result_still_valid(self, result: QueryResult, cache_key: str) -> bool:
-        """Check if cached result is still valid based on table changes."""
-        if not result.execution_stats:
-            return True
+        """Check if cached result is still valid based on TTL and table changes."""
+        if time.monotonic() >= result.expires_at:
+            return False
 
-        # Check if any dependent tables changed since result was cached
-        for table_name in result.execution_stats.table_dependencies:
-            if table_name in self.table_trackers:
-                tracker = self.table_trackers[table_name]
-                if tracker.last_change_timestamp > result.timestamp:
-                    return False
+        # Check if any dependent table changed since the query ran
+        trackers = self.table_trackers
+        for table_name, version in result.table_versions.items():
+            tracker = trackers.get(table_name)
+            if tracker is not None and tracker.change_count != version:
+                return False
 
         return True
 
     async def _track_table_dependencies(self, fingerprint: QueryFingerprint) -> None:
         """Track which queries depend on which tables."""
-        async with self._lock:
-            for table_name in fingerprint.table_names:
-                if table_name not in self.table_trackers:
-                    self.table_trackers[table_name] = TableChangeTracker(table_name)
-
-                self.table_trackers[table_name].tracked_queries.add(fingerprint.cache_key)
-
-    async def _setup_change_tracking(self) -> None:
-        """Set up database change tracking."""
-        # This would typically involve setting up database triggers
-        # or change data capture mechanisms
-        # For now, this is a placeholder
-        logger.info("Database change tracking setup completed")
-
-    async def _simulate_query_execution(self, sql: str, parameters: tuple[Any, ...]) -> Any:
-        """Simulate query execution (replace with actual database calls)."""
-        # Simulate execution time based on query complexity
-        complexity_factor = len(sql.split()) / 10
-        execution_time = complexity_factor * 0.01  # 10ms per 10 words
-
-        await asyncio.sleep(min(execution_time, 0.1))  # Cap at 100ms for simulation
-
-        # Return mock data based on query type
-        if "select" in sql.lower():
-            return [{"id": 1, "name": "Sample Data", "value": 42}]
-        if "count" in sql.lower():
-            return 42
-        return {"affected_rows": 1}
-
-    async def _execute_optimized_batch(
-        self, queries: list[tuple[str, tuple[Any, ...]]], connection_id: str
-    ) -> list[QueryResult]:
-        """Execute large batch of queries with optimization."""
-        # Group similar queries for optimization
-        query_groups = defaultdict(list)
-
-        for sql, params in queries:
-            # Group by similar query patterns
-            pattern = sql.split()[0].lower()  # SELECT, INSERT, etc.
-            query_groups[pattern].append((sql, params))
-
-        # Execute groups concurrently
-        tasks = []
-        for pattern, group_queries in query_groups.items():
-            if pattern == "select" and len(group_queries) > 1:
-                # Batch SELECT queries
-                tasks.append(self._execute_batch_select(group_queries, connection_id))
-            else:
-                # Execute other queries individually
-                tasks.extend(
-                    [
-                        self.execute_query(sql, params, connection_id)
-                        for sql, params in group_queries
-                    ]
-                )
+        for table_name in fingerprint.table_names:
+            if table_name not in self.table_trackers:
+                self.table_trackers[table_name] = TableChangeTracker(table_name)
 
-        results = await asyncio.gather(*tasks)
-        return [
-            item
-            for sublist in results
-            for item in (sublist if isinstance(sublist, list) else [sublist])
-        ]
+            self.table_trackers[table_name].tracked_queries.add(fingerprint.cache_key)
 
-    async def _execute_batch_select(
-        self, queries: list[tuple[str, tuple[Any, ...]]], connection_id: str
-    ) -> list[QueryResult]:
-        """Execute batch SELECT queries efficiently."""
-        # For now, execute individually
-        # In a real implementation, this could combine queries or use batch APIs
-        return await asyncio.gather(
-            *[self.execute_query(sql, params, connection_id) for sql, params in queries]
-        )
+    async def _setup_change_tracking(self, change_source: Any = None) -> None:
+        """Start the database change listener."""
+        if change_source is None:
+            if not ASYNCPG_AVAILABLE:
+                logger.warning(
+                    "asyncpg not installed; query cache relies on TTLs and local writes"
+                )
+                return
+            change_source = PostgresChangeListener(self)
+        self.change_source = change_source
+        await change_source.start()
+        logger.info(f"Database change tracking started ({type(change_source).__name__})")
 
     def _calculate_ttl_distribution(self) -> dict[str, int]:
         """Calculate distribution of TTL values."""
@@ -579,7 +716,7 @@ class QueryCacheManager:
 
         return ttl_ranges
 
-    def _update_cache_stats(self, hit: bool, execution_time: float, error: bool = False) -> None:
+    def _update_cache_stats(self, hit: bool) -> None:
         """Update cache performance statistics."""
         if hit:
             self.total_queries_cached += 1
@@ -592,12 +729,211 @@ class QueryCacheManager:
             self.cache_hit_ratio = self.total_queries_cached / total
 
 
+# =============================================================================
+# CHANGE SOURCES
+# =============================================================================
+
+NOTIFY_FUNCTION_SQL = """
+CREATE OR REPLACE FUNCTION resync_notify_table_change() RETURNS trigger AS $$
+BEGIN
+    PERFORM pg_notify(TG_ARGV[0], TG_TABLE_NAME || ':' || lower(TG_OP));
+    RETURN NULL;
+END;
+$$ LANGUAGE plpgsql
+"""
+
+
+def change_trigger_statements(tables: list[str], channel: str = CHANGE_CHANNEL) -> list[str]:
+    """
+    DDL for statement-level triggers that NOTIFY ``channel`` with "table:op".
+
+    Statement-level triggers send one notification per statement (and
+    PostgreSQL folds identical notifications within a transaction), so bulk
+    writes do not flood the listener.
+    """
+    if not _SAFE_IDENTIFIER.match(channel):
+        raise ValueError(f"Invalid channel name: {channel!r}")
+    statements = [NOTIFY_FUNCTION_SQL]
+    for table in tables:
+        if not _SAFE_IDENTIFIER.match(table):
+            raise ValueError(f"Invalid table name: {table!r}")
+        trigger = f"resync_change_notify_{table.replace('.', '_')}"
+        statements.append(f"DROP TRIGGER IF EXISTS {trigger} ON {table}")
+        statements.append(
+            f"CREATE TRIGGER {trigger} AFTER INSERT OR UPDATE OR DELETE OR TRUNCATE "
+            f"ON {table} FOR EACH STATEMENT EXECUTE FUNCTION "
+            f"resync_notify_table_change('{channel}')"
+        )
+    return statements
+
+
+async def install_change_triggers(
+    session: Any, tables: list[str], channel: str = CHANGE_CHANNEL
+) -> None:
+    """Install the NOTIFY triggers on ``tables`` (e.g. ["tws.tws_job_status"])."""
+    for statement in change_trigger_statements(tables, channel):
+        await session.execute(text(statement))
+    await session.commit()
+
+
+class PostgresChangeListener:
+    """
+    Feed table changes from PostgreSQL LISTEN/NOTIFY into a QueryCacheManager.
+
+    Uses a dedicated asyncpg connection (LISTEN does not work through a
+    pooled transaction). When the connection drops, notifications may have
+    been missed, so every cached result is dropped before reconnecting.
+    """
+
+    def __init__(
+        self,
+        manager: QueryCacheManager,
+        dsn: str | None = None,
+        channel: str = CHANGE_CHANNEL,
+        reconnect_delay: float = 1.0,
+        max_reconnect_delay: float = 30.0,
+    ):
+        self.manager = manager
+        self.dsn = dsn
+        self.channel = channel
+        self.reconnect_delay = reconnect_delay
+        self.max_reconnect_delay = max_reconnect_delay
+        self.notifications = 0
+        self.reconnects = 0
+        self._task: asyncio.Task | None = None
+        self._connection = None
+
+    async def start(self) -> None:
+        if self._task is None:
+            self._task = asyncio.create_task(self._run())
+
+    async def stop(self) -> None:
+        if self._task is not None:
+            self._task.cancel()
+            with contextlib.suppress(asyncio.CancelledError):
+                await self._task
+            self._task = None
+
+    def _on_notification(self, connection: Any, pid: int, channel: str, payload: str) -> None:
+        """asyncpg callback; payload is "table" or "table:operation"."""
+        self.notifications += 1
+        table_name = payload.split(":", 1)[0]
+        if table_name:
+            self.manager.invalidate_table(table_name)
+
+    async def _run(self) -> None:
+        delay = self.reconnect_delay
+        while True:
+            closed = asyncio.Event()
+            try:
+                dsn = self.dsn
+                if dsn is None:
+                    from resync.core.database.config import get_database_config
+
+                    dsn = get_database_config().raw_url
+                self._connection = await asyncpg.connect(dsn)
+                self._connection.add_termination_listener(lambda _: closed.set())
+                await self._connection.add_listener(self.channel, self._on_notification)
+                logger.info(f"Listening for table changes on channel {self.channel}")
+                delay = self.reconnect_delay
+                await closed.wait()
+                logger.warning("Change listener connection closed")
+            except asyncio.CancelledError:
+                if self._connection is not None and not self._connection.is_closed():
+                    await self._connection.close()
+                raise
+            except Exception as e:
+                logger.warning(f"Change listener connection failed: {e}")
+
+            # Changes may have been missed while disconnected
+            self.manager.invalidate_all()
+            self.reconnects += 1
+            await asyncio.sleep(delay * random.uniform(0.8, 1.2))
+            delay = min(delay * 2, self.max_reconnect_delay)
+
+
+class ChangeLogPoller:
+    """
+    Feed table changes from a local change-log table into a QueryCacheManager.
+
+    For databases without LISTEN/NOTIFY (SQLite in tests, or restricted
+    environments): triggers append ``(id, table_name)`` rows and the poller
+    reads the rows past the last id it has seen.
+    """
+
+    def __init__(
+        self,
+        manager: QueryCacheManager,
+        session_factory: Callable[[], Any],
+        table: str = "resync_table_changes",
+        poll_interval: float = 1.0,
+    ):
+        if not _SAFE_IDENTIFIER.match(table):
+            raise ValueError(f"Invalid table name: {table!r}")
+        self.manager = manager
+        self.session_factory = session_factory
+        self.table = table
+        self.poll_interval = poll_interval
+        self.last_id: int | None = None
+        self._task: asyncio.Task | None = None
+
+    async def start(self) -> None:
+        await self.poll_once()  # establishes the starting point
+        if self._task is None and self.poll_interval > 0:
+            self._task = asyncio.create_task(self._run())
+
+    async def stop(self) -> None:
+        if self._task is not None:
+            self._task.cancel()
+            with contextlib.suppress(asyncio.CancelledError):
+                await self._task
+            self._task = None
+
+    async def poll_once(self) -> int:
+        """Apply new change-log rows; returns the number of tables invalidated."""
+        async with self.session_factory() as session:
+            if self.last_id is None:
+                result = await session.execute(text(f"SELECT MAX(id) FROM {self.table}"))
+                self.last_id = result.scalar() or 0
+                return 0
+            result = await session.execute(
+                text(f"SELECT id, table_name FROM {self.table} WHERE id > :last ORDER BY id"),
+                {"last": self.last_id},
+            )
+            rows = result.all()
+
+        tables = set()
+        for row_id, table_name in rows:
+            self.last_id = row_id
+            tables.add(table_name)
+        for table_name in tables:
+            self.manager.invalidate_table(table_name)
+        return len(tables)
+
+    async def _run(self) -> None:
+        while True:
+            await asyncio.sleep(self.poll_interval)
+            try:
+                await self.poll_once()
+            except Exception as e:
+                # Unknown which changes were missed
+                logger.warning(f"Change-log poll failed: {e}")
+                self.manager.invalidate_all()
+
+
 # Global query cache manager instance
 query_cache_manager = QueryCacheManager()
 
 
 async def get_query_cache_manager() -> QueryCacheManager:
     """Get the global query cache manager instance."""
-    if not query_cache_manager.cache_manager:
+    if not query_cache_manager._initialized:
         await query_cache_manager.initialize()
     return query_cache_manager
+
+
+def get_repository_query_cache() -> QueryCacheManager | None:
+    """Query cache for repositories, or None when disabled in settings."""
+    from resync.settings import settings
+
+    return query_cache_manager if settings.query_cache_enabled else None
@@ -98,6 +98,14 @@ class RedisConfig:
             os.getenv("SEMANTIC_CACHE_MAX_ENTRIES", "100000")
         )
 
+        # Single-flight coalescing of concurrent identical LLM calls
+        self.semantic_cache_singleflight_lease_ms: int = int(
+            os.getenv("SEMANTIC_CACHE_SINGLEFLIGHT_LEASE_MS", "30000")
+        )
+        self.semantic_cache_singleflight_wait_s: float = float(
+            os.getenv("SEMANTIC_CACHE_SINGLEFLIGHT_WAIT_S", "30.0")
+        )
+
     def get_url(self, db: RedisDatabase = RedisDatabase.CONNECTIONS) -> str:
         """
         Build Redis URL for specific database.
@@ -126,8 +134,8 @@ def get_redis_config() -> RedisConfig:
     return RedisConfig()
 
 
-# Connection pool cache (one per database)
-_connection_pools: dict[RedisDatabase, Any] = {}
+# Connection pool cache (one per database and response decoding)
+_connection_pools: dict[tuple[RedisDatabase, bool], Any] = {}
 
 
 async def get_redis_client(
@@ -155,8 +163,9 @@ async def get_redis_client(
 
     config = get_redis_config()
 
-    # Check if we already have a pool for this DB
-    if db not in _connection_pools:
+    # Check if we already have a pool for this DB (binary clients get their own)
+    pool_key = (db, decode_responses)
+    if pool_key not in _connection_pools:
         logger.info(f"Creating Redis connection pool for DB {db.name} ({db.value})")
 
         pool = redis_async.ConnectionPool(
@@ -171,9 +180,9 @@ async def get_redis_client(
             health_check_interval=config.health_check_interval,
             decode_responses=decode_responses,
         )
-        _connection_pools[db] = pool
+        _connection_pools[pool_key] = pool
 
-    return redis_async.Redis(connection_pool=_connection_pools[db])
+    return redis_async.Redis(connection_pool=_connection_pools[pool_key])
 
 
 async def check_redis_stack_available() -> dict[str, bool]:
@@ -247,7 +256,7 @@ async def close_all_pools() -> None:
 
     Call this during application shutdown to release resources cleanly.
     """
-    for db, pool in _connection_pools.items():
+    for (db, _), pool in _connection_pools.items():
         try:
             await pool.disconnect()
             logger.info(f"Closed Redis pool for DB {db.name}")
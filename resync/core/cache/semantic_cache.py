@@ -153,6 +153,8 @@ class SemanticCache:
     KEY_PREFIX = "semantic_cache:"
     INDEX_NAME = "idx:semantic_cache"
     STATS_KEY = "semantic_cache:stats"
+    # Outside KEY_PREFIX so scans over entries never see the tag sets
+    TAG_PREFIX = "semantic_tag:"
 
     def __init__(
         self,
@@ -561,6 +563,7 @@ class SemanticCache:
         response: str,
         ttl: int | None = None,
         metadata: dict[str, Any] | None = None,
+        tags: list[str] | None = None,
     ) -> bool:
         """
         Store query-response pair in cache.
@@ -570,6 +573,7 @@ class SemanticCache:
             response: LLM's response
             ttl: Time-to-live in seconds (None = use default)
             metadata: Additional info to store (model, latency, etc.)
+            tags: Tags to invalidate the entry by (e.g. "job:JOB_XPTO")
 
         Returns:
             True if stored successfully
@@ -611,6 +615,16 @@ class SemanticCache:
             effective_ttl = ttl or self.default_ttl
             await client.expire(key, effective_ttl)
 
+            # File the entry under its tags (tag sets outlive their entries
+            # by at most one TTL; stale members are harmless on delete)
+            if tags:
+                pipe = client.pipeline(transaction=False)
+                for tag in tags:
+                    pipe.sadd(f"{self.TAG_PREFIX}{tag}", key)
+                    pipe.expire(f"{self.TAG_PREFIX}{tag}", effective_ttl, gt=True)
+                    pipe.expire(f"{self.TAG_PREFIX}{tag}", effective_ttl, nx=True)
+                await pipe.execute()
+
             self._stats["sets"] += 1
 
             logger.debug(
@@ -662,6 +676,35 @@ class SemanticCache:
             logger.error(f"Failed to invalidate cache entry: {e}")
             return False
 
+    async def invalidate_tags(self, tags: list[str]) -> int:
+        """
+        Invalidate all entries filed under any of the tags.
+
+        Args:
+            tags: Tags given to set()
+
+        Returns:
+            Number of entries invalidated
+        """
+        try:
+            client = await get_redis_client(RedisDatabase.SEMANTIC_CACHE)
+
+            tag_keys = [f"{self.TAG_PREFIX}{tag}" for tag in tags]
+            keys: set[str] = set()
+            for tag_key in tag_keys:
+                keys.update(await client.smembers(tag_key))
+
+            count = await client.delete(*keys) if keys else 0
+            await client.delete(*tag_keys)
+
+            if count:
+                logger.info(f"Invalidated {count} cache entries for tags {tags}")
+            return count
+
+        except Exception as e:
+            logger.error(f"Failed to invalidate by tags: {e}")
+            return 0
+
     async def invalidate_pattern(self, pattern: str) -> int:
         """
         Invalidate all entries matching a pattern.
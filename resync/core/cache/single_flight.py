@@ -0,0 +1,385 @@
+"""
+Single-flight coalescing for LLM generations.
+
+v5.9.10 - Request coalescing with:
+- In-worker deduplication of identical (normalized) queries via shared futures
+- Optional near-duplicate coalescing using the semantic cache distance threshold
+- Cross-worker deduplication via a short Redis lease plus pub/sub notification
+- Graceful degradation: if Redis is unavailable, each worker still coalesces locally
+
+Why this exists:
+During an incident dozens of operators ask the same question within seconds.
+The semantic cache store is fire-and-forget, so every one of those requests
+misses and pays a full LLM call. Single-flight makes the first caller the
+"leader" and every concurrent identical caller a "follower" that waits for
+the leader's result instead of generating its own.
+
+Flow:
+1. Query is normalized and hashed (same normalization as SemanticCache)
+2. If a generation for the same key is in flight in this worker -> await it
+   (the generation runs in a task the flight owns, so a caller that goes
+   away never cancels it for the others)
+3. Otherwise try to take the Redis lease for the key (SET NX PX)
+4. Lease taken -> generate, publish the result, release the lease
+5. Lease held by another worker -> subscribe and wait for its result,
+   falling back to generating locally on timeout or leader failure
+"""
+
+import asyncio
+import hashlib
+import json
+import logging
+import re
+import uuid
+from collections.abc import Awaitable, Callable
+from dataclasses import dataclass, field
+from typing import Any
+
+from .embedding_model import cosine_distance, generate_embedding
+from .redis_config import RedisDatabase, get_redis_client, get_redis_config
+
+logger = logging.getLogger(__name__)
+
+_WHITESPACE_RE = re.compile(r"\s+")
+
+
+@dataclass
+class _Flight:
+    """An in-flight generation owned by this worker."""
+
+    key: str
+    task: asyncio.Task
+    embedding: list[float] | None = None
+    followers: int = 0
+
+
+@dataclass
+class FlightResult:
+    """
+    Result of a single-flight execution.
+
+    Attributes:
+        value: The generated response
+        shared: True if this caller reused another caller's generation
+        source: "leader", "local" (same worker) or "remote" (other worker)
+    """
+
+    value: str
+    shared: bool = False
+    source: str = "leader"
+    metadata: dict[str, Any] = field(default_factory=dict)
+
+
+class LLMSingleFlight:
+    """
+    Coalesces concurrent identical LLM generations.
+
+    Example:
+        flight = get_llm_single_flight()
+        result = await flight.run(query, lambda: llm.generate(query))
+        if result.shared:
+            ...  # another request paid for this generation
+    """
+
+    LEASE_PREFIX = "semantic_cache:inflight:lease:"
+    RESULT_PREFIX = "semantic_cache:inflight:result:"
+    CHANNEL_PREFIX = "semantic_cache:inflight:done:"
+
+    # Only delete the lease if we still own it
+    RELEASE_SCRIPT = """
+    if redis.call("get", KEYS[1]) == ARGV[1] then
+      return redis.call("del", KEYS[1])
+    else
+      return 0
+    end
+    """
+
+    def __init__(
+        self,
+        lease_ttl_ms: int | None = None,
+        wait_timeout: float | None = None,
+        result_ttl: int = 10,
+        distributed: bool = True,
+    ):
+        """
+        Initialize single-flight coordinator.
+
+        Args:
+            lease_ttl_ms: Redis lease lifetime; bounds how long a crashed
+                leader can stall followers in other workers
+            wait_timeout: Max seconds a follower waits before generating itself
+            result_ttl: Seconds the published result stays readable, covering
+                followers that subscribe just after the notification
+            distributed: Whether to coordinate across workers through Redis
+        """
+        config = get_redis_config()
+
+        self.lease_ttl_ms = lease_ttl_ms or config.semantic_cache_singleflight_lease_ms
+        self.wait_timeout = wait_timeout or config.semantic_cache_singleflight_wait_s
+        self.result_ttl = result_ttl
+        self.distributed = distributed
+
+        self._flights: dict[str, _Flight] = {}
+        self._stats = {
+            "leaders": 0,
+            "local_followers": 0,
+            "remote_followers": 0,
+            "similar_followers": 0,
+            "remote_timeouts": 0,
+            "redis_errors": 0,
+        }
+
+    @staticmethod
+    def normalize(query: str) -> str:
+        """Normalize query text (case and whitespace insensitive)."""
+        return _WHITESPACE_RE.sub(" ", query.strip().lower())
+
+    def make_key(self, query: str) -> str:
+        """Hash the normalized query into a flight key."""
+        return hashlib.md5(self.normalize(query).encode("utf-8")).hexdigest()
+
+    @property
+    def in_flight(self) -> int:
+        """Number of generations currently in flight in this worker."""
+        return len(self._flights)
+
+    def get_stats(self) -> dict[str, Any]:
+        """Return coalescing counters for this worker."""
+        return {**self._stats, "in_flight": self.in_flight}
+
+    def _find_similar(self, embedding: list[float], threshold: float) -> _Flight | None:
+        """Find an in-flight generation whose query is within threshold."""
+        best: _Flight | None = None
+        best_distance = float("inf")
+
+        for flight in self._flights.values():
+            if flight.embedding is None:
+                continue
+            distance = cosine_distance(embedding, flight.embedding)
+            if distance <= threshold and distance < best_distance:
+                best, best_distance = flight, distance
+
+        return best
+
+    async def run(
+        self,
+        query: str,
+        producer: Callable[[], Awaitable[str]],
+        similarity_threshold: float | None = None,
+    ) -> FlightResult:
+        """
+        Run producer once per concurrent group of identical queries.
+
+        Args:
+            query: User's query (coalescing key after normalization)
+            producer: Zero-arg coroutine factory that performs the generation
+            similarity_threshold: If set, also join in-flight generations whose
+                query embedding is within this cosine distance
+
+        Returns:
+            FlightResult with the response and whether it was shared
+
+        Raises:
+            Whatever the producer raises (local followers share the failure)
+        """
+        key = self.make_key(query)
+
+        flight = self._flights.get(key)
+        if flight is not None:
+            self._stats["local_followers"] += 1
+            return await self._follow(flight, "local")
+
+        embedding: list[float] | None = None
+        if similarity_threshold is not None:
+            try:
+                embedding = generate_embedding(query)
+                flight = self._find_similar(embedding, similarity_threshold)
+            except Exception as e:
+                logger.warning(f"Near-duplicate coalescing unavailable: {e}")
+                flight = None
+
+            if flight is not None:
+                self._stats["similar_followers"] += 1
+                return await self._follow(flight, "similar")
+
+        task = asyncio.create_task(self._lead(key, producer))
+        self._flights[key] = _Flight(key=key, task=task, embedding=embedding)
+        task.add_done_callback(lambda t, k=key: self._release(k, t))
+        # A cancelled leader (e.g. client disconnect) must not cancel the
+        # generation its followers are waiting for
+        return await asyncio.shield(task)
+
+    def _release(self, key: str, task: asyncio.Task) -> None:
+        flight = self._flights.get(key)
+        if flight is not None and flight.task is task:
+            del self._flights[key]
+        if not task.cancelled():
+            # Mark the exception retrieved even if every caller went away
+            task.exception()
+
+    async def _follow(self, flight: _Flight, source: str) -> FlightResult:
+        """Wait on another caller's in-flight generation."""
+        flight.followers += 1
+        # shield: a cancelled follower must not cancel the shared generation
+        result = await asyncio.shield(flight.task)
+        return FlightResult(value=result.value, shared=True, source=source)
+
+    async def _lead(self, key: str, producer: Callable[[], Awaitable[str]]) -> FlightResult:
+        """Generate as the worker-local leader, coordinating with other workers."""
+        if not self.distributed:
+            self._stats["leaders"] += 1
+            return FlightResult(value=await producer())
+
+        client = None
+        token = uuid.uuid4().hex
+        lease_key = f"{self.LEASE_PREFIX}{key}"
+
+        try:
+            client = await get_redis_client(RedisDatabase.SEMANTIC_CACHE)
+            acquired = await client.set(lease_key, token, nx=True, px=self.lease_ttl_ms)
+        except Exception as e:
+            self._stats["redis_errors"] += 1
+            logger.debug(f"Single-flight lease unavailable, generating locally: {e}")
+            client = None
+            acquired = True
+
+        if not acquired:
+            remote = await self._wait_remote(client, key)
+            if remote is not None:
+                self._stats["remote_followers"] += 1
+                return FlightResult(value=remote, shared=True, source="remote")
+            # Leader timed out or failed; generate ourselves without a lease
+            client = None
+
+        self._stats["leaders"] += 1
+        try:
+            value = await producer()
+        except BaseException:
+            if client is not None:
+                await self._publish(client, key, lease_key, token, None)
+            raise
+
+        if client is not None:
+            await self._publish(client, key, lease_key, token, value)
+
+        return FlightResult(value=value)
+
+    async def _publish(
+        self,
+        client: Any,
+        key: str,
+        lease_key: str,
+        token: str,
+        value: str | None,
+    ) -> None:
+        """Publish the outcome to waiting workers and release the lease."""
+        try:
+            payload = self._encode(value)
+            if value is not None and payload is not None:
+                await client.set(f"{self.RESULT_PREFIX}{key}", payload, ex=self.result_ttl)
+            # Followers treat a failure payload as "generate yourself"
+            await client.publish(f"{self.CHANNEL_PREFIX}{key}", payload or self._encode(None))
+        except Exception as e:
+            self._stats["redis_errors"] += 1
+            logger.warning(f"Failed to publish single-flight result: {e}")
+        finally:
+            try:
+                # SECURITY NOTE: hardcoded script, compare-and-delete of our own lease
+                await client.eval(self.RELEASE_SCRIPT, 1, lease_key, token)
+            except Exception as e:
+                self._stats["redis_errors"] += 1
+                logger.warning(f"Failed to release single-flight lease: {e}")
+
+    @staticmethod
+    def _encode(value: Any) -> str | None:
+        """
+        Encode a result payload; None if the value cannot be serialized.
+
+        Non-string results (e.g. dicts from structured generations) are
+        serialized as JSON, anything else is stringified.
+        """
+        try:
+            return json.dumps({"ok": value is not None, "value": value}, default=str)
+        except (TypeError, ValueError) as e:
+            logger.warning(f"Single-flight result not serializable, not sharing it: {e}")
+            return None
+
+    async def _wait_remote(self, client: Any, key: str) -> str | None:
+        """
+        Wait for another worker's generation.
+
+        Returns:
+            The remote result, or None if the leader failed or timed out
+        """
+        channel = f"{self.CHANNEL_PREFIX}{key}"
+        pubsub = None
+
+        try:
+            pubsub = client.pubsub()
+            await pubsub.subscribe(channel)
+
+            # Result may have been published before we subscribed
+            cached = await client.get(f"{self.RESULT_PREFIX}{key}")
+            if cached:
+                return self._decode(cached)
+
+            loop = asyncio.get_running_loop()
+            deadline = loop.time() + self.wait_timeout
+            while (remaining := deadline - loop.time()) > 0:
+                message = await pubsub.get_message(
+                    ignore_subscribe_messages=True, timeout=min(remaining, 1.0)
+                )
+                if message is not None and message.get("type") == "message":
+                    return self._decode(message.get("data"))
+                # Leader died without publishing: lease expired, stop waiting
+                if not await client.exists(f"{self.LEASE_PREFIX}{key}"):
+                    cached = await client.get(f"{self.RESULT_PREFIX}{key}")
+                    return self._decode(cached) if cached else None
+
+            self._stats["remote_timeouts"] += 1
+            logger.info(f"Single-flight wait timed out after {self.wait_timeout}s")
+            return None
+
+        except Exception as e:
+            self._stats["redis_errors"] += 1
+            logger.warning(f"Single-flight remote wait failed: {e}")
+            return None
+
+        finally:
+            if pubsub is not None:
+                try:
+                    await pubsub.unsubscribe(channel)
+                    await pubsub.aclose()
+                except Exception:
+                    pass
+
+    @staticmethod
+    def _decode(raw: Any) -> str | None:
+        """Decode a published payload; None means the leader failed."""
+        if isinstance(raw, bytes):
+            raw = raw.decode("utf-8")
+        try:
+            payload = json.loads(raw)
+        except (TypeError, ValueError):
+            return None
+        return payload.get("value") if payload.get("ok") else None
+
+
+# Singleton instance
+_single_flight: LLMSingleFlight | None = None
+
+
+def get_llm_single_flight() -> LLMSingleFlight:
+    """Get singleton LLMSingleFlight instance (one per worker)."""
+    global _single_flight
+
+    if _single_flight is None:
+        _single_flight = LLMSingleFlight()
+    return _single_flight
+
+
+__all__ = [
+    "FlightResult",
+    "LLMSingleFlight",
+    "get_llm_single_flight",
+]
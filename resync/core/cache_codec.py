@@ -0,0 +1,350 @@
+"""
+Value codec for cache tiers that hold serialized values (L2, Redis).
+
+Features:
+- Compact binary serialization (msgpack, JSON fallback when msgpack is not
+  installed) that round-trips datetime, date, Decimal, UUID, tuple, set
+  and bytes instead of flattening them to strings
+- zstd compression above a size threshold (when zstandard is installed)
+- Authenticated encryption with AES-256-GCM or ChaCha20-Poly1305; every
+  blob names the key that sealed it, so keys can be rotated while old
+  entries are still readable
+- The cache key can be bound as associated data, so a ciphertext copied
+  under another key fails authentication
+
+Blob layout:
+    b"CV" | version | serializer | compression | cipher | header | payload
+
+    header (cipher != none): key id length (1 byte) | key id | nonce (12 bytes)
+    payload: serialized value, optionally compressed, then encrypted
+             (with a 16-byte tag); the bytes before it are authenticated
+
+Keys are configured with CACHE_ENCRYPTION_KEYS ("id:base64key,..." of
+32-byte keys) and CACHE_ENCRYPTION_ACTIVE_KEY (defaults to the first id).
+"""
+
+from __future__ import annotations
+
+import base64
+import datetime as dt
+import json
+import os
+import uuid
+from decimal import Decimal
+from enum import Enum
+from typing import Any
+
+from cryptography.exceptions import InvalidTag
+from cryptography.hazmat.primitives.ciphers.aead import AESGCM, ChaCha20Poly1305
+
+try:
+    import msgpack
+
+    MSGPACK_AVAILABLE = True
+except ImportError:
+    msgpack = None
+    MSGPACK_AVAILABLE = False
+
+try:
+    import zstandard
+
+    ZSTD_AVAILABLE = True
+except ImportError:
+    zstandard = None
+    ZSTD_AVAILABLE = False
+
+
+MAGIC = b"CV"
+VERSION = 1
+
+SERIALIZER_JSON = 0
+SERIALIZER_MSGPACK = 1
+
+COMPRESSION_NONE = 0
+COMPRESSION_ZSTD = 1
+
+CIPHER_NONE = 0
+CIPHER_AES_GCM = 1
+CIPHER_CHACHA20_POLY1305 = 2
+
+CIPHERS = {"aes-gcm": CIPHER_AES_GCM, "chacha20-poly1305": CIPHER_CHACHA20_POLY1305}
+_AEADS = {CIPHER_AES_GCM: AESGCM, CIPHER_CHACHA20_POLY1305: ChaCha20Poly1305}
+
+NONCE_SIZE = 12
+KEY_SIZE = 32
+
+# msgpack extension type codes
+_EXT_DATETIME = 1
+_EXT_DATE = 2
+_EXT_DECIMAL = 3
+_EXT_UUID = 4
+_EXT_TUPLE = 5
+_EXT_SET = 6
+_EXT_FROZENSET = 7
+
+
+class CacheCodecError(ValueError):
+    """Raised when a cache value cannot be encoded or decoded (or authenticated)."""
+
+
+def _packb(obj: Any) -> bytes:
+    return msgpack.packb(obj, default=_msgpack_default, use_bin_type=True, strict_types=True)
+
+
+def _msgpack_default(obj: Any) -> Any:
+    # strict_types sends tuples and subclasses of native types here
+    if isinstance(obj, tuple):
+        return msgpack.ExtType(_EXT_TUPLE, _packb(list(obj)))
+    if isinstance(obj, Enum):
+        return obj.value
+    if isinstance(obj, bool):
+        return bool(obj)
+    if isinstance(obj, int):
+        return int(obj)
+    if isinstance(obj, float):
+        return float(obj)
+    if isinstance(obj, str):
+        return str(obj)
+    if isinstance(obj, bytes | bytearray | memoryview):
+        return bytes(obj)
+    if isinstance(obj, dict):
+        return dict(obj)
+    if isinstance(obj, list):
+        return list(obj)
+    if isinstance(obj, dt.datetime):
+        return msgpack.ExtType(_EXT_DATETIME, obj.isoformat().encode())
+    if isinstance(obj, dt.date):
+        return msgpack.ExtType(_EXT_DATE, obj.isoformat().encode())
+    if isinstance(obj, Decimal):
+        return msgpack.ExtType(_EXT_DECIMAL, str(obj).encode())
+    if isinstance(obj, uuid.UUID):
+        return msgpack.ExtType(_EXT_UUID, obj.bytes)
+    if isinstance(obj, frozenset):
+        return msgpack.ExtType(_EXT_FROZENSET, _packb(list(obj)))
+    if isinstance(obj, set):
+        return msgpack.ExtType(_EXT_SET, _packb(list(obj)))
+    if hasattr(obj, "model_dump"):
+        return obj.model_dump()
+    return str(obj)
+
+
+def _msgpack_ext_hook(code: int, data: bytes) -> Any:
+    if code == _EXT_DATETIME:
+        return dt.datetime.fromisoformat(data.decode())
+    if code == _EXT_DATE:
+        return dt.date.fromisoformat(data.decode())
+    if code == _EXT_DECIMAL:
+        return Decimal(data.decode())
+    if code == _EXT_UUID:
+        return uuid.UUID(bytes=data)
+    if code == _EXT_TUPLE:
+        return tuple(_unpackb(data))
+    if code == _EXT_SET:
+        return set(_unpackb(data))
+    if code == _EXT_FROZENSET:
+        return frozenset(_unpackb(data))
+    return msgpack.ExtType(code, data)
+
+
+def _unpackb(payload: bytes) -> Any:
+    return msgpack.unpackb(
+        payload, raw=False, strict_map_key=False, ext_hook=_msgpack_ext_hook
+    )
+
+
+def _json_default(obj: Any) -> Any:
+    """Lossy fallback used only without msgpack (mirrors json.dumps(default=str))."""
+    if isinstance(obj, set | frozenset):
+        return sorted(obj, key=str)
+    if hasattr(obj, "model_dump"):
+        return obj.model_dump()
+    return str(obj)
+
+
+class CacheKeyring:
+    """
+    Encryption keys by id, with one active key for new values.
+
+    Rotation: add the new key, make it active, keep the old one until
+    entries sealed with it have expired, then drop it.
+    """
+
+    def __init__(self, keys: dict[str, bytes], active_key_id: str | None = None):
+        if not keys:
+            raise CacheCodecError("At least one cache encryption key is required")
+        for key_id, key in keys.items():
+            if len(key) != KEY_SIZE:
+                raise CacheCodecError(f"Cache encryption key {key_id!r} must be {KEY_SIZE} bytes")
+            if not 0 < len(key_id.encode()) < 256:
+                raise CacheCodecError(f"Invalid cache encryption key id {key_id!r}")
+        self.keys = dict(keys)
+        self.active_key_id = active_key_id or next(iter(keys))
+        if self.active_key_id not in self.keys:
+            raise CacheCodecError(f"Unknown active cache key id {self.active_key_id!r}")
+
+    @staticmethod
+    def generate_key() -> bytes:
+        """Generate a new 256-bit key."""
+        return os.urandom(KEY_SIZE)
+
+    @classmethod
+    def from_env(cls) -> CacheKeyring:
+        """Load keys from CACHE_ENCRYPTION_KEYS / CACHE_ENCRYPTION_ACTIVE_KEY."""
+        spec = os.getenv("CACHE_ENCRYPTION_KEYS", "")
+        keys: dict[str, bytes] = {}
+        for item in filter(None, (part.strip() for part in spec.split(","))):
+            key_id, _, encoded = item.partition(":")
+            try:
+                keys[key_id] = base64.b64decode(encoded, validate=True)
+            except ValueError as e:
+                raise CacheCodecError(f"Invalid base64 for cache key {key_id!r}") from e
+        if not keys:
+            raise CacheCodecError(
+                "CACHE_ENCRYPTION_KEYS is not set. Provide 'id:base64key' entries of "
+                f"{KEY_SIZE}-byte keys to enable cache encryption."
+            )
+        return cls(keys, os.getenv("CACHE_ENCRYPTION_ACTIVE_KEY") or None)
+
+
+class CacheValueCodec:
+    """
+    Encode/decode cache values into self-describing (optionally sealed) blobs.
+
+    Without a keyring values are only serialized and compressed.
+    """
+
+    def __init__(
+        self,
+        keyring: CacheKeyring | None = None,
+        cipher: str = "aes-gcm",
+        compress_threshold: int = 1024,
+        compression_level: int = 3,
+    ):
+        if cipher not in CIPHERS:
+            raise CacheCodecError(f"Unknown cache cipher {cipher!r}")
+        self.keyring = keyring
+        self.cipher = CIPHERS[cipher]
+        self.compress_threshold = compress_threshold
+        self._aeads: dict[tuple[int, str], Any] = {}
+        self._compressor = (
+            zstandard.ZstdCompressor(level=compression_level) if ZSTD_AVAILABLE else None
+        )
+        self._decompressor = zstandard.ZstdDecompressor() if ZSTD_AVAILABLE else None
+
+    @property
+    def encrypted(self) -> bool:
+        return self.keyring is not None
+
+    def _aead(self, cipher: int, key_id: str) -> Any:
+        aead = self._aeads.get((cipher, key_id))
+        if aead is None:
+            try:
+                key = self.keyring.keys[key_id]
+            except (AttributeError, KeyError) as e:
+                raise CacheCodecError(f"Unknown cache encryption key id {key_id!r}") from e
+            aead = self._aeads[(cipher, key_id)] = _AEADS[cipher](key)
+        return aead
+
+    def encode(self, value: Any, associated_data: bytes = b"") -> bytes:
+        """
+        Encode a value.
+
+        Args:
+            value: Value to store
+            associated_data: Authenticated but not stored (e.g. the cache key)
+
+        Returns:
+            Blob for the serialized tier
+        """
+        try:
+            if MSGPACK_AVAILABLE:
+                serializer, payload = SERIALIZER_MSGPACK, _packb(value)
+            else:
+                serializer = SERIALIZER_JSON
+                payload = json.dumps(value, default=_json_default, ensure_ascii=False).encode()
+        except (TypeError, ValueError, OverflowError) as e:
+            raise CacheCodecError(f"Cannot serialize {type(value).__name__}: {e}") from e
+
+        compression = COMPRESSION_NONE
+        if self._compressor is not None and len(payload) > self.compress_threshold:
+            compressed = self._compressor.compress(payload)
+            if len(compressed) < len(payload):
+                compression, payload = COMPRESSION_ZSTD, compressed
+
+        if self.keyring is None:
+            return MAGIC + bytes((VERSION, serializer, compression, CIPHER_NONE)) + payload
+
+        key_id = self.keyring.active_key_id.encode()
+        nonce = os.urandom(NONCE_SIZE)
+        header = (
+            MAGIC
+            + bytes((VERSION, serializer, compression, self.cipher, len(key_id)))
+            + key_id
+            + nonce
+        )
+        sealed = self._aead(self.cipher, self.keyring.active_key_id).encrypt(
+            nonce, payload, header + associated_data
+        )
+        return header + sealed
+
+    def decode(self, blob: bytes, associated_data: bytes = b"") -> Any:
+        """Decode a blob produced by encode() (verifying it when sealed)."""
+        if not isinstance(blob, bytes | bytearray | memoryview):
+            raise CacheCodecError(f"Expected bytes, got {type(blob).__name__}")
+        blob = bytes(blob)
+        if len(blob) < 6 or blob[:2] != MAGIC:
+            raise CacheCodecError("Not a cache value blob")
+        version, serializer, compression, cipher = blob[2], blob[3], blob[4], blob[5]
+        if version != VERSION:
+            raise CacheCodecError(f"Unsupported cache value version {version}")
+
+        if cipher == CIPHER_NONE:
+            if self.keyring is not None:
+                raise CacheCodecError("Refusing an unencrypted value in an encrypted cache")
+            payload = blob[6:]
+        elif cipher in _AEADS:
+            key_id_end = 7 + blob[6]
+            nonce_end = key_id_end + NONCE_SIZE
+            key_id = blob[7:key_id_end].decode()
+            header, nonce = blob[:nonce_end], blob[key_id_end:nonce_end]
+            try:
+                payload = self._aead(cipher, key_id).decrypt(
+                    nonce, blob[nonce_end:], header + associated_data
+                )
+            except InvalidTag as e:
+                raise CacheCodecError("Cache value failed authentication") from e
+        else:
+            raise CacheCodecError(f"Unknown cache cipher id {cipher}")
+
+        if compression == COMPRESSION_ZSTD:
+            if self._decompressor is None:
+                raise CacheCodecError("zstandard is required to decode this cache value")
+            try:
+                payload = self._decompressor.decompress(payload)
+            except zstandard.ZstdError as e:
+                raise CacheCodecError(f"Corrupt compressed cache value: {e}") from e
+        elif compression != COMPRESSION_NONE:
+            raise CacheCodecError(f"Unknown compression id {compression}")
+
+        try:
+            if serializer == SERIALIZER_MSGPACK:
+                if not MSGPACK_AVAILABLE:
+                    raise CacheCodecError("msgpack is required to decode this cache value")
+                return _unpackb(payload)
+            if serializer == SERIALIZER_JSON:
+                return json.loads(payload)
+        except (TypeError, ValueError) as e:
+            raise CacheCodecError(f"Corrupt cache value: {e}") from e
+        raise CacheCodecError(f"Unknown serializer id {serializer}")
+
+    def key_id_of(self, blob: bytes) -> str | None:
+        """Key id that sealed a blob (None when unencrypted)."""
+        if len(blob) < 7 or blob[5] == CIPHER_NONE:
+            return None
+        return bytes(blob[7 : 7 + blob[6]]).decode()
+
+    def needs_reencryption(self, blob: bytes) -> bool:
+        """True when a blob was sealed with a key other than the active one."""
+        if self.keyring is None:
+            return False
+        return self.key_id_of(blob) != self.keyring.active_key_id
@@ -0,0 +1,474 @@
+"""
+Event-driven, tag-based cache invalidation.
+
+Cached TWS state (API cache, dependency graphs, semantic-cache answers) is
+tagged with the TWS objects it depends on. TWSBackgroundPoller publishes
+job and workstation change events on the EventBus; the CacheInvalidator
+turns each event into tags and evicts exactly the entries that carry them,
+so freshness no longer depends on short TTLs.
+
+Tags:
+- job:<job id or name>
+- jobstream:<job stream name>
+- workstation:<workstation name>
+- plan:jobs (any job list/query result; evicted on every job event)
+
+Shared caches keep the same kind of index in Redis (RedisTagIndex): one
+set per tag, per ":" key prefix and per dependency, so invalidation by tag
+or prefix is SMEMBERS + UNLINK instead of a SCAN over the keyspace.
+
+Usage:
+    index = TagIndex()
+    index.add("job_status:123", job_payload_tags("123", payload))
+    keys = index.pop_keys(["job:123"])  # keys to evict
+
+    invalidator = init_cache_invalidator(event_bus)  # wires default targets
+"""
+
+import re
+from collections.abc import Iterable
+from typing import Any, Protocol
+
+import structlog
+
+logger = structlog.get_logger(__name__)
+
+PLAN_JOBS_TAG = "plan:jobs"
+
+# Events that change the state cached entries depend on
+JOB_INVALIDATING_EVENTS = frozenset(
+    {"job_started", "job_completed", "job_abend", "job_rerun"}
+)
+WORKSTATION_INVALIDATING_EVENTS = frozenset(
+    {"workstation_online", "workstation_offline", "workstation_linked", "workstation_unlinked"}
+)
+
+# TWS object names as they appear in free text (JOB_XPTO, PAYROLL#DAILY)
+_ENTITY_RE = re.compile(r"\b[A-Z][A-Z0-9_#@$-]{2,}\b")
+
+_JOB_ID_FIELDS = ("id", "jobId", "job_id")
+_JOB_NAME_FIELDS = ("name", "jobName", "job_name")
+_JOBSTREAM_FIELDS = ("jobStream", "jobStreamName", "job_stream", "stream")
+_WORKSTATION_FIELDS = ("workstation", "workstationName", "workstation_name")
+
+
+def job_tag(job: str) -> str:
+    """Tag for a job id or name."""
+    return f"job:{job}"
+
+
+def jobstream_tag(name: str) -> str:
+    """Tag for a job stream."""
+    return f"jobstream:{name}"
+
+
+def workstation_tag(name: str) -> str:
+    """Tag for a workstation."""
+    return f"workstation:{name}"
+
+
+def _first(data: dict[str, Any], fields: tuple[str, ...]) -> str | None:
+    for field_name in fields:
+        value = data.get(field_name)
+        if value:
+            return value if isinstance(value, str) else str(value)
+    return None
+
+
+def job_payload_tags(job_id: str | None, payload: Any = None) -> list[str]:
+    """
+    Tags of a cached job object.
+
+    Args:
+        job_id: Job id used to look the job up
+        payload: TWS job dict (jobStream/workstation/name are tagged too)
+
+    Returns:
+        Deduplicated tags, job tag first
+    """
+    tags = [job_tag(job_id)] if job_id else []
+    if isinstance(payload, dict):
+        for fields, make_tag in (
+            (_JOB_ID_FIELDS, job_tag),
+            (_JOB_NAME_FIELDS, job_tag),
+            (_JOBSTREAM_FIELDS, jobstream_tag),
+            (_WORKSTATION_FIELDS, workstation_tag),
+        ):
+            value = _first(payload, fields)
+            if value:
+                tags.append(make_tag(value))
+    return list(dict.fromkeys(tags))
+
+
+def entity_tags(text: str) -> list[str]:
+    """
+    Job tags for TWS object names mentioned in free text.
+
+    Used to tag semantic-cache answers ("why did JOB_XPTO abend?") so they
+    are evicted when that job changes state.
+    """
+    return list(dict.fromkeys(job_tag(name) for name in _ENTITY_RE.findall(text)))
+
+
+def tags_for_event(event_data: dict[str, Any]) -> list[str]:
+    """
+    Tags invalidated by an EventBus event (TWSEvent.to_dict()).
+
+    Returns:
+        Tags to evict, empty for events that do not change cached state
+    """
+    event_type = str(event_data.get("event_type", ""))
+    details = event_data.get("details") or {}
+
+    if event_type in JOB_INVALIDATING_EVENTS:
+        job = details.get("job") or {}
+        tags = job_payload_tags(_first(job, _JOB_ID_FIELDS), job)
+        if event_data.get("source"):
+            tags.append(job_tag(event_data["source"]))
+        tags.append(PLAN_JOBS_TAG)
+        return list(dict.fromkeys(tags))
+
+    if event_type in WORKSTATION_INVALIDATING_EVENTS:
+        workstation = details.get("workstation") or {}
+        name = workstation.get("name") or event_data.get("source")
+        return [workstation_tag(name)] if name else []
+
+    return []
+
+
+class TagIndex:
+    """
+    In-process tag -> keys index.
+
+    Keeps both directions so an evicted or expired key can be dropped from
+    every tag it was filed under.
+    """
+
+    def __init__(self) -> None:
+        self._keys_by_tag: dict[str, set[str]] = {}
+        self._tags_by_key: dict[str, set[str]] = {}
+
+    def add(self, key: str, tags: Iterable[str]) -> None:
+        """File a key under tags (replacing its previous tags)."""
+        self.discard(key)
+        tags = set(tags)
+        if not tags:
+            return
+        self._tags_by_key[key] = tags
+        for tag in tags:
+            self._keys_by_tag.setdefault(tag, set()).add(key)
+
+    def discard(self, key: str) -> None:
+        """Forget a key."""
+        for tag in self._tags_by_key.pop(key, ()):
+            keys = self._keys_by_tag.get(tag)
+            if keys is not None:
+                keys.discard(key)
+                if not keys:
+                    del self._keys_by_tag[tag]
+
+    def keys_for(self, tags: Iterable[str]) -> set[str]:
+        """Keys filed under any of the tags."""
+        keys: set[str] = set()
+        for tag in tags:
+            keys |= self._keys_by_tag.get(tag, set())
+        return keys
+
+    def tags_for(self, key: str) -> set[str]:
+        """Tags of a key."""
+        return set(self._tags_by_key.get(key, ()))
+
+    def pop_keys(self, tags: Iterable[str]) -> set[str]:
+        """Keys filed under any of the tags, removed from the index."""
+        keys = self.keys_for(tags)
+        for key in keys:
+            self.discard(key)
+        return keys
+
+    def clear(self) -> None:
+        """Forget everything."""
+        self._keys_by_tag.clear()
+        self._tags_by_key.clear()
+
+    def __len__(self) -> int:
+        return len(self._tags_by_key)
+
+
+# Redis index keys (tag/prefix/dependency -> data keys, data key -> index sets)
+INDEX_KEY_PREFIX = "cache:idx:"
+TAG_INDEX_PREFIX = INDEX_KEY_PREFIX + "tag:"
+PREFIX_INDEX_PREFIX = INDEX_KEY_PREFIX + "prefix:"
+DEPENDENTS_INDEX_PREFIX = INDEX_KEY_PREFIX + "deps:"
+KEY_INDEXES_PREFIX = INDEX_KEY_PREFIX + "key:"
+
+_GLOB_CHARS = frozenset("*?[\\")
+
+
+def key_prefixes(key: str, max_depth: int = 3) -> list[str]:
+    """
+    Indexed prefixes of a key: each ":"-terminated leading segment.
+
+    "tws:jobs:J1" -> ["tws:", "tws:jobs:"]
+    """
+    prefixes = []
+    end = key.find(":")
+    while end != -1 and len(prefixes) < max_depth:
+        prefixes.append(key[: end + 1])
+        end = key.find(":", end + 1)
+    return prefixes
+
+
+def glob_prefix(pattern: str) -> str | None:
+    """
+    The indexed prefix a glob pattern selects, if it is a plain prefix match.
+
+    "tws:jobs:*" -> "tws:jobs:"; "tws:job_*" and "*:J1" -> None
+    """
+    if not pattern.endswith("*"):
+        return None
+    prefix = pattern[:-1]
+    if not prefix.endswith(":") or _GLOB_CHARS & set(prefix):
+        return None
+    return prefix
+
+
+class RedisTagIndex:
+    """
+    Tag, prefix and dependency index kept in Redis next to the entries.
+
+    Every indexed key is filed in a Redis set per tag, per ":" prefix and
+    per key it depends on, and the key's own set lists those index sets.
+    Index sets expire with their longest-lived member, so expired entries
+    only leave members behind until the set itself expires; invalidating
+    an already-expired key is a no-op UNLINK.
+
+    Lookups are SMEMBERS on the index sets and deletion is a pipelined
+    UNLINK in chunks of ``batch_size``, instead of SCAN over the keyspace.
+    The client must decode responses to str.
+    """
+
+    def __init__(self, redis_client: Any, batch_size: int = 500, max_prefix_depth: int = 3):
+        self.redis = redis_client
+        self.batch_size = batch_size
+        self.max_prefix_depth = max_prefix_depth
+
+    def index_sets(
+        self, key: str, tags: Iterable[str] = (), dependencies: Iterable[str] = ()
+    ) -> list[str]:
+        """Index sets a key is filed under."""
+        return (
+            [TAG_INDEX_PREFIX + tag for tag in tags]
+            + [PREFIX_INDEX_PREFIX + prefix for prefix in key_prefixes(key, self.max_prefix_depth)]
+            + [DEPENDENTS_INDEX_PREFIX + dep for dep in dependencies]
+        )
+
+    def record(
+        self,
+        pipe: Any,
+        key: str,
+        ttl: int,
+        tags: Iterable[str] = (),
+        dependencies: Iterable[str] = (),
+    ) -> None:
+        """
+        Queue the index updates for a key on the caller's pipeline.
+
+        Run in the same MULTI as the SET so the entry and its index entries
+        are written together.
+        """
+        sets = self.index_sets(key, tags, dependencies)
+        if not sets:
+            return
+        own = KEY_INDEXES_PREFIX + key
+        pipe.sadd(own, *sets)
+        for index_key in sets:
+            pipe.sadd(index_key, key)
+        for index_key in (own, *sets):
+            # Extend to the longest-lived member, never shorten
+            pipe.expire(index_key, ttl, nx=True)
+            pipe.expire(index_key, ttl, gt=True)
+
+    async def _members(self, index_keys: list[str]) -> list[set[str]]:
+        if not index_keys:
+            return []
+        pipe = self.redis.pipeline(transaction=False)
+        for index_key in index_keys:
+            pipe.smembers(index_key)
+        return [set(members) for members in await pipe.execute()]
+
+    async def keys_for_tags(self, tags: Iterable[str]) -> set[str]:
+        """Keys filed under any of the tags."""
+        return set().union(*await self._members([TAG_INDEX_PREFIX + tag for tag in tags]))
+
+    async def keys_for_prefix(self, prefix: str) -> set[str]:
+        """Keys under a ":"-terminated prefix (see key_prefixes)."""
+        return set().union(*await self._members([PREFIX_INDEX_PREFIX + prefix]))
+
+    async def dependents(self, keys: Iterable[str]) -> set[str]:
+        """Keys depending on any of the keys, transitively (one round trip per level)."""
+        found: set[str] = set()
+        frontier = set(keys)
+        visited = set(frontier)
+        while frontier:
+            members = await self._members([DEPENDENTS_INDEX_PREFIX + key for key in frontier])
+            frontier = set().union(*members) - visited
+            visited |= frontier
+            found |= frontier
+        return found
+
+    async def unlink(self, keys: Iterable[str], drop_sets: Iterable[str] = ()) -> set[str]:
+        """
+        UNLINK keys and remove them from every index set they were filed in.
+
+        Args:
+            keys: Data keys to delete
+            drop_sets: Index sets to delete outright (e.g. the invalidated tag)
+
+        Returns:
+            Keys that existed in Redis
+        """
+        keys = list(dict.fromkeys(keys))
+        unlinked: set[str] = set()
+        for start in range(0, len(keys), self.batch_size):
+            chunk = keys[start : start + self.batch_size]
+            owners = await self._members([KEY_INDEXES_PREFIX + key for key in chunk])
+            pipe = self.redis.pipeline(transaction=False)
+            for key in chunk:
+                pipe.unlink(key)
+            for key, index_keys in zip(chunk, owners, strict=True):
+                for index_key in index_keys:
+                    pipe.srem(index_key, key)
+            pipe.unlink(*(KEY_INDEXES_PREFIX + key for key in chunk))
+            results = await pipe.execute()
+            unlinked.update(key for key, removed in zip(chunk, results, strict=False) if removed)
+        drop_sets = list(drop_sets)
+        if drop_sets:
+            await self.redis.unlink(*drop_sets)
+        return unlinked
+
+
+class InvalidationTarget(Protocol):
+    """A cache that can evict its entries by tag."""
+
+    async def invalidate_tags(self, tags: list[str]) -> int: ...
+
+
+class CacheInvalidator:
+    """
+    Evicts tagged cache entries when TWS change events arrive.
+
+    Subscribes to the EventBus (job and workstation events) and forwards the
+    tags of every state-changing event to each registered target.
+    """
+
+    SUBSCRIBER_ID = "cache_invalidator"
+
+    def __init__(self) -> None:
+        self._targets: dict[str, InvalidationTarget] = {}
+        self._event_bus: Any | None = None
+        self._stats = {"events": 0, "invalidations": 0, "evicted": 0, "errors": 0}
+
+    def register(self, name: str, target: InvalidationTarget) -> None:
+        """Register a cache to invalidate."""
+        self._targets[name] = target
+
+    @property
+    def targets(self) -> list[str]:
+        """Registered target names."""
+        return list(self._targets)
+
+    def attach(self, event_bus: Any) -> None:
+        """Subscribe to job and workstation events of an EventBus."""
+        from resync.core.event_bus import SubscriptionType
+
+        self.detach()
+        event_bus.subscribe(
+            self.SUBSCRIBER_ID,
+            self.handle_event,
+            {SubscriptionType.JOBS, SubscriptionType.WORKSTATIONS},
+        )
+        self._event_bus = event_bus
+
+    def detach(self) -> None:
+        """Unsubscribe from the EventBus."""
+        if self._event_bus is not None:
+            self._event_bus.unsubscribe(self.SUBSCRIBER_ID)
+            self._event_bus = None
+
+    async def handle_event(self, event_data: dict[str, Any]) -> dict[str, int]:
+        """EventBus callback: evict everything tagged by the event."""
+        self._stats["events"] += 1
+        tags = tags_for_event(event_data)
+        if not tags:
+            return {}
+        return await self.invalidate_tags(tags)
+
+    async def invalidate_tags(self, tags: list[str]) -> dict[str, int]:
+        """
+        Evict entries carrying any of the tags from every target.
+
+        Returns:
+            Number of entries evicted per target
+        """
+        self._stats["invalidations"] += 1
+        evicted: dict[str, int] = {}
+        for name, target in self._targets.items():
+            try:
+                evicted[name] = await target.invalidate_tags(tags)
+            except Exception as e:
+                self._stats["errors"] += 1
+                logger.warning("tag_invalidation_failed", target=name, error=str(e))
+                evicted[name] = 0
+        self._stats["evicted"] += sum(evicted.values())
+        logger.debug("cache_tags_invalidated", tags=tags, evicted=evicted)
+        return evicted
+
+    def get_stats(self) -> dict[str, Any]:
+        """Get invalidation statistics."""
+        return {**self._stats, "targets": self.targets, "attached": self._event_bus is not None}
+
+
+class _SemanticCacheTarget:
+    """Resolves the semantic cache singleton lazily (it connects to Redis)."""
+
+    async def invalidate_tags(self, tags: list[str]) -> int:
+        from resync.core.cache.semantic_cache import get_semantic_cache
+
+        cache = await get_semantic_cache()
+        return await cache.invalidate_tags(tags)
+
+
+_invalidator: CacheInvalidator | None = None
+
+
+def get_cache_invalidator() -> CacheInvalidator | None:
+    """Get the singleton invalidator (None until initialized)."""
+    return _invalidator
+
+
+def init_cache_invalidator(event_bus: Any | None = None) -> CacheInvalidator:
+    """
+    Create the singleton invalidator with the default targets.
+
+    Targets: TWS API cache, TWS graph cache and the semantic cache.
+
+    Args:
+        event_bus: EventBus to subscribe to (optional)
+    """
+    global _invalidator
+
+    from resync.services.tws_cache import get_tws_cache
+    from resync.services.tws_graph_service import get_graph_service
+
+    if _invalidator is not None:
+        _invalidator.detach()
+
+    _invalidator = CacheInvalidator()
+    _invalidator.register("tws_api", get_tws_cache())
+    _invalidator.register("tws_graph", get_graph_service())
+    _invalidator.register("semantic", _SemanticCacheTarget())
+    if event_bus is not None:
+        _invalidator.attach(event_bus)
+
+    logger.info("cache_invalidator_initialized", targets=_invalidator.targets)
+    return _invalidator
@@ -18,6 +18,8 @@ from dataclasses import dataclass, field
 from datetime import datetime
 from typing import Any, Callable
 
+from resync.core.cache_invalidation import RedisTagIndex
+
 logger = logging.getLogger(__name__)
 
 
@@ -143,10 +145,14 @@ class EnhancedCacheManager:
             else:
                 data = fetcher()
 
-            # Armazenar no cache
+            # Armazenar no cache, registrando a chave no índice de prefixos
+            # (RedisCacheManager.clear_pattern limpa "tws:*" sem SCAN)
             import json
 
-            await self.redis.setex(key, 3600, json.dumps(data))  # TTL: 1 hora
+            pipe = self.redis.pipeline(transaction=True)
+            pipe.set(key, json.dumps(data), ex=3600)  # TTL: 1 hora
+            RedisTagIndex(self.redis).record(pipe, key, 3600)
+            await pipe.execute()
 
             logger.debug(f"Cache warmed: {key}")
 
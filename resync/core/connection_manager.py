@@ -27,13 +27,15 @@ class ConnectionManager:
             self._pool_manager = await get_websocket_pool_manager()
         return self._pool_manager
 
-    async def connect(self, websocket: WebSocket, client_id: str) -> None:
+    async def connect(
+        self, websocket: WebSocket, client_id: str, topics: list[str] | None = None
+    ) -> None:
         """
         Accepts a new WebSocket connection and adds it to the active list.
         Integrates with the WebSocket pool manager for enhanced monitoring.
         """
         pool_manager = await self._get_pool_manager()
-        await pool_manager.connect(websocket, client_id)
+        await pool_manager.connect(websocket, client_id, topics=topics)
 
         # Maintain backward compatibility with existing dictionary
         self.active_connections[client_id] = websocket
@@ -54,6 +56,19 @@ class ConnectionManager:
             logger.info("WebSocket connection closed: %s", client_id)
             logger.info("Total active connections: %d", len(self.active_connections))
 
+    async def subscribe(self, client_id: str, topics: list[str]) -> set[str]:
+        """
+        Subscribes a client to broadcast topics (e.g. ``job:<name>``).
+        Returns the client's current topics.
+        """
+        pool_manager = await self._get_pool_manager()
+        return pool_manager.subscribe(client_id, topics)
+
+    async def unsubscribe(self, client_id: str, topics: list[str] | None = None) -> set[str]:
+        """Unsubscribes a client from topics (all topics when None)."""
+        pool_manager = await self._get_pool_manager()
+        return pool_manager.unsubscribe(client_id, topics)
+
     async def send_personal_message(self, message: str, client_id: str) -> None:
         """
         Sends a message to a specific client.
@@ -111,14 +126,19 @@ class ConnectionManager:
                 # Log error but don't stop broadcasting to other clients
                 logger.error("Unexpected error during broadcast.", exc_info=True)
 
-    async def broadcast_json(self, data: dict[str, Any]) -> None:
+    async def broadcast_json(
+        self, data: dict[str, Any], topic: str | None = None, key: str | None = None
+    ) -> None:
         """
-        Sends a JSON payload to all connected clients.
-        Uses the WebSocket pool manager for enhanced broadcasting.
+        Sends a JSON payload to all connected clients, or to the subscribers
+        of ``topic``. The payload is serialized once by the pool manager;
+        ``key`` lets slow clients receive only the latest state per key.
         """
         # Use pool manager for enhanced JSON broadcasting with monitoring
         if self._pool_manager and self._pool_manager.connections:
-            successful_sends = await self._pool_manager.broadcast_json(data)
+            successful_sends = await self._pool_manager.broadcast_json(
+                data, topic=topic, key=key
+            )
             logger.info(
                 "json_broadcast_completed",
                 successful_sends=successful_sends,
@@ -170,6 +190,10 @@ class ConnectionManager:
                 "total_messages_received": stats.total_messages_received,
                 "connection_errors": stats.connection_errors,
                 "cleanup_cycles": stats.cleanup_cycles,
+                "broadcasts": stats.broadcasts,
+                "frames_dropped": stats.frames_dropped,
+                "frames_coalesced": stats.frames_coalesced,
+                "slow_consumer_disconnects": stats.slow_consumer_disconnects,
                 "last_cleanup": (stats.last_cleanup.isoformat() if stats.last_cleanup else None),
             }
         # Fallback to basic stats if pool manager not available
@@ -35,16 +35,24 @@ class BaseRepository(Generic[ModelT]):
                 super().__init__(TWSJobStatus, session_factory)
     """
 
-    def __init__(self, model: type[ModelT], session_factory: async_sessionmaker | None = None):
+    def __init__(
+        self,
+        model: type[ModelT],
+        session_factory: async_sessionmaker | None = None,
+        query_cache: Any | None = None,
+    ):
         """
         Initialize repository.
 
         Args:
             model: SQLAlchemy model class
             session_factory: Optional session factory (uses default if not provided)
+            query_cache: Optional QueryCacheManager serving execute_cached reads;
+                writes through this repository invalidate the model's table
         """
         self.model = model
         self._session_factory = session_factory
+        self._query_cache = query_cache
         self._initialized = False
 
     @asynccontextmanager
@@ -57,6 +65,35 @@ class BaseRepository(Generic[ModelT]):
             async with get_session() as session:
                 yield session
 
+    def _invalidate_cache(self) -> None:
+        """Drop cached results that read this repository's table."""
+        if self._query_cache is not None:
+            self._query_cache.invalidate_table(self.model.__tablename__)
+
+    async def execute_cached(
+        self, statement: Any, params: dict[str, Any] | None = None, ttl: int | None = None
+    ) -> list[dict[str, Any]]:
+        """
+        Execute a read through the query cache.
+
+        Args:
+            statement: SQLAlchemy select or SQL string
+            params: Optional query parameters
+            ttl: Optional TTL override in seconds
+
+        Returns:
+            List of result dictionaries (executed directly without a query cache)
+        """
+        if self._query_cache is not None:
+            result = await self._query_cache.execute_query(statement, params, ttl_override=ttl)
+            return result.data
+
+        if isinstance(statement, str):
+            statement = text(statement)
+        async with self._get_session() as session:
+            result = await session.execute(statement, params or None)
+            return [dict(row) for row in result.mappings().all()]
+
     async def create(self, **kwargs) -> ModelT:
         """
         Create a new record.
@@ -71,6 +108,7 @@ class BaseRepository(Generic[ModelT]):
             instance = self.model(**kwargs)
             session.add(instance)
             await session.commit()
+            self._invalidate_cache()
             await session.refresh(instance)
             return instance
 
@@ -88,6 +126,7 @@ class BaseRepository(Generic[ModelT]):
             instances = [self.model(**item) for item in items]
             session.add_all(instances)
             await session.commit()
+            self._invalidate_cache()
             for instance in instances:
                 await session.refresh(instance)
             return instances
@@ -202,6 +241,7 @@ class BaseRepository(Generic[ModelT]):
                 update(self.model).where(self.model.id == id).values(**kwargs).returning(self.model)
             )
             await session.commit()
+            self._invalidate_cache()
             return result.scalar_one_or_none()
 
     async def update_many(self, filters: dict[str, Any], values: dict[str, Any]) -> int:
@@ -228,6 +268,7 @@ class BaseRepository(Generic[ModelT]):
                 update(self.model).where(and_(*conditions)).values(**values)
             )
             await session.commit()
+            self._invalidate_cache()
             return result.rowcount
 
     async def delete(self, id: int) -> bool:
@@ -243,6 +284,7 @@ class BaseRepository(Generic[ModelT]):
         async with self._get_session() as session:
             result = await session.execute(delete(self.model).where(self.model.id == id))
             await session.commit()
+            self._invalidate_cache()
             return result.rowcount > 0
 
     async def delete_many(self, filters: dict[str, Any]) -> int:
@@ -266,6 +308,7 @@ class BaseRepository(Generic[ModelT]):
 
             result = await session.execute(delete(self.model).where(and_(*conditions)))
             await session.commit()
+            self._invalidate_cache()
             return result.rowcount
 
     async def count(self, filters: dict[str, Any] | None = None) -> int:
@@ -425,4 +468,5 @@ class TimestampedRepository(BaseRepository[ModelT]):
             ts_field = getattr(self.model, timestamp_field)
             result = await session.execute(delete(self.model).where(ts_field < cutoff))
             await session.commit()
+            self._invalidate_cache()
             return result.rowcount
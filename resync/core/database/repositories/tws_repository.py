@@ -109,8 +109,10 @@ class TWSSnapshotRepository(TimestampedRepository[TWSSnapshot]):
 class TWSJobStatusRepository(TimestampedRepository[TWSJobStatus]):
     """Repository for TWS job status records."""
 
-    def __init__(self, session_factory: async_sessionmaker | None = None):
-        super().__init__(TWSJobStatus, session_factory)
+    def __init__(
+        self, session_factory: async_sessionmaker | None = None, query_cache: Any | None = None
+    ):
+        super().__init__(TWSJobStatus, session_factory, query_cache)
 
     async def upsert_job_status(self, job: JobStatus) -> TWSJobStatus:
         """Insert or update job status."""
@@ -154,6 +156,7 @@ class TWSJobStatusRepository(TimestampedRepository[TWSJobStatus]):
                 session.add(record)
 
             await session.commit()
+            self._invalidate_cache()
             await session.refresh(record)
             return record
 
@@ -186,14 +189,12 @@ class TWSJobStatusRepository(TimestampedRepository[TWSJobStatus]):
         )
 
     async def get_status_summary(self) -> dict[str, int]:
-        """Get count by status."""
-        async with self._get_session() as session:
-            result = await session.execute(
-                select(TWSJobStatus.status, func.count(TWSJobStatus.id)).group_by(
-                    TWSJobStatus.status
-                )
-            )
-            return {row[0]: row[1] for row in result.all()}
+        """Get count by status (served from the query cache when one is attached)."""
+        query = select(TWSJobStatus.status, func.count(TWSJobStatus.id).label("count")).group_by(
+            TWSJobStatus.status
+        )
+        rows = await self.execute_cached(query)
+        return {row["status"]: row["count"] for row in rows}
 
 
 class TWSEventRepository(TimestampedRepository[TWSEvent]):
@@ -385,9 +386,11 @@ class TWSStore:
     tws_status_store.py but backed by PostgreSQL.
     """
 
-    def __init__(self, session_factory: async_sessionmaker | None = None):
+    def __init__(
+        self, session_factory: async_sessionmaker | None = None, query_cache: Any | None = None
+    ):
         self.snapshots = TWSSnapshotRepository(session_factory)
-        self.jobs = TWSJobStatusRepository(session_factory)
+        self.jobs = TWSJobStatusRepository(session_factory, query_cache)
         self.events = TWSEventRepository(session_factory)
         self.patterns = TWSPatternRepository(session_factory)
         self.solutions = TWSProblemSolutionRepository(session_factory)
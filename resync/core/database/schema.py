@@ -79,6 +79,25 @@ async def create_tables(engine: AsyncEngine | None = None) -> None:
     logger.info("Database tables created")
 
 
+async def create_change_triggers(engine: AsyncEngine | None = None) -> None:
+    """
+    Install the NOTIFY triggers feeding the query cache.
+
+    Args:
+        engine: Optional SQLAlchemy async engine. Uses default if not provided.
+    """
+    from resync.core.cache.query_cache import CACHED_TABLES, change_trigger_statements
+
+    if engine is None:
+        engine = get_engine()
+
+    async with engine.begin() as conn:
+        for statement in change_trigger_statements(CACHED_TABLES):
+            await conn.execute(text(statement))
+
+    logger.info("Query cache change triggers created")
+
+
 async def drop_all_tables(engine: AsyncEngine | None = None, confirm: bool = False) -> None:
     """
     Drop all tables. USE WITH CAUTION!
@@ -112,6 +131,7 @@ async def initialize_database(engine: AsyncEngine | None = None) -> None:
 
     await create_schemas(engine)
     await create_tables(engine)
+    await create_change_triggers(engine)
 
     logger.info("Database initialization complete")
 
@@ -10,6 +10,7 @@ This module provides comprehensive security controls for all database operations
 
 import logging
 import re
+import time
 from typing import Any
 
 logger = logging.getLogger(__name__)
@@ -345,15 +346,7 @@ class DatabaseAuditor:
             "table": table,
             "user_id": user_id,
             "details": details or {},
-            "timestamp": logger.makeRecord(
-                name=__name__,
-                level=logging.INFO,
-                pathname="",
-                lineno=0,
-                msg="",
-                args=(),
-                exc_info=None,
-            ).created,
+            "timestamp": time.time(),
         }
 
         logger.info("database_operation_audited", extra=log_entry)
@@ -374,15 +367,7 @@ class DatabaseAuditor:
             "violation_type": violation_type,
             "input_value": input_value[:100] + "..." if len(input_value) > 100 else input_value,
             "user_id": user_id,
-            "timestamp": logger.makeRecord(
-                name=__name__,
-                level=logging.WARNING,
-                pathname="",
-                lineno=0,
-                msg="",
-                args=(),
-                exc_info=None,
-            ).created,
+            "timestamp": time.time(),
         }
 
         logger.warning("database_security_violation", extra=log_entry)
@@ -17,6 +17,7 @@ This module provides comprehensive distributed tracing capabilities including:
 import asyncio
 import contextlib
 import functools
+import threading
 import time
 from collections.abc import Callable
 from contextvars import ContextVar
@@ -27,7 +28,13 @@ from urllib.parse import urlparse
 from opentelemetry import trace
 from opentelemetry.sdk.trace import TracerProvider
 from opentelemetry.sdk.trace.export import BatchSpanProcessor
-from opentelemetry.sdk.trace.sampling import Decision, Sampler, SamplingResult
+from opentelemetry.sdk.trace.sampling import (
+    ALWAYS_ON,
+    Decision,
+    ParentBased,
+    Sampler,
+    SamplingResult,
+)
 from opentelemetry.trace import SpanKind, Status, StatusCode
 
 try:
@@ -71,6 +78,7 @@ except ImportError:
 
 
 from resync.core.structured_logger import get_logger
+from resync.core.tail_sampling import TailSamplingSpanProcessor, trace_id_ratio_sampled
 
 logger = get_logger(__name__)
 
@@ -87,17 +95,29 @@ class IntelligentSampler(Sampler):
     - Error rates
     - Service criticality
     - Resource usage
+
+    Request and error counts decay with a half-life of
+    ``decay_half_life_seconds``, so an error burst only raises the rate
+    for a while.
     """
 
-    def __init__(self, base_sample_rate: float = 0.1, max_sample_rate: float = 1.0):
+    def __init__(
+        self,
+        base_sample_rate: float = 0.1,
+        max_sample_rate: float = 1.0,
+        decay_half_life_seconds: float = 60.0,
+    ):
         self.base_sample_rate = base_sample_rate
         self.max_sample_rate = max_sample_rate
+        self.decay_half_life_seconds = decay_half_life_seconds
 
-        # Adaptive sampling state
-        self.error_count = 0
-        self.total_requests = 0
+        # Adaptive sampling state (exponentially decayed counts)
+        self.error_count = 0.0
+        self.total_requests = 0.0
         self.latency_threshold = 1.0  # seconds
         self.error_threshold = 0.05  # 5%
+        self._last_decay = time.monotonic()
+        self._lock = threading.Lock()
 
         # Sampling decisions cache
         self._decisions: dict[str, SamplingResult] = {}
@@ -107,7 +127,7 @@ class IntelligentSampler(Sampler):
         return (
             f"IntelligentSampler(base_rate={self.base_sample_rate}, "
             f"max_rate={self.max_sample_rate}, "
-            f"errors={self.error_count}/{self.total_requests})"
+            f"errors={self.error_count:.1f}/{self.total_requests:.1f})"
         )
 
     def should_sample(
@@ -144,18 +164,17 @@ class IntelligentSampler(Sampler):
         current_rate = self._calculate_adaptive_rate()
 
         # Use trace_id for consistent sampling
-        should_sample = (trace_id % int(1 / current_rate)) == 0
-
-        if should_sample:
+        if trace_id_ratio_sampled(trace_id, current_rate):
             return SamplingResult(Decision.RECORD_AND_SAMPLE)
         return SamplingResult(Decision.DROP)
 
     def _calculate_adaptive_rate(self) -> float:
         """Calculate adaptive sampling rate based on current conditions."""
-        if self.total_requests == 0:
-            return self.base_sample_rate
-
-        error_rate = self.error_count / self.total_requests
+        with self._lock:
+            self._decay()
+            if self.total_requests < 1:
+                return self.base_sample_rate
+            error_rate = self.error_count / self.total_requests
 
         # Increase sampling for high error rates
         if error_rate > self.error_threshold:
@@ -168,15 +187,27 @@ class IntelligentSampler(Sampler):
 
         return adaptive_rate
 
+    def _decay(self) -> None:
+        """Age the counts by the time elapsed since the last decay (lock held)."""
+        now = time.monotonic()
+        elapsed = now - self._last_decay
+        if elapsed > 0 and self.decay_half_life_seconds > 0:
+            factor = 0.5 ** (elapsed / self.decay_half_life_seconds)
+            self.error_count *= factor
+            self.total_requests *= factor
+        self._last_decay = now
+
     def record_request(self, has_error: bool = False, latency: float = 0.0):
         """Record request metrics for adaptive sampling."""
-        self.total_requests += 1
-        if has_error:
-            self.error_count += 1
+        with self._lock:
+            self._decay()
+            self.total_requests += 1
+            if has_error:
+                self.error_count += 1
 
-        # Update latency threshold based on moving average
-        if latency > 0:
-            self.latency_threshold = 0.9 * self.latency_threshold + 0.1 * latency
+            # Update latency threshold based on moving average
+            if latency > 0:
+                self.latency_threshold = 0.9 * self.latency_threshold + 0.1 * latency
 
 
 @dataclass
@@ -193,6 +224,14 @@ class TraceConfiguration:
     adaptive_sampling: bool = True
     max_sampling_rate: float = 1.0
 
+    # Tail sampling: record every span and decide per trace once it completes
+    # (errors and latency outliers kept, plus a uniform baseline)
+    tail_sampling: bool = True
+    tail_sampling_baseline_rate: float = 0.01
+    tail_sampling_latency_quantile: float = 0.99
+    tail_sampling_decision_wait_seconds: float = 30.0
+    tail_sampling_max_buffered_spans: int = 100_000
+
     # Performance configuration
     max_batch_size: int = 512
     export_timeout_seconds: int = 30
@@ -230,6 +269,7 @@ class DistributedTracingManager:
         self.tracer_provider: TracerProvider | None = None
         self.tracer: trace.Tracer | None = None
         self.jaeger_exporter: JaegerExporter | None = None
+        self.tail_sampler: TailSamplingSpanProcessor | None = None
 
         # Instrumentation state
         self._instrumented = False
@@ -259,7 +299,10 @@ class DistributedTracingManager:
         self.tracer_provider = TracerProvider()
 
         # Configure sampling
-        if self.config.adaptive_sampling:
+        if self.config.tail_sampling:
+            # Every span must reach the tail sampler
+            sampler = ParentBased(ALWAYS_ON)
+        elif self.config.adaptive_sampling:
             sampler = IntelligentSampler(self.config.sampling_rate, self.config.max_sampling_rate)
         else:
             from opentelemetry.sdk.trace.sampling import TraceIdRatioBasedSampler
@@ -283,18 +326,29 @@ class DistributedTracingManager:
             schedule_delay_millis=5000,
         )
 
-        self.tracer_provider.add_span_processor(span_processor)
+        export_processors = [span_processor]
 
         # Add console processor for development
         try:
             logger_level = getattr(logger, "level", 20)  # Default to INFO if no level attribute
             if logger_level <= 10 and CONSOLE_AVAILABLE:  # DEBUG level
-                console_processor = ConsoleSpanProcessor()
-                self.tracer_provider.add_span_processor(console_processor)
+                export_processors.append(ConsoleSpanProcessor())
         except AttributeError:
             if CONSOLE_AVAILABLE:  # Default to adding console processor if we can't check level
-                console_processor = ConsoleSpanProcessor()
-                self.tracer_provider.add_span_processor(console_processor)
+                export_processors.append(ConsoleSpanProcessor())
+
+        if self.config.tail_sampling:
+            self.tail_sampler = TailSamplingSpanProcessor(
+                export_processors,
+                baseline_rate=self.config.tail_sampling_baseline_rate,
+                latency_quantile=self.config.tail_sampling_latency_quantile,
+                decision_wait_seconds=self.config.tail_sampling_decision_wait_seconds,
+                max_buffered_spans=self.config.tail_sampling_max_buffered_spans,
+            )
+            self.tracer_provider.add_span_processor(self.tail_sampler)
+        else:
+            for processor in export_processors:
+                self.tracer_provider.add_span_processor(processor)
 
         # Add custom span processors
         for processor in self.config.custom_span_processors:
@@ -574,6 +628,7 @@ class DistributedTracingManager:
                 "jaeger_endpoint": self.config.jaeger_endpoint,
                 "sampling_rate": self.config.sampling_rate,
                 "adaptive_sampling": self.config.adaptive_sampling,
+                "tail_sampling": self.config.tail_sampling,
                 "auto_instrumentation": {
                     "http": self.config.auto_instrument_http,
                     "database": self.config.auto_instrument_db,
@@ -581,6 +636,7 @@ class DistributedTracingManager:
                     "external_calls": self.config.auto_instrument_external_calls,
                 },
             },
+            "tail_sampling": self.tail_sampler.get_metrics() if self.tail_sampler else None,
             "health": {
                 "instrumented": self._instrumented,
                 "running": self._running,
@@ -9,6 +9,11 @@ This module provides cryptographically secure audit trails including:
 - Compressed archival of historical logs
 - Efficient search and retrieval capabilities
 - Compliance-ready audit reporting
+
+Blocks are stored in append-only segment files with a sidecar index
+(see resync.core.audit_segments) by time range, event type, user and
+resource. Searches decrypt only the blocks the index selects. User and
+resource ids are indexed as keyed hashes, so the index does not expose them.
 """
 
 from __future__ import annotations
@@ -29,6 +34,14 @@ from typing import Any
 
 from cryptography.fernet import Fernet
 
+from resync.core.audit_segments import AuditSegmentStore, SegmentRef
+from resync.core.audit_verification import (
+    AuditVerifier,
+    block_hash,
+    chain_hash,
+    entry_content_hash,
+    entry_signature,
+)
 from resync.core.structured_logger import get_logger
 
 logger = get_logger(__name__)
@@ -62,21 +75,7 @@ class AuditEntry:
 
     def _generate_hash(self) -> None:
         """Generate SHA-256 hash of the entry content."""
-        content = {
-            "entry_id": self.entry_id,
-            "timestamp": self.timestamp,
-            "event_type": self.event_type,
-            "user_id": self.user_id,
-            "resource_id": self.resource_id,
-            "action": self.action,
-            "details": self.details,
-            "ip_address": self.ip_address,
-            "user_agent": self.user_agent,
-            "session_id": self.session_id,
-        }
-
-        content_str = json.dumps(content, sort_keys=True, separators=(",", ":"))
-        self.hash_value = hashlib.sha256(content_str.encode()).hexdigest()
+        self.hash_value = entry_content_hash(vars(self))
 
     def to_dict(self) -> dict[str, Any]:
         """Convert entry to dictionary."""
@@ -155,18 +154,16 @@ class AuditLogBlock:
     block_hash: str = ""
     signature: str = ""
     previous_block_hash: str = ""
+    encryption_key_id: str = ""
 
     def generate_block_hash(self) -> str:
         """Generate hash for the entire block."""
-        content = {
-            "block_id": self.block_id,
-            "created_at": self.created_at,
-            "entries": [entry.hash_value for entry in self.entries],
-            "previous_block_hash": self.previous_block_hash,
-        }
-
-        content_str = json.dumps(content, sort_keys=True, separators=(",", ":"))
-        self.block_hash = hashlib.sha256(content_str.encode()).hexdigest()
+        self.block_hash = block_hash(
+            self.block_id,
+            self.created_at,
+            [entry.hash_value for entry in self.entries],
+            self.previous_block_hash,
+        )
         return self.block_hash
 
 
@@ -178,6 +175,8 @@ class EncryptedAuditConfig:
     audit_log_directory: str = "data/audit_logs"
     max_entries_per_block: int = 1000
     compression_enabled: bool = True
+    max_segment_bytes: int = 64 * 1024 * 1024
+    fsync_enabled: bool = True
 
     # Encryption settings
     key_rotation_days: int = 90
@@ -188,6 +187,7 @@ class EncryptedAuditConfig:
     enable_hash_chaining: bool = True
     enable_signatures: bool = True
     chain_verification_enabled: bool = True
+    verification_workers: int | None = None  # process pool size (None = CPU count)
 
     # Archival settings
     archival_age_days: int = 365  # Archive logs older than 1 year
@@ -304,6 +304,13 @@ class EncryptedAuditTrail:
         # Block management
         self.current_block: AuditLogBlock | None = None
         self.block_counter = 0
+        self.segment_store = AuditSegmentStore(
+            self.audit_log_dir,
+            max_segment_bytes=self.config.max_segment_bytes,
+            fsync=self.config.fsync_enabled,
+        )
+        self._flush_lock = asyncio.Lock()
+        self.verifier = AuditVerifier(self, max_workers=self.config.verification_workers)
 
         # Statistics
         self.total_entries = 0
@@ -367,6 +374,8 @@ class EncryptedAuditTrail:
                 with contextlib.suppress(asyncio.CancelledError):
                     await task
 
+        await self.verifier.close()
+
         logger.info("Encrypted audit trail system stopped")
 
     async def log_event(
@@ -396,17 +405,7 @@ class EncryptedAuditTrail:
             session_id=session_id,
         )
 
-        # Add to hash chain
-        if self.config.enable_hash_chaining:
-            entry.previous_hash = self.chain_hash
-            entry.chain_hash = self._calculate_chain_hash(entry)
-
-            # Update chain
-            self.chain_hash = entry.chain_hash
-
-        # Add HMAC signature
-        if self.config.enable_signatures:
-            entry.signature = self._calculate_signature(entry)
+        self._chain_entry(entry)
 
         # Set encryption key
         active_key = self.key_manager.get_active_key()
@@ -416,22 +415,54 @@ class EncryptedAuditTrail:
         self.pending_entries.append(entry)
         self.total_entries += 1
 
+        # Seal full blocks right away; pending_entries is bounded and drops the oldest
+        if len(self.pending_entries) >= self.config.max_entries_per_block:
+            await self._flush_pending_entries()
+
         logger.debug(f"Audit event logged: {entry_id}")
         return entry_id
 
+    def _chain_entry(self, entry: AuditEntry) -> None:
+        """Link an entry to the hash chain and sign it."""
+        # Add to hash chain
+        if self.config.enable_hash_chaining:
+            entry.previous_hash = self.chain_hash
+            entry.chain_hash = self._calculate_chain_hash(entry)
+
+            # Update chain
+            self.chain_hash = entry.chain_hash
+
+        # Add HMAC signature
+        if self.config.enable_signatures:
+            entry.signature = self._calculate_signature(entry)
+
     def _calculate_chain_hash(self, entry: AuditEntry) -> str:
         """Calculate hash chain value."""
-        if not entry.previous_hash:
-            return entry.hash_value
-
-        combined = f"{entry.previous_hash}:{entry.hash_value}"
-        return hashlib.sha256(combined.encode()).hexdigest()
+        return chain_hash(entry.previous_hash, entry.hash_value)
 
     def _calculate_signature(self, entry: AuditEntry) -> str:
         """Calculate HMAC signature for the entry."""
-        content = f"{entry.entry_id}:{entry.hash_value}:{entry.chain_hash}"
-        signature = hmac.new(self.key_manager.hmac_key, content.encode(), hashlib.sha256)
-        return signature.hexdigest()
+        return entry_signature(
+            self.key_manager.hmac_key, entry.entry_id, entry.hash_value, entry.chain_hash
+        )
+
+    def _index_terms(
+        self,
+        event_type: str | None = None,
+        user_id: str | None = None,
+        resource_id: str | None = None,
+    ) -> list[str]:
+        """Index terms for the given field values (ids as keyed hashes)."""
+        terms = []
+        if event_type:
+            terms.append(f"event:{event_type}")
+        for kind, value in (("user", user_id), ("resource", resource_id)):
+            if value:
+                digest = hmac.new(
+                    self.key_manager.hmac_key, f"{kind}:{value}".encode(), hashlib.sha256
+                )
+                terms.append(f"{kind}:{digest.hexdigest()[:20]}")
+        return terms
 
     async def search_events(
         self,
@@ -442,7 +473,28 @@ class EncryptedAuditTrail:
         resource_id: str | None = None,
         limit: int = 100,
     ) -> list[AuditEntry]:
-        """Search audit events with optional filters."""
+        """
+        Search audit events with optional filters.
+
+        Pending entries are searched first, then stored blocks newest first.
+        Only blocks whose index matches the time range and every given
+        field are read and decrypted (in a worker thread).
+        """
+        return await self._search_events(
+            start_time, end_time, event_type, user_id, resource_id, limit
+        )
+
+    async def _search_events(
+        self,
+        start_time: float | None,
+        end_time: float | None,
+        event_type: str | None = None,
+        user_id: str | None = None,
+        resource_id: str | None = None,
+        limit: int = 100,
+        sources: dict[str, tuple[str, list[str], int]] | None = None,
+    ) -> list[AuditEntry]:
+        """search_events; fills ``sources`` with entry_id -> (block_id, leaf hashes, index)."""
         results = []
 
         # Search in current pending entries
@@ -455,11 +507,51 @@ class EncryptedAuditTrail:
         if len(results) >= limit:
             return results
 
-        # Search in archived blocks (simplified - would need full implementation)
-        # This would decrypt and search through archived blocks
+        # Search stored blocks selected by the index
+        terms = self._index_terms(event_type, user_id, resource_id)
+        for ref in self.segment_store.find(start_time, end_time, terms):
+            try:
+                entries = await self._load_block_entries(ref)
+            except Exception as e:
+                logger.warning(f"Skipping unreadable audit block {ref.block_id}: {e}")
+                continue
+
+            leaves = [entry.hash_value for entry in entries] if sources is not None else []
+            for index in range(len(entries) - 1, -1, -1):
+                entry = entries[index]
+                if self._matches_filters(
+                    entry, start_time, end_time, event_type, user_id, resource_id
+                ):
+                    results.append(entry)
+                    if sources is not None:
+                        sources[entry.entry_id] = (ref.block_id, leaves, index)
+                    if len(results) >= limit:
+                        return results
 
         return results
 
+    async def _load_block_entries(self, ref: SegmentRef) -> list[AuditEntry]:
+        """Read and decrypt a stored block."""
+        key = self.key_manager.get_key_by_id(ref.meta["encryption_key_id"])
+        if key is None:
+            raise KeyError(f"encryption key {ref.meta['encryption_key_id']} not available")
+
+        payload = await self.segment_store.read(ref)
+        entries_data = await asyncio.to_thread(
+            self._decrypt_payload, key, payload, ref.meta.get("compressed", False)
+        )
+        return [AuditEntry.from_dict(data) for data in entries_data]
+
+    @staticmethod
+    def _decrypt_payload(
+        key: EncryptionKey, payload: bytes, compressed: bool
+    ) -> list[dict[str, Any]]:
+        """Decrypt (and decompress) a block payload into entry dicts."""
+        data = Fernet(key.get_fernet_key()).decrypt(base64.urlsafe_b64encode(payload))
+        if compressed:
+            data = gzip.decompress(data)
+        return json.loads(data)
+
     def _matches_filters(
         self,
         entry: AuditEntry,
@@ -514,12 +606,14 @@ class EncryptedAuditTrail:
                     results["integrity_status"] = "compromised"
                     results["issues_found"].append("signatures_invalid")
 
-            # Full chain verification (expensive)
-            if full_chain_check:
-                full_check = await self._verify_full_chain()
-                if not full_check["valid"]:
-                    results["integrity_status"] = "compromised"
-                    results["issues_found"].extend(full_check["issues"])
+            # Stored blocks: only those added since the last checkpoint,
+            # unless a full re-verification is requested
+            stored_check = await self._verify_full_chain(full=full_chain_check)
+            results["blocks_verified"] = stored_check["blocks_verified"]
+            if not stored_check["valid"]:
+                results["integrity_status"] = "compromised"
+                results["issues_found"].extend(stored_check["issues"])
+                self.integrity_violations += len(stored_check["issues"])
 
         except Exception as e:
             logger.error("exception_caught", error=str(e), exc_info=True)
@@ -536,30 +630,10 @@ class EncryptedAuditTrail:
         if not self.config.enable_hash_chaining or not self.pending_entries:
             return True
 
-        # For now, just verify that entries have proper hash values
-        # Full chain verification would require loading all historical blocks
+        # Pending entries only; stored blocks are verified by AuditVerifier
         for entry in self.pending_entries:
             # Verify entry hash is correctly calculated
-            expected_hash = hashlib.sha256(
-                json.dumps(
-                    {
-                        "entry_id": entry.entry_id,
-                        "timestamp": entry.timestamp,
-                        "event_type": entry.event_type,
-                        "user_id": entry.user_id,
-                        "resource_id": entry.resource_id,
-                        "action": entry.action,
-                        "details": entry.details,
-                        "ip_address": entry.ip_address,
-                        "user_agent": entry.user_agent,
-                        "session_id": entry.session_id,
-                    },
-                    sort_keys=True,
-                    separators=(",", ":"),
-                ).encode()
-            ).hexdigest()
-
-            if entry.hash_value != expected_hash:
+            if entry.hash_value != entry_content_hash(vars(entry)):
                 return False
 
         return True
@@ -576,25 +650,30 @@ class EncryptedAuditTrail:
 
         return True
 
-    async def _verify_full_chain(self) -> dict[str, Any]:
-        """Perform full chain verification across all archived blocks."""
-        # This would verify all archived blocks
-        # Simplified implementation
-        return {
-            "valid": True,
-            "issues": [],
-            "blocks_verified": 0,
-            "entries_verified": 0,
-        }
+    async def _verify_full_chain(self, full: bool = True) -> dict[str, Any]:
+        """
+        Verify stored blocks and checkpoint them (see AuditVerifier).
+
+        Args:
+            full: Re-verify every block instead of only unchecked ones
+        """
+        return await self.verifier.verify(full=full)
 
     async def export_forensic_data(
         self, start_time: float, end_time: float, include_encrypted: bool = False
     ) -> dict[str, Any]:
-        """Export audit data for forensic analysis."""
-        events = await self.search_events(
-            start_time=start_time,
-            end_time=end_time,
+        """
+        Export audit data for forensic analysis.
+
+        Stored events come with a Merkle inclusion proof against their
+        block's signed checkpoint (see verify_merkle_proof).
+        """
+        sources: dict[str, tuple[str, list[str], int]] = {}
+        events = await self._search_events(
+            start_time,
+            end_time,
             limit=10000,  # Large limit for forensic export
+            sources=sources,
         )
 
         export_data = {
@@ -603,11 +682,21 @@ class EncryptedAuditTrail:
             "total_events": len(events),
             "integrity_status": await self.verify_integrity(),
             "events": [event.to_dict() for event in events],
+            "inclusion_proofs": {
+                entry_id: self.verifier.inclusion_proof(block_id, leaves, index)
+                for entry_id, (block_id, leaves, index) in sources.items()
+            },
         }
 
         if include_encrypted:
             # Include encrypted block data for forensic analysis
-            export_data["encrypted_blocks"] = []  # Would include encrypted blocks
+            export_data["encrypted_blocks"] = [
+                {
+                    "metadata": ref.meta,
+                    "encrypted_data": base64.b64encode(await self.segment_store.read(ref)).decode(),
+                }
+                for ref in reversed(self.segment_store.find(start_time, end_time))
+            ]
 
         return export_data
 
@@ -647,10 +736,12 @@ class EncryptedAuditTrail:
                 "signatures_enabled": self.config.enable_signatures,
                 "hash_chaining_enabled": self.config.enable_hash_chaining,
             },
+            "integrity": self.verifier.get_statistics(),
             "storage": {
                 "audit_log_directory": str(self.audit_log_dir),
                 "blocks_created": self.block_counter,
                 "compression_enabled": self.config.compression_enabled,
+                **self.segment_store.get_statistics(),
             },
             "configuration": {
                 "max_entries_per_block": self.config.max_entries_per_block,
@@ -664,93 +755,110 @@ class EncryptedAuditTrail:
         if not self.pending_entries:
             return
 
-        # Create new block
-        block_id = f"block_{self.block_counter:06d}"
-        self.block_counter += 1
-
-        block = AuditLogBlock(
-            block_id=block_id,
-            entries=list(self.pending_entries),
-            created_at=time.time(),
-            previous_block_hash=self.chain_hash,
-        )
-
-        # Generate block hash
-        block.generate_block_hash()
-
-        # Encrypt block
-        await self._encrypt_block(block)
-
-        # Save block
-        await self._save_block(block)
+        async with self._flush_lock:
+            if not self.pending_entries:
+                return
+
+            # Take the entries and advance the chain before any await, so
+            # events logged during the write go to the next block
+            previous_chain_hash = self.chain_hash
+            block_id = f"block_{self.block_counter:06d}"
+            self.block_counter += 1
+
+            block = AuditLogBlock(
+                block_id=block_id,
+                entries=list(self.pending_entries),
+                created_at=time.time(),
+                previous_block_hash=self.chain_hash,
+            )
+            self.pending_entries.clear()
 
-        # Clear pending entries
-        self.pending_entries.clear()
+            # Generate block hash
+            block.generate_block_hash()
 
-        # Update chain hash
-        self.chain_hash = block.block_hash
+            # Update chain hash
+            self.chain_hash = block.block_hash
 
-        # Save chain state
-        await self._save_chain_state()
+            try:
+                # Encrypt block
+                await self._encrypt_block(block)
+
+                # Save block
+                await self._save_block(block)
+            except Exception:
+                # The block was not stored: take its id and chain position back
+                # and keep its entries for the next flush
+                self.block_counter -= 1
+                self.chain_hash = previous_chain_hash
+                logged_meanwhile = list(self.pending_entries)
+                self.pending_entries.clear()
+                self.pending_entries.extend(block.entries)
+                # Entries logged during the write were linked to the lost block
+                for entry in logged_meanwhile:
+                    self._chain_entry(entry)
+                    self.pending_entries.append(entry)
+                raise
+
+            # Save chain state
+            await self._save_chain_state()
 
         logger.debug(f"Flushed {len(block.entries)} entries to block {block_id}")
 
     async def _encrypt_block(self, block: AuditLogBlock) -> None:
-        """Encrypt a block of audit entries."""
+        """Encrypt a block of audit entries (in a worker thread)."""
         active_key = self.key_manager.get_active_key()
-        fernet = Fernet(active_key.get_fernet_key())
-
-        # Serialize entries
+        block.encryption_key_id = active_key.key_id
         entries_data = [entry.to_dict() for entry in block.entries]
-        json_data = json.dumps(entries_data, separators=(",", ":"))
+        block.encrypted_data = await asyncio.to_thread(
+            self._encrypt_payload, active_key, entries_data
+        )
+
+    def _encrypt_payload(self, key: EncryptionKey, entries_data: list[dict[str, Any]]) -> bytes:
+        """Serialize, compress and encrypt entries into raw ciphertext bytes."""
+        data = json.dumps(entries_data, separators=(",", ":")).encode()
 
         # Compress if enabled
         if self.config.compression_enabled:
-            json_data = gzip.compress(
-                json_data.encode(), compresslevel=self.config.compression_level
-            )
-        else:
-            json_data = json_data.encode()
+            data = gzip.compress(data, compresslevel=self.config.compression_level)
 
-        # Encrypt
-        block.encrypted_data = fernet.encrypt(json_data)
+        # Fernet tokens are base64; store the raw bytes
+        return base64.urlsafe_b64decode(Fernet(key.get_fernet_key()).encrypt(data))
 
     async def _save_block(self, block: AuditLogBlock) -> None:
-        """Save encrypted block to disk."""
-        block_file = self.audit_log_dir / f"{block.block_id}.audit"
-
-        # Prepare block metadata
+        """Append encrypted block to the segment store and index it."""
         metadata = {
             "block_id": block.block_id,
             "created_at": block.created_at,
             "entries_count": len(block.entries),
             "block_hash": block.block_hash,
             "previous_block_hash": block.previous_block_hash,
-            "encryption_key_id": (block.entries[0].encryption_key_id if block.entries else ""),
+            "encryption_key_id": block.encryption_key_id,
             "compressed": self.config.compression_enabled,
         }
 
-        # Combine metadata and encrypted data
-        block_data = {
-            "metadata": metadata,
-            "encrypted_data": base64.b64encode(block.encrypted_data).decode(),
-        }
-
-        # Save to file
-        async with asyncio.Lock():  # File system operations need locking
-            with open(block_file, "w", encoding="utf-8") as f:
-                json.dump(block_data, f, separators=(",", ":"))
+        terms: set[str] = set()
+        for entry in block.entries:
+            terms.update(self._index_terms(entry.event_type, entry.user_id, entry.resource_id))
+
+        await self.segment_store.append(
+            block.block_id,
+            block.encrypted_data,
+            metadata,
+            terms,
+            min_ts=min(entry.timestamp for entry in block.entries),
+            max_ts=max(entry.timestamp for entry in block.entries),
+        )
 
     async def _save_chain_state(self) -> None:
         """Save current chain state to disk."""
+        await asyncio.to_thread(self._write_chain_state, self.chain_hash, self.block_counter)
+
+    def _write_chain_state(self, chain_hash: str, block_counter: int) -> None:
         chain_file = self.audit_log_dir / "chain_hash.txt"
         counter_file = self.audit_log_dir / "block_counter.txt"
 
-        with open(chain_file, "w") as f:
-            f.write(self.chain_hash)
-
-        with open(counter_file, "w") as f:
-            f.write(str(self.block_counter))
+        chain_file.write_text(chain_hash)
+        counter_file.write_text(str(block_counter))
 
     async def _flush_worker(self) -> None:
         """Background worker for periodic flushing."""
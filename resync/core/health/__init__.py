@@ -100,6 +100,7 @@ _EXPORTS: dict[str, tuple[str, str]] = {
         "component_cache_manager",
         "ComponentCacheManager",
     ),
+    "HealthCheckScheduler": ("health_check_scheduler", "HealthCheckScheduler"),
     # Memory management
     "MemoryUsageTracker": ("memory_usage_tracker", "MemoryUsageTracker"),
     # Recovery and alerting
@@ -190,6 +191,7 @@ if TYPE_CHECKING:
     from .component_cache_manager import ComponentCacheManager  # noqa: F401
     from .health_alerting import HealthAlerting  # noqa: F401
     from .health_check_retry import HealthCheckRetry  # noqa: F401
+    from .health_check_scheduler import HealthCheckScheduler  # noqa: F401
     from .health_check_service import HealthCheckService  # noqa: F401
     from .health_check_utils import HealthCheckUtils  # noqa: F401
     from .health_config_manager import HealthCheckConfigurationManager  # noqa: F401
@@ -21,7 +21,7 @@ class ComponentCacheManager:
     Manages caching of component health results.
 
     This class provides functionality for:
-    - Caching component health results with expiry
+    - Caching component health results with per-component max staleness
     - Thread-safe cache operations
     - Cache performance tracking (hits/misses)
     - Automatic cache cleanup and maintenance
@@ -36,6 +36,7 @@ class ComponentCacheManager:
         """
         self.default_cache_expiry = timedelta(seconds=default_cache_expiry_seconds)
         self.component_cache: dict[str, ComponentHealth] = {}
+        self._max_staleness: dict[str, timedelta] = {}
         self._cache_lock = asyncio.Lock()
 
         # Performance tracking
@@ -47,6 +48,50 @@ class ComponentCacheManager:
         self._last_cleanup: datetime | None = None
         self.cleanup_interval = timedelta(minutes=5)  # Cleanup every 5 minutes
 
+    def set_max_staleness(self, component_name: str, seconds: float) -> None:
+        """
+        Set how old a component's cached result may be before it expires.
+
+        Args:
+            component_name: Name of the component
+            seconds: Maximum age in seconds
+        """
+        self._max_staleness[component_name] = timedelta(seconds=seconds)
+
+    def get_max_staleness(self, component_name: str) -> timedelta:
+        """Get the max staleness of a component (default expiry if unset)."""
+        return self._max_staleness.get(component_name, self.default_cache_expiry)
+
+    def is_fresh(
+        self, component_name: str, health: ComponentHealth, now: datetime | None = None
+    ) -> bool:
+        """Whether a cached result is within its component's max staleness."""
+        if health.last_check is None:
+            return False
+        age = (now or datetime.now()) - health.last_check
+        return age < self.get_max_staleness(component_name)
+
+    def peek(self, component_name: str, fresh_only: bool = False) -> ComponentHealth | None:
+        """
+        Read a component without locking or evicting (hot path for probes).
+
+        Safe because all writers run on the same event loop and a dict
+        lookup cannot observe a partial update.
+
+        Args:
+            component_name: Name of the component to retrieve
+            fresh_only: Return None if the entry exceeded its max staleness
+
+        Returns:
+            Cached component health, or None
+        """
+        health = self.component_cache.get(component_name)
+        if health is None or (fresh_only and not self.is_fresh(component_name, health)):
+            self._cache_misses += 1
+            return None
+        self._cache_hits += 1
+        return health
+
     async def get_component(self, component_name: str) -> ComponentHealth | None:
         """
         Get a component from cache with expiry validation.
@@ -60,23 +105,14 @@ class ComponentCacheManager:
         async with self._cache_lock:
             health = self.component_cache.get(component_name)
             if health:
-                age = datetime.now() - health.last_check
-                if age < self.default_cache_expiry:
+                if self.is_fresh(component_name, health):
                     self._cache_hits += 1
-                    logger.debug(
-                        "cache_hit",
-                        component=component_name,
-                        age_seconds=age.total_seconds(),
-                    )
+                    logger.debug("cache_hit", component=component_name)
                     return health
                 # Cache expired, remove from cache
                 self.component_cache.pop(component_name, None)
                 self._cache_evictions += 1
-                logger.debug(
-                    "cache_expired",
-                    component=component_name,
-                    age_seconds=age.total_seconds(),
-                )
+                logger.debug("cache_expired", component=component_name)
 
             self._cache_misses += 1
             logger.debug("cache_miss", component=component_name)
@@ -139,10 +175,10 @@ class ComponentCacheManager:
         async with self._cache_lock:
             expired_components = []
             valid_components = {}
+            current_time = datetime.now()
 
             for name, health in self.component_cache.items():
-                age = datetime.now() - health.last_check
-                if age < self.default_cache_expiry:
+                if self.is_fresh(name, health, current_time):
                     valid_components[name] = health
                 else:
                     expired_components.append(name)
@@ -184,8 +220,7 @@ class ComponentCacheManager:
             current_time = datetime.now()
 
             for name, health in self.component_cache.items():
-                age = current_time - health.last_check
-                if age >= self.default_cache_expiry:
+                if not self.is_fresh(name, health, current_time):
                     expired_components.append(name)
 
             # Remove expired components
@@ -248,23 +283,24 @@ class ComponentCacheManager:
         Get components that are stale based on age.
 
         Args:
-            max_age_seconds: Maximum age in seconds (uses default expiry if None)
+            max_age_seconds: Maximum age in seconds (uses each component's
+                max staleness if None)
 
         Returns:
             Dictionary of stale components
         """
-        if max_age_seconds is None:
-            max_age = self.default_cache_expiry
-        else:
-            max_age = timedelta(seconds=max_age_seconds)
-
         async with self._cache_lock:
             stale_components = {}
             current_time = datetime.now()
 
             for name, health in self.component_cache.items():
-                age = current_time - health.last_check
-                if age >= max_age:
+                if max_age_seconds is None:
+                    stale = not self.is_fresh(name, health, current_time)
+                else:
+                    stale = health.last_check is None or (
+                        current_time - health.last_check
+                    ) >= timedelta(seconds=max_age_seconds)
+                if stale:
                     stale_components[name] = health
 
             return stale_components.copy()
@@ -0,0 +1,289 @@
+"""
+Health Check Scheduler
+
+This module runs each health checker in the background on its own cadence
+and serves results from a ComponentCacheManager, so health endpoints and
+probes read cached state instead of fanning out to every dependency on each
+request.
+
+- Per-component intervals (HealthCheckConfig.component_check_intervals) with
+  random jitter, so checks do not fire in lockstep
+- Per-component max staleness; missing or stale entries are refreshed on read
+- Single-flight refreshes: concurrent callers share one in-flight check
+"""
+
+from __future__ import annotations
+
+import asyncio
+import contextlib
+import random
+import time
+from collections.abc import Awaitable, Callable, Iterable
+from datetime import datetime
+from typing import Any
+
+import structlog
+
+from .component_cache_manager import ComponentCacheManager
+from .health_models import ComponentHealth, ComponentType, HealthCheckConfig, HealthStatus
+
+logger = structlog.get_logger(__name__)
+
+CheckFunc = Callable[[], Awaitable[ComponentHealth]]
+
+
+class HealthCheckScheduler:
+    """
+    Background, staggered health checking backed by a component cache.
+
+    Usage:
+        scheduler = HealthCheckScheduler(config)
+        scheduler.register("database", checker.check_health)
+        await scheduler.start()
+        components = await scheduler.get_components()  # served from cache
+        snapshot = scheduler.snapshot()  # no I/O, no awaiting
+        await scheduler.stop()
+    """
+
+    def __init__(
+        self,
+        config: HealthCheckConfig | None = None,
+        cache: ComponentCacheManager | None = None,
+    ):
+        """
+        Initialize the scheduler.
+
+        Args:
+            config: Health check configuration (uses defaults if None)
+            cache: Component cache (created if None)
+        """
+        self.config = config or HealthCheckConfig()
+        self.cache = cache or ComponentCacheManager(
+            default_cache_expiry_seconds=self.config.check_interval_seconds
+        )
+        self.default_interval: float = float(self.config.check_interval_seconds)
+
+        self._checks: dict[str, CheckFunc] = {}
+        self._in_flight: dict[str, asyncio.Task] = {}
+        self._tasks: dict[str, asyncio.Task] = {}
+        self._running = False
+
+        # Metrics
+        self._refresh_count = 0
+        self._coalesced_count = 0
+
+    # =========================================================================
+    # Registration and cadence
+    # =========================================================================
+
+    def register(self, name: str, check: CheckFunc) -> None:
+        """
+        Register a component check.
+
+        Args:
+            name: Component name
+            check: Coroutine function returning the component's ComponentHealth
+        """
+        self._checks[name] = check
+        self.cache.set_max_staleness(name, self.max_staleness_for(name))
+
+    @property
+    def components(self) -> list[str]:
+        """Registered component names."""
+        return list(self._checks)
+
+    @property
+    def is_running(self) -> bool:
+        """Whether background checks are scheduled."""
+        return self._running
+
+    def interval_for(self, name: str) -> float:
+        """Check interval of a component in seconds."""
+        return float(self.config.component_check_intervals.get(name, self.default_interval))
+
+    def max_staleness_for(self, name: str) -> float:
+        """Age after which a cached result is no longer served."""
+        return (
+            self.interval_for(name) * self.config.max_staleness_factor
+            + self.config.component_timeout_seconds
+        )
+
+    def _next_delay(self, name: str) -> float:
+        interval = self.interval_for(name)
+        jitter = interval * self.config.check_jitter_ratio
+        return max(0.0, interval + random.uniform(-jitter, jitter))
+
+    # =========================================================================
+    # Lifecycle
+    # =========================================================================
+
+    async def start(self) -> None:
+        """Start one background task per registered component."""
+        if self._running:
+            logger.warning("health_check_scheduler_already_running")
+            return
+
+        self._running = True
+        for name in self._checks:
+            self._tasks[name] = asyncio.create_task(
+                self._run_component(name), name=f"health-check:{name}"
+            )
+        logger.info(
+            "health_check_scheduler_started",
+            intervals={name: self.interval_for(name) for name in self._checks},
+        )
+
+    async def stop(self) -> None:
+        """Cancel background and in-flight checks."""
+        self._running = False
+        tasks = [*self._tasks.values(), *self._in_flight.values()]
+        for task in tasks:
+            task.cancel()
+        for task in tasks:
+            with contextlib.suppress(asyncio.CancelledError):
+                await task
+        self._tasks.clear()
+        self._in_flight.clear()
+        logger.info("health_check_scheduler_stopped")
+
+    async def _run_component(self, name: str) -> None:
+        """Check a component forever on its own jittered cadence."""
+        # Small random offset so components started together drift apart
+        offset = self.interval_for(name) * self.config.check_jitter_ratio
+        await asyncio.sleep(random.uniform(0, offset))
+        while self._running:
+            try:
+                await self.refresh(name)
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                logger.error("scheduled_health_check_error", component=name, error=str(e))
+            await asyncio.sleep(self._next_delay(name))
+
+    # =========================================================================
+    # Checks
+    # =========================================================================
+
+    async def refresh(self, name: str) -> ComponentHealth:
+        """
+        Run a component check now, joining an in-flight one if there is one.
+
+        Args:
+            name: Component name
+
+        Returns:
+            Fresh ComponentHealth (also stored in the cache)
+        """
+        task = self._in_flight.get(name)
+        if task is None:
+            task = asyncio.create_task(self._check(name))
+            self._in_flight[name] = task
+            task.add_done_callback(lambda t, n=name: self._release(n, t))
+        else:
+            self._coalesced_count += 1
+        # A cancelled caller must not cancel the check other callers share
+        return await asyncio.shield(task)
+
+    def _release(self, name: str, task: asyncio.Task) -> None:
+        if self._in_flight.get(name) is task:
+            del self._in_flight[name]
+
+    async def _check(self, name: str) -> ComponentHealth:
+        start_time = time.perf_counter()
+        try:
+            health = await asyncio.wait_for(
+                self._checks[name](), timeout=self.config.component_timeout_seconds
+            )
+        except asyncio.TimeoutError:
+            logger.warning("health_check_timeout", component=name)
+            health = self._error_health(name, "Check timeout")
+        except Exception as e:
+            logger.warning("health_check_error", component=name, error=str(e))
+            health = self._error_health(name, str(e))
+
+        if health.response_time_ms is None:
+            health.response_time_ms = (time.perf_counter() - start_time) * 1000
+        health.last_check = datetime.now()
+        await self.cache.set_component(name, health)
+        self._refresh_count += 1
+        return health
+
+    async def get_components(
+        self, names: Iterable[str] | None = None, force: bool = False
+    ) -> dict[str, ComponentHealth]:
+        """
+        Get component health, refreshing only what is missing or stale.
+
+        Args:
+            names: Components to return (all registered if None)
+            force: Refresh every requested component (single-flight)
+
+        Returns:
+            Dictionary of component name to health
+        """
+        names = list(self._checks) if names is None else [n for n in names if n in self._checks]
+        results: dict[str, ComponentHealth] = {}
+        to_refresh: list[str] = []
+        for name in names:
+            health = None if force else self.cache.peek(name, fresh_only=True)
+            if health is None:
+                to_refresh.append(name)
+            else:
+                results[name] = health
+
+        if to_refresh:
+            refreshed = await asyncio.gather(*(self.refresh(name) for name in to_refresh))
+            results.update(zip(to_refresh, refreshed))
+
+        return {name: results[name] for name in names}
+
+    def snapshot(self, names: Iterable[str] | None = None) -> dict[str, ComponentHealth]:
+        """
+        Get the last known health of components without any I/O.
+
+        Stale entries are reported as UNKNOWN, components never checked are
+        omitted.
+
+        Args:
+            names: Components to return (all registered if None)
+
+        Returns:
+            Dictionary of component name to health
+        """
+        names = list(self._checks) if names is None else list(names)
+        result: dict[str, ComponentHealth] = {}
+        for name in names:
+            health = self.cache.peek(name)
+            if health is None:
+                continue
+            if not self.cache.is_fresh(name, health):
+                health = ComponentHealth(
+                    name=name,
+                    component_type=health.component_type,
+                    status=HealthStatus.UNKNOWN,
+                    message="Health result is stale",
+                    last_check=health.last_check,
+                    metadata={"stale": True, "last_status": health.status.value},
+                )
+            result[name] = health
+        return result
+
+    def _error_health(self, name: str, error: str) -> ComponentHealth:
+        return ComponentHealth(
+            name=name,
+            component_type=ComponentType.OTHER,
+            status=HealthStatus.UNHEALTHY,
+            message=error,
+            metadata={"error": error},
+        )
+
+    def get_stats(self) -> dict[str, Any]:
+        """Get scheduler statistics."""
+        return {
+            "running": self._running,
+            "components": len(self._checks),
+            "refresh_count": self._refresh_count,
+            "coalesced_refreshes": self._coalesced_count,
+            "in_flight": len(self._in_flight),
+            "cache": self.cache.get_cache_stats(),
+        }
@@ -82,6 +82,24 @@ class HealthCheckConfig:
     timeout_seconds: int = 30
     max_retries: int = 3
     retry_delay_seconds: int = 5
+    component_timeout_seconds: int = 10  # Per-checker timeout
+
+    # Background scheduling (each component on its own cadence, served from cache)
+    component_check_intervals: dict[str, int] = field(
+        default_factory=lambda: {
+            "database": 15,
+            "redis": 10,
+            "cache_hierarchy": 30,
+            "connection_pools": 15,
+            "file_system": 120,
+            "memory": 10,
+            "cpu": 10,
+            "tws_monitor": 30,
+            "websocket_pool": 30,
+        }
+    )  # Components not listed use check_interval_seconds
+    check_jitter_ratio: float = 0.1  # Random +/- fraction applied to each interval
+    max_staleness_factor: float = 3.0  # Cached result expires after N missed intervals
 
     # Component-specific thresholds
     database_timeout_seconds: int = 10
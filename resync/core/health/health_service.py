@@ -9,6 +9,8 @@ This is a refactored version that:
 - Delegates health checks to modular checkers (health_checkers/)
 - Uses existing CircuitBreakerManager for resilience
 - Delegates history tracking to HealthHistoryManager
+- Runs checkers in the background on per-component cadences and serves
+  results from cache (HealthCheckScheduler)
 - Maintains backward compatibility with existing API
 
 Original: 1,631 lines
@@ -18,16 +20,15 @@ Refactored: ~400 lines
 from __future__ import annotations
 
 import asyncio
-import contextlib
 import time
 from datetime import datetime
 from typing import TYPE_CHECKING, Any
 
 import structlog
 
+from .health_check_scheduler import HealthCheckScheduler
 from .health_models import (
     ComponentHealth,
-    ComponentType,
     HealthCheckConfig,
     HealthCheckResult,
     HealthStatus,
@@ -72,8 +73,8 @@ class HealthCheckService:
         self._checkers: dict[str, BaseHealthChecker] | None = None
         self._history_manager: Any = None
 
-        # Monitoring state
-        self._monitoring_task: asyncio.Task | None = None
+        # Staggered background checks + cached results
+        self.scheduler = HealthCheckScheduler(self.config)
         self._is_monitoring = False
 
         # Metrics
@@ -84,77 +85,56 @@ class HealthCheckService:
     # =========================================================================
 
     async def start_monitoring(self) -> None:
-        """Start continuous health monitoring in background."""
+        """Start per-component background health checks."""
         if self._is_monitoring:
             logger.warning("health_monitoring_already_active")
             return
 
         self._is_monitoring = True
-        self._monitoring_task = asyncio.create_task(self._monitoring_loop())
+        await self._get_checkers()
+        await self.scheduler.start()
         logger.info("health_check_monitoring_started")
 
     async def stop_monitoring(self) -> None:
-        """Stop continuous health monitoring."""
+        """Stop background health checks."""
         self._is_monitoring = False
-        if self._monitoring_task:
-            self._monitoring_task.cancel()
-            with contextlib.suppress(asyncio.CancelledError):
-                await self._monitoring_task
-            self._monitoring_task = None
+        await self.scheduler.stop()
         logger.info("health_check_monitoring_stopped")
 
-    async def _monitoring_loop(self) -> None:
-        """Background monitoring loop."""
-        interval = self.config.check_interval_seconds
-        while self._is_monitoring:
-            try:
-                await self.perform_comprehensive_health_check()
-                await asyncio.sleep(interval)
-            except asyncio.CancelledError:
-                break
-            except Exception as e:
-                logger.error("monitoring_loop_error", error=str(e))
-                await asyncio.sleep(interval)
-
     # =========================================================================
     # Core Health Check
     # =========================================================================
 
-    async def perform_comprehensive_health_check(self) -> HealthCheckResult:
+    async def perform_comprehensive_health_check(self, force: bool = False) -> HealthCheckResult:
         """
         Perform comprehensive health check of all components.
 
+        Fresh cached results are served as-is; only missing or stale
+        components are checked (concurrent callers share in-flight checks).
+
+        Args:
+            force: Re-check every component instead of serving cached results
+
         Returns:
             HealthCheckResult with status of all components
         """
         start_time = time.time()
 
         try:
-            # Get all health checkers
-            checkers = await self._get_checkers()
-
-            # Execute all checks in parallel
-            components = await self._execute_all_checks(checkers)
-
-            # Calculate overall status
-            status = self._calculate_overall_status(components)
-
-            # Build result
-            result = HealthCheckResult(
-                overall_status=status,
-                components=components,
-                timestamp=datetime.now(),
-                duration_ms=(time.time() - start_time) * 1000,
-                alerts=self._check_alerts(components),
-                summary=self._generate_summary(components),
+            await self._get_checkers()
+            components = await asyncio.wait_for(
+                self.scheduler.get_components(force=force),
+                timeout=self.config.timeout_seconds,
             )
 
+            result = self._build_result(components, start_time)
+
             # Update internal state
             await self._update_state(result, components)
 
             logger.debug(
                 "health_check_completed",
-                status=status.value,
+                status=result.overall_status.value,
                 duration_ms=result.duration_ms,
             )
 
@@ -164,59 +144,28 @@ class HealthCheckService:
             logger.error("health_check_failed", error=str(e))
             return self._create_error_result(start_time, str(e))
 
-    async def _execute_all_checks(
-        self, checkers: dict[str, BaseHealthChecker]
-    ) -> dict[str, ComponentHealth]:
+    def get_cached_health_result(self) -> HealthCheckResult:
         """
-        Execute all health checks in parallel with timeout.
+        Build a health result from cached component state only (no I/O).
 
-        Args:
-            checkers: Dictionary of component name to checker
-
-        Returns:
-            Dictionary of component name to health result
+        Intended for probes: stale components are reported as UNKNOWN and
+        components never checked are absent.
         """
-        tasks = {
-            name: asyncio.create_task(self._safe_check(checker, name))
-            for name, checker in checkers.items()
-        }
+        return self._build_result(self.scheduler.snapshot(), time.time())
 
-        # Wait with global timeout
-        done, pending = await asyncio.wait(
-            tasks.values(),
-            timeout=self.config.timeout_seconds,
-            return_when=asyncio.ALL_COMPLETED,
+    def _build_result(
+        self, components: dict[str, ComponentHealth], start_time: float
+    ) -> HealthCheckResult:
+        """Build a HealthCheckResult from component results."""
+        return HealthCheckResult(
+            overall_status=self._calculate_overall_status(components),
+            components=components,
+            timestamp=datetime.now(),
+            duration_ms=(time.time() - start_time) * 1000,
+            alerts=self._check_alerts(components),
+            summary=self._generate_summary(components),
         )
 
-        # Cancel pending
-        for task in pending:
-            task.cancel()
-
-        # Collect results
-        components: dict[str, ComponentHealth] = {}
-        for name, task in tasks.items():
-            if task in done and not task.cancelled():
-                try:
-                    components[name] = task.result()
-                except Exception as e:
-                    components[name] = self._error_health(name, str(e))
-            else:
-                components[name] = self._error_health(name, "Timeout")
-
-        return components
-
-    async def _safe_check(self, checker: BaseHealthChecker, name: str) -> ComponentHealth:
-        """Execute a single check with error handling."""
-        try:
-            return await asyncio.wait_for(
-                checker.check_health(),
-                timeout=self.config.component_timeout_seconds,
-            )
-        except asyncio.TimeoutError:
-            return self._error_health(name, "Component timeout")
-        except Exception as e:
-            return self._error_health(name, str(e))
-
     # =========================================================================
     # Checker Management (Delegation)
     # =========================================================================
@@ -228,8 +177,10 @@ class HealthCheckService:
                 HealthCheckerFactory,
             )
 
-            factory = HealthCheckerFactory()
-            self._checkers = factory.create_all_checkers()
+            factory = HealthCheckerFactory(self.config)
+            self._checkers = factory.get_enabled_health_checkers()
+            for name, checker in self._checkers.items():
+                self.scheduler.register(name, checker.check_health)
 
         return self._checkers
 
@@ -282,30 +233,6 @@ class HealthCheckService:
     # Helper Methods
     # =========================================================================
 
-    def _error_health(self, name: str, error: str) -> ComponentHealth:
-        """Create error health result."""
-        return ComponentHealth(
-            name=name,
-            status=HealthStatus.UNHEALTHY,
-            message=error,
-            response_time_ms=0,
-            component_type=self._get_component_type(name),
-            metadata={"error": error},
-        )
-
-    def _get_component_type(self, name: str) -> ComponentType:
-        """Map component name to type."""
-        type_map = {
-            "database": ComponentType.DATABASE,
-            "redis": ComponentType.CACHE,
-            "cache": ComponentType.CACHE,
-            "memory": ComponentType.SYSTEM,
-            "cpu": ComponentType.SYSTEM,
-            "filesystem": ComponentType.SYSTEM,
-            "tws_monitor": ComponentType.EXTERNAL,
-        }
-        return type_map.get(name, ComponentType.SERVICE)
-
     def _create_error_result(self, start_time: float, error: str) -> HealthCheckResult:
         """Create error health check result."""
         return HealthCheckResult(
@@ -368,6 +295,7 @@ class HealthCheckService:
             "history_size": len(self.health_history),
             "checkers_loaded": self._checkers is not None,
             "check_count": self._check_count,
+            "scheduler": self.scheduler.get_stats(),
             "estimated_bytes": sys.getsizeof(self.health_history),
         }
 
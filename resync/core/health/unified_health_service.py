@@ -16,7 +16,6 @@ Consolidated into a single, well-organized module (~600 lines).
 from __future__ import annotations
 
 import asyncio
-import contextlib
 import time
 from datetime import datetime
 from typing import TYPE_CHECKING, Any
@@ -25,12 +24,12 @@ import structlog
 
 from resync.core.health.health_models import (
     ComponentHealth,
-    ComponentType,
     HealthCheckConfig,
     HealthCheckResult,
     HealthStatus,
     HealthStatusHistory,
 )
+from resync.core.health.health_check_scheduler import HealthCheckScheduler
 
 if TYPE_CHECKING:
     from .health_checkers.base_health_checker import BaseHealthChecker
@@ -43,7 +42,8 @@ class UnifiedHealthService:
     Unified health check service that consolidates orchestration and enhanced monitoring.
 
     This service provides:
-    - Comprehensive health checking across all components
+    - Comprehensive health checking across all components, served from a
+      per-component cache refreshed in the background (HealthCheckScheduler)
     - Modular checker integration via HealthCheckerFactory
     - Circuit breaker protection for critical components
     - Health history tracking and metrics
@@ -71,8 +71,8 @@ class UnifiedHealthService:
         # Circuit breakers for critical components
         self._circuit_breakers: dict[str, Any] = {}
 
-        # Monitoring control
-        self._monitoring_task: asyncio.Task | None = None
+        # Staggered background checks + cached results
+        self.scheduler = HealthCheckScheduler(self.config)
         self._is_monitoring = False
 
         # Metrics
@@ -87,17 +87,23 @@ class UnifiedHealthService:
         """
         Start continuous health monitoring.
 
+        Each component is checked by its own background task on its own
+        cadence (config.component_check_intervals, with jitter).
+
         Args:
-            interval_seconds: Check interval (uses config default if None)
+            interval_seconds: Interval for components without their own
+                cadence (uses config default if None)
         """
         if self._is_monitoring:
             logger.warning("health_monitoring_already_running")
             return
 
         self._is_monitoring = True
-        interval = interval_seconds or self.config.check_interval_seconds
-        self._monitoring_task = asyncio.create_task(self._monitoring_loop(interval))
-        logger.info("unified_health_monitoring_started", interval=interval)
+        if interval_seconds:
+            self.scheduler.default_interval = float(interval_seconds)
+        await self._get_health_checkers()
+        await self.scheduler.start()
+        logger.info("unified_health_monitoring_started", components=self.scheduler.components)
 
     async def stop_monitoring(self) -> None:
         """Stop continuous health monitoring gracefully."""
@@ -105,39 +111,24 @@ class UnifiedHealthService:
             return
 
         self._is_monitoring = False
-        if self._monitoring_task:
-            self._monitoring_task.cancel()
-            with contextlib.suppress(asyncio.CancelledError):
-                await self._monitoring_task
-            self._monitoring_task = None
+        await self.scheduler.stop()
 
         logger.info("unified_health_monitoring_stopped")
 
-    async def _monitoring_loop(self, interval: int) -> None:
-        """
-        Continuous monitoring loop.
-
-        Args:
-            interval: Seconds between health checks
-        """
-        while self._is_monitoring:
-            try:
-                await self.perform_comprehensive_health_check()
-                await asyncio.sleep(interval)
-            except asyncio.CancelledError:
-                break
-            except Exception as e:
-                logger.error("health_monitoring_error", error=str(e))
-                await asyncio.sleep(interval)
-
     # =========================================================================
     # Core Health Check Operations
     # =========================================================================
 
-    async def perform_comprehensive_health_check(self) -> HealthCheckResult:
+    async def perform_comprehensive_health_check(self, force: bool = False) -> HealthCheckResult:
         """
         Perform comprehensive health check across all components.
 
+        Fresh cached results are served as-is; only missing or stale
+        components are checked (concurrent callers share in-flight checks).
+
+        Args:
+            force: Re-check every component instead of serving cached results
+
         Returns:
             HealthCheckResult with status of all components
         """
@@ -147,49 +138,13 @@ class UnifiedHealthService:
         logger.debug("starting_comprehensive_health_check", correlation_id=correlation_id)
 
         try:
-            # Get all health checkers
-            checkers = await self._get_health_checkers()
-
-            # Execute all checks in parallel with timeout
-            check_tasks = {
-                name: asyncio.create_task(self._execute_check_with_timeout(checker, name))
-                for name, checker in checkers.items()
-            }
-
-            # Wait for all checks with global timeout
-            components: dict[str, ComponentHealth] = {}
-            done, pending = await asyncio.wait(
-                check_tasks.values(),
+            await self._get_health_checkers()
+            components = await asyncio.wait_for(
+                self.scheduler.get_components(force=force),
                 timeout=self.config.timeout_seconds,
-                return_when=asyncio.ALL_COMPLETED,
             )
 
-            # Cancel pending tasks
-            for task in pending:
-                task.cancel()
-
-            # Collect results
-            for name, task in check_tasks.items():
-                if task in done and not task.cancelled():
-                    try:
-                        components[name] = task.result()
-                    except Exception as e:
-                        components[name] = self._create_error_health(name, str(e))
-                else:
-                    components[name] = self._create_error_health(name, "Check timeout")
-
-            # Calculate overall status
-            overall_status = self._calculate_overall_status(components)
-
-            # Build result
-            result = HealthCheckResult(
-                overall_status=overall_status,
-                components=components,
-                timestamp=datetime.now(),
-                duration_ms=(time.time() - start_time) * 1000,
-                alerts=self._generate_alerts(components),
-                summary=self._generate_summary(components),
-            )
+            result = self._build_result(components, start_time, correlation_id)
 
             # Update tracking
             async with self._lock:
@@ -201,7 +156,7 @@ class UnifiedHealthService:
             # Update history
             await self._update_health_history(result)
 
-            logger.info(
+            logger.debug(
                 "comprehensive_health_check_completed",
                 status=result.status.value,
                 duration_ms=result.duration_ms,
@@ -221,30 +176,36 @@ class UnifiedHealthService:
                 summary={"error": 1},
             )
 
-    async def _execute_check_with_timeout(
-        self, checker: BaseHealthChecker, name: str
-    ) -> ComponentHealth:
+    def get_cached_health_result(self) -> HealthCheckResult:
         """
-        Execute a single health check with timeout protection.
+        Build a health result from cached component state only (no I/O).
 
-        Args:
-            checker: The health checker to execute
-            name: Component name for logging
+        Intended for probes: stale components are reported as UNKNOWN and
+        components never checked are absent.
 
         Returns:
-            ComponentHealth result
+            HealthCheckResult from the last known component health
         """
-        try:
-            return await asyncio.wait_for(
-                checker.check_health(),
-                timeout=self.config.component_timeout_seconds,
-            )
-        except asyncio.TimeoutError:
-            logger.warning("health_check_timeout", component=name)
-            return self._create_error_health(name, "Check timeout")
-        except Exception as e:
-            logger.warning("health_check_error", component=name, error=str(e))
-            return self._create_error_health(name, str(e))
+        start_time = time.time()
+        return self._build_result(
+            self.scheduler.snapshot(), start_time, f"health_{int(start_time * 1000)}"
+        )
+
+    def _build_result(
+        self,
+        components: dict[str, ComponentHealth],
+        start_time: float,
+        correlation_id: str,
+    ) -> HealthCheckResult:
+        return HealthCheckResult(
+            overall_status=self._calculate_overall_status(components),
+            components=components,
+            timestamp=datetime.now(),
+            correlation_id=correlation_id,
+            duration_ms=(time.time() - start_time) * 1000,
+            alerts=self._generate_alerts(components),
+            summary=self._generate_summary(components),
+        )
 
     async def _get_health_checkers(self) -> dict[str, BaseHealthChecker]:
         """
@@ -256,8 +217,10 @@ class UnifiedHealthService:
         if self._checkers is None:
             from .health_checkers.health_checker_factory import HealthCheckerFactory
 
-            factory = HealthCheckerFactory()
-            self._checkers = factory.create_all_checkers()
+            factory = HealthCheckerFactory(self.config)
+            self._checkers = factory.get_enabled_health_checkers()
+            for name, checker in self._checkers.items():
+                self.scheduler.register(name, checker.check_health)
 
         return self._checkers
 
@@ -315,17 +278,6 @@ class UnifiedHealthService:
                 alerts.append(f"WARNING: {name} is degraded - {health.message}")
         return alerts
 
-    def _create_error_health(self, name: str, error: str) -> ComponentHealth:
-        """Create an error ComponentHealth result."""
-        return ComponentHealth(
-            name=name,
-            status=HealthStatus.UNHEALTHY,
-            message=error,
-            response_time_ms=0,
-            component_type=ComponentType.SERVICE,
-            metadata={"error": error},
-        )
-
     # =========================================================================
     # History Management
     # =========================================================================
@@ -422,6 +374,7 @@ class UnifiedHealthService:
             "last_check": self.last_health_check.isoformat() if self.last_health_check else None,
             "history_size": len(self.health_history),
             "components_tracked": len(self._component_results),
+            "scheduler": self.scheduler.get_stats(),
         }
 
 
@@ -10,7 +10,7 @@ from .exceptions import (
     IdempotencyStorageError,
 )
 from .manager import IdempotencyManager
-from .models import IdempotencyRecord, RequestContext
+from .models import ClaimResult, ClaimStatus, IdempotencyRecord, RequestContext
 from .storage import IdempotencyStorage
 from .validation import generate_idempotency_key, validate_idempotency_key
 
@@ -23,6 +23,8 @@ __all__ = [
     "IdempotencyConflictError",
     "IdempotencyManager",
     "IdempotencyRecord",
+    "ClaimResult",
+    "ClaimStatus",
     "RequestContext",
     "IdempotencyStorage",
     "validate_idempotency_key",
@@ -14,6 +14,11 @@ class IdempotencyConfig:
     key_prefix: str = "idempotency"
     processing_prefix: str = "processing"
     max_response_size_kb: int = 64  # 64KB máximo por resposta
+    processing_ttl_seconds: int = 300  # TTL da marca de processamento
+    # Duplicatas em andamento aguardam a conclusão (pub/sub) em vez de 409
+    wait_for_in_flight: bool = False
+    in_flight_wait_timeout_seconds: float = 10.0
+    completion_channel_prefix: str = "idempotency:done"
 
 
 # Instância global de configuração
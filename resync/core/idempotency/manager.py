@@ -2,15 +2,17 @@
 Gerenciador principal de idempotency refatorado.
 """
 
+import asyncio
+import uuid
 from datetime import datetime, timedelta
 from typing import Any
 
 from redis.asyncio import Redis
 
-from resync.core.idempotency.config import config
+from resync.core.idempotency.config import IdempotencyConfig, config
 from resync.core.idempotency.exceptions import IdempotencyKeyError, IdempotencyStorageError
 from resync.core.idempotency.metrics import IdempotencyMetrics
-from resync.core.idempotency.models import IdempotencyRecord
+from resync.core.idempotency.models import ClaimResult, ClaimStatus, IdempotencyRecord
 from resync.core.idempotency.storage import IdempotencyStorage
 from resync.core.idempotency.validation import IdempotencyKeyValidator
 from resync.core.structured_logger import get_logger
@@ -27,16 +29,18 @@ class IdempotencyManager:
     executadas múltiplas vezes.
     """
 
-    def __init__(self, redis_client: Redis):
+    def __init__(self, redis_client: Redis, idempotency_config: IdempotencyConfig | None = None):
         self.redis = redis_client
+        self.config = idempotency_config or config
         self.storage = IdempotencyStorage(redis_client)
         self.metrics = IdempotencyMetrics()
 
         logger.info(
             "Idempotency manager initialized",
-            ttl_hours=config.ttl_hours,
-            redis_db=config.redis_db,
-            max_response_size_kb=config.max_response_size_kb,
+            ttl_hours=self.config.ttl_hours,
+            redis_db=self.config.redis_db,
+            max_response_size_kb=self.config.max_response_size_kb,
+            wait_for_in_flight=self.config.wait_for_in_flight,
         )
 
     async def get_cached_response(
@@ -152,36 +156,15 @@ class IdempotencyManager:
             # Validar chave
             IdempotencyKeyValidator.validate(idempotency_key)
 
-            # Verificar tamanho da resposta
-            response_size = len(str(response_data).encode("utf-8"))
-            max_size_bytes = config.max_response_size_kb * 1024
-
-            if response_size > max_size_bytes:
-                logger.warning(
-                    "Response too large for idempotency cache",
-                    idempotency_key=idempotency_key,
-                    size_kb=response_size / 1024,
-                    max_size_kb=config.max_response_size_kb,
-                )
-                return False
-
-            # Criar registro
-            now = self._now()
-            expires_at = now + timedelta(hours=config.ttl_hours)
-
-            record = IdempotencyRecord(
-                idempotency_key=idempotency_key,
-                request_hash=(self._hash_request_data(request_data) if request_data else ""),
-                response_data=response_data,
-                status_code=status_code,
-                created_at=now,
-                expires_at=expires_at,
-                request_metadata=metadata or {},
+            built = self._build_record(
+                idempotency_key, response_data, status_code, request_data, metadata
             )
+            if built is None:
+                return False
+            record, ttl_seconds, response_size = built
 
             # Armazenar
             key = self._make_key(idempotency_key)
-            ttl_seconds = int((expires_at - now).total_seconds())
             success = await self.storage.set(key, record, ttl_seconds)
 
             if success:
@@ -422,6 +405,275 @@ class IdempotencyManager:
             )
             return False
 
+    async def check_or_claim(
+        self,
+        idempotency_key: str,
+        request_data: dict[str, Any] | None = None,
+        wait: bool | None = None,
+    ) -> ClaimResult:
+        """
+        Retorna a resposta cacheada ou adquire a marca de processamento
+
+        Substitui get_cached_response + is_processing + mark_processing por
+        um único script Lua atômico. Com wait=True, duplicatas em andamento
+        aguardam a notificação de conclusão via pub/sub em vez de retornar
+        PROCESSING imediatamente.
+
+        Args:
+            idempotency_key: Chave de idempotência
+            request_data: Dados da requisição para validação (opcional)
+            wait: Aguardar requisição em andamento (padrão: config.wait_for_in_flight)
+
+        Returns:
+            ClaimResult (CACHED, CLAIMED, PROCESSING ou CONFLICT)
+        """
+        self.metrics.total_requests += 1
+        if wait is None:
+            wait = self.config.wait_for_in_flight
+
+        try:
+            IdempotencyKeyValidator.validate(idempotency_key)
+            result = await self._claim(idempotency_key, request_data)
+
+            if result.status is ClaimStatus.PROCESSING and wait:
+                self.metrics.in_flight_waits += 1
+                result = await self._wait_for_completion(idempotency_key, request_data)
+
+            if result.status is ClaimStatus.CACHED:
+                self.metrics.cache_hits += 1
+            elif result.status is ClaimStatus.CLAIMED:
+                self.metrics.cache_misses += 1
+            elif result.status is ClaimStatus.CONFLICT:
+                self.metrics.key_conflicts += 1
+            else:
+                self.metrics.concurrent_blocks += 1
+            return result
+
+        except IdempotencyKeyError as e:
+            logger.warning(
+                "Invalid idempotency key",
+                idempotency_key=idempotency_key,
+                error=str(e),
+            )
+        except IdempotencyStorageError as e:
+            self.metrics.storage_errors += 1
+            logger.error(
+                "Failed to claim idempotency key",
+                idempotency_key=idempotency_key,
+                error=str(e),
+            )
+        except Exception as e:
+            self.metrics.storage_errors += 1
+            logger.error(
+                "Unexpected error claiming idempotency key",
+                idempotency_key=idempotency_key,
+                error=str(e),
+            )
+
+        # Falha aberta: executa a operação sem proteção (como antes)
+        return ClaimResult(ClaimStatus.CLAIMED)
+
+    async def complete_and_release(
+        self,
+        idempotency_key: str,
+        token: str | None,
+        response_data: dict[str, Any] | None = None,
+        status_code: int = 200,
+        request_data: dict[str, Any] | None = None,
+        metadata: dict[str, Any] | None = None,
+    ) -> bool:
+        """
+        Armazena a resposta (se fornecida) e libera a marca de processamento
+
+        Um único script Lua: se a marca ainda pertencer a este token, SET da
+        resposta, DEL da marca e PUBLISH para duplicatas em espera. Se a marca
+        expirou e outra execução a readquiriu, nada é gravado.
+
+        Args:
+            idempotency_key: Chave de idempotência
+            token: Token retornado por check_or_claim (None = sem marca)
+            response_data: Dados da resposta (None = apenas liberar)
+            status_code: Código de status HTTP
+            request_data: Dados da requisição para hash
+            metadata: Metadados adicionais
+
+        Returns:
+            True se concluído; False se a marca pertence a outra execução
+        """
+        try:
+            IdempotencyKeyValidator.validate(idempotency_key)
+
+            record = None
+            ttl_seconds = 1
+            if response_data is not None:
+                built = self._build_record(
+                    idempotency_key, response_data, status_code, request_data, metadata
+                )
+                if built is not None:
+                    record, ttl_seconds, _ = built
+
+            owned = await self.storage.complete(
+                self._make_key(idempotency_key),
+                self._make_processing_key(idempotency_key),
+                token or "",
+                record,
+                ttl_seconds,
+                self._make_channel(idempotency_key),
+            )
+            if not owned:
+                logger.warning(
+                    "Processing mark expired and was re-claimed; response not stored",
+                    idempotency_key=idempotency_key,
+                )
+                return False
+
+            logger.debug(
+                "Idempotency key completed",
+                idempotency_key=idempotency_key,
+                stored=record is not None,
+            )
+            return True
+
+        except IdempotencyKeyError as e:
+            logger.warning(
+                "Invalid idempotency key",
+                idempotency_key=idempotency_key,
+                error=str(e),
+            )
+            return False
+        except IdempotencyStorageError as e:
+            self.metrics.storage_errors += 1
+            logger.error(
+                "Failed to complete idempotency key",
+                idempotency_key=idempotency_key,
+                error=str(e),
+            )
+            return False
+        except Exception as e:
+            self.metrics.storage_errors += 1
+            logger.error(
+                "Unexpected error completing idempotency key",
+                idempotency_key=idempotency_key,
+                error=str(e),
+            )
+            return False
+
+    async def _claim(
+        self, idempotency_key: str, request_data: dict[str, Any] | None
+    ) -> ClaimResult:
+        """Executa o script de check-or-claim e interpreta o resultado"""
+        key = self._make_key(idempotency_key)
+        processing_key = self._make_processing_key(idempotency_key)
+        token = uuid.uuid4().hex
+
+        status, record = await self.storage.claim(
+            key, processing_key, token, self.config.processing_ttl_seconds
+        )
+
+        if status == ClaimStatus.CLAIMED.value:
+            return ClaimResult(ClaimStatus.CLAIMED, token=token)
+        if status == ClaimStatus.PROCESSING.value:
+            return ClaimResult(ClaimStatus.PROCESSING)
+
+        if request_data is not None and record.request_hash:
+            current_hash = self._hash_request_data(request_data)
+            if current_hash != record.request_hash:
+                logger.warning(
+                    "Idempotency key collision detected",
+                    idempotency_key=idempotency_key,
+                    stored_hash=record.request_hash,
+                    current_hash=current_hash,
+                )
+                # Sem marca de processamento: executar a operação permitiria
+                # duplicatas concorrentes do payload divergente
+                return ClaimResult(ClaimStatus.CONFLICT)
+
+        logger.debug(
+            "Idempotency cache hit",
+            idempotency_key=idempotency_key,
+            age_seconds=(self._now() - record.created_at).total_seconds(),
+        )
+        return ClaimResult(
+            ClaimStatus.CACHED,
+            cached_response={
+                "status_code": record.status_code,
+                "data": record.response_data,
+                "cached_at": record.created_at.isoformat(),
+                "expires_at": record.expires_at.isoformat(),
+            },
+        )
+
+    async def _wait_for_completion(
+        self, idempotency_key: str, request_data: dict[str, Any] | None
+    ) -> ClaimResult:
+        """
+        Aguarda a conclusão da requisição em andamento via pub/sub
+
+        Assina o canal antes de repetir o claim, para não perder uma
+        notificação publicada entre o primeiro claim e a assinatura.
+        """
+        loop = asyncio.get_running_loop()
+        deadline = loop.time() + self.config.in_flight_wait_timeout_seconds
+        pubsub = self.redis.pubsub()
+        try:
+            await pubsub.subscribe(self._make_channel(idempotency_key))
+            result = await self._claim(idempotency_key, request_data)
+
+            while result.status is ClaimStatus.PROCESSING:
+                remaining = deadline - loop.time()
+                if remaining <= 0:
+                    logger.warning(
+                        "Timed out waiting for in-flight idempotent request",
+                        idempotency_key=idempotency_key,
+                        timeout_seconds=self.config.in_flight_wait_timeout_seconds,
+                    )
+                    break
+                message = await pubsub.get_message(
+                    ignore_subscribe_messages=True, timeout=remaining
+                )
+                if message is not None:
+                    # Resposta armazenada (CACHED) ou liberada sem cache (CLAIMED)
+                    result = await self._claim(idempotency_key, request_data)
+            return result
+        finally:
+            await pubsub.unsubscribe()
+            await pubsub.aclose()
+
+    def _build_record(
+        self,
+        idempotency_key: str,
+        response_data: dict[str, Any],
+        status_code: int,
+        request_data: dict[str, Any] | None,
+        metadata: dict[str, Any] | None,
+    ) -> tuple[IdempotencyRecord, int, int] | None:
+        """Cria o registro a armazenar (None se a resposta for grande demais)"""
+        # Verificar tamanho da resposta
+        response_size = len(str(response_data).encode("utf-8"))
+        max_size_bytes = self.config.max_response_size_kb * 1024
+
+        if response_size > max_size_bytes:
+            logger.warning(
+                "Response too large for idempotency cache",
+                idempotency_key=idempotency_key,
+                size_kb=response_size / 1024,
+                max_size_kb=self.config.max_response_size_kb,
+            )
+            return None
+
+        now = self._now()
+        expires_at = now + timedelta(hours=self.config.ttl_hours)
+        record = IdempotencyRecord(
+            idempotency_key=idempotency_key,
+            request_hash=(self._hash_request_data(request_data) if request_data else ""),
+            response_data=response_data,
+            status_code=status_code,
+            created_at=now,
+            expires_at=expires_at,
+            request_metadata=metadata or {},
+        )
+        return record, int((expires_at - now).total_seconds()), response_size
+
     def get_metrics(self) -> dict[str, Any]:
         """Retorna métricas atuais"""
         return {
@@ -430,17 +682,23 @@ class IdempotencyManager:
             "cache_misses": self.metrics.cache_misses,
             "hit_rate": self.metrics.hit_rate,
             "concurrent_blocks": self.metrics.concurrent_blocks,
+            "in_flight_waits": self.metrics.in_flight_waits,
+            "key_conflicts": self.metrics.key_conflicts,
             "storage_errors": self.metrics.storage_errors,
             "expired_cleanups": self.metrics.expired_cleanups,
         }
 
     def _make_key(self, idempotency_key: str) -> str:
         """Cria chave Redis para resposta cacheada"""
-        return f"{config.key_prefix}:{idempotency_key}"
+        return f"{self.config.key_prefix}:{idempotency_key}"
 
     def _make_processing_key(self, idempotency_key: str) -> str:
         """Cria chave Redis para marca de processamento"""
-        return f"{config.processing_prefix}:{idempotency_key}"
+        return f"{self.config.processing_prefix}:{idempotency_key}"
+
+    def _make_channel(self, idempotency_key: str) -> str:
+        """Cria canal pub/sub de conclusão da chave"""
+        return f"{self.config.completion_channel_prefix}:{idempotency_key}"
 
     def _hash_request_data(self, request_data: dict[str, Any]) -> str:
         """
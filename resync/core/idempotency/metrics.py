@@ -13,6 +13,8 @@ class IdempotencyMetrics:
     cache_hits: int = 0
     cache_misses: int = 0
     concurrent_blocks: int = 0
+    in_flight_waits: int = 0
+    key_conflicts: int = 0
     storage_errors: int = 0
     expired_cleanups: int = 0
 
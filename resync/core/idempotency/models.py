@@ -4,6 +4,7 @@ Modelos de dados para o sistema de idempotency.
 
 from dataclasses import dataclass, field
 from datetime import datetime
+from enum import Enum
 from typing import Any
 
 
@@ -45,6 +46,28 @@ class IdempotencyRecord:
         )
 
 
+class ClaimStatus(str, Enum):
+    """Resultado do check-or-claim atômico"""
+
+    CACHED = "cached"  # Resposta já armazenada
+    CLAIMED = "claimed"  # Esta requisição detém a marca de processamento
+    PROCESSING = "processing"  # Outra requisição está processando a chave
+    CONFLICT = "conflict"  # Chave reutilizada com payload diferente
+
+
+@dataclass
+class ClaimResult:
+    """Resultado de IdempotencyManager.check_or_claim"""
+
+    status: ClaimStatus
+    cached_response: dict[str, Any] | None = None
+    token: str | None = None  # Dono da marca de processamento (CLAIMED)
+
+    @property
+    def claimed(self) -> bool:
+        return self.status is ClaimStatus.CLAIMED
+
+
 @dataclass
 class RequestContext:
     """Contexto de uma requisição para idempotency"""
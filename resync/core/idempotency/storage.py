@@ -1,18 +1,65 @@
 """
 Abstração de armazenamento para o sistema de idempotency.
+
+O protocolo principal usa dois scripts Lua atômicos (um round trip cada):
+
+- CLAIM: retorna a resposta cacheada ou adquire a marca de processamento
+  (SET NX), eliminando a corrida entre "is_processing" e "mark_processing"
+- COMPLETE: se a marca ainda pertencer ao dono, grava a resposta (opcional),
+  libera a marca e publica a conclusão para duplicatas em espera; uma
+  execução cuja marca expirou (e foi readquirida) não sobrescreve a resposta
 """
 
+import json
+
 from redis.asyncio import Redis
 
 from resync.core.idempotency.exceptions import IdempotencyStorageError
 from resync.core.idempotency.models import IdempotencyRecord
 
+# KEYS[1]=resposta, KEYS[2]=processamento; ARGV[1]=token, ARGV[2]=TTL (s)
+# Retorna {"cached", <registro>} | {"claimed", ""} | {"processing", ""}
+CLAIM_SCRIPT = """
+local cached = redis.call('GET', KEYS[1])
+if cached then
+    return {'cached', cached}
+end
+if redis.call('SET', KEYS[2], ARGV[1], 'NX', 'EX', ARGV[2]) then
+    return {'claimed', ''}
+end
+return {'processing', ''}
+"""
+
+# KEYS[1]=resposta, KEYS[2]=processamento
+# ARGV[1]=token ('' = falha aberta, sem marca), ARGV[2]=registro ('' = apenas
+# liberar), ARGV[3]=TTL (s), ARGV[4]=canal de conclusão
+# Retorna 0 se a marca pertence a outro dono (nada é gravado)
+COMPLETE_SCRIPT = """
+if ARGV[1] ~= '' then
+    if redis.call('GET', KEYS[2]) ~= ARGV[1] then
+        return 0
+    end
+    redis.call('DEL', KEYS[2])
+end
+if ARGV[2] ~= '' then
+    redis.call('SET', KEYS[1], ARGV[2], 'EX', ARGV[3])
+end
+redis.call('PUBLISH', ARGV[4], ARGV[2] ~= '' and 'stored' or 'released')
+return 1
+"""
+
+
+def _decode(value: bytes | str) -> str:
+    return value.decode("utf-8") if isinstance(value, bytes) else value
+
 
 class IdempotencyStorage:
     """Abstração de armazenamento para o sistema de idempotency"""
 
     def __init__(self, redis_client: Redis):
         self.redis = redis_client
+        self._claim_script = None
+        self._complete_script = None
 
     async def get(self, key: str) -> IdempotencyRecord | None:
         """Recupera registro de idempotency"""
@@ -20,24 +67,14 @@ class IdempotencyStorage:
             cached_data = await self.redis.get(key)
             if not cached_data:
                 return None
-
-            record_data = await self.redis.get(key)
-            if not record_data:
-                return None
-
-            record_dict = await self.redis.get(key)
-            if not record_dict:
-                return None
-
-            return IdempotencyRecord.from_dict(record_dict)
+            return IdempotencyRecord.from_dict(json.loads(_decode(cached_data)))
         except Exception as e:
             raise IdempotencyStorageError(f"Failed to get idempotency record: {str(e)}") from e
 
     async def set(self, key: str, record: IdempotencyRecord, ttl_seconds: int) -> bool:
         """Armazena registro de idempotency"""
         try:
-            data = record.to_dict()
-            serialized_data = str(data)
+            serialized_data = json.dumps(record.to_dict())
             success = await self.redis.setex(key, ttl_seconds, serialized_data)
             return bool(success)
         except Exception as e:
@@ -57,3 +94,55 @@ class IdempotencyStorage:
             return deleted > 0
         except Exception as e:
             raise IdempotencyStorageError(f"Failed to delete key: {str(e)}") from e
+
+    async def claim(
+        self, key: str, processing_key: str, token: str, ttl_seconds: int
+    ) -> tuple[str, IdempotencyRecord | None]:
+        """
+        Check-or-claim atômico (um round trip)
+
+        Returns:
+            ("cached", registro) | ("claimed", None) | ("processing", None)
+        """
+        try:
+            if self._claim_script is None:
+                # EVALSHA com fallback automático para EVAL (NOSCRIPT)
+                self._claim_script = self.redis.register_script(CLAIM_SCRIPT)
+            status, payload = await self._claim_script(
+                keys=[key, processing_key], args=[token, ttl_seconds]
+            )
+            status = _decode(status)
+            if status == "cached":
+                return status, IdempotencyRecord.from_dict(json.loads(_decode(payload)))
+            return status, None
+        except Exception as e:
+            raise IdempotencyStorageError(f"Failed to claim idempotency key: {str(e)}") from e
+
+    async def complete(
+        self,
+        key: str,
+        processing_key: str,
+        token: str,
+        record: IdempotencyRecord | None,
+        ttl_seconds: int,
+        channel: str,
+    ) -> bool:
+        """
+        Grava a resposta (se houver), libera a marca e notifica (um round trip)
+
+        Returns:
+            False se a marca expirou e pertence a outra execução
+        """
+        try:
+            if self._complete_script is None:
+                self._complete_script = self.redis.register_script(COMPLETE_SCRIPT)
+            payload = json.dumps(record.to_dict()) if record is not None else ""
+            result = await self._complete_script(
+                keys=[key, processing_key],
+                args=[token, payload, ttl_seconds, channel],
+            )
+            return bool(result)
+        except Exception as e:
+            raise IdempotencyStorageError(
+                f"Failed to complete idempotency key: {str(e)}"
+            ) from e
@@ -0,0 +1,218 @@
+"""
+Compact binary codec and delta encoding for LangGraph checkpoints.
+
+Used by PostgresCheckpointer to avoid rewriting the whole, growing graph
+state at every node transition of long diagnostic runs.
+
+Features:
+- msgpack serialization (JSON fallback when msgpack is not installed)
+- zstd / lz4 compression (gzip fallback) above a size threshold
+- Self-describing header, so every stored blob can be decoded regardless
+  of which optional libraries the writer had
+- Per-channel digests to compute "changed channels since parent" deltas
+
+Blob layout:
+    b"RC" | version (1 byte) | serializer (1 byte) | compression (1 byte) | payload
+"""
+
+from __future__ import annotations
+
+import gzip
+import hashlib
+import json
+from typing import Any
+
+try:
+    import msgpack
+
+    MSGPACK_AVAILABLE = True
+except ImportError:
+    msgpack = None
+    MSGPACK_AVAILABLE = False
+
+try:
+    import zstandard
+
+    ZSTD_AVAILABLE = True
+except ImportError:
+    zstandard = None
+    ZSTD_AVAILABLE = False
+
+try:
+    import lz4.frame as lz4_frame
+
+    LZ4_AVAILABLE = True
+except ImportError:
+    lz4_frame = None
+    LZ4_AVAILABLE = False
+
+
+MAGIC = b"RC"
+VERSION = 1
+
+SERIALIZER_JSON = 0
+SERIALIZER_MSGPACK = 1
+
+COMPRESSION_NONE = 0
+COMPRESSION_ZSTD = 1
+COMPRESSION_LZ4 = 2
+COMPRESSION_GZIP = 3
+
+# Keys of the checkpoint dict that hold per-channel state
+CHANNEL_VALUES_KEY = "channel_values"
+
+
+class CheckpointCodecError(ValueError):
+    """Raised when a checkpoint blob cannot be decoded."""
+
+
+def _default(obj: Any) -> Any:
+    """Fallback for non-native types (mirrors json.dumps(default=str))."""
+    if isinstance(obj, set | frozenset):
+        return sorted(obj, key=str)
+    return str(obj)
+
+
+def _pack(data: Any) -> tuple[int, bytes]:
+    if MSGPACK_AVAILABLE:
+        return SERIALIZER_MSGPACK, msgpack.packb(data, default=_default, use_bin_type=True)
+    return SERIALIZER_JSON, json.dumps(data, default=_default, ensure_ascii=False).encode("utf-8")
+
+
+def _unpack(serializer: int, payload: bytes) -> Any:
+    if serializer == SERIALIZER_MSGPACK:
+        if not MSGPACK_AVAILABLE:
+            raise CheckpointCodecError("msgpack is required to decode this checkpoint")
+        return msgpack.unpackb(payload, raw=False, strict_map_key=False)
+    if serializer == SERIALIZER_JSON:
+        return json.loads(payload.decode("utf-8"))
+    raise CheckpointCodecError(f"Unknown serializer id {serializer}")
+
+
+def _compress(payload: bytes, level: int) -> tuple[int, bytes]:
+    if ZSTD_AVAILABLE:
+        return COMPRESSION_ZSTD, zstandard.ZstdCompressor(level=level).compress(payload)
+    if LZ4_AVAILABLE:
+        return COMPRESSION_LZ4, lz4_frame.compress(payload)
+    return COMPRESSION_GZIP, gzip.compress(payload)
+
+
+def _decompress(compression: int, payload: bytes) -> bytes:
+    if compression == COMPRESSION_NONE:
+        return payload
+    if compression == COMPRESSION_ZSTD:
+        if not ZSTD_AVAILABLE:
+            raise CheckpointCodecError("zstandard is required to decode this checkpoint")
+        return zstandard.ZstdDecompressor().decompress(payload)
+    if compression == COMPRESSION_LZ4:
+        if not LZ4_AVAILABLE:
+            raise CheckpointCodecError("lz4 is required to decode this checkpoint")
+        return lz4_frame.decompress(payload)
+    if compression == COMPRESSION_GZIP:
+        return gzip.decompress(payload)
+    raise CheckpointCodecError(f"Unknown compression id {compression}")
+
+
+def encode(data: Any, compress_threshold: int = 1024, level: int = 3) -> bytes:
+    """
+    Encode data into a self-describing binary blob.
+
+    Args:
+        data: Checkpoint (or delta) record
+        compress_threshold: Compress payloads larger than this (bytes)
+        level: zstd compression level
+
+    Returns:
+        Encoded blob
+    """
+    serializer, payload = _pack(data)
+
+    compression = COMPRESSION_NONE
+    if len(payload) > compress_threshold:
+        compression, payload = _compress(payload, level)
+
+    return MAGIC + bytes((VERSION, serializer, compression)) + payload
+
+
+def decode(blob: bytes) -> Any:
+    """Decode a blob produced by encode()."""
+    blob = bytes(blob)
+    if len(blob) < 5 or blob[:2] != MAGIC:
+        raise CheckpointCodecError("Not a binary checkpoint blob")
+    if blob[2] != VERSION:
+        raise CheckpointCodecError(f"Unsupported checkpoint blob version {blob[2]}")
+
+    return _unpack(blob[3], _decompress(blob[4], blob[5:]))
+
+
+def channel_digests(channels: dict[str, Any]) -> dict[str, bytes]:
+    """Compute a short digest of each channel value for change detection."""
+    return {
+        name: hashlib.blake2b(_pack(value)[1], digest_size=16).digest()
+        for name, value in channels.items()
+    }
+
+
+def split_checkpoint(
+    checkpoint: dict[str, Any],
+) -> tuple[dict[str, Any], dict[str, Any] | None]:
+    """
+    Split a checkpoint into (channels, header).
+
+    LangGraph checkpoints keep state under "channel_values"; plain dict states
+    are treated as one channel per top-level key.
+    """
+    values = checkpoint.get(CHANNEL_VALUES_KEY)
+    if isinstance(values, dict):
+        header = {k: v for k, v in checkpoint.items() if k != CHANNEL_VALUES_KEY}
+        return values, header
+    return checkpoint, None
+
+
+def join_checkpoint(channels: dict[str, Any], header: dict[str, Any] | None) -> dict[str, Any]:
+    """Inverse of split_checkpoint()."""
+    if header is None:
+        return dict(channels)
+    return {**header, CHANNEL_VALUES_KEY: dict(channels)}
+
+
+def make_delta(
+    channels: dict[str, Any],
+    digests: dict[str, bytes],
+    parent_digests: dict[str, bytes],
+) -> tuple[dict[str, Any], list[str]]:
+    """
+    Compute the channels changed or removed relative to the parent.
+
+    Returns:
+        (changed channel values, removed channel names)
+    """
+    changed = {name: channels[name] for name, d in digests.items() if parent_digests.get(name) != d}
+    removed = [name for name in parent_digests if name not in digests]
+    return changed, removed
+
+
+def apply_delta(
+    channels: dict[str, Any],
+    changed: dict[str, Any],
+    removed: list[str],
+) -> dict[str, Any]:
+    """Apply a delta produced by make_delta() to parent channel values."""
+    result = {k: v for k, v in channels.items() if k not in removed}
+    result.update(changed)
+    return result
+
+
+__all__ = [
+    "CheckpointCodecError",
+    "LZ4_AVAILABLE",
+    "MSGPACK_AVAILABLE",
+    "ZSTD_AVAILABLE",
+    "apply_delta",
+    "channel_digests",
+    "decode",
+    "encode",
+    "join_checkpoint",
+    "make_delta",
+    "split_checkpoint",
+]
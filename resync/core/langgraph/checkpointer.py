@@ -10,6 +10,8 @@ Features:
 - TTL-based expiration
 - Compression for large states
 - Efficient serialization
+- Delta checkpoints (v5.9.10): only channels changed since the parent are
+  written, in a compact binary encoding, with periodic full compaction
 
 Usage:
     checkpointer = await get_checkpointer()
@@ -24,10 +26,12 @@ from __future__ import annotations
 import asyncio
 import gzip
 import json
+from collections import OrderedDict
 from datetime import datetime, timedelta
 from functools import lru_cache
 from typing import Any
 
+from resync.core.langgraph import checkpoint_codec as codec
 from resync.core.structured_logger import get_logger
 
 logger = get_logger(__name__)
@@ -88,6 +92,23 @@ class CheckpointRecord:
         self.expires_at = expires_at
 
 
+# Values of the checkpoint_format column
+FORMAT_JSON = 0  # Legacy: JSONB column or gzip'd JSON in checkpoint_compressed
+FORMAT_FULL = 1  # Binary full checkpoint in checkpoint_blob
+FORMAT_DELTA = 2  # Binary delta against delta_parent in checkpoint_blob
+
+
+class _ChainState:
+    """What the writer remembers about a checkpoint it wrote (for deltas)."""
+
+    __slots__ = ("base_id", "depth", "digests")
+
+    def __init__(self, base_id: str, depth: int, digests: dict[str, bytes]):
+        self.base_id = base_id
+        self.depth = depth
+        self.digests = digests
+
+
 # =============================================================================
 # CHECKPOINTER
 # =============================================================================
@@ -106,6 +127,12 @@ class PostgresCheckpointer(BaseCheckpointSaver if LANGGRAPH_AVAILABLE else objec
             checkpoint_id VARCHAR(255) NOT NULL,
             parent_id VARCHAR(255),
             checkpoint JSONB NOT NULL,
+            checkpoint_compressed BYTEA,
+            checkpoint_format SMALLINT DEFAULT 0,
+            checkpoint_blob BYTEA,
+            base_checkpoint_id VARCHAR(255),
+            delta_parent_id VARCHAR(255),
+            chain_depth INTEGER DEFAULT 0,
             metadata JSONB DEFAULT '{}',
             created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
             expires_at TIMESTAMP,
@@ -113,12 +140,20 @@ class PostgresCheckpointer(BaseCheckpointSaver if LANGGRAPH_AVAILABLE else objec
         );
         CREATE INDEX idx_checkpoints_thread ON langgraph_checkpoints(thread_id);
         CREATE INDEX idx_checkpoints_expires ON langgraph_checkpoints(expires_at);
+        CREATE INDEX idx_checkpoints_base ON langgraph_checkpoints(thread_id, base_checkpoint_id);
+
+    Delta format:
+        A full checkpoint (format 1) starts a chain and is its own base. Each
+        following write stores only the channels changed since the previous
+        checkpoint in the chain (format 2). Reads rebuild state from the base
+        by replaying the chain; a new full checkpoint is written every
+        ``compaction_interval`` writes, bounding replay cost.
     """
 
     _instance: PostgresCheckpointer | None = None
     _initialized: bool = False
 
-    def __new__(cls) -> PostgresCheckpointer:
+    def __new__(cls, *args: Any, **kwargs: Any) -> PostgresCheckpointer:
         """Singleton pattern."""
         if cls._instance is None:
             cls._instance = super().__new__(cls)
@@ -128,6 +163,10 @@ class PostgresCheckpointer(BaseCheckpointSaver if LANGGRAPH_AVAILABLE else objec
         self,
         ttl_hours: int = 24,
         compress_threshold: int = 10000,
+        binary_format: bool = True,
+        compaction_interval: int = 20,
+        binary_compress_threshold: int = 1024,
+        max_tracked_checkpoints: int = 2048,
     ):
         """
         Initialize the checkpointer.
@@ -135,38 +174,70 @@ class PostgresCheckpointer(BaseCheckpointSaver if LANGGRAPH_AVAILABLE else objec
         Args:
             ttl_hours: Time-to-live for checkpoints in hours
             compress_threshold: Compress states larger than this (bytes)
+            binary_format: Write binary full/delta checkpoints (False = legacy JSON)
+            compaction_interval: Max chain length before a full checkpoint is written
+            binary_compress_threshold: Compress binary payloads larger than this (bytes)
+            max_tracked_checkpoints: Checkpoints remembered in-process as delta parents
         """
         if self._initialized:
             return
 
         self.ttl_hours = ttl_hours
         self.compress_threshold = compress_threshold
+        self.binary_format = binary_format
+        self.compaction_interval = max(1, compaction_interval)
+        self.binary_compress_threshold = binary_compress_threshold
+        self.max_tracked_checkpoints = max_tracked_checkpoints
         self._lock = asyncio.Lock()
+
+        # (thread_id, checkpoint_id) -> chain state of checkpoints written here
+        self._chains: OrderedDict[tuple[str, str], _ChainState] = OrderedDict()
+        # thread_id -> last checkpoint_id written here
+        self._latest: OrderedDict[str, str] = OrderedDict()
+
         self._initialized = True
 
     async def ensure_table(self) -> None:
         """Create the checkpoints table if it doesn't exist."""
         from resync.core.database.engine import get_db_session
 
-        create_table_sql = """
-        CREATE TABLE IF NOT EXISTS langgraph_checkpoints (
-            thread_id VARCHAR(255) NOT NULL,
-            checkpoint_id VARCHAR(255) NOT NULL,
-            parent_id VARCHAR(255),
-            checkpoint JSONB NOT NULL,
-            checkpoint_compressed BYTEA,
-            metadata JSONB DEFAULT '{}',
-            created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
-            expires_at TIMESTAMP,
-            PRIMARY KEY (thread_id, checkpoint_id)
-        );
-        CREATE INDEX IF NOT EXISTS idx_checkpoints_thread ON langgraph_checkpoints(thread_id);
-        CREATE INDEX IF NOT EXISTS idx_checkpoints_expires ON langgraph_checkpoints(expires_at);
-        """
+        from sqlalchemy import text
+
+        statements = [
+            """
+            CREATE TABLE IF NOT EXISTS langgraph_checkpoints (
+                thread_id VARCHAR(255) NOT NULL,
+                checkpoint_id VARCHAR(255) NOT NULL,
+                parent_id VARCHAR(255),
+                checkpoint JSONB NOT NULL,
+                checkpoint_compressed BYTEA,
+                metadata JSONB DEFAULT '{}',
+                created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+                expires_at TIMESTAMP,
+                PRIMARY KEY (thread_id, checkpoint_id)
+            )
+            """,
+            "ALTER TABLE langgraph_checkpoints "
+            "ADD COLUMN IF NOT EXISTS checkpoint_format SMALLINT DEFAULT 0",
+            "ALTER TABLE langgraph_checkpoints ADD COLUMN IF NOT EXISTS checkpoint_blob BYTEA",
+            "ALTER TABLE langgraph_checkpoints "
+            "ADD COLUMN IF NOT EXISTS base_checkpoint_id VARCHAR(255)",
+            "ALTER TABLE langgraph_checkpoints "
+            "ADD COLUMN IF NOT EXISTS delta_parent_id VARCHAR(255)",
+            "ALTER TABLE langgraph_checkpoints "
+            "ADD COLUMN IF NOT EXISTS chain_depth INTEGER DEFAULT 0",
+            "CREATE INDEX IF NOT EXISTS idx_checkpoints_thread "
+            "ON langgraph_checkpoints(thread_id)",
+            "CREATE INDEX IF NOT EXISTS idx_checkpoints_expires "
+            "ON langgraph_checkpoints(expires_at)",
+            "CREATE INDEX IF NOT EXISTS idx_checkpoints_base "
+            "ON langgraph_checkpoints(thread_id, base_checkpoint_id)",
+        ]
 
         try:
             async with get_db_session() as session:
-                await session.execute(create_table_sql)
+                for statement in statements:
+                    await session.execute(text(statement))
                 await session.commit()
             logger.info("checkpoint_table_ensured")
         except Exception as e:
@@ -196,6 +267,326 @@ class PostgresCheckpointer(BaseCheckpointSaver if LANGGRAPH_AVAILABLE else objec
 
         return {}
 
+    # =========================================================================
+    # DELTA CHAINS
+    # =========================================================================
+
+    def _remember(self, thread_id: str, checkpoint_id: str, state: _ChainState) -> None:
+        """Track a written checkpoint so the next write can be a delta."""
+        key = (thread_id, checkpoint_id)
+        self._chains[key] = state
+        self._chains.move_to_end(key)
+        self._latest[thread_id] = checkpoint_id
+        self._latest.move_to_end(thread_id)
+
+        while len(self._chains) > self.max_tracked_checkpoints:
+            self._chains.popitem(last=False)
+        while len(self._latest) > self.max_tracked_checkpoints:
+            self._latest.popitem(last=False)
+
+    def _encode_binary(
+        self,
+        thread_id: str,
+        checkpoint_id: str,
+        parent_id: str | None,
+        checkpoint: dict[str, Any],
+        force_full: bool = False,
+    ) -> tuple[int, bytes, str, str | None, int]:
+        """
+        Encode a checkpoint as a full or delta blob.
+
+        The delta parent is the explicit parent checkpoint if this process
+        wrote it, otherwise the latest checkpoint written for the thread.
+        ``force_full`` skips delta encoding (e.g. when the parent row is gone).
+
+        Returns:
+            (format, blob, base_checkpoint_id, delta_parent_id, chain_depth)
+        """
+        channels, header = codec.split_checkpoint(checkpoint)
+        digests = codec.channel_digests(channels)
+
+        delta_parent = parent_id if (thread_id, parent_id) in self._chains else None
+        delta_parent = delta_parent or self._latest.get(thread_id)
+        parent_state = self._chains.get((thread_id, delta_parent)) if delta_parent else None
+        if force_full:
+            parent_state = None
+
+        if parent_state is not None and parent_state.depth + 1 < self.compaction_interval:
+            changed, removed = codec.make_delta(channels, digests, parent_state.digests)
+            record = {"header": header, "set": changed, "del": removed}
+            state = _ChainState(parent_state.base_id, parent_state.depth + 1, digests)
+            fmt = FORMAT_DELTA
+        else:
+            record = {"header": header, "set": channels, "del": []}
+            state = _ChainState(checkpoint_id, 0, digests)
+            delta_parent = None
+            fmt = FORMAT_FULL
+
+        blob = codec.encode(record, compress_threshold=self.binary_compress_threshold)
+        self._remember(thread_id, checkpoint_id, state)
+        return fmt, blob, state.base_id, delta_parent, state.depth
+
+    async def _confirm_delta_parent(
+        self,
+        session: Any,
+        thread_id: str,
+        checkpoint_id: str,
+        checkpoint: dict[str, Any],
+        encoded: tuple[int, bytes, str, str | None, int],
+    ) -> tuple[int, bytes, str, str | None, int]:
+        """
+        Re-read the delta parent's chain before writing a delta.
+
+        Another worker may have compacted the parent since this process
+        wrote it, moving it (and its descendants) to a new base; a delta
+        filed under the old base would be unreachable. The parent row is
+        locked FOR SHARE until the write commits, so a concurrent compaction
+        waits and then rebases this delta along with the rest of the chain.
+        """
+        from sqlalchemy import text
+
+        fmt, blob, base_id, delta_parent, depth = encoded
+        if fmt != FORMAT_DELTA:
+            return encoded
+
+        query = text("""
+            SELECT base_checkpoint_id, chain_depth FROM langgraph_checkpoints
+            WHERE thread_id = :thread_id AND checkpoint_id = :checkpoint_id
+              AND checkpoint_format IN (:full, :delta)
+            FOR SHARE
+        """)
+        row = (
+            await session.execute(
+                query,
+                {
+                    "thread_id": thread_id,
+                    "checkpoint_id": delta_parent,
+                    "full": FORMAT_FULL,
+                    "delta": FORMAT_DELTA,
+                },
+            )
+        ).fetchone()
+
+        if row is None:
+            # Parent expired or was deleted: this write starts a new chain
+            return self._encode_binary(thread_id, checkpoint_id, None, checkpoint, force_full=True)
+
+        parent_base, parent_depth = row[0] or delta_parent, row[1] or 0
+        if parent_base == base_id and parent_depth + 1 == depth:
+            return encoded
+
+        state = self._chains.get((thread_id, checkpoint_id))
+        if state is not None:
+            state.base_id, state.depth = parent_base, parent_depth + 1
+        parent_state = self._chains.get((thread_id, delta_parent))
+        if parent_state is not None:
+            parent_state.base_id, parent_state.depth = parent_base, parent_depth
+        return fmt, blob, parent_base, delta_parent, parent_depth + 1
+
+    async def _load_chain_rows(
+        self,
+        session: Any,
+        thread_id: str,
+        base_ids: set[str],
+    ) -> dict[str, tuple]:
+        """Fetch every row of the given delta chains (expired rows included)."""
+        from sqlalchemy import bindparam, text
+
+        query = text("""
+            SELECT checkpoint_id, checkpoint_format, checkpoint_blob,
+                   base_checkpoint_id, delta_parent_id
+            FROM langgraph_checkpoints
+            WHERE thread_id = :thread_id
+              AND base_checkpoint_id IN :base_ids
+        """).bindparams(bindparam("base_ids", expanding=True))
+
+        result = await session.execute(
+            query, {"thread_id": thread_id, "base_ids": sorted(base_ids)}
+        )
+        return {row[0]: tuple(row) for row in result.fetchall()}
+
+    @staticmethod
+    def _rebuild(checkpoint_id: str, chain: dict[str, tuple]) -> dict[str, Any]:
+        """Rebuild a checkpoint by replaying its chain from the full base."""
+        path = []
+        current: str | None = checkpoint_id
+        while current is not None:
+            row = chain.get(current)
+            if row is None:
+                raise codec.CheckpointCodecError(f"Checkpoint chain broken at {current}")
+            path.append(row)
+            current = row[4] if row[1] == FORMAT_DELTA else None
+
+        channels: dict[str, Any] = {}
+        header: dict[str, Any] | None = None
+        for row in reversed(path):
+            record = codec.decode(row[2])
+            channels = codec.apply_delta(channels, record.get("set", {}), record.get("del", []))
+            header = record.get("header")
+
+        return codec.join_checkpoint(channels, header)
+
+    async def _decode_rows(
+        self,
+        session: Any,
+        thread_id: str,
+        rows: list[tuple],
+    ) -> dict[str, dict[str, Any]]:
+        """
+        Decode checkpoint rows of any format.
+
+        Each row is (checkpoint_id, checkpoint_format, checkpoint, checkpoint_compressed,
+        checkpoint_blob). Delta rows trigger one extra query for their chains.
+        """
+        decoded: dict[str, dict[str, Any]] = {}
+        delta_rows = []
+
+        for checkpoint_id, fmt, checkpoint_json, compressed, blob in rows:
+            if fmt == FORMAT_FULL:
+                record = codec.decode(blob)
+                decoded[checkpoint_id] = codec.join_checkpoint(
+                    record.get("set", {}), record.get("header")
+                )
+            elif fmt == FORMAT_DELTA:
+                delta_rows.append(checkpoint_id)
+            else:
+                decoded[checkpoint_id] = self._deserialize(
+                    checkpoint_json
+                    if isinstance(checkpoint_json, str)
+                    else json.dumps(checkpoint_json),
+                    compressed,
+                )
+
+        if delta_rows:
+            base_ids: set[str] = set()
+            unknown: list[str] = []
+            for cid in delta_rows:
+                state = self._chains.get((thread_id, cid))
+                if state is not None:
+                    base_ids.add(state.base_id)
+                else:
+                    unknown.append(cid)
+
+            if unknown:
+                # Written by another process: look up which chains they belong to
+                from sqlalchemy import bindparam, text
+
+                query = text("""
+                    SELECT DISTINCT base_checkpoint_id FROM langgraph_checkpoints
+                    WHERE thread_id = :thread_id AND checkpoint_id IN :ids
+                """).bindparams(bindparam("ids", expanding=True))
+                result = await session.execute(query, {"thread_id": thread_id, "ids": unknown})
+                base_ids.update(r[0] for r in result.fetchall() if r[0])
+
+            chain = await self._load_chain_rows(session, thread_id, base_ids)
+
+            for cid in delta_rows:
+                decoded[cid] = self._rebuild(cid, chain)
+
+        return decoded
+
+    async def compact_thread(self, thread_id: str) -> bool:
+        """
+        Rewrite the latest checkpoint of a thread as a full checkpoint.
+
+        Older rows of its chain can then expire independently. Deltas already
+        written on top of it (by concurrent writers) are moved to the new base
+        in the same transaction; writers lock their delta parent, so a delta
+        is either rebased here or sees the new base when it is written.
+
+        Returns:
+            True if a delta checkpoint was compacted
+        """
+        from sqlalchemy import text
+
+        from resync.core.database.engine import get_db_session
+
+        query = text("""
+            SELECT checkpoint_id, checkpoint_format, checkpoint, checkpoint_compressed,
+                   checkpoint_blob, chain_depth
+            FROM langgraph_checkpoints
+            WHERE thread_id = :thread_id
+            ORDER BY created_at DESC
+            LIMIT 1
+            FOR UPDATE
+        """)
+        rebase = text("""
+            WITH RECURSIVE descendants AS (
+                SELECT checkpoint_id FROM langgraph_checkpoints
+                WHERE thread_id = :thread_id AND delta_parent_id = :checkpoint_id
+                  AND checkpoint_format = :delta
+                UNION
+                SELECT c.checkpoint_id FROM langgraph_checkpoints c
+                JOIN descendants d ON c.delta_parent_id = d.checkpoint_id
+                WHERE c.thread_id = :thread_id AND c.checkpoint_format = :delta
+            )
+            UPDATE langgraph_checkpoints
+            SET base_checkpoint_id = :checkpoint_id,
+                chain_depth = chain_depth - :depth
+            WHERE thread_id = :thread_id
+              AND checkpoint_id IN (SELECT checkpoint_id FROM descendants)
+            RETURNING checkpoint_id, chain_depth
+        """)
+        update = text("""
+            UPDATE langgraph_checkpoints
+            SET checkpoint_format = :fmt, checkpoint_blob = :blob,
+                base_checkpoint_id = :checkpoint_id, delta_parent_id = NULL, chain_depth = 0
+            WHERE thread_id = :thread_id AND checkpoint_id = :checkpoint_id
+        """)
+
+        try:
+            async with get_db_session() as session:
+                row = (await session.execute(query, {"thread_id": thread_id})).fetchone()
+                if not row or row[1] != FORMAT_DELTA:
+                    return False
+
+                checkpoint_id, depth = row[0], row[5] or 0
+                state = (await self._decode_rows(session, thread_id, [tuple(row[:5])]))[
+                    checkpoint_id
+                ]
+                channels, header = codec.split_checkpoint(state)
+                blob = codec.encode(
+                    {"header": header, "set": channels, "del": []},
+                    compress_threshold=self.binary_compress_threshold,
+                )
+                await session.execute(
+                    update,
+                    {
+                        "fmt": FORMAT_FULL,
+                        "blob": blob,
+                        "thread_id": thread_id,
+                        "checkpoint_id": checkpoint_id,
+                    },
+                )
+                rebased = (
+                    await session.execute(
+                        rebase,
+                        {
+                            "thread_id": thread_id,
+                            "checkpoint_id": checkpoint_id,
+                            "delta": FORMAT_DELTA,
+                            "depth": depth,
+                        },
+                    )
+                ).fetchall()
+                await session.commit()
+
+            for descendant_id, descendant_depth in rebased:
+                descendant = self._chains.get((thread_id, descendant_id))
+                if descendant is not None:
+                    descendant.base_id, descendant.depth = checkpoint_id, descendant_depth
+            self._remember(
+                thread_id,
+                checkpoint_id,
+                _ChainState(checkpoint_id, 0, codec.channel_digests(channels)),
+            )
+            logger.info("checkpoint_thread_compacted", thread_id=thread_id)
+            return True
+
+        except Exception as e:
+            logger.error("checkpoint_compaction_failed", thread_id=thread_id, error=str(e))
+            return False
+
     # =========================================================================
     # LANGGRAPH INTERFACE
     # =========================================================================
@@ -222,7 +613,8 @@ class PostgresCheckpointer(BaseCheckpointSaver if LANGGRAPH_AVAILABLE else objec
         from resync.core.database.engine import get_db_session
 
         query = text("""
-            SELECT checkpoint_id, parent_id, checkpoint, checkpoint_compressed, metadata
+            SELECT checkpoint_id, parent_id, checkpoint, checkpoint_compressed, metadata,
+                   checkpoint_format, checkpoint_blob
             FROM langgraph_checkpoints
             WHERE thread_id = :thread_id
               AND (expires_at IS NULL OR expires_at > NOW())
@@ -238,14 +630,22 @@ class PostgresCheckpointer(BaseCheckpointSaver if LANGGRAPH_AVAILABLE else objec
                 if not row:
                     return None
 
-                checkpoint_id, parent_id, checkpoint_json, compressed, metadata = row
-
-                checkpoint_data = self._deserialize(
-                    checkpoint_json
-                    if isinstance(checkpoint_json, str)
-                    else json.dumps(checkpoint_json),
+                (
+                    checkpoint_id,
+                    parent_id,
+                    checkpoint_json,
                     compressed,
+                    metadata,
+                    fmt,
+                    blob,
+                ) = row
+
+                decoded = await self._decode_rows(
+                    session,
+                    thread_id,
+                    [(checkpoint_id, fmt, checkpoint_json, compressed, blob)],
                 )
+                checkpoint_data = decoded[checkpoint_id]
 
                 if LANGGRAPH_AVAILABLE:
                     return CheckpointTuple(
@@ -301,22 +701,51 @@ class PostgresCheckpointer(BaseCheckpointSaver if LANGGRAPH_AVAILABLE else objec
         expires_at = datetime.utcnow() + timedelta(hours=self.ttl_hours)
 
         # Serialize
-        json_str, compressed = self._serialize(checkpoint)
+        json_str: str | None = None
+        compressed: bytes | None = None
+        blob: bytes | None = None
+        base_id: str | None = None
+        delta_parent: str | None = None
+        depth = 0
+
+        if self.binary_format:
+            fmt, blob, base_id, delta_parent, depth = self._encode_binary(
+                thread_id, checkpoint_id, parent_id, checkpoint
+            )
+        else:
+            fmt = FORMAT_JSON
+            json_str, compressed = self._serialize(checkpoint)
 
         query = text("""
             INSERT INTO langgraph_checkpoints
-                (thread_id, checkpoint_id, parent_id, checkpoint, checkpoint_compressed, metadata, expires_at)
+                (thread_id, checkpoint_id, parent_id, checkpoint, checkpoint_compressed,
+                 checkpoint_format, checkpoint_blob, base_checkpoint_id, delta_parent_id,
+                 chain_depth, metadata, expires_at)
             VALUES
-                (:thread_id, :checkpoint_id, :parent_id, :checkpoint, :compressed, :metadata, :expires_at)
+                (:thread_id, :checkpoint_id, :parent_id, :checkpoint, :compressed,
+                 :fmt, :blob, :base_id, :delta_parent, :depth, :metadata, :expires_at)
             ON CONFLICT (thread_id, checkpoint_id) DO UPDATE SET
                 checkpoint = EXCLUDED.checkpoint,
                 checkpoint_compressed = EXCLUDED.checkpoint_compressed,
+                checkpoint_format = EXCLUDED.checkpoint_format,
+                checkpoint_blob = EXCLUDED.checkpoint_blob,
+                base_checkpoint_id = EXCLUDED.base_checkpoint_id,
+                delta_parent_id = EXCLUDED.delta_parent_id,
+                chain_depth = EXCLUDED.chain_depth,
                 metadata = EXCLUDED.metadata,
                 expires_at = EXCLUDED.expires_at
         """)
 
         try:
             async with get_db_session() as session:
+                if self.binary_format:
+                    fmt, blob, base_id, delta_parent, depth = await self._confirm_delta_parent(
+                        session,
+                        thread_id,
+                        checkpoint_id,
+                        checkpoint,
+                        (fmt, blob, base_id, delta_parent, depth),
+                    )
                 await session.execute(
                     query,
                     {
@@ -325,6 +754,11 @@ class PostgresCheckpointer(BaseCheckpointSaver if LANGGRAPH_AVAILABLE else objec
                         "parent_id": parent_id,
                         "checkpoint": json_str or "{}",
                         "compressed": compressed,
+                        "fmt": fmt,
+                        "blob": blob,
+                        "base_id": base_id,
+                        "delta_parent": delta_parent,
+                        "depth": depth,
                         "metadata": json.dumps(metadata or {}),
                         "expires_at": expires_at,
                     },
@@ -335,10 +769,16 @@ class PostgresCheckpointer(BaseCheckpointSaver if LANGGRAPH_AVAILABLE else objec
                 "checkpoint_saved",
                 thread_id=thread_id,
                 checkpoint_id=checkpoint_id,
+                format=fmt,
+                chain_depth=depth,
+                size_bytes=len(blob) if blob is not None else None,
                 compressed=compressed is not None,
             )
 
         except Exception as e:
+            # The row may not exist; never use it as a delta parent
+            self._chains.pop((thread_id, checkpoint_id), None)
+            self._latest.pop(thread_id, None)
             logger.error("checkpoint_save_failed", thread_id=thread_id, error=str(e))
             raise
 
@@ -379,7 +819,8 @@ class PostgresCheckpointer(BaseCheckpointSaver if LANGGRAPH_AVAILABLE else objec
         limit = limit or 100
 
         query = text("""
-            SELECT checkpoint_id, parent_id, checkpoint, checkpoint_compressed, metadata, created_at
+            SELECT checkpoint_id, parent_id, checkpoint, checkpoint_compressed, metadata, created_at,
+                   checkpoint_format, checkpoint_blob
             FROM langgraph_checkpoints
             WHERE thread_id = :thread_id
               AND (expires_at IS NULL OR expires_at > NOW())
@@ -392,18 +833,17 @@ class PostgresCheckpointer(BaseCheckpointSaver if LANGGRAPH_AVAILABLE else objec
                 result = await session.execute(query, {"thread_id": thread_id, "limit": limit})
                 rows = result.fetchall()
 
+                decoded = await self._decode_rows(
+                    session,
+                    thread_id,
+                    [(r[0], r[6], r[2], r[3], r[7]) for r in rows],
+                )
+
                 checkpoints = []
                 for row in rows:
-                    checkpoint_id, parent_id, checkpoint_json, compressed, metadata, created_at = (
-                        row
-                    )
+                    checkpoint_id, parent_id, _, _, metadata, created_at, _, _ = row
 
-                    checkpoint_data = self._deserialize(
-                        checkpoint_json
-                        if isinstance(checkpoint_json, str)
-                        else json.dumps(checkpoint_json),
-                        compressed,
-                    )
+                    checkpoint_data = decoded[checkpoint_id]
 
                     if LANGGRAPH_AVAILABLE:
                         checkpoints.append(
@@ -462,9 +902,16 @@ class PostgresCheckpointer(BaseCheckpointSaver if LANGGRAPH_AVAILABLE else objec
 
         from resync.core.database.engine import get_db_session
 
+        # Keep expired rows that a live delta still replays from
         query = text("""
-            DELETE FROM langgraph_checkpoints
-            WHERE expires_at IS NOT NULL AND expires_at < NOW()
+            DELETE FROM langgraph_checkpoints c
+            WHERE c.expires_at IS NOT NULL AND c.expires_at < NOW()
+              AND NOT EXISTS (
+                  SELECT 1 FROM langgraph_checkpoints d
+                  WHERE d.thread_id = c.thread_id
+                    AND d.base_checkpoint_id = COALESCE(c.base_checkpoint_id, c.checkpoint_id)
+                    AND (d.expires_at IS NULL OR d.expires_at >= NOW())
+              )
         """)
 
         try:
@@ -507,6 +954,10 @@ class PostgresCheckpointer(BaseCheckpointSaver if LANGGRAPH_AVAILABLE else objec
                 await session.commit()
                 deleted = result.rowcount
 
+                self._latest.pop(thread_id, None)
+                for key in [k for k in self._chains if k[0] == thread_id]:
+                    del self._chains[key]
+
                 logger.info("thread_checkpoints_deleted", thread_id=thread_id, count=deleted)
                 return deleted
 
@@ -526,7 +977,9 @@ class PostgresCheckpointer(BaseCheckpointSaver if LANGGRAPH_AVAILABLE else objec
                 COUNT(DISTINCT thread_id) as total_threads,
                 COUNT(CASE WHEN checkpoint_compressed IS NOT NULL THEN 1 END) as compressed_count,
                 SUM(LENGTH(checkpoint::text)) as total_json_size,
-                SUM(LENGTH(checkpoint_compressed)) as total_compressed_size
+                SUM(LENGTH(checkpoint_compressed)) as total_compressed_size,
+                COUNT(CASE WHEN checkpoint_format = 2 THEN 1 END) as delta_count,
+                SUM(LENGTH(checkpoint_blob)) as total_binary_size
             FROM langgraph_checkpoints
             WHERE expires_at IS NULL OR expires_at > NOW()
         """)
@@ -542,6 +995,8 @@ class PostgresCheckpointer(BaseCheckpointSaver if LANGGRAPH_AVAILABLE else objec
                     "compressed_count": row[2] or 0,
                     "total_json_bytes": row[3] or 0,
                     "total_compressed_bytes": row[4] or 0,
+                    "delta_count": row[5] or 0,
+                    "total_binary_bytes": row[6] or 0,
                 }
 
         except Exception as e:
@@ -5,6 +5,8 @@ This module implements advanced parallelization patterns for LangGraph:
 - Fan-out/Fan-in (Map-Reduce) pattern for troubleshooting
 - Parallel data fetching from multiple sources
 - Annotated reducers for result aggregation
+- Scatter-gather with per-source deadlines: the aggregator runs on whatever
+  arrived in time, stragglers are cancelled and flagged as missing
 
 Performance Improvement Target:
 - Before: Sequential execution ~3-5s for troubleshooting
@@ -47,9 +49,10 @@ import asyncio
 import json
 import operator
 import time
-from dataclasses import dataclass
-from typing import Annotated, Any, TypedDict
+from dataclasses import dataclass, field
+from typing import Annotated, Any, NotRequired, TypedDict
 
+from resync.core.langgraph.scatter_gather import SourceSpec, get_scatter_gather_executor
 from resync.core.structured_logger import get_logger
 from resync.settings import settings
 
@@ -79,6 +82,7 @@ class DataSourceResult(TypedDict):
     latency_ms: float
     success: bool
     error: str | None
+    timed_out: NotRequired[bool]
 
 
 class ParallelState(TypedDict, total=False):
@@ -140,6 +144,32 @@ class ParallelConfig:
     # Aggregation
     min_sources_required: int = 1  # Minimum sources needed to generate response
 
+    # Per-source deadlines (seconds from fan-out start); missing sources use
+    # node_timeout_seconds. All deadlines are capped by total_timeout_seconds.
+    source_deadlines: dict[str, float] = field(
+        default_factory=lambda: {
+            "tws_status": 3.0,
+            "rag_search": 2.5,
+            "log_cache": 1.0,
+            "metrics": 0.5,
+        }
+    )
+
+    # Launch/report priority (higher first)
+    source_priorities: dict[str, int] = field(
+        default_factory=lambda: {
+            "tws_status": 3,
+            "rag_search": 2,
+            "log_cache": 1,
+            "metrics": 0,
+        }
+    )
+
+    def deadline_for(self, source: str) -> float:
+        """Effective deadline for a source."""
+        deadline = self.source_deadlines.get(source, self.node_timeout_seconds)
+        return min(deadline, self.total_timeout_seconds)
+
 
 # =============================================================================
 # PARALLEL DATA FETCHING NODES
@@ -434,6 +464,72 @@ async def metrics_node(state: ParallelState) -> dict[str, Any]:
         }
 
 
+# =============================================================================
+# SCATTER-GATHER
+# =============================================================================
+
+
+def _source_nodes(config: ParallelConfig) -> dict[str, Any]:
+    """Enabled data-source nodes by name (resolved at call time)."""
+    nodes = {}
+    if config.enable_tws_status:
+        nodes["tws_status"] = tws_status_node
+    if config.enable_rag_search:
+        nodes["rag_search"] = rag_search_node
+    if config.enable_log_cache:
+        nodes["log_cache"] = log_cache_node
+    if config.enable_metrics:
+        nodes["metrics"] = metrics_node
+    return nodes
+
+
+async def gather_sources(state: ParallelState, config: ParallelConfig) -> dict[str, Any]:
+    """
+    Query all enabled data sources concurrently.
+
+    Each source gets its own deadline; sources that miss it are cancelled
+    and reported as failed results with ``timed_out=True``, so the
+    aggregator can run on partial data instead of waiting for the slowest.
+    """
+    nodes = _source_nodes(config)
+    specs = [
+        SourceSpec(
+            name=name,
+            func=lambda node=node: node(state),
+            deadline_s=config.deadline_for(name),
+            priority=config.source_priorities.get(name, 0),
+        )
+        for name, node in nodes.items()
+    ]
+
+    gathered = await get_scatter_gather_executor("parallel_troubleshoot").run(
+        specs, deadline_s=config.total_timeout_seconds
+    )
+
+    parallel_results: list[DataSourceResult] = []
+    errors: list[str] = []
+
+    for outcome in gathered.outcomes:
+        if outcome.ok and isinstance(outcome.value, dict):
+            parallel_results.extend(outcome.value.get("parallel_results", []))
+            errors.extend(outcome.value.get("errors", []))
+            continue
+
+        parallel_results.append(
+            DataSourceResult(
+                source=outcome.name,
+                data={},
+                latency_ms=outcome.latency_ms,
+                success=False,
+                error=outcome.error or "No result",
+                timed_out=outcome.timed_out,
+            )
+        )
+        errors.append(f"{outcome.name}: {outcome.error}")
+
+    return {"parallel_results": parallel_results, "errors": errors}
+
+
 # =============================================================================
 # AGGREGATOR NODE
 # =============================================================================
@@ -466,6 +562,7 @@ async def aggregator_node(state: ParallelState) -> dict[str, Any]:
         "metrics": {},
         "sources_available": [],
         "sources_failed": [],
+        "sources_missing": [],
     }
 
     for result in parallel_results:
@@ -487,8 +584,11 @@ async def aggregator_node(state: ParallelState) -> dict[str, Any]:
                 {
                     "source": source,
                     "error": result.get("error"),
+                    "timed_out": bool(result.get("timed_out")),
                 }
             )
+            if result.get("timed_out"):
+                aggregated["sources_missing"].append(source)
 
     # Calculate performance improvement
     speedup_factor = total_sequential_latency / max_latency if max_latency > 0 else 1
@@ -497,6 +597,7 @@ async def aggregator_node(state: ParallelState) -> dict[str, Any]:
         "parallel_aggregation_complete",
         sources_available=len(aggregated["sources_available"]),
         sources_failed=len(aggregated["sources_failed"]),
+        sources_missing=aggregated["sources_missing"],
         parallel_latency_ms=max_latency,
         sequential_equivalent_ms=total_sequential_latency,
         speedup_factor=f"{speedup_factor:.2f}x",
@@ -509,6 +610,8 @@ async def aggregator_node(state: ParallelState) -> dict[str, Any]:
             "parallel_execution": True,
             "sources_queried": len(parallel_results),
             "sources_successful": len(aggregated["sources_available"]),
+            "sources_missing": aggregated["sources_missing"],
+            "partial": bool(aggregated["sources_failed"]),
             "speedup_factor": speedup_factor,
             "parallel_latency_ms": max_latency,
             "sequential_equivalent_ms": total_sequential_latency,
@@ -660,38 +763,20 @@ async def create_parallel_troubleshoot_graph(
     # Create graph with ParallelState
     graph = StateGraph(ParallelState)
 
-    # Add parallel data fetching nodes
-    if config.enable_tws_status:
-        graph.add_node("tws_status", tws_status_node)
-    if config.enable_rag_search:
-        graph.add_node("rag_search", rag_search_node)
-    if config.enable_log_cache:
-        graph.add_node("log_cache", log_cache_node)
-    if config.enable_metrics:
-        graph.add_node("metrics", metrics_node)
+    async def scatter_gather_node(state: ParallelState) -> dict[str, Any]:
+        return await gather_sources(state, config)
 
-    # Add aggregator and response generator
+    # Fan-out happens inside a single scatter-gather node so per-source
+    # deadlines apply (LangGraph supersteps wait for every branch).
+    graph.add_node("scatter_gather", scatter_gather_node)
     graph.add_node("aggregator", aggregator_node)
     graph.add_node("response_generator", response_generator_node)
 
-    # Set entry point - fan out to all data sources
-    # LangGraph will execute these in parallel automatically
-    graph.set_entry_point("tws_status")
-
-    # Fan-out: Multiple edges from entry point (executed in parallel)
-    enabled_sources = []
-    if config.enable_tws_status:
-        enabled_sources.append("tws_status")
-    if config.enable_rag_search:
-        enabled_sources.append("rag_search")
-    if config.enable_log_cache:
-        enabled_sources.append("log_cache")
-    if config.enable_metrics:
-        enabled_sources.append("metrics")
+    graph.set_entry_point("scatter_gather")
+    enabled_sources = list(_source_nodes(config))
 
-    # All parallel nodes converge to aggregator (fan-in)
-    for source in enabled_sources:
-        graph.add_edge(source, "aggregator")
+    # Fan-in
+    graph.add_edge("scatter_gather", "aggregator")
 
     # Aggregator to response generator
     graph.add_edge("aggregator", "response_generator")
@@ -719,15 +804,14 @@ class FallbackParallelGraph:
     """
     Fallback when LangGraph is not available.
 
-    Uses asyncio.gather for parallel execution instead of LangGraph's
-    native parallelization.
+    Runs the same scatter-gather fan-out as the compiled graph.
     """
 
     def __init__(self, config: ParallelConfig):
         self.config = config
 
     async def ainvoke(self, state: dict[str, Any]) -> ParallelState:
-        """Execute with asyncio.gather for parallelization."""
+        """Execute data sources concurrently, then aggregate and respond."""
         start_time = time.time()
 
         # Initialize state
@@ -741,42 +825,10 @@ class FallbackParallelGraph:
             "errors": [],
         }
 
-        # Build list of tasks to run in parallel
-        tasks = []
-        task_names = []
-
-        if self.config.enable_tws_status:
-            tasks.append(tws_status_node(full_state))
-            task_names.append("tws_status")
-        if self.config.enable_rag_search:
-            tasks.append(rag_search_node(full_state))
-            task_names.append("rag_search")
-        if self.config.enable_log_cache:
-            tasks.append(log_cache_node(full_state))
-            task_names.append("log_cache")
-        if self.config.enable_metrics:
-            tasks.append(metrics_node(full_state))
-            task_names.append("metrics")
-
-        # Execute all in parallel with timeout
-        try:
-            results = await asyncio.wait_for(
-                asyncio.gather(*tasks, return_exceptions=True),
-                timeout=self.config.total_timeout_seconds,
-            )
-
-            # Merge results into state
-            for i, result in enumerate(results):
-                if isinstance(result, Exception):
-                    full_state["errors"].append(f"{task_names[i]}: {str(result)}")
-                elif isinstance(result, dict):
-                    if "parallel_results" in result:
-                        full_state["parallel_results"].extend(result["parallel_results"])
-                    if "errors" in result:
-                        full_state["errors"].extend(result["errors"])
-
-        except asyncio.TimeoutError:
-            full_state["errors"].append("Parallel execution timeout")
+        # Fan-out with per-source deadlines; never waits past total timeout
+        gathered = await gather_sources(full_state, self.config)
+        full_state["parallel_results"].extend(gathered["parallel_results"])
+        full_state["errors"].extend(gathered["errors"])
 
         # Aggregate results
         aggregator_result = await aggregator_node(full_state)
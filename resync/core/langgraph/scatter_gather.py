@@ -0,0 +1,292 @@
+"""
+Scatter-Gather Executor for diagnostic data sources.
+
+Runs several independent data-source coroutines concurrently and returns
+whatever arrived in time, so one slow source cannot hold the whole response.
+
+Features:
+- Per-source deadline (measured from the start of the gather)
+- Priority ordering (higher priority sources are launched first when a
+  concurrency limit is set, and listed first in results)
+- Overall deadline; stragglers are cancelled, not awaited
+- Per-source latency / outcome metrics exported via the internal registry
+
+Usage:
+    executor = get_scatter_gather_executor("troubleshoot")
+    result = await executor.run(
+        [
+            SourceSpec("tws_status", lambda: fetch_status(), deadline_s=2.0, priority=3),
+            SourceSpec("rag_search", lambda: search_docs(), deadline_s=1.5, priority=2),
+        ],
+        deadline_s=3.0,
+    )
+    for outcome in result.completed:
+        ...
+    result.missing  # names of sources that timed out or failed
+"""
+
+from __future__ import annotations
+
+import asyncio
+from collections.abc import Awaitable, Callable
+from dataclasses import dataclass, field
+from typing import Any
+
+from resync.core.metrics_internal import create_counter, create_histogram
+from resync.core.structured_logger import get_logger
+
+logger = get_logger(__name__)
+
+
+# Outcome statuses
+STATUS_OK = "ok"
+STATUS_ERROR = "error"
+STATUS_TIMEOUT = "timeout"
+
+
+# Per-source metrics (labels: graph, source[, status])
+source_latency_seconds = create_histogram(
+    "scatter_gather_source_latency_seconds",
+    "Latency of data sources queried by scatter-gather executors",
+    labels=["graph", "source"],
+)
+
+source_outcomes_total = create_counter(
+    "scatter_gather_source_outcomes_total",
+    "Data source outcomes (ok / error / timeout) in scatter-gather executors",
+    labels=["graph", "source", "status"],
+)
+
+gather_latency_seconds = create_histogram(
+    "scatter_gather_latency_seconds",
+    "Wall time of a scatter-gather round",
+    labels=["graph"],
+)
+
+
+@dataclass
+class SourceSpec:
+    """
+    A data source to query.
+
+    Attributes:
+        name: Source name (used in results and metrics)
+        func: Zero-arg coroutine factory that fetches the data
+        deadline_s: Max seconds from the start of the gather
+        priority: Higher values are launched (and listed) first
+    """
+
+    name: str
+    func: Callable[[], Awaitable[Any]]
+    deadline_s: float = 5.0
+    priority: int = 0
+
+
+@dataclass
+class SourceOutcome:
+    """Outcome of a single source."""
+
+    name: str
+    status: str
+    value: Any = None
+    latency_ms: float = 0.0
+    error: str | None = None
+    priority: int = 0
+
+    @property
+    def ok(self) -> bool:
+        return self.status == STATUS_OK
+
+    @property
+    def timed_out(self) -> bool:
+        return self.status == STATUS_TIMEOUT
+
+
+@dataclass
+class GatherResult:
+    """Outcomes of a scatter-gather round, in priority order."""
+
+    outcomes: list[SourceOutcome] = field(default_factory=list)
+    elapsed_ms: float = 0.0
+
+    @property
+    def completed(self) -> list[SourceOutcome]:
+        return [o for o in self.outcomes if o.ok]
+
+    @property
+    def timed_out(self) -> list[str]:
+        return [o.name for o in self.outcomes if o.timed_out]
+
+    @property
+    def failed(self) -> list[str]:
+        return [o.name for o in self.outcomes if o.status == STATUS_ERROR]
+
+    @property
+    def missing(self) -> list[str]:
+        return [o.name for o in self.outcomes if not o.ok]
+
+    @property
+    def partial(self) -> bool:
+        return bool(self.missing)
+
+
+class ScatterGatherExecutor:
+    """
+    Concurrent fan-out with deadlines and partial results.
+
+    One executor per graph; instances are cheap and stateless apart from
+    the optional concurrency limit.
+    """
+
+    def __init__(self, graph: str, max_concurrency: int | None = None):
+        """
+        Args:
+            graph: Graph name used as a metrics label
+            max_concurrency: Optional cap on sources running at once
+        """
+        self.graph = graph
+        self.max_concurrency = max_concurrency
+
+    async def run(
+        self,
+        specs: list[SourceSpec],
+        deadline_s: float | None = None,
+    ) -> GatherResult:
+        """
+        Query all sources concurrently and collect what arrives in time.
+
+        Args:
+            specs: Sources to query
+            deadline_s: Overall deadline; caps every per-source deadline
+
+        Returns:
+            GatherResult with one outcome per spec (never raises for
+            source failures or timeouts)
+        """
+        loop = asyncio.get_running_loop()
+        start = loop.time()
+        ordered = sorted(specs, key=lambda s: -s.priority)
+        semaphore = asyncio.Semaphore(self.max_concurrency) if self.max_concurrency else None
+
+        def _limit(spec: SourceSpec) -> float:
+            limit = spec.deadline_s
+            if deadline_s is not None:
+                limit = min(limit, deadline_s)
+            return max(limit, 0.0)
+
+        async def _run_one(spec: SourceSpec) -> SourceOutcome:
+            t0 = loop.time()
+            try:
+                if semaphore is not None:
+                    async with semaphore:
+                        remaining = _limit(spec) - (loop.time() - start)
+                        value = await asyncio.wait_for(spec.func(), timeout=max(remaining, 0))
+                else:
+                    value = await asyncio.wait_for(spec.func(), timeout=_limit(spec))
+                return SourceOutcome(
+                    spec.name, STATUS_OK, value, (loop.time() - t0) * 1000, priority=spec.priority
+                )
+            except asyncio.TimeoutError:
+                return SourceOutcome(
+                    spec.name,
+                    STATUS_TIMEOUT,
+                    latency_ms=(loop.time() - t0) * 1000,
+                    error=f"Deadline exceeded ({_limit(spec) * 1000:.0f}ms)",
+                    priority=spec.priority,
+                )
+            except Exception as e:
+                return SourceOutcome(
+                    spec.name,
+                    STATUS_ERROR,
+                    latency_ms=(loop.time() - t0) * 1000,
+                    error=str(e),
+                    priority=spec.priority,
+                )
+
+        tasks = {spec.name: asyncio.create_task(_run_one(spec)) for spec in ordered}
+        outer = max((_limit(s) for s in ordered), default=0.0)
+
+        try:
+            # Small grace so per-source wait_for resolves before the outer cut-off
+            _, pending = await asyncio.wait(tasks.values(), timeout=outer + 0.05)
+        except asyncio.CancelledError:
+            for task in tasks.values():
+                task.cancel()
+            raise
+
+        for task in pending:
+            task.cancel()
+        if pending:
+            await asyncio.gather(*pending, return_exceptions=True)
+
+        outcomes = []
+        for spec in ordered:
+            task = tasks[spec.name]
+            if task.cancelled() or task.exception() is not None:
+                outcome = SourceOutcome(
+                    spec.name,
+                    STATUS_TIMEOUT,
+                    latency_ms=(loop.time() - start) * 1000,
+                    error="Cancelled at overall deadline",
+                    priority=spec.priority,
+                )
+            else:
+                outcome = task.result()
+            outcomes.append(outcome)
+            self._record(outcome)
+
+        result = GatherResult(outcomes=outcomes, elapsed_ms=(loop.time() - start) * 1000)
+        gather_latency_seconds.observe(result.elapsed_ms / 1000, {"graph": self.graph})
+
+        if result.partial:
+            logger.warning(
+                "scatter_gather_partial",
+                graph=self.graph,
+                timed_out=result.timed_out,
+                failed=result.failed,
+                elapsed_ms=round(result.elapsed_ms, 1),
+            )
+
+        return result
+
+    def _record(self, outcome: SourceOutcome) -> None:
+        labels = {"graph": self.graph, "source": outcome.name}
+        source_latency_seconds.observe(outcome.latency_ms / 1000, labels)
+        source_outcomes_total.inc(1, {**labels, "status": outcome.status})
+
+    def get_source_stats(self, source: str) -> dict[str, Any]:
+        """Latency percentiles and outcome counts for one source."""
+        labels = {"graph": self.graph, "source": source}
+        p50 = source_latency_seconds.get_percentile(50, labels)
+        p95 = source_latency_seconds.get_percentile(95, labels)
+        return {
+            "p50_ms": p50 * 1000 if p50 is not None else None,
+            "p95_ms": p95 * 1000 if p95 is not None else None,
+            **{
+                status: source_outcomes_total.get({**labels, "status": status})
+                for status in (STATUS_OK, STATUS_ERROR, STATUS_TIMEOUT)
+            },
+        }
+
+
+_executors: dict[str, ScatterGatherExecutor] = {}
+
+
+def get_scatter_gather_executor(
+    graph: str,
+    max_concurrency: int | None = None,
+) -> ScatterGatherExecutor:
+    """Get the shared executor for a graph."""
+    executor = _executors.get(graph)
+    if executor is None:
+        executor = _executors[graph] = ScatterGatherExecutor(graph, max_concurrency)
+    return executor
+
+
+__all__ = [
+    "GatherResult",
+    "ScatterGatherExecutor",
+    "SourceOutcome",
+    "SourceSpec",
+    "get_scatter_gather_executor",
+]
@@ -83,6 +83,9 @@ class ConversationContext:
     # User preferences detected in session
     user_preferences: dict[str, Any] = field(default_factory=dict)
 
+    # Turns already written by an append-only store (not serialized)
+    persisted_turns: int = field(default=0, repr=False, compare=False)
+
     def add_message(self, role: str, content: str, metadata: dict | None = None) -> None:
         """Add a message to the conversation."""
         msg = Message(
@@ -127,26 +130,11 @@ class ConversationContext:
 
         Returns a formatted string of recent conversation turns.
         """
-        recent = self.get_recent_messages(max_messages)
-
-        if not recent:
-            return ""
-
-        lines = ["<conversation_history>"]
-        for msg in recent:
-            role_label = "User" if msg.role == "user" else "Assistant"
-            lines.append(f"{role_label}: {msg.content}")
-        lines.append("</conversation_history>")
-
-        # Add entity context
-        if self.referenced_jobs:
-            lines.append("\n<referenced_entities>")
-            lines.append(f"Recently mentioned jobs: {', '.join(self.referenced_jobs[-5:])}")
-            if self.referenced_workstations:
-                lines.append(f"Workstations: {', '.join(self.referenced_workstations[-3:])}")
-            lines.append("</referenced_entities>")
-
-        return "\n".join(lines)
+        return format_prompt_context(
+            self.get_recent_messages(max_messages),
+            self.referenced_jobs,
+            self.referenced_workstations,
+        )
 
     def to_dict(self) -> dict[str, Any]:
         return {
@@ -177,6 +165,32 @@ class ConversationContext:
         return ctx
 
 
+def format_prompt_context(
+    messages: list[Message],
+    referenced_jobs: list[str],
+    referenced_workstations: list[str],
+) -> str:
+    """Format recent messages and entity references for LLM prompt injection."""
+    if not messages:
+        return ""
+
+    lines = ["<conversation_history>"]
+    for msg in messages:
+        role_label = "User" if msg.role == "user" else "Assistant"
+        lines.append(f"{role_label}: {msg.content}")
+    lines.append("</conversation_history>")
+
+    # Add entity context
+    if referenced_jobs:
+        lines.append("\n<referenced_entities>")
+        lines.append(f"Recently mentioned jobs: {', '.join(referenced_jobs[-5:])}")
+        if referenced_workstations:
+            lines.append(f"Workstations: {', '.join(referenced_workstations[-3:])}")
+        lines.append("</referenced_entities>")
+
+    return "\n".join(lines)
+
+
 # =============================================================================
 # MEMORY STORE INTERFACE
 # =============================================================================
@@ -201,6 +215,15 @@ class MemoryStore(ABC):
     async def list_sessions(self, limit: int = 100) -> list[str]:
         """List active session IDs."""
 
+    async def get_context_for_prompt(self, session_id: str, max_messages: int = 5) -> str:
+        """
+        Format recent conversation for prompt injection.
+
+        Stores that can read only the tail of a session should override this.
+        """
+        context = await self.load_context(session_id)
+        return context.get_context_for_prompt(max_messages) if context else ""
+
 
 # =============================================================================
 # REDIS MEMORY STORE
@@ -213,18 +236,34 @@ class RedisMemoryStore(MemoryStore):
 
     Features:
     - Automatic TTL expiration
-    - Cluster-compatible
-    - High performance
+    - Cluster-compatible (all keys of a session share a hash tag)
+    - Append-only writes: each turn costs O(new messages), not O(conversation)
+
+    Layout per session (the braces are a cluster hash tag):
+    - <prefix>{<session_id>}:msgs   LIST of JSON messages, capped with LTRIM
+    - <prefix>{<session_id>}:state  HASH with entities, counters and preferences
+    - <prefix>sessions              ZSET of session IDs scored by last activity
     """
 
+    SESSIONS_INDEX = "sessions"
+
+    _ENTITY_FIELDS = (
+        "referenced_jobs",
+        "referenced_workstations",
+        "referenced_job_streams",
+        "user_preferences",
+    )
+
     def __init__(
         self,
         redis_url: str | None = None,
         key_prefix: str = "resync:memory:",
         ttl_seconds: int = 3600,  # 1 hour default
+        max_messages: int = 50,
     ):
         self.key_prefix = key_prefix
         self.ttl_seconds = ttl_seconds
+        self.max_messages = max_messages
         self._redis = None
         self._redis_url = redis_url
 
@@ -254,55 +293,158 @@ class RedisMemoryStore(MemoryStore):
         return self._redis
 
     def _key(self, session_id: str) -> str:
-        """Generate Redis key for session."""
+        """Generate legacy (single JSON blob) Redis key for session."""
         return f"{self.key_prefix}{session_id}"
 
+    def _messages_key(self, session_id: str) -> str:
+        return f"{self.key_prefix}{{{session_id}}}:msgs"
+
+    def _state_key(self, session_id: str) -> str:
+        return f"{self.key_prefix}{{{session_id}}}:state"
+
+    def _sessions_key(self) -> str:
+        return f"{self.key_prefix}{self.SESSIONS_INDEX}"
+
     async def save_context(self, context: ConversationContext) -> None:
-        """Save context to Redis with TTL."""
+        """
+        Append new messages and update session state in one round trip.
+
+        Only messages added since the context was loaded (or last saved) are
+        pushed; the list is trimmed to ``max_messages``.
+        """
         redis = await self._get_redis()
-        key = self._key(context.session_id)
+        sid = context.session_id
+        msgs_key = self._messages_key(sid)
+        state_key = self._state_key(sid)
+
+        new_count = min(len(context.messages), context.turn_count - context.persisted_turns)
+        new_messages = context.messages[-new_count:] if new_count > 0 else []
+
+        state = {
+            "session_id": sid,
+            "created_at": context.created_at,
+            "last_activity": context.last_activity,
+            "turn_count": context.turn_count,
+        }
+        for name in self._ENTITY_FIELDS:
+            state[name] = json.dumps(getattr(context, name))
+
+        async with redis.pipeline(transaction=False) as pipe:
+            if context.persisted_turns == 0:
+                # New session, or a legacy single-blob session being migrated
+                pipe.delete(self._key(sid))
+            if new_messages:
+                pipe.rpush(msgs_key, *(json.dumps(m.to_dict()) for m in new_messages))
+                pipe.ltrim(msgs_key, -self.max_messages, -1)
+            pipe.hset(state_key, mapping=state)
+            pipe.expire(msgs_key, self.ttl_seconds)
+            pipe.expire(state_key, self.ttl_seconds)
+            pipe.zadd(self._sessions_key(), {sid: context.last_activity})
+            await pipe.execute()
+
+        context.persisted_turns = context.turn_count
+
+        logger.debug(f"Saved context {sid}, appended {len(new_messages)} messages")
 
-        data = json.dumps(context.to_dict())
-        await redis.setex(key, self.ttl_seconds, data)
+    async def load_context(self, session_id: str) -> ConversationContext | None:
+        """Load state hash and capped message list in one pipelined round trip."""
+        redis = await self._get_redis()
 
-        logger.debug(f"Saved context {context.session_id}, {len(context.messages)} messages")
+        async with redis.pipeline(transaction=False) as pipe:
+            pipe.hgetall(self._state_key(session_id))
+            pipe.lrange(self._messages_key(session_id), 0, -1)
+            state, raw_messages = await pipe.execute()
 
-    async def load_context(self, session_id: str) -> ConversationContext | None:
-        """Load context from Redis."""
+        if not state:
+            return await self._load_legacy(session_id)
+
+        try:
+            ctx = ConversationContext(
+                session_id=state.get("session_id", session_id),
+                created_at=float(state.get("created_at", time.time())),
+                last_activity=float(state.get("last_activity", time.time())),
+                turn_count=int(state.get("turn_count", 0)),
+            )
+            for name in self._ENTITY_FIELDS:
+                if name in state:
+                    setattr(ctx, name, json.loads(state[name]))
+            ctx.messages = [Message.from_dict(json.loads(m)) for m in raw_messages]
+            ctx.persisted_turns = ctx.turn_count
+            return ctx
+        except Exception as e:
+            logger.error(f"Failed to parse context: {e}")
+            return None
+
+    async def _load_legacy(self, session_id: str) -> ConversationContext | None:
+        """Read a pre-v5.9.10 single-blob session; it is rewritten on next save."""
         redis = await self._get_redis()
-        key = self._key(session_id)
 
-        data = await redis.get(key)
+        data = await redis.get(self._key(session_id))
         if not data:
             return None
 
         try:
-            return ConversationContext.from_dict(json.loads(data))
+            ctx = ConversationContext.from_dict(json.loads(data))
         except Exception as e:
             logger.error(f"Failed to parse context: {e}")
             return None
 
+        # persisted_turns stays 0 so the next save pushes every message
+        return ctx
+
+    async def get_context_for_prompt(self, session_id: str, max_messages: int = 5) -> str:
+        """Read only the last N messages and entity fields in one round trip."""
+        if max_messages <= 0:
+            return ""
+
+        redis = await self._get_redis()
+
+        async with redis.pipeline(transaction=False) as pipe:
+            pipe.lrange(self._messages_key(session_id), -max_messages, -1)
+            pipe.hmget(
+                self._state_key(session_id), "referenced_jobs", "referenced_workstations"
+            )
+            raw_messages, (jobs, workstations) = await pipe.execute()
+
+        if not raw_messages:
+            return await super().get_context_for_prompt(session_id, max_messages)
+
+        try:
+            messages = [Message.from_dict(json.loads(m)) for m in raw_messages]
+            return format_prompt_context(
+                messages,
+                json.loads(jobs) if jobs else [],
+                json.loads(workstations) if workstations else [],
+            )
+        except Exception as e:
+            logger.error(f"Failed to parse context: {e}")
+            return ""
+
     async def delete_context(self, session_id: str) -> bool:
         """Delete context from Redis."""
         redis = await self._get_redis()
-        key = self._key(session_id)
 
-        result = await redis.delete(key)
-        return result > 0
+        async with redis.pipeline(transaction=False) as pipe:
+            # Separate commands: the legacy key lives in a different cluster slot
+            pipe.unlink(self._messages_key(session_id), self._state_key(session_id))
+            pipe.unlink(self._key(session_id))
+            pipe.zrem(self._sessions_key(), session_id)
+            removed, removed_legacy, _ = await pipe.execute()
+
+        return removed + removed_legacy > 0
 
     async def list_sessions(self, limit: int = 100) -> list[str]:
-        """List active sessions."""
+        """List active sessions, most recently active first."""
         redis = await self._get_redis()
-        pattern = f"{self.key_prefix}*"
+        index = self._sessions_key()
 
-        keys = []
-        async for key in redis.scan_iter(pattern, count=limit):
-            session_id = key.replace(self.key_prefix, "")
-            keys.append(session_id)
-            if len(keys) >= limit:
-                break
+        # Drop index entries whose keys have expired
+        async with redis.pipeline(transaction=False) as pipe:
+            pipe.zremrangebyscore(index, "-inf", time.time() - self.ttl_seconds)
+            pipe.zrevrange(index, 0, limit - 1)
+            _, sessions = await pipe.execute()
 
-        return keys
+        return list(sessions)
 
     async def close(self) -> None:
         """Close Redis connection."""
@@ -409,6 +551,7 @@ class ConversationMemory:
             if not getattr(settings, "disable_redis", False):
                 self._store = RedisMemoryStore(
                     ttl_seconds=self._timeout,
+                    max_messages=self._max_messages,
                 )
                 # Test connection
                 await self._store._get_redis()
@@ -460,6 +603,20 @@ class ConversationMemory:
         store = await self._ensure_store()
         await store.save_context(context)
 
+    async def get_context_for_prompt(self, session_id: str, max_messages: int = 5) -> str:
+        """
+        Get formatted recent conversation without loading the full session.
+
+        Args:
+            session_id: Session ID
+            max_messages: Number of most recent messages to include
+
+        Returns:
+            Formatted context string (empty if session is unknown)
+        """
+        store = await self._ensure_store()
+        return await store.get_context_for_prompt(session_id, max_messages)
+
     async def delete_session(self, session_id: str) -> bool:
         """Delete a session."""
         store = await self._ensure_store()
@@ -544,6 +701,7 @@ def get_conversation_memory() -> ConversationMemory:
 __all__ = [
     "Message",
     "ConversationContext",
+    "format_prompt_context",
     "MemoryStore",
     "RedisMemoryStore",
     "InMemoryStore",
@@ -92,8 +92,9 @@ async def assemble_memory_context(
     # 2. Conversation history (recent turns)
     if include_conversation and session_id:
         conv_memory = get_conversation_memory()
-        session = await conv_memory.get_or_create_session(session_id)
-        conv_context = session.get_context_for_prompt(max_conversation_turns)
+        conv_context = await conv_memory.get_context_for_prompt(
+            session_id, max_conversation_turns
+        )
         if conv_context:
             sections.append(conv_context)
 
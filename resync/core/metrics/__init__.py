@@ -44,6 +44,7 @@ from resync.core.metrics.lightweight_store import (
     record_metric,
     record_timing,
 )
+from resync.core.logger import log_with_correlation
 from resync.core.metrics.runtime_metrics import RuntimeMetricsCollector, runtime_metrics
 
 __all__ = [
@@ -61,6 +62,7 @@ __all__ = [
     # Runtime metrics
     "RuntimeMetricsCollector",
     "runtime_metrics",
+    "log_with_correlation",
     # Continual Learning
     "ContinualLearningMetrics",
     "MetricNames",
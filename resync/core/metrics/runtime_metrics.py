@@ -4,17 +4,24 @@ Runtime Metrics Module.
 Provides runtime metrics collection and tracking using internal metrics system.
 This module creates all the standard metrics counters, gauges and histograms
 used throughout the application.
+
+Under gunicorn (RESYNC_METRICS_MULTIPROC_DIR set) get_stats() aggregates the
+mmap segments of every worker instead of reporting the serving worker only.
 """
 
+import itertools
 import logging
+import random
 import time
-import uuid
+from collections import OrderedDict
+from threading import Lock
 from typing import Any
 
 from resync.core.metrics_internal import (
     create_counter,
     create_gauge,
     create_histogram,
+    registry,
 )
 
 logger = logging.getLogger(__name__)
@@ -32,7 +39,16 @@ class RuntimeMetricsCollector:
     - Agent operations
     """
 
-    def __init__(self):
+    # Correlation tracking: only a sample of operations is timed, and at most
+    # MAX_TRACKED_CORRELATIONS are kept (oldest evicted if never closed)
+    CORRELATION_SAMPLE_RATE = 0.01
+    MAX_TRACKED_CORRELATIONS = 1024
+
+    def __init__(
+        self,
+        correlation_sample_rate: float = CORRELATION_SAMPLE_RATE,
+        max_tracked_correlations: int = MAX_TRACKED_CORRELATIONS,
+    ):
         """Initialize all metrics."""
         # API Metrics
         self.api_requests_total = create_counter("api_requests_total", "Total API requests")
@@ -51,7 +67,9 @@ class RuntimeMetricsCollector:
         self.cache_misses = create_counter("cache_misses", "Cache misses")
         self.cache_evictions = create_counter("cache_evictions", "Cache evictions")
         self.cache_cleanup_cycles = create_counter("cache_cleanup_cycles", "Cache cleanup cycles")
-        self.cache_avg_latency = create_gauge("cache_avg_latency", "Average cache latency")
+        self.cache_avg_latency = create_gauge(
+            "cache_avg_latency", "Average cache latency", multiprocess_mode="mean"
+        )
         self.cache_size = create_gauge("cache_size", "Current cache size")
 
         # TWS Metrics
@@ -86,27 +104,59 @@ class RuntimeMetricsCollector:
         )
         self.pool_connections_idle = create_gauge("pool_connections_idle", "Idle pool connections")
 
-        # Correlation tracking
-        self._correlations: dict[str, dict[str, Any]] = {}
+        self.correlations_evicted = create_counter(
+            "correlations_evicted", "Tracked correlations evicted without being closed"
+        )
+        self.correlation_duration = create_histogram(
+            "correlation_duration", "Duration of sampled correlated operations"
+        )
+
+        # Correlation tracking (bounded, sampled)
+        self.correlation_sample_rate = correlation_sample_rate
+        self.max_tracked_correlations = max_tracked_correlations
+        self._correlations: OrderedDict[str, tuple[str, float]] = OrderedDict()
+        self._correlation_lock = Lock()
+        self._correlation_seq = itertools.count(1)
+        self._random = random.random
 
         logger.info("RuntimeMetricsCollector initialized")
 
-    def create_correlation_id(self, operation: str, **kwargs) -> str:
-        """Create a correlation ID for tracking an operation."""
-        correlation_id = f"{operation}_{uuid.uuid4().hex[:8]}"
-        self._correlations[correlation_id] = {
-            "operation": operation,
-            "start_time": time.time(),
-            **kwargs,
-        }
+    def create_correlation_id(self, operation: str | dict[str, Any], **kwargs) -> str:
+        """
+        Create a correlation ID for tracking an operation.
+
+        IDs are a cheap sequence number (no uuid). Only a sample of
+        operations is timed, in a bounded table; keyword context is not
+        retained.
+        """
+        if isinstance(operation, dict):
+            # Legacy callers pass a context dict; don't build its repr
+            operation = str(operation.get("operation") or operation.get("component") or "op")
+        correlation_id = f"{operation}_{next(self._correlation_seq):x}"
+
+        if self._random() < self.correlation_sample_rate:
+            with self._correlation_lock:
+                self._correlations[correlation_id] = (operation, time.perf_counter())
+                if len(self._correlations) > self.max_tracked_correlations:
+                    # Never closed (missed close_correlation_id): drop the oldest
+                    self._correlations.popitem(last=False)
+                    self.correlations_evicted.inc()
         return correlation_id
 
     def close_correlation_id(self, correlation_id: str, error: bool = False) -> float:
-        """Close a correlation ID and return duration in ms."""
-        if correlation_id in self._correlations:
-            data = self._correlations.pop(correlation_id)
-            return (time.time() - data["start_time"]) * 1000
-        return 0.0
+        """Close a correlation ID and return duration in ms (0.0 if not sampled)."""
+        with self._correlation_lock:
+            entry = self._correlations.pop(correlation_id, None)
+        if entry is None:
+            return 0.0
+        duration = time.perf_counter() - entry[1]
+        self.correlation_duration.observe(duration, {"operation": entry[0]})
+        return duration * 1000
+
+    @property
+    def tracked_correlations(self) -> int:
+        """Number of sampled correlations currently open."""
+        return len(self._correlations)
 
     def record_health_check(
         self,
@@ -149,28 +199,40 @@ class RuntimeMetricsCollector:
             self.cache_misses.inc()
 
     def get_stats(self) -> dict[str, Any]:
-        """Get all metrics as a dictionary."""
+        """Get all metrics as a dictionary (whole process group when shared)."""
+        try:
+            shared = registry.collect_multiprocess()
+        except Exception as e:
+            logger.warning(f"Failed to aggregate multi-process metrics: {e}")
+            shared = None
+
+        def value(metric: Any) -> float:
+            if shared is not None and metric.name in shared:
+                return shared[metric.name].get((), 0)
+            return metric.get()
+
         return {
             "api": {
-                "requests_total": self.api_requests_total.get(),
-                "requests_success": self.api_requests_success.get(),
-                "requests_failed": self.api_requests_failed.get(),
+                "requests_total": value(self.api_requests_total),
+                "requests_success": value(self.api_requests_success),
+                "requests_failed": value(self.api_requests_failed),
             },
             "cache": {
-                "hits": self.cache_hits.get(),
-                "misses": self.cache_misses.get(),
-                "evictions": self.cache_evictions.get(),
+                "hits": value(self.cache_hits),
+                "misses": value(self.cache_misses),
+                "evictions": value(self.cache_evictions),
             },
             "tws": {
-                "requests_total": self.tws_requests_total.get(),
-                "requests_success": self.tws_requests_success.get(),
-                "requests_failed": self.tws_requests_failed.get(),
+                "requests_total": value(self.tws_requests_total),
+                "requests_success": value(self.tws_requests_success),
+                "requests_failed": value(self.tws_requests_failed),
             },
             "health": {
-                "checks_total": self.health_checks_total.get(),
-                "checks_success": self.health_checks_success.get(),
-                "checks_failed": self.health_checks_failed.get(),
+                "checks_total": value(self.health_checks_total),
+                "checks_success": value(self.health_checks_success),
+                "checks_failed": value(self.health_checks_failed),
             },
+            "multiprocess": shared is not None,
         }
 
 
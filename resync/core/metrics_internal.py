@@ -3,17 +3,33 @@ Internal Metrics System - Replaces Prometheus/Grafana dependencies.
 
 Provides lightweight metrics collection without external dependencies.
 Metrics can be exported to JSON for any visualization tool.
+
+Histograms are backed by DDSketch (log-bucketed quantile sketch): O(1)
+observe, bounded memory and percentiles within a fixed relative error.
+
+With RESYNC_METRICS_MULTIPROC_DIR set, metrics cover the whole process
+group: counters and gauges are mirrored into per-process mmap segments
+(resync.core.metrics_multiprocess), every worker periodically writes its
+histogram sketches to a segment file, and export_json() /
+collect_multiprocess() aggregate them.
 """
 
+import json
 import logging
+import math
+import os
+import threading
 import time
-from collections import defaultdict
+from collections import defaultdict, deque
 from dataclasses import dataclass, field
 from datetime import datetime
 from enum import Enum
+from pathlib import Path
 from threading import Lock
 from typing import Any, Optional
 
+from resync.core.metrics_multiprocess import SharedMetricValues, collect
+
 logger = logging.getLogger(__name__)
 
 
@@ -42,7 +58,8 @@ class Metric:
     name: str
     type: MetricType
     description: str = ""
-    values: list[MetricValue] = field(default_factory=list)
+    # Keep only last 1000 values (deque drops the oldest in O(1))
+    values: deque[MetricValue] = field(default_factory=lambda: deque(maxlen=1000))
 
     def record(self, value: float, labels: dict[str, str] | None = None):
         """Record a new value."""
@@ -53,9 +70,6 @@ class Metric:
                 labels=labels or {},
             )
         )
-        # Keep only last 1000 values
-        if len(self.values) > 1000:
-            self.values = self.values[-1000:]
 
     def get_current(self) -> float | None:
         """Get most recent value."""
@@ -83,12 +97,16 @@ class Counter:
         self.label_names = labels or []
         self._values: dict[tuple, float] = defaultdict(float)
         self._lock = Lock()
+        # Multi-process segment (set by MetricsRegistry.enable_multiprocess)
+        self._shared: SharedMetricValues | None = None
 
     def inc(self, amount: float = 1, labels: dict[str, str] = None):
         """Increment the counter."""
         label_key = tuple(sorted((labels or {}).items()))
         with self._lock:
             self._values[label_key] += amount
+            if self._shared is not None:
+                self._shared.write_counter(self.name, label_key, self._values[label_key])
 
     def get(self, labels: dict[str, str] = None) -> float:
         """Get current value."""
@@ -114,30 +132,45 @@ class _LabeledCounter:
 class Gauge:
     """A gauge that can go up or down."""
 
-    def __init__(self, name: str, description: str = "", labels: list[str] = None):
+    # How live worker values are combined: "sum", "max", "min" or "mean"
+    MULTIPROCESS_MODES = ("sum", "max", "min", "mean")
+
+    def __init__(
+        self,
+        name: str,
+        description: str = "",
+        labels: list[str] = None,
+        multiprocess_mode: str = "sum",
+    ):
+        if multiprocess_mode not in self.MULTIPROCESS_MODES:
+            raise ValueError(f"Invalid multiprocess_mode: {multiprocess_mode}")
         self.name = name
         self.description = description
         self.label_names = labels or []
+        self.multiprocess_mode = multiprocess_mode
         self._values: dict[tuple, float] = defaultdict(float)
         self._lock = Lock()
+        self._shared: SharedMetricValues | None = None
 
     def set(self, value: float, labels: dict[str, str] = None):
         """Set the gauge value."""
         label_key = tuple(sorted((labels or {}).items()))
         with self._lock:
             self._values[label_key] = value
+            if self._shared is not None:
+                self._shared.write_gauge(self.name, label_key, value)
 
     def inc(self, amount: float = 1, labels: dict[str, str] = None):
         """Increment the gauge."""
         label_key = tuple(sorted((labels or {}).items()))
         with self._lock:
             self._values[label_key] += amount
+            if self._shared is not None:
+                self._shared.write_gauge(self.name, label_key, self._values[label_key])
 
     def dec(self, amount: float = 1, labels: dict[str, str] = None):
         """Decrement the gauge."""
-        label_key = tuple(sorted((labels or {}).items()))
-        with self._lock:
-            self._values[label_key] -= amount
+        self.inc(-amount, labels)
 
     def get(self, labels: dict[str, str] = None) -> float:
         """Get current value."""
@@ -166,8 +199,159 @@ class _LabeledGauge:
         self._gauge.dec(amount, self._labels)
 
 
+class DDSketch:
+    """
+    Mergeable quantile sketch with relative-error guarantees (DDSketch).
+
+    Values are mapped to logarithmic buckets: bucket k holds values in
+    (gamma^(k-1), gamma^k] with gamma = (1 + a) / (1 - a), so any quantile is
+    estimated within relative accuracy ``a``. Observe is O(1), memory is
+    bounded by ``max_bins`` (lowest buckets are collapsed beyond that) and
+    two sketches with the same accuracy merge by adding bucket counts.
+    """
+
+    __slots__ = (
+        "relative_accuracy",
+        "max_bins",
+        "_gamma",
+        "_log_gamma",
+        "_bins",
+        "_negative_bins",
+        "zero_count",
+        "count",
+        "sum",
+        "min",
+        "max",
+    )
+
+    # Values with magnitude below this are counted as zero
+    MIN_INDEXABLE = 1e-9
+
+    def __init__(self, relative_accuracy: float = 0.01, max_bins: int = 2048):
+        if not 0 < relative_accuracy < 1:
+            raise ValueError("relative_accuracy must be between 0 and 1")
+        self.relative_accuracy = relative_accuracy
+        self.max_bins = max_bins
+        self._gamma = (1 + relative_accuracy) / (1 - relative_accuracy)
+        self._log_gamma = math.log(self._gamma)
+        self._bins: dict[int, int] = {}
+        self._negative_bins: dict[int, int] = {}
+        self.zero_count = 0
+        self.count = 0
+        self.sum = 0.0
+        self.min = math.inf
+        self.max = -math.inf
+
+    def _key(self, value: float) -> int:
+        return math.ceil(math.log(value) / self._log_gamma)
+
+    def _value(self, key: int) -> float:
+        # Midpoint (in relative terms) of bucket (gamma^(k-1), gamma^k]
+        return 2 * self._gamma**key / (self._gamma + 1)
+
+    def add(self, value: float, count: int = 1) -> None:
+        """Record an observation (O(1))."""
+        if value > self.MIN_INDEXABLE:
+            bins = self._bins
+            key = self._key(value)
+        elif value < -self.MIN_INDEXABLE:
+            bins = self._negative_bins
+            key = self._key(-value)
+        else:
+            bins = None
+            self.zero_count += count
+
+        if bins is not None:
+            bins[key] = bins.get(key, 0) + count
+            if len(bins) > self.max_bins:
+                self._collapse(bins)
+
+        self.count += count
+        self.sum += value * count
+        if value < self.min:
+            self.min = value
+        if value > self.max:
+            self.max = value
+
+    @staticmethod
+    def _collapse(bins: dict[int, int]) -> None:
+        """Fold the lowest bucket into the next one (keeps upper quantiles exact)."""
+        lowest, second = sorted(bins)[:2]
+        bins[second] += bins.pop(lowest)
+
+    def quantile(self, q: float) -> float | None:
+        """Estimate the q-quantile (0 <= q <= 1)."""
+        if self.count == 0:
+            return None
+        rank = q * (self.count - 1)
+
+        seen = 0
+        for key in sorted(self._negative_bins, reverse=True):
+            seen += self._negative_bins[key]
+            if seen > rank:
+                return max(-self._value(key), self.min)
+        seen += self.zero_count
+        if seen > rank:
+            return 0.0
+        for key in sorted(self._bins):
+            seen += self._bins[key]
+            if seen > rank:
+                return min(self._value(key), self.max)
+        return self.max
+
+    def merge(self, other: "DDSketch") -> None:
+        """Add another sketch's observations into this one."""
+        if other.relative_accuracy != self.relative_accuracy:
+            raise ValueError("Cannot merge sketches with different relative accuracy")
+        for source, target in (
+            (other._bins, self._bins),
+            (other._negative_bins, self._negative_bins),
+        ):
+            for key, count in source.items():
+                target[key] = target.get(key, 0) + count
+            while len(target) > self.max_bins:
+                self._collapse(target)
+        self.zero_count += other.zero_count
+        self.count += other.count
+        self.sum += other.sum
+        self.min = min(self.min, other.min)
+        self.max = max(self.max, other.max)
+
+    def copy(self) -> "DDSketch":
+        clone = DDSketch(self.relative_accuracy, self.max_bins)
+        clone.merge(self)
+        return clone
+
+    def to_dict(self) -> dict[str, Any]:
+        """Serialize (JSON-compatible)."""
+        return {
+            "relative_accuracy": self.relative_accuracy,
+            "max_bins": self.max_bins,
+            "bins": [[k, c] for k, c in self._bins.items()],
+            "negative_bins": [[k, c] for k, c in self._negative_bins.items()],
+            "zero_count": self.zero_count,
+            "count": self.count,
+            "sum": self.sum,
+            "min": self.min if self.count else None,
+            "max": self.max if self.count else None,
+        }
+
+    @classmethod
+    def from_dict(cls, data: dict[str, Any]) -> "DDSketch":
+        sketch = cls(data["relative_accuracy"], data["max_bins"])
+        sketch._bins = {int(k): int(c) for k, c in data["bins"]}
+        sketch._negative_bins = {int(k): int(c) for k, c in data["negative_bins"]}
+        sketch.zero_count = data["zero_count"]
+        sketch.count = data["count"]
+        sketch.sum = data["sum"]
+        if sketch.count:
+            sketch.min = data["min"]
+            sketch.max = data["max"]
+        return sketch
+
+
 class Histogram:
-    """A histogram for measuring distributions."""
+    """A histogram for measuring distributions (DDSketch per label set)."""
 
     DEFAULT_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
 
@@ -177,32 +361,48 @@ class Histogram:
         description: str = "",
         labels: list[str] = None,
         buckets: tuple = None,
+        relative_accuracy: float = 0.01,
     ):
         self.name = name
         self.description = description
         self.label_names = labels or []
         self.buckets = buckets or self.DEFAULT_BUCKETS
-        self._observations: dict[tuple, list[float]] = defaultdict(list)
+        self.relative_accuracy = relative_accuracy
+        self._sketches: dict[tuple, DDSketch] = {}
         self._lock = Lock()
 
     def observe(self, value: float, labels: dict[str, str] = None):
         """Record an observation."""
         label_key = tuple(sorted((labels or {}).items()))
         with self._lock:
-            self._observations[label_key].append(value)
-            # Keep last 10000 observations
-            if len(self._observations[label_key]) > 10000:
-                self._observations[label_key] = self._observations[label_key][-10000:]
+            sketch = self._sketches.get(label_key)
+            if sketch is None:
+                sketch = self._sketches[label_key] = DDSketch(self.relative_accuracy)
+            sketch.add(value)
 
     def get_percentile(self, percentile: float, labels: dict[str, str] = None) -> float | None:
-        """Get a percentile value."""
+        """Get a percentile value (within relative_accuracy)."""
         label_key = tuple(sorted((labels or {}).items()))
-        observations = self._observations.get(label_key, [])
-        if not observations:
+        sketch = self._sketches.get(label_key)
+        if sketch is None:
             return None
-        sorted_obs = sorted(observations)
-        idx = int(len(sorted_obs) * percentile / 100)
-        return sorted_obs[min(idx, len(sorted_obs) - 1)]
+        with self._lock:
+            return sketch.quantile(percentile / 100)
+
+    def get_count(self, labels: dict[str, str] = None) -> int:
+        """Number of observations."""
+        sketch = self._sketches.get(tuple(sorted((labels or {}).items())))
+        return sketch.count if sketch else 0
+
+    def get_sum(self, labels: dict[str, str] = None) -> float:
+        """Sum of observations."""
+        sketch = self._sketches.get(tuple(sorted((labels or {}).items())))
+        return sketch.sum if sketch else 0.0
+
+    def snapshot(self) -> dict[tuple, DDSketch]:
+        """Copy of the sketches per label set (safe to merge/serialize)."""
+        with self._lock:
+            return {key: sketch.copy() for key, sketch in self._sketches.items()}
 
     def labels(self, **kwargs) -> "Histogram":
         """Return histogram with specific labels."""
@@ -244,6 +444,78 @@ class _HistogramTimer:
         self._histogram.observe(duration, self._labels)
 
 
+MULTIPROC_DIR_ENV = "RESYNC_METRICS_MULTIPROC_DIR"
+
+
+class SketchSegmentStore:
+    """
+    File-backed histogram segments shared by the workers of a process group.
+
+    Each process writes its sketches to ``sketches_<pid>.json`` in a shared
+    directory (atomic replace); any process can read all segments and merge
+    them into whole-group percentiles.
+    """
+
+    PREFIX = "sketches_"
+
+    def __init__(self, directory: str | os.PathLike, pid: int | None = None):
+        self.directory = Path(directory)
+        self.directory.mkdir(parents=True, exist_ok=True)
+        self.pid = pid or os.getpid()
+
+    @property
+    def path(self) -> Path:
+        return self.directory / f"{self.PREFIX}{self.pid}.json"
+
+    def write(self, histograms: dict[str, "Histogram"]) -> None:
+        """Write this process' sketches to its segment."""
+        payload = {
+            name: [
+                [list(map(list, label_key)), sketch.to_dict()]
+                for label_key, sketch in histogram.snapshot().items()
+            ]
+            for name, histogram in histograms.items()
+        }
+        tmp = self.path.with_suffix(".tmp")
+        tmp.write_text(json.dumps(payload), encoding="utf-8")
+        os.replace(tmp, self.path)
+
+    def read_merged(self) -> dict[str, dict[tuple, DDSketch]]:
+        """Merge the segments of every process: name -> label key -> sketch."""
+        merged: dict[str, dict[tuple, DDSketch]] = defaultdict(dict)
+        for segment in self.directory.glob(f"{self.PREFIX}*.json"):
+            try:
+                payload = json.loads(segment.read_text(encoding="utf-8"))
+            except (OSError, ValueError) as e:
+                logger.debug("Skipping unreadable metrics segment %s: %s", segment, e)
+                continue
+            for name, series in payload.items():
+                for raw_key, data in series:
+                    label_key = tuple(tuple(pair) for pair in raw_key)
+                    sketch = DDSketch.from_dict(data)
+                    target = merged[name].get(label_key)
+                    if target is None:
+                        merged[name][label_key] = sketch
+                    else:
+                        target.merge(sketch)
+        return dict(merged)
+
+    def remove(self, pid: int | None = None) -> None:
+        """Drop a process' segment (e.g. from gunicorn child_exit)."""
+        path = self.directory / f"{self.PREFIX}{pid or self.pid}.json"
+        path.unlink(missing_ok=True)
+
+
+def _combine_gauge(values: list[float], mode: str) -> float:
+    if mode == "max":
+        return max(values)
+    if mode == "min":
+        return min(values)
+    if mode == "mean":
+        return sum(values) / len(values)
+    return sum(values)
+
+
 class MetricsRegistry:
     """Central registry for all metrics."""
 
@@ -254,12 +526,31 @@ class MetricsRegistry:
             cls._instance = super().__new__(cls)
             cls._instance._metrics: dict[str, Any] = {}
             cls._instance._lock = Lock()
+            cls._instance._segment_store: SketchSegmentStore | None = None
+            cls._instance._shared_values: SharedMetricValues | None = None
+            cls._instance._forked = False
         return cls._instance
 
     def register(self, metric: Any) -> None:
         """Register a metric."""
         with self._lock:
             self._metrics[metric.name] = metric
+            if self._shared_values is not None:
+                self._attach_shared(metric)
+
+    def _attach_shared(self, metric: Any) -> None:
+        """Mirror a counter/gauge (current values included) into the mmap segment."""
+        if not isinstance(metric, Counter | Gauge):
+            return
+        with metric._lock:
+            metric._shared = self._shared_values
+            write = (
+                self._shared_values.write_counter
+                if isinstance(metric, Counter)
+                else self._shared_values.write_gauge
+            )
+            for label_key, value in metric._values.items():
+                write(metric.name, label_key, value)
 
     def get(self, name: str) -> Any | None:
         """Get a metric by name."""
@@ -269,6 +560,116 @@ class MetricsRegistry:
         """Get all metrics."""
         return dict(self._metrics)
 
+    def enable_multiprocess(
+        self, directory: str | os.PathLike | None = None, flush_interval: float = 5.0
+    ) -> SketchSegmentStore | None:
+        """
+        Share metrics across worker processes.
+
+        Counters and gauges are mirrored into this process' mmap segments on
+        every update. A daemon thread writes the histogram sketches to the
+        segment directory every ``flush_interval`` seconds. export_json()
+        and collect_multiprocess() then report the whole process group.
+
+        Args:
+            directory: Segment directory (default: $RESYNC_METRICS_MULTIPROC_DIR)
+            flush_interval: Seconds between segment writes
+        """
+        directory = directory or os.getenv(MULTIPROC_DIR_ENV)
+        if not directory:
+            return None
+
+        with self._lock:
+            store = self._segment_store
+            if store is not None and store.pid == os.getpid():
+                return store
+            if self._forked:
+                # Inherited values are already counted in the parent's segments
+                self._reset_values()
+                self._forked = False
+            # New process (or first call): own segments + flusher thread
+            store = SketchSegmentStore(directory)
+            self._segment_store = store
+            self._shared_values = SharedMetricValues(directory)
+            for metric in self._metrics.values():
+                self._attach_shared(metric)
+
+        def _flush_loop() -> None:
+            while True:
+                time.sleep(flush_interval)
+                try:
+                    self.flush_segment()
+                except Exception as e:
+                    logger.warning("Failed to write metrics segment: %s", e)
+
+        threading.Thread(target=_flush_loop, name="metrics-segment-flush", daemon=True).start()
+        logger.info("Multi-process metrics segments enabled in %s", directory)
+        return store
+
+    def _reset_values(self) -> None:
+        for metric in self._metrics.values():
+            if isinstance(metric, Counter | Gauge):
+                metric._values.clear()
+            elif isinstance(metric, Histogram):
+                metric._sketches.clear()
+
+    def _detach_after_fork(self) -> None:
+        """
+        Fork child hook: stop writing to the parent's segments.
+
+        Only gunicorn workers get segments of their own (post_fork calls
+        enable_multiprocess, which zeroes the inherited values first). Other
+        forked children, e.g. ProcessPoolExecutor workers, keep local-only
+        metrics and never show up in the aggregated totals.
+        """
+        if self._segment_store is None:
+            return
+        # Locks held by other parent threads at fork time are never released
+        self._lock = Lock()
+        for metric in self._metrics.values():
+            metric._lock = Lock()
+            if isinstance(metric, Counter | Gauge):
+                metric._shared = None
+        self._segment_store = None
+        self._shared_values = None
+        self._forked = True
+
+    def flush_segment(self) -> None:
+        """Write this process' histogram sketches to its segment now."""
+        store = self._segment_store
+        if store is None:
+            return
+        histograms = {
+            name: metric for name, metric in self._metrics.items() if isinstance(metric, Histogram)
+        }
+        store.write(histograms)
+
+    def collect_multiprocess(self) -> dict[str, dict[tuple, float]] | None:
+        """
+        Counter/gauge values aggregated over all worker segments.
+
+        Counters are summed (exited workers included, so totals stay
+        monotonic); gauges are combined with each gauge's multiprocess_mode.
+
+        Returns:
+            name -> label key -> value, or None when multi-process is disabled
+        """
+        store = self._segment_store
+        if store is None:
+            return None
+
+        raw = collect(store.directory)
+        result: dict[str, dict[tuple, float]] = {}
+        for name, series in raw["counters"].items():
+            result[name] = {label_key: sum(values) for label_key, values in series.items()}
+        for name, series in raw["gauges"].items():
+            metric = self._metrics.get(name)
+            mode = getattr(metric, "multiprocess_mode", "sum")
+            result[name] = {
+                label_key: _combine_gauge(values, mode) for label_key, values in series.items()
+            }
+        return result
+
     def export_json(self) -> dict[str, Any]:
         """Export all metrics to JSON format."""
         result = {
@@ -276,26 +677,43 @@ class MetricsRegistry:
             "metrics": {},
         }
 
+        # Whole-process-group values when segments are enabled
+        merged: dict[str, dict[tuple, DDSketch]] = {}
+        shared: dict[str, dict[tuple, float]] = {}
+        store = self._segment_store
+        if store is not None:
+            try:
+                self.flush_segment()
+                merged = store.read_merged()
+                shared = self.collect_multiprocess() or {}
+            except Exception as e:
+                logger.warning("Failed to merge metrics segments: %s", e)
+
         for name, metric in self._metrics.items():
             if isinstance(metric, Counter):
                 result["metrics"][name] = {
                     "type": "counter",
                     "description": metric.description,
-                    "values": dict(metric._values),
+                    "values": shared.get(name) or dict(metric._values),
                 }
             elif isinstance(metric, Gauge):
                 result["metrics"][name] = {
                     "type": "gauge",
                     "description": metric.description,
-                    "values": dict(metric._values),
+                    "values": shared.get(name) or dict(metric._values),
                 }
             elif isinstance(metric, Histogram):
+                sketch = merged.get(name, {}).get(()) or metric.snapshot().get(())
+                sketch = sketch or DDSketch(metric.relative_accuracy)
                 result["metrics"][name] = {
                     "type": "histogram",
                     "description": metric.description,
-                    "p50": metric.get_percentile(50),
-                    "p95": metric.get_percentile(95),
-                    "p99": metric.get_percentile(99),
+                    "count": sketch.count,
+                    "sum": sketch.sum,
+                    "p50": sketch.quantile(0.50),
+                    "p95": sketch.quantile(0.95),
+                    "p99": sketch.quantile(0.99),
+                    "multiprocess": name in merged,
                 }
 
         return result
@@ -303,6 +721,10 @@ class MetricsRegistry:
 
 # Global registry
 registry = MetricsRegistry()
+registry.enable_multiprocess()
+if hasattr(os, "register_at_fork"):
+    # Forked children must not write into the parent's segments (see post_fork)
+    os.register_at_fork(after_in_child=registry._detach_after_fork)
 
 
 def create_counter(name: str, description: str = "", labels: list[str] = None) -> Counter:
@@ -312,9 +734,14 @@ def create_counter(name: str, description: str = "", labels: list[str] = None) -
     return counter
 
 
-def create_gauge(name: str, description: str = "", labels: list[str] = None) -> Gauge:
+def create_gauge(
+    name: str,
+    description: str = "",
+    labels: list[str] = None,
+    multiprocess_mode: str = "sum",
+) -> Gauge:
     """Create and register a gauge."""
-    gauge = Gauge(name, description, labels)
+    gauge = Gauge(name, description, labels, multiprocess_mode)
     registry.register(gauge)
     return gauge
 
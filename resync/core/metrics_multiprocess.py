@@ -0,0 +1,224 @@
+"""
+Multi-process metrics backend - mmap'd counter/gauge segments.
+
+Under gunicorn every worker has its own copy of the internal metrics, so a
+dashboard only sees the worker that served the request. With this backend
+each process mirrors its counters and gauges into fixed-layout files in a
+shared directory, and any process can aggregate all of them.
+
+Layout of a segment file (``counters_<pid>.db`` / ``gauges_<pid>.db``)::
+
+    header:  uint32 used_bytes | uint32 reserved
+    entry:   uint32 key_len | key (utf-8, padded to 8) | float64 value
+
+Each file has exactly one writer (its process), so updates are a single
+aligned 8-byte store into the mapping - no cross-process locks. New keys
+are appended and become visible once ``used_bytes`` is updated, so readers
+never see a partial entry.
+"""
+
+import json
+import logging
+import mmap
+import os
+import struct
+from collections import defaultdict
+from pathlib import Path
+
+logger = logging.getLogger(__name__)
+
+_HEADER = struct.Struct("<II")
+_KEY_LEN = struct.Struct("<I")
+_VALUE = struct.Struct("<d")
+
+INITIAL_SIZE = 64 * 1024
+
+COUNTER_PREFIX = "counters_"
+GAUGE_PREFIX = "gauges_"
+# Counters of exited workers, folded in by the master (its only writer)
+ARCHIVE_SEGMENT = f"{COUNTER_PREFIX}archive.db"
+
+
+def encode_key(name: str, label_key: tuple) -> str:
+    """Stable string key for (metric name, sorted label pairs)."""
+    return json.dumps([name, [list(pair) for pair in label_key]], separators=(",", ":"))
+
+
+def decode_key(key: str) -> tuple[str, tuple]:
+    name, pairs = json.loads(key)
+    return name, tuple(tuple(pair) for pair in pairs)
+
+
+def _entry_size(key_bytes: bytes) -> int:
+    padded = _KEY_LEN.size + len(key_bytes)
+    padded += (8 - padded % 8) % 8
+    return padded + _VALUE.size
+
+
+def read_segment(path: str | os.PathLike) -> list[tuple[str, float]]:
+    """Read all (key, value) pairs of a segment file (any process)."""
+    with open(path, "rb") as f:
+        data = f.read()
+    if len(data) < _HEADER.size:
+        return []
+    used, _ = _HEADER.unpack_from(data, 0)
+    used = min(used, len(data))
+
+    entries = []
+    pos = _HEADER.size
+    while pos + _KEY_LEN.size <= used:
+        (key_len,) = _KEY_LEN.unpack_from(data, pos)
+        key_bytes = data[pos + _KEY_LEN.size : pos + _KEY_LEN.size + key_len]
+        size = _entry_size(key_bytes)
+        if pos + size > used:
+            break
+        (value,) = _VALUE.unpack_from(data, pos + size - _VALUE.size)
+        entries.append((key_bytes.decode("utf-8"), value))
+        pos += size
+    return entries
+
+
+class MmapValueFile:
+    """Single-writer mmap'd table of float64 values keyed by string."""
+
+    def __init__(self, path: str | os.PathLike):
+        self.path = Path(path)
+        self._f = open(self.path, "a+b")  # noqa: SIM115 - kept open for the mapping
+        if os.fstat(self._f.fileno()).st_size < INITIAL_SIZE:
+            self._f.truncate(INITIAL_SIZE)
+        self._capacity = os.fstat(self._f.fileno()).st_size
+        self._map = mmap.mmap(self._f.fileno(), self._capacity)
+        self._positions: dict[str, int] = {}
+
+        used, _ = _HEADER.unpack_from(self._map, 0)
+        if used == 0:
+            used = _HEADER.size
+            _HEADER.pack_into(self._map, 0, used, 0)
+        self._used = used
+        # Reopened segment (same pid): index existing entries
+        pos = _HEADER.size
+        for key, _ in read_segment(self.path):
+            key_bytes = key.encode("utf-8")
+            size = _entry_size(key_bytes)
+            self._positions[key] = pos + size - _VALUE.size
+            pos += size
+
+    def _append(self, key: str) -> int:
+        key_bytes = key.encode("utf-8")
+        size = _entry_size(key_bytes)
+        while self._used + size > self._capacity:
+            self._grow()
+        pos = self._used
+        _KEY_LEN.pack_into(self._map, pos, len(key_bytes))
+        self._map[pos + _KEY_LEN.size : pos + _KEY_LEN.size + len(key_bytes)] = key_bytes
+        value_pos = pos + size - _VALUE.size
+        _VALUE.pack_into(self._map, value_pos, 0.0)
+        # Publish the entry only after it is complete
+        self._used += size
+        _HEADER.pack_into(self._map, 0, self._used, 0)
+        self._positions[key] = value_pos
+        return value_pos
+
+    def _grow(self) -> None:
+        self._capacity *= 2
+        self._map.close()
+        self._f.truncate(self._capacity)
+        self._map = mmap.mmap(self._f.fileno(), self._capacity)
+
+    def write(self, key: str, value: float) -> None:
+        """Store a value (aligned 8-byte write)."""
+        pos = self._positions.get(key)
+        if pos is None:
+            pos = self._append(key)
+        _VALUE.pack_into(self._map, pos, value)
+
+    def read(self, key: str) -> float | None:
+        pos = self._positions.get(key)
+        if pos is None:
+            return None
+        return _VALUE.unpack_from(self._map, pos)[0]
+
+    def close(self) -> None:
+        self._map.close()
+        self._f.close()
+
+
+class SharedMetricValues:
+    """Counter/gauge segments of the current process."""
+
+    def __init__(self, directory: str | os.PathLike, pid: int | None = None):
+        self.directory = Path(directory)
+        self.directory.mkdir(parents=True, exist_ok=True)
+        self.pid = pid or os.getpid()
+        self._counters = MmapValueFile(self.directory / f"{COUNTER_PREFIX}{self.pid}.db")
+        self._gauges = MmapValueFile(self.directory / f"{GAUGE_PREFIX}{self.pid}.db")
+        self._keys: dict[tuple[str, tuple], str] = {}
+
+    def _key(self, name: str, label_key: tuple) -> str:
+        key = self._keys.get((name, label_key))
+        if key is None:
+            key = self._keys[(name, label_key)] = encode_key(name, label_key)
+        return key
+
+    def write_counter(self, name: str, label_key: tuple, value: float) -> None:
+        self._counters.write(self._key(name, label_key), value)
+
+    def write_gauge(self, name: str, label_key: tuple, value: float) -> None:
+        self._gauges.write(self._key(name, label_key), value)
+
+    def close(self) -> None:
+        self._counters.close()
+        self._gauges.close()
+
+
+def collect(directory: str | os.PathLike) -> dict[str, dict[str, dict[tuple, list[float]]]]:
+    """
+    Read every process' segments.
+
+    Returns:
+        {"counters": {name: {label_key: [value per process]}}, "gauges": {...}}
+    """
+    result: dict[str, dict[str, dict[tuple, list[float]]]] = {}
+    for kind, prefix in (("counters", COUNTER_PREFIX), ("gauges", GAUGE_PREFIX)):
+        series: dict[str, dict[tuple, list[float]]] = defaultdict(lambda: defaultdict(list))
+        for path in Path(directory).glob(f"{prefix}*.db"):
+            try:
+                entries = read_segment(path)
+            except OSError as e:
+                logger.debug("Skipping unreadable metrics segment %s: %s", path, e)
+                continue
+            for key, value in entries:
+                name, label_key = decode_key(key)
+                series[name][label_key].append(value)
+        result[kind] = {name: dict(values) for name, values in series.items()}
+    return result
+
+
+def mark_process_dead(pid: int, directory: str | os.PathLike) -> None:
+    """
+    Remove the segments of an exited worker (gunicorn child_exit).
+
+    Its counters are first added to the archive segment so totals stay
+    monotonic; gauge segments and histogram sketches describe live state
+    and are dropped.
+    """
+    directory = Path(directory)
+    segment = directory / f"{COUNTER_PREFIX}{pid}.db"
+    if segment.exists():
+        archive = MmapValueFile(directory / ARCHIVE_SEGMENT)
+        try:
+            for key, value in read_segment(segment):
+                archive.write(key, (archive.read(key) or 0.0) + value)
+        finally:
+            archive.close()
+    for name in (segment.name, f"{GAUGE_PREFIX}{pid}.db", f"sketches_{pid}.json"):
+        (directory / name).unlink(missing_ok=True)
+
+
+__all__ = [
+    "MmapValueFile",
+    "SharedMetricValues",
+    "collect",
+    "mark_process_dead",
+    "read_segment",
+]
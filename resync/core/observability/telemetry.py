@@ -23,6 +23,11 @@ Environment Variables:
     OTEL_EXPORTER_OTLP_ENDPOINT: OTLP endpoint (default: http://localhost:4317)
     OTEL_TRACES_SAMPLER: Sampler type (default: parentbased_traceidratio)
     OTEL_TRACES_SAMPLER_ARG: Sampling rate 0-1 (default: 0.1 = 10%)
+    OTEL_TAIL_SAMPLING: Decide per trace after it completes, keeping errors,
+        latency outliers and a baseline; records every span (default: true)
+    OTEL_TAIL_SAMPLING_BASELINE: Baseline keep rate 0-1 (default: 0.01)
+    OTEL_TAIL_SAMPLING_LATENCY_QUANTILE: Per-route latency outlier quantile
+        (default: 0.99)
 """
 
 from __future__ import annotations
@@ -48,6 +53,11 @@ def is_telemetry_enabled() -> bool:
     return os.getenv("OTEL_ENABLED", "true").lower() in ("true", "1", "yes")
 
 
+def is_tail_sampling_enabled() -> bool:
+    """Check if tail-based trace sampling is enabled."""
+    return os.getenv("OTEL_TAIL_SAMPLING", "true").lower() in ("true", "1", "yes")
+
+
 def get_service_name() -> str:
     """Get service name for telemetry."""
     return os.getenv("OTEL_SERVICE_NAME", "resync")
@@ -92,7 +102,10 @@ def setup_telemetry(app: FastAPI | None = None) -> None:
         from opentelemetry.sdk.resources import Resource
         from opentelemetry.sdk.trace import TracerProvider
         from opentelemetry.sdk.trace.export import BatchSpanProcessor
+        from opentelemetry.sdk.trace.sampling import ALWAYS_ON, ParentBased
         from opentelemetry.semconv.resource import ResourceAttributes
+
+        from resync.core.tail_sampling import TailSamplingSpanProcessor
     except ImportError:
         logger.warning(
             "OpenTelemetry packages not installed. "
@@ -113,14 +126,26 @@ def setup_telemetry(app: FastAPI | None = None) -> None:
         }
     )
 
-    # Create tracer provider
-    tracer_provider = TracerProvider(resource=resource)
+    # Create tracer provider (the tail sampler needs every span recorded)
+    tail_sampling = is_tail_sampling_enabled()
+    if tail_sampling:
+        tracer_provider = TracerProvider(resource=resource, sampler=ParentBased(ALWAYS_ON))
+    else:
+        tracer_provider = TracerProvider(resource=resource)
 
     # Setup OTLP exporter
     otlp_endpoint = os.getenv("OTEL_EXPORTER_OTLP_ENDPOINT", "http://localhost:4317")
     try:
         otlp_exporter = OTLPSpanExporter(endpoint=otlp_endpoint, insecure=True)
         span_processor = BatchSpanProcessor(otlp_exporter)
+        if tail_sampling:
+            span_processor = TailSamplingSpanProcessor(
+                span_processor,
+                baseline_rate=float(os.getenv("OTEL_TAIL_SAMPLING_BASELINE", "0.01")),
+                latency_quantile=float(
+                    os.getenv("OTEL_TAIL_SAMPLING_LATENCY_QUANTILE", "0.99")
+                ),
+            )
         tracer_provider.add_span_processor(span_processor)
     except Exception as e:
         logger.warning(f"Failed to setup OTLP exporter: {e}")
@@ -136,6 +161,7 @@ def setup_telemetry(app: FastAPI | None = None) -> None:
         service_name=get_service_name(),
         endpoint=otlp_endpoint,
         environment=get_environment(),
+        tail_sampling=tail_sampling,
     )
 
 
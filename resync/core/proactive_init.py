@@ -7,6 +7,7 @@ Initializes proactive monitoring components using PostgreSQL.
 import logging
 from typing import Any
 
+from resync.core.cache.query_cache import get_repository_query_cache
 from resync.core.database.repositories import TWSStore
 
 logger = logging.getLogger(__name__)
@@ -21,7 +22,7 @@ class ProactiveMonitor:
         """Initialize. db_path is ignored - uses PostgreSQL."""
         if db_path:
             logger.debug(f"db_path ignored, using PostgreSQL: {db_path}")
-        self._store = TWSStore()
+        self._store = TWSStore(query_cache=get_repository_query_cache())
         self._initialized = False
         self._config = kwargs
 
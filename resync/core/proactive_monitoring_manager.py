@@ -43,6 +43,7 @@ class ProactiveMonitoringManager:
         self._poller = None
         self._event_bus = None
         self._status_store = None
+        self._cache_invalidator = None
 
         # Tasks
         self._pattern_detection_task: asyncio.Task | None = None
@@ -89,6 +90,11 @@ class ProactiveMonitoringManager:
         await self._event_bus.start()
         logger.info("event_bus_initialized")
 
+        # Invalidação de caches por tag a partir dos eventos do poller
+        from resync.core.cache_invalidation import init_cache_invalidator
+
+        self._cache_invalidator = init_cache_invalidator(self._event_bus)
+
         # 2. Inicializa Status Store
         from resync.core.tws_status_store import init_status_store
 
@@ -102,12 +108,14 @@ class ProactiveMonitoringManager:
 
         # 3. Inicializa Background Poller
         from resync.core.tws_background_poller import init_tws_poller
+        from resync.services.tws_cache import get_tws_cache
 
         self._poller = init_tws_poller(
             tws_client=tws_client,
             polling_interval=self._config.polling_interval_seconds,
             status_store=self._status_store,
             event_bus=self._event_bus,
+            api_cache=get_tws_cache(),
         )
 
         # Configura thresholds
@@ -158,6 +166,8 @@ class ProactiveMonitoringManager:
             await self._poller.stop()
 
         # Para event bus
+        if self._cache_invalidator:
+            self._cache_invalidator.detach()
         if self._event_bus:
             await self._event_bus.stop()
 
@@ -328,6 +338,7 @@ class ProactiveMonitoringManager:
                 "poller": None,
                 "event_bus": None,
                 "status_store": None,
+                "cache_invalidator": None,
             },
         }
 
@@ -337,6 +348,9 @@ class ProactiveMonitoringManager:
         if self._event_bus:
             status["components"]["event_bus"] = self._event_bus.get_metrics()
 
+        if self._cache_invalidator:
+            status["components"]["cache_invalidator"] = self._cache_invalidator.get_stats()
+
         return status
 
     async def update_config(self, updates: dict[str, Any]) -> None:
@@ -17,15 +17,16 @@ import json
 import secrets
 import time
 from abc import ABC, abstractmethod
-from collections import deque
 from collections.abc import Awaitable, Callable
 from dataclasses import dataclass, field
 from datetime import datetime
 from enum import Enum
+from pathlib import Path
 from typing import Any
 
 import aiohttp
 
+from resync.core.siem_spool import AdaptiveBatchSizer, EncodedEvent, SIEMSpool
 from resync.core.structured_logger import get_logger
 
 logger = get_logger(__name__)
@@ -175,6 +176,28 @@ class SIEMEvent:
         return mapping.get(severity.lower(), 5)
 
 
+_ENCODERS: dict[EventFormat, Callable[[SIEMEvent], str]] = {
+    EventFormat.JSON: SIEMEvent.to_json,
+    EventFormat.CEF: SIEMEvent.to_cef,
+    EventFormat.LEEF: SIEMEvent.to_leef,
+}
+
+
+def encode_event(event: SIEMEvent, formats: set[EventFormat]) -> EncodedEvent:
+    """Encode an event once into every format the connectors need."""
+    unsupported = formats - _ENCODERS.keys()
+    if unsupported:
+        names = sorted(fmt.value for fmt in unsupported)
+        raise ValueError(f"Unsupported SIEM event format(s): {names}")
+    return EncodedEvent(
+        event_id=event.event_id,
+        timestamp=event.timestamp,
+        source=event.source,
+        category=event.category,
+        formats={fmt.value: _ENCODERS[fmt](event) for fmt in formats},
+    )
+
+
 @dataclass
 class SIEMConfiguration:
     """Configuration for SIEM integration."""
@@ -231,9 +254,26 @@ class SIEMConnector(ABC):
     async def send_event(self, event: SIEMEvent) -> bool:
         """Send single event to SIEM."""
 
-    @abstractmethod
+    @property
+    def event_format(self) -> EventFormat:
+        """Format this connector ships events in (``custom_config["event_format"]``)."""
+        return EventFormat(self.config.custom_config.get("event_format", EventFormat.JSON.value))
+
     async def send_events_batch(self, events: list[SIEMEvent]) -> int:
         """Send batch of events to SIEM. Returns number of events sent successfully."""
+        return await self.send_encoded_batch(
+            [encode_event(event, {self.event_format}) for event in events]
+        )
+
+    @abstractmethod
+    async def send_encoded_batch(self, events: list[EncodedEvent]) -> int:
+        """
+        Send pre-encoded events to SIEM.
+
+        Returns:
+            Number of events, counted from the start of the batch, the SIEM
+            accepted; the rest are retried by the caller.
+        """
 
     @abstractmethod
     async def health_check(self) -> dict[str, Any]:
@@ -299,17 +339,20 @@ class SplunkConnector(SIEMConnector):
         """Send single event to Splunk."""
         return await self.send_events_batch([event]) == 1
 
-    async def send_events_batch(self, events: list[SIEMEvent]) -> int:
-        """Send batch of events to Splunk."""
+    async def send_encoded_batch(self, events: list[EncodedEvent]) -> int:
+        """Send batch of events to Splunk HEC (all-or-nothing per request)."""
         if not self.session or not self.is_connected():
             return 0
 
         try:
             # Format events for Splunk
+            event_format = self.event_format.value
             splunk_events = []
             for event in events:
                 splunk_event = {
-                    "event": event.to_json(),
+                    "event": event.formats.get(
+                        event_format, event.formats[EventFormat.JSON.value]
+                    ),
                     "time": event.timestamp,
                     "host": "hwa-new-system",
                     "source": event.source,
@@ -402,8 +445,18 @@ class ELKConnector(SIEMConnector):
         """Send single event to ELK."""
         return await self.send_events_batch([event]) == 1
 
-    async def send_events_batch(self, events: list[SIEMEvent]) -> int:
-        """Send batch of events to ELK using bulk API."""
+    @property
+    def event_format(self) -> EventFormat:
+        """Elasticsearch indexes JSON documents."""
+        return EventFormat.JSON
+
+    async def send_encoded_batch(self, events: list[EncodedEvent]) -> int:
+        """
+        Send batch of events to ELK using bulk API.
+
+        Documents are indexed under their event id, so re-sending events after
+        a partial failure does not duplicate them.
+        """
         if not self.session or not self.is_connected():
             return 0
 
@@ -414,18 +467,19 @@ class ELKConnector(SIEMConnector):
                 # Index metadata
                 index_meta = {"index": {"_index": "security-events", "_id": event.event_id}}
                 bulk_data.append(json.dumps(index_meta))
-                bulk_data.append(event.to_json())
+                bulk_data.append(event.formats[EventFormat.JSON.value])
 
             payload = "\n".join(bulk_data) + "\n"
 
             async with self.session.post(self.bulk_endpoint, data=payload) as response:
                 if response.status == 200:
                     result = await response.json()
-                    successful = sum(
-                        1
-                        for item in result.get("items", [])
-                        if item.get("index", {}).get("status") == 201
-                    )
+                    # Accepted prefix: stop at the first failed item
+                    successful = 0
+                    for item in result.get("items", []):
+                        if item.get("index", {}).get("status") not in (200, 201):
+                            break
+                        successful += 1
                     self.events_sent += successful
                     self.last_event_sent = time.time()
                     return successful
@@ -468,7 +522,10 @@ class SIEMIntegrator:
     Features:
     - Multiple SIEM connectors with load balancing
     - Event normalization and enrichment
-    - Real-time event streaming
+    - Durable on-disk spool with a delivery cursor per connector
+    - Events encoded once (JSON/CEF/LEEF) and shared across connectors
+    - Batch sizes adapted to observed connector latency
+    - Replay of undelivered events after outages and restarts
     - Circuit breaker protection
     - Event correlation and deduplication
     - Performance monitoring
@@ -478,14 +535,27 @@ class SIEMIntegrator:
     def __init__(self, config: dict[str, Any] | None = None):
         self.config = config or {}
         self.connectors: dict[str, SIEMConnector] = {}
-        self.event_queue: asyncio.Queue = asyncio.Queue(maxsize=10000)
         self.correlation_engine = EventCorrelationEngine()
         self.enrichment_engine = EventEnrichmentEngine()
 
+        # Spool shared by all connectors; opened lazily (start or first event)
+        self.spool = SIEMSpool(
+            Path(self.config.get("spool_directory", "data/siem_spool")),
+            max_segment_bytes=self.config.get("spool_segment_bytes", 16 * 1024 * 1024),
+            max_bytes=self.config.get("spool_max_bytes", 1024 * 1024 * 1024),
+            fsync=self.config.get("spool_fsync", True),
+        )
+        self.backpressure_timeout = self.config.get("backpressure_timeout_seconds", 5.0)
+
         # Processing
-        self.event_buffer: deque = deque(maxlen=1000)
         self.batch_size = self.config.get("batch_size", 50)
+        self.max_batch_size = self.config.get("max_batch_size", 5000)
+        self.target_batch_latency = self.config.get("target_batch_latency_seconds", 0.5)
+        self.batch_linger = self.config.get("batch_linger_seconds", 0.05)
         self.flush_interval = self.config.get("flush_interval_seconds", 5.0)
+        self.max_retry_delay = self.config.get("max_retry_delay_seconds", 60.0)
+        self.drain_timeout = self.config.get("drain_timeout_seconds", 5.0)
+        self.batch_sizers: dict[str, AdaptiveBatchSizer] = {}
 
         # Statistics
         self.events_processed = 0
@@ -494,8 +564,7 @@ class SIEMIntegrator:
         self.last_flush = time.time()
 
         # Background tasks
-        self._processor_task: asyncio.Task | None = None
-        self._flusher_task: asyncio.Task | None = None
+        self._delivery_tasks: dict[str, asyncio.Task] = {}
         self._monitor_task: asyncio.Task | None = None
         self._running = False
 
@@ -508,27 +577,28 @@ class SIEMIntegrator:
             return
 
         self._running = True
-        self._processor_task = asyncio.create_task(self._event_processor())
-        self._flusher_task = asyncio.create_task(self._batch_flusher())
+        self.spool.open(self.connectors)
+        for name in self.connectors:
+            self._start_delivery(name)
         self._monitor_task = asyncio.create_task(self._health_monitor())
 
         logger.info("SIEM integrator started")
 
     async def stop(self) -> None:
-        """Stop the SIEM integrator."""
+        """Stop the SIEM integrator; undelivered events stay spooled for the next start."""
         if not self._running:
             return
 
+        # Give connected SIEMs a chance to catch up
+        await self._drain(self.drain_timeout)
         self._running = False
 
-        # Flush remaining events
-        await self._flush_events()
-
-        for task in [self._processor_task, self._flusher_task, self._monitor_task]:
+        for task in [*self._delivery_tasks.values(), self._monitor_task]:
             if task:
                 task.cancel()
                 with contextlib.suppress(asyncio.CancelledError):
                     await task
+        self._delivery_tasks.clear()
 
         # Disconnect all connectors
         for connector in self.connectors.values():
@@ -548,6 +618,9 @@ class SIEMIntegrator:
                 return False
 
             self.connectors[name] = connector
+            if self._running:
+                self.spool.add_consumer(name)
+                self._start_delivery(name)
             logger.info(f"Added SIEM connector: {name} ({config.siem_type.value})")
             return True
 
@@ -555,6 +628,23 @@ class SIEMIntegrator:
             logger.error(f"Failed to add SIEM connector {name}: {e}")
             return False
 
+    async def remove_siem_connector(self, name: str) -> bool:
+        """Remove a SIEM connector and release the spool segments it was holding."""
+        connector = self.connectors.pop(name, None)
+        if connector is None:
+            return False
+
+        task = self._delivery_tasks.pop(name, None)
+        if task:
+            task.cancel()
+            with contextlib.suppress(asyncio.CancelledError):
+                await task
+        self.batch_sizers.pop(name, None)
+        await connector.disconnect()
+        await self.spool.remove_consumer(name)
+        logger.info(f"Removed SIEM connector: {name}")
+        return True
+
     async def send_security_event(
         self,
         event_type: str,
@@ -587,27 +677,39 @@ class SIEMIntegrator:
             event.tags.add("correlated")
             self.correlation_events += 1
 
-        # Queue event for processing
-        try:
-            self.event_queue.put_nowait(event)
-            self.events_processed += 1
-            return event_id
-        except asyncio.QueueFull:
-            self.events_dropped += 1
-            logger.warning("Event queue full, dropping event")
-            return ""
+        return await self._spool_event(event)
 
     async def send_custom_event(self, event: SIEMEvent) -> str:
         """Send a custom security event."""
-        try:
-            self.event_queue.put_nowait(event)
+        return await self._spool_event(event)
+
+    async def _spool_event(self, event: SIEMEvent) -> str:
+        """
+        Encode an event once and append it to the spool.
+
+        When the spool is full the caller waits up to ``backpressure_timeout``
+        for connectors to catch up before the event is dropped.
+        """
+        if not self.connectors:
+            logger.debug(f"No SIEM connectors configured, not forwarding {event.event_id}")
             self.events_processed += 1
             return event.event_id
-        except asyncio.QueueFull:
+
+        # JSON is always included so connectors added later can fall back to it
+        formats = {EventFormat.JSON} | {c.event_format for c in self.connectors.values()}
+        encoded = encode_event(event, formats)
+
+        self.spool.open(self.connectors)
+        if not await self.spool.append(encoded.to_bytes(), timeout=self.backpressure_timeout):
             self.events_dropped += 1
-            logger.warning("Event queue full, dropping custom event")
+            logger.error(
+                f"SIEM spool full ({self.spool.size_bytes} bytes), dropping event {event.event_id}"
+            )
             return ""
 
+        self.events_processed += 1
+        return event.event_id
+
     def get_connector_status(self) -> dict[str, dict[str, Any]]:
         """Get status of all connectors."""
         return {name: connector.get_metrics() for name, connector in self.connectors.items()}
@@ -621,9 +723,10 @@ class SIEMIntegrator:
                 "processed": self.events_processed,
                 "dropped": self.events_dropped,
                 "correlated": self.correlation_events,
-                "queue_size": self.event_queue.qsize(),
-                "buffer_size": len(self.event_buffer),
+                "spooled_bytes": self.spool.size_bytes,
             },
+            "spool": self.spool.get_metrics(),
+            "batching": {name: sizer.get_metrics() for name, sizer in self.batch_sizers.items()},
             "connectors": {
                 "total": len(self.connectors),
                 "connected": sum(
@@ -657,75 +760,97 @@ class SIEMIntegrator:
         }
         return categories.get(event_type, "general")
 
-    async def _event_processor(self) -> None:
-        """Process events from the queue."""
-        while self._running:
-            try:
-                # Get event from queue
-                event = await self.event_queue.get()
-
-                # Add to buffer for batching
-                self.event_buffer.append(event)
-
-                # Process immediately if buffer is full
-                if len(self.event_buffer) >= self.batch_size:
-                    await self._flush_events()
-
-            except asyncio.CancelledError:
-                break
-            except Exception as e:
-                logger.error(f"Event processor error: {e}")
+    def _start_delivery(self, name: str) -> None:
+        """Start the delivery task of a connector (once)."""
+        self.batch_sizers.setdefault(
+            name,
+            AdaptiveBatchSizer(
+                initial=self.batch_size,
+                max_size=self.max_batch_size,
+                target_latency_seconds=self.target_batch_latency,
+            ),
+        )
+        task = self._delivery_tasks.get(name)
+        if task is None or task.done():
+            self._delivery_tasks[name] = asyncio.create_task(self._deliver(name))
+
+    def _next_retry_delay(self, name: str, delay: float) -> float:
+        """Exponential backoff starting at the connector's retry delay."""
+        base = self.connectors[name].config.retry_delay_seconds
+        return min(max(delay * 2, base), self.max_retry_delay)
+
+    async def _deliver(self, name: str) -> None:
+        """
+        Forward spooled events to one connector.
+
+        Reads from the connector's cursor and only advances it past events the
+        SIEM accepted, so anything not delivered is retried (after a backoff)
+        and replayed once the SIEM is reachable again.
+        """
+        sizer = self.batch_sizers[name]
+        retry_delay = 0.0
 
-    async def _batch_flusher(self) -> None:
-        """Periodically flush event batches."""
         while self._running:
             try:
-                await asyncio.sleep(self.flush_interval)
+                if retry_delay:
+                    await asyncio.sleep(retry_delay)
+                connector = self.connectors[name]
+
+                if self.circuit_breaker.is_open(name):
+                    if not self.circuit_breaker.can_attempt(name):
+                        retry_delay = self._next_retry_delay(name, retry_delay)
+                        continue
+                    self.circuit_breaker.attempt_reset(name)
 
-                # Check if it's time to flush
-                if (
-                    len(self.event_buffer) > 0
-                    and time.time() - self.last_flush >= self.flush_interval
-                ):
-                    await self._flush_events()
+                if not connector.is_connected() and not await connector.connect():
+                    self.circuit_breaker.record_failure(name)
+                    retry_delay = self._next_retry_delay(name, retry_delay)
+                    continue
+
+                if not await self.spool.wait_for_data(name, self.flush_interval):
+                    continue
+                # Let a burst accumulate into one batch
+                if self.batch_linger:
+                    await asyncio.sleep(self.batch_linger)
+
+                records = await self.spool.read(name, sizer.size)
+                if not records:
+                    continue
+                events = [EncodedEvent.from_bytes(record) for record, _ in records]
+
+                started = time.perf_counter()
+                sent = await connector.send_encoded_batch(events)
+                sizer.record(len(events), time.perf_counter() - started, ok=sent == len(events))
+
+                if sent:
+                    await self.spool.ack(name, records[sent - 1][1], sent)
+                    self.last_flush = time.time()
+                if sent < len(events):
+                    self.circuit_breaker.record_failure(name)
+                    logger.warning(
+                        f"{name} accepted {sent} of {len(events)} events, retrying the rest"
+                    )
+                    retry_delay = self._next_retry_delay(name, retry_delay)
+                else:
+                    retry_delay = 0.0
+                    if self.circuit_breaker.failure_counts.get(name):
+                        self.circuit_breaker.reset(name)
 
             except asyncio.CancelledError:
                 break
             except Exception as e:
-                logger.error(f"Batch flusher error: {e}")
-
-    async def _flush_events(self) -> None:
-        """Flush buffered events to SIEMs."""
-        if not self.event_buffer:
-            return
-
-        events_to_send = list(self.event_buffer)
-        self.event_buffer.clear()
-
-        # Send to all active connectors
-        successful_sends = 0
-
-        for name, connector in self.connectors.items():
-            if connector.is_connected() and not self.circuit_breaker.is_open(name):
-                try:
-                    sent = await connector.send_events_batch(events_to_send)
-                    successful_sends += sent
-
-                    if sent == 0:
-                        self.circuit_breaker.record_failure(name)
-                        logger.warning(f"Failed to send events to {name}")
-
-                except Exception as e:
-                    self.circuit_breaker.record_failure(name)
-                    logger.error(f"Error sending events to {name}: {e}")
-            else:
-                logger.debug(f"Skipping {name}: not connected or circuit open")
-
-        self.last_flush = time.time()
-
-        if successful_sends < len(events_to_send):
-            failed_count = len(events_to_send) - successful_sends
-            logger.warning(f"Failed to send {failed_count} out of {len(events_to_send)} events")
+                logger.error(f"SIEM delivery error for {name}: {e}")
+                retry_delay = self._next_retry_delay(name, retry_delay)
+
+    async def _drain(self, timeout: float) -> None:
+        """Wait (bounded) until connected SIEMs have received every spooled event."""
+        deadline = time.monotonic() + timeout
+        while time.monotonic() < deadline and any(
+            self.spool.backlog_bytes(name) > 0
+            for name, connector in self.connectors.items()
+            if connector.is_connected() and name in self._delivery_tasks
+        ):
+            await asyncio.sleep(0.05)
 
     async def _health_monitor(self) -> None:
         """Monitor health of SIEM connections."""
@@ -0,0 +1,393 @@
+"""
+Durable spool for SIEM event forwarding.
+
+Security events are encoded once (JSON/CEF/LEEF, as needed by the
+configured connectors), appended to a local append-only spool and then
+delivered by one reader per connector. Each connector has its own
+acknowledgement cursor, so a connector that is down simply falls behind
+and replays from its cursor when it comes back, and nothing buffered is
+lost on restart.
+
+Spool layout:
+    spool_<n>.log   length-prefixed records (u32 big-endian + JSON)
+    cursors.json    consumer -> [segment, offset] of the next unacked record
+
+Appends are group-committed: concurrent producers share one write (and
+one fsync) in a worker thread. Segments are deleted once every cursor has
+moved past them; when the spool reaches ``max_bytes`` producers wait for
+space (backpressure) instead of events being dropped silently.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import contextlib
+import json
+import os
+import struct
+from collections.abc import Iterable
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Any
+
+from resync.core.structured_logger import get_logger
+
+logger = get_logger(__name__)
+
+_LENGTH = struct.Struct(">I")
+
+CURSORS_FILE_NAME = "cursors.json"
+
+# (segment, offset) of a record in the spool
+SpoolPosition = tuple[int, int]
+
+
+@dataclass
+class EncodedEvent:
+    """A SIEM event encoded once, shared by every connector."""
+
+    event_id: str
+    timestamp: float
+    source: str
+    category: str
+    formats: dict[str, str] = field(default_factory=dict)
+
+    def to_bytes(self) -> bytes:
+        """Spool record payload."""
+        return json.dumps(
+            {
+                "id": self.event_id,
+                "ts": self.timestamp,
+                "src": self.source,
+                "cat": self.category,
+                "f": self.formats,
+            },
+            separators=(",", ":"),
+        ).encode()
+
+    @classmethod
+    def from_bytes(cls, data: bytes) -> EncodedEvent:
+        """Decode a spool record payload."""
+        raw = json.loads(data)
+        return cls(
+            event_id=raw["id"],
+            timestamp=raw["ts"],
+            source=raw["src"],
+            category=raw["cat"],
+            formats=raw["f"],
+        )
+
+
+class AdaptiveBatchSizer:
+    """
+    Batch size that follows observed connector latency (AIMD).
+
+    Full batches answered within the target latency grow the size by a
+    quarter; slow batches shrink it by 30% and failures halve it.
+    """
+
+    def __init__(
+        self,
+        initial: int = 100,
+        min_size: int = 10,
+        max_size: int = 5000,
+        target_latency_seconds: float = 0.5,
+    ):
+        self.min_size = min_size
+        self.max_size = max_size
+        self.target_latency_seconds = target_latency_seconds
+        self.size = max(min_size, min(initial, max_size))
+        self.avg_latency = 0.0
+
+    def record(self, batch_len: int, latency: float, ok: bool) -> None:
+        """Adjust the size after a send."""
+        self.avg_latency = latency if not self.avg_latency else (
+            0.8 * self.avg_latency + 0.2 * latency
+        )
+        if not ok:
+            self.size = max(self.min_size, self.size // 2)
+        elif latency > self.target_latency_seconds:
+            self.size = max(self.min_size, int(self.size * 0.7))
+        elif batch_len >= self.size:
+            self.size = min(self.max_size, self.size + max(1, self.size // 4))
+
+    def get_metrics(self) -> dict[str, Any]:
+        """Current size and latency."""
+        return {"batch_size": self.size, "avg_latency": self.avg_latency}
+
+
+class SIEMSpool:
+    """
+    Append-only, multi-consumer event spool on local disk.
+
+    Features:
+    - Group-committed appends (one write/fsync per burst) off the event loop
+    - Per-consumer acknowledgement cursors persisted atomically
+    - Segment rotation and deletion of fully acknowledged segments
+    - Backpressure when the spool is full
+    - Torn tail records truncated on open
+    """
+
+    def __init__(
+        self,
+        directory: Path,
+        max_segment_bytes: int = 16 * 1024 * 1024,
+        max_bytes: int = 1024 * 1024 * 1024,
+        fsync: bool = True,
+    ):
+        self.directory = Path(directory)
+        self.max_segment_bytes = max_segment_bytes
+        self.max_bytes = max_bytes
+        self.fsync = fsync
+
+        self._segment_sizes: dict[int, int] = {}
+        self._head: SpoolPosition = (0, 0)  # end of committed data
+        self._cursors: dict[str, SpoolPosition] = {}
+        self._pending: list[tuple[bytes, asyncio.Future]] = []
+        self._writer: asyncio.Task | None = None
+        self._changed = asyncio.Condition()
+        self._opened = False
+
+        self.records_appended = 0
+        self.records_acked = 0
+
+    # ------------------------------------------------------------------
+    # Lifecycle
+    # ------------------------------------------------------------------
+
+    def open(self, consumers: Iterable[str] = ()) -> None:
+        """
+        Recover the spool from disk and register consumers (idempotent).
+
+        Saved cursors of consumers that are no longer configured are dropped
+        on the first open, so they cannot pin segments forever.
+        """
+        consumers = list(consumers)
+        if not self._opened:
+            self.directory.mkdir(parents=True, exist_ok=True)
+            for path in sorted(self.directory.glob("spool_*.log")):
+                self._segment_sizes[int(path.stem.split("_")[1])] = path.stat().st_size
+            if self._segment_sizes:
+                last = max(self._segment_sizes)
+                self._segment_sizes[last] = self._recover_tail(last)
+                self._head = (last, self._segment_sizes[last])
+            else:
+                self._segment_sizes[0] = 0
+
+            cursors_file = self.directory / CURSORS_FILE_NAME
+            if cursors_file.exists():
+                try:
+                    saved = json.loads(cursors_file.read_text(encoding="utf-8"))
+                    self._cursors = {
+                        name: tuple(pos) for name, pos in saved.items() if name in consumers
+                    }
+                    for name in saved.keys() - self._cursors.keys():
+                        logger.info(f"Dropped SIEM spool cursor of removed consumer {name}")
+                except ValueError:
+                    logger.warning(f"Unreadable SIEM spool cursors in {cursors_file}")
+            self._opened = True
+
+        for consumer in consumers:
+            self.add_consumer(consumer)
+
+    def add_consumer(self, consumer: str) -> None:
+        """
+        Register a consumer.
+
+        New consumers start at the oldest retained record, so events spooled
+        before the consumer was configured are delivered too.
+        """
+        if consumer not in self._cursors:
+            self._cursors[consumer] = (min(self._segment_sizes), 0)
+
+    async def remove_consumer(self, consumer: str) -> None:
+        """Forget a consumer's cursor and drop the segments only it was holding."""
+        if self._cursors.pop(consumer, None) is not None:
+            await self._release()
+
+    def _recover_tail(self, segment: int) -> int:
+        """Truncate a partially written last record; returns the segment size."""
+        path = self._segment_path(segment)
+        offset = 0
+        with open(path, "r+b") as f:
+            while True:
+                head = f.read(_LENGTH.size)
+                if not head:
+                    break
+                (length,) = _LENGTH.unpack(head) if len(head) == _LENGTH.size else (None,)
+                if length is None or len(f.read(length)) < length:
+                    logger.warning(f"Truncating torn SIEM spool record at {path}:{offset}")
+                    f.truncate(offset)
+                    break
+                offset += _LENGTH.size + length
+        return offset
+
+    def _segment_path(self, segment: int) -> Path:
+        return self.directory / f"spool_{segment:06d}.log"
+
+    # ------------------------------------------------------------------
+    # Producers
+    # ------------------------------------------------------------------
+
+    @property
+    def size_bytes(self) -> int:
+        """Bytes currently retained on disk."""
+        return sum(self._segment_sizes.values())
+
+    async def append(self, record: bytes, timeout: float | None = None) -> bool:
+        """
+        Durably append a record.
+
+        Waits (up to ``timeout``) for space when the spool is full.
+
+        Returns:
+            True once the record is on disk, False if no space freed in time
+        """
+        if self.size_bytes >= self.max_bytes:
+            try:
+                async with self._changed:
+                    await asyncio.wait_for(
+                        self._changed.wait_for(lambda: self.size_bytes < self.max_bytes),
+                        timeout,
+                    )
+            except asyncio.TimeoutError:
+                return False
+
+        future = asyncio.get_running_loop().create_future()
+        self._pending.append((record, future))
+        if self._writer is None or self._writer.done():
+            self._writer = asyncio.create_task(self._commit_pending())
+        await future
+        return True
+
+    async def _commit_pending(self) -> None:
+        """Write queued records in batches: one write and fsync per batch."""
+        while self._pending:
+            batch, self._pending = self._pending, []
+            try:
+                head = await asyncio.to_thread(self._write, [record for record, _ in batch])
+            except Exception as e:
+                for _, future in batch:
+                    if not future.done():
+                        future.set_exception(e)
+                continue
+
+            self._head = head
+            self._segment_sizes[head[0]] = head[1]
+            self.records_appended += len(batch)
+            for _, future in batch:
+                if not future.done():
+                    future.set_result(None)
+            async with self._changed:
+                self._changed.notify_all()
+
+    def _write(self, records: list[bytes]) -> SpoolPosition:
+        segment, offset = self._head
+        if offset >= self.max_segment_bytes:
+            segment, offset = segment + 1, 0
+        data = b"".join(_LENGTH.pack(len(record)) + record for record in records)
+        with open(self._segment_path(segment), "ab") as f:
+            f.write(data)
+            f.flush()
+            if self.fsync:
+                os.fsync(f.fileno())
+        return segment, offset + len(data)
+
+    # ------------------------------------------------------------------
+    # Consumers
+    # ------------------------------------------------------------------
+
+    def position(self, consumer: str) -> SpoolPosition:
+        """Next unacknowledged position of a consumer."""
+        return self._cursors[consumer]
+
+    def backlog_bytes(self, consumer: str) -> int:
+        """Bytes the consumer has not acknowledged yet."""
+        segment, offset = self._cursors[consumer]
+        return sum(size for seg, size in self._segment_sizes.items() if seg >= segment) - offset
+
+    async def wait_for_data(self, consumer: str, timeout: float) -> bool:
+        """Wait until the consumer has unread records (or the timeout passes)."""
+        if self._cursors[consumer] < self._head:
+            return True
+        with contextlib.suppress(asyncio.TimeoutError):
+            async with self._changed:
+                await asyncio.wait_for(
+                    self._changed.wait_for(lambda: self._cursors[consumer] < self._head),
+                    timeout,
+                )
+        return self._cursors[consumer] < self._head
+
+    async def read(
+        self, consumer: str, max_records: int
+    ) -> list[tuple[bytes, SpoolPosition]]:
+        """
+        Read unacknowledged records of a consumer without moving its cursor.
+
+        Returns:
+            (record, position after the record) pairs, oldest first
+        """
+        start, head = self._cursors[consumer], self._head
+        if start >= head:
+            return []
+        return await asyncio.to_thread(self._read, start, head, max_records)
+
+    def _read(
+        self, start: SpoolPosition, head: SpoolPosition, max_records: int
+    ) -> list[tuple[bytes, SpoolPosition]]:
+        records: list[tuple[bytes, SpoolPosition]] = []
+        segment, offset = start
+        while len(records) < max_records and (segment, offset) < head:
+            end = head[1] if segment == head[0] else self._segment_sizes.get(segment, 0)
+            if offset >= end:
+                segment, offset = segment + 1, 0
+                continue
+            with open(self._segment_path(segment), "rb") as f:
+                f.seek(offset)
+                while len(records) < max_records and offset < end:
+                    (length,) = _LENGTH.unpack(f.read(_LENGTH.size))
+                    record = f.read(length)
+                    offset += _LENGTH.size + length
+                    records.append((record, (segment, offset)))
+        return records
+
+    async def ack(self, consumer: str, position: SpoolPosition, count: int = 0) -> None:
+        """Move a consumer's cursor and drop segments every consumer has passed."""
+        if position <= self._cursors[consumer]:
+            return
+        self._cursors[consumer] = position
+        self.records_acked += count
+        await self._release()
+
+    async def _release(self) -> None:
+        """Persist the cursors and delete segments every consumer has passed."""
+        oldest = min(self._cursors.values(), default=self._head)[0]
+        removable = [seg for seg in self._segment_sizes if seg < oldest and seg < self._head[0]]
+        cursors = dict(self._cursors)
+        await asyncio.to_thread(self._persist, cursors, removable)
+        for segment in removable:
+            self._segment_sizes.pop(segment, None)
+        if removable:
+            async with self._changed:
+                self._changed.notify_all()
+
+    def _persist(self, cursors: dict[str, SpoolPosition], removable: list[int]) -> None:
+        path = self.directory / CURSORS_FILE_NAME
+        tmp = path.with_suffix(".tmp")
+        tmp.write_text(json.dumps({name: list(pos) for name, pos in cursors.items()}))
+        os.replace(tmp, path)
+        for segment in removable:
+            with contextlib.suppress(FileNotFoundError):
+                self._segment_path(segment).unlink()
+
+    def get_metrics(self) -> dict[str, Any]:
+        """Spool statistics."""
+        return {
+            "size_bytes": self.size_bytes,
+            "max_bytes": self.max_bytes,
+            "segments": len(self._segment_sizes),
+            "records_appended": self.records_appended,
+            "records_acked": self.records_acked,
+            "pending_writes": len(self._pending),
+            "backlog_bytes": {name: self.backlog_bytes(name) for name in self._cursors},
+        }
@@ -0,0 +1,392 @@
+"""
+Tail-based trace sampling.
+
+Head samplers decide when the first span starts, before the status code
+or the latency of the request is known. ``TailSamplingSpanProcessor``
+instead buffers the finished spans of every trace in memory and decides
+once the trace is complete (its local root span ended):
+
+- every trace containing an error span is kept
+- latency outliers are kept: the root span took longer than a rolling
+  per-route quantile (p99 by default) of recent root latencies
+- a small uniform baseline of the remaining traces is kept, chosen from
+  the trace id so every service keeps the same traces
+
+Kept spans are handed to the downstream processors (e.g. a
+BatchSpanProcessor around the OTLP/Jaeger exporter, or the console
+processor). Buffering is bounded: traces whose root never ends are
+decided after ``decision_wait_seconds`` and when the buffer exceeds
+``max_buffered_spans`` the oldest trace is decided early. Spans ending
+after their trace was decided follow the recorded decision.
+
+The processor must receive all spans, so the tracer provider's head
+sampler should record everything (``ParentBased(ALWAYS_ON)``).
+"""
+
+from __future__ import annotations
+
+import threading
+import time
+from collections import OrderedDict, deque
+from collections.abc import Callable, Iterable
+from dataclasses import dataclass, field
+from typing import Any
+
+from opentelemetry.context import Context
+from opentelemetry.sdk.trace import ReadableSpan, Span, SpanProcessor
+from opentelemetry.trace import StatusCode
+
+from resync.core.structured_logger import get_logger
+
+logger = get_logger(__name__)
+
+_TRACE_ID_MASK = (1 << 64) - 1
+
+# Rough per-span overhead of a buffered ReadableSpan, excluding attributes
+_SPAN_OVERHEAD_BYTES = 512
+
+_STATUS_CODE_ATTRIBUTES = ("http.status_code", "http.response.status_code")
+
+
+def trace_id_ratio_sampled(trace_id: int, rate: float) -> bool:
+    """
+    Consistent ratio decision from the low 64 bits of a trace id.
+
+    Works for any rate in [0, 1] (no integer reciprocal needed) and gives
+    the same answer for the same trace in every process.
+    """
+    if rate >= 1.0:
+        return True
+    if rate <= 0.0:
+        return False
+    return (trace_id & _TRACE_ID_MASK) < int(rate * (_TRACE_ID_MASK + 1))
+
+
+class RollingQuantile:
+    """
+    Quantile of the most recent ``window`` observations.
+
+    The threshold is recomputed every ``window // 8`` observations, so the
+    estimate follows the traffic and old latencies age out.
+    """
+
+    def __init__(self, quantile: float = 0.99, window: int = 1024):
+        self.quantile = quantile
+        self._values: deque[float] = deque(maxlen=window)
+        self._refresh_every = max(1, window // 8)
+        self._since_refresh = 0
+        self._threshold: float | None = None
+
+    def __len__(self) -> int:
+        return len(self._values)
+
+    def add(self, value: float) -> None:
+        self._values.append(value)
+        self._since_refresh += 1
+        if self._threshold is None or self._since_refresh >= self._refresh_every:
+            ordered = sorted(self._values)
+            self._threshold = ordered[min(len(ordered) - 1, int(self.quantile * len(ordered)))]
+            self._since_refresh = 0
+
+    @property
+    def threshold(self) -> float | None:
+        return self._threshold
+
+
+@dataclass
+class _BufferedTrace:
+    first_seen: float
+    spans: list[ReadableSpan] = field(default_factory=list)
+    estimated_bytes: int = 0
+    has_error: bool = False
+    root: ReadableSpan | None = None
+
+
+def _estimate_span_bytes(span: ReadableSpan) -> int:
+    size = _SPAN_OVERHEAD_BYTES + len(span.name)
+    for key, value in (span.attributes or {}).items():
+        size += len(key) + len(str(value))
+    return size + 128 * len(span.events)
+
+
+def _is_error(span: ReadableSpan) -> bool:
+    if span.status.status_code is StatusCode.ERROR:
+        return True
+    attributes = span.attributes or {}
+    for name in _STATUS_CODE_ATTRIBUTES:
+        code = attributes.get(name)
+        if code is not None:
+            try:
+                return int(code) >= 500
+            except (TypeError, ValueError):
+                return False
+    return False
+
+
+def _is_local_root(span: ReadableSpan) -> bool:
+    return span.parent is None or span.parent.is_remote
+
+
+class TailSamplingSpanProcessor(SpanProcessor):
+    """
+    Span processor that samples whole traces after they complete.
+
+    Features:
+    - Keeps all error traces and per-route latency outliers
+    - Uniform, trace-id consistent baseline for everything else
+    - Bounded buffer (spans, spans per trace, decision wait)
+    - Late spans follow the decision taken for their trace
+    - Memory and drop counters in ``get_metrics``
+    """
+
+    def __init__(
+        self,
+        downstream: SpanProcessor | Iterable[SpanProcessor],
+        baseline_rate: float = 0.01,
+        latency_quantile: float = 0.99,
+        latency_window: int = 1024,
+        min_route_samples: int = 100,
+        fallback_latency_seconds: float = 1.0,
+        decision_wait_seconds: float = 30.0,
+        max_buffered_spans: int = 100_000,
+        max_spans_per_trace: int = 1000,
+        max_routes: int = 1000,
+        decision_cache_size: int = 100_000,
+        sweep_interval_seconds: float = 5.0,
+        clock: Callable[[], float] = time.monotonic,
+    ):
+        if isinstance(downstream, SpanProcessor):
+            downstream = [downstream]
+        self.downstream: list[SpanProcessor] = list(downstream)
+        self.baseline_rate = baseline_rate
+        self.latency_quantile = latency_quantile
+        self.latency_window = latency_window
+        self.min_route_samples = min_route_samples
+        self.fallback_latency_seconds = fallback_latency_seconds
+        self.decision_wait_seconds = decision_wait_seconds
+        self.max_buffered_spans = max_buffered_spans
+        self.max_spans_per_trace = max_spans_per_trace
+        self.max_routes = max_routes
+        self.decision_cache_size = decision_cache_size
+        self._clock = clock
+
+        self._lock = threading.Lock()
+        self._traces: OrderedDict[int, _BufferedTrace] = OrderedDict()
+        self._decided: OrderedDict[int, bool] = OrderedDict()
+        self._routes: OrderedDict[str, RollingQuantile] = OrderedDict()
+        self._buffered_spans = 0
+        self._buffered_bytes = 0
+
+        self.counters: dict[str, int] = {
+            "traces_kept_error": 0,
+            "traces_kept_latency": 0,
+            "traces_kept_baseline": 0,
+            "traces_dropped": 0,
+            "traces_decided_on_timeout": 0,
+            "traces_decided_on_overflow": 0,
+            "spans_exported": 0,
+            "spans_dropped": 0,
+            "spans_dropped_trace_limit": 0,
+            "late_spans_exported": 0,
+            "late_spans_dropped": 0,
+            "peak_buffered_spans": 0,
+            "peak_buffered_bytes": 0,
+        }
+
+        self._shutdown = threading.Event()
+        self._sweeper: threading.Thread | None = None
+        if sweep_interval_seconds > 0:
+            self._sweeper = threading.Thread(
+                target=self._sweep_loop,
+                args=(sweep_interval_seconds,),
+                name="TailSamplingSweeper",
+                daemon=True,
+            )
+            self._sweeper.start()
+
+    # ------------------------------------------------------------------
+    # SpanProcessor interface
+    # ------------------------------------------------------------------
+
+    def on_start(self, span: Span, parent_context: Context | None = None) -> None:
+        # Downstream processors only see spans of kept traces, at export time
+        return
+
+    def on_end(self, span: ReadableSpan) -> None:
+        trace_id = span.context.trace_id
+        ready: list[tuple[list[ReadableSpan], bool]] = []
+
+        with self._lock:
+            decision = self._decided.get(trace_id)
+            if decision is not None:
+                self.counters["late_spans_exported" if decision else "late_spans_dropped"] += 1
+                if decision:
+                    ready.append(([span], True))
+            else:
+                self._buffer(trace_id, span, ready)
+
+        self._export(ready)
+
+    def _buffer(
+        self,
+        trace_id: int,
+        span: ReadableSpan,
+        ready: list[tuple[list[ReadableSpan], bool]],
+    ) -> None:
+        now = self._clock()
+        buffered = self._traces.get(trace_id)
+        if buffered is None:
+            buffered = self._traces[trace_id] = _BufferedTrace(first_seen=now)
+
+        if _is_error(span):
+            buffered.has_error = True
+        if len(buffered.spans) < self.max_spans_per_trace:
+            size = _estimate_span_bytes(span)
+            buffered.spans.append(span)
+            buffered.estimated_bytes += size
+            self._buffered_spans += 1
+            self._buffered_bytes += size
+        else:
+            self.counters["spans_dropped_trace_limit"] += 1
+
+        if _is_local_root(span):
+            buffered.root = span
+            ready.append(self._decide(trace_id))
+
+        while self._buffered_spans > self.max_buffered_spans and self._traces:
+            self.counters["traces_decided_on_overflow"] += 1
+            ready.append(self._decide(next(iter(self._traces))))
+
+        self.counters["peak_buffered_spans"] = max(
+            self.counters["peak_buffered_spans"], self._buffered_spans
+        )
+        self.counters["peak_buffered_bytes"] = max(
+            self.counters["peak_buffered_bytes"], self._buffered_bytes
+        )
+
+    # ------------------------------------------------------------------
+    # Decisions
+    # ------------------------------------------------------------------
+
+    def _route_of(self, root: ReadableSpan) -> str:
+        attributes = root.attributes or {}
+        return str(attributes.get("http.route") or root.name)
+
+    def _route_quantile(self, route: str) -> RollingQuantile:
+        quantile = self._routes.get(route)
+        if quantile is None:
+            quantile = self._routes[route] = RollingQuantile(
+                self.latency_quantile, self.latency_window
+            )
+            if len(self._routes) > self.max_routes:
+                self._routes.popitem(last=False)
+        else:
+            self._routes.move_to_end(route)
+        return quantile
+
+    def _is_latency_outlier(self, root: ReadableSpan) -> bool:
+        if root.start_time is None or root.end_time is None:
+            return False
+        latency = (root.end_time - root.start_time) / 1e9
+        quantile = self._route_quantile(self._route_of(root))
+        threshold = quantile.threshold
+        if len(quantile) >= self.min_route_samples and threshold is not None:
+            outlier = latency > threshold
+        else:
+            outlier = latency >= self.fallback_latency_seconds
+        quantile.add(latency)
+        return outlier
+
+    def _decide(self, trace_id: int) -> tuple[list[ReadableSpan], bool]:
+        """Remove a trace from the buffer and decide whether to keep it."""
+        buffered = self._traces.pop(trace_id)
+        self._buffered_spans -= len(buffered.spans)
+        self._buffered_bytes -= buffered.estimated_bytes
+
+        if buffered.has_error:
+            keep, reason = True, "traces_kept_error"
+        elif buffered.root is not None and self._is_latency_outlier(buffered.root):
+            keep, reason = True, "traces_kept_latency"
+        elif trace_id_ratio_sampled(trace_id, self.baseline_rate):
+            keep, reason = True, "traces_kept_baseline"
+        else:
+            keep, reason = False, "traces_dropped"
+        self.counters[reason] += 1
+        self.counters["spans_exported" if keep else "spans_dropped"] += len(buffered.spans)
+
+        self._decided[trace_id] = keep
+        if len(self._decided) > self.decision_cache_size:
+            self._decided.popitem(last=False)
+        return buffered.spans, keep
+
+    def sweep(self, now: float | None = None) -> int:
+        """Decide traces that waited longer than ``decision_wait_seconds``."""
+        now = self._clock() if now is None else now
+        ready: list[tuple[list[ReadableSpan], bool]] = []
+        with self._lock:
+            while self._traces:
+                trace_id, buffered = next(iter(self._traces.items()))
+                if now - buffered.first_seen < self.decision_wait_seconds:
+                    break
+                self.counters["traces_decided_on_timeout"] += 1
+                ready.append(self._decide(trace_id))
+        self._export(ready)
+        return len(ready)
+
+    def _sweep_loop(self, interval: float) -> None:
+        while not self._shutdown.wait(interval):
+            try:
+                self.sweep()
+            except Exception as e:
+                logger.error(f"Tail sampling sweep failed: {e}")
+
+    def _export(self, ready: list[tuple[list[ReadableSpan], bool]]) -> None:
+        for spans, keep in ready:
+            if not keep:
+                continue
+            for span in spans:
+                for processor in self.downstream:
+                    try:
+                        processor.on_end(span)
+                    except Exception as e:
+                        logger.error(f"Span processor {type(processor).__name__} failed: {e}")
+
+    # ------------------------------------------------------------------
+    # Lifecycle and metrics
+    # ------------------------------------------------------------------
+
+    def _decide_all(self) -> None:
+        ready: list[tuple[list[ReadableSpan], bool]] = []
+        with self._lock:
+            while self._traces:
+                ready.append(self._decide(next(iter(self._traces))))
+        self._export(ready)
+
+    def force_flush(self, timeout_millis: int = 30000) -> bool:
+        """Decide every buffered trace now and flush the downstream processors."""
+        self._decide_all()
+        return all(processor.force_flush(timeout_millis) for processor in self.downstream)
+
+    def shutdown(self) -> None:
+        self._shutdown.set()
+        self._decide_all()
+        for processor in self.downstream:
+            processor.shutdown()
+
+    def get_metrics(self) -> dict[str, Any]:
+        """Buffer usage and sampling counters."""
+        with self._lock:
+            kept = sum(
+                self.counters[name]
+                for name in ("traces_kept_error", "traces_kept_latency", "traces_kept_baseline")
+            )
+            decided = kept + self.counters["traces_dropped"]
+            return {
+                "buffered_traces": len(self._traces),
+                "buffered_spans": self._buffered_spans,
+                "buffered_bytes_estimate": self._buffered_bytes,
+                "max_buffered_spans": self.max_buffered_spans,
+                "tracked_routes": len(self._routes),
+                "keep_ratio": kept / decided if decided else 0.0,
+                **self.counters,
+            }
@@ -194,6 +194,7 @@ class TWSBackgroundPoller:
         polling_interval: int = 30,
         status_store: Any | None = None,
         event_bus: Any | None = None,
+        api_cache: Any | None = None,
     ):
         """
         Inicializa o poller.
@@ -203,11 +204,13 @@ class TWSBackgroundPoller:
             polling_interval: Intervalo de polling em segundos (default: 30)
             status_store: Store para persistência de status
             event_bus: Bus para broadcast de eventos
+            api_cache: TWSAPICache cujas entradas de jobs alterados são invalidadas
         """
         self.tws_client = tws_client
         self.polling_interval = polling_interval
         self.status_store = status_store
         self.event_bus = event_bus
+        self.api_cache = api_cache
 
         # Estado interno
         self._is_running = False
@@ -332,6 +335,9 @@ class TWSBackgroundPoller:
                     # Detecta mudanças e gera eventos
                     events = self._detect_changes(snapshot)
 
+                    # Invalida o cache da API (em todos os workers)
+                    await self._invalidate_changed_jobs(snapshot)
+
                     # Persiste snapshot
                     if self.status_store:
                         await self._persist_snapshot(snapshot)
@@ -731,6 +737,25 @@ class TWSBackgroundPoller:
             current_state=current_state,
         )
 
+    async def _invalidate_changed_jobs(self, snapshot: SystemSnapshot) -> None:
+        """Invalida no cache da API os jobs cujo status mudou."""
+        if self.api_cache is None or not self._previous_jobs:
+            return
+
+        changed = [
+            job.job_id
+            for job in snapshot.jobs
+            if (prev := self._previous_jobs.get(job.job_id)) is not None
+            and prev.status != job.status
+        ]
+        if not changed:
+            return
+
+        try:
+            await self.api_cache.invalidate_jobs(changed)
+        except Exception as e:
+            logger.warning("api_cache_invalidation_failed", error=str(e), jobs=len(changed))
+
     def _update_cache(self, snapshot: SystemSnapshot) -> None:
         """Atualiza cache com estado atual."""
         self._previous_jobs = {j.job_id: j for j in snapshot.jobs}
@@ -818,6 +843,7 @@ def init_tws_poller(
     polling_interval: int = 30,
     status_store: Any = None,
     event_bus: Any = None,
+    api_cache: Any = None,
 ) -> TWSBackgroundPoller:
     """Inicializa o poller singleton."""
     global _poller_instance
@@ -827,6 +853,7 @@ def init_tws_poller(
         polling_interval=polling_interval,
         status_store=status_store,
         event_bus=event_bus,
+        api_cache=api_cache,
     )
 
     return _poller_instance
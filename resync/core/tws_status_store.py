@@ -13,6 +13,7 @@ import logging
 from datetime import datetime
 from typing import Any
 
+from resync.core.cache.query_cache import get_repository_query_cache
 from resync.core.database.models import (
     TWSEvent,
     TWSJobStatus,
@@ -50,7 +51,7 @@ class TWSStatusStore:
         """Initialize. db_path is ignored - uses PostgreSQL."""
         if db_path:
             logger.debug(f"db_path ignored, using PostgreSQL: {db_path}")
-        self._store = TWSStore()
+        self._store = TWSStore(query_cache=get_repository_query_cache())
         self._initialized = False
 
     async def initialize(self) -> None:
@@ -9,7 +9,7 @@ import contextlib
 import heapq
 import math
 import time
-from collections import deque
+from collections import OrderedDict, deque
 from typing import Any, Generic, TypeVar
 
 T = TypeVar("T")
@@ -369,12 +369,247 @@ class ChunkedArray:
             yield from chunk
         yield from self.current_chunk
 
+_MASK64 = (1 << 64) - 1
+_SKETCH_SEEDS = (0x9E3779B97F4A7C15, 0xC2B2AE3D27D4EB4F, 0x165667B19E3779F9, 0x27D4EB2F165667C5)
+_HALVE = bytes(i >> 1 for i in range(256))
+
+
+class CountMinSketch:
+    """
+    Approximate access frequencies in a fixed amount of memory.
+
+    Four rows of saturating counters (max 15); all counters are halved
+    after ``10 * capacity`` increments so old popularity fades away.
+    """
+
+    def __init__(self, capacity: int):
+        width = 1 << max(4, (max(capacity, 1) - 1).bit_length())
+        self._shift = 64 - (width.bit_length() - 1)
+        self.rows = [bytearray(width) for _ in _SKETCH_SEEDS]
+        self.sample_size = 10 * max(capacity, 1)
+        self.additions = 0
+
+    def increment(self, item: Any) -> None:
+        """Record one access."""
+        self.increment_all((item,))
+
+    def increment_all(self, items: Any) -> None:
+        """Record one access for each item (hot loop kept free of attribute lookups)."""
+        shift = self._shift
+        r0, r1, r2, r3 = self.rows
+        s0, s1, s2, s3 = _SKETCH_SEEDS
+        additions = self.additions
+        for item in items:
+            h = hash(item) & _MASK64
+            i0 = ((h * s0) & _MASK64) >> shift
+            i1 = ((h * s1) & _MASK64) >> shift
+            i2 = ((h * s2) & _MASK64) >> shift
+            i3 = ((h * s3) & _MASK64) >> shift
+            added = False
+            if r0[i0] < 15:
+                r0[i0] += 1
+                added = True
+            if r1[i1] < 15:
+                r1[i1] += 1
+                added = True
+            if r2[i2] < 15:
+                r2[i2] += 1
+                added = True
+            if r3[i3] < 15:
+                r3[i3] += 1
+                added = True
+            if added:
+                additions += 1
+                if additions >= self.sample_size:
+                    self.additions = additions
+                    self.reset()
+                    additions = self.additions
+                    r0, r1, r2, r3 = self.rows
+        self.additions = additions
+
+    def frequency(self, item: Any) -> int:
+        """Estimated access count (never underestimates before a reset)."""
+        h = hash(item) & _MASK64
+        shift = self._shift
+        return min(
+            row[((h * seed) & _MASK64) >> shift] for row, seed in zip(self.rows, _SKETCH_SEEDS)
+        )
+
+    def reset(self) -> None:
+        """Halve every counter (aging)."""
+        for i, row in enumerate(self.rows):
+            self.rows[i] = bytearray(row.translate(_HALVE))
+        self.additions //= 2
+
+
+class WTinyLFUCache(Generic[K, V]):
+    """
+    Bounded cache with a W-TinyLFU policy.
+
+    New keys enter a small LRU window; keys leaving the window are only
+    admitted to the main segmented LRU (probation + protected) when the
+    frequency sketch says they are accessed at least as often as the
+    entry they would evict. This keeps popular keys resident under
+    skewed workloads and makes the cache resistant to one-off scans.
+
+    Reads only do a dict lookup and append the key to a small buffer; the
+    buffered accesses are applied to the sketch and the LRU order in one
+    batch before the next write (or when the buffer fills). Eviction
+    decisions therefore always see every access, while recency within
+    the last few reads is approximate.
+
+    No operation blocks or awaits, so a single asyncio event loop can use
+    it without locks.
+    """
+
+    read_buffer_size = 32
+
+    def __init__(self, max_size: int, window_ratio: float = 0.01, protected_ratio: float = 0.8):
+        if max_size < 1:
+            raise ValueError("max_size must be a positive integer")
+        self.max_size = max_size
+        self.window_size = max(1, int(max_size * window_ratio))
+        self.main_size = max_size - self.window_size
+        self.protected_size = int(self.main_size * protected_ratio)
+
+        self._data: dict[K, V] = {}
+        self._segment: dict[K, OrderedDict] = {}
+        self._window: OrderedDict[K, None] = OrderedDict()
+        self._probation: OrderedDict[K, None] = OrderedDict()
+        self._protected: OrderedDict[K, None] = OrderedDict()
+        self.sketch = CountMinSketch(max_size)
+        self._reads: list[K] = []
+
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def get(self, key: K, default: V | None = None) -> V | None:
+        """Get value with O(1) complexity, recording the access."""
+        reads = self._reads
+        reads.append(key)
+        if len(reads) >= self.read_buffer_size:
+            self._drain_reads()
+        try:
+            value = self._data[key]
+        except KeyError:
+            self.misses += 1
+            return default
+        self.hits += 1
+        return value
+
+    def put(self, key: K, value: V) -> None:
+        """Insert or update a value (O(1) amortized)."""
+        if self._reads:
+            self._drain_reads()
+        self.sketch.increment(key)
+        if key in self._data:
+            self._data[key] = value
+            self._touch(key)
+            return
+
+        self._data[key] = value
+        self._window[key] = None
+        self._segment[key] = self._window
+        if len(self._window) > self.window_size:
+            candidate, _ = self._window.popitem(last=False)
+            self._admit(candidate)
+
+    def remove(self, key: K) -> bool:
+        """Remove key with O(1) complexity."""
+        segment = self._segment.pop(key, None)
+        if segment is None:
+            return False
+        del segment[key]
+        del self._data[key]
+        return True
+
+    def clear(self) -> None:
+        """Remove all entries (frequency history is kept)."""
+        self._reads.clear()
+        self._data.clear()
+        self._segment.clear()
+        self._window.clear()
+        self._probation.clear()
+        self._protected.clear()
+
+    def _drain_reads(self) -> None:
+        reads, self._reads = self._reads, []
+        self.sketch.increment_all(reads)
+        segment_of = self._segment.get
+        probation = self._probation
+        for key in reads:
+            segment = segment_of(key)
+            if segment is None:
+                continue  # miss, or removed since it was read
+            if segment is probation:
+                self._touch(key)
+            else:
+                segment.move_to_end(key)
+
+    def _touch(self, key: K) -> None:
+        segment = self._segment[key]
+        if segment is self._probation:
+            del self._probation[key]
+            self._protected[key] = None
+            self._segment[key] = self._protected
+            if len(self._protected) > self.protected_size:
+                demoted, _ = self._protected.popitem(last=False)
+                self._probation[demoted] = None
+                self._segment[demoted] = self._probation
+        else:
+            segment.move_to_end(key)
+
+    def _admit(self, candidate: K) -> None:
+        if len(self._probation) + len(self._protected) < self.main_size:
+            self._probation[candidate] = None
+            self._segment[candidate] = self._probation
+            return
+
+        main = self._probation or self._protected
+        victim = next(iter(main), None)
+        if victim is None:  # main segment has no room at all (max_size == 1)
+            self._evict(candidate)
+            return
+        if self.sketch.frequency(candidate) >= self.sketch.frequency(victim):
+            del main[victim]
+            self._evict(victim)
+            self._probation[candidate] = None
+            self._segment[candidate] = self._probation
+        else:
+            self._evict(candidate)
+
+    def _evict(self, key: K) -> None:
+        del self._data[key]
+        del self._segment[key]
+        self.evictions += 1
+
+    def __contains__(self, key: K) -> bool:
+        return key in self._data
+
+    def __len__(self) -> int:
+        return len(self._data)
+
+    def size(self) -> int:
+        """Get current size."""
+        return len(self._data)
+
+    @property
+    def hit_ratio(self) -> float:
+        total = self.hits + self.misses
+        return self.hits / total if total else 0.0
+
 
 def create_lru_cache(capacity: int) -> LRUCache:
     """Factory function to create LRU cache."""
     return LRUCache(capacity)
 
 
+def create_tinylfu_cache(max_size: int) -> WTinyLFUCache:
+    """Factory function to create W-TinyLFU cache."""
+    return WTinyLFUCache(max_size)
+
+
 def create_priority_queue() -> IndexedPriorityQueue:
     """Factory function to create priority queue."""
     return IndexedPriorityQueue()
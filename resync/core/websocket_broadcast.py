@@ -0,0 +1,392 @@
+"""
+Encode-once, fan-out WebSocket broadcasting.
+
+A broadcast is serialized a single time into a ``BroadcastMessage`` and
+the same immutable text frame is pushed into a bounded send queue per
+client. Every connection has exactly one writer task draining its queue,
+so a slow client only ever delays itself: when its queue is full the
+configured slow-consumer policy decides what happens:
+
+- ``drop_oldest``: the oldest queued frame is discarded
+- ``coalesce``: a frame carrying a state ``key`` (e.g. a job id) replaces
+  the queued frame with the same key, so the client gets the latest state
+  instead of every intermediate one; otherwise the oldest frame is dropped
+- ``disconnect``: the client is closed (code 1013) and must reconnect
+
+Clients may subscribe to topics (e.g. ``job:<name>``); topic broadcasts
+are only queued for subscribers. A subscription to ``*`` receives every
+topic.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import contextlib
+import json
+import logging
+from collections import OrderedDict
+from collections.abc import Awaitable, Callable, Iterable
+from dataclasses import dataclass
+from enum import Enum
+from typing import Any
+
+from fastapi import WebSocket
+
+logger = logging.getLogger(__name__)
+
+ALL_TOPICS = "*"
+
+# Close code sent to clients disconnected by the slow-consumer policy
+SLOW_CONSUMER_CLOSE_CODE = 1013
+
+
+class SlowConsumerPolicy(str, Enum):
+    """What to do when a client's send queue is full."""
+
+    DROP_OLDEST = "drop_oldest"
+    COALESCE = "coalesce"
+    DISCONNECT = "disconnect"
+
+
+class EnqueueResult(str, Enum):
+    """Outcome of queueing a frame for one client."""
+
+    QUEUED = "queued"
+    COALESCED = "coalesced"
+    DROPPED_OLDEST = "dropped_oldest"
+    OVERFLOW = "overflow"
+
+
+@dataclass(frozen=True, slots=True)
+class BroadcastMessage:
+    """A frame serialized once and shared by every recipient."""
+
+    text: str
+    size: int
+    topic: str | None = None
+    key: str | None = None
+
+    @classmethod
+    def from_text(
+        cls, text: str, topic: str | None = None, key: str | None = None
+    ) -> BroadcastMessage:
+        return cls(text=text, size=len(text.encode("utf-8")), topic=topic, key=key)
+
+    @classmethod
+    def from_json(
+        cls, data: Any, topic: str | None = None, key: str | None = None
+    ) -> BroadcastMessage:
+        """Serialize like ``WebSocket.send_json`` does, but only once."""
+        text = json.dumps(data, separators=(",", ":"), ensure_ascii=False)
+        return cls.from_text(text, topic=topic, key=key)
+
+
+class ClientSendQueue:
+    """
+    Bounded per-client frame queue applying a slow-consumer policy.
+
+    Frames are kept in an ordered dict so a coalesced frame replaces its
+    predecessor in place (O(1)) and keeps its position in the stream.
+    """
+
+    def __init__(self, max_size: int, policy: SlowConsumerPolicy):
+        self.max_size = max(1, max_size)
+        self.policy = policy
+        self._frames: OrderedDict[Any, BroadcastMessage] = OrderedDict()
+        self._seq = 0
+        self._ready = asyncio.Event()
+
+    def __len__(self) -> int:
+        return len(self._frames)
+
+    def put(self, message: BroadcastMessage) -> EnqueueResult:
+        """Queue a frame without blocking."""
+        coalescing = self.policy is SlowConsumerPolicy.COALESCE and message.key is not None
+        if coalescing:
+            slot: Any = ("key", message.key)
+            if slot in self._frames:
+                self._frames[slot] = message
+                return EnqueueResult.COALESCED
+        else:
+            self._seq += 1
+            slot = self._seq
+
+        result = EnqueueResult.QUEUED
+        if len(self._frames) >= self.max_size:
+            if self.policy is SlowConsumerPolicy.DISCONNECT:
+                return EnqueueResult.OVERFLOW
+            self._frames.popitem(last=False)
+            result = EnqueueResult.DROPPED_OLDEST
+
+        self._frames[slot] = message
+        self._ready.set()
+        return result
+
+    async def get(self) -> BroadcastMessage:
+        """Wait for and remove the oldest frame."""
+        while not self._frames:
+            self._ready.clear()
+            await self._ready.wait()
+        return self._frames.popitem(last=False)[1]
+
+    def clear(self) -> None:
+        self._frames.clear()
+
+
+class ClientWriter:
+    """The single task writing queued frames to one WebSocket."""
+
+    def __init__(
+        self,
+        client_id: str,
+        websocket: WebSocket,
+        queue: ClientSendQueue,
+        send_timeout: float,
+        on_sent: Callable[[int], None] | None = None,
+        on_close: Callable[[str, str], Awaitable[None]] | None = None,
+    ):
+        self.client_id = client_id
+        self.websocket = websocket
+        self.queue = queue
+        self.send_timeout = send_timeout
+        self.topics: set[str] = set()
+        self.on_sent = on_sent
+        self.on_close = on_close
+
+        self.messages_sent = 0
+        self.bytes_sent = 0
+        self.dropped = 0
+        self.coalesced = 0
+        self.close_reason: str | None = None
+        self._task: asyncio.Task | None = None
+        self._closing = False
+
+    def start(self) -> None:
+        self._task = asyncio.create_task(self._run(), name=f"ws-writer-{self.client_id}")
+
+    @property
+    def closed(self) -> bool:
+        return self.close_reason is not None
+
+    def request_close(self, reason: str) -> None:
+        """Stop writing; the writer task closes the socket and exits."""
+        if self.close_reason is None:
+            self.close_reason = reason
+            self.queue.clear()
+            if self._task is not None:
+                self._task.cancel()
+
+    async def stop(self) -> None:
+        """
+        Cancel the writer and wait for it.
+
+        A writer already running its close callback is only cancelled, not
+        awaited: the callback may be waiting on a lock held by the caller.
+        """
+        if self.close_reason is None:
+            self.close_reason = "unregistered"
+        task = self._task
+        if task is None or task is asyncio.current_task():
+            return
+        task.cancel()
+        if not self._closing:
+            with contextlib.suppress(asyncio.CancelledError):
+                await task
+
+    async def _run(self) -> None:
+        try:
+            while True:
+                message = await self.queue.get()
+                async with asyncio.timeout(self.send_timeout):
+                    await self.websocket.send_text(message.text)
+                self.messages_sent += 1
+                self.bytes_sent += message.size
+                if self.on_sent is not None:
+                    self.on_sent(message.size)
+        except asyncio.CancelledError:
+            if self.close_reason in (None, "unregistered", "replaced"):
+                raise
+        except TimeoutError:
+            logger.warning(
+                f"WebSocket send to {self.client_id} exceeded {self.send_timeout}s; closing"
+            )
+            self.close_reason = "send_timeout"
+        except Exception as e:
+            logger.warning(f"WebSocket writer for {self.client_id} stopped: {e}")
+            self.close_reason = "send_error"
+
+        self._closing = True
+        if self.close_reason == "slow_consumer":
+            with contextlib.suppress(Exception):
+                await self.websocket.close(
+                    code=SLOW_CONSUMER_CLOSE_CODE, reason="Client too slow"
+                )
+        if self.on_close is not None:
+            try:
+                await self.on_close(self.client_id, self.close_reason or "send_error")
+            except Exception as e:
+                logger.error(f"Error handling closed WebSocket writer {self.client_id}: {e}")
+
+
+class BroadcastHub:
+    """
+    Topic-aware fan-out of pre-serialized frames to per-client writers.
+
+    Features:
+    - One serialization per broadcast, shared by all recipients
+    - Bounded per-client queues with a slow-consumer policy
+    - One writer task per connection (no task per message per client)
+    - Per-topic subscriptions
+    """
+
+    def __init__(
+        self,
+        max_queue_size: int = 256,
+        policy: SlowConsumerPolicy | str = SlowConsumerPolicy.DROP_OLDEST,
+        send_timeout: float = 10.0,
+    ):
+        self.max_queue_size = max_queue_size
+        self.policy = SlowConsumerPolicy(policy)
+        self.send_timeout = send_timeout
+        self.writers: dict[str, ClientWriter] = {}
+        self._subscribers: dict[str, set[str]] = {}
+
+        self.messages_published = 0
+        self.frames_enqueued = 0
+        self.frames_dropped = 0
+        self.frames_coalesced = 0
+        self.slow_consumer_disconnects = 0
+
+    # ------------------------------------------------------------------
+    # Clients
+    # ------------------------------------------------------------------
+
+    def register(
+        self,
+        client_id: str,
+        websocket: WebSocket,
+        topics: Iterable[str] | None = None,
+        policy: SlowConsumerPolicy | str | None = None,
+        on_sent: Callable[[int], None] | None = None,
+        on_close: Callable[[str, str], Awaitable[None]] | None = None,
+    ) -> ClientWriter:
+        """Start a writer for a connected client."""
+        queue = ClientSendQueue(
+            self.max_queue_size, SlowConsumerPolicy(policy) if policy else self.policy
+        )
+        writer = ClientWriter(
+            client_id, websocket, queue, self.send_timeout, on_sent=on_sent, on_close=on_close
+        )
+        previous = self.writers.get(client_id)
+        if previous is not None:
+            previous.request_close("replaced")
+        self.writers[client_id] = writer
+        if topics:
+            self.subscribe(client_id, topics)
+        writer.start()
+        return writer
+
+    async def unregister(self, client_id: str) -> None:
+        """Stop a client's writer and drop its subscriptions."""
+        writer = self.writers.pop(client_id, None)
+        if writer is None:
+            return
+        for topic in writer.topics:
+            subscribers = self._subscribers.get(topic)
+            if subscribers is not None:
+                subscribers.discard(client_id)
+                if not subscribers:
+                    del self._subscribers[topic]
+        await writer.stop()
+
+    def subscribe(self, client_id: str, topics: Iterable[str]) -> set[str]:
+        """Add topic subscriptions; returns the client's topics."""
+        writer = self.writers[client_id]
+        for topic in topics:
+            writer.topics.add(topic)
+            self._subscribers.setdefault(topic, set()).add(client_id)
+        return set(writer.topics)
+
+    def unsubscribe(self, client_id: str, topics: Iterable[str] | None = None) -> set[str]:
+        """Remove topic subscriptions (all when ``topics`` is None)."""
+        writer = self.writers[client_id]
+        for topic in list(writer.topics if topics is None else topics):
+            writer.topics.discard(topic)
+            subscribers = self._subscribers.get(topic)
+            if subscribers is not None:
+                subscribers.discard(client_id)
+                if not subscribers:
+                    del self._subscribers[topic]
+        return set(writer.topics)
+
+    def recipients(self, topic: str | None) -> list[ClientWriter]:
+        """Writers that should receive a broadcast on ``topic``."""
+        if topic is None:
+            return list(self.writers.values())
+        client_ids = self._subscribers.get(topic, set()) | self._subscribers.get(
+            ALL_TOPICS, set()
+        )
+        return [self.writers[cid] for cid in client_ids if cid in self.writers]
+
+    # ------------------------------------------------------------------
+    # Publishing
+    # ------------------------------------------------------------------
+
+    def publish(self, message: BroadcastMessage) -> int:
+        """
+        Queue a pre-serialized frame for every recipient.
+
+        Never waits on a socket. Returns the number of clients the frame was
+        queued (or coalesced) for.
+        """
+        self.messages_published += 1
+        delivered = 0
+        for writer in self.recipients(message.topic):
+            if writer.closed:
+                continue
+            result = writer.queue.put(message)
+            if result is EnqueueResult.OVERFLOW:
+                self.slow_consumer_disconnects += 1
+                logger.warning(
+                    f"Disconnecting slow WebSocket client {writer.client_id}: "
+                    f"{len(writer.queue)} frames queued"
+                )
+                writer.request_close("slow_consumer")
+                continue
+            delivered += 1
+            self.frames_enqueued += 1
+            if result is EnqueueResult.DROPPED_OLDEST:
+                writer.dropped += 1
+                self.frames_dropped += 1
+            elif result is EnqueueResult.COALESCED:
+                writer.coalesced += 1
+                self.frames_coalesced += 1
+        return delivered
+
+    def publish_text(self, text: str, topic: str | None = None, key: str | None = None) -> int:
+        return self.publish(BroadcastMessage.from_text(text, topic=topic, key=key))
+
+    def publish_json(self, data: Any, topic: str | None = None, key: str | None = None) -> int:
+        return self.publish(BroadcastMessage.from_json(data, topic=topic, key=key))
+
+    async def close(self) -> None:
+        """Stop every writer."""
+        for client_id in list(self.writers):
+            await self.unregister(client_id)
+
+    def get_metrics(self) -> dict[str, Any]:
+        """Fan-out statistics."""
+        queued = [len(writer.queue) for writer in self.writers.values()]
+        return {
+            "clients": len(self.writers),
+            "topics": len(self._subscribers),
+            "policy": self.policy.value,
+            "max_queue_size": self.max_queue_size,
+            "messages_published": self.messages_published,
+            "frames_enqueued": self.frames_enqueued,
+            "frames_dropped": self.frames_dropped,
+            "frames_coalesced": self.frames_coalesced,
+            "slow_consumer_disconnects": self.slow_consumer_disconnects,
+            "queued_frames": sum(queued),
+            "max_client_backlog": max(queued, default=0),
+        }
@@ -8,6 +8,7 @@ from typing import Any
 from fastapi import WebSocket, WebSocketDisconnect
 
 from resync.core.metrics import runtime_metrics
+from resync.core.websocket_broadcast import BroadcastHub, BroadcastMessage
 
 # --- Logging Setup ---
 logger = logging.getLogger(__name__)
@@ -63,6 +64,10 @@ class WebSocketPoolStats:
     connection_errors: int = 0
     cleanup_cycles: int = 0
     last_cleanup: datetime | None = None
+    broadcasts: int = 0
+    frames_dropped: int = 0
+    frames_coalesced: int = 0
+    slow_consumer_disconnects: int = 0
 
 
 class WebSocketPoolManager:
@@ -76,6 +81,13 @@ class WebSocketPoolManager:
         self._initialized = False
         self._shutdown = False
 
+        settings = _get_settings()
+        self.broadcaster = BroadcastHub(
+            max_queue_size=getattr(settings, "WS_SEND_QUEUE_SIZE", 256),
+            policy=getattr(settings, "WS_SLOW_CONSUMER_POLICY", "drop_oldest"),
+            send_timeout=getattr(settings, "WS_SEND_TIMEOUT", 10.0),
+        )
+
     async def initialize(self) -> None:
         """Initialize the WebSocket pool manager."""
         if self._initialized or self._shutdown:
@@ -191,13 +203,16 @@ class WebSocketPoolManager:
             except Exception as e:
                 logger.error(f"Error closing WebSocket connection {client_id}: {e}")
 
-    async def connect(self, websocket: WebSocket, client_id: str) -> None:
+    async def connect(
+        self, websocket: WebSocket, client_id: str, topics: list[str] | None = None
+    ) -> None:
         """
         Accept a new WebSocket connection and add it to the pool.
 
         Args:
             websocket: The WebSocket connection
             client_id: Unique identifier for the client
+            topics: Broadcast topics the client is subscribed to initially
         """
         if self._shutdown:
             raise RuntimeError("WebSocket pool manager is shutdown")
@@ -219,8 +234,22 @@ class WebSocketPoolManager:
             last_activity=current_time,
         )
 
+        def record_sent(size: int) -> None:
+            conn_info.update_activity()
+            conn_info.message_count += 1
+            conn_info.bytes_sent += size
+            self.stats.total_messages_sent += 1
+            self.stats.total_bytes_sent += size
+
         async with self._lock:
             self.connections[client_id] = conn_info
+            self.broadcaster.register(
+                client_id,
+                websocket,
+                topics=topics,
+                on_sent=record_sent,
+                on_close=self._on_writer_closed,
+            )
             self.stats.total_connections += 1
             self.stats.active_connections = len(self.connections)
             self.stats.healthy_connections += 1
@@ -248,6 +277,19 @@ class WebSocketPoolManager:
         """
         await self._remove_connection(client_id)
 
+    async def _on_writer_closed(self, client_id: str, reason: str) -> None:
+        """Remove a connection whose broadcast writer stopped."""
+        conn_info = self.connections.get(client_id)
+        if conn_info is None:
+            return
+        if reason == "slow_consumer":
+            self.stats.slow_consumer_disconnects += 1
+            runtime_metrics.record_counter("websocket_pool.slow_consumer_disconnects", 1)
+        else:
+            conn_info.mark_error()
+            self.stats.connection_errors += 1
+        await self._remove_connection(client_id)
+
     async def _remove_connection(self, client_id: str) -> None:
         """Internal method to remove a connection."""
         async with self._lock:
@@ -255,6 +297,7 @@ class WebSocketPoolManager:
                 return
 
             conn_info = self.connections[client_id]
+            await self.broadcaster.unregister(client_id)
 
             try:
                 # Close the WebSocket connection
@@ -331,149 +374,87 @@ class WebSocketPoolManager:
             conn_info.mark_error()
             return False
 
-    async def broadcast(self, message: str) -> int:
+    def subscribe(self, client_id: str, topics: list[str]) -> set[str]:
         """
-        Send a message to all connected clients.
+        Subscribe a client to broadcast topics (e.g. ``job:<name>``).
+
+        Returns:
+            The client's current topics
+        """
+        return self.broadcaster.subscribe(client_id, topics)
+
+    def unsubscribe(self, client_id: str, topics: list[str] | None = None) -> set[str]:
+        """Unsubscribe a client from topics (all topics when None)."""
+        return self.broadcaster.unsubscribe(client_id, topics)
+
+    def _publish(self, message: BroadcastMessage) -> int:
+        """Queue a pre-serialized frame for its recipients and record metrics."""
+        hub = self.broadcaster
+        dropped, coalesced = hub.frames_dropped, hub.frames_coalesced
+        queued = hub.publish(message)
+
+        self.stats.broadcasts += 1
+        self.stats.frames_dropped += hub.frames_dropped - dropped
+        self.stats.frames_coalesced += hub.frames_coalesced - coalesced
+        runtime_metrics.record_counter("websocket_pool.broadcasts", 1)
+        return queued
+
+    async def broadcast(
+        self, message: str, topic: str | None = None, key: str | None = None
+    ) -> int:
+        """
+        Send a message to all connected clients (or the subscribers of a topic).
+
+        The frame is queued for each client's writer task and this call
+        never waits on a socket; slow clients are handled by the
+        slow-consumer policy of the broadcaster.
 
         Args:
             message: The message to broadcast
+            topic: Only queue for clients subscribed to this topic
+            key: State key used to coalesce frames for slow clients
 
         Returns:
-            Number of clients that received the message
+            Number of clients the message was queued for
         """
         if not self.connections:
             logger.info("Broadcast requested, but no active WebSocket connections")
             return 0
 
-        logger.info(f"Broadcasting message to {len(self.connections)} WebSocket clients")
-
-        # Create tasks to send messages concurrently
-        tasks = []
-        client_ids = list(self.connections.keys())
+        queued = self._publish(BroadcastMessage.from_text(message, topic=topic, key=key))
+        logger.debug(f"Message queued for {queued} WebSocket clients")
+        return queued
 
-        for client_id in client_ids:
-            task = asyncio.create_task(self._send_message_with_error_handling(client_id, message))
-            tasks.append((client_id, task))
-
-        # Wait for all tasks to complete
-        successful_sends = 0
-        for client_id, task in tasks:
-            try:
-                success = await task
-                if success:
-                    successful_sends += 1
-            except Exception as e:
-                logger.error(f"Error in broadcast task for {client_id}: {e}")
-
-        logger.info(f"Message successfully broadcast to {successful_sends} clients")
-        return successful_sends
-
-    async def _send_message_with_error_handling(self, client_id: str, message: str) -> bool:
-        """Send message with proper error handling and connection cleanup."""
-        conn_info = self.connections.get(client_id)
-        if not conn_info:
-            return False
-
-        try:
-            await conn_info.websocket.send_text(message)
-            conn_info.update_activity()
-            conn_info.message_count += 1
-            conn_info.bytes_sent += len(message.encode("utf-8"))
-            return True
-
-        except (WebSocketDisconnect, ConnectionError) as e:
-            logger.warning(f"Connection issue during broadcast to {client_id}: {e}")
-            conn_info.mark_error()
-            # Remove connection after disconnection
-            await self._remove_connection(client_id)
-            return False
-        except RuntimeError as e:
-            if "websocket state" in str(e).lower():
-                logger.warning(f"WebSocket in wrong state during broadcast to {client_id}: {e}")
-                conn_info.mark_error()
-                return False
-            logger.error(f"Runtime error during broadcast to {client_id}: {e}")
-            return False
-        except Exception as e:
-            logger.error(f"Unexpected error during broadcast to {client_id}: {e}")
-            return False
-
-    async def broadcast_json(self, data: dict[str, Any]) -> int:
+    async def broadcast_json(
+        self, data: dict[str, Any], topic: str | None = None, key: str | None = None
+    ) -> int:
         """
-        Send JSON data to all connected clients.
+        Send JSON data to all connected clients (or the subscribers of a topic).
+
+        The payload is serialized once and the same text frame is queued for
+        every recipient.
 
         Args:
             data: The JSON data to broadcast
+            topic: Only queue for clients subscribed to this topic
+            key: State key used to coalesce frames for slow clients
 
         Returns:
-            Number of clients that received the data
+            Number of clients the data was queued for
         """
         if not self.connections:
             logger.info("JSON broadcast requested, but no active WebSocket connections")
             return 0
 
-        logger.info(f"Broadcasting JSON data to {len(self.connections)} WebSocket clients")
-
-        # Create tasks to send JSON data concurrently
-        tasks = []
-        client_ids = list(self.connections.keys())
-
-        for client_id in client_ids:
-            task = asyncio.create_task(self._send_json_with_error_handling(client_id, data))
-            tasks.append((client_id, task))
-
-        # Wait for all tasks to complete
-        successful_sends = 0
-        for client_id, task in tasks:
-            try:
-                success = await task
-                if success:
-                    successful_sends += 1
-            except Exception as e:
-                logger.error(f"Error in JSON broadcast task for {client_id}: {e}")
-
-        logger.info(f"JSON data successfully broadcast to {successful_sends} clients")
-        return successful_sends
-
-    async def _send_json_with_error_handling(self, client_id: str, data: dict[str, Any]) -> bool:
-        """Send JSON data with proper error handling and connection cleanup."""
-        conn_info = self.connections.get(client_id)
-        if not conn_info:
-            return False
-
         try:
-            await conn_info.websocket.send_json(data)
-            conn_info.update_activity()
-            conn_info.message_count += 1
-
-            # Estimate bytes sent (rough approximation)
-            import json
-
-            json_str = json.dumps(data)
-            conn_info.bytes_sent += len(json_str.encode("utf-8"))
-            return True
+            message = BroadcastMessage.from_json(data, topic=topic, key=key)
+        except (TypeError, ValueError) as e:
+            logger.error(f"JSON serialization error during broadcast: {e}")
+            return 0
 
-        except (WebSocketDisconnect, ConnectionError) as e:
-            logger.warning(f"Connection issue during JSON broadcast to {client_id}: {e}")
-            conn_info.mark_error()
-            # Remove connection after disconnection
-            await self._remove_connection(client_id)
-            return False
-        except ValueError as e:
-            logger.error(f"JSON serialization error during broadcast to {client_id}: {e}")
-            return False
-        except RuntimeError as e:
-            if "websocket state" in str(e).lower():
-                logger.warning(
-                    f"WebSocket in wrong state during JSON broadcast to {client_id}: {e}"
-                )
-                conn_info.mark_error()
-                return False
-            logger.error(f"Runtime error during JSON broadcast to {client_id}: {e}")
-            return False
-        except Exception as e:
-            logger.error(f"Unexpected error during JSON broadcast to {client_id}: {e}")
-            return False
+        queued = self._publish(message)
+        logger.debug(f"JSON data queued for {queued} WebSocket clients")
+        return queued
 
     def get_connection_info(self, client_id: str) -> WebSocketConnectionInfo | None:
         """Get information about a specific connection."""
@@ -5,14 +5,24 @@ Expande automaticamente o Knowledge Graph com dados obtidos
 da API do TWS, incluindo jobs, dependências, recursos,
 schedules e workstations.
 
+v5.9.10:
+- Jobs, recursos, schedules e workstations são obtidos concorrentemente
+  (limitado por parallel_requests)
+- expand_from_job busca cada nível da árvore em paralelo
+- Persistência set-based via TWSGraphStore (COPY + merge), gravando
+  apenas nós/relações alterados desde a expansão anterior
+
 Versão: 5.4.0
 """
 
+import asyncio
 import logging
+from collections.abc import Awaitable
 from dataclasses import dataclass
 from datetime import datetime
-from typing import Any
+from typing import Any, TypeVar
 
+from resync.knowledge.retrieval.tws_graph_store import TWSGraphStore
 from resync.knowledge.retrieval.tws_relations import (
     TWSNode,
     TWSNodeType,
@@ -22,6 +32,8 @@ from resync.knowledge.retrieval.tws_relations import (
 
 logger = logging.getLogger(__name__)
 
+T = TypeVar("T")
+
 
 # =============================================================================
 # CONFIGURAÇÃO
@@ -73,6 +85,11 @@ class ExpansionStats:
     nodes_created: int = 0
     relations_created: int = 0
 
+    # Persistência (apenas o que mudou desde a expansão anterior)
+    nodes_written: int = 0
+    relations_written: int = 0
+    relations_deleted: int = 0
+
     errors: list[str] = None
 
     def __post_init__(self):
@@ -96,6 +113,9 @@ class ExpansionStats:
             "resources_processed": self.resources_processed,
             "nodes_created": self.nodes_created,
             "relations_created": self.relations_created,
+            "nodes_written": self.nodes_written,
+            "relations_written": self.relations_written,
+            "relations_deleted": self.relations_deleted,
             "errors_count": len(self.errors),
             "errors": self.errors[:10],  # Limitar a 10 erros no output
         }
@@ -142,6 +162,8 @@ class TWSGraphExpander:
         self._stats = ExpansionStats()
         self._nodes: dict[str, TWSNode] = {}
         self._relations: list[TWSRelation] = []
+        self._relation_keys: set[tuple[str, str, TWSRelationType]] = set()
+        self._fetch_semaphore: asyncio.Semaphore | None = None
 
     async def expand_full(self) -> ExpansionStats:
         """
@@ -153,32 +175,44 @@ class TWSGraphExpander:
         self._stats = ExpansionStats(started_at=datetime.utcnow())
 
         try:
+            # 0. Buscar todas as fontes concorrentemente
+            data = await self._fetch_all_sources()
+
             # 1. Expandir jobs e dependências
             if self.config.extract_dependencies:
-                await self._expand_jobs_and_dependencies()
+                await self._expand_jobs_and_dependencies(data["jobs"])
 
             # 2. Expandir recursos
             if self.config.extract_resources:
-                await self._expand_resources()
+                await self._expand_resources(data["resources"])
 
             # 3. Expandir schedules
             if self.config.extract_schedules:
-                await self._expand_schedules()
+                await self._expand_schedules(data["schedules"])
 
             # 4. Expandir workstations
             if self.config.extract_workstations:
-                await self._expand_workstations()
+                await self._expand_workstations(data["workstations"])
 
             # 5. Expandir recovery jobs
             if self.config.extract_recovery:
-                await self._expand_recovery_jobs()
+                await self._expand_recovery_jobs(data["recovery"])
 
             # 6. Expandir alertas
             if self.config.extract_alerts:
-                await self._expand_alerts()
-
-            # 7. Persistir no banco
-            await self._persist_to_database()
+                await self._expand_alerts(data["alerts"])
+
+            # 7. Persistir no banco (expansão completa: remove relações obsoletas).
+            # Uma fonte que falhou parece "vazia": remover relações nesse caso
+            # apagaria o grafo persistido, então a limpeza fica para a próxima
+            # expansão sem erros.
+            prune = not self._stats.errors
+            if not prune:
+                logger.warning(
+                    f"Expansão com {len(self._stats.errors)} erro(s): "
+                    "relações obsoletas não serão removidas"
+                )
+            await self._persist_to_database(prune=prune)
 
         except Exception as e:
             logger.error(f"Erro na expansão do grafo: {e}")
@@ -219,12 +253,49 @@ class TWSGraphExpander:
         self._stats.completed_at = datetime.utcnow()
         return self._stats
 
-    async def _expand_jobs_and_dependencies(self):
+    async def _fetch(self, coro: Awaitable[T]) -> T:
+        """Executa uma chamada ao TWS respeitando parallel_requests."""
+        if self._fetch_semaphore is None:
+            self._fetch_semaphore = asyncio.Semaphore(max(1, self.config.parallel_requests))
+        async with self._fetch_semaphore:
+            return await coro
+
+    async def _fetch_all_sources(self) -> dict[str, Any]:
+        """Busca jobs, recursos, schedules, workstations, recovery e alertas em paralelo."""
+        fetchers = {
+            "jobs": (self.config.extract_dependencies, self._get_jobs_from_tws, list),
+            "resources": (self.config.extract_resources, self._get_resources_from_tws, list),
+            "schedules": (self.config.extract_schedules, self._get_schedules_from_tws, list),
+            "workstations": (
+                self.config.extract_workstations,
+                self._get_workstations_from_tws,
+                list,
+            ),
+            "recovery": (self.config.extract_recovery, self._get_recovery_jobs_from_tws, dict),
+            "alerts": (self.config.extract_alerts, self._get_alerts_from_tws, list),
+        }
+        names = [name for name, (enabled, _, _) in fetchers.items() if enabled]
+        results = await asyncio.gather(
+            *(self._fetch(fetchers[name][1]()) for name in names),
+            return_exceptions=True,
+        )
+
+        data: dict[str, Any] = {name: empty() for name, (_, _, empty) in fetchers.items()}
+        for name, result in zip(names, results, strict=True):
+            if isinstance(result, Exception):
+                logger.warning(f"Erro ao obter {name} do TWS: {result}")
+                self._stats.errors.append(f"Fetch {name}: {result}")
+            else:
+                data[name] = result
+        return data
+
+    async def _expand_jobs_and_dependencies(self, jobs: list[dict] | None = None):
         """Expande todos os jobs e suas dependências."""
         logger.info("Expandindo jobs e dependências...")
 
         # Obter lista de jobs do TWS
-        jobs = await self._get_jobs_from_tws()
+        if jobs is None:
+            jobs = await self._get_jobs_from_tws()
 
         for job in jobs[: self.config.max_jobs]:
             try:
@@ -265,11 +336,12 @@ class TWSGraphExpander:
                 logger.warning(f"Erro ao processar job {job.get('name')}: {e}")
                 self._stats.errors.append(f"Job {job.get('name')}: {e}")
 
-    async def _expand_resources(self):
+    async def _expand_resources(self, resources: list[dict] | None = None):
         """Expande recursos e alocações."""
         logger.info("Expandindo recursos...")
 
-        resources = await self._get_resources_from_tws()
+        if resources is None:
+            resources = await self._get_resources_from_tws()
 
         for resource in resources:
             try:
@@ -322,11 +394,12 @@ class TWSGraphExpander:
                 logger.warning(f"Erro ao processar recurso {resource.get('name')}: {e}")
                 self._stats.errors.append(f"Resource {resource.get('name')}: {e}")
 
-    async def _expand_schedules(self):
+    async def _expand_schedules(self, schedules: list[dict] | None = None):
         """Expande schedules e seus jobs."""
         logger.info("Expandindo schedules...")
 
-        schedules = await self._get_schedules_from_tws()
+        if schedules is None:
+            schedules = await self._get_schedules_from_tws()
 
         for schedule in schedules:
             try:
@@ -372,11 +445,12 @@ class TWSGraphExpander:
                 logger.warning(f"Erro ao processar schedule {schedule.get('name')}: {e}")
                 self._stats.errors.append(f"Schedule {schedule.get('name')}: {e}")
 
-    async def _expand_workstations(self):
+    async def _expand_workstations(self, workstations: list[dict] | None = None):
         """Expande workstations e jobs que rodam nelas."""
         logger.info("Expandindo workstations...")
 
-        workstations = await self._get_workstations_from_tws()
+        if workstations is None:
+            workstations = await self._get_workstations_from_tws()
 
         for ws in workstations:
             try:
@@ -412,12 +486,13 @@ class TWSGraphExpander:
                 logger.warning(f"Erro ao processar workstation {ws.get('name')}: {e}")
                 self._stats.errors.append(f"Workstation {ws.get('name')}: {e}")
 
-    async def _expand_recovery_jobs(self):
+    async def _expand_recovery_jobs(self, recovery_map: dict[str, str] | None = None):
         """Expande jobs de recovery."""
         logger.info("Expandindo recovery jobs...")
 
         # Obter mapeamento de recovery jobs
-        recovery_map = await self._get_recovery_jobs_from_tws()
+        if recovery_map is None:
+            recovery_map = await self._get_recovery_jobs_from_tws()
 
         for main_job, recovery_job in recovery_map.items():
             self._add_relation(
@@ -429,11 +504,12 @@ class TWSGraphExpander:
                 )
             )
 
-    async def _expand_alerts(self):
+    async def _expand_alerts(self, alerts: list[dict] | None = None):
         """Expande regras de alerta."""
         logger.info("Expandindo alertas...")
 
-        alerts = await self._get_alerts_from_tws()
+        if alerts is None:
+            alerts = await self._get_alerts_from_tws()
 
         for alert in alerts:
             try:
@@ -486,29 +562,52 @@ class TWSGraphExpander:
         depth: int,
         visited: set[str],
     ):
-        """Expande recursivamente a partir de um job."""
-        if depth <= 0 or job_name in visited:
-            return
+        """
+        Expande a partir de um job, nível a nível.
 
-        visited.add(job_name)
+        Os detalhes de todos os jobs de um mesmo nível são obtidos em
+        paralelo (limitado por parallel_requests).
+        """
+        frontier = [job_name]
 
-        # Obter detalhes do job
-        job = await self._get_job_details_from_tws(job_name)
-        if not job:
-            return
+        while depth > 0 and frontier:
+            level = [name for name in dict.fromkeys(frontier) if name and name not in visited]
+            visited.update(level)
+            if not level:
+                return
 
-        # Criar nó
-        job_node = TWSNode(
-            node_id=f"job:{job_name}",
-            node_type=TWSNodeType.JOB,
-            name=job_name,
-            properties=job.get("properties", {}),
-            tenant_id=self.config.tenant_id,
+            details = await asyncio.gather(
+                *(self._fetch(self._get_job_details_from_tws(name)) for name in level),
+                return_exceptions=True,
+            )
+
+            frontier = []
+            for name, job in zip(level, details, strict=True):
+                if isinstance(job, Exception):
+                    logger.warning(f"Erro ao obter job {name}: {job}")
+                    self._stats.errors.append(f"Job {name}: {job}")
+                    continue
+                if job:
+                    frontier.extend(self._add_job_details(name, job))
+
+            depth -= 1
+
+    def _add_job_details(self, job_name: str, job: dict) -> list[str]:
+        """Cria nó e relações de um job; retorna os vizinhos a expandir."""
+        self._add_node(
+            TWSNode(
+                node_id=f"job:{job_name}",
+                node_type=TWSNodeType.JOB,
+                name=job_name,
+                properties=job.get("properties", {}),
+                tenant_id=self.config.tenant_id,
+            )
         )
-        self._add_node(job_node)
         self._stats.jobs_processed += 1
 
-        # Expandir dependências
+        neighbours = []
+
+        # Dependências
         for dep in job.get("dependencies", []):
             dep_name = dep.get("job_name")
             self._add_relation(
@@ -519,9 +618,9 @@ class TWSGraphExpander:
                     tenant_id=self.config.tenant_id,
                 )
             )
-            await self._expand_job_recursive(dep_name, depth - 1, visited)
+            neighbours.append(dep_name)
 
-        # Expandir successores
+        # Sucessores
         for succ in job.get("successors", []):
             succ_name = succ.get("job_name")
             self._add_relation(
@@ -532,7 +631,9 @@ class TWSGraphExpander:
                     tenant_id=self.config.tenant_id,
                 )
             )
-            await self._expand_job_recursive(succ_name, depth - 1, visited)
+            neighbours.append(succ_name)
+
+        return neighbours
 
     # =========================================================================
     # MÉTODOS AUXILIARES
@@ -548,9 +649,9 @@ class TWSGraphExpander:
         """Adiciona relação ao grafo."""
         # Verificar duplicata
         key = (relation.from_node, relation.to_node, relation.relation_type)
-        existing = [r for r in self._relations if (r.from_node, r.to_node, r.relation_type) == key]
 
-        if not existing:
+        if key not in self._relation_keys:
+            self._relation_keys.add(key)
             self._relations.append(relation)
             self._stats.relations_created += 1
 
@@ -565,46 +666,50 @@ class TWSGraphExpander:
         }
         return mapping.get(dep_type.lower() if dep_type else "follows", TWSRelationType.DEPENDS_ON)
 
-    async def _persist_to_database(self):
-        """Persiste nós e relações no banco de dados."""
+    async def _persist_to_database(self, prune: bool = False):
+        """
+        Persiste nós e relações no banco de dados.
+
+        Args:
+            prune: Remover relações persistidas que não aparecem nesta
+                expansão (somente válido para expand_full)
+        """
         if not self.db:
             logger.warning("Database session não disponível, dados não persistidos")
             return
 
         try:
-            # Persistir nós
-            for node in self._nodes.values():
-                await self._upsert_node(node)
+            diff = await TWSGraphStore(self.db).sync(
+                list(self._nodes.values()),
+                self._relations,
+                tenant_id=self.config.tenant_id,
+                prune=prune,
+            )
 
-            # Persistir relações
-            for relation in self._relations:
-                await self._upsert_relation(relation)
+            self._stats.nodes_written = len(diff.nodes_upsert)
+            self._stats.relations_written = len(diff.relations_upsert)
+            self._stats.relations_deleted = len(diff.relations_delete)
 
-            logger.info(f"Persistidos {len(self._nodes)} nós e {len(self._relations)} relações")
+            logger.info(
+                f"Persistidos {len(diff.nodes_upsert)}/{len(self._nodes)} nós e "
+                f"{len(diff.relations_upsert)}/{len(self._relations)} relações "
+                f"({len(diff.relations_delete)} relações removidas)"
+            )
 
         except Exception as e:
             logger.error(f"Erro ao persistir no banco: {e}")
             self._stats.errors.append(f"Persistence error: {e}")
 
-    async def _upsert_node(self, node: TWSNode):
-        """Insere ou atualiza nó no banco."""
-        # Implementação depende do banco (PostgreSQL com jsonb)
-
-    async def _upsert_relation(self, relation: TWSRelation):
-        """Insere ou atualiza relação no banco."""
-        # Implementação depende do banco
-
     # =========================================================================
     # MÉTODOS DE INTEGRAÇÃO COM TWS (Mock para desenvolvimento)
     # =========================================================================
+    # Mock apenas sem cliente TWS; com cliente, erros são propagados para que
+    # _fetch_all_sources registre a falha (dados mock nunca substituem o plano)
 
     async def _get_jobs_from_tws(self) -> list[dict]:
         """Obtém lista de jobs do TWS."""
         if self.tws:
-            try:
-                return await self.tws.get_all_jobs()
-            except Exception as e:
-                logger.warning(f"Erro ao obter jobs do TWS: {e}")
+            return await self.tws.get_all_jobs()
 
         # Mock data para desenvolvimento
         return self._get_mock_jobs()
@@ -623,40 +728,28 @@ class TWSGraphExpander:
     async def _get_resources_from_tws(self) -> list[dict]:
         """Obtém lista de recursos do TWS."""
         if self.tws:
-            try:
-                return await self.tws.get_all_resources()
-            except Exception as e:
-                logger.warning(f"Erro ao obter recursos: {e}")
+            return await self.tws.get_all_resources()
 
         return self._get_mock_resources()
 
     async def _get_schedules_from_tws(self) -> list[dict]:
         """Obtém lista de schedules do TWS."""
         if self.tws:
-            try:
-                return await self.tws.get_all_schedules()
-            except Exception as e:
-                logger.warning(f"Erro ao obter schedules: {e}")
+            return await self.tws.get_all_schedules()
 
         return self._get_mock_schedules()
 
     async def _get_workstations_from_tws(self) -> list[dict]:
         """Obtém lista de workstations do TWS."""
         if self.tws:
-            try:
-                return await self.tws.get_all_workstations()
-            except Exception as e:
-                logger.warning(f"Erro ao obter workstations: {e}")
+            return await self.tws.get_all_workstations()
 
         return self._get_mock_workstations()
 
     async def _get_recovery_jobs_from_tws(self) -> dict[str, str]:
         """Obtém mapeamento de recovery jobs."""
         if self.tws:
-            try:
-                return await self.tws.get_recovery_mapping()
-            except Exception as e:
-                logger.warning(f"Erro ao obter recovery jobs: {e}")
+            return await self.tws.get_recovery_mapping()
 
         return self._get_mock_recovery_mapping()
 
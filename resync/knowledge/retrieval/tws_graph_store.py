@@ -0,0 +1,319 @@
+"""
+TWS Knowledge Graph Store - Persistência em lote v5.9.10
+
+Grava nós e relações do TWSGraphExpander nas tabelas kg_nodes / kg_relations
+(as mesmas consultadas por TWSQueryPatterns) usando operações set-based:
+
+1. Lê os hashes de conteúdo da expansão anterior (por tenant)
+2. Calcula o diff: apenas nós/relações novos ou alterados são gravados,
+   relações que sumiram do plano são removidas
+3. COPY dos registros alterados para tabelas temporárias de staging
+4. Um único INSERT ... ON CONFLICT por tabela faz o merge
+
+Aceita como conexão:
+- asyncpg.Connection
+- asyncpg.Pool
+- SQLAlchemy AsyncSession (usa a conexão asyncpg subjacente e faz commit da
+  sessão ao final)
+
+Nota: Apache AGE nunca foi implementado (v5.9.3); o grafo persistido são as
+tabelas relacionais kg_nodes / kg_relations.
+"""
+
+from __future__ import annotations
+
+import hashlib
+import json
+import logging
+from contextlib import asynccontextmanager
+from dataclasses import dataclass, field
+from typing import Any
+
+from resync.knowledge.retrieval.tws_relations import TWSNode, TWSRelation
+
+logger = logging.getLogger(__name__)
+
+
+NODES_TABLE = "kg_nodes"
+RELATIONS_TABLE = "kg_relations"
+
+NODE_COLUMNS = ("node_id", "node_type", "name", "properties", "tenant_id", "content_hash")
+RELATION_COLUMNS = (
+    "from_node",
+    "to_node",
+    "relation_type",
+    "properties",
+    "weight",
+    "tenant_id",
+    "content_hash",
+)
+
+# Tenant "global" é gravado como string vazia (NULL quebraria o ON CONFLICT)
+GLOBAL_TENANT = ""
+
+
+# =============================================================================
+# DIFF
+# =============================================================================
+
+
+def _hash(*parts: Any) -> str:
+    payload = json.dumps(parts, sort_keys=True, default=str, separators=(",", ":"))
+    return hashlib.blake2b(payload.encode("utf-8"), digest_size=16).hexdigest()
+
+
+def node_record(node: TWSNode) -> tuple:
+    """Converte TWSNode em registro para COPY (ordem de NODE_COLUMNS)."""
+    properties = json.dumps(node.properties, sort_keys=True, default=str)
+    return (
+        node.node_id,
+        node.node_type.value,
+        node.name,
+        properties,
+        node.tenant_id or GLOBAL_TENANT,
+        _hash(node.node_type.value, node.name, properties),
+    )
+
+
+def relation_record(relation: TWSRelation) -> tuple:
+    """Converte TWSRelation em registro para COPY (ordem de RELATION_COLUMNS)."""
+    properties = json.dumps(relation.properties, sort_keys=True, default=str)
+    return (
+        relation.from_node,
+        relation.to_node,
+        relation.relation_type.value,
+        properties,
+        float(relation.weight),
+        relation.tenant_id or GLOBAL_TENANT,
+        _hash(properties, relation.weight),
+    )
+
+
+@dataclass
+class GraphDiff:
+    """Diferença entre a expansão atual e a persistida."""
+
+    nodes_upsert: list[tuple] = field(default_factory=list)
+    relations_upsert: list[tuple] = field(default_factory=list)
+    relations_delete: list[tuple[str, str, str]] = field(default_factory=list)
+    nodes_unchanged: int = 0
+    relations_unchanged: int = 0
+
+    @property
+    def is_empty(self) -> bool:
+        return not (self.nodes_upsert or self.relations_upsert or self.relations_delete)
+
+
+def diff_graph(
+    nodes: list[TWSNode],
+    relations: list[TWSRelation],
+    previous_nodes: dict[str, str],
+    previous_relations: dict[tuple[str, str, str], str],
+    prune: bool = True,
+) -> GraphDiff:
+    """
+    Calcula o que precisa ser gravado.
+
+    Args:
+        nodes: Nós da expansão atual
+        relations: Relações da expansão atual
+        previous_nodes: node_id -> content_hash já persistido
+        previous_relations: (from, to, type) -> content_hash já persistido
+        prune: Remover relações persistidas ausentes da expansão atual
+            (apenas para expansões completas)
+
+    Returns:
+        GraphDiff com registros a gravar e relações a remover
+    """
+    diff = GraphDiff()
+
+    for node in nodes:
+        record = node_record(node)
+        if previous_nodes.get(record[0]) == record[-1]:
+            diff.nodes_unchanged += 1
+        else:
+            diff.nodes_upsert.append(record)
+
+    current_keys: set[tuple[str, str, str]] = set()
+    for relation in relations:
+        record = relation_record(relation)
+        key = record[:3]
+        current_keys.add(key)
+        if previous_relations.get(key) == record[-1]:
+            diff.relations_unchanged += 1
+        else:
+            diff.relations_upsert.append(record)
+
+    if prune:
+        diff.relations_delete = [key for key in previous_relations if key not in current_keys]
+    return diff
+
+
+# =============================================================================
+# STORE
+# =============================================================================
+
+
+class TWSGraphStore:
+    """Persistência set-based do grafo TWS em PostgreSQL."""
+
+    def __init__(self, db: Any):
+        """
+        Args:
+            db: asyncpg Connection/Pool ou SQLAlchemy AsyncSession
+        """
+        self.db = db
+
+    @asynccontextmanager
+    async def _connection(self):
+        """Resolve uma conexão asyncpg a partir do objeto de banco recebido."""
+        db = self.db
+        if hasattr(db, "copy_records_to_table"):
+            yield db
+        elif hasattr(db, "acquire"):
+            async with db.acquire() as conn:
+                yield conn
+        elif hasattr(db, "connection"):
+            # A transação asyncpg aberta dentro da sessão vira SAVEPOINT:
+            # o commit precisa ser feito na transação externa da sessão
+            sa_conn = await db.connection()
+            raw = await sa_conn.get_raw_connection()
+            try:
+                yield raw.driver_connection
+            except BaseException:
+                await db.rollback()
+                raise
+            await db.commit()
+        else:
+            raise TypeError(f"Unsupported database handle: {type(db).__name__}")
+
+    async def _load_hashes(
+        self, conn: Any, tenant_id: str
+    ) -> tuple[dict[str, str], dict[tuple[str, str, str], str]]:
+        node_rows = await conn.fetch(
+            f"SELECT node_id, content_hash FROM {NODES_TABLE} WHERE tenant_id = $1",
+            tenant_id,
+        )
+        relation_rows = await conn.fetch(
+            f"SELECT from_node, to_node, relation_type, content_hash "
+            f"FROM {RELATIONS_TABLE} WHERE tenant_id = $1",
+            tenant_id,
+        )
+        return (
+            {r["node_id"]: r["content_hash"] for r in node_rows},
+            {
+                (r["from_node"], r["to_node"], r["relation_type"]): r["content_hash"]
+                for r in relation_rows
+            },
+        )
+
+    async def sync(
+        self,
+        nodes: list[TWSNode],
+        relations: list[TWSRelation],
+        tenant_id: str | None = None,
+        prune: bool = True,
+    ) -> GraphDiff:
+        """
+        Sincroniza a expansão atual com o banco.
+
+        Args:
+            nodes: Nós da expansão
+            relations: Relações da expansão
+            tenant_id: Tenant da expansão (None = global)
+            prune: Remover relações que não existem mais no plano
+
+        Returns:
+            GraphDiff aplicado
+        """
+        tenant = tenant_id or GLOBAL_TENANT
+
+        async with self._connection() as conn:
+            previous_nodes, previous_relations = await self._load_hashes(conn, tenant)
+            diff = diff_graph(nodes, relations, previous_nodes, previous_relations, prune)
+
+            if diff.is_empty:
+                return diff
+
+            async with conn.transaction():
+                if diff.nodes_upsert:
+                    await self._merge_nodes(conn, diff.nodes_upsert)
+                if diff.relations_upsert:
+                    await self._merge_relations(conn, diff.relations_upsert)
+                if diff.relations_delete:
+                    await self._delete_relations(conn, tenant, diff.relations_delete)
+
+        return diff
+
+    async def _merge_nodes(self, conn: Any, records: list[tuple]) -> None:
+        await conn.execute(
+            "CREATE TEMP TABLE kg_nodes_stage "
+            f"(LIKE {NODES_TABLE} INCLUDING DEFAULTS) ON COMMIT DROP"
+        )
+        await conn.copy_records_to_table(
+            "kg_nodes_stage", records=records, columns=list(NODE_COLUMNS)
+        )
+        await conn.execute(
+            f"""
+            INSERT INTO {NODES_TABLE}
+                (node_id, node_type, name, properties, tenant_id, content_hash)
+            SELECT node_id, node_type, name, properties, tenant_id, content_hash
+            FROM kg_nodes_stage
+            ON CONFLICT (node_id, tenant_id) DO UPDATE SET
+                node_type = EXCLUDED.node_type,
+                name = EXCLUDED.name,
+                properties = EXCLUDED.properties,
+                content_hash = EXCLUDED.content_hash,
+                updated_at = NOW()
+            """
+        )
+
+    async def _merge_relations(self, conn: Any, records: list[tuple]) -> None:
+        await conn.execute(
+            "CREATE TEMP TABLE kg_relations_stage "
+            f"(LIKE {RELATIONS_TABLE} INCLUDING DEFAULTS) ON COMMIT DROP"
+        )
+        await conn.copy_records_to_table(
+            "kg_relations_stage", records=records, columns=list(RELATION_COLUMNS)
+        )
+        await conn.execute(
+            f"""
+            INSERT INTO {RELATIONS_TABLE}
+                (from_node, to_node, relation_type, properties, weight, tenant_id, content_hash)
+            SELECT from_node, to_node, relation_type, properties, weight, tenant_id, content_hash
+            FROM kg_relations_stage
+            ON CONFLICT (from_node, to_node, relation_type, tenant_id) DO UPDATE SET
+                properties = EXCLUDED.properties,
+                weight = EXCLUDED.weight,
+                content_hash = EXCLUDED.content_hash,
+                updated_at = NOW()
+            """
+        )
+
+    async def _delete_relations(
+        self, conn: Any, tenant: str, keys: list[tuple[str, str, str]]
+    ) -> None:
+        from_nodes, to_nodes, types = (list(col) for col in zip(*keys, strict=True))
+        await conn.execute(
+            f"""
+            DELETE FROM {RELATIONS_TABLE} r
+            USING unnest($1::text[], $2::text[], $3::text[]) AS d(from_node, to_node, relation_type)
+            WHERE r.tenant_id = $4
+              AND r.from_node = d.from_node
+              AND r.to_node = d.to_node
+              AND r.relation_type = d.relation_type
+            """,
+            from_nodes,
+            to_nodes,
+            types,
+            tenant,
+        )
+
+
+__all__ = [
+    "GraphDiff",
+    "TWSGraphStore",
+    "diff_graph",
+    "node_record",
+    "relation_record",
+]
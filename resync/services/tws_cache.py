@@ -11,6 +11,9 @@ Features:
 - Request coalescing (prevents API overload)
 - Transparency via _fetched_at timestamp
 - age_seconds calculation for UI feedback
+- Optional shared Redis tier (L2) so all workers reuse one fetch per key
+  per TTL, with pub/sub invalidation of every worker's in-process L1
+- Tags (job / job stream / workstation) for event-driven invalidation
 
 Usage:
     from resync.services.tws_cache import tws_cache, CacheCategory
@@ -18,19 +21,35 @@ Usage:
     @tws_cache(CacheCategory.JOB_STATUS)
     async def get_job_status(job_id: str) -> dict:
         return await tws_client.get_current_plan_job(job_id)
+
+    # Shared tier (at startup, one binary client per worker)
+    await get_tws_cache().enable_shared_tier(redis_client)
 """
 
 import asyncio
+import contextlib
 import hashlib
+import json
 import time
+import uuid
 from dataclasses import dataclass, field
 from datetime import datetime, timezone
 from enum import Enum
 from functools import wraps
-from typing import Any, Callable
+from typing import Any, Awaitable, Callable, Iterable
 
 import structlog
 
+from resync.core.cache_invalidation import TagIndex
+
+try:
+    import msgpack
+
+    MSGPACK_AVAILABLE = True
+except ImportError:
+    msgpack = None
+    MSGPACK_AVAILABLE = False
+
 logger = structlog.get_logger(__name__)
 
 
@@ -53,6 +72,64 @@ DEFAULT_TTLS: dict[CacheCategory, int] = {
     CacheCategory.DEFAULT: 60,
 }
 
+# Shared (Redis) tier
+SHARED_KEY_PREFIX = "tws_cache:"
+SHARED_LEASE_PREFIX = "tws_cache:lease:"
+INVALIDATION_CHANNEL = "tws_cache:invalidate"
+# Delete the lease only while it still holds this fetch's token
+RELEASE_LEASE_SCRIPT = """
+if redis.call("get", KEYS[1]) == ARGV[1] then
+  return redis.call("del", KEYS[1])
+else
+  return 0
+end
+"""
+
+# Cache keys that describe a single job's current state
+JOB_STATE_KEY_FORMATS = ("job_status:{}", "job_logs:{}")
+
+_FORMAT_JSON = b"\x00"
+_FORMAT_MSGPACK = b"\x01"
+
+# Tags of an entry, or a function deriving them from the fetched value
+TagSpec = Iterable[str] | Callable[[Any], Iterable[str]] | None
+
+
+def encode_shared_value(value: Any, fetched_at: float, tags: Iterable[str] = ()) -> bytes:
+    """
+    Encode a value, its fetch time and its tags for the shared tier.
+
+    msgpack when available (JSON otherwise), behind a 1-byte format tag so
+    workers with different optional libraries can read each other's entries.
+    """
+    data = [fetched_at, value, sorted(tags)]
+    if MSGPACK_AVAILABLE:
+        return _FORMAT_MSGPACK + msgpack.packb(data, default=str, use_bin_type=True)
+    return _FORMAT_JSON + json.dumps(data, default=str).encode("utf-8")
+
+
+def decode_shared_value(raw: bytes) -> tuple[Any, float, list[str]]:
+    """Decode a shared-tier entry into (value, fetched_at timestamp, tags)."""
+    fmt, payload = raw[:1], raw[1:]
+    if fmt == _FORMAT_MSGPACK:
+        if not MSGPACK_AVAILABLE:
+            raise ValueError("msgpack is required to decode this cache entry")
+        data = msgpack.unpackb(payload, raw=False, strict_map_key=False)
+    elif fmt == _FORMAT_JSON:
+        data = json.loads(payload.decode("utf-8"))
+    else:
+        raise ValueError(f"Unknown cache entry format {fmt!r}")
+    fetched_at, value, *rest = data
+    return value, fetched_at, rest[0] if rest else []
+
+
+def _resolve_tags(tags: TagSpec, value: Any) -> list[str]:
+    if tags is None:
+        return []
+    if callable(tags):
+        return list(tags(value))
+    return list(tags)
+
 
 @dataclass
 class CacheEntry:
@@ -82,22 +159,35 @@ class CacheStats:
     hits: int = 0
     misses: int = 0
     evictions: int = 0
+    coalesced: int = 0
+    shared_hits: int = 0
+    shared_errors: int = 0
+    remote_waits: int = 0
+    invalidations: int = 0
 
     @property
     def hit_rate(self) -> float:
-        total = self.hits + self.misses
-        return self.hits / total if total > 0 else 0.0
+        total = self.hits + self.shared_hits + self.misses
+        return (self.hits + self.shared_hits) / total if total > 0 else 0.0
 
 
 class TWSAPICache:
     """
-    In-memory async cache with TTL differentiation.
+    Two-level async cache with TTL differentiation.
 
     Designed for TWS API caching with:
     - Different TTLs per data category
     - _fetched_at injection for transparency
-    - Request coalescing via locks
+    - Request coalescing via shared in-flight fetches
+    - Optional Redis L2 shared by all workers (see enable_shared_tier)
+    - Tag index for event-driven invalidation (see invalidate_tags)
     - Cache statistics
+
+    The in-process dict is the L1. With the shared tier enabled, L1 misses
+    are read from Redis (entries keep their original fetch time, so the
+    age and expiry are the same in every worker), concurrent misses across
+    workers are serialized by a short lease, and invalidations are
+    broadcast so every worker evicts its L1 copy at once.
     """
 
     _instance: "TWSAPICache | None" = None
@@ -113,9 +203,19 @@ class TWSAPICache:
             return
 
         self._cache: dict[str, CacheEntry] = {}
-        self._locks: dict[str, asyncio.Lock] = {}
+        self._tags = TagIndex()
+        self._in_flight: dict[str, asyncio.Task] = {}
+        # In-flight fetches started before an invalidation: never cached
+        self._stale_fetches: set[asyncio.Task] = set()
         self._stats = CacheStats()
         self._ttls = DEFAULT_TTLS.copy()
+
+        # Shared tier (disabled until enable_shared_tier)
+        self._redis: Any | None = None
+        self._listener_task: asyncio.Task | None = None
+        self._lease_ms = 5000
+        self._lease_wait_seconds = 2.0
+        self._instance_id = uuid.uuid4().hex
         self._initialized = True
 
         logger.info("tws_api_cache_initialized", ttls=self._ttls)
@@ -157,59 +257,138 @@ class TWSAPICache:
         category: CacheCategory = CacheCategory.DEFAULT,
     ) -> tuple[Any, bool, float] | None:
         """
-        Get value from cache.
+        Get value from cache (L1, then the shared tier).
 
         Returns:
             Tuple of (value, is_cached, age_seconds) or None if not found/expired
         """
+        return (await self.get_many([key], category))[0]
+
+    async def get_many(
+        self,
+        keys: list[str],
+        category: CacheCategory = CacheCategory.DEFAULT,
+    ) -> list[tuple[Any, bool, float] | None]:
+        """
+        Get several values in one call.
+
+        L1 misses are read from the shared tier with a single MGET.
+
+        Returns:
+            One (value, is_cached, age_seconds) or None per key, in order
+        """
+        results = [self._lookup(key) for key in keys]
+        missing = [i for i, result in enumerate(results) if result is None]
+
+        if missing and self._redis is not None:
+            raws = await self._shared_mget([keys[i] for i in missing])
+            for i, raw in zip(missing, raws):
+                if raw is not None:
+                    results[i] = self._promote(keys[i], raw, category)
+
+        for result in results:
+            if result is None:
+                self._stats.misses += 1
+        return results
+
+    def _lookup(self, key: str) -> tuple[Any, bool, float] | None:
         entry = self._cache.get(key)
 
         if entry is None:
-            self._stats.misses += 1
             return None
 
         if entry.is_expired:
-            self._stats.misses += 1
             self._stats.evictions += 1
             del self._cache[key]
+            self._tags.discard(key)
             return None
 
         self._stats.hits += 1
         return entry.value, True, entry.age_seconds
 
+    def _promote(
+        self, key: str, raw: bytes, category: CacheCategory
+    ) -> tuple[Any, bool, float] | None:
+        """Copy a shared-tier entry into L1, keeping its original fetch time."""
+        try:
+            value, fetched_ts, tags = decode_shared_value(raw)
+        except Exception as e:
+            self._stats.shared_errors += 1
+            logger.warning("tws_cache_shared_decode_failed", key=key, error=str(e))
+            return None
+
+        entry = CacheEntry(
+            value=value,
+            fetched_at=datetime.fromtimestamp(fetched_ts, timezone.utc),
+            category=category,
+            ttl=self._get_ttl(category),
+        )
+        if entry.is_expired:
+            return None
+
+        self._cache[key] = entry
+        self._tags.add(key, tags)
+        self._stats.shared_hits += 1
+        return entry.value, True, entry.age_seconds
+
     async def set(
         self,
         key: str,
         value: Any,
         category: CacheCategory = CacheCategory.DEFAULT,
+        tags: Iterable[str] | None = None,
     ):
-        """Set value in cache with metadata injection."""
+        """
+        Set value in cache with metadata injection.
+
+        Args:
+            tags: Tags to invalidate the entry by (see invalidate_tags)
+        """
+        tags = list(tags or ())
         # Inject _fetched_at for transparency
         if isinstance(value, dict):
             value = value.copy()
             value["_fetched_at"] = datetime.now(timezone.utc).isoformat()
 
         ttl = self._get_ttl(category)
+        fetched_at = datetime.now(timezone.utc)
 
         self._cache[key] = CacheEntry(
             value=value,
-            fetched_at=datetime.now(timezone.utc),
+            fetched_at=fetched_at,
             category=category,
             ttl=ttl,
         )
+        self._tags.add(key, tags)
+
+        if self._redis is not None:
+            try:
+                await self._redis.set(
+                    SHARED_KEY_PREFIX + key,
+                    encode_shared_value(value, fetched_at.timestamp(), tags),
+                    ex=ttl,
+                )
+            except Exception as e:
+                self._stats.shared_errors += 1
+                logger.warning("tws_cache_shared_set_failed", key=key, error=str(e))
 
     async def get_or_fetch(
         self,
         key: str,
         fetch_func: Callable,
         category: CacheCategory = CacheCategory.DEFAULT,
+        tags: TagSpec = None,
     ) -> tuple[Any, bool, float]:
         """
         Get from cache or fetch and cache.
 
-        Uses locking for request coalescing - if multiple requests come in
-        for the same key while a fetch is in progress, they all wait for
-        the same result instead of making duplicate API calls.
+        Request coalescing: concurrent misses for the same key share one
+        in-flight fetch (and its result or error) instead of making duplicate
+        API calls.
+
+        Args:
+            tags: Tags of the entry, or a function deriving them from the
+                fetched value
 
         Returns:
             Tuple of (value, is_cached, age_seconds)
@@ -219,31 +398,335 @@ class TWSAPICache:
         if result is not None:
             return result
 
-        # Get or create lock for this key
-        if key not in self._locks:
-            self._locks[key] = asyncio.Lock()
+        value = await self._fetch_shared(key, fetch_func, category, tags)
+        return value, False, 0.0
+
+    async def get_or_fetch_many(
+        self,
+        fetchers: dict[str, Callable[[], Awaitable[Any]]],
+        category: CacheCategory = CacheCategory.DEFAULT,
+        max_concurrency: int = 10,
+        tags: dict[str, TagSpec] | None = None,
+    ) -> dict[str, tuple[Any, bool, float] | BaseException]:
+        """
+        Batch get_or_fetch: one multi-get, then only the misses are fetched
+        concurrently (at most max_concurrency at a time, coalesced with any
+        in-flight fetch of the same key).
+
+        Args:
+            fetchers: Cache key -> fetch function for that key
+            category: Cache category (TTL)
+            max_concurrency: Max concurrent fetches for this batch
+            tags: Cache key -> tags of that entry (see get_or_fetch)
+
+        Returns:
+            Cache key -> (value, is_cached, age_seconds), or the exception
+            raised by that key's fetch
+        """
+        keys = list(fetchers)
+        results: dict[str, tuple[Any, bool, float] | BaseException] = {}
+        misses: list[str] = []
+        for key, cached in zip(keys, await self.get_many(keys, category)):
+            if cached is None:
+                misses.append(key)
+            else:
+                results[key] = cached
+
+        if misses:
+            semaphore = asyncio.Semaphore(max_concurrency)
+
+            async def load(key: str) -> tuple[Any, bool, float]:
+                async with semaphore:
+                    value = await self._fetch_shared(
+                        key, fetchers[key], category, (tags or {}).get(key)
+                    )
+                    return value, False, 0.0
+
+            fetched = await asyncio.gather(*(load(key) for key in misses), return_exceptions=True)
+            results.update(zip(misses, fetched))
+
+        return results
+
+    async def _fetch_shared(
+        self, key: str, fetch_func: Callable, category: CacheCategory, tags: TagSpec = None
+    ) -> Any:
+        """Fetch and cache a key, joining an in-flight fetch if there is one."""
+        task = self._in_flight.get(key)
+        if task is None:
+            task = asyncio.create_task(self._fetch_and_set(key, fetch_func, category, tags))
+            self._in_flight[key] = task
+            task.add_done_callback(lambda t, k=key: self._release(k, t))
+        else:
+            self._stats.coalesced += 1
+
+        # A cancelled caller must not cancel the fetch other callers share
+        return await asyncio.shield(task)
+
+    async def _fetch_and_set(
+        self, key: str, fetch_func: Callable, category: CacheCategory, tags: TagSpec
+    ) -> Any:
+        if self._redis is not None:
+            return await self._fetch_with_lease(key, fetch_func, category, tags)
+        value = await fetch_func()
+        await self._set_if_current(key, value, category, tags)
+        return value
+
+    async def _set_if_current(
+        self, key: str, value: Any, category: CacheCategory, tags: TagSpec
+    ) -> None:
+        """Cache a fetched value unless the key was invalidated during the fetch."""
+        if asyncio.current_task() in self._stale_fetches:
+            logger.debug("tws_cache_stale_fetch_discarded", key=key)
+            return
+        await self.set(key, value, category, _resolve_tags(tags, value))
+
+    async def _fetch_with_lease(
+        self, key: str, fetch_func: Callable, category: CacheCategory, tags: TagSpec
+    ) -> Any:
+        """
+        Fetch a key once for the whole fleet.
 
-        async with self._locks[key]:
-            # Double-check after acquiring lock (another request might have fetched)
-            result = await self.get(key, category)
-            if result is not None:
-                return result
+        The worker that takes the lease fetches and writes the shared tier;
+        the others poll the shared tier until the value appears, the lease
+        is released (leader failed) or the wait times out, and only then
+        fetch themselves.
+        """
+        lease_key = SHARED_LEASE_PREFIX + key
+        token = uuid.uuid4().hex
+        try:
+            leader = await self._redis.set(lease_key, token, nx=True, px=self._lease_ms)
+        except Exception as e:
+            self._stats.shared_errors += 1
+            logger.warning("tws_cache_lease_failed", key=key, error=str(e))
+            leader = True
+            lease_key = None
+
+        if not leader:
+            self._stats.remote_waits += 1
+            shared = await self._wait_for_shared(key, lease_key, category)
+            if shared is not None:
+                return shared[0]
+
+        try:
+            value = await fetch_func()
+            await self._set_if_current(key, value, category, tags)
+            return value
+        finally:
+            if leader and lease_key is not None:
+                # Best effort: an expired lease only costs one extra fetch.
+                # Compare-and-delete: after expiry the lease may be another fetch's
+                with contextlib.suppress(Exception):
+                    await self._redis.eval(RELEASE_LEASE_SCRIPT, 1, lease_key, token)
+
+    async def _wait_for_shared(
+        self, key: str, lease_key: str, category: CacheCategory
+    ) -> tuple[Any, bool, float] | None:
+        loop = asyncio.get_running_loop()
+        deadline = loop.time() + self._lease_wait_seconds
+        try:
+            while loop.time() < deadline:
+                await asyncio.sleep(0.05)
+                raw = await self._redis.get(SHARED_KEY_PREFIX + key)
+                if raw is not None:
+                    return self._promote(key, raw, category)
+                if not await self._redis.exists(lease_key):
+                    return None
+        except Exception as e:
+            self._stats.shared_errors += 1
+            logger.warning("tws_cache_shared_wait_failed", key=key, error=str(e))
+        return None
+
+    def _release(self, key: str, task: asyncio.Task) -> None:
+        if self._in_flight.get(key) is task:
+            del self._in_flight[key]
+        self._stale_fetches.discard(task)
+        if not task.cancelled():
+            # Mark the exception retrieved even if every caller went away
+            task.exception()
+
+    # =========================================================================
+    # SHARED TIER
+    # =========================================================================
+
+    async def enable_shared_tier(
+        self,
+        redis_client: Any,
+        listen: bool = True,
+        lease_ms: int = 5000,
+        lease_wait_seconds: float = 2.0,
+    ) -> None:
+        """
+        Use Redis as a shared L2 behind the in-process L1.
+
+        Args:
+            redis_client: Async Redis client created with decode_responses=False
+            listen: Subscribe to invalidations from other workers
+            lease_ms: Lifetime of the per-key fetch lease
+            lease_wait_seconds: Max time a worker waits for another worker's fetch
+        """
+        await self.disable_shared_tier()
+        self._redis = redis_client
+        self._lease_ms = lease_ms
+        self._lease_wait_seconds = lease_wait_seconds
+        if listen:
+            self._listener_task = asyncio.create_task(
+                self._listen_invalidations(), name="tws-cache-invalidations"
+            )
+        logger.info("tws_cache_shared_tier_enabled", listen=listen, msgpack=MSGPACK_AVAILABLE)
+
+    async def disable_shared_tier(self) -> None:
+        """Stop using the shared tier and stop listening for invalidations."""
+        if self._listener_task is not None:
+            self._listener_task.cancel()
+            with contextlib.suppress(asyncio.CancelledError):
+                await self._listener_task
+            self._listener_task = None
+        self._redis = None
+
+    @property
+    def shared_tier_enabled(self) -> bool:
+        """Whether the Redis tier is in use."""
+        return self._redis is not None
+
+    async def _shared_mget(self, keys: list[str]) -> list[bytes | None]:
+        try:
+            return await self._redis.mget([SHARED_KEY_PREFIX + key for key in keys])
+        except Exception as e:
+            self._stats.shared_errors += 1
+            logger.warning("tws_cache_shared_get_failed", keys=len(keys), error=str(e))
+            return [None] * len(keys)
+
+    async def invalidate(self, keys: list[str]) -> int:
+        """
+        Evict keys from every worker.
+
+        Deletes the keys locally and in the shared tier, then broadcasts them
+        so other workers evict their L1 copies.
+
+        Returns:
+            Number of keys evicted from this worker's L1
+        """
+        if not keys:
+            return 0
+
+        evicted = self._evict_local(keys)
+        if self._redis is not None:
+            try:
+                await self._redis.delete(*self._shared_keys(keys))
+                await self._publish_invalidation(keys=keys)
+            except Exception as e:
+                self._stats.shared_errors += 1
+                logger.warning("tws_cache_invalidation_publish_failed", error=str(e))
+        return evicted
+
+    async def invalidate_tags(self, tags: list[str]) -> int:
+        """
+        Evict every entry carrying any of the tags, in every worker.
+
+        Workers evict the keys they have filed under the tags, so entries
+        that only exist in another worker's L1 are evicted too.
+
+        Returns:
+            Number of keys evicted from this worker's L1
+        """
+        if not tags:
+            return 0
+
+        keys = sorted(self._tags.keys_for(tags))
+        # The tags of an in-flight fetch are unknown until its value arrives
+        evicted = self._evict_local(keys, all_in_flight=True)
+        if self._redis is not None:
+            try:
+                if keys:
+                    await self._redis.delete(*self._shared_keys(keys))
+                await self._publish_invalidation(keys=keys, tags=list(tags))
+            except Exception as e:
+                self._stats.shared_errors += 1
+                logger.warning("tws_cache_invalidation_publish_failed", error=str(e))
+        return evicted
+
+    @staticmethod
+    def _shared_keys(keys: list[str]) -> list[str]:
+        # A lease taken before the invalidation only guards a stale fetch:
+        # drop it too, so the next fetch does not wait for that one
+        return [prefix + key for key in keys for prefix in (SHARED_KEY_PREFIX, SHARED_LEASE_PREFIX)]
+
+    async def _publish_invalidation(
+        self, keys: list[str], tags: list[str] | None = None
+    ) -> None:
+        message = {"origin": self._instance_id, "keys": keys, "tags": tags or []}
+        await self._redis.publish(INVALIDATION_CHANNEL, encode_shared_value(message, time.time()))
+
+    async def invalidate_jobs(self, job_ids: list[str]) -> int:
+        """Evict the cached status and logs of jobs from every worker."""
+        return await self.invalidate(
+            [fmt.format(job_id) for job_id in job_ids for fmt in JOB_STATE_KEY_FORMATS]
+        )
 
-            # Fetch fresh data
+    def _evict_local(self, keys: list[str], all_in_flight: bool = False) -> int:
+        # Fetches already running may return pre-invalidation data: detach them
+        # so they are not cached and later callers start a fresh fetch
+        for key in list(self._in_flight) if all_in_flight else keys:
+            task = self._in_flight.pop(key, None)
+            if task is not None:
+                self._stale_fetches.add(task)
+
+        evicted = 0
+        for key in keys:
+            self._tags.discard(key)
+            if self._cache.pop(key, None) is not None:
+                evicted += 1
+        self._stats.invalidations += evicted
+        return evicted
+
+    async def _listen_invalidations(self) -> None:
+        """Evict keys invalidated by other workers, reconnecting on errors."""
+        while True:
+            pubsub = None
             try:
-                value = await fetch_func()
-                await self.set(key, value, category)
-                return value, False, 0.0
+                pubsub = self._redis.pubsub()
+                await pubsub.subscribe(INVALIDATION_CHANNEL)
+                while True:
+                    message = await pubsub.get_message(
+                        ignore_subscribe_messages=True, timeout=1.0
+                    )
+                    if message is None or message.get("type") != "message":
+                        continue
+                    try:
+                        payload, _, _ = decode_shared_value(message["data"])
+                    except Exception as e:
+                        logger.warning("tws_cache_invalidation_decode_failed", error=str(e))
+                        continue
+                    if payload.get("origin") != self._instance_id:
+                        await self._apply_remote_invalidation(payload)
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                self._stats.shared_errors += 1
+                logger.warning("tws_cache_invalidation_listener_error", error=str(e))
+                await asyncio.sleep(1.0)
             finally:
-                # Clean up lock if no longer needed
-                if key in self._locks:
-                    del self._locks[key]
+                if pubsub is not None:
+                    with contextlib.suppress(Exception):
+                        await pubsub.unsubscribe(INVALIDATION_CHANNEL)
+                        await pubsub.aclose()
+
+    async def _apply_remote_invalidation(self, payload: dict[str, Any]) -> None:
+        tags = payload.get("tags") or []
+        tagged = self._tags.keys_for(tags)
+        self._evict_local([*payload.get("keys", []), *tagged], all_in_flight=bool(tags))
+        # Shared entries this worker wrote but the publisher never saw
+        tagged.difference_update(payload.get("keys", []))
+        if tagged:
+            await self._redis.delete(*(SHARED_KEY_PREFIX + key for key in tagged))
 
     def clear(self):
-        """Clear all cache entries."""
+        """Clear all cache entries (this worker's L1)."""
         count = len(self._cache)
         self._cache.clear()
-        self._locks.clear()
+        self._tags.clear()
+        self._stale_fetches.update(self._in_flight.values())
+        self._in_flight.clear()
         logger.info("tws_cache_cleared", entries_cleared=count)
 
     def get_stats(self) -> dict[str, Any]:
@@ -260,7 +743,16 @@ class TWSAPICache:
             "hits": self._stats.hits,
             "misses": self._stats.misses,
             "evictions": self._stats.evictions,
+            "coalesced": self._stats.coalesced,
             "hit_rate": round(self._stats.hit_rate, 3),
+            "tagged_entries": len(self._tags),
+            "shared_tier": {
+                "enabled": self._redis is not None,
+                "hits": self._stats.shared_hits,
+                "errors": self._stats.shared_errors,
+                "remote_waits": self._stats.remote_waits,
+                "invalidations": self._stats.invalidations,
+            },
             "ttls": {k.value: v for k, v in self._ttls.items()},
         }
 
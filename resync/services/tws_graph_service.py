@@ -6,7 +6,8 @@ Replaces persistent graph storage with fresh data from source of truth.
 
 Features:
 - On-demand graph construction from TWS API
-- In-memory caching with configurable TTL
+- In-memory caching with configurable TTL, evicted early by job /
+  job stream tags on TWS change events (see resync.core.cache_invalidation)
 - Critical path analysis
 - Impact analysis
 - Betweenness centrality for bottleneck detection
@@ -43,6 +44,8 @@ from typing import Any
 import networkx as nx
 import structlog
 
+from resync.core.cache_invalidation import TagIndex, job_tag, jobstream_tag
+
 logger = structlog.get_logger(__name__)
 
 
@@ -87,6 +90,7 @@ class TwsGraphService:
         self.cache_ttl = cache_ttl
         self.max_depth = max_depth
         self._cache: dict[str, GraphCacheEntry] = {}
+        self._tags = TagIndex()
 
         logger.info(
             "tws_graph_service_initialized",
@@ -141,6 +145,7 @@ class TwsGraphService:
             created_at=time.time(),
             scope=f"job:{job_id}",
         )
+        self._tags.add(cache_key, [job_tag(str(node)) for node in graph.nodes])
 
         logger.info(
             "graph_built_from_api",
@@ -269,6 +274,7 @@ class TwsGraphService:
             created_at=time.time(),
             scope=f"jobstream:{jobstream_id}",
         )
+        self._tags.add(cache_key, [jobstream_tag(str(node)) for node in graph.nodes])
 
         return graph
 
@@ -448,8 +454,24 @@ class TwsGraphService:
         """Clear the graph cache."""
         count = len(self._cache)
         self._cache.clear()
+        self._tags.clear()
         logger.info("graph_cache_cleared", entries_cleared=count)
 
+    async def invalidate_tags(self, tags: list[str]) -> int:
+        """
+        Evict cached graphs containing any tagged job or job stream.
+
+        Returns:
+            Number of graphs evicted
+        """
+        evicted = 0
+        for cache_key in self._tags.pop_keys(tags):
+            if self._cache.pop(cache_key, None) is not None:
+                evicted += 1
+        if evicted:
+            logger.debug("graph_cache_invalidated", tags=tags, evicted=evicted)
+        return evicted
+
     def get_cache_stats(self) -> dict[str, Any]:
         """Get cache statistics."""
         now = time.time()
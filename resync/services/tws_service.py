@@ -14,14 +14,16 @@ v5.9.3: Added TTL-differentiated caching:
 - Graph dependencies: 5min
 
 Cache injects _fetched_at for UI transparency.
+
+Requests go through TWSTransport (pool limits, HTTP/2, coalescing of
+identical in-flight reads, per-endpoint concurrency limits, SLO metrics).
 """
 
-import time
+import asyncio
+from collections.abc import Awaitable, Callable
 from datetime import datetime, timezone
 from typing import Any
 
-import httpx
-
 try:
     # Optional import for automatic OpenTelemetry instrumentation of httpx
     from opentelemetry.instrumentation.httpx import HTTPXClientInstrumentor
@@ -31,34 +33,34 @@ except Exception as _e:
     # Instrumentation is optional; if it fails, continue without it
     pass
 
+from resync.core.cache_invalidation import (
+    PLAN_JOBS_TAG,
+    job_payload_tags,
+    job_tag,
+    workstation_tag,
+)
 from resync.core.metrics_compat import Counter, Histogram
 from resync.services.tws_cache import (
     CacheCategory,
     enrich_response_with_cache_meta,
     get_tws_cache,
 )
+from resync.services.tws_transport import TWSTransport, TWSTransportConfig
 
 
 class OptimizedTWSClient:
     """
     A lightweight asynchronous client for the TWS/HWA REST API.
 
-    It wraps an httpx.AsyncClient and exposes convenient methods for common
-    read‑only operations. All requests funnel through a single `_get` method
-    which records request latency and counts by endpoint and status code.
+    It wraps a TWSTransport and exposes convenient methods for common
+    read‑only operations. All requests funnel through a single `_get` method;
+    the transport records request latency and counts by endpoint and status
+    code.
     """
 
-    # Prometheus metrics shared across all client instances
-    _request_latency: Histogram = Histogram(
-        "tws_request_latency_seconds",
-        "Latency of TWS API requests",
-        ["endpoint"],
-    )
-    _request_count: Counter = Counter(
-        "tws_request_total",
-        "Total number of TWS API requests",
-        ["endpoint", "status"],
-    )
+    # Prometheus metrics shared across all client instances (owned by the transport)
+    _request_latency: Histogram = TWSTransport._request_latency
+    _request_count: Counter = TWSTransport._request_count
 
     def __init__(
         self,
@@ -68,6 +70,8 @@ class OptimizedTWSClient:
         engine_name: str,
         engine_owner: str,
         trust_env: bool = False,
+        transport_config: TWSTransportConfig | None = None,
+        transport: TWSTransport | None = None,
     ) -> None:
         """
         Construct the TWS client.
@@ -81,24 +85,30 @@ class OptimizedTWSClient:
             trust_env: If True, use system proxy settings from environment variables.
                        Set to True in corporate environments that require proxy access.
                        Default is False to avoid requiring optional dependencies like socksio.
+                       Ignored when transport_config is given.
+            transport_config: Pool/HTTP2/concurrency/SLO settings for the transport
+            transport: Shared transport to use instead of creating one
         """
         self.base_url = base_url.rstrip("/")
         self.auth = (username, password)
         self.engine_name = engine_name
         self.engine_owner = engine_owner
-        # httpx client with a base URL and basic authentication. Connection pooling
-        # is automatically handled by httpx.AsyncClient.
-        self.client = httpx.AsyncClient(
-            base_url=self.base_url,
+        self.transport = transport or TWSTransport(
+            self.base_url,
             auth=self.auth,
-            trust_env=trust_env,
+            config=transport_config or TWSTransportConfig(trust_env=trust_env),
         )
+        self.client = self.transport.client
         # v5.9.3: TTL-differentiated cache
         self._cache = get_tws_cache()
 
     async def close(self) -> None:
-        """Close the underlying httpx client."""
-        await self.client.aclose()
+        """Close the underlying transport."""
+        await self.transport.close()
+
+    def get_transport_stats(self) -> dict[str, Any]:
+        """Get transport state and per-endpoint latency/SLO report."""
+        return self.transport.get_stats()
 
     # -------------------------------------------------------------------------
     # Cache Management (v5.9.3)
@@ -132,7 +142,8 @@ class OptimizedTWSClient:
         params: dict[str, Any] | None = None,
     ) -> Any:
         """
-        Internal helper for GET requests with metrics.
+        Internal helper for GET requests (coalesced, limited and measured
+        by the transport).
 
         Args:
             path: The path portion of the URL (should begin with '/')
@@ -145,25 +156,7 @@ class OptimizedTWSClient:
             httpx.HTTPStatusError: For non‑2xx responses.
             httpx.RequestError: For network errors.
         """
-        endpoint_label = path.lstrip("/").replace("/", "_") or "root"
-        start = time.perf_counter()
-        try:
-            response = await self.client.get(path, params=params)
-            elapsed = time.perf_counter() - start
-            # Record metrics
-            self._request_latency.labels(endpoint=endpoint_label).observe(elapsed)
-            self._request_count.labels(
-                endpoint=endpoint_label, status=str(response.status_code)
-            ).inc()
-            response.raise_for_status()
-            # Parse JSON (httpx will raise if the body isn't valid JSON)
-            return response.json()
-        except Exception as _e:
-            elapsed = time.perf_counter() - start
-            # Record error in metrics
-            self._request_latency.labels(endpoint=endpoint_label).observe(elapsed)
-            self._request_count.labels(endpoint=endpoint_label, status="error").inc()
-            raise
+        return await self.transport.get_json(path, params=params)
 
     # ---------------------------------------------------------------------
     # Engine & Configuration
@@ -445,15 +438,11 @@ class OptimizedTWSClient:
             Job status dict with _fetched_at timestamp
             If with_meta=True: {data: {...}, meta: {cached, age_seconds, freshness}}
         """
-        cache_key = f"job_status:{job_id}"
-
-        async def fetch():
-            data = await self.get_current_plan_job(job_id)
-            data["_fetched_at"] = datetime.now(timezone.utc).isoformat()
-            return data
-
         value, is_cached, age = await self._cache.get_or_fetch(
-            cache_key, fetch, CacheCategory.JOB_STATUS
+            f"job_status:{job_id}",
+            lambda: self._fetch_job_status(job_id),
+            CacheCategory.JOB_STATUS,
+            tags=lambda data: job_payload_tags(job_id, data),
         )
 
         if with_meta:
@@ -471,16 +460,11 @@ class OptimizedTWSClient:
         Returns:
             Job logs with _fetched_at timestamp
         """
-        cache_key = f"job_logs:{job_id}"
-
-        async def fetch():
-            data = await self.get_current_plan_job_joblog()
-            if isinstance(data, dict):
-                data["_fetched_at"] = datetime.now(timezone.utc).isoformat()
-            return data
-
         value, is_cached, age = await self._cache.get_or_fetch(
-            cache_key, fetch, CacheCategory.JOB_LOGS
+            f"job_logs:{job_id}",
+            lambda: self._fetch_job_logs(job_id),
+            CacheCategory.JOB_LOGS,
+            tags=[job_tag(job_id)],
         )
 
         if with_meta:
@@ -499,26 +483,41 @@ class OptimizedTWSClient:
         Returns:
             Dict with predecessors and successors
         """
-        cache_key = f"job_deps:{job_id}:d{depth}"
-
-        async def fetch():
-            preds = await self.get_current_plan_job_predecessors(job_id, depth)
-            succs = await self.get_current_plan_job_successors(job_id, depth)
-            return {
-                "job_id": job_id,
-                "predecessors": preds or [],
-                "successors": succs or [],
-                "_fetched_at": datetime.now(timezone.utc).isoformat(),
-            }
-
         value, is_cached, age = await self._cache.get_or_fetch(
-            cache_key, fetch, CacheCategory.GRAPH
+            f"job_deps:{job_id}:d{depth}",
+            lambda: self._fetch_job_dependencies(job_id, depth),
+            CacheCategory.GRAPH,
+            tags=_dependency_tags,
         )
 
         if with_meta:
             return enrich_response_with_cache_meta(value, is_cached, age)
         return value
 
+    async def _fetch_job_status(self, job_id: str) -> Any:
+        data = await self.get_current_plan_job(job_id)
+        data["_fetched_at"] = datetime.now(timezone.utc).isoformat()
+        return data
+
+    async def _fetch_job_logs(self, job_id: str) -> Any:
+        data = await self.get_current_plan_job_joblog()
+        if isinstance(data, dict):
+            data["_fetched_at"] = datetime.now(timezone.utc).isoformat()
+        return data
+
+    async def _fetch_job_dependencies(self, job_id: str, depth: int) -> dict[str, Any]:
+        # Predecessors and successors are independent lookups
+        preds, succs = await asyncio.gather(
+            self.get_current_plan_job_predecessors(job_id, depth),
+            self.get_current_plan_job_successors(job_id, depth),
+        )
+        return {
+            "job_id": job_id,
+            "predecessors": preds or [],
+            "successors": succs or [],
+            "_fetched_at": datetime.now(timezone.utc).isoformat(),
+        }
+
     async def get_jobdefinition_cached(
         self,
         jobdef_id: str,
@@ -566,7 +565,10 @@ class OptimizedTWSClient:
             return data
 
         value, is_cached, age = await self._cache.get_or_fetch(
-            cache_key, fetch, CacheCategory.STATIC_STRUCTURE
+            cache_key,
+            fetch,
+            CacheCategory.STATIC_STRUCTURE,
+            tags=[workstation_tag(workstation_id)],
         )
 
         if with_meta:
@@ -598,19 +600,164 @@ class OptimizedTWSClient:
             }
 
         value, is_cached, age = await self._cache.get_or_fetch(
-            cache_key, fetch, CacheCategory.JOB_STATUS
+            cache_key, fetch, CacheCategory.JOB_STATUS, tags=[PLAN_JOBS_TAG]
         )
 
         if with_meta:
             return enrich_response_with_cache_meta(value, is_cached, age)
         return value
 
+    # =========================================================================
+    # BATCH METHODS
+    # =========================================================================
+    # One multi-get against the cache, then only the misses are fetched
+    # concurrently (bounded by max_concurrency). Results keep the order of
+    # job_ids and always carry {data, meta}; a failed lookup has data=None
+    # and an "error" field instead of failing the whole batch.
+
+    async def _get_batch_cached(
+        self,
+        job_ids: list[str],
+        key_format: str,
+        fetch_one: Callable[[str], Awaitable[Any]],
+        category: CacheCategory,
+        max_concurrency: int,
+        tags_for: Callable[[str], Any],
+    ) -> list[dict[str, Any]]:
+        keys = [key_format.format(job_id) for job_id in job_ids]
+        results = await self._cache.get_or_fetch_many(
+            {key: (lambda job_id=job_id: fetch_one(job_id)) for key, job_id in zip(keys, job_ids)},
+            category,
+            max_concurrency=max_concurrency,
+            tags={key: tags_for(job_id) for key, job_id in zip(keys, job_ids)},
+        )
+
+        batch = []
+        for job_id, key in zip(job_ids, keys):
+            result = results[key]
+            if isinstance(result, BaseException):
+                item = enrich_response_with_cache_meta(None)
+                item["error"] = str(result)
+            else:
+                item = enrich_response_with_cache_meta(*result)
+            item["job_id"] = job_id
+            batch.append(item)
+        return batch
+
+    async def get_job_status_batch(
+        self,
+        job_ids: list[str],
+        max_concurrency: int = 10,
+    ) -> list[dict[str, Any]]:
+        """
+        Get the status of several jobs (10-second cache).
+
+        Returns:
+            One {job_id, data, meta[, error]} per job id, in order
+        """
+        return await self._get_batch_cached(
+            job_ids,
+            "job_status:{}",
+            self._fetch_job_status,
+            CacheCategory.JOB_STATUS,
+            max_concurrency,
+            lambda job_id: lambda data: job_payload_tags(job_id, data),
+        )
+
+    async def get_job_logs_batch(
+        self,
+        job_ids: list[str],
+        max_concurrency: int = 10,
+    ) -> list[dict[str, Any]]:
+        """
+        Get the logs of several jobs (30-second cache).
+
+        Returns:
+            One {job_id, data, meta[, error]} per job id, in order
+        """
+        return await self._get_batch_cached(
+            job_ids,
+            "job_logs:{}",
+            self._fetch_job_logs,
+            CacheCategory.JOB_LOGS,
+            max_concurrency,
+            lambda job_id: [job_tag(job_id)],
+        )
+
+    async def get_job_dependencies_batch(
+        self,
+        job_ids: list[str],
+        depth: int = 1,
+        max_concurrency: int = 10,
+    ) -> list[dict[str, Any]]:
+        """
+        Get the dependencies of several jobs (5-minute cache).
+
+        Returns:
+            One {job_id, data, meta[, error]} per job id, in order
+        """
+        return await self._get_batch_cached(
+            job_ids,
+            f"job_deps:{{}}:d{depth}",
+            lambda job_id: self._fetch_job_dependencies(job_id, depth),
+            CacheCategory.GRAPH,
+            max_concurrency,
+            lambda job_id: _dependency_tags,
+        )
+
+    async def get_job_details_batch(
+        self,
+        job_ids: list[str],
+        include_logs: bool = True,
+        include_dependencies: bool = False,
+        depth: int = 1,
+        max_concurrency: int = 10,
+    ) -> list[dict[str, Any]]:
+        """
+        Get status (and optionally logs and dependencies) of several jobs.
+
+        The status, logs and dependency batches run concurrently.
+
+        Returns:
+            One {job_id, status[, logs][, dependencies]} per job id, in order;
+            each part is a {data, meta[, error]} item
+        """
+        parts: dict[str, Awaitable[list[dict[str, Any]]]] = {
+            "status": self.get_job_status_batch(job_ids, max_concurrency)
+        }
+        if include_logs:
+            parts["logs"] = self.get_job_logs_batch(job_ids, max_concurrency)
+        if include_dependencies:
+            parts["dependencies"] = self.get_job_dependencies_batch(
+                job_ids, depth, max_concurrency
+            )
+
+        batches = dict(zip(parts, await asyncio.gather(*parts.values())))
+        details = []
+        for index, job_id in enumerate(job_ids):
+            detail: dict[str, Any] = {"job_id": job_id}
+            for name, batch in batches.items():
+                item = dict(batch[index])
+                item.pop("job_id", None)
+                detail[name] = item
+            details.append(detail)
+        return details
+
 
 # =============================================================================
 # HELPER FUNCTION
 # =============================================================================
 
 
+def _dependency_tags(data: dict[str, Any]) -> list[str]:
+    """Tags of a dependency result: the job and every predecessor/successor."""
+    job_ids = [data["job_id"]]
+    for item in [*data["predecessors"], *data["successors"]]:
+        if isinstance(item, dict):
+            job_ids.append(item.get("jobId") or item.get("id"))
+    return [job_tag(str(job_id)) for job_id in job_ids if job_id]
+
+
 async def get_tws_client() -> OptimizedTWSClient:
     """
     Get or create TWS client instance.
@@ -630,4 +777,5 @@ async def get_tws_client() -> OptimizedTWSClient:
         password=settings.TWS_PASSWORD or "tws_password",
         engine_name=settings.TWS_ENGINE_NAME,
         engine_owner=settings.TWS_ENGINE_OWNER,
+        transport_config=TWSTransportConfig.from_settings(),
     )
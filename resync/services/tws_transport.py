@@ -0,0 +1,404 @@
+"""
+HTTP transport for the TWS/HWA REST API.
+
+Every TWS call made by OptimizedTWSClient (and UnifiedTWSClient, which wraps
+it) goes through a single TWSTransport that:
+
+- uses explicit connection pool limits and timeouts, and HTTP/2 when the
+  optional ``h2`` package is installed and the server negotiates it (ALPN)
+- coalesces identical in-flight reads keyed by (method, path, params), so
+  fifty operators refreshing the same job cause one request to TWS
+- bounds concurrency per endpoint template (e.g. ``plan/job/{id}``) with a
+  semaphore, protecting the TWS server from bursts
+- records latency per endpoint template and counts requests slower than the
+  endpoint's latency SLO
+
+Usage:
+    transport = TWSTransport(base_url, auth=(user, password))
+    job = await transport.get_json("/twsd/api/v2/plan/job/123")
+    report = transport.get_slo_report()
+"""
+
+from __future__ import annotations
+
+import asyncio
+import time
+from dataclasses import dataclass, field
+from typing import Any
+
+import httpx
+import structlog
+
+from resync.core.constants import (
+    DEFAULT_CONNECT_TIMEOUT,
+    DEFAULT_POOL_TIMEOUT,
+    DEFAULT_READ_TIMEOUT,
+    DEFAULT_WRITE_TIMEOUT,
+)
+from resync.core.metrics_compat import Counter, Histogram
+
+try:
+    import h2  # noqa: F401
+
+    H2_AVAILABLE = True
+except ImportError:
+    H2_AVAILABLE = False
+
+logger = structlog.get_logger(__name__)
+
+API_PREFIX = "twsd/api/v2/"
+
+# Methods whose concurrent identical requests may share one response
+COALESCABLE_METHODS = frozenset({"GET", "HEAD"})
+
+# Path segments that belong to the API surface; any other segment is an id
+_STATIC_SEGMENTS = frozenset(
+    {
+        "engine",
+        "info",
+        "configuration",
+        "model",
+        "user",
+        "group",
+        "jobdefinition",
+        "jobstream",
+        "workstation",
+        "plan",
+        "job",
+        "predecessors",
+        "successors",
+        "description",
+        "count",
+        "issues",
+        "joblog",
+        "resource",
+        "folder",
+        "objects-count",
+        "consumed-jobs",
+        "runs",
+    }
+)
+
+
+def endpoint_template(path: str) -> str:
+    """
+    Map a request path to its endpoint template.
+
+    ``/twsd/api/v2/plan/job/JOB_01/successors`` -> ``plan/job/{id}/successors``.
+    Templates keep metric label cardinality bounded and key the per-endpoint
+    concurrency limits.
+    """
+    path = path.strip("/")
+    if path.startswith(API_PREFIX):
+        path = path[len(API_PREFIX) :]
+    segments = [s if s in _STATIC_SEGMENTS else "{id}" for s in path.split("/") if s]
+    return "/".join(segments) or "root"
+
+
+def _freeze(params: dict[str, Any] | None) -> tuple:
+    if not params:
+        return ()
+    return tuple(sorted((str(k), str(v)) for k, v in params.items()))
+
+
+@dataclass
+class TWSTransportConfig:
+    """Pool, protocol, concurrency and SLO settings for TWSTransport."""
+
+    # Connection pool
+    max_connections: int = 20
+    max_keepalive_connections: int = 10
+    keepalive_expiry: float = 30.0
+
+    # Timeouts (seconds)
+    connect_timeout: float = DEFAULT_CONNECT_TIMEOUT
+    read_timeout: float = DEFAULT_READ_TIMEOUT
+    write_timeout: float = DEFAULT_WRITE_TIMEOUT
+    pool_timeout: float = DEFAULT_POOL_TIMEOUT
+
+    # Protocol / TLS
+    http2: bool = True  # Only effective when h2 is installed
+    verify: bool | str = True
+    trust_env: bool = False
+
+    # Concurrent in-flight requests per endpoint template
+    endpoint_concurrency: int = 8
+    endpoint_concurrency_overrides: dict[str, int] = field(
+        default_factory=lambda: {
+            "plan/job/joblog": 2,
+            "plan/job/{id}/predecessors": 4,
+            "plan/job/{id}/successors": 4,
+        }
+    )
+
+    # Latency objective per endpoint template (seconds)
+    latency_slo_seconds: float = 1.0
+    latency_slo_overrides: dict[str, float] = field(
+        default_factory=lambda: {"plan/job/joblog": 5.0}
+    )
+
+    @classmethod
+    def from_settings(cls) -> TWSTransportConfig:
+        """Create config from application settings."""
+        from resync.settings import settings
+
+        verify = settings.tws_verify
+        if verify and settings.tws_ca_bundle:
+            verify = settings.tws_ca_bundle
+
+        return cls(
+            max_connections=settings.tws_max_connections,
+            max_keepalive_connections=settings.tws_max_keepalive_connections,
+            read_timeout=settings.tws_request_timeout,
+            http2=settings.tws_http2_enabled,
+            verify=verify,
+            endpoint_concurrency=settings.tws_endpoint_concurrency,
+            latency_slo_seconds=settings.tws_latency_slo_seconds,
+        )
+
+
+class TWSTransport:
+    """
+    Pooled, coalescing, per-endpoint limited HTTP transport for TWS.
+
+    Coalesced callers share one httpx.Response and each parses its own copy
+    of the body, so results can be mutated safely.
+    """
+
+    # Metrics shared across all transports
+    _request_latency: Histogram = Histogram(
+        "tws_request_latency_seconds",
+        "Latency of TWS API requests",
+        ["endpoint"],
+    )
+    _request_count: Counter = Counter(
+        "tws_request_total",
+        "Total number of TWS API requests",
+        ["endpoint", "status"],
+    )
+    _coalesced_count: Counter = Counter(
+        "tws_request_coalesced_total",
+        "TWS requests served by an identical in-flight request",
+        ["endpoint"],
+    )
+    _slo_violations: Counter = Counter(
+        "tws_request_slo_violations_total",
+        "TWS requests slower than the endpoint latency SLO",
+        ["endpoint"],
+    )
+
+    def __init__(
+        self,
+        base_url: str,
+        auth: Any = None,
+        config: TWSTransportConfig | None = None,
+        client: httpx.AsyncClient | None = None,
+    ) -> None:
+        """
+        Construct the transport.
+
+        Args:
+            base_url: Base URL of the TWS API
+            auth: httpx auth (e.g. a (username, password) tuple)
+            config: Transport configuration (defaults if None)
+            client: Pre-built httpx client (tests); pool/protocol config is
+                then ignored
+        """
+        self.config = config or TWSTransportConfig()
+        self.base_url = base_url.rstrip("/")
+        self.http2 = self.config.http2 and H2_AVAILABLE
+        if self.config.http2 and not H2_AVAILABLE:
+            logger.debug("tws_http2_unavailable", hint="pip install h2")
+
+        self.client = client or httpx.AsyncClient(
+            base_url=self.base_url,
+            auth=auth,
+            http2=self.http2,
+            verify=self.config.verify,
+            trust_env=self.config.trust_env,
+            limits=httpx.Limits(
+                max_connections=self.config.max_connections,
+                max_keepalive_connections=self.config.max_keepalive_connections,
+                keepalive_expiry=self.config.keepalive_expiry,
+            ),
+            timeout=httpx.Timeout(
+                connect=self.config.connect_timeout,
+                read=self.config.read_timeout,
+                write=self.config.write_timeout,
+                pool=self.config.pool_timeout,
+            ),
+        )
+
+        self._in_flight: dict[tuple, asyncio.Task] = {}
+        self._semaphores: dict[str, asyncio.Semaphore] = {}
+        self._stats: dict[str, dict[str, int]] = {}
+
+    async def close(self) -> None:
+        """Close the underlying httpx client."""
+        await self.client.aclose()
+
+    # -------------------------------------------------------------------------
+    # Limits and SLOs
+    # -------------------------------------------------------------------------
+    def concurrency_for(self, endpoint: str) -> int:
+        """Max concurrent requests for an endpoint template."""
+        return self.config.endpoint_concurrency_overrides.get(
+            endpoint, self.config.endpoint_concurrency
+        )
+
+    def slo_for(self, endpoint: str) -> float:
+        """Latency objective (seconds) for an endpoint template."""
+        return self.config.latency_slo_overrides.get(endpoint, self.config.latency_slo_seconds)
+
+    def _semaphore(self, endpoint: str) -> asyncio.Semaphore:
+        semaphore = self._semaphores.get(endpoint)
+        if semaphore is None:
+            semaphore = self._semaphores[endpoint] = asyncio.Semaphore(
+                self.concurrency_for(endpoint)
+            )
+        return semaphore
+
+    def _endpoint_stats(self, endpoint: str) -> dict[str, int]:
+        stats = self._stats.get(endpoint)
+        if stats is None:
+            stats = self._stats[endpoint] = {
+                "requests": 0,
+                "errors": 0,
+                "coalesced": 0,
+                "slo_violations": 0,
+            }
+        return stats
+
+    # -------------------------------------------------------------------------
+    # Requests
+    # -------------------------------------------------------------------------
+    async def request(
+        self,
+        method: str,
+        path: str,
+        params: dict[str, Any] | None = None,
+        json: Any = None,
+    ) -> httpx.Response:
+        """
+        Send a request, joining an identical in-flight read if there is one.
+
+        Args:
+            method: HTTP method
+            path: Path relative to the base URL (should begin with '/')
+            params: Optional query parameters
+            json: Optional JSON body (requests with a body are never coalesced)
+
+        Returns:
+            The httpx.Response (status is not checked)
+
+        Raises:
+            httpx.RequestError: For network errors.
+        """
+        method = method.upper()
+        endpoint = endpoint_template(path)
+        if method not in COALESCABLE_METHODS or json is not None:
+            return await self._send(endpoint, method, path, params, json)
+
+        key = (method, path, _freeze(params))
+        task = self._in_flight.get(key)
+        if task is None:
+            task = asyncio.create_task(self._send(endpoint, method, path, params, None))
+            self._in_flight[key] = task
+            task.add_done_callback(lambda t, k=key: self._release(k, t))
+        else:
+            self._endpoint_stats(endpoint)["coalesced"] += 1
+            self._coalesced_count.labels(endpoint=endpoint).inc()
+        # A cancelled caller must not cancel the request other callers share
+        return await asyncio.shield(task)
+
+    def _release(self, key: tuple, task: asyncio.Task) -> None:
+        if self._in_flight.get(key) is task:
+            del self._in_flight[key]
+        if not task.cancelled():
+            # Mark the exception retrieved even if every caller went away
+            task.exception()
+
+    async def _send(
+        self,
+        endpoint: str,
+        method: str,
+        path: str,
+        params: dict[str, Any] | None,
+        json: Any,
+    ) -> httpx.Response:
+        async with self._semaphore(endpoint):
+            start = time.perf_counter()
+            try:
+                response = await self.client.request(method, path, params=params, json=json)
+            except Exception:
+                self._record(endpoint, "error", time.perf_counter() - start)
+                raise
+            self._record(endpoint, str(response.status_code), time.perf_counter() - start)
+            return response
+
+    def _record(self, endpoint: str, status: str, elapsed: float) -> None:
+        stats = self._endpoint_stats(endpoint)
+        stats["requests"] += 1
+        if status == "error" or status.startswith("5"):
+            stats["errors"] += 1
+        self._request_latency.labels(endpoint=endpoint).observe(elapsed)
+        self._request_count.labels(endpoint=endpoint, status=status).inc()
+        if elapsed > self.slo_for(endpoint):
+            stats["slo_violations"] += 1
+            self._slo_violations.labels(endpoint=endpoint).inc()
+
+    async def get_json(self, path: str, params: dict[str, Any] | None = None) -> Any:
+        """
+        GET a path and parse the JSON body.
+
+        Raises:
+            httpx.HTTPStatusError: For non-2xx responses.
+            httpx.RequestError: For network errors.
+        """
+        response = await self.request("GET", path, params=params)
+        response.raise_for_status()
+        return response.json()
+
+    # -------------------------------------------------------------------------
+    # Reporting
+    # -------------------------------------------------------------------------
+    def get_slo_report(self) -> dict[str, dict[str, Any]]:
+        """
+        Latency and SLO attainment per endpoint template.
+
+        Percentiles come from the process-wide latency histogram; counts are
+        for this transport.
+        """
+        report: dict[str, dict[str, Any]] = {}
+        for endpoint, stats in self._stats.items():
+            labels = {"endpoint": endpoint}
+            requests = stats["requests"]
+            report[endpoint] = {
+                **stats,
+                "slo_seconds": self.slo_for(endpoint),
+                "slo_attainment": (
+                    1 - stats["slo_violations"] / requests if requests else 1.0
+                ),
+                "p50": self._request_latency.get_percentile(50, labels),
+                "p95": self._request_latency.get_percentile(95, labels),
+                "p99": self._request_latency.get_percentile(99, labels),
+            }
+        return report
+
+    def get_stats(self) -> dict[str, Any]:
+        """Transport configuration and live state."""
+        return {
+            "http2": self.http2,
+            "max_connections": self.config.max_connections,
+            "max_keepalive_connections": self.config.max_keepalive_connections,
+            "in_flight": len(self._in_flight),
+            "endpoints": self.get_slo_report(),
+        }
+
+
+__all__ = [
+    "H2_AVAILABLE",
+    "TWSTransport",
+    "TWSTransportConfig",
+    "endpoint_template",
+]
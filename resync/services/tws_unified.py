@@ -52,6 +52,7 @@ from resync.core.resilience import (
     RetryWithBackoff,
     TimeoutManager,
 )
+from resync.services.tws_transport import TWSTransportConfig
 
 logger = structlog.get_logger(__name__)
 
@@ -86,6 +87,13 @@ class TWSClientConfig:
     connect_timeout: float = 10.0
     read_timeout: float = 30.0
 
+    # Transport settings (pool, protocol, per-endpoint limits, SLO)
+    max_connections: int = 20
+    max_keepalive_connections: int = 10
+    http2: bool = True
+    endpoint_concurrency: int = 8
+    latency_slo_seconds: float = 1.0
+
     # Circuit breaker settings
     circuit_failure_threshold: int = 5
     circuit_recovery_timeout: int = 60
@@ -111,6 +119,23 @@ class TWSClientConfig:
             engine_owner=getattr(settings, "tws_engine_owner", ""),
             connect_timeout=getattr(settings, "tws_connect_timeout", 10.0),
             read_timeout=getattr(settings, "tws_request_timeout", 30.0),
+            max_connections=getattr(settings, "tws_max_connections", 20),
+            max_keepalive_connections=getattr(settings, "tws_max_keepalive_connections", 10),
+            http2=getattr(settings, "tws_http2_enabled", True),
+            endpoint_concurrency=getattr(settings, "tws_endpoint_concurrency", 8),
+            latency_slo_seconds=getattr(settings, "tws_latency_slo_seconds", 1.0),
+        )
+
+    def to_transport_config(self) -> TWSTransportConfig:
+        """Build the TWSTransport configuration for this client."""
+        return TWSTransportConfig(
+            max_connections=self.max_connections,
+            max_keepalive_connections=self.max_keepalive_connections,
+            connect_timeout=self.connect_timeout,
+            read_timeout=self.read_timeout,
+            http2=self.http2,
+            endpoint_concurrency=self.endpoint_concurrency,
+            latency_slo_seconds=self.latency_slo_seconds,
         )
 
 
@@ -227,6 +252,7 @@ class UnifiedTWSClient:
                     password=self.config.password,
                     engine_name=self.config.engine_name,
                     engine_owner=self.config.engine_owner,
+                    transport_config=self.config.to_transport_config(),
                 )
 
                 # Verify connection with a health check
@@ -436,6 +462,11 @@ class UnifiedTWSClient:
                 self._metrics.last_failure.isoformat() if self._metrics.last_failure else None
             ),
             "last_error": self._metrics.last_error,
+            "transport": (
+                self._client.get_transport_stats()
+                if hasattr(getattr(self, "_client", None), "get_transport_stats")
+                else None
+            ),
         }
 
 
@@ -126,6 +126,14 @@ class Settings(BaseSettings, SettingsValidators):
     db_pool_health_check_interval: int = Field(default=60, ge=10)
     db_pool_max_lifetime: int = Field(default=1800, ge=300)
 
+    query_cache_enabled: bool = Field(
+        default=True,
+        description=(
+            "Serve repository reads of tables with NOTIFY triggers through the "
+            "in-process query cache (invalidated by LISTEN/NOTIFY)"
+        ),
+    )
+
     # ============================================================================
     # REDIS - v5.3.22 adjusted for single VM
     # ============================================================================
@@ -503,6 +511,25 @@ class Settings(BaseSettings, SettingsValidators):
         default=None,
         description=("CA bundle for TWS TLS verification (ignored if tws_verify=False)"),
     )
+    tws_http2_enabled: bool = Field(
+        default=True,
+        description="Negotiate HTTP/2 with TWS when supported (requires the 'h2' package)",
+    )
+    tws_max_connections: int = Field(default=20, ge=1, description="TWS HTTP pool size")
+    tws_max_keepalive_connections: int = Field(default=10, ge=0)
+    tws_endpoint_concurrency: int = Field(
+        default=8, ge=1, description="Max concurrent in-flight requests per TWS endpoint"
+    )
+    tws_latency_slo_seconds: float = Field(
+        default=1.0, gt=0, description="Latency objective for TWS requests"
+    )
+    tws_cache_shared_enabled: bool = Field(
+        default=True,
+        description=(
+            "Share the TWS API cache between workers through Redis "
+            "(L2 tier plus pub/sub invalidation of each worker's in-process L1)"
+        ),
+    )
 
     # Connection Pool - HTTP
     http_pool_min_size: int = Field(default=10, ge=1)
@@ -689,6 +716,27 @@ class Settings(BaseSettings, SettingsValidators):
         repr=False,
     )
 
+    # Request inspection (v5.9.10: pure ASGI, body parsed once)
+    request_inspection_enabled: bool = Field(
+        default=False,
+        description=(
+            "Install the SQL injection inspection layer (query and body; the "
+            "pattern set flags quotes and ';', so it is opt-in)"
+        ),
+    )
+    request_inspection_block: bool = Field(
+        default=False,
+        description=(
+            "Reject suspicious requests with 400. When False, detections are "
+            "only logged/audited (the pattern set flags quotes and ';')."
+        ),
+    )
+    request_inspection_max_body_bytes: int = Field(
+        default=1024 * 1024,
+        ge=0,
+        description="Max request body size buffered and parsed for inspection",
+    )
+
     # CORS
     cors_allowed_origins: list[str] = Field(default=["http://localhost:3000"])
     cors_allow_credentials: bool = Field(default=False)
@@ -0,0 +1,174 @@
+"""
+Benchmark: ten consecutive daily full backups of an evolving database dump.
+
+A synthetic pg_dump (COPY rows) is generated for day 1 and then changed
+every day like a job-history table: recent rows updated, new rows
+appended, a few old rows edited or deleted. Each day is backed up three
+ways:
+
+- gzip:  gzip -9 of the whole dump plus a separate SHA-256 pass (the
+         previous create_database_backup/_calculate_sha256 behaviour)
+- zstd:  BackupService._write_stream (multi-threaded zstd, inline hash)
+- dedup: DedupRepository snapshot (content-defined chunks, only new
+         chunks stored), followed by a verified restore check
+
+Usage:
+    python scripts/benchmark_backup_dedup.py [--rows 1000000] [--days 10]
+"""
+
+import argparse
+import asyncio
+import gzip
+import os
+import random
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+# Add project root to path
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from resync.core.backup.backup_service import (
+    ZSTD_AVAILABLE,
+    BackupService,
+    _calculate_sha256,
+    _human_size,
+)
+from resync.core.backup.dedup_repository import DedupRepository
+
+STATUSES = ["SUCC", "ABEND", "EXEC", "HOLD", "CANCEL"]
+
+
+def make_row(i: int, rng: random.Random) -> str:
+    return (
+        f"{i}\tJOB_{i:08d}\tWS{i % 50:03d}\t{rng.choice(STATUSES)}\t"
+        f"2026-10-{rng.randint(1, 28):02d} {rng.randint(0, 23):02d}:{rng.randint(0, 59):02d}:00\t"
+        f"{rng.random():.6f}\t{{\"retries\": {rng.randint(0, 3)}}}\n"
+    )
+
+
+def evolve(rows: list[str], day: int, change_rate: float, next_id: int) -> int:
+    """
+    Apply one day of changes in place; returns the next free id.
+
+    Job-history tables mostly append new runs and update recent ones, so
+    updates go to the newest 5% of rows, plus a handful of scattered edits
+    and deletions of old rows.
+    """
+    rng = random.Random(day)
+    hot_start = int(len(rows) * 0.95)
+    for _ in range(int(len(rows) * change_rate)):
+        index = rng.randrange(hot_start, len(rows))
+        rows[index] = make_row(int(rows[index].split("\t", 1)[0]), rng)
+    scattered = max(2, len(rows) // 100_000)
+    for _ in range(scattered):
+        index = rng.randrange(hot_start)
+        rows[index] = make_row(int(rows[index].split("\t", 1)[0]), rng)
+    for _ in range(scattered // 2):
+        del rows[rng.randrange(hot_start)]
+    for _ in range(int(len(rows) * change_rate / 2)):
+        rows.append(make_row(next_id, rng))
+        next_id += 1
+    return next_id
+
+
+def render(rows: list[str]) -> bytes:
+    header = "COPY public.tws_jobs (id, name, workstation, status, ts, score, meta) FROM stdin;\n"
+    return (header + "".join(rows) + "\\.\n").encode()
+
+
+async def stream(data: bytes, block: int = 1024 * 1024):
+    for start in range(0, len(data), block):
+        yield data[start : start + block]
+
+
+def gzip_backup(data: bytes, path: Path) -> None:
+    with gzip.open(path, "wb", compresslevel=9) as f:
+        f.write(data)
+    _calculate_sha256(str(path))
+
+
+async def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.split("\n")[1])
+    parser.add_argument("--rows", type=int, default=1_000_000)
+    parser.add_argument("--days", type=int, default=10)
+    parser.add_argument(
+        "--change-rate", type=float, default=0.01, help="fraction of rows updated per day"
+    )
+    parser.add_argument("--skip-gzip", action="store_true")
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as directory:
+        root = Path(directory)
+        os.environ["BACKUP_DIR"] = str(root / "service")
+        service = BackupService()
+        repository = DedupRepository(root / "repository", fsync=False)
+
+        rng = random.Random(0)
+        rows = [make_row(i, rng) for i in range(args.rows)]
+        next_id = args.rows
+
+        print(f"\nzstd available: {ZSTD_AVAILABLE}\n")
+        print(
+            f"{'day':>3} {'dump':>10} | {'gzip s':>7} {'gzip MB':>8} | "
+            f"{'zstd s':>7} {'zstd MB':>8} | {'dedup s':>7} {'new MB':>8} {'verify s':>8}"
+        )
+        totals = {"gzip": [0.0, 0], "zstd": [0.0, 0], "dedup": [0.0, 0]}
+
+        for day in range(1, args.days + 1):
+            if day > 1:
+                next_id = evolve(rows, day, args.change_rate, next_id)
+            data = render(rows)
+
+            gzip_seconds = gzip_bytes = 0
+            if not args.skip_gzip:
+                path = root / f"day{day}.sql.gz"
+                start = time.perf_counter()
+                gzip_backup(data, path)
+                gzip_seconds = time.perf_counter() - start
+                gzip_bytes = path.stat().st_size
+                path.unlink()
+
+            path = root / f"day{day}.sql.zst"
+            start = time.perf_counter()
+            await service._write_stream(stream(data), path, compress=True)
+            zstd_seconds = time.perf_counter() - start
+            zstd_bytes = path.stat().st_size
+            path.unlink()
+
+            start = time.perf_counter()
+            async with repository.create_snapshot(f"day{day:02d}") as snapshot:
+                await snapshot.add_stream("database/resync_db.sql", stream(data))
+            dedup_seconds = time.perf_counter() - start
+            dedup_bytes = snapshot.snapshot.new_bytes
+
+            start = time.perf_counter()
+            await repository.verify(f"day{day:02d}")
+            verify_seconds = time.perf_counter() - start
+
+            for name, seconds, size in (
+                ("gzip", gzip_seconds, gzip_bytes),
+                ("zstd", zstd_seconds, zstd_bytes),
+                ("dedup", dedup_seconds, dedup_bytes),
+            ):
+                totals[name][0] += seconds
+                totals[name][1] += size
+
+            print(
+                f"{day:>3} {_human_size(len(data)):>10} | "
+                f"{gzip_seconds:>7.2f} {gzip_bytes / 1e6:>8.1f} | "
+                f"{zstd_seconds:>7.2f} {zstd_bytes / 1e6:>8.1f} | "
+                f"{dedup_seconds:>7.2f} {dedup_bytes / 1e6:>8.1f} {verify_seconds:>8.2f}"
+            )
+
+        print("\nTotals over", args.days, "days:")
+        for name, (seconds, size) in totals.items():
+            if name == "gzip" and args.skip_gzip:
+                continue
+            print(f"  {name:<6} {seconds:>8.2f} s  {_human_size(size):>12} stored")
+        repository.close()
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,154 @@
+"""
+Benchmark: L1 cache hit latency and hit ratio on a Zipfian key trace.
+
+Compares the previous L1 (16 cachetools LRU shards, each read and write
+under an asyncio.Lock) with the lock-free W-TinyLFU L1Cache. Hit ratio is
+measured by replaying a skewed trace (cache-aside: miss -> set), latency
+by timing awaited gets of resident keys.
+
+Usage:
+    python scripts/benchmark_l1_cache.py [--keys 100000] [--requests 500000] [--size 1000]
+"""
+
+import argparse
+import asyncio
+import random
+import sys
+import time
+from pathlib import Path
+from typing import Any
+
+from cachetools import LRUCache
+
+# Add project root to path
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from resync.core.utils.data_structures import WTinyLFUCache
+
+
+class ShardedLockedLRU:
+    """The previous L1Cache implementation."""
+
+    def __init__(self, max_size: int, num_shards: int = 16):
+        self.num_shards = num_shards
+        self.shards = [LRUCache(maxsize=max_size // num_shards) for _ in range(num_shards)]
+        self.shard_locks = [asyncio.Lock() for _ in range(num_shards)]
+
+    def _get_shard(self, key: str) -> tuple[LRUCache, asyncio.Lock]:
+        shard_index = hash(key) % self.num_shards
+        return self.shards[shard_index], self.shard_locks[shard_index]
+
+    async def get(self, key: str) -> Any | None:
+        shard, lock = self._get_shard(key)
+        async with lock:
+            try:
+                return shard[key]
+            except KeyError:
+                return None
+
+    async def set(self, key: str, value: Any) -> None:
+        shard, lock = self._get_shard(key)
+        async with lock:
+            shard[key] = value
+
+
+class TinyLFUL1:
+    """Same surface as L1Cache, without importing the cache package."""
+
+    def __init__(self, max_size: int):
+        self.cache = WTinyLFUCache(max_size)
+
+    def get_nowait(self, key: str) -> Any | None:
+        return self.cache.get(key)
+
+    async def get(self, key: str) -> Any | None:
+        return self.cache.get(key)
+
+    async def set(self, key: str, value: Any) -> None:
+        self.cache.put(key, value)
+
+
+def zipf_trace(keys: int, length: int, s: float, seed: int = 42) -> list[str]:
+    weights = [1 / (rank**s) for rank in range(1, keys + 1)]
+    names = [f"tws:job:{i}" for i in range(keys)]
+    return random.Random(seed).choices(names, weights=weights, k=length)
+
+
+async def hit_ratio(cache, trace: list[str]) -> float:
+    hits = 0
+    for key in trace:
+        if await cache.get(key) is None:
+            await cache.set(key, key)
+        else:
+            hits += 1
+    return hits / len(trace)
+
+
+async def hit_latency_ns(cache, keys: list[str], rounds: int) -> float:
+    for key in keys:
+        await cache.set(key, key)
+    resident = [key for key in keys if await cache.get(key) is not None]
+    start = time.perf_counter_ns()
+    for _ in range(rounds):
+        for key in resident:
+            await cache.get(key)
+    return (time.perf_counter_ns() - start) / (rounds * len(resident))
+
+
+async def sync_hit_latency_ns(cache, keys: list[str], rounds: int) -> float:
+    """CacheHierarchy.get reads L1 through get_nowait (no coroutine per lookup)."""
+    for key in keys:
+        await cache.set(key, key)
+    resident = [key for key in keys if cache.get_nowait(key) is not None]
+    get = cache.get_nowait
+    start = time.perf_counter_ns()
+    for _ in range(rounds):
+        for key in resident:
+            get(key)
+    return (time.perf_counter_ns() - start) / (rounds * len(resident))
+
+
+async def concurrent_hits_per_second(cache, keys: list[str], tasks: int, reads: int) -> float:
+    for key in keys:
+        await cache.set(key, key)
+
+    async def reader(offset: int) -> None:
+        for i in range(reads):
+            await cache.get(keys[(offset + i) % len(keys)])
+            if i % 64 == 0:
+                await asyncio.sleep(0)
+
+    start = time.perf_counter()
+    await asyncio.gather(*(reader(i) for i in range(tasks)))
+    return tasks * reads / (time.perf_counter() - start)
+
+
+async def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.split("\n")[1])
+    parser.add_argument("--keys", type=int, default=100_000)
+    parser.add_argument("--requests", type=int, default=500_000)
+    parser.add_argument("--size", type=int, default=1000)
+    parser.add_argument("--skew", type=float, default=0.9, help="Zipf exponent")
+    args = parser.parse_args()
+
+    trace = zipf_trace(args.keys, args.requests, args.skew)
+    hot = [f"tws:job:{i}" for i in range(args.size // 2)]
+    print(
+        f"\nZipf(s={args.skew}) over {args.keys:,} keys, {args.requests:,} requests, "
+        f"L1 size {args.size:,}\n"
+    )
+    print(f"{'L1':<28}{'hit ratio':>10}{'hit ns':>10}{'hits/s (100 tasks)':>22}")
+    for name, factory in {
+        "sharded LRU + asyncio.Lock": lambda: ShardedLockedLRU(args.size),
+        "lock-free W-TinyLFU": lambda: TinyLFUL1(args.size),
+    }.items():
+        ratio = await hit_ratio(factory(), trace)
+        latency = await hit_latency_ns(factory(), hot, rounds=200)
+        throughput = await concurrent_hits_per_second(factory(), hot, tasks=100, reads=5000)
+        print(f"{name:<28}{ratio:>10.2%}{latency:>10.0f}{throughput:>22,.0f}")
+    latency = await sync_hit_latency_ns(TinyLFUL1(args.size), hot, rounds=200)
+    print(f"{'W-TinyLFU get_nowait':<28}{'':>10}{latency:>10.0f}")
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,127 @@
+"""
+Benchmark: requests/sec through the full middleware stack.
+
+Builds the production middleware stack (ApplicationFactory._configure_middleware)
+on a bare FastAPI app with two cheap endpoints and measures throughput with an
+in-process ASGI client (no network), comparing:
+
+- legacy:     stack + DatabaseSecurityMiddleware (BaseHTTPMiddleware, parses
+              the body itself, one re.search per pattern per value)
+- inspection: stack + RequestInspectionMiddleware (pure ASGI, body parsed
+              once into the scope, one combined precompiled regex)
+- baseline:   stack without any injection detection
+
+Usage:
+    python scripts/benchmark_middleware_stack.py [--requests 2000] [--concurrency 20]
+"""
+
+import argparse
+import asyncio
+import os
+import sys
+import time
+from pathlib import Path
+
+# Add project root to path
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+import httpx
+from fastapi import FastAPI, Request
+
+from resync.api.middleware.database_security_middleware import DatabaseSecurityMiddleware
+from resync.api.middleware.request_inspection import get_parsed_body
+from resync.app_factory import ApplicationFactory
+from resync.settings import settings
+
+JSON_PAYLOAD = {
+    "message": "Job PAYROLL_01 terminou com ABEND S0C7",
+    "job_name": "PAYROLL_01",
+    "filters": {"workstation": "PROD_WS_01", "limit": 20, "tags": ["batch", "payroll"]},
+}
+
+
+def build_app(variant: str) -> FastAPI:
+    """Build an app with the production middleware stack for a variant."""
+    object.__setattr__(settings, "request_inspection_enabled", variant == "inspection")
+    object.__setattr__(settings, "request_inspection_block", False)
+
+    factory = ApplicationFactory()
+    factory.app = FastAPI()
+
+    @factory.app.get("/api/v1/ping")
+    async def ping():
+        return {"ok": True}
+
+    @factory.app.post("/api/v1/echo")
+    async def echo(request: Request):
+        body = get_parsed_body(request)
+        if body is None:
+            body = await request.json()
+        return {"keys": len(body)}
+
+    factory._configure_middleware()
+    if variant == "legacy":
+        factory.app.add_middleware(DatabaseSecurityMiddleware)
+
+    return factory.app
+
+
+async def measure(app: FastAPI, method: str, total: int, concurrency: int) -> float:
+    """Return requests/sec for a method against the app."""
+    transport = httpx.ASGITransport(app=app)
+    headers = {"user-agent": "benchmark/1.0", "origin": "http://localhost:3000"}
+
+    async with httpx.AsyncClient(transport=transport, base_url="http://test") as client:
+
+        async def one() -> None:
+            if method == "GET":
+                response = await client.get("/api/v1/ping", params={"q": "status"}, headers=headers)
+            else:
+                response = await client.post("/api/v1/echo", json=JSON_PAYLOAD, headers=headers)
+            response.raise_for_status()
+
+        # Warm-up
+        for _ in range(50):
+            await one()
+
+        semaphore = asyncio.Semaphore(concurrency)
+
+        async def bounded() -> None:
+            async with semaphore:
+                await one()
+
+        start = time.perf_counter()
+        await asyncio.gather(*(bounded() for _ in range(total)))
+        return total / (time.perf_counter() - start)
+
+
+async def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.split("\n")[1])
+    parser.add_argument("--requests", type=int, default=2000)
+    parser.add_argument("--concurrency", type=int, default=20)
+    args = parser.parse_args()
+
+    os.environ.setdefault("APP_ENVIRONMENT", "development")
+
+    print("=" * 64)
+    print("MIDDLEWARE STACK THROUGHPUT (requests/sec, in-process ASGI)")
+    print("=" * 64)
+    print(f"{'variant':<12} {'GET /ping':>14} {'POST /echo (json)':>20}")
+    print("-" * 64)
+
+    results = {}
+    for variant in ("baseline", "legacy", "inspection"):
+        app = build_app(variant)
+        get_rps = await measure(app, "GET", args.requests, args.concurrency)
+        post_rps = await measure(app, "POST", args.requests, args.concurrency)
+        results[variant] = (get_rps, post_rps)
+        print(f"{variant:<12} {get_rps:>14.0f} {post_rps:>20.0f}")
+
+    print("-" * 64)
+    legacy_post = results["legacy"][1]
+    inspection_post = results["inspection"][1]
+    print(f"inspection vs legacy (POST): {inspection_post / legacy_post:.2f}x")
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,114 @@
+"""
+Benchmark: job-status summary latency with and without the query cache.
+
+Runs the TWSJobStatusRepository-style GROUP BY summary against a local
+SQLite table directly and through QueryCacheManager, with a write every
+--write-every reads invalidating the cached result via the change log.
+
+Usage:
+    python scripts/benchmark_query_cache.py [--rows 50000] [--reads 2000] [--write-every 100]
+"""
+
+import argparse
+import asyncio
+import sys
+import tempfile
+import time
+import types
+from pathlib import Path
+
+from sqlalchemy import Column, Integer, MetaData, String, Table, func, select, text
+from sqlalchemy.ext.asyncio import async_sessionmaker, create_async_engine
+
+# Add project root to path
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+# Load the query cache without the rest of the cache package
+_package = types.ModuleType("resync.core.cache")
+_package.__path__ = [str(Path(__file__).parent.parent / "resync" / "core" / "cache")]
+sys.modules.setdefault("resync.core.cache", _package)
+
+from resync.core.cache.query_cache import ChangeLogPoller, QueryCacheManager
+
+metadata = MetaData()
+jobs = Table(
+    "tws_job_status",
+    metadata,
+    Column("id", Integer, primary_key=True),
+    Column("job_name", String),
+    Column("status", String),
+)
+SUMMARY = select(jobs.c.status, func.count(jobs.c.id).label("count")).group_by(jobs.c.status)
+STATUSES = ["SUCC", "ABEND", "EXEC", "HOLD", "READY"]
+
+
+async def setup(path: Path, rows: int):
+    engine = create_async_engine(f"sqlite+aiosqlite:///{path}")
+    async with engine.begin() as conn:
+        await conn.run_sync(metadata.create_all)
+        await conn.execute(
+            text("CREATE TABLE resync_table_changes (id INTEGER PRIMARY KEY, table_name TEXT)")
+        )
+        await conn.execute(
+            text(
+                "CREATE TRIGGER job_change AFTER UPDATE ON tws_job_status BEGIN "
+                "INSERT INTO resync_table_changes (table_name) VALUES ('tws_job_status'); END"
+            )
+        )
+        await conn.execute(
+            jobs.insert(),
+            [{"job_name": f"JOB{i}", "status": STATUSES[i % 5]} for i in range(rows)],
+        )
+    return engine, async_sessionmaker(engine, expire_on_commit=False)
+
+
+async def run(engine, sessions, reads: int, write_every: int, cache=None, poller=None):
+    latencies = []
+    for i in range(reads):
+        if i and i % write_every == 0:
+            async with engine.begin() as conn:
+                await conn.execute(
+                    jobs.update().where(jobs.c.id == i).values(status=STATUSES[i % 3])
+                )
+            if poller is not None:
+                await poller.poll_once()
+        start = time.perf_counter()
+        if cache is not None:
+            await cache.execute_query(SUMMARY)
+        else:
+            async with sessions() as session:
+                (await session.execute(SUMMARY)).all()
+        latencies.append(time.perf_counter() - start)
+    latencies.sort()
+    return sum(latencies) / len(latencies), latencies[int(len(latencies) * 0.99)]
+
+
+async def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.split("\n")[1])
+    parser.add_argument("--rows", type=int, default=50_000)
+    parser.add_argument("--reads", type=int, default=2_000)
+    parser.add_argument("--write-every", type=int, default=100)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        engine, sessions = await setup(Path(tmp) / "bench.db", args.rows)
+        cache = QueryCacheManager(sessions)
+        poller = ChangeLogPoller(cache, sessions, poll_interval=0)
+        await cache.initialize(change_source=poller)
+
+        print(f"\n{args.rows:,} rows, {args.reads:,} summaries, write every {args.write_every}\n")
+        print(f"{'mode':<16}{'mean ms':>10}{'p99 ms':>10}")
+        for name, kwargs in {
+            "direct": {},
+            "query cache": {"cache": cache, "poller": poller},
+        }.items():
+            mean, p99 = await run(engine, sessions, args.reads, args.write_every, **kwargs)
+            print(f"{name:<16}{mean * 1000:>10.3f}{p99 * 1000:>10.3f}")
+        stats = cache.get_cache_statistics()["performance"]
+        print(f"\ncache hit ratio {stats['cache_hit_ratio']:.1%}")
+        await cache.shutdown()
+        await engine.dispose()
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,119 @@
+"""
+Benchmark: WebSocket broadcast fan-out to thousands of in-process sockets.
+
+Compares the previous broadcast_json (one task per client per message,
+``send_json`` serializing the payload for every client) with the
+encode-once BroadcastHub (one serialization per message, bounded
+per-client queues drained by one writer task per connection).
+
+A fraction of the clients can be made slow to show that they no longer
+hold up the broadcast.
+
+Usage:
+    python scripts/benchmark_websocket_broadcast.py [--clients 5000] [--messages 200]
+"""
+
+import argparse
+import asyncio
+import json
+import sys
+import time
+from pathlib import Path
+
+# Add project root to path
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from resync.core.websocket_broadcast import BroadcastHub
+
+
+class FakeWebSocket:
+    def __init__(self, delay: float = 0.0):
+        self.delay = delay
+        self.frames = 0
+        self.bytes = 0
+
+    async def send_text(self, text: str) -> None:
+        if self.delay:
+            await asyncio.sleep(self.delay)
+        self.frames += 1
+        self.bytes += len(text)
+
+    async def send_json(self, data) -> None:
+        # Starlette's WebSocket.send_json
+        await self.send_text(json.dumps(data, separators=(",", ":"), ensure_ascii=False))
+
+
+def payload(n: int) -> dict:
+    return {
+        "type": "job_status",
+        "seq": n,
+        "jobs": [
+            {"name": f"JOB_{i:04d}", "workstation": "WS001", "status": "EXEC", "progress": i}
+            for i in range(20)
+        ],
+    }
+
+
+async def legacy(sockets: list[FakeWebSocket], messages: int) -> float:
+    start = time.perf_counter()
+    for n in range(messages):
+        data = payload(n)
+        tasks = [asyncio.create_task(ws.send_json(data)) for ws in sockets]
+        for task in tasks:
+            await task
+    return time.perf_counter() - start
+
+
+async def encode_once(sockets: list[FakeWebSocket], messages: int, queue_size: int) -> float:
+    hub = BroadcastHub(max_queue_size=queue_size)
+    for i, ws in enumerate(sockets):
+        hub.register(f"c{i}", ws)
+    fast = [ws for ws in sockets if not ws.delay]
+
+    start = time.perf_counter()
+    for n in range(messages):
+        hub.publish_json(payload(n))
+        await asyncio.sleep(0)
+    while any(ws.frames < messages for ws in fast):
+        await asyncio.sleep(0.001)
+    elapsed = time.perf_counter() - start
+
+    metrics = hub.get_metrics()
+    await hub.close()
+    print(
+        f"  hub: {metrics['frames_enqueued']} frames queued, "
+        f"{metrics['frames_dropped']} dropped for slow clients"
+    )
+    return elapsed
+
+
+async def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.split("\n")[1])
+    parser.add_argument("--clients", type=int, default=5000)
+    parser.add_argument("--messages", type=int, default=200)
+    parser.add_argument("--slow-fraction", type=float, default=0.01)
+    parser.add_argument("--slow-delay", type=float, default=0.05, help="seconds per send")
+    parser.add_argument("--queue-size", type=int, default=256)
+    args = parser.parse_args()
+
+    def make_sockets() -> list[FakeWebSocket]:
+        every = int(1 / args.slow_fraction) if args.slow_fraction else 0
+        return [
+            FakeWebSocket(args.slow_delay if every and i % every == 0 else 0.0)
+            for i in range(args.clients)
+        ]
+
+    print(f"\n{args.clients} clients, {args.messages} messages, {args.slow_fraction:.0%} slow\n")
+
+    sockets = make_sockets()
+    legacy_seconds = await legacy(sockets, args.messages)
+    print(f"task per client + send_json: {legacy_seconds:8.2f} s")
+
+    sockets = make_sockets()
+    hub_seconds = await encode_once(sockets, args.messages, args.queue_size)
+    print(f"encode once + writer tasks:  {hub_seconds:8.2f} s")
+    print(f"\nspeedup: {legacy_seconds / hub_seconds:.1f}x")
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,257 @@
+"""
+Unit tests for single-flight coalescing of LLM calls.
+
+v5.9.10 - Tests for:
+- In-worker coalescing of identical queries
+- Near-duplicate coalescing
+- Cross-worker lease + pub/sub wait
+- Integration with cached_llm_call
+"""
+
+import asyncio
+import json
+from unittest.mock import AsyncMock, MagicMock, patch
+
+import pytest
+
+
+class TestLocalCoalescing:
+    """Tests for in-worker single-flight."""
+
+    @pytest.mark.asyncio
+    async def test_identical_queries_share_one_call(self):
+        """Concurrent identical queries call the producer once."""
+        from resync.core.cache.single_flight import LLMSingleFlight
+
+        flight = LLMSingleFlight(distributed=False)
+        calls = 0
+
+        async def producer():
+            nonlocal calls
+            calls += 1
+            await asyncio.sleep(0.05)
+            return "answer"
+
+        results = await asyncio.gather(
+            *(flight.run("Why did job X abend?", producer) for _ in range(10))
+        )
+
+        assert calls == 1
+        assert all(r.value == "answer" for r in results)
+        assert sum(1 for r in results if not r.shared) == 1
+        assert flight.in_flight == 0
+
+    @pytest.mark.asyncio
+    async def test_normalization_ignores_case_and_whitespace(self):
+        """Keys are case- and whitespace-insensitive."""
+        from resync.core.cache.single_flight import LLMSingleFlight
+
+        flight = LLMSingleFlight(distributed=False)
+
+        assert flight.make_key("  Job  STATUS ") == flight.make_key("job status")
+
+    @pytest.mark.asyncio
+    async def test_failure_is_shared_with_local_followers(self):
+        """Followers see the leader's exception and the flight is cleared."""
+        from resync.core.cache.single_flight import LLMSingleFlight
+
+        flight = LLMSingleFlight(distributed=False)
+
+        async def producer():
+            await asyncio.sleep(0.01)
+            raise RuntimeError("llm down")
+
+        results = await asyncio.gather(
+            flight.run("q", producer), flight.run("q", producer), return_exceptions=True
+        )
+
+        assert all(isinstance(r, RuntimeError) for r in results)
+        assert flight.in_flight == 0
+
+    @pytest.mark.asyncio
+    async def test_cancelled_leader_does_not_fail_followers(self):
+        """A leader that goes away (client disconnect) leaves the generation running."""
+        from resync.core.cache.single_flight import LLMSingleFlight
+
+        flight = LLMSingleFlight(distributed=False)
+        calls = 0
+
+        async def producer():
+            nonlocal calls
+            calls += 1
+            await asyncio.sleep(0.05)
+            return "answer"
+
+        leader = asyncio.create_task(flight.run("q", producer))
+        await asyncio.sleep(0)
+        follower = asyncio.create_task(flight.run("q", producer))
+        await asyncio.sleep(0)
+        leader.cancel()
+
+        result = await asyncio.wait_for(follower, 1.0)
+
+        assert leader.cancelled()
+        assert result.value == "answer" and result.shared
+        assert calls == 1
+        assert flight.in_flight == 0
+
+    @pytest.mark.asyncio
+    async def test_similar_queries_coalesce_within_threshold(self):
+        """Near-duplicates join an in-flight generation when a threshold is given."""
+        from resync.core.cache.single_flight import LLMSingleFlight
+
+        flight = LLMSingleFlight(distributed=False)
+        calls = 0
+
+        async def producer():
+            nonlocal calls
+            calls += 1
+            await asyncio.sleep(0.05)
+            return "answer"
+
+        with patch(
+            "resync.core.cache.single_flight.generate_embedding", return_value=[1.0, 0.0]
+        ):
+            first, second = await asyncio.gather(
+                flight.run("why did job X abend", producer, similarity_threshold=0.1),
+                flight.run("why did job X abend?", producer, similarity_threshold=0.1),
+            )
+
+        assert calls == 1
+        assert second.shared and second.source == "similar"
+
+
+class TestDistributedCoalescing:
+    """Tests for cross-worker lease and notification."""
+
+    @pytest.mark.asyncio
+    async def test_leader_publishes_and_releases_lease(self):
+        """The lease holder publishes its result and releases the lease."""
+        from resync.core.cache.single_flight import LLMSingleFlight
+
+        client = MagicMock()
+        client.set = AsyncMock(return_value=True)
+        client.publish = AsyncMock(return_value=1)
+        client.eval = AsyncMock(return_value=1)
+
+        flight = LLMSingleFlight()
+        with patch(
+            "resync.core.cache.single_flight.get_redis_client", AsyncMock(return_value=client)
+        ):
+            result = await flight.run("q", AsyncMock(return_value="answer"))
+
+        assert result.value == "answer" and not result.shared
+        client.publish.assert_awaited_once()
+        client.eval.assert_awaited_once()
+
+    @pytest.mark.asyncio
+    async def test_follower_waits_for_remote_result(self):
+        """Without the lease, the worker waits for the remote leader's result."""
+        from resync.core.cache.single_flight import LLMSingleFlight
+
+        pubsub = MagicMock()
+        pubsub.subscribe = AsyncMock()
+        pubsub.unsubscribe = AsyncMock()
+        pubsub.aclose = AsyncMock()
+        pubsub.get_message = AsyncMock(
+            return_value={"type": "message", "data": json.dumps({"ok": True, "value": "remote"})}
+        )
+
+        client = MagicMock()
+        client.set = AsyncMock(return_value=None)
+        client.get = AsyncMock(return_value=None)
+        client.exists = AsyncMock(return_value=1)
+        client.pubsub = MagicMock(return_value=pubsub)
+
+        producer = AsyncMock(return_value="local")
+        flight = LLMSingleFlight()
+        with patch(
+            "resync.core.cache.single_flight.get_redis_client", AsyncMock(return_value=client)
+        ):
+            result = await flight.run("q", producer)
+
+        assert result.value == "remote"
+        assert result.shared and result.source == "remote"
+        producer.assert_not_awaited()
+
+    @pytest.mark.asyncio
+    async def test_lease_released_when_result_cannot_be_published(self):
+        """Unserializable results and publish errors still release the lease."""
+        from resync.core.cache.single_flight import LLMSingleFlight
+
+        circular: dict = {}
+        circular["self"] = circular
+
+        client = MagicMock()
+        client.set = AsyncMock(return_value=True)
+        client.publish = AsyncMock(side_effect=ConnectionError("down"))
+        client.eval = AsyncMock(return_value=1)
+
+        flight = LLMSingleFlight()
+        with patch(
+            "resync.core.cache.single_flight.get_redis_client", AsyncMock(return_value=client)
+        ):
+            result = await flight.run("q", AsyncMock(return_value=circular))
+            assert result.value is circular
+            client.eval.assert_awaited_once()
+
+            client.publish = AsyncMock(return_value=1)
+            await flight.run("other", AsyncMock(return_value={"rows": 3}))
+
+        payload = json.loads(client.publish.await_args.args[1])
+        assert payload == {"ok": True, "value": {"rows": 3}}
+        assert client.eval.await_count == 2
+
+    @pytest.mark.asyncio
+    async def test_redis_unavailable_falls_back_to_local(self):
+        """Redis errors degrade to local-only coalescing."""
+        from resync.core.cache.single_flight import LLMSingleFlight
+
+        flight = LLMSingleFlight()
+        with patch(
+            "resync.core.cache.single_flight.get_redis_client",
+            AsyncMock(side_effect=ConnectionError("down")),
+        ):
+            result = await flight.run("q", AsyncMock(return_value="answer"))
+
+        assert result.value == "answer"
+        assert flight.get_stats()["redis_errors"] == 1
+
+
+class TestCachedLLMCallSingleFlight:
+    """Tests for single-flight inside cached_llm_call."""
+
+    @pytest.mark.asyncio
+    async def test_concurrent_misses_call_llm_once(self):
+        """Concurrent misses for one query trigger a single LLM call and store."""
+        from resync.core.cache.llm_cache_wrapper import cached_llm_call
+        from resync.core.cache.semantic_cache import CacheResult, SemanticCache
+        from resync.core.cache.single_flight import LLMSingleFlight
+
+        calls = 0
+
+        async def mock_llm():
+            nonlocal calls
+            calls += 1
+            await asyncio.sleep(0.05)
+            return "LLM response"
+
+        mock_cache = MagicMock(spec=SemanticCache)
+        mock_cache.get = AsyncMock(return_value=CacheResult(hit=False))
+        mock_cache.set = AsyncMock(return_value=True)
+
+        with patch(
+            "resync.core.cache.llm_cache_wrapper.get_llm_single_flight",
+            return_value=LLMSingleFlight(distributed=False),
+        ):
+            results = await asyncio.gather(
+                *(
+                    cached_llm_call(query="why did job X abend", llm_func=mock_llm, cache=mock_cache)
+                    for _ in range(5)
+                )
+            )
+            await asyncio.sleep(0)
+
+        assert calls == 1
+        assert sum(1 for r in results if r.metadata["coalesced"]) == 4
+        mock_cache.set.assert_awaited_once()
@@ -0,0 +1,182 @@
+"""
+Tests for Health Check Scheduler
+
+This module contains unit tests for the HealthCheckScheduler class and the
+cached, single-flight health checks it provides to the health services.
+"""
+
+import asyncio
+from datetime import datetime, timedelta
+
+import pytest
+
+from resync.core.health.health_check_scheduler import HealthCheckScheduler
+from resync.core.health.health_models import (
+    ComponentHealth,
+    ComponentType,
+    HealthCheckConfig,
+    HealthStatus,
+)
+from resync.core.health.health_service import HealthCheckService
+
+
+class CountingCheck:
+    """Check function that counts calls and can be held open."""
+
+    def __init__(self, name: str, status: HealthStatus = HealthStatus.HEALTHY):
+        self.name = name
+        self.status = status
+        self.calls = 0
+        self.release = asyncio.Event()
+        self.release.set()
+
+    async def __call__(self) -> ComponentHealth:
+        self.calls += 1
+        await self.release.wait()
+        return ComponentHealth(
+            name=self.name, component_type=ComponentType.OTHER, status=self.status
+        )
+
+
+def make_config(**overrides) -> HealthCheckConfig:
+    config = HealthCheckConfig(component_timeout_seconds=1, **overrides)
+    config.component_check_intervals = {"database": 10, "cpu": 1}
+    return config
+
+
+class TestHealthCheckScheduler:
+    """Test cases for HealthCheckScheduler."""
+
+    async def test_fresh_results_are_served_from_cache(self):
+        scheduler = HealthCheckScheduler(make_config())
+        check = CountingCheck("database")
+        scheduler.register("database", check)
+
+        first = await scheduler.get_components()
+        second = await scheduler.get_components()
+
+        assert check.calls == 1
+        assert first["database"] is second["database"]
+        assert second["database"].last_check is not None
+
+    async def test_stale_results_are_refreshed(self):
+        scheduler = HealthCheckScheduler(make_config())
+        check = CountingCheck("database")
+        scheduler.register("database", check)
+        health = (await scheduler.get_components())["database"]
+
+        health.last_check = datetime.now() - timedelta(
+            seconds=scheduler.max_staleness_for("database") + 1
+        )
+        await scheduler.get_components()
+
+        assert check.calls == 2
+
+    async def test_concurrent_refreshes_are_single_flight(self):
+        scheduler = HealthCheckScheduler(make_config())
+        check = CountingCheck("database")
+        check.release.clear()
+        scheduler.register("database", check)
+
+        waiters = [asyncio.create_task(scheduler.refresh("database")) for _ in range(10)]
+        waiters.append(asyncio.create_task(scheduler.get_components(force=True)))
+        await asyncio.sleep(0)
+        check.release.set()
+        await asyncio.gather(*waiters)
+
+        assert check.calls == 1
+        assert scheduler.get_stats()["coalesced_refreshes"] == 10
+
+    async def test_check_errors_and_timeouts_are_unhealthy(self):
+        scheduler = HealthCheckScheduler(make_config())
+
+        async def failing():
+            raise ConnectionError("refused")
+
+        hanging = CountingCheck("redis")
+        hanging.release.clear()
+        scheduler.register("database", failing)
+        scheduler.register("redis", hanging)
+        scheduler.config.component_timeout_seconds = 0.01
+
+        components = await scheduler.get_components()
+
+        assert components["database"].status == HealthStatus.UNHEALTHY
+        assert components["database"].message == "refused"
+        assert components["redis"].message == "Check timeout"
+
+    async def test_snapshot_does_not_run_checks(self):
+        scheduler = HealthCheckScheduler(make_config())
+        check = CountingCheck("database")
+        scheduler.register("database", check)
+
+        assert scheduler.snapshot() == {}
+
+        await scheduler.refresh("database")
+        scheduler.cache.peek("database").last_check = datetime.now() - timedelta(days=1)
+        snapshot = scheduler.snapshot()
+
+        assert check.calls == 1
+        assert snapshot["database"].status == HealthStatus.UNKNOWN
+        assert snapshot["database"].metadata["last_status"] == "healthy"
+
+    async def test_background_checks_follow_component_cadence(self):
+        scheduler = HealthCheckScheduler(make_config(check_jitter_ratio=0.0))
+        fast, slow = CountingCheck("cpu"), CountingCheck("database")
+        scheduler.register("cpu", fast)
+        scheduler.register("database", slow)
+        scheduler.config.component_check_intervals = {"database": 10, "cpu": 0.01}
+
+        await scheduler.start()
+        await asyncio.sleep(0.1)
+        await scheduler.stop()
+
+        assert slow.calls == 1
+        assert fast.calls > 3
+        assert not scheduler.is_running
+
+    def test_jitter_stays_within_ratio(self):
+        scheduler = HealthCheckScheduler(make_config(check_jitter_ratio=0.2))
+
+        delays = [scheduler._next_delay("database") for _ in range(200)]
+
+        assert all(8.0 <= delay <= 12.0 for delay in delays)
+        assert len(set(delays)) > 1
+
+
+class TestHealthCheckServiceCaching:
+    """HealthCheckService serves component results from the scheduler."""
+
+    @pytest.fixture
+    def service(self):
+        service = HealthCheckService(make_config())
+        self.checks = {
+            "database": CountingCheck("database"),
+            "redis": CountingCheck("redis", HealthStatus.DEGRADED),
+        }
+        service._checkers = self.checks
+        for name, check in self.checks.items():
+            service.scheduler.register(name, check)
+        return service
+
+    async def test_repeated_checks_hit_cache(self, service):
+        await service.perform_comprehensive_health_check()
+        result = await service.perform_comprehensive_health_check()
+
+        assert result.overall_status == HealthStatus.DEGRADED
+        assert all(check.calls == 1 for check in self.checks.values())
+
+    async def test_force_rechecks_every_component(self, service):
+        await service.perform_comprehensive_health_check()
+        await service.perform_comprehensive_health_check(force=True)
+
+        assert all(check.calls == 2 for check in self.checks.values())
+
+    async def test_cached_result_has_no_io(self, service):
+        assert service.get_cached_health_result().overall_status == HealthStatus.UNKNOWN
+
+        await service.perform_comprehensive_health_check()
+        cached = service.get_cached_health_result()
+
+        assert set(cached.components) == {"database", "redis"}
+        assert all(check.calls == 1 for check in self.checks.values())
@@ -0,0 +1,199 @@
+"""
+Tests for binary/delta checkpoint encoding in PostgresCheckpointer.
+
+Covers:
+1. Codec round trip and compression
+2. Delta chains store only changed channels
+3. Rebuilding state from the full base
+4. Periodic compaction into full checkpoints
+"""
+
+import pytest
+
+from resync.core.langgraph import checkpoint_codec as codec
+from resync.core.langgraph.checkpointer import (
+    FORMAT_DELTA,
+    FORMAT_FULL,
+    PostgresCheckpointer,
+)
+
+
+@pytest.fixture
+def checkpointer():
+    """Fresh (non-singleton) checkpointer instance."""
+    PostgresCheckpointer._instance = None
+    PostgresCheckpointer._initialized = False
+    cp = PostgresCheckpointer(compaction_interval=4)
+    yield cp
+    PostgresCheckpointer._instance = None
+    PostgresCheckpointer._initialized = False
+
+
+def _write(cp, chain, thread_id, checkpoint_id, checkpoint):
+    """Encode a checkpoint and keep the row the way Postgres would."""
+    fmt, blob, base_id, delta_parent, depth = cp._encode_binary(
+        thread_id, checkpoint_id, None, checkpoint
+    )
+    chain[checkpoint_id] = (checkpoint_id, fmt, blob, base_id, delta_parent)
+    return fmt, blob, depth
+
+
+class TestCheckpointCodec:
+    """Tests for the binary codec."""
+
+    def test_roundtrip(self):
+        data = {"messages": ["a", "b"], "step": 3, "nested": {"x": [1.5, None]}}
+
+        assert codec.decode(codec.encode(data)) == data
+
+    def test_large_payload_is_compressed(self):
+        data = {"log": "ABEND " * 5000}
+        blob = codec.encode(data, compress_threshold=1024)
+
+        assert len(blob) < 5000
+        assert blob[4] != codec.COMPRESSION_NONE
+        assert codec.decode(blob) == data
+
+    def test_unknown_types_fall_back_to_str(self):
+        from datetime import datetime
+
+        ts = datetime(2024, 1, 1, 12, 0)
+
+        assert codec.decode(codec.encode({"ts": ts})) == {"ts": str(ts)}
+
+    def test_rejects_foreign_blob(self):
+        with pytest.raises(codec.CheckpointCodecError):
+            codec.decode(b'{"not": "binary"}')
+
+
+class TestDeltaChains:
+    """Tests for delta writes and rebuilds."""
+
+    def test_second_write_stores_only_changed_channels(self, checkpointer):
+        chain = {}
+        big = {"channel_values": {"logs": "x" * 20000, "step": 1}, "v": 1}
+        _write(checkpointer, chain, "t1", "c1", big)
+
+        changed = {"channel_values": {"logs": "x" * 20000, "step": 2}, "v": 1}
+        fmt, blob, depth = _write(checkpointer, chain, "t1", "c2", changed)
+
+        assert fmt == FORMAT_DELTA and depth == 1
+        record = codec.decode(blob)
+        assert record["set"] == {"step": 2}
+        assert len(blob) < 200
+
+    def test_rebuild_replays_chain(self, checkpointer):
+        chain = {}
+        states = [
+            {"channel_values": {"a": 1, "b": [1]}, "v": 1},
+            {"channel_values": {"a": 2, "b": [1]}, "v": 1},
+            {"channel_values": {"b": [1, 2]}, "v": 1},
+        ]
+        for i, state in enumerate(states):
+            _write(checkpointer, chain, "t1", f"c{i}", state)
+
+        for i, state in enumerate(states):
+            assert PostgresCheckpointer._rebuild(f"c{i}", chain) == state
+
+    def test_plain_dict_state(self, checkpointer):
+        chain = {}
+        _write(checkpointer, chain, "t1", "c1", {"message": "hi", "intent": "status"})
+        _write(checkpointer, chain, "t1", "c2", {"message": "hi", "intent": "logs"})
+
+        assert PostgresCheckpointer._rebuild("c2", chain) == {
+            "message": "hi",
+            "intent": "logs",
+        }
+
+    def test_compaction_interval_starts_new_chain(self, checkpointer):
+        chain = {}
+        formats = [
+            _write(checkpointer, chain, "t1", f"c{i}", {"step": i})[0] for i in range(6)
+        ]
+
+        assert formats == [
+            FORMAT_FULL,
+            FORMAT_DELTA,
+            FORMAT_DELTA,
+            FORMAT_DELTA,
+            FORMAT_FULL,
+            FORMAT_DELTA,
+        ]
+        assert PostgresCheckpointer._rebuild("c5", chain) == {"step": 5}
+
+    def test_threads_are_independent(self, checkpointer):
+        chain = {}
+        _write(checkpointer, chain, "t1", "a1", {"x": 1})
+        fmt, _, _ = _write(checkpointer, chain, "t2", "b1", {"x": 1})
+
+        assert fmt == FORMAT_FULL
+
+    def test_broken_chain_raises(self, checkpointer):
+        chain = {}
+        _write(checkpointer, chain, "t1", "c1", {"x": 1})
+        _write(checkpointer, chain, "t1", "c2", {"x": 2})
+        del chain["c1"]
+
+        with pytest.raises(codec.CheckpointCodecError):
+            PostgresCheckpointer._rebuild("c2", chain)
+
+
+class _ParentRowSession:
+    """Session stub answering the delta-parent lookup with a fixed row."""
+
+    def __init__(self, row):
+        self.row = row
+        self.statements = []
+
+    async def execute(self, query, params=None):
+        self.statements.append(str(query))
+        row = self.row
+
+        class _Result:
+            def fetchone(self):
+                return row
+
+        return _Result()
+
+
+class TestConcurrentCompaction:
+    """Deltas written after another worker compacted their parent."""
+
+    @pytest.mark.asyncio
+    async def test_delta_follows_parent_to_new_base(self, checkpointer):
+        chain = {}
+        _write(checkpointer, chain, "t1", "c1", {"x": 1})
+        _write(checkpointer, chain, "t1", "c2", {"x": 2})
+        encoded = checkpointer._encode_binary("t1", "c3", "c2", {"x": 3})
+        assert encoded[2] == "c1" and encoded[4] == 2
+
+        # Another worker compacted c2: it is now the full base of its chain
+        session = _ParentRowSession(("c2", 0))
+        fmt, blob, base_id, delta_parent, depth = await checkpointer._confirm_delta_parent(
+            session, "t1", "c3", {"x": 3}, encoded
+        )
+
+        assert "FOR SHARE" in session.statements[0]
+        assert (fmt, base_id, delta_parent, depth) == (FORMAT_DELTA, "c2", "c2", 1)
+        assert checkpointer._chains[("t1", "c3")].base_id == "c2"
+
+        compacted = codec.encode({"header": None, "set": {"x": 2}, "del": []})
+        chain["c2"] = ("c2", FORMAT_FULL, compacted, "c2", None)
+        chain["c3"] = ("c3", fmt, blob, base_id, delta_parent)
+        rows = {cid: row for cid, row in chain.items() if row[3] == base_id}
+        assert PostgresCheckpointer._rebuild("c3", rows) == {"x": 3}
+
+    @pytest.mark.asyncio
+    async def test_missing_parent_writes_full_checkpoint(self, checkpointer):
+        chain = {}
+        _write(checkpointer, chain, "t1", "c1", {"x": 1})
+        encoded = checkpointer._encode_binary("t1", "c2", "c1", {"x": 2})
+
+        fmt, blob, base_id, delta_parent, depth = await checkpointer._confirm_delta_parent(
+            _ParentRowSession(None), "t1", "c2", {"x": 2}, encoded
+        )
+
+        assert (fmt, base_id, delta_parent, depth) == (FORMAT_FULL, "c2", None, 0)
+        assert PostgresCheckpointer._rebuild("c2", {"c2": ("c2", fmt, blob, "c2", None)}) == {
+            "x": 2
+        }
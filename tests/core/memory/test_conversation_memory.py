@@ -0,0 +1,149 @@
+"""
+Tests for the append-only Redis conversation store.
+
+Covers:
+1. Append-only saves (only new messages are pushed)
+2. Capped message list
+3. Session index ordered by last activity
+4. Tail-only prompt context reads
+5. Migration of legacy single-blob sessions
+"""
+
+import json
+
+import pytest
+
+from resync.core.memory.conversation_memory import (
+    ConversationContext,
+    ConversationMemory,
+    RedisMemoryStore,
+)
+
+fakeredis = pytest.importorskip("fakeredis")
+
+
+# =============================================================================
+# FIXTURES
+# =============================================================================
+
+
+@pytest.fixture
+async def store() -> RedisMemoryStore:
+    """Redis store backed by an in-process fake Redis."""
+    store = RedisMemoryStore(max_messages=4)
+    store._redis = fakeredis.FakeAsyncRedis(decode_responses=True)
+    yield store
+    await store.close()
+
+
+# =============================================================================
+# TESTS
+# =============================================================================
+
+
+class TestRedisMemoryStore:
+    """Tests for RedisMemoryStore storage layout."""
+
+    @pytest.mark.asyncio
+    async def test_roundtrip(self, store):
+        ctx = ConversationContext(session_id="s1")
+        ctx.add_message("user", "Show me job AWSBH001")
+        ctx.add_message("assistant", "AWSBH001 is running")
+        await store.save_context(ctx)
+
+        loaded = await store.load_context("s1")
+
+        assert [m.content for m in loaded.messages] == [
+            "Show me job AWSBH001",
+            "AWSBH001 is running",
+        ]
+        assert loaded.get_last_job() == "AWSBH001"
+        assert loaded.turn_count == 2
+
+    @pytest.mark.asyncio
+    async def test_save_appends_only_new_messages(self, store):
+        ctx = ConversationContext(session_id="s1")
+        ctx.add_message("user", "first")
+        await store.save_context(ctx)
+
+        loaded = await store.load_context("s1")
+        loaded.add_message("user", "second")
+        await store.save_context(loaded)
+        # Saving again without changes must not duplicate anything
+        await store.save_context(loaded)
+
+        raw = await store._redis.lrange(store._messages_key("s1"), 0, -1)
+        assert [json.loads(m)["content"] for m in raw] == ["first", "second"]
+
+    @pytest.mark.asyncio
+    async def test_message_list_is_capped(self, store):
+        ctx = ConversationContext(session_id="s1")
+        for i in range(10):
+            ctx.add_message("user", f"msg {i}")
+        await store.save_context(ctx)
+
+        loaded = await store.load_context("s1")
+
+        assert [m.content for m in loaded.messages] == [f"msg {i}" for i in range(6, 10)]
+
+    @pytest.mark.asyncio
+    async def test_list_sessions_most_recent_first(self, store):
+        for sid, ts in (("old", 100.0), ("new", 200.0)):
+            ctx = ConversationContext(session_id=sid)
+            ctx.add_message("user", "hi")
+            ctx.last_activity = ts
+            await store.save_context(ctx)
+        store.ttl_seconds = 10**10
+
+        assert await store.list_sessions() == ["new", "old"]
+
+    @pytest.mark.asyncio
+    async def test_prompt_context_reads_tail(self, store):
+        ctx = ConversationContext(session_id="s1")
+        for i in range(4):
+            ctx.add_message("user", f"question {i} about JOB_{i}X")
+        await store.save_context(ctx)
+
+        prompt = await store.get_context_for_prompt("s1", max_messages=2)
+
+        assert "question 3" in prompt and "question 2" in prompt
+        assert "question 1" not in prompt
+        assert prompt == (await store.load_context("s1")).get_context_for_prompt(2)
+
+    @pytest.mark.asyncio
+    async def test_delete_context(self, store):
+        ctx = ConversationContext(session_id="s1")
+        ctx.add_message("user", "hi")
+        await store.save_context(ctx)
+
+        assert await store.delete_context("s1") is True
+        assert await store.load_context("s1") is None
+        assert await store.list_sessions() == []
+
+    @pytest.mark.asyncio
+    async def test_legacy_blob_is_migrated(self, store):
+        legacy = ConversationContext(session_id="s1")
+        legacy.add_message("user", "legacy message")
+        await store._redis.set(store._key("s1"), json.dumps(legacy.to_dict()))
+
+        loaded = await store.load_context("s1")
+        loaded.add_message("user", "new message")
+        await store.save_context(loaded)
+
+        assert await store._redis.get(store._key("s1")) is None
+        reloaded = await store.load_context("s1")
+        assert [m.content for m in reloaded.messages] == ["legacy message", "new message"]
+
+
+class TestConversationMemoryPromptContext:
+    """Tests for ConversationMemory.get_context_for_prompt."""
+
+    @pytest.mark.asyncio
+    async def test_delegates_to_store(self, store):
+        memory = ConversationMemory(store=store)
+        await memory.add_turn("s1", "status of PAYROLL_01", "PAYROLL_01 completed")
+
+        prompt = await memory.get_context_for_prompt("s1")
+
+        assert "PAYROLL_01 completed" in prompt
+        assert await memory.get_context_for_prompt("unknown") == ""
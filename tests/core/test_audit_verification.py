@@ -0,0 +1,159 @@
+"""
+Tests for incremental Merkle verification of the encrypted audit trail.
+
+Tests cover:
+- Merkle roots and inclusion proofs
+- Checkpointing and incremental verification of stored blocks
+- Tamper detection (ciphertext, checkpoints, block links)
+- Inclusion proofs in forensic exports
+"""
+
+import json
+
+import pytest
+
+from resync.core.audit_verification import (
+    CHECKPOINT_FILE_NAME,
+    merkle_proof,
+    merkle_root,
+    verify_merkle_proof,
+)
+from resync.core.encrypted_audit import EncryptedAuditConfig, EncryptedAuditTrail
+
+
+def hashes(n: int) -> list[str]:
+    return [f"{i:064x}" for i in range(n)]
+
+
+@pytest.mark.parametrize("size", [1, 2, 3, 7, 8, 13])
+def test_every_leaf_has_a_valid_proof(size):
+    leaves = hashes(size)
+    root = merkle_root(leaves)
+
+    for index, leaf in enumerate(leaves):
+        assert verify_merkle_proof(leaf, merkle_proof(leaves, index), root)
+
+
+def test_proof_rejects_other_leaf_and_root():
+    leaves = hashes(5)
+    proof = merkle_proof(leaves, 2)
+
+    assert not verify_merkle_proof(leaves[3], proof, merkle_root(leaves))
+    assert not verify_merkle_proof(leaves[2], proof, merkle_root(hashes(6)))
+
+
+@pytest.fixture
+async def trail(tmp_path):
+    config = EncryptedAuditConfig(
+        audit_log_directory=str(tmp_path),
+        max_entries_per_block=5,
+        fsync_enabled=False,
+        verification_workers=2,
+    )
+    trail = EncryptedAuditTrail(config)
+    yield trail
+    await trail.verifier.close()
+
+
+async def log(trail, count: int, start: int = 0) -> None:
+    for i in range(start, start + count):
+        await trail.log_event("config_change", user_id=f"user{i % 3}", details={"i": i})
+
+
+class TestIncrementalVerification:
+    """Checkpoints and incremental runs."""
+
+    async def test_only_new_blocks_are_verified(self, trail):
+        await log(trail, 15)
+
+        first = await trail.verifier.verify()
+        second = await trail.verifier.verify()
+        await log(trail, 5, start=15)
+        third = await trail.verifier.verify()
+
+        assert first["valid"] and first["blocks_verified"] == 3
+        assert first["entries_verified"] == 15
+        assert second["blocks_verified"] == 0
+        assert third["blocks_verified"] == 1
+        assert third["checkpointed_blocks"] == 4
+
+    async def test_verify_integrity_reports_blocks(self, trail):
+        await log(trail, 12)
+
+        result = await trail.verify_integrity()
+
+        assert result["integrity_status"] == "valid"
+        assert result["blocks_verified"] == 2
+
+    async def test_tampered_block_is_not_checkpointed(self, trail):
+        await log(trail, 10)
+        store = trail.segment_store
+        ref = store.refs()[0]
+        with open(store.segment_path(ref.segment), "r+b") as f:
+            f.seek(ref.offset + ref.length - 10)
+            f.write(b"\xff" * 4)
+
+        result = await trail.verifier.verify()
+
+        assert not result["valid"]
+        assert any("block_000000" in issue for issue in result["issues"])
+        assert result["checkpointed_blocks"] == 0
+
+    async def test_checkpoint_tampering_is_detected(self, trail, tmp_path):
+        await log(trail, 10)
+        await trail.verifier.verify()
+        checkpoint_file = tmp_path / CHECKPOINT_FILE_NAME
+        lines = checkpoint_file.read_text().splitlines()
+        forged = json.loads(lines[0])
+        forged["merkle_root"] = "0" * 64
+        checkpoint_file.write_text("\n".join([json.dumps(forged), *lines[1:]]) + "\n")
+
+        reloaded = type(trail.verifier)(trail)
+        issues = reloaded.verify_checkpoints()
+
+        assert "block_000000:checkpoint_signature_invalid" in issues
+
+    async def test_full_check_rehashes_checkpointed_blocks(self, trail):
+        await log(trail, 10)
+        await trail.verifier.verify()
+
+        result = await trail.verifier.verify(full=True)
+
+        assert result["valid"]
+        assert result["blocks_verified"] == 2
+
+
+    async def test_worker_pool_is_reused_and_closed(self, trail):
+        await log(trail, 10)
+        await trail.verifier.verify()
+        executor = trail.verifier._executor
+        await log(trail, 5, start=10)
+        await trail.verifier.verify()
+
+        assert executor is not None and trail.verifier._executor is executor
+        assert executor._mp_context.get_start_method() == "spawn"
+        await trail.verifier.close()
+        assert trail.verifier._executor is None
+
+
+class TestForensicExport:
+    """Inclusion proofs of exported events."""
+
+    async def test_exported_events_carry_proofs(self, trail):
+        await log(trail, 12)
+        entries = await trail.search_events(limit=100)
+        start = min(entry.timestamp for entry in entries)
+        end = max(entry.timestamp for entry in entries)
+
+        export = await trail.export_forensic_data(start, end)
+
+        proofs = export["inclusion_proofs"]
+        # 10 events in two stored blocks, 2 still pending
+        assert len(proofs) == 10
+        for event in export["events"]:
+            proof = proofs.get(event["entry_id"])
+            if proof is None:
+                continue
+            assert proof["checkpointed"] is True
+            assert proof["leaf_hash"] == event["hash_value"]
+            assert verify_merkle_proof(proof["leaf_hash"], proof["proof"], proof["merkle_root"])
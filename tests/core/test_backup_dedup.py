@@ -0,0 +1,257 @@
+"""
+Tests for streaming, deduplicated backups.
+
+Tests cover:
+- Content-defined chunk boundaries (stable under insertions)
+- Repository deduplication, verified restore and corruption detection
+- Pruning of chunks released by deleted snapshots
+- BackupService streaming a (fake) pg_dump into zstd and the repository
+"""
+
+import hashlib
+import io
+import random
+import sys
+import tarfile
+import zipfile
+
+import pytest
+
+from resync.core.backup.backup_service import ZSTD_AVAILABLE, BackupService, BackupStatus
+from resync.core.backup.dedup_repository import (
+    ContentDefinedChunker,
+    DedupRepository,
+    RepositoryIntegrityError,
+)
+
+SMALL_CHUNKS = {"min_size": 1024, "avg_size": 4096, "max_size": 16384}
+
+
+def sql_dump(rows: int, seed: int = 0, changed: tuple[int, ...] = ()) -> bytes:
+    """Deterministic pseudo pg_dump output."""
+    rng = random.Random(seed)
+    lines = [
+        f"{i}\tjob_{i:06d}\t{'FAILED' if i in changed else 'SUCC'}\t{rng.random():.12f}\n"
+        for i in range(rows)
+    ]
+    return ("COPY public.jobs (id, name, status, score) FROM stdin;\n" + "".join(lines)).encode()
+
+
+async def chunks_of(data: bytes, size: int = 7000):
+    for start in range(0, len(data), size):
+        yield data[start : start + size]
+
+
+@pytest.fixture
+def repository(tmp_path):
+    repo = DedupRepository(
+        tmp_path / "repo",
+        chunker=ContentDefinedChunker(**SMALL_CHUNKS),
+        fsync=False,
+        scan_buffer_size=64 * 1024,
+    )
+    yield repo
+    repo.close()
+
+
+async def store(repo, snapshot_id: str, data: bytes):
+    async with repo.create_snapshot(snapshot_id) as writer:
+        await writer.add_stream("database/dump.sql", chunks_of(data))
+    return writer.snapshot
+
+
+def test_boundaries_survive_an_insertion():
+    chunker = ContentDefinedChunker(**SMALL_CHUNKS)
+    data = random.Random(1).randbytes(500_000)
+    edited = data[:1000] + b"inserted row\n" + data[1000:]
+
+    original = set(chunker.cut_points(data, final=True))
+    shifted = {cut - 13 for cut in chunker.cut_points(edited, final=True)}
+
+    assert len(original & shifted) >= len(original) - 2
+
+
+def test_chunk_sizes_are_bounded():
+    chunker = ContentDefinedChunker(**SMALL_CHUNKS)
+    data = random.Random(2).randbytes(300_000) + b"\x00" * 100_000
+
+    cuts = chunker.cut_points(data, final=True)
+    sizes = [end - start for start, end in zip([0, *cuts], cuts)]
+
+    assert cuts[-1] == len(data)
+    assert max(sizes) <= SMALL_CHUNKS["max_size"]
+    assert min(sizes[:-1]) >= SMALL_CHUNKS["min_size"]
+
+
+class TestRepository:
+    """DedupRepository snapshots."""
+
+    async def test_repeated_backup_stores_only_changed_chunks(self, repository):
+        first = await store(repository, "day1", sql_dump(20_000))
+        second = await store(repository, "day2", sql_dump(20_000, changed=(15_000,)))
+
+        assert first.new_chunks == len(first.files["database/dump.sql"].chunks)
+        assert 0 < second.new_chunks <= 2
+        assert second.new_bytes < first.new_bytes / 10
+
+    async def test_restore_is_byte_identical(self, repository, tmp_path):
+        data = sql_dump(5_000)
+        snapshot = await store(repository, "s1", data)
+
+        result = await repository.restore("s1", tmp_path / "restore")
+
+        restored = (tmp_path / "restore" / "database" / "dump.sql").read_bytes()
+        assert restored == data
+        assert result["verified"] and result["bytes"] == len(data)
+        stored = snapshot.files["database/dump.sql"]
+        assert stored.sha256 == hashlib.sha256(data).hexdigest()
+
+    async def test_corrupt_chunk_fails_verification(self, repository, tmp_path):
+        await store(repository, "s1", sql_dump(5_000))
+        chunk_file = next((repository.root / "chunks").glob("*/*"))
+        chunk_file.write_bytes(chunk_file.read_bytes()[:-8] + b"garbage!")
+
+        with pytest.raises(RepositoryIntegrityError):
+            await repository.restore("s1", tmp_path / "restore")
+        assert not (tmp_path / "restore" / "database" / "dump.sql").exists()
+
+    async def test_exported_archive_is_rebuilt_from_chunks(self, repository):
+        data = sql_dump(5_000)
+        await store(repository, "s1", data)
+
+        archive = b"".join([piece async for piece in repository.export_archive("s1")])
+
+        assert len(archive) % tarfile.RECORDSIZE == 0
+        with tarfile.open(fileobj=io.BytesIO(archive)) as tar:
+            assert tar.getnames() == ["database/dump.sql"]
+            assert tar.extractfile("database/dump.sql").read() == data
+
+    async def test_corrupt_chunk_aborts_export(self, repository):
+        await store(repository, "s1", sql_dump(5_000))
+        chunk_file = next((repository.root / "chunks").glob("*/*"))
+        chunk_file.write_bytes(chunk_file.read_bytes()[:-8] + b"garbage!")
+
+        with pytest.raises(RepositoryIntegrityError):
+            async for _ in repository.export_archive("s1"):
+                pass
+
+    async def test_delete_prunes_unshared_chunks(self, repository):
+        await store(repository, "old", sql_dump(10_000, seed=1))
+        await store(repository, "new", sql_dump(10_000, seed=2))
+        before = repository.get_statistics()["chunks"]
+
+        pruned = await repository.delete_snapshot("old")
+
+        assert pruned["removed_chunks"] > 0
+        assert repository.get_statistics()["chunks"] == before - pruned["removed_chunks"]
+        assert (await repository.verify("new"))["verified"]
+
+    async def test_paths_cannot_escape_the_restore_directory(self, repository):
+        async with repository.create_snapshot("bad") as writer:
+            with pytest.raises(ValueError):
+                await writer.add_stream("../etc/passwd", chunks_of(b"x"))
+
+
+@pytest.fixture
+def backup_service(tmp_path, monkeypatch):
+    monkeypatch.setenv("BACKUP_DIR", str(tmp_path / "backups"))
+    monkeypatch.setattr(BackupService, "_instance", None)
+    service = BackupService()
+    service._repository = DedupRepository(
+        tmp_path / "backups" / "repository",
+        chunker=ContentDefinedChunker(**SMALL_CHUNKS),
+        fsync=False,
+    )
+
+    project = tmp_path / "project"
+    (project / "config").mkdir(parents=True)
+    (project / "config" / "app.yaml").write_text("debug: false\n")
+    (project / ".env").write_text("SECRET=1\n")
+    service._project_root = project
+    service._config_paths = ["config/", ".env"]
+
+    dump_file = tmp_path / "dump.sql"
+    dump_file.write_bytes(sql_dump(20_000))
+    service._dump_file = dump_file
+
+    def fake_pg_dump(db_config):
+        script = f"import sys; sys.stdout.buffer.write(open({str(dump_file)!r}, 'rb').read())"
+        return [sys.executable, "-c", script], {}
+
+    monkeypatch.setattr(service, "_pg_dump_command", fake_pg_dump)
+    yield service
+    service._repository.close()
+
+
+class TestBackupService:
+    """BackupService streaming and deduplicated full backups."""
+
+    async def test_database_backup_checksum_is_computed_inline(self, backup_service):
+        backup = await backup_service.create_database_backup()
+
+        assert backup.status == BackupStatus.COMPLETED
+        assert backup.filename.endswith(".sql.zst" if ZSTD_AVAILABLE else ".sql.gz")
+        with open(backup.filepath, "rb") as f:
+            assert backup.checksum_sha256 == hashlib.sha256(f.read()).hexdigest()
+        assert (await backup_service.verify_backup(backup.id))["verified"]
+
+    async def test_failed_dump_removes_partial_file(self, backup_service, monkeypatch):
+        monkeypatch.setattr(
+            backup_service,
+            "_pg_dump_command",
+            lambda db_config: ([sys.executable, "-c", "import sys; sys.exit(3)"], {}),
+        )
+
+        backup = await backup_service.create_database_backup()
+
+        assert backup.status == BackupStatus.FAILED
+        assert "pg_dump failed" in backup.error
+        assert not list(backup_service._db_backup_dir.iterdir())
+
+    async def test_config_backup_zip_matches_checksum(self, backup_service):
+        backup = await backup_service.create_config_backup()
+
+        with open(backup.filepath, "rb") as f:
+            assert backup.checksum_sha256 == hashlib.sha256(f.read()).hexdigest()
+        with zipfile.ZipFile(backup.filepath) as zf:
+            assert zf.read("config/app.yaml") == b"debug: false\n"
+            assert zf.testzip() is None
+
+    async def test_full_backups_are_deduplicated_and_restorable(self, backup_service, tmp_path):
+        first = await backup_service.create_full_backup()
+        backup_service._dump_file.write_bytes(sql_dump(20_000, changed=(100,)))
+        second = await backup_service.create_full_backup()
+
+        assert first.status == second.status == BackupStatus.COMPLETED
+        assert second.size_bytes < first.size_bytes / 5
+        # "FAILED" is two bytes longer than "SUCC"
+        assert second.metadata["logical_size_bytes"] == first.metadata["logical_size_bytes"] + 2
+
+        result = await backup_service.restore_backup(second.id, tmp_path / "restore")
+
+        assert result["verified"]
+        restored = tmp_path / "restore"
+        assert (restored / "database" / "resync_db.sql").read_bytes() == sql_dump(
+            20_000, changed=(100,)
+        )
+        assert (restored / "config" / ".env").read_text() == "SECRET=1\n"
+
+        assert await backup_service.delete_backup(first.id)
+        assert (await backup_service.verify_backup(second.id))["verified"]
+
+    async def test_full_backup_exports_and_restores_by_id(self, backup_service):
+        backup = await backup_service.create_full_backup()
+
+        archive = b"".join([piece async for piece in backup_service.export_backup(backup.id)])
+        with tarfile.open(fileobj=io.BytesIO(archive)) as tar:
+            assert tar.extractfile("config/.env").read() == b"SECRET=1\n"
+            assert tar.extractfile("database/resync_db.sql").read() == sql_dump(20_000)
+
+        result = await backup_service.restore_backup(backup.id)
+        restored = backup_service._backup_dir / "restores" / backup.id
+        assert result["target_dir"] == str(restored)
+        assert (restored / "config" / ".env").read_text() == "SECRET=1\n"
+
+        database = await backup_service.create_database_backup()
+        with pytest.raises(ValueError):
+            backup_service.export_backup(database.id)
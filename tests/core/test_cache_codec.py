@@ -0,0 +1,121 @@
+"""
+Tests for the cache value codec.
+
+Tests cover:
+- Round-trips of rich types (datetime, Decimal, UUID, tuple, set, bytes)
+- Compression above the threshold
+- AES-GCM / ChaCha20-Poly1305 authentication, key binding and key rotation
+- Keyring configuration from the environment
+"""
+
+import base64
+import datetime as dt
+import uuid
+from decimal import Decimal
+
+import pytest
+
+from resync.core import cache_codec
+from resync.core.cache_codec import CacheCodecError, CacheKeyring, CacheValueCodec
+
+
+def tws_job(i: int = 0) -> dict:
+    return {
+        "job_id": f"JOB_{i:05d}",
+        "workstation": "CPU_MASTER",
+        "status": "SUCC",
+        "return_code": 0,
+        "started_at": dt.datetime(2024, 5, 1, 2, 30, tzinfo=dt.UTC),
+        "sched_date": dt.date(2024, 5, 1),
+        "cpu_seconds": Decimal("12.375"),
+        "run_id": uuid.UUID(int=i),
+        "dependencies": ("JOB_A", "JOB_B"),
+        "tags": {"batch", "nightly"},
+        "stdout_tail": b"\x00\x01 done",
+    }
+
+
+@pytest.fixture
+def keyring():
+    return CacheKeyring({"k1": CacheKeyring.generate_key()})
+
+
+def test_round_trip_preserves_types():
+    codec = CacheValueCodec()
+    value = tws_job(7)
+
+    assert codec.decode(codec.encode(value)) == value
+
+
+def test_large_values_are_compressed():
+    codec = CacheValueCodec(compress_threshold=256)
+    value = [tws_job(i) for i in range(200)]
+
+    blob = codec.encode(value)
+
+    assert blob[4] == cache_codec.COMPRESSION_ZSTD
+    assert codec.decode(blob) == value
+    assert len(blob) < len(CacheValueCodec(compress_threshold=1 << 30).encode(value)) / 3
+
+
+@pytest.mark.parametrize("cipher", ["aes-gcm", "chacha20-poly1305"])
+def test_encrypted_round_trip_and_tamper_detection(keyring, cipher):
+    codec = CacheValueCodec(keyring, cipher=cipher)
+    blob = codec.encode(tws_job(), b"cache:job:1")
+
+    assert b"CPU_MASTER" not in blob
+    assert codec.decode(blob, b"cache:job:1") == tws_job()
+
+    tampered = bytearray(blob)
+    tampered[-1] ^= 0x01
+    with pytest.raises(CacheCodecError, match="authentication"):
+        codec.decode(bytes(tampered), b"cache:job:1")
+
+
+def test_ciphertext_is_bound_to_its_key(keyring):
+    codec = CacheValueCodec(keyring)
+    blob = codec.encode({"role": "operator"}, b"cache:user:alice")
+
+    with pytest.raises(CacheCodecError):
+        codec.decode(blob, b"cache:user:bob")
+
+
+def test_encrypted_cache_rejects_plain_values(keyring):
+    plain = CacheValueCodec().encode({"a": 1})
+
+    with pytest.raises(CacheCodecError, match="unencrypted"):
+        CacheValueCodec(keyring).decode(plain)
+    with pytest.raises(CacheCodecError, match="Expected bytes"):
+        CacheValueCodec(keyring).decode({"__encrypted__": True, "data": "e30="})
+
+
+def test_key_rotation():
+    old_key, new_key = CacheKeyring.generate_key(), CacheKeyring.generate_key()
+    old = CacheValueCodec(CacheKeyring({"2024-01": old_key}))
+    blob = old.encode("value")
+
+    rotated = CacheValueCodec(
+        CacheKeyring({"2024-01": old_key, "2024-06": new_key}, active_key_id="2024-06")
+    )
+
+    assert rotated.decode(blob) == "value"
+    assert rotated.needs_reencryption(blob)
+    assert rotated.key_id_of(rotated.encode("value")) == "2024-06"
+    with pytest.raises(CacheCodecError, match="Unknown cache encryption key"):
+        CacheValueCodec(CacheKeyring({"2024-06": new_key})).decode(blob)
+
+
+def test_keyring_from_env(monkeypatch):
+    key = CacheKeyring.generate_key()
+    monkeypatch.setenv("CACHE_ENCRYPTION_KEYS", f"a:{base64.b64encode(key).decode()}")
+    monkeypatch.delenv("CACHE_ENCRYPTION_ACTIVE_KEY", raising=False)
+
+    keyring = CacheKeyring.from_env()
+
+    assert keyring.active_key_id == "a" and keyring.keys["a"] == key
+
+    monkeypatch.setenv("CACHE_ENCRYPTION_KEYS", "")
+    with pytest.raises(CacheCodecError, match="CACHE_ENCRYPTION_KEYS"):
+        CacheKeyring.from_env()
+    with pytest.raises(CacheCodecError, match="32 bytes"):
+        CacheKeyring({"short": b"x" * 16})
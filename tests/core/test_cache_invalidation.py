@@ -0,0 +1,286 @@
+"""
+Tests for event-driven, tag-based cache invalidation.
+
+Tests cover:
+- Tag extraction from TWS payloads, poller events and free text
+- TagIndex bookkeeping
+- CacheInvalidator fan-out from EventBus events to cache targets
+- Tagged entries in TWSAPICache and TwsGraphService
+- The Redis tag/prefix/dependency index
+"""
+
+import asyncio
+
+import networkx as nx
+import pytest
+
+from resync.core.cache_invalidation import (
+    PLAN_JOBS_TAG,
+    CacheInvalidator,
+    RedisTagIndex,
+    TagIndex,
+    entity_tags,
+    glob_prefix,
+    job_payload_tags,
+    key_prefixes,
+    tags_for_event,
+)
+from resync.core.event_bus import EventBus
+from resync.services.tws_cache import CacheCategory, TWSAPICache
+from resync.services.tws_graph_service import GraphCacheEntry, TwsGraphService
+
+
+def job_event(event_type: str = "job_abend") -> dict:
+    return {
+        "event_type": event_type,
+        "source": "PAYROLL_DAILY",
+        "details": {
+            "job": {
+                "job_id": "J1",
+                "job_name": "PAYROLL_DAILY",
+                "job_stream": "PAYROLL",
+                "workstation": "WS01",
+            }
+        },
+    }
+
+
+def make_cache() -> TWSAPICache:
+    cache = object.__new__(TWSAPICache)
+    cache.__init__()
+    return cache
+
+
+class TestTags:
+    """Tag extraction."""
+
+    def test_job_payload_tags(self):
+        payload = {
+            "id": "J1",
+            "name": "PAYROLL_DAILY",
+            "jobStream": "PAYROLL",
+            "workstation": "WS01",
+        }
+
+        assert job_payload_tags("J1", payload) == [
+            "job:J1",
+            "job:PAYROLL_DAILY",
+            "jobstream:PAYROLL",
+            "workstation:WS01",
+        ]
+
+    def test_job_event_tags(self):
+        tags = tags_for_event(job_event())
+
+        assert set(tags) == {
+            "job:J1",
+            "job:PAYROLL_DAILY",
+            "jobstream:PAYROLL",
+            "workstation:WS01",
+            PLAN_JOBS_TAG,
+        }
+
+    def test_workstation_event_tags(self):
+        event = {"event_type": "workstation_offline", "details": {"workstation": {"name": "WS01"}}}
+
+        assert tags_for_event(event) == ["workstation:WS01"]
+
+    def test_non_state_events_have_no_tags(self):
+        assert tags_for_event(job_event("job_stuck")) == []
+        assert tags_for_event({"event_type": "system_degraded"}) == []
+
+    def test_entity_tags(self):
+        assert entity_tags("Por que o JOB_XPTO falhou depois de PAYROLL#DAILY?") == [
+            "job:JOB_XPTO",
+            "job:PAYROLL#DAILY",
+        ]
+
+
+class TestTagIndex:
+    """TagIndex bookkeeping."""
+
+    def test_pop_keys_removes_every_tag(self):
+        index = TagIndex()
+        index.add("a", ["job:J1", "workstation:WS01"])
+        index.add("b", ["workstation:WS01"])
+
+        assert index.pop_keys(["job:J1"]) == {"a"}
+        assert index.keys_for(["workstation:WS01"]) == {"b"}
+        assert len(index) == 1
+
+    def test_add_replaces_tags(self):
+        index = TagIndex()
+        index.add("a", ["job:J1"])
+        index.add("a", ["job:J2"])
+
+        assert index.keys_for(["job:J1"]) == set()
+        assert index.tags_for("a") == {"job:J2"}
+
+
+class TestInvalidator:
+    """EventBus -> targets."""
+
+    async def test_event_evicts_only_dependent_entries(self):
+        cache = make_cache()
+        await cache.set("job_status:J1", {"status": "EXEC"}, tags=["job:J1"])
+        await cache.set("ws:WS01", {"status": "LINKED"}, tags=["workstation:WS01"])
+        await cache.set("jobs_query:q=None", {"jobs": []}, tags=[PLAN_JOBS_TAG])
+        await cache.set("job_status:J9", {"status": "EXEC"}, tags=["job:J9"])
+        invalidator = CacheInvalidator()
+        invalidator.register("tws_api", cache)
+
+        evicted = await invalidator.handle_event(job_event())
+
+        assert evicted == {"tws_api": 3}
+        assert set(cache._cache) == {"job_status:J9"}
+
+    async def test_subscribes_to_event_bus(self):
+        cache = make_cache()
+        await cache.set("job_status:J1", {"status": "EXEC"}, tags=["job:J1"])
+        bus = EventBus()
+        invalidator = CacheInvalidator()
+        invalidator.register("tws_api", cache)
+        invalidator.attach(bus)
+        await bus.start()
+        try:
+            await bus.publish(job_event("job_completed"))
+            await asyncio.sleep(0.05)
+        finally:
+            await bus.stop()
+
+        assert "job_status:J1" not in cache._cache
+        assert invalidator.get_stats()["evicted"] == 1
+
+    async def test_failing_target_does_not_stop_others(self):
+        class Broken:
+            async def invalidate_tags(self, tags):
+                raise ConnectionError("redis down")
+
+        cache = make_cache()
+        await cache.set("job_status:J1", {"status": "EXEC"}, tags=["job:J1"])
+        invalidator = CacheInvalidator()
+        invalidator.register("semantic", Broken())
+        invalidator.register("tws_api", cache)
+
+        evicted = await invalidator.invalidate_tags(["job:J1"])
+
+        assert evicted == {"semantic": 0, "tws_api": 1}
+        assert invalidator.get_stats()["errors"] == 1
+
+
+class TestTaggedCaches:
+    """Tagging in the caches themselves."""
+
+    async def test_tags_derived_from_fetched_value(self):
+        cache = make_cache()
+
+        async def fetch():
+            return {"id": "J1", "jobStream": "PAYROLL"}
+
+        await cache.get_or_fetch(
+            "job_status:J1",
+            fetch,
+            CacheCategory.JOB_STATUS,
+            tags=lambda data: job_payload_tags("J1", data),
+        )
+
+        assert await cache.invalidate_tags(["jobstream:PAYROLL"]) == 1
+        assert await cache.get("job_status:J1") is None
+
+    async def test_graph_cache_evicted_by_member_job(self):
+        service = TwsGraphService()
+        graph = nx.DiGraph([("J0", "J1"), ("J1", "J2")])
+        service._cache["job:J1:depth:5"] = GraphCacheEntry(graph, 0.0, "job:J1")
+        service._tags.add("job:J1:depth:5", [f"job:{node}" for node in graph.nodes])
+
+        assert await service.invalidate_tags(["job:J9"]) == 0
+        assert await service.invalidate_tags(["job:J2"]) == 1
+        assert service._cache == {}
+
+
+class TestRedisTagIndex:
+    """Tag, prefix and dependency sets in Redis."""
+
+    @pytest.fixture
+    async def index(self):
+        fakeredis = pytest.importorskip("fakeredis")
+        redis = fakeredis.FakeAsyncRedis(decode_responses=True)
+        yield RedisTagIndex(redis, batch_size=2)
+        await redis.aclose()
+
+    async def put(self, index, key, ttl=60, tags=(), dependencies=()):
+        pipe = index.redis.pipeline(transaction=True)
+        pipe.set(key, "v", ex=ttl)
+        index.record(pipe, key, ttl, tags, dependencies)
+        await pipe.execute()
+
+    def test_prefixes(self):
+        assert key_prefixes("tws:jobs:J1") == ["tws:", "tws:jobs:"]
+        assert key_prefixes("plain") == []
+        assert glob_prefix("tws:jobs:*") == "tws:jobs:"
+        assert glob_prefix("tws:job_*") is None
+        assert glob_prefix("tws:*:J1*") is None
+
+    async def test_lookup_by_tag_and_prefix(self, index):
+        await self.put(index, "tws:jobs:J1", tags=["job:J1"])
+        await self.put(index, "tws:jobs:J2", tags=["job:J2"])
+        await self.put(index, "tws:ws:WS01", tags=["job:J1"])
+
+        assert await index.keys_for_tags(["job:J1"]) == {"tws:jobs:J1", "tws:ws:WS01"}
+        assert await index.keys_for_prefix("tws:jobs:") == {"tws:jobs:J1", "tws:jobs:J2"}
+        assert len(await index.keys_for_prefix("tws:")) == 3
+
+    async def test_index_sets_expire_with_longest_member(self, index):
+        await self.put(index, "a:1", ttl=100, tags=["t"])
+        await self.put(index, "a:2", ttl=10, tags=["t"])
+
+        assert 90 < await index.redis.ttl("cache:idx:tag:t") <= 100
+        assert 90 < await index.redis.ttl("cache:idx:prefix:a:") <= 100
+
+    async def test_unlink_cleans_every_index_set(self, index):
+        for i in range(5):
+            await self.put(index, f"tws:jobs:J{i}", tags=["plan:jobs"])
+
+        unlinked = await index.unlink(
+            await index.keys_for_tags(["plan:jobs"]), drop_sets=["cache:idx:tag:plan:jobs"]
+        )
+
+        assert len(unlinked) == 5
+        assert await index.keys_for_prefix("tws:jobs:") == set()
+        assert await index.redis.keys("*") == []
+
+    async def test_clear_pattern_uses_prefix_index(self):
+        fakeredis = pytest.importorskip("fakeredis")
+        from resync.api.cache import RedisCacheManager
+        from resync.core.cache_utils import EnhancedCacheManager
+
+        server = fakeredis.FakeServer()
+        async_redis = fakeredis.FakeAsyncRedis(server=server, decode_responses=True)
+        # Warmed keys (tws:system_status, tws:critical_jobs) are indexed too
+        await EnhancedCacheManager(async_redis)._warm_single_key(
+            "tws:system_status", lambda: {"status": "ok"}
+        )
+        redis = fakeredis.FakeRedis(server=server, decode_responses=True)
+        pipe = redis.pipeline(transaction=True)
+        for key in ("tws:jobs:J1", "tws:jobs:J2"):
+            pipe.set(key, "v", ex=60)
+            RedisTagIndex(redis).record(pipe, key, 60)
+        pipe.execute()
+        redis.setex("tws:unindexed", 60, "v")
+        redis.setex("job:A1", 60, "v")
+
+        manager = RedisCacheManager(redis)
+
+        assert manager.clear_pattern("tws:jobs:*", batch_size=1) == 2
+        assert manager.clear_pattern("tws:*") == 1
+        # Prefix globs never SCAN: keys written outside the index are left
+        assert redis.exists("tws:unindexed")
+        assert manager.clear_pattern("job:A?") == 1
+        assert redis.keys("*") == ["tws:unindexed"]
+
+    async def test_transitive_dependents(self, index):
+        await self.put(index, "report", dependencies=["summary"])
+        await self.put(index, "summary", dependencies=["jobs"])
+        await self.put(index, "other", dependencies=["workstations"])
+
+        assert await index.dependents(["jobs"]) == {"summary", "report"}
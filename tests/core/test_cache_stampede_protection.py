@@ -0,0 +1,185 @@
+"""
+Tests for the loader cache with stampede protection.
+
+Tests cover:
+- Per-key single flight, and independent keys never waiting on each other
+- Stale-while-revalidate with a bounded background refresh budget
+- Probabilistic early refresh (XFetch)
+- Negative caching with jittered exponential backoff
+"""
+
+import asyncio
+
+import pytest
+
+from resync.core.cache import cache_with_stampede_protection as module
+from resync.core.cache.cache_with_stampede_protection import (
+    CacheConfig,
+    CacheWithStampedeProtection,
+    StampedeProtectionLevel,
+)
+
+
+class Loader:
+    """Async loader that counts calls and can be held open."""
+
+    def __init__(self, value="value", fail: bool = False):
+        self.value = value
+        self.fail = fail
+        self.calls = 0
+        self.release = asyncio.Event()
+        self.release.set()
+
+    async def __call__(self):
+        self.calls += 1
+        await self.release.wait()
+        if self.fail:
+            raise ConnectionError("TWS unavailable")
+        return f"{self.value}-{self.calls}"
+
+
+async def test_concurrent_misses_share_one_load():
+    cache = CacheWithStampedeProtection()
+    loader = Loader()
+    loader.release.clear()
+
+    waiters = [asyncio.create_task(cache.get("jobs", loader)) for _ in range(100)]
+    await asyncio.sleep(0)
+    loader.release.set()
+
+    assert set(await asyncio.gather(*waiters)) == {"value-1"}
+    assert loader.calls == 1
+
+
+async def test_independent_keys_never_wait_on_each_other():
+    cache = CacheWithStampedeProtection()
+    slow = Loader("slow")
+    slow.release.clear()
+    slow_waiters = [asyncio.create_task(cache.get("slow", slow)) for _ in range(10)]
+    await asyncio.sleep(0)
+
+    fast_results = await asyncio.wait_for(
+        asyncio.gather(*(cache.get(f"fast:{i}", Loader(f"fast{i}")) for i in range(50))),
+        timeout=1,
+    )
+
+    assert fast_results == [f"fast{i}-1" for i in range(50)]
+    assert not any(task.done() for task in slow_waiters)
+    slow.release.set()
+    assert set(await asyncio.gather(*slow_waiters)) == {"slow-1"}
+
+
+async def test_cancelled_caller_does_not_cancel_shared_load():
+    cache = CacheWithStampedeProtection()
+    loader = Loader()
+    loader.release.clear()
+    first = asyncio.create_task(cache.get("k", loader))
+    second = asyncio.create_task(cache.get("k", loader))
+    await asyncio.sleep(0)
+
+    first.cancel()
+    loader.release.set()
+
+    assert await second == "value-1"
+
+
+async def test_stale_value_is_served_while_revalidating():
+    cache = CacheWithStampedeProtection(CacheConfig(stale_ttl=60))
+    loader = Loader()
+    assert await cache.get("k", loader, ttl=0.01) == "value-1"
+    await asyncio.sleep(0.02)
+
+    loader.release.clear()
+    assert await cache.get("k", loader, ttl=60) == "value-1"  # stale, no waiting
+    assert cache.get_stats()["background_refreshes"] == 1
+    loader.release.set()
+    await asyncio.sleep(0.005)
+
+    assert await cache.get("k", loader) == "value-2"
+    assert cache.stale_hits == 1
+
+
+async def test_background_refreshes_are_bounded():
+    cache = CacheWithStampedeProtection(CacheConfig(max_concurrent_loads=2, stale_ttl=60))
+    loaders = [Loader() for _ in range(5)]
+    for i, loader in enumerate(loaders):
+        await cache.get(f"k{i}", loader, ttl=0.01)
+        loader.release.clear()
+    await asyncio.sleep(0.02)
+
+    for i, loader in enumerate(loaders):
+        assert await cache.get(f"k{i}", loader) == "value-1"
+    await asyncio.sleep(0)
+
+    assert sum(loader.calls for loader in loaders) == 5 + 2
+    assert cache.refreshes_skipped == 3
+    for loader in loaders:
+        loader.release.set()
+    await asyncio.sleep(0.005)
+    assert cache.get_stats()["background_refreshes"] == 0
+
+
+async def test_hot_key_refreshes_before_expiry(monkeypatch):
+    cache = CacheWithStampedeProtection(
+        CacheConfig(stampede_protection_level=StampedeProtectionLevel.AGGRESSIVE)
+    )
+    loader = Loader()
+    await cache.get("hot", loader, ttl=60)
+    cache._cache["hot"].delta = 10.0  # the load "took" ten seconds
+
+    monkeypatch.setattr(module.random, "random", lambda: 0.5)
+    await cache.get("hot", loader)
+    await asyncio.sleep(0)
+    assert loader.calls == 1  # 60s left > 10 * -ln(0.5)
+
+    monkeypatch.setattr(module.random, "random", lambda: 0.9999)  # 10 * -ln(1e-4) > 60
+    assert await cache.get("hot", loader) == "value-1"
+    await asyncio.sleep(0)
+    assert loader.calls == 2
+    assert cache.early_refreshes == 1
+
+
+async def test_failures_are_negatively_cached_with_backoff():
+    cache = CacheWithStampedeProtection(
+        CacheConfig(negative_ttl=10, negative_ttl_max=25, negative_ttl_jitter=0.2)
+    )
+    loader = Loader(fail=True)
+
+    for _ in range(3):
+        with pytest.raises(ConnectionError):
+            await cache.get("k", loader)
+    assert loader.calls == 1
+    assert cache.negative_hits == 2
+
+    backoffs = [cache._backoff(failures) for failures in (1, 2, 3, 4)]
+    assert 8 <= backoffs[0] <= 12 and 16 <= backoffs[1] <= 24
+    assert all(20 <= b <= 30 for b in backoffs[2:])
+
+
+async def test_failed_revalidation_keeps_stale_value():
+    cache = CacheWithStampedeProtection(CacheConfig(stale_ttl=60, negative_ttl=30))
+    loader = Loader()
+    await cache.get("k", loader, ttl=0.01)
+    await asyncio.sleep(0.02)
+
+    loader.fail = True
+    assert await cache.get("k", loader) == "value-1"
+    await asyncio.sleep(0.005)
+    assert await cache.get("k", loader) == "value-1"
+
+    assert loader.calls == 2  # the failed refresh is not retried before the backoff
+    assert cache.load_failures == 1
+
+
+async def test_invalidate_discards_in_flight_result():
+    cache = CacheWithStampedeProtection()
+    loader = Loader()
+    loader.release.clear()
+    waiter = asyncio.create_task(cache.get("k", loader))
+    await asyncio.sleep(0)
+
+    cache.invalidate("k")
+    loader.release.set()
+
+    assert await waiter == "value-1"
+    assert "k" not in cache._cache
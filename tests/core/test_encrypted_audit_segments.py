@@ -0,0 +1,182 @@
+"""
+Tests for the segment-based, indexed storage of encrypted audit blocks.
+
+Tests cover:
+- Append/read of length-prefixed records and index lookups
+- Recovery of unindexed and torn records after a crash
+- Rollback of failed appends and flushes
+- EncryptedAuditTrail searching stored blocks through the index
+"""
+
+import json
+
+import pytest
+
+from resync.core.audit_segments import INDEX_FILE_NAME, AuditSegmentStore
+from resync.core.encrypted_audit import EncryptedAuditConfig, EncryptedAuditTrail
+
+
+async def append(store, block_id, min_ts, max_ts, terms=(), payload=b"ciphertext"):
+    return await store.append(block_id, payload, {"block_id": block_id}, terms, min_ts, max_ts)
+
+
+class TestSegmentStore:
+    """AuditSegmentStore records and index."""
+
+    async def test_find_by_time_and_terms(self, tmp_path):
+        store = AuditSegmentStore(tmp_path, fsync=False)
+        await append(store, "b0", 0, 10, ["user:a", "event:login"])
+        await append(store, "b1", 10, 20, ["user:b", "event:login"])
+        await append(store, "b2", 20, 30, ["user:a", "event:logout"])
+
+        assert [r.block_id for r in store.find(terms=["user:a"])] == ["b2", "b0"]
+        assert [r.block_id for r in store.find(terms=["user:a", "event:login"])] == ["b0"]
+        assert [r.block_id for r in store.find(12, 25)] == ["b2", "b1"]
+        assert store.find(terms=["user:zzz"]) == []
+
+    async def test_read_returns_payload(self, tmp_path):
+        store = AuditSegmentStore(tmp_path, fsync=False)
+        ref = await append(store, "b0", 0, 1, payload=b"\x00\x01binary")
+
+        assert await store.read(ref) == b"\x00\x01binary"
+
+    async def test_segments_rotate(self, tmp_path):
+        store = AuditSegmentStore(tmp_path, max_segment_bytes=100, fsync=False)
+        for i in range(3):
+            await append(store, f"b{i}", i, i, payload=b"x" * 200)
+
+        assert [ref.segment for ref in store.refs()] == [0, 1, 2]
+        assert await store.read(store.get("b1")) == b"x" * 200
+
+    async def test_reload_from_index(self, tmp_path):
+        store = AuditSegmentStore(tmp_path, fsync=False)
+        await append(store, "b0", 0, 10, ["user:a"])
+
+        reopened = AuditSegmentStore(tmp_path, fsync=False)
+
+        assert [r.block_id for r in reopened.find(terms=["user:a"])] == ["b0"]
+        assert await reopened.read(reopened.get("b0")) == b"ciphertext"
+
+    async def test_recovers_unindexed_and_torn_records(self, tmp_path):
+        store = AuditSegmentStore(tmp_path, fsync=False)
+        await append(store, "b0", 0, 10)
+        await append(store, "b1", 10, 20, ["user:a"])
+        # Crash after the segment write of b1 but before its index line,
+        # plus half a record of a third block
+        index = tmp_path / INDEX_FILE_NAME
+        index.write_text(index.read_text().splitlines()[0] + "\n")
+        with open(store.segment_path(0), "ab") as f:
+            f.write(b"RSA1\x00\x00")
+
+        reopened = AuditSegmentStore(tmp_path, fsync=False)
+
+        assert [r.block_id for r in reopened.find(terms=["user:a"])] == ["b1"]
+        assert len(index.read_text().splitlines()) == 2
+        ref = await append(reopened, "b2", 20, 30)
+        assert await reopened.read(ref) == b"ciphertext"
+
+
+    async def test_failed_append_is_rolled_back(self, tmp_path):
+        store = AuditSegmentStore(tmp_path, fsync=False)
+        await append(store, "b0", 0, 10)
+        index = tmp_path / INDEX_FILE_NAME
+        lines = index.read_text()
+        # The index write fails after the record reached the segment
+        index.unlink()
+        index.mkdir()
+        with pytest.raises(OSError):
+            await append(store, "b1", 10, 20, payload=b"lost")
+        index.rmdir()
+        index.write_text(lines)
+
+        ref = await append(store, "b2", 20, 30, payload=b"kept")
+
+        assert await store.read(ref) == b"kept"
+        assert store.get("b1") is None
+        reopened = AuditSegmentStore(tmp_path, fsync=False)
+        assert [r.block_id for r in reopened.refs()] == ["b0", "b2"]
+        assert await reopened.read(reopened.get("b2")) == b"kept"
+
+
+class TestTrailSearch:
+    """EncryptedAuditTrail search over stored blocks."""
+
+    @pytest.fixture
+    def trail(self, tmp_path):
+        config = EncryptedAuditConfig(
+            audit_log_directory=str(tmp_path), max_entries_per_block=10, fsync_enabled=False
+        )
+        return EncryptedAuditTrail(config)
+
+    async def test_search_decrypts_only_candidate_blocks(self, trail, monkeypatch):
+        for i in range(50):
+            await trail.log_event("login", user_id=f"user{i % 5}", resource_id="portal")
+        await trail.log_event("logout", user_id="user1")
+
+        loaded = []
+        original = trail._load_block_entries
+
+        async def spy(ref):
+            loaded.append(ref.block_id)
+            return await original(ref)
+
+        monkeypatch.setattr(trail, "_load_block_entries", spy)
+
+        results = await trail.search_events(user_id="user3", event_type="login", limit=100)
+
+        assert len(trail.segment_store) == 5
+        assert len(results) == 10
+        assert all(entry.user_id == "user3" for entry in results)
+        assert len(loaded) == 5
+
+        loaded.clear()
+        logout = await trail.search_events(event_type="logout")
+        assert [entry.user_id for entry in logout] == ["user1"]
+        assert loaded == []  # still pending, no block read
+
+    async def test_search_by_time_window(self, trail):
+        for i in range(30):
+            await trail.log_event("job_update", user_id="ops", details={"i": i})
+        entries = await trail.search_events(limit=100)
+        window = sorted(entry.timestamp for entry in entries)[10:20]
+
+        results = await trail.search_events(start_time=window[0], end_time=window[-1])
+
+        assert sorted(entry.details["i"] for entry in results) == list(range(10, 20))
+
+    async def test_index_does_not_store_plain_ids(self, trail, tmp_path):
+        for _ in range(10):
+            await trail.log_event("login", user_id="alice@example.com", resource_id="db-prod")
+
+        index = (tmp_path / INDEX_FILE_NAME).read_text()
+
+        assert "alice" not in index
+        assert "db-prod" not in index
+        assert json.loads(index.splitlines()[0])["meta"]["entries_count"] == 10
+
+    async def test_failed_flush_keeps_chain_and_block_ids(self, trail, monkeypatch):
+        store_append = trail.segment_store.append
+
+        async def failing_append(*args, **kwargs):
+            # Logged while the block is being written, then the write fails
+            await trail.log_event("during_write", user_id="ops")
+            monkeypatch.setattr(trail.segment_store, "append", store_append)
+            raise OSError("disk full")
+
+        monkeypatch.setattr(trail.segment_store, "append", failing_append)
+        for _ in range(9):
+            await trail.log_event("login", user_id="ops")
+        chain_before = trail.chain_hash
+        with pytest.raises(OSError):
+            await trail.log_event("login", user_id="ops")
+
+        assert trail.block_counter == 0
+        assert len(trail.pending_entries) == 11
+        assert trail.pending_entries[-1].previous_hash == trail.pending_entries[-2].chain_hash
+        assert trail.chain_hash != chain_before
+
+        await trail.log_event("login", user_id="ops")
+
+        assert [ref.block_id for ref in trail.segment_store.refs()] == ["block_000000"]
+        result = await trail.verify_integrity(full_chain_check=True)
+        assert result["integrity_status"] == "valid", result["issues_found"]
@@ -0,0 +1,257 @@
+"""
+Tests for the read-through SQL query cache.
+
+Tests cover:
+- Hits keyed on normalized SQL plus parameters (no database round trip)
+- Table-level invalidation from a change-log table, NOTIFY payloads and local writes
+- Single flight for concurrent misses, and changes racing a running query
+- Repository integration (job status summary) and store wiring
+"""
+
+import asyncio
+from datetime import datetime
+
+import pytest
+from sqlalchemy import Column, Integer, MetaData, String, Table, event, select, text
+from sqlalchemy.ext.asyncio import async_sessionmaker, create_async_engine
+
+from resync.core.cache.query_cache import (
+    ChangeLogPoller,
+    PostgresChangeListener,
+    QueryCacheManager,
+    QueryFingerprint,
+    change_trigger_statements,
+    normalize_sql,
+)
+
+metadata = MetaData()
+jobs = Table(
+    "jobs",
+    metadata,
+    Column("id", Integer, primary_key=True),
+    Column("name", String),
+    Column("status", String),
+)
+
+CHANGE_LOG_DDL = [
+    "CREATE TABLE resync_table_changes (id INTEGER PRIMARY KEY AUTOINCREMENT, table_name TEXT)",
+    *(
+        f"CREATE TRIGGER jobs_{op} AFTER {op} ON jobs BEGIN "
+        "INSERT INTO resync_table_changes (table_name) VALUES ('jobs'); END"
+        for op in ("INSERT", "UPDATE", "DELETE")
+    ),
+]
+
+JOB_STATUS_DDL = """
+CREATE TABLE tws.tws_job_status (
+    id INTEGER PRIMARY KEY, snapshot_id INTEGER, job_name VARCHAR(255) NOT NULL,
+    job_stream VARCHAR(255), workstation VARCHAR(255), status VARCHAR(50) NOT NULL,
+    run_number INTEGER NOT NULL, start_time DATETIME, end_time DATETIME,
+    return_code INTEGER, timestamp DATETIME NOT NULL, metadata JSON
+)
+"""
+
+
+@pytest.fixture
+async def database(tmp_path):
+    engine = create_async_engine(f"sqlite+aiosqlite:///{tmp_path / 'cache.db'}")
+    async with engine.begin() as conn:
+        await conn.run_sync(metadata.create_all)
+        for statement in CHANGE_LOG_DDL:
+            await conn.execute(text(statement))
+        await conn.execute(
+            jobs.insert(),
+            [
+                {"name": "PAYROLL", "status": "SUCC"},
+                {"name": "BACKUP", "status": "ABEND"},
+                {"name": "ETL", "status": "SUCC"},
+            ],
+        )
+
+    executed = []
+    event.listen(
+        engine.sync_engine,
+        "before_cursor_execute",
+        lambda conn, cursor, statement, *args: executed.append(statement),
+    )
+    yield engine, async_sessionmaker(engine, expire_on_commit=False), executed
+    await engine.dispose()
+
+
+def _selects(executed: list[str]) -> int:
+    return sum(1 for sql in executed if "resync_table_changes" not in sql and "SELECT" in sql)
+
+
+async def test_normalized_sql_hits_without_round_trip(database):
+    engine, sessions, executed = database
+    cache = QueryCacheManager(sessions)
+
+    first = await cache.execute_query(
+        "SELECT name FROM jobs WHERE status = :status ORDER BY name", {"status": "SUCC"}
+    )
+    second = await cache.execute_query(
+        "select name\n  from   JOBS where STATUS = :status order by name;", {"status": "SUCC"}
+    )
+
+    assert first.data == [{"name": "ETL"}, {"name": "PAYROLL"}]
+    assert second.data == first.data and second.from_cache
+    assert _selects(executed) == 1
+
+    other = await cache.execute_query(
+        "SELECT name FROM jobs WHERE status = :status ORDER BY name", {"status": "ABEND"}
+    )
+    assert other.data == [{"name": "BACKUP"}]
+    assert _selects(executed) == 2
+    assert cache.get_cache_statistics()["performance"]["cached_queries"] == 1
+
+
+def test_normalization_keeps_literals_and_finds_tables():
+    assert normalize_sql("SELECT  *\nFROM T WHERE x = 'Mixed  Case';") == (
+        "select * from t where x = 'Mixed  Case'"
+    )
+    fingerprint = QueryFingerprint.from_statement(
+        'SELECT * FROM tws.tws_job_status s JOIN "Events" e ON e.id = s.id'
+    )
+    assert fingerprint.table_names == {"tws_job_status", "Events"}
+    assert QueryFingerprint.from_statement(select(jobs.c.name)).table_names == {"jobs"}
+    assert not QueryFingerprint.from_statement("UPDATE jobs SET status = 'x'").is_read
+
+
+async def test_change_log_invalidates_only_dependent_tables(database):
+    engine, sessions, executed = database
+    cache = QueryCacheManager(sessions)
+    poller = ChangeLogPoller(cache, sessions, poll_interval=0)
+    await cache.initialize(change_source=poller)
+
+    query = select(jobs.c.status).where(jobs.c.name == "BACKUP")
+    assert (await cache.execute_query(query)).data == [{"status": "ABEND"}]
+    await cache.execute_query("SELECT 1 AS one FROM resync_table_changes LIMIT 1", ttl_override=60)
+
+    # A write made outside this process is only seen through the change log
+    async with engine.begin() as conn:
+        await conn.execute(jobs.update().where(jobs.c.name == "BACKUP").values(status="SUCC"))
+    assert (await cache.execute_query(query)).from_cache
+
+    assert await poller.poll_once() == 1
+    result = await cache.execute_query(query)
+    assert result.data == [{"status": "SUCC"}] and not result.from_cache
+    await cache.shutdown()
+
+
+async def test_local_write_invalidates_immediately(database):
+    engine, sessions, executed = database
+    cache = QueryCacheManager(sessions)
+    query = "SELECT COUNT(*) AS total FROM jobs"
+
+    assert (await cache.execute_query(query)).data == [{"total": 3}]
+    written = await cache.execute_query(
+        "INSERT INTO jobs (name, status) VALUES (:name, :status)", {"name": "X", "status": "EXEC"}
+    )
+
+    assert written.data == {"affected_rows": 1}
+    assert (await cache.execute_query(query)).data == [{"total": 4}]
+
+
+async def test_concurrent_misses_execute_once(database):
+    engine, sessions, executed = database
+    cache = QueryCacheManager(sessions)
+
+    results = await asyncio.gather(
+        *(cache.execute_query(select(jobs.c.name).order_by(jobs.c.name)) for _ in range(20))
+    )
+
+    assert all(result.data == results[0].data for result in results)
+    assert _selects(executed) == 1
+
+
+async def test_notify_payload_invalidates_table(database):
+    engine, sessions, executed = database
+    cache = QueryCacheManager(sessions)
+    listener = PostgresChangeListener(cache)
+    query = select(jobs.c.name).where(jobs.c.status == "SUCC")
+
+    await cache.execute_query(query)
+    listener._on_notification(None, 1, "resync_table_changes", "other_table:insert")
+    assert (await cache.execute_query(query)).from_cache
+
+    listener._on_notification(None, 1, "resync_table_changes", "jobs:update")
+    assert not (await cache.execute_query(query)).from_cache
+    assert listener.notifications == 2
+
+
+async def test_change_during_execution_is_not_served(database):
+    engine, sessions, executed = database
+    cache = QueryCacheManager(sessions)
+    event.listen(
+        engine.sync_engine,
+        "before_cursor_execute",
+        lambda *args: cache.invalidate_table("jobs") if len(executed) == 1 else None,
+    )
+    query = select(jobs.c.name).where(jobs.c.id == 1)
+
+    await cache.execute_query(query)  # a change arrives while this runs
+    assert not (await cache.execute_query(query)).from_cache
+    assert (await cache.execute_query(query)).from_cache
+
+
+def test_trigger_ddl_validates_identifiers():
+    statements = change_trigger_statements(["tws.tws_job_status"])
+    assert "AFTER INSERT OR UPDATE OR DELETE OR TRUNCATE ON tws.tws_job_status" in statements[-1]
+    assert "FOR EACH STATEMENT" in statements[-1]
+
+    with pytest.raises(ValueError):
+        change_trigger_statements(["jobs; DROP TABLE jobs"])
+
+
+async def test_job_status_summary_is_cached_until_a_write(tmp_path):
+    from resync.core.database.repositories.tws_repository import (
+        JobStatus,
+        TWSJobStatusRepository,
+    )
+
+    engine = create_async_engine(f"sqlite+aiosqlite:///{tmp_path / 'main.db'}")
+    tws_path = tmp_path / "tws.db"
+
+    @event.listens_for(engine.sync_engine, "connect")
+    def attach_schema(dbapi_connection, connection_record):
+        cursor = dbapi_connection.cursor()
+        cursor.execute(f"ATTACH DATABASE '{tws_path}' AS tws")
+        cursor.close()
+
+    async with engine.begin() as conn:
+        # DDL by hand: SQLite cannot render the model's JSONB column
+        await conn.execute(text(JOB_STATUS_DDL))
+    sessions = async_sessionmaker(engine, expire_on_commit=False)
+    executed = []
+    event.listen(
+        engine.sync_engine,
+        "before_cursor_execute",
+        lambda conn, cursor, statement, *args: executed.append(statement),
+    )
+
+    repository = TWSJobStatusRepository(sessions, QueryCacheManager(sessions))
+    job = JobStatus(job_name="PAYROLL", job_stream="DAILY", workstation="WS1", status="EXEC")
+    await repository.upsert_job_status(job)
+
+    assert await repository.get_status_summary() == {"EXEC": 1}
+    summaries = len(executed)
+    assert await repository.get_status_summary() == {"EXEC": 1}
+    assert len(executed) == summaries
+
+    job.status, job.timestamp = "SUCC", datetime.now()
+    await repository.upsert_job_status(job)
+    assert await repository.get_status_summary() == {"SUCC": 1}
+    await engine.dispose()
+
+
+def test_stores_read_through_the_shared_query_cache(monkeypatch):
+    from resync.core.cache.query_cache import query_cache_manager
+    from resync.core.proactive_init import ProactiveMonitor
+    from resync.core.tws_status_store import TWSStatusStore
+    from resync.settings import settings
+
+    assert TWSStatusStore()._store.jobs._query_cache is query_cache_manager
+    assert ProactiveMonitor()._store.jobs._query_cache is query_cache_manager
+
+    monkeypatch.setattr(settings, "query_cache_enabled", False)
+    assert TWSStatusStore()._store.jobs._query_cache is None
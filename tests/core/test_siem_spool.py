@@ -0,0 +1,337 @@
+"""
+Tests for durable SIEM forwarding.
+
+Tests cover:
+- Spool appends, per-consumer cursors, segment cleanup and torn-tail recovery
+- Backpressure when the spool is full
+- Adaptive batch sizing
+- Delivery to fake Splunk HEC / ELK bulk endpoints, including replay after
+  an outage and partial bulk failures
+"""
+
+import asyncio
+import json
+
+import pytest
+from aiohttp import web
+from aiohttp.test_utils import TestServer
+
+from resync.core.siem_integrator import (
+    EventFormat,
+    SIEMConfiguration,
+    SIEMEvent,
+    SIEMIntegrator,
+    SIEMType,
+    encode_event,
+)
+from resync.core.siem_spool import (
+    CURSORS_FILE_NAME,
+    AdaptiveBatchSizer,
+    EncodedEvent,
+    SIEMSpool,
+)
+
+
+class FakeSIEM:
+    """Splunk HEC and Elasticsearch bulk endpoints on localhost."""
+
+    def __init__(self):
+        self.hec_events: list[dict] = []
+        self.bulk_docs: dict[str, dict] = {}
+        self.hec_requests = 0
+        self.down = False
+        self.reject_bulk_ids: set[str] = set()
+
+        app = web.Application()
+        app.router.add_get("/services/server/info", self.health)
+        app.router.add_get("/_cluster/health", self.health)
+        app.router.add_post("/services/collector/event", self.hec)
+        app.router.add_post("/_bulk", self.bulk)
+        self.server = TestServer(app)
+
+    @property
+    def url(self) -> str:
+        return str(self.server.make_url("")).rstrip("/")
+
+    async def health(self, request):
+        if self.down:
+            return web.json_response({}, status=503)
+        return web.json_response({"status": "green"})
+
+    async def hec(self, request):
+        self.hec_requests += 1
+        if self.down:
+            return web.json_response({"text": "Server is busy"}, status=503)
+        for line in (await request.text()).splitlines():
+            self.hec_events.append(json.loads(line))
+        return web.json_response({"text": "Success", "code": 0})
+
+    async def bulk(self, request):
+        lines = (await request.text()).splitlines()
+        items = []
+        for meta_line, doc_line in zip(lines[::2], lines[1::2]):
+            doc_id = json.loads(meta_line)["index"]["_id"]
+            if doc_id in self.reject_bulk_ids:
+                items.append({"index": {"_id": doc_id, "status": 429}})
+                continue
+            self.bulk_docs[doc_id] = json.loads(doc_line)
+            items.append({"index": {"_id": doc_id, "status": 201}})
+        return web.json_response({"errors": len(items) != len(lines) // 2, "items": items})
+
+
+@pytest.fixture
+async def fake_siem():
+    siem = FakeSIEM()
+    await siem.server.start_server()
+    yield siem
+    await siem.server.close()
+
+
+def make_integrator(tmp_path, **config) -> SIEMIntegrator:
+    return SIEMIntegrator(
+        {
+            "spool_directory": str(tmp_path / "spool"),
+            "spool_fsync": False,
+            "flush_interval_seconds": 0.05,
+            "batch_linger_seconds": 0.01,
+            **config,
+        }
+    )
+
+
+def add_connector(integrator, siem_type, name, url, **custom_config) -> None:
+    integrator.add_siem_connector(
+        name,
+        SIEMConfiguration(
+            siem_type=siem_type,
+            name=name,
+            endpoint_url=url,
+            api_key="token",
+            retry_delay_seconds=0.05,
+            custom_config=custom_config,
+        ),
+    )
+
+
+async def wait_until(predicate, timeout: float = 5.0) -> None:
+    deadline = asyncio.get_running_loop().time() + timeout
+    while not predicate():
+        assert asyncio.get_running_loop().time() < deadline, "condition not met in time"
+        await asyncio.sleep(0.02)
+
+
+class TestSpool:
+    """SIEMSpool storage and cursors."""
+
+    async def test_consumers_read_and_ack_independently(self, tmp_path):
+        spool = SIEMSpool(tmp_path, fsync=False)
+        spool.open(["a", "b"])
+        await asyncio.gather(*(spool.append(f"r{i}".encode()) for i in range(5)))
+
+        records = await spool.read("a", 3)
+        await spool.ack("a", records[-1][1], len(records))
+
+        assert [record for record, _ in records] == [b"r0", b"r1", b"r2"]
+        assert [record for record, _ in await spool.read("a", 10)] == [b"r3", b"r4"]
+        assert len(await spool.read("b", 10)) == 5
+
+    async def test_cursors_survive_reopen(self, tmp_path):
+        spool = SIEMSpool(tmp_path, fsync=False)
+        spool.open(["a"])
+        for i in range(4):
+            await spool.append(f"r{i}".encode())
+        records = await spool.read("a", 2)
+        await spool.ack("a", records[-1][1])
+
+        reopened = SIEMSpool(tmp_path, fsync=False)
+        reopened.open(["a"])
+
+        assert [record for record, _ in await reopened.read("a", 10)] == [b"r2", b"r3"]
+
+    async def test_acknowledged_segments_are_deleted(self, tmp_path):
+        spool = SIEMSpool(tmp_path, max_segment_bytes=20, fsync=False)
+        spool.open(["a", "b"])
+        for i in range(6):
+            await spool.append(b"x" * 16)
+
+        for consumer in ("a", "b"):
+            records = await spool.read(consumer, 10)
+            assert len(records) == 6
+            await spool.ack(consumer, records[-1][1])
+
+        assert len(list(tmp_path.glob("spool_*.log"))) == 1
+        assert spool.backlog_bytes("a") == 0
+
+    async def test_unconfigured_cursors_are_dropped_on_open(self, tmp_path):
+        spool = SIEMSpool(tmp_path, max_segment_bytes=20, fsync=False)
+        spool.open(["a", "gone"])
+        for _ in range(6):
+            await spool.append(b"x" * 16)
+        records = await spool.read("a", 1)
+        await spool.ack("a", records[-1][1])  # persists both cursors
+
+        reopened = SIEMSpool(tmp_path, max_segment_bytes=20, fsync=False)
+        reopened.open(["a"])
+        records = await reopened.read("a", 10)
+        await reopened.ack("a", records[-1][1])
+
+        assert len(list(tmp_path.glob("spool_*.log"))) == 1
+        assert "gone" not in reopened.get_metrics()["backlog_bytes"]
+
+    async def test_removed_consumer_releases_segments(self, tmp_path):
+        spool = SIEMSpool(tmp_path, max_segment_bytes=20, fsync=False)
+        spool.open(["a", "b"])
+        for _ in range(6):
+            await spool.append(b"x" * 16)
+        records = await spool.read("a", 10)
+        await spool.ack("a", records[-1][1])
+        assert len(list(tmp_path.glob("spool_*.log"))) == 6
+
+        await spool.remove_consumer("b")
+
+        assert len(list(tmp_path.glob("spool_*.log"))) == 1
+        assert "b" not in json.loads((tmp_path / CURSORS_FILE_NAME).read_text())
+
+    async def test_torn_tail_is_truncated(self, tmp_path):
+        spool = SIEMSpool(tmp_path, fsync=False)
+        spool.open(["a"])
+        await spool.append(b"complete")
+        with open(spool._segment_path(0), "ab") as f:
+            f.write(b"\x00\x00\x00\x10half")
+
+        reopened = SIEMSpool(tmp_path, fsync=False)
+        reopened.open(["a"])
+        await reopened.append(b"next")
+
+        assert [record for record, _ in await reopened.read("a", 10)] == [b"complete", b"next"]
+
+    async def test_full_spool_applies_backpressure(self, tmp_path):
+        spool = SIEMSpool(tmp_path, max_segment_bytes=10, max_bytes=30, fsync=False)
+        spool.open(["a"])
+        for _ in range(3):
+            await spool.append(b"x" * 8)
+
+        assert await spool.append(b"dropped", timeout=0.05) is False
+
+        waiting = asyncio.create_task(spool.append(b"accepted", timeout=2))
+        await asyncio.sleep(0.05)
+        records = await spool.read("a", 2)
+        await spool.ack("a", records[-1][1])
+
+        assert await waiting is True
+
+
+def test_batch_size_follows_latency():
+    sizer = AdaptiveBatchSizer(initial=100, min_size=10, max_size=200, target_latency_seconds=0.5)
+
+    sizer.record(100, 0.1, ok=True)
+    assert sizer.size == 125
+    sizer.record(125, 2.0, ok=True)
+    assert sizer.size == 87
+    sizer.record(87, 0.1, ok=False)
+    assert sizer.size == 43
+    for _ in range(20):
+        sizer.record(sizer.size, 0.1, ok=True)
+    assert sizer.size == 200
+
+
+def test_event_is_encoded_once_per_format():
+    event = SIEMEvent(
+        event_id="e1",
+        timestamp=1.0,
+        source="test",
+        event_type="login",
+        severity="high",
+        category="authentication",
+        message="login",
+    )
+
+    encoded = EncodedEvent.from_bytes(
+        encode_event(event, {EventFormat.JSON, EventFormat.CEF}).to_bytes()
+    )
+
+    assert encoded.formats["json"] == event.to_json()
+    assert encoded.formats["cef"] == event.to_cef()
+    assert "leef" not in encoded.formats
+
+
+class TestForwarding:
+    """SIEMIntegrator delivery against fake SIEM endpoints."""
+
+    async def test_events_reach_splunk_and_elk(self, tmp_path, fake_siem):
+        integrator = make_integrator(tmp_path)
+        add_connector(integrator, SIEMType.SPLUNK, "splunk", fake_siem.url, event_format="cef")
+        add_connector(integrator, SIEMType.ELK_STACK, "elk", fake_siem.url)
+        await integrator.start()
+        try:
+            ids = [
+                await integrator.send_security_event("login", "high", f"login {i}", user_id="u")
+                for i in range(20)
+            ]
+            await wait_until(
+                lambda: len(fake_siem.hec_events) == 20 and len(fake_siem.bulk_docs) == 20
+            )
+        finally:
+            await integrator.stop()
+
+        assert fake_siem.hec_events[0]["event"].startswith("CEF:0|")
+        assert set(fake_siem.bulk_docs) == set(ids)
+        assert integrator.get_system_metrics()["events"]["dropped"] == 0
+
+    async def test_events_are_replayed_after_outage(self, tmp_path, fake_siem):
+        integrator = make_integrator(tmp_path)
+        add_connector(integrator, SIEMType.SPLUNK, "splunk", fake_siem.url)
+        await integrator.start()
+        try:
+            await wait_until(lambda: integrator.connectors["splunk"].is_connected())
+            fake_siem.down = True
+            for i in range(10):
+                await integrator.send_security_event("anomaly", "high", f"burst {i}")
+            await wait_until(lambda: fake_siem.hec_requests >= 2)
+            assert fake_siem.hec_events == []
+
+            fake_siem.down = False
+            await wait_until(lambda: len(fake_siem.hec_events) == 10)
+        finally:
+            await integrator.stop()
+
+        messages = [json.loads(e["event"])["message"] for e in fake_siem.hec_events]
+        assert messages == [f"burst {i}" for i in range(10)]
+
+    async def test_spooled_events_survive_restart(self, tmp_path, fake_siem):
+        fake_siem.down = True
+        first = make_integrator(tmp_path, drain_timeout_seconds=0)
+        add_connector(first, SIEMType.ELK_STACK, "elk", fake_siem.url)
+        await first.start()
+        ids = [await first.send_security_event("breach", "critical", "x") for _ in range(5)]
+        await first.stop()
+
+        fake_siem.down = False
+        second = make_integrator(tmp_path)
+        add_connector(second, SIEMType.ELK_STACK, "elk", fake_siem.url)
+        await second.start()
+        try:
+            await wait_until(lambda: len(fake_siem.bulk_docs) == 5)
+        finally:
+            await second.stop()
+
+        assert set(fake_siem.bulk_docs) == set(ids)
+
+    async def test_partial_bulk_failure_retries_the_rest(self, tmp_path, fake_siem):
+        integrator = make_integrator(tmp_path)
+        add_connector(integrator, SIEMType.ELK_STACK, "elk", fake_siem.url)
+        ids = [await integrator.send_security_event("login", "low", "x") for _ in range(6)]
+        fake_siem.reject_bulk_ids = {ids[3]}
+        integrator.circuit_breaker.recovery_timeout = 0
+
+        await integrator.start()
+        try:
+            await wait_until(lambda: ids[2] in fake_siem.bulk_docs)
+            assert ids[3] not in fake_siem.bulk_docs
+            assert integrator.spool.backlog_bytes("elk") > 0
+            fake_siem.reject_bulk_ids.clear()
+            await wait_until(lambda: len(fake_siem.bulk_docs) == 6)
+        finally:
+            await integrator.stop()
+
+        assert integrator.spool.backlog_bytes("elk") == 0
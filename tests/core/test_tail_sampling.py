@@ -0,0 +1,167 @@
+"""
+Tests for tail-based trace sampling.
+
+Tests cover:
+- Error traces and per-route latency outliers are always exported
+- Uniform, trace-id consistent baseline for the rest
+- Buffer limits, decision timeout and late spans
+- IntelligentSampler ratio decisions and decaying error counts
+"""
+
+from opentelemetry.sdk.trace import TracerProvider
+from opentelemetry.sdk.trace.export import SimpleSpanProcessor
+from opentelemetry.sdk.trace.export.in_memory_span_exporter import InMemorySpanExporter
+from opentelemetry.sdk.trace.sampling import Decision
+from opentelemetry.trace import Status, StatusCode, set_span_in_context
+
+from resync.core.distributed_tracing import IntelligentSampler
+from resync.core.tail_sampling import (
+    RollingQuantile,
+    TailSamplingSpanProcessor,
+    trace_id_ratio_sampled,
+)
+
+MS = 1_000_000  # nanoseconds
+
+
+def make_tracer(**options):
+    exporter = InMemorySpanExporter()
+    processor = TailSamplingSpanProcessor(
+        SimpleSpanProcessor(exporter), sweep_interval_seconds=0, **options
+    )
+    provider = TracerProvider()
+    provider.add_span_processor(processor)
+    return provider.get_tracer(__name__), processor, exporter
+
+
+def request(tracer, route="/jobs", duration_ms=10, error=False, children=2, start=0):
+    """Emit one trace: a root server span with ``children`` child spans."""
+    root = tracer.start_span("GET " + route, attributes={"http.route": route}, start_time=start)
+    context = set_span_in_context(root)
+    for i in range(children):
+        child = tracer.start_span(f"db.query.{i}", context=context, start_time=start)
+        if error and i == 0:
+            child.set_status(Status(StatusCode.ERROR, "deadlock"))
+        child.end(end_time=start + MS)
+    root.end(end_time=start + duration_ms * MS)
+    return root.get_span_context().trace_id
+
+
+def exported_traces(exporter) -> set[int]:
+    return {span.context.trace_id for span in exporter.get_finished_spans()}
+
+
+def test_error_traces_are_kept_whole():
+    tracer, processor, exporter = make_tracer(baseline_rate=0.0)
+
+    failed = request(tracer, error=True)
+    request(tracer)
+
+    assert exported_traces(exporter) == {failed}
+    assert len(exporter.get_finished_spans()) == 3
+    assert processor.get_metrics()["traces_kept_error"] == 1
+    assert processor.get_metrics()["buffered_spans"] == 0
+
+
+def test_latency_outliers_are_judged_per_route():
+    tracer, processor, exporter = make_tracer(
+        baseline_rate=0.0, min_route_samples=50, latency_quantile=0.95
+    )
+    for _ in range(200):
+        request(tracer, route="/jobs", duration_ms=10, children=0)
+        request(tracer, route="/reports", duration_ms=500, children=0)
+
+    slow_jobs = request(tracer, route="/jobs", duration_ms=100, children=0)
+    normal_report = request(tracer, route="/reports", duration_ms=120, children=0)
+
+    kept = exported_traces(exporter)
+    assert slow_jobs in kept
+    assert normal_report not in kept
+
+
+def test_baseline_is_uniform_and_consistent():
+    ids = range(0, 1 << 64, (1 << 64) // 10_000)
+
+    kept = sum(trace_id_ratio_sampled(trace_id, 0.03) for trace_id in ids)
+
+    assert 250 <= kept <= 350
+    assert trace_id_ratio_sampled(12345, 0.3) == trace_id_ratio_sampled(12345, 0.3)
+    assert not trace_id_ratio_sampled(1, 0.0) and trace_id_ratio_sampled(1, 1.0)
+
+
+def test_unfinished_trace_is_decided_after_timeout():
+    clock = [0.0]
+    tracer, processor, exporter = make_tracer(
+        baseline_rate=0.0, decision_wait_seconds=10, clock=lambda: clock[0]
+    )
+    root = tracer.start_span("GET /jobs")
+    child = tracer.start_span("db.query", context=set_span_in_context(root))
+    child.set_status(Status(StatusCode.ERROR))
+    child.end()
+
+    assert processor.sweep() == 0
+    clock[0] = 11.0
+    assert processor.sweep() == 1
+
+    assert len(exporter.get_finished_spans()) == 1
+    root.end()  # late root follows the "keep" decision
+    assert len(exporter.get_finished_spans()) == 2
+    metrics = processor.get_metrics()
+    assert metrics["traces_decided_on_timeout"] == 1
+    assert metrics["late_spans_exported"] == 1
+
+
+def test_buffer_is_bounded():
+    tracer, processor, exporter = make_tracer(baseline_rate=0.0, max_buffered_spans=20)
+
+    roots = [tracer.start_span(f"r{i}") for i in range(10)]
+    for root in roots:
+        for _ in range(5):
+            tracer.start_span("child", context=set_span_in_context(root)).end()
+
+    metrics = processor.get_metrics()
+    assert metrics["buffered_spans"] <= 20
+    assert metrics["traces_decided_on_overflow"] >= 6
+    assert metrics["peak_buffered_bytes"] > 0
+    for root in roots:
+        root.end()
+    assert processor.get_metrics()["buffered_traces"] == 0
+
+
+def test_rolling_quantile_forgets_old_values():
+    quantile = RollingQuantile(0.9, window=100)
+    for _ in range(100):
+        quantile.add(5.0)
+    for _ in range(100):
+        quantile.add(0.1)
+
+    assert quantile.threshold == 0.1
+
+
+class TestIntelligentSampler:
+    """Head sampler fixes."""
+
+    def test_non_integer_reciprocal_rate(self):
+        sampler = IntelligentSampler(base_sample_rate=0.3)
+        ids = range(0, 1 << 64, (1 << 64) // 10_000)
+
+        sampled = sum(
+            sampler.should_sample(None, trace_id, "op").decision is Decision.RECORD_AND_SAMPLE
+            for trace_id in ids
+        )
+
+        assert 2800 <= sampled <= 3200
+
+    def test_error_burst_decays(self, monkeypatch):
+        now = [1000.0]
+        monkeypatch.setattr("resync.core.distributed_tracing.time.monotonic", lambda: now[0])
+        sampler = IntelligentSampler(base_sample_rate=0.1, decay_half_life_seconds=10)
+        for _ in range(100):
+            sampler.record_request(has_error=True)
+        assert sampler._calculate_adaptive_rate() == 1.0
+
+        now[0] += 120
+        for _ in range(100):
+            sampler.record_request(has_error=False)
+
+        assert sampler._calculate_adaptive_rate() == 0.1
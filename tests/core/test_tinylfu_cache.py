@@ -0,0 +1,93 @@
+"""
+Tests for the W-TinyLFU cache used by the L1 tier.
+
+Tests cover:
+- Basic get/put/remove semantics and the size bound
+- Frequency-based admission (popular keys survive scans)
+- Count-min sketch estimates and aging
+- Hit ratio on a skewed (Zipfian) trace compared with plain LRU
+"""
+
+import random
+from collections import OrderedDict
+
+from resync.core.utils.data_structures import CountMinSketch, WTinyLFUCache
+
+
+def zipf_trace(keys: int, length: int, s: float = 1.0, seed: int = 7) -> list[int]:
+    weights = [1 / (rank**s) for rank in range(1, keys + 1)]
+    return random.Random(seed).choices(range(keys), weights=weights, k=length)
+
+
+def test_basic_operations_and_bound():
+    cache = WTinyLFUCache(max_size=10)
+    for i in range(100):
+        cache.put(f"k{i}", i)
+        assert len(cache) <= 10
+
+    cache.put("hot", "v1")
+    cache.put("hot", "v2")
+    assert cache.get("hot") == "v2"
+    assert cache.remove("hot") and not cache.remove("hot")
+    assert cache.get("hot", "default") == "default"
+    assert cache.evictions == 100 - 10 + 1
+
+
+def test_popular_keys_survive_a_scan():
+    cache = WTinyLFUCache(max_size=100)
+    for i in range(50):
+        cache.put(f"hot{i}", i)
+
+    for round_ in range(50):
+        for i in range(50):
+            if cache.get(f"hot{i}") is None:
+                cache.put(f"hot{i}", i)
+        for i in range(200):
+            cache.put(f"scan{round_}:{i}", i)
+
+    assert all(f"hot{i}" in cache for i in range(50))
+
+
+def test_sketch_estimates_and_ages():
+    sketch = CountMinSketch(capacity=64)
+    for _ in range(5):
+        sketch.increment("job:A")
+    sketch.increment("job:B")
+
+    assert sketch.frequency("job:A") >= 5
+    assert sketch.frequency("job:B") >= 1
+    assert sketch.frequency("job:A") > sketch.frequency("never-seen")
+
+    sketch.reset()
+    assert 2 <= sketch.frequency("job:A") <= 3
+
+
+def test_sketch_counters_saturate():
+    sketch = CountMinSketch(capacity=1_000_000)
+    for _ in range(100):
+        sketch.increment("x")
+
+    assert sketch.frequency("x") == 15
+
+
+def test_beats_lru_on_zipfian_trace():
+    capacity = 100
+    trace = zipf_trace(keys=10_000, length=50_000)
+
+    tinylfu = WTinyLFUCache(max_size=capacity)
+    for key in trace:
+        if tinylfu.get(key) is None:
+            tinylfu.put(key, key)
+
+    lru: OrderedDict[int, int] = OrderedDict()
+    lru_hits = 0
+    for key in trace:
+        if key in lru:
+            lru.move_to_end(key)
+            lru_hits += 1
+        else:
+            lru[key] = key
+            if len(lru) > capacity:
+                lru.popitem(last=False)
+
+    assert tinylfu.hit_ratio > lru_hits / len(trace) + 0.05
@@ -0,0 +1,257 @@
+"""
+Tests for encode-once WebSocket broadcasting.
+
+Tests cover:
+- Slow-consumer policies (drop oldest, coalesce latest state, disconnect)
+- Topic subscriptions
+- One serialization per broadcast, one writer per connection
+- WebSocketPoolManager fan-out to thousands of in-process fake sockets
+"""
+
+import asyncio
+import json
+import logging
+from types import SimpleNamespace
+from unittest.mock import Mock
+
+import pytest
+
+from resync.core import websocket_pool_manager as pool_module
+from resync.core.websocket_broadcast import (
+    BroadcastHub,
+    BroadcastMessage,
+    ClientSendQueue,
+    EnqueueResult,
+    SlowConsumerPolicy,
+)
+from resync.core.websocket_pool_manager import WebSocketPoolManager
+
+
+class FakeWebSocket:
+    """In-process WebSocket recording frames; can be slowed down or stalled."""
+
+    def __init__(self, delay: float = 0.0, stalled: bool = False):
+        self.frames: list[str] = []
+        self.delay = delay
+        self.stalled = stalled
+        self.closed_with: int | None = None
+        self.client_state = SimpleNamespace(DISCONNECTED=False)
+
+    async def accept(self) -> None:
+        pass
+
+    async def send_text(self, text: str) -> None:
+        if self.stalled:
+            await asyncio.Event().wait()
+        if self.delay:
+            await asyncio.sleep(self.delay)
+        self.frames.append(text)
+
+    async def send_json(self, data) -> None:
+        raise AssertionError("broadcasts must send pre-serialized text")
+
+    async def close(self, code: int = 1000, reason: str | None = None) -> None:
+        self.closed_with = code
+
+
+async def wait_until(predicate, timeout: float = 5.0) -> None:
+    deadline = asyncio.get_running_loop().time() + timeout
+    while not predicate():
+        assert asyncio.get_running_loop().time() < deadline, "condition not met in time"
+        await asyncio.sleep(0.01)
+
+
+def frame(n: int, key: str | None = None) -> BroadcastMessage:
+    return BroadcastMessage.from_text(str(n), key=key)
+
+
+class TestSendQueue:
+    """ClientSendQueue slow-consumer policies."""
+
+    def test_drop_oldest_keeps_newest_frames(self):
+        queue = ClientSendQueue(3, SlowConsumerPolicy.DROP_OLDEST)
+
+        results = [queue.put(frame(i)) for i in range(5)]
+
+        assert results[-1] is EnqueueResult.DROPPED_OLDEST
+        assert [m.text for m in queue._frames.values()] == ["2", "3", "4"]
+
+    def test_coalesce_replaces_state_in_place(self):
+        queue = ClientSendQueue(3, SlowConsumerPolicy.COALESCE)
+        queue.put(frame(1, key="job:A"))
+        queue.put(frame(2, key="job:B"))
+
+        assert queue.put(frame(3, key="job:A")) is EnqueueResult.COALESCED
+        assert [m.text for m in queue._frames.values()] == ["3", "2"]
+
+    def test_disconnect_policy_reports_overflow(self):
+        queue = ClientSendQueue(2, SlowConsumerPolicy.DISCONNECT)
+        queue.put(frame(1))
+        queue.put(frame(2))
+
+        assert queue.put(frame(3)) is EnqueueResult.OVERFLOW
+        assert len(queue) == 2
+
+
+class TestBroadcastHub:
+    """Fan-out, topics and per-client writers."""
+
+    async def test_topic_broadcasts_reach_only_subscribers(self):
+        hub = BroadcastHub()
+        watcher, other, everything = FakeWebSocket(), FakeWebSocket(), FakeWebSocket()
+        hub.register("watcher", watcher, topics=["job:A"])
+        hub.register("other", other, topics=["job:B"])
+        hub.register("all", everything, topics=["*"])
+
+        assert hub.publish_json({"job": "A"}, topic="job:A") == 2
+        assert hub.publish_json({"hello": 1}) == 3
+        await wait_until(lambda: len(watcher.frames) == 2 and len(everything.frames) == 2)
+        await hub.close()
+
+        assert other.frames == ['{"hello":1}']
+        assert watcher.frames == ['{"job":"A"}', '{"hello":1}']
+
+    async def test_slow_client_does_not_delay_others(self):
+        hub = BroadcastHub(max_queue_size=4, send_timeout=30)
+        fast, stalled = FakeWebSocket(), FakeWebSocket(stalled=True)
+        hub.register("fast", fast)
+        hub.register("stalled", stalled)
+
+        for i in range(50):
+            hub.publish_text(str(i))
+            await asyncio.sleep(0)
+        await wait_until(lambda: len(fast.frames) == 50)
+
+        assert len(hub.writers["stalled"].queue) == 4
+        assert hub.writers["stalled"].dropped > 0
+        await hub.close()
+
+    async def test_coalescing_delivers_latest_state(self):
+        hub = BroadcastHub(max_queue_size=8, policy="coalesce")
+        slow = FakeWebSocket(delay=0.05)
+        hub.register("slow", slow)
+
+        for i in range(20):
+            hub.publish_json({"job": "A", "status": i}, key="job:A")
+        await wait_until(lambda: slow.frames and json.loads(slow.frames[-1])["status"] == 19)
+        await hub.close()
+
+        assert len(slow.frames) <= 3
+        assert hub.frames_coalesced >= 17
+
+    async def test_disconnect_policy_closes_slow_client(self):
+        closed = []
+
+        async def on_close(client_id, reason):
+            closed.append((client_id, reason))
+
+        hub = BroadcastHub(max_queue_size=2, policy=SlowConsumerPolicy.DISCONNECT)
+        stalled = FakeWebSocket(stalled=True)
+        hub.register("slow", stalled, on_close=on_close)
+
+        for i in range(5):
+            hub.publish_text(str(i))
+            await asyncio.sleep(0)
+        await wait_until(lambda: closed)
+
+        assert closed == [("slow", "slow_consumer")]
+        assert stalled.closed_with == 1013
+        assert hub.slow_consumer_disconnects == 1
+        await hub.close()
+
+    async def test_send_timeout_stops_the_writer(self):
+        closed = []
+
+        async def on_close(client_id, reason):
+            closed.append(reason)
+
+        hub = BroadcastHub(send_timeout=0.05)
+        hub.register("stuck", FakeWebSocket(stalled=True), on_close=on_close)
+        hub.publish_text("x")
+
+        await wait_until(lambda: closed)
+        assert closed == ["send_timeout"]
+        await hub.close()
+
+
+@pytest.fixture
+def ws_settings(monkeypatch):
+    monkeypatch.setattr(pool_module, "runtime_metrics", Mock())
+    settings = SimpleNamespace(
+        WS_POOL_MAX_SIZE=10_000,
+        WS_POOL_CLEANUP_INTERVAL=3600,
+        WS_CONNECTION_TIMEOUT=3600,
+        WS_SEND_QUEUE_SIZE=16,
+        WS_SLOW_CONSUMER_POLICY="drop_oldest",
+        WS_SEND_TIMEOUT=60.0,
+    )
+    monkeypatch.setattr(pool_module, "_get_settings", lambda: settings)
+    return settings
+
+
+class TestPoolManagerBroadcast:
+    """WebSocketPoolManager broadcasting through per-client writers."""
+
+    async def test_json_is_serialized_once(self, ws_settings, monkeypatch):
+        manager = WebSocketPoolManager()
+        sockets = [FakeWebSocket() for _ in range(10)]
+        for i, ws in enumerate(sockets):
+            await manager.connect(ws, f"c{i}")
+
+        calls = []
+        original = json.dumps
+        monkeypatch.setattr(
+            "resync.core.websocket_broadcast.json.dumps",
+            lambda *a, **kw: calls.append(1) or original(*a, **kw),
+        )
+        assert await manager.broadcast_json({"type": "job_update", "status": "SUCC"}) == 10
+        await wait_until(lambda: all(ws.frames for ws in sockets))
+
+        assert len(calls) == 1
+        assert manager.stats.total_messages_sent == 10
+        await manager._close_all_connections()
+
+    async def test_failed_socket_is_removed(self, ws_settings):
+        manager = WebSocketPoolManager()
+        broken = FakeWebSocket()
+
+        async def fail(text):
+            raise ConnectionError("reset by peer")
+
+        broken.send_text = fail
+        await manager.connect(broken, "broken")
+        await manager.connect(FakeWebSocket(), "ok")
+
+        await manager.broadcast("ping")
+        await wait_until(lambda: "broken" not in manager.connections)
+
+        assert set(manager.connections) == {"ok"}
+        assert "broken" not in manager.broadcaster.writers
+        await manager._close_all_connections()
+
+    async def test_thousands_of_clients_with_slow_minority(self, ws_settings, caplog):
+        caplog.set_level(logging.WARNING, logger=pool_module.__name__)
+        manager = WebSocketPoolManager()
+        clients = 2000
+        sockets = []
+        for i in range(clients):
+            ws = FakeWebSocket(stalled=i % 100 == 0)
+            sockets.append(ws)
+            await manager.connect(ws, f"c{i}", topics=[f"job:{i % 10}"])
+
+        for n in range(20):
+            await manager.broadcast_json({"seq": n})
+            await manager.broadcast_json({"job": 3, "seq": n}, topic="job:3")
+            await asyncio.sleep(0)
+
+        expected = [40 if i % 10 == 3 else 20 for i in range(clients)]
+        await wait_until(
+            lambda: all(
+                len(ws.frames) == n for ws, n in zip(sockets, expected) if not ws.stalled
+            ),
+            timeout=30,
+        )
+        assert manager.stats.frames_dropped > 0
+        assert max(len(w.queue) for w in manager.broadcaster.writers.values()) <= 16
+        await manager._close_all_connections()
+        assert not manager.broadcaster.writers
@@ -0,0 +1,253 @@
+"""
+Tests for set-based TWS knowledge graph persistence.
+
+Covers:
+1. Diff against the previous expansion (only changed rows written)
+2. COPY into staging + merge, and pruning of removed edges
+3. Concurrent source fetching and level-parallel job expansion
+"""
+
+import asyncio
+from contextlib import asynccontextmanager
+
+import pytest
+
+from resync.knowledge.retrieval.tws_expander import GraphExpansionConfig, TWSGraphExpander
+from resync.knowledge.retrieval.tws_graph_store import (
+    TWSGraphStore,
+    diff_graph,
+    node_record,
+    relation_record,
+)
+from resync.knowledge.retrieval.tws_relations import (
+    TWSNode,
+    TWSNodeType,
+    TWSRelation,
+    TWSRelationType,
+)
+
+
+class FakeConnection:
+    """Minimal asyncpg.Connection double backed by dicts."""
+
+    def __init__(self):
+        self.nodes: dict[str, tuple] = {}
+        self.relations: dict[tuple, tuple] = {}
+        self.copied: dict[str, list[tuple]] = {}
+        self.deleted: list[tuple] = []
+
+    async def fetch(self, query, tenant):
+        if "FROM kg_nodes" in query:
+            return [{"node_id": r[0], "content_hash": r[-1]} for r in self.nodes.values()]
+        return [
+            {"from_node": r[0], "to_node": r[1], "relation_type": r[2], "content_hash": r[-1]}
+            for r in self.relations.values()
+        ]
+
+    async def execute(self, query, *args):
+        if query.lstrip().startswith("INSERT INTO kg_nodes"):
+            for r in self.copied.pop("kg_nodes_stage"):
+                self.nodes[r[0]] = r
+        elif query.lstrip().startswith("INSERT INTO kg_relations"):
+            for r in self.copied.pop("kg_relations_stage"):
+                self.relations[r[:3]] = r
+        elif query.lstrip().startswith("DELETE"):
+            for key in zip(*args[:3], strict=True):
+                self.deleted.append(key)
+                self.relations.pop(key, None)
+
+    async def copy_records_to_table(self, table, records, columns):
+        self.copied[table] = list(records)
+
+    @asynccontextmanager
+    async def transaction(self):
+        yield
+
+
+def _node(name, **props):
+    return TWSNode(
+        node_id=f"job:{name}", node_type=TWSNodeType.JOB, name=name, properties=props
+    )
+
+
+def _rel(a, b, rel_type=TWSRelationType.FOLLOWS):
+    return TWSRelation(from_node=a, to_node=b, relation_type=rel_type)
+
+
+class TestDiffGraph:
+    """Tests for diff_graph."""
+
+    def test_unchanged_rows_are_skipped(self):
+        nodes = [_node("A", status="SUCC"), _node("B")]
+        relations = [_rel("B", "A")]
+        previous_nodes = {r[0]: r[-1] for r in map(node_record, nodes)}
+        previous_rels = {r[:3]: r[-1] for r in map(relation_record, relations)}
+
+        diff = diff_graph(nodes, relations, previous_nodes, previous_rels)
+
+        assert diff.is_empty
+        assert diff.nodes_unchanged == 2 and diff.relations_unchanged == 1
+
+    def test_changed_and_removed(self):
+        old = [_rel("B", "A"), _rel("C", "A")]
+        previous_rels = {r[:3]: r[-1] for r in map(relation_record, old)}
+        previous_nodes = {node_record(_node("A", status="SUCC"))[0]: "stale"}
+
+        diff = diff_graph([_node("A", status="ABEND")], [_rel("B", "A")], previous_nodes, previous_rels)
+
+        assert [r[0] for r in diff.nodes_upsert] == ["job:A"]
+        assert diff.relations_upsert == []
+        assert diff.relations_delete == [("C", "A", "follows")]
+
+    def test_no_prune_keeps_missing_relations(self):
+        previous_rels = {relation_record(_rel("C", "A"))[:3]: "x"}
+
+        diff = diff_graph([], [], {}, previous_rels, prune=False)
+
+        assert diff.relations_delete == []
+
+
+class TestTWSGraphStore:
+    """Tests for TWSGraphStore.sync."""
+
+    @pytest.mark.asyncio
+    async def test_second_sync_writes_only_delta(self):
+        conn = FakeConnection()
+        store = TWSGraphStore(conn)
+
+        first = await store.sync([_node("A"), _node("B")], [_rel("B", "A"), _rel("C", "A")])
+        assert len(first.nodes_upsert) == 2 and len(first.relations_upsert) == 2
+
+        second = await store.sync(
+            [_node("A"), _node("B", owner="ops")],
+            [_rel("B", "A"), _rel("D", "A")],
+        )
+
+        assert [r[0] for r in second.nodes_upsert] == ["job:B"]
+        assert [r[:3] for r in second.relations_upsert] == [("D", "A", "follows")]
+        assert conn.deleted == [("C", "A", "follows")]
+        assert set(conn.relations) == {("B", "A", "follows"), ("D", "A", "follows")}
+
+    @pytest.mark.asyncio
+    async def test_accepts_pool(self):
+        conn = FakeConnection()
+
+        class Pool:
+            @asynccontextmanager
+            async def acquire(self):
+                yield conn
+
+        await TWSGraphStore(Pool()).sync([_node("A")], [])
+
+        assert "job:A" in conn.nodes
+
+
+class TestConcurrentExpansion:
+    """Tests for bounded concurrent fetching in TWSGraphExpander."""
+
+    @pytest.mark.asyncio
+    async def test_job_levels_fetched_concurrently_and_bounded(self):
+        in_flight = 0
+        peak = 0
+        tree = {"ROOT": ["A", "B", "C", "D"], "A": ["E"], "B": ["E"]}
+
+        class FakeTWS:
+            async def get_job(self, name):
+                nonlocal in_flight, peak
+                in_flight += 1
+                peak = max(peak, in_flight)
+                await asyncio.sleep(0.05)
+                in_flight -= 1
+                return {
+                    "name": name,
+                    "dependencies": [],
+                    "successors": [{"job_name": s} for s in tree.get(name, [])],
+                }
+
+        expander = TWSGraphExpander(
+            tws_client=FakeTWS(), config=GraphExpansionConfig(parallel_requests=2)
+        )
+
+        start = asyncio.get_running_loop().time()
+        stats = await expander.expand_from_job("ROOT", depth=3)
+        elapsed = asyncio.get_running_loop().time() - start
+
+        assert stats.jobs_processed == 6
+        assert stats.relations_created == 6
+        assert peak == 2
+        # 1 + ceil(4/2) + 1 rounds of 50ms instead of 6 sequential calls
+        assert elapsed < 0.3
+
+    @pytest.mark.asyncio
+    async def test_full_expansion_persists_with_prune(self):
+        conn = FakeConnection()
+        conn.relations[("OLD", "GONE", "follows")] = ("OLD", "GONE", "follows", "{}", 1.0, "", "h")
+
+        stats = await TWSGraphExpander(db_session=conn).expand_full()
+
+        assert stats.nodes_written == stats.nodes_created
+        assert stats.relations_written == stats.relations_created
+        assert stats.relations_deleted == 1
+        assert ("OLD", "GONE", "follows") not in conn.relations
+
+    @pytest.mark.asyncio
+    async def test_failed_source_skips_prune(self):
+        conn = FakeConnection()
+        conn.relations[("PAYROLL", "BACKUP", "follows")] = (
+            "PAYROLL", "BACKUP", "follows", "{}", 1.0, "", "h"
+        )
+
+        class FailingTWS:
+            async def get_all_jobs(self):
+                raise ConnectionError("TWS API unavailable")
+
+            async def get_all_resources(self):
+                return []
+
+            async def get_all_schedules(self):
+                return []
+
+            async def get_all_workstations(self):
+                return []
+
+            async def get_recovery_mapping(self):
+                return {}
+
+        stats = await TWSGraphExpander(tws_client=FailingTWS(), db_session=conn).expand_full()
+
+        assert any("jobs" in error for error in stats.errors)
+        assert stats.relations_deleted == 0
+        assert ("PAYROLL", "BACKUP", "follows") in conn.relations
+
+
+class TestSessionHandle:
+    """SQLAlchemy AsyncSession handles."""
+
+    @pytest.mark.asyncio
+    async def test_outer_session_transaction_is_committed(self):
+        conn = FakeConnection()
+
+        class Session:
+            committed = rolled_back = False
+
+            async def connection(self):
+                class SAConnection:
+                    async def get_raw_connection(self):
+                        class Raw:
+                            driver_connection = conn
+
+                        return Raw()
+
+                return SAConnection()
+
+            async def commit(self):
+                self.committed = True
+
+            async def rollback(self):
+                self.rolled_back = True
+
+        session = Session()
+        await TWSGraphStore(session).sync([_node("A")], [])
+
+        assert "job:A" in conn.nodes
+        assert session.committed and not session.rolled_back
@@ -0,0 +1,154 @@
+"""
+Tests for the scatter-gather executor used by diagnostic graphs.
+
+These tests validate:
+1. Sources run concurrently and results come back in priority order
+2. Per-source deadlines cancel stragglers without delaying the rest
+3. Source errors become outcomes instead of exceptions
+4. FallbackParallelGraph aggregates partial results and flags missing sources
+"""
+
+import asyncio
+import time
+from unittest.mock import AsyncMock, patch
+
+import pytest
+
+from resync.core.langgraph.parallel_graph import (
+    DataSourceResult,
+    FallbackParallelGraph,
+    ParallelConfig,
+)
+from resync.core.langgraph.scatter_gather import (
+    ScatterGatherExecutor,
+    SourceSpec,
+)
+
+
+async def _value(value, delay: float):
+    await asyncio.sleep(delay)
+    return value
+
+
+class TestScatterGatherExecutor:
+    """Tests for ScatterGatherExecutor.run."""
+
+    @pytest.mark.asyncio
+    async def test_runs_concurrently_in_priority_order(self):
+        executor = ScatterGatherExecutor("test_concurrent")
+        specs = [
+            SourceSpec("low", lambda: _value("l", 0.1), priority=0),
+            SourceSpec("high", lambda: _value("h", 0.1), priority=5),
+        ]
+
+        start = time.perf_counter()
+        result = await executor.run(specs)
+        elapsed = time.perf_counter() - start
+
+        assert elapsed < 0.18
+        assert [o.name for o in result.outcomes] == ["high", "low"]
+        assert [o.value for o in result.completed] == ["h", "l"]
+        assert not result.partial
+
+    @pytest.mark.asyncio
+    async def test_straggler_is_cancelled_at_deadline(self):
+        executor = ScatterGatherExecutor("test_deadline")
+        cancelled = asyncio.Event()
+
+        async def slow():
+            try:
+                await asyncio.sleep(5)
+            except asyncio.CancelledError:
+                cancelled.set()
+                raise
+
+        specs = [
+            SourceSpec("fast", lambda: _value("ok", 0.01), deadline_s=1.0),
+            SourceSpec("slow", slow, deadline_s=0.1),
+        ]
+
+        start = time.perf_counter()
+        result = await executor.run(specs)
+
+        assert time.perf_counter() - start < 0.5
+        assert cancelled.is_set()
+        assert result.timed_out == ["slow"]
+        assert [o.name for o in result.completed] == ["fast"]
+        assert "Deadline exceeded" in result.outcomes[1].error
+
+    @pytest.mark.asyncio
+    async def test_overall_deadline_caps_sources(self):
+        executor = ScatterGatherExecutor("test_overall")
+        specs = [SourceSpec("slow", lambda: _value("x", 1.0), deadline_s=10.0)]
+
+        start = time.perf_counter()
+        result = await executor.run(specs, deadline_s=0.1)
+
+        assert time.perf_counter() - start < 0.5
+        assert result.missing == ["slow"]
+
+    @pytest.mark.asyncio
+    async def test_errors_become_outcomes(self):
+        executor = ScatterGatherExecutor("test_errors")
+
+        async def boom():
+            raise RuntimeError("connection refused")
+
+        result = await executor.run([SourceSpec("tws", boom)])
+
+        assert result.failed == ["tws"]
+        assert result.outcomes[0].error == "connection refused"
+
+    @pytest.mark.asyncio
+    async def test_records_per_source_metrics(self):
+        executor = ScatterGatherExecutor("test_metrics")
+        specs = [
+            SourceSpec("a", lambda: _value(1, 0)),
+            SourceSpec("b", lambda: _value(2, 1.0), deadline_s=0.05),
+        ]
+
+        await executor.run(specs)
+
+        assert executor.get_source_stats("a")["ok"] == 1
+        assert executor.get_source_stats("b")["timeout"] == 1
+        assert executor.get_source_stats("a")["p50_ms"] is not None
+
+
+class TestFallbackPartialResults:
+    """FallbackParallelGraph returns partial results on slow sources."""
+
+    @pytest.mark.asyncio
+    async def test_slow_source_is_flagged_missing(self):
+        def result(source):
+            return {
+                "parallel_results": [
+                    DataSourceResult(
+                        source=source, data={"ok": True}, latency_ms=1.0, success=True, error=None
+                    )
+                ]
+            }
+
+        async def slow_rag(state):
+            await asyncio.sleep(5)
+
+        config = ParallelConfig(
+            enable_log_cache=False,
+            enable_metrics=False,
+            source_deadlines={"tws_status": 1.0, "rag_search": 0.1},
+        )
+
+        with patch.multiple(
+            "resync.core.langgraph.parallel_graph",
+            tws_status_node=AsyncMock(return_value=result("tws_status")),
+            rag_search_node=slow_rag,
+            response_generator_node=AsyncMock(return_value={"response": "ok"}),
+        ):
+            start = time.perf_counter()
+            state = await FallbackParallelGraph(config).ainvoke({"message": "Job X falhou"})
+
+        assert time.perf_counter() - start < 1.0
+        aggregated = state["aggregated_data"]
+        assert aggregated["sources_available"] == ["tws_status"]
+        assert aggregated["sources_missing"] == ["rag_search"]
+        assert aggregated["sources_failed"][0]["timed_out"] is True
+        assert state["metadata"]["partial"] is True
@@ -0,0 +1,176 @@
+"""
+Tests for the internal metrics Histogram (DDSketch).
+
+Tests cover:
+- Percentile accuracy within the configured relative error
+- Bounded memory and merging
+- Whole-process-group percentiles through segment files
+"""
+
+import multiprocessing
+import random
+from concurrent.futures import ProcessPoolExecutor
+
+import pytest
+
+from resync.core.metrics_internal import (
+    DDSketch,
+    Histogram,
+    MetricsRegistry,
+    SketchSegmentStore,
+)
+
+
+def _pool_observe(name):
+    registry = MetricsRegistry()
+    registry.get(name).observe(5.0)
+    registry.flush_segment()
+
+
+def _gunicorn_worker(directory, name):
+    registry = MetricsRegistry()
+    registry.enable_multiprocess(directory, flush_interval=3600)
+    registry.get(name).observe(5.0)
+    registry.flush_segment()
+
+
+def _exact(values, q):
+    ordered = sorted(values)
+    return ordered[int(q * (len(ordered) - 1))]
+
+
+class TestDDSketch:
+    """Tests for DDSketch."""
+
+    @pytest.mark.parametrize("q", [0.5, 0.9, 0.95, 0.99])
+    def test_quantiles_within_relative_accuracy(self, q):
+        rng = random.Random(42)
+        values = [rng.lognormvariate(-3, 1.2) for _ in range(20_000)]
+        sketch = DDSketch(relative_accuracy=0.01)
+        for value in values:
+            sketch.add(value)
+
+        exact = _exact(values, q)
+
+        assert sketch.quantile(q) == pytest.approx(exact, rel=0.011)
+
+    def test_zero_and_negative_values(self):
+        sketch = DDSketch()
+        for value in (-2.0, -1.0, 0.0, 0.0, 1.0):
+            sketch.add(value)
+
+        assert sketch.quantile(0) == pytest.approx(-2.0, rel=0.01)
+        assert sketch.quantile(0.5) == 0.0
+        assert sketch.quantile(1) == pytest.approx(1.0, rel=0.01)
+
+    def test_memory_is_bounded(self):
+        sketch = DDSketch(max_bins=64)
+        values = [i * 10.0**exponent for exponent in range(-8, 8) for i in range(1, 100)]
+        for value in values:
+            sketch.add(value)
+
+        assert len(sketch._bins) <= 64
+        assert sketch.count == len(values)
+        # Collapsing folds the lowest buckets, upper quantiles stay accurate
+        assert sketch.quantile(0.99) == pytest.approx(_exact(values, 0.99), rel=0.011)
+
+    def test_merge_equals_single_sketch(self):
+        rng = random.Random(7)
+        values = [rng.expovariate(10) for _ in range(5_000)]
+        whole, left, right = DDSketch(), DDSketch(), DDSketch()
+        for i, value in enumerate(values):
+            whole.add(value)
+            (left if i % 2 else right).add(value)
+
+        left.merge(right)
+
+        assert left.count == whole.count
+        for q in (0.5, 0.95, 0.99):
+            assert left.quantile(q) == whole.quantile(q)
+
+    def test_roundtrip(self):
+        sketch = DDSketch()
+        for value in (0.001, 0.2, 3.0):
+            sketch.add(value)
+
+        restored = DDSketch.from_dict(sketch.to_dict())
+
+        assert restored.quantile(0.5) == sketch.quantile(0.5)
+        assert restored.count == 3 and restored.sum == pytest.approx(3.201)
+
+
+class TestHistogram:
+    """Tests for the sketch-backed Histogram."""
+
+    def test_percentiles_per_label_set(self):
+        histogram = Histogram("latency", labels=["route"])
+        for i in range(1, 101):
+            histogram.observe(i / 1000, {"route": "a"})
+        histogram.observe(5.0, {"route": "b"})
+
+        assert histogram.get_percentile(50, {"route": "a"}) == pytest.approx(0.05, rel=0.02)
+        assert histogram.get_percentile(99, {"route": "b"}) == pytest.approx(5.0, rel=0.01)
+        assert histogram.get_percentile(50, {"route": "missing"}) is None
+        assert histogram.get_count({"route": "a"}) == 100
+
+    def test_segments_merge_across_processes(self, tmp_path):
+        first, second = Histogram("rt"), Histogram("rt")
+        for i in range(100):
+            first.observe(0.01)
+            second.observe(1.0)
+
+        SketchSegmentStore(tmp_path, pid=1).write({"rt": first})
+        SketchSegmentStore(tmp_path, pid=2).write({"rt": second})
+
+        merged = SketchSegmentStore(tmp_path, pid=3).read_merged()["rt"][()]
+
+        assert merged.count == 200
+        assert merged.quantile(0.25) == pytest.approx(0.01, rel=0.01)
+        assert merged.quantile(0.75) == pytest.approx(1.0, rel=0.01)
+
+    def test_export_reports_process_group(self, tmp_path, monkeypatch):
+        registry = MetricsRegistry()
+        histogram = Histogram("export_rt_test")
+        histogram.observe(0.1)
+        registry.register(histogram)
+
+        other = Histogram("export_rt_test")
+        for _ in range(9):
+            other.observe(2.0)
+        SketchSegmentStore(tmp_path, pid=999_999).write({"export_rt_test": other})
+
+        monkeypatch.setattr(registry, "_segment_store", SketchSegmentStore(tmp_path))
+        try:
+            exported = registry.export_json()["metrics"]["export_rt_test"]
+        finally:
+            registry._metrics.pop("export_rt_test", None)
+
+        assert exported["multiprocess"] is True
+        assert exported["count"] == 10
+        assert exported["p50"] == pytest.approx(2.0, rel=0.01)
+
+    def test_forked_children_do_not_duplicate_sketches(self, tmp_path, monkeypatch):
+        registry = MetricsRegistry()
+        monkeypatch.setattr(registry, "_segment_store", None)
+        monkeypatch.setattr(registry, "_shared_values", None)
+        monkeypatch.setattr(registry, "_metrics", {})
+
+        histogram = Histogram("fork_rt_test")
+        registry.register(histogram)
+        registry.enable_multiprocess(tmp_path, flush_interval=3600)
+        for _ in range(10):
+            histogram.observe(0.1)
+        registry.flush_segment()
+
+        ctx = multiprocessing.get_context("fork")
+        with ProcessPoolExecutor(2, mp_context=ctx) as pool:
+            list(pool.map(_pool_observe, [histogram.name] * 4))
+        worker = ctx.Process(target=_gunicorn_worker, args=(tmp_path, histogram.name))
+        worker.start()
+        worker.join()
+
+        merged = SketchSegmentStore(tmp_path, pid=1).read_merged()[histogram.name][()]
+
+        # Parent's 10 observations once, plus the worker's own
+        assert merged.count == 11
+        assert len(list(tmp_path.glob("sketches_*.json"))) == 2
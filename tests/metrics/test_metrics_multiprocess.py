@@ -0,0 +1,217 @@
+"""
+Tests for the multi-process metrics backend and correlation tracking.
+
+Tests cover:
+- mmap segment layout (append, growth, reopen)
+- Aggregation of counters/gauges written by several processes
+- Bounded, sampled correlation tracking in RuntimeMetricsCollector
+"""
+
+import multiprocessing
+import os
+from concurrent.futures import ProcessPoolExecutor
+
+import pytest
+
+from resync.core.metrics.runtime_metrics import RuntimeMetricsCollector
+from resync.core.metrics_internal import Counter, Gauge, MetricsRegistry, _combine_gauge
+from resync.core.metrics_multiprocess import (
+    MmapValueFile,
+    SharedMetricValues,
+    collect,
+    mark_process_dead,
+    read_segment,
+)
+
+
+class TestMmapValueFile:
+    """Tests for the single-writer mmap table."""
+
+    def test_write_and_read_back(self, tmp_path):
+        table = MmapValueFile(tmp_path / "counters_1.db")
+        table.write("a", 1.0)
+        table.write("b", 2.5)
+        table.write("a", 3.0)
+
+        assert dict(read_segment(tmp_path / "counters_1.db")) == {"a": 3.0, "b": 2.5}
+        table.close()
+
+    def test_grows_beyond_initial_size(self, tmp_path):
+        table = MmapValueFile(tmp_path / "counters_1.db")
+        for i in range(5_000):
+            table.write(f"metric_with_a_long_name_{i}", float(i))
+
+        entries = dict(read_segment(tmp_path / "counters_1.db"))
+
+        assert len(entries) == 5_000
+        assert entries["metric_with_a_long_name_4999"] == 4999.0
+        table.close()
+
+    def test_reopen_reuses_slots(self, tmp_path):
+        path = tmp_path / "counters_1.db"
+        first = MmapValueFile(path)
+        first.write("a", 1.0)
+        first.close()
+
+        second = MmapValueFile(path)
+        second.write("a", 5.0)
+
+        assert read_segment(path) == [("a", 5.0)]
+        second.close()
+
+
+def _worker(directory, pid, hits):
+    values = SharedMetricValues(directory, pid=pid)
+    for i in range(1, hits + 1):
+        values.write_counter("cache_hits", (), float(i))
+    values.write_gauge("cache_size", (("shard", "0"),), float(pid))
+    values.close()
+
+
+def _pool_task(name):
+    counter = MetricsRegistry().get(name)
+    counter.inc()
+    return counter.get()
+
+
+def _gunicorn_worker(directory, name):
+    # What gunicorn.conf.py post_fork does under preload_app
+    registry = MetricsRegistry()
+    registry.enable_multiprocess(directory, flush_interval=3600)
+    registry.get(name).inc()
+
+
+class TestAggregation:
+    """Tests for cross-process aggregation."""
+
+    def test_collect_from_several_processes(self, tmp_path):
+        ctx = multiprocessing.get_context("fork")
+        procs = [ctx.Process(target=_worker, args=(tmp_path, pid, pid * 10)) for pid in (1, 2, 3)]
+        for proc in procs:
+            proc.start()
+        for proc in procs:
+            proc.join()
+
+        raw = collect(tmp_path)
+
+        assert sorted(raw["counters"]["cache_hits"][()]) == [10.0, 20.0, 30.0]
+        assert sorted(raw["gauges"]["cache_size"][(("shard", "0"),)]) == [1.0, 2.0, 3.0]
+
+    def test_dead_worker_keeps_counters_drops_gauges(self, tmp_path):
+        _worker(tmp_path, 7, 3)
+
+        mark_process_dead(7, tmp_path)
+        raw = collect(tmp_path)
+
+        assert raw["counters"]["cache_hits"][()] == [3.0]
+        assert raw["gauges"] == {}
+        assert [path.name for path in tmp_path.iterdir()] == ["counters_archive.db"]
+
+        _worker(tmp_path, 8, 2)
+        mark_process_dead(8, tmp_path)
+
+        assert collect(tmp_path)["counters"]["cache_hits"][()] == [5.0]
+
+    @pytest.mark.parametrize(
+        "mode,expected", [("sum", 6.0), ("max", 3.0), ("min", 1.0), ("mean", 2.0)]
+    )
+    def test_gauge_modes(self, mode, expected):
+        assert _combine_gauge([1.0, 2.0, 3.0], mode) == expected
+
+    def test_registry_mirrors_and_aggregates(self, tmp_path, monkeypatch):
+        registry = MetricsRegistry()
+        monkeypatch.setattr(registry, "_segment_store", None)
+        monkeypatch.setattr(registry, "_shared_values", None)
+        monkeypatch.setattr(registry, "_metrics", {})
+
+        counter = Counter("mp_requests")
+        gauge = Gauge("mp_latency", multiprocess_mode="max")
+        counter.inc(4)
+        registry.register(counter)
+        registry.register(gauge)
+        registry.enable_multiprocess(tmp_path, flush_interval=3600)
+        try:
+            counter.inc()
+            gauge.set(0.2)
+            # Another worker's segment
+            _worker(tmp_path, 99_999, 2)
+            other = SharedMetricValues(tmp_path, pid=99_998)
+            other.write_counter("mp_requests", (), 10.0)
+            other.write_gauge("mp_latency", (), 0.7)
+
+            shared = registry.collect_multiprocess()
+        finally:
+            counter._shared = gauge._shared = None
+
+        assert shared["mp_requests"][()] == 15.0
+        assert shared["mp_latency"][()] == 0.7
+        assert shared["cache_hits"][()] == 2.0
+
+
+    def test_forked_children_do_not_multiply_totals(self, tmp_path, monkeypatch):
+        registry = MetricsRegistry()
+        monkeypatch.setattr(registry, "_segment_store", None)
+        monkeypatch.setattr(registry, "_shared_values", None)
+        monkeypatch.setattr(registry, "_metrics", {})
+
+        counter = Counter("mp_forked_requests")
+        registry.register(counter)
+        registry.enable_multiprocess(tmp_path, flush_interval=3600)
+        ctx = multiprocessing.get_context("fork")
+        try:
+            counter.inc(100)
+            with ProcessPoolExecutor(2, mp_context=ctx) as pool:
+                # Pool children count locally (inherited 100 plus the tasks
+                # that child ran, 1 to 4), unshared
+                values = list(pool.map(_pool_task, [counter.name] * 4))
+            assert set(values) <= {101.0, 102.0, 103.0, 104.0}
+            assert registry.collect_multiprocess()[counter.name][()] == 100.0
+            worker = ctx.Process(target=_gunicorn_worker, args=(tmp_path, counter.name))
+            worker.start()
+            worker.join()
+
+            assert registry.collect_multiprocess()[counter.name][()] == 101.0
+            mark_process_dead(worker.pid, tmp_path)
+            assert registry.collect_multiprocess()[counter.name][()] == 101.0
+        finally:
+            counter._shared = None
+
+        assert {path.name for path in tmp_path.glob("counters_*.db")} == {
+            "counters_archive.db",
+            f"counters_{os.getpid()}.db",
+        }
+
+
+class TestCorrelationTracking:
+    """Tests for bounded, sampled correlation tracking."""
+
+    def test_unsampled_ids_are_not_stored(self):
+        collector = RuntimeMetricsCollector(correlation_sample_rate=0.0)
+
+        ids = {collector.create_correlation_id("cache_get") for _ in range(1_000)}
+
+        assert len(ids) == 1_000
+        assert collector.tracked_correlations == 0
+        assert collector.close_correlation_id(next(iter(ids))) == 0.0
+
+    def test_sampled_ids_are_timed(self):
+        collector = RuntimeMetricsCollector(correlation_sample_rate=1.0)
+
+        correlation_id = collector.create_correlation_id({"component": "cache", "operation": "set"})
+
+        assert correlation_id.startswith("set_")
+        assert collector.close_correlation_id(correlation_id) >= 0.0
+        assert collector.tracked_correlations == 0
+        assert collector.correlation_duration.get_count({"operation": "set"}) >= 1
+
+    def test_leaked_ids_are_bounded(self):
+        collector = RuntimeMetricsCollector(
+            correlation_sample_rate=1.0, max_tracked_correlations=10
+        )
+        evicted_before = collector.correlations_evicted.get()
+
+        for _ in range(100):
+            collector.create_correlation_id("leaky")
+
+        assert collector.tracked_correlations == 10
+        assert collector.correlations_evicted.get() - evicted_before == 90
@@ -0,0 +1,188 @@
+"""
+Tests for the pure ASGI request-inspection middleware.
+
+Covers:
+1. Body parsed once and shared through the scope (and still readable)
+2. Combined SQL injection regex on query, headers and nested bodies
+3. Report-only mode and oversized bodies
+"""
+
+import pytest
+from fastapi import FastAPI, Request
+from fastapi.testclient import TestClient
+
+from resync.api.middleware.database_security_middleware import (
+    DatabaseSecurityMiddleware,
+    SQL_INJECTION_REGEX,
+    contains_sql_injection,
+)
+from resync.api.middleware.request_inspection import (
+    FormBody,
+    RequestInspectionMiddleware,
+    get_parsed_body,
+)
+
+
+def _make_app(**kwargs) -> tuple[FastAPI, dict]:
+    seen: dict = {}
+    app = FastAPI()
+
+    @app.post("/echo")
+    async def echo(request: Request):
+        seen["parsed"] = get_parsed_body(request)
+        seen["body"] = await request.body()
+        return {"ok": True}
+
+    @app.get("/search")
+    async def search(q: str = ""):
+        return {"q": q}
+
+    app.add_middleware(RequestInspectionMiddleware, **kwargs)
+    return app, seen
+
+
+class TestCombinedRegex:
+    """The combined regex keeps the per-pattern semantics."""
+
+    @pytest.mark.parametrize(
+        "value",
+        [
+            "' OR '1'='1",
+            "1 UNION SELECT password FROM users",
+            "x; DROP TABLE jobs",
+            "EXEC xp_cmdshell('dir')",
+            "WAITFOR DELAY '0:0:5'",
+        ],
+    )
+    def test_detects_attacks(self, value):
+        assert contains_sql_injection(value)
+
+    @pytest.mark.parametrize("value", ["normal_user_query", "valid-id-123", "job AWSBH001"])
+    def test_allows_safe_values(self, value):
+        assert not contains_sql_injection(value)
+
+    def test_matches_every_individual_pattern(self):
+        samples = ["a union b select", "/* c */", "sleep (1)", "cast x as y", "sp_who"]
+
+        for sample in samples:
+            per_pattern = any(p.search(sample) for p in DatabaseSecurityMiddleware.SQL_INJECTION_PATTERNS)
+            assert per_pattern == bool(SQL_INJECTION_REGEX.search(sample)), sample
+
+    def test_nested_values(self):
+        assert contains_sql_injection({"filters": [{"name": "x' OR 1=1 --"}]})
+        assert not contains_sql_injection({"filters": [{"name": "PAYROLL"}], "limit": 5})
+
+
+class TestRequestInspectionMiddleware:
+    """End-to-end tests through a FastAPI app."""
+
+    def test_json_body_parsed_once_and_replayed(self):
+        app, seen = _make_app()
+
+        response = TestClient(app).post("/echo", json={"job": "PAYROLL_01", "limit": 10})
+
+        assert response.status_code == 200
+        assert seen["parsed"] == {"job": "PAYROLL_01", "limit": 10}
+        assert seen["body"] == b'{"job":"PAYROLL_01","limit":10}'
+
+    def test_form_body_shared(self):
+        app, seen = _make_app()
+
+        TestClient(app).post("/echo", data={"name": "AWSBH001"})
+
+        assert isinstance(seen["parsed"], FormBody)
+        assert seen["parsed"] == {"name": "AWSBH001"}
+
+    def test_blocks_injection_in_nested_json(self):
+        app, seen = _make_app()
+
+        response = TestClient(app).post("/echo", json={"filter": {"name": "x'; DROP TABLE jobs --"}})
+
+        assert response.status_code == 400
+        assert "SQL injection" in response.json()["detail"]
+        assert "parsed" not in seen
+
+    def test_blocks_injection_in_query(self):
+        app, _ = _make_app()
+
+        response = TestClient(app).get("/search", params={"q": "1 UNION SELECT * FROM users"})
+
+        assert response.status_code == 400
+
+    def test_report_only_mode_passes_through(self):
+        app, seen = _make_app(block_on_detection=False)
+
+        response = TestClient(app).post("/echo", json={"note": "what's wrong?"})
+
+        assert response.status_code == 200
+        assert seen["parsed"] == {"note": "what's wrong?"}
+
+    def test_browser_user_agent_is_not_flagged(self):
+        user_agent = (
+            "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 "
+            "(KHTML, like Gecko) Chrome/120.0 Safari/537.36"
+        )
+        app = FastAPI()
+
+        @app.get("/search")
+        async def search(q: str = ""):
+            return {"q": q}
+
+        for kwargs in ({}, {"inspect_headers": (b"user-agent",)}):
+            middleware = RequestInspectionMiddleware(app, **kwargs)
+
+            response = TestClient(middleware).get(
+                "/search", params={"q": "PAYROLL"}, headers={"user-agent": user_agent}
+            )
+
+            assert response.status_code == 200
+            assert middleware.flagged_requests == 0
+
+    def test_oversized_body_is_not_buffered(self):
+        app, seen = _make_app(max_body_bytes=16)
+
+        response = TestClient(app).post("/echo", json={"payload": "x" * 100})
+
+        assert response.status_code == 200
+        assert seen["parsed"] is None
+        assert len(seen["body"]) > 100
+
+
+class TestDatabaseSecurityMiddlewareReuse:
+    """DatabaseSecurityMiddleware reads the shared parsed body."""
+
+    @pytest.mark.asyncio
+    async def test_uses_parsed_body_from_scope(self):
+        class FakeRequest:
+            def __init__(self):
+                self.scope = {"resync.parsed_body": {"job": "X"}}
+                self.query_params = {}
+                self.path_params = {}
+                self.headers = {}
+                self.method = "POST"
+
+            async def json(self):
+                raise AssertionError("body must not be parsed again")
+
+        data = await DatabaseSecurityMiddleware(None)._extract_request_data(FakeRequest())
+
+        assert data["body.job"] == "X"
+
+
+class TestSingleLayer:
+    """The inspection layer is opt-in and replaces DatabaseSecurityMiddleware."""
+
+    def test_disabled_by_default(self):
+        from resync.settings import Settings
+
+        assert Settings.model_fields["request_inspection_enabled"].default is False
+
+    def test_security_factory_returns_inspection_layer(self):
+        from resync.api.middleware.database_security_middleware import (
+            create_database_security_middleware,
+        )
+
+        middleware = create_database_security_middleware(FastAPI())
+
+        assert isinstance(middleware, RequestInspectionMiddleware)
+        assert middleware.block_on_detection and not middleware.inspect_headers
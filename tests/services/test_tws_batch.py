@@ -0,0 +1,123 @@
+"""
+Tests for the batch job-detail API of OptimizedTWSClient.
+
+Tests cover:
+- Multi-get + concurrent fetch of misses only, results in order
+- Bounded concurrency of batch fetches
+- Per-item errors and freshness metadata
+"""
+
+import asyncio
+
+import httpx
+import pytest
+
+from resync.services.tws_cache import CacheCategory, get_tws_cache
+from resync.services.tws_service import OptimizedTWSClient
+from resync.services.tws_transport import TWSTransport, TWSTransportConfig
+
+BASE_URL = "http://tws.test"
+
+
+class JobServer:
+    """MockTransport handler serving plan jobs."""
+
+    def __init__(self, delay: float = 0.01):
+        self.delay = delay
+        self.paths: list[str] = []
+        self.active = 0
+        self.max_active = 0
+
+    async def __call__(self, request: httpx.Request) -> httpx.Response:
+        path = request.url.path
+        self.paths.append(path)
+        self.active += 1
+        self.max_active = max(self.max_active, self.active)
+        try:
+            await asyncio.sleep(self.delay)
+        finally:
+            self.active -= 1
+        job_id = path.split("/")[6]
+        if job_id == "BROKEN":
+            return httpx.Response(500, json={"error": "boom"})
+        if path.endswith("/predecessors") or path.endswith("/successors"):
+            return httpx.Response(200, json=[{"id": f"{job_id}-dep"}])
+        return httpx.Response(200, json={"id": job_id, "status": "ABEND"})
+
+
+@pytest.fixture
+def server():
+    return JobServer()
+
+
+@pytest.fixture
+def client(server):
+    get_tws_cache().clear()
+    http = httpx.AsyncClient(base_url=BASE_URL, transport=httpx.MockTransport(server))
+    transport = TWSTransport(
+        BASE_URL, config=TWSTransportConfig(endpoint_concurrency=100), client=http
+    )
+    yield OptimizedTWSClient(BASE_URL, "user", "pass", "ENGINE", "owner", transport=transport)
+    get_tws_cache().clear()
+
+
+class TestBatchJobDetails:
+    """Tests for get_job_*_batch."""
+
+    async def test_results_are_in_order_with_meta(self, client):
+        job_ids = [f"J{i}" for i in range(5)]
+
+        batch = await client.get_job_status_batch(job_ids)
+
+        assert [item["job_id"] for item in batch] == job_ids
+        assert [item["data"]["id"] for item in batch] == job_ids
+        assert all(item["meta"]["cached"] is False for item in batch)
+        assert all(item["meta"]["fetched_at"] for item in batch)
+
+    async def test_only_misses_are_fetched(self, client, server):
+        await client.get_job_status_cached("J1")
+        server.paths.clear()
+
+        batch = await client.get_job_status_batch(["J1", "J2", "J2"])
+
+        assert server.paths == ["/twsd/api/v2/plan/job/J2"]
+        assert batch[0]["meta"]["cached"] is True
+        assert batch[1]["data"] == batch[2]["data"]
+
+    async def test_fetches_are_bounded(self, client, server):
+        await client.get_job_status_batch([f"J{i}" for i in range(20)], max_concurrency=4)
+
+        assert len(server.paths) == 20
+        assert server.max_active <= 4
+
+    async def test_failed_job_does_not_fail_batch(self, client):
+        batch = await client.get_job_status_batch(["J1", "BROKEN", "J3"])
+
+        assert batch[1]["data"] is None
+        assert "500" in batch[1]["error"]
+        assert batch[0]["data"]["id"] == "J1"
+        assert batch[2]["data"]["id"] == "J3"
+        assert await get_tws_cache().get("job_status:BROKEN", CacheCategory.JOB_STATUS) is None
+
+    async def test_dependencies_fetched_concurrently(self, client, server):
+        server.delay = 0.05
+        loop = asyncio.get_running_loop()
+
+        start = loop.time()
+        batch = await client.get_job_dependencies_batch(["J1", "J2"])
+        elapsed = loop.time() - start
+
+        assert len(server.paths) == 4
+        # predecessors/successors of both jobs in one round of latency
+        assert elapsed < 0.15
+        assert batch[0]["data"]["predecessors"] == [{"id": "J1-dep"}]
+
+    async def test_details_combine_parts(self, client):
+        details = await client.get_job_details_batch(
+            ["J1", "J2"], include_logs=True, include_dependencies=True
+        )
+
+        assert [detail["job_id"] for detail in details] == ["J1", "J2"]
+        assert set(details[0]) == {"job_id", "status", "logs", "dependencies"}
+        assert details[1]["status"]["data"]["id"] == "J2"
+        assert "meta" in details[0]["logs"]
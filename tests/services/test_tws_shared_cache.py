@@ -0,0 +1,248 @@
+"""
+Tests for the shared (Redis) tier of TWSAPICache.
+
+Tests cover:
+- Compact binary encoding of shared entries
+- L1 misses served from the shared tier with the original age
+- One fetch per key for all workers (lease)
+- Pub/sub invalidation of every worker's L1
+- Fetches racing an invalidation are not cached
+- TWSBackgroundPoller invalidating jobs whose status changed
+"""
+
+import asyncio
+from datetime import datetime
+
+import pytest
+
+from resync.core.tws_background_poller import JobStatus, SystemSnapshot, TWSBackgroundPoller
+from resync.services.tws_cache import (
+    SHARED_KEY_PREFIX,
+    SHARED_LEASE_PREFIX,
+    CacheCategory,
+    TWSAPICache,
+    decode_shared_value,
+    encode_shared_value,
+)
+
+fakeredis = pytest.importorskip("fakeredis")
+
+
+def make_worker() -> TWSAPICache:
+    """A cache instance of its own, as in a separate worker process."""
+    cache = object.__new__(TWSAPICache)
+    cache.__init__()
+    return cache
+
+
+@pytest.fixture
+async def workers():
+    server = fakeredis.FakeServer()
+    caches = [make_worker(), make_worker()]
+    for cache in caches:
+        await cache.enable_shared_tier(fakeredis.FakeAsyncRedis(server=server))
+    yield caches
+    for cache in caches:
+        await cache.disable_shared_tier()
+
+
+def test_shared_value_round_trip():
+    value = {"id": "J1", "status": "SUCC", "nested": [1, 2.5, None]}
+
+    raw = encode_shared_value(value, 1700000000.5, ["job:J1"])
+
+    assert decode_shared_value(raw) == (value, 1700000000.5, ["job:J1"])
+    assert len(raw) < len(repr(value)) + 24
+
+
+async def test_shared_tier_client_is_binary(monkeypatch):
+    """The client app startup passes to enable_shared_tier (own pool, bytes)."""
+    from resync.core.cache import redis_config
+
+    monkeypatch.setattr(redis_config, "_connection_pools", {})
+    text = await redis_config.get_redis_client(redis_config.RedisDatabase.CACHE)
+    binary = await redis_config.get_redis_client(
+        redis_config.RedisDatabase.CACHE, decode_responses=False
+    )
+
+    assert binary.connection_pool is not text.connection_pool
+    assert binary.connection_pool.connection_kwargs["decode_responses"] is False
+
+
+class TestSharedTier:
+    """L2 reads, writes and fleet-wide fetch deduplication."""
+
+    async def test_other_worker_reads_shared_entry(self, workers):
+        first, second = workers
+        await first.set("job_status:J1", {"status": "EXEC"}, CacheCategory.JOB_STATUS)
+
+        value, is_cached, age = await second.get("job_status:J1", CacheCategory.JOB_STATUS)
+
+        assert value["status"] == "EXEC"
+        assert is_cached is True
+        assert age < 1
+        assert second.get_stats()["shared_tier"]["hits"] == 1
+        # Promoted into the second worker's L1
+        assert "job_status:J1" in second._cache
+
+    async def test_get_many_reads_misses_in_one_mget(self, workers):
+        first, second = workers
+        await first.set("a", {"v": 1})
+        await first.set("b", {"v": 2})
+        await second.set("c", {"v": 3})
+
+        results = await second.get_many(["a", "missing", "b", "c"])
+
+        assert [r[0]["v"] if r else None for r in results] == [1, None, 2, 3]
+
+    async def test_one_fetch_per_key_for_all_workers(self, workers):
+        calls = 0
+
+        async def fetch():
+            nonlocal calls
+            calls += 1
+            await asyncio.sleep(0.1)
+            return {"status": "SUCC"}
+
+        results = await asyncio.gather(
+            *(
+                cache.get_or_fetch("job_status:J2", fetch, CacheCategory.JOB_STATUS)
+                for cache in workers
+                for _ in range(5)
+            )
+        )
+
+        assert calls == 1
+        assert all(value["status"] == "SUCC" for value, _, _ in results)
+        assert workers[1].get_stats()["shared_tier"]["remote_waits"] == 1
+
+    async def test_failed_leader_lets_followers_fetch(self, workers):
+        first, second = workers
+
+        async def failing():
+            await asyncio.sleep(0.05)
+            raise ConnectionError("tws down")
+
+        async def working():
+            return {"status": "SUCC"}
+
+        leader = asyncio.create_task(first.get_or_fetch("k", failing))
+        await asyncio.sleep(0.01)
+        value, _, _ = await second.get_or_fetch("k", working)
+
+        assert value == {"status": "SUCC"}
+        with pytest.raises(ConnectionError):
+            await leader
+
+
+    async def test_expired_lease_of_another_fetch_is_kept(self, workers):
+        pytest.importorskip("lupa")
+        first, second = workers
+        lease_key = SHARED_LEASE_PREFIX + "k"
+
+        async def slow():
+            # Our lease expires and another worker takes the key meanwhile
+            await first._redis.set(lease_key, "other-worker", px=5000)
+            return {"status": "SUCC"}
+
+        await first.get_or_fetch("k", slow)
+
+        assert await second._redis.get(lease_key) == b"other-worker"
+
+    async def test_released_lease_lets_next_fetch_lead(self, workers):
+        pytest.importorskip("lupa")
+        first, _ = workers
+
+        async def fetch():
+            return {"status": "SUCC"}
+
+        await first.get_or_fetch("k", fetch)
+
+        assert not await first._redis.exists(SHARED_LEASE_PREFIX + "k")
+
+
+class TestInvalidation:
+    """Pub/sub eviction of every worker's L1."""
+
+    async def test_invalidate_evicts_all_workers(self, workers):
+        first, second = workers
+        await first.set("job_status:J1", {"status": "EXEC"})
+        await second.get("job_status:J1")
+        await asyncio.sleep(0.05)  # let the listeners subscribe
+
+        await first.invalidate_jobs(["J1"])
+        await asyncio.sleep(0.1)
+
+        assert "job_status:J1" not in first._cache
+        assert "job_status:J1" not in second._cache
+        assert await second.get("job_status:J1") is None
+
+    async def test_poller_invalidates_changed_jobs(self, workers):
+        first, second = workers
+        for job_id in ("J1", "J2"):
+            await second.set(f"job_status:{job_id}", {"status": "EXEC"})
+        await asyncio.sleep(0.05)
+
+        poller = TWSBackgroundPoller(tws_client=None, api_cache=first)
+        poller._previous_jobs = {
+            "J1": JobStatus("J1", "JOB1", "S", "WS", "EXEC"),
+            "J2": JobStatus("J2", "JOB2", "S", "WS", "EXEC"),
+        }
+        snapshot = SystemSnapshot(
+            timestamp=datetime.now(),
+            workstations=[],
+            jobs=[
+                JobStatus("J1", "JOB1", "S", "WS", "SUCC"),
+                JobStatus("J2", "JOB2", "S", "WS", "EXEC"),
+            ],
+        )
+
+        await poller._invalidate_changed_jobs(snapshot)
+        await asyncio.sleep(0.1)
+
+        assert "job_status:J1" not in second._cache
+        assert "job_status:J2" in second._cache
+
+    async def test_tag_invalidation_reaches_other_workers(self, workers):
+        first, second = workers
+        # Only the second worker knows this entry and its tags
+        await second.set("ws:WS01", {"status": "LINKED"}, tags=["workstation:WS01"])
+        await asyncio.sleep(0.05)
+
+        await first.invalidate_tags(["workstation:WS01"])
+        await asyncio.sleep(0.1)
+
+        assert "ws:WS01" not in second._cache
+        assert await first.get("ws:WS01") is None
+
+    @pytest.mark.parametrize("shared", [False, True])
+    async def test_fetch_racing_an_invalidation_is_not_cached(self, workers, shared):
+        cache = workers[0] if shared else make_worker()
+        started, release = asyncio.Event(), asyncio.Event()
+        calls = 0
+
+        async def fetch():
+            nonlocal calls
+            calls += 1
+            if calls == 1:
+                started.set()
+                await release.wait()
+                return {"status": "EXEC"}  # read before the invalidation
+            return {"status": "SUCC"}
+
+        stale = asyncio.create_task(cache.get_or_fetch("job_status:J9", fetch))
+        await started.wait()
+        await cache.invalidate(["job_status:J9"])
+        # Must not join the stale fetch (bounded so a regression fails, not hangs)
+        fresh, _, _ = await asyncio.wait_for(cache.get_or_fetch("job_status:J9", fetch), 1.0)
+        release.set()
+        old, _, _ = await stale
+
+        assert old["status"] == "EXEC" and fresh["status"] == "SUCC"
+        assert calls == 2
+        value, is_cached, _ = await cache.get("job_status:J9")
+        assert value["status"] == "SUCC" and is_cached
+        if shared:
+            raw = await cache._redis.get(SHARED_KEY_PREFIX + "job_status:J9")
+            assert decode_shared_value(raw)[0]["status"] == "SUCC"
+        assert not cache._stale_fetches
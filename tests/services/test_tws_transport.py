@@ -0,0 +1,204 @@
+"""
+Tests for the TWS HTTP transport.
+
+Tests cover:
+- Endpoint templating (bounded label cardinality)
+- Coalescing of identical in-flight reads
+- Per-endpoint concurrency limits
+- Latency SLO accounting
+- Coalesced misses in TWSAPICache.get_or_fetch
+"""
+
+import asyncio
+
+import httpx
+import pytest
+
+from resync.services.tws_cache import CacheCategory, TWSAPICache
+from resync.services.tws_service import OptimizedTWSClient
+from resync.services.tws_transport import TWSTransport, TWSTransportConfig, endpoint_template
+
+BASE_URL = "http://tws.test"
+
+
+class SlowServer:
+    """MockTransport handler that holds requests until released."""
+
+    def __init__(self, delay: float = 0.0):
+        self.delay = delay
+        self.calls: list[str] = []
+        self.active = 0
+        self.max_active = 0
+
+    async def __call__(self, request: httpx.Request) -> httpx.Response:
+        self.calls.append(str(request.url))
+        self.active += 1
+        self.max_active = max(self.max_active, self.active)
+        try:
+            await asyncio.sleep(self.delay)
+        finally:
+            self.active -= 1
+        if request.url.path.endswith("/missing"):
+            return httpx.Response(404, json={"error": "not found"})
+        return httpx.Response(200, json={"path": request.url.path})
+
+
+def make_transport(server: SlowServer, **config) -> TWSTransport:
+    client = httpx.AsyncClient(base_url=BASE_URL, transport=httpx.MockTransport(server))
+    return TWSTransport(BASE_URL, config=TWSTransportConfig(**config), client=client)
+
+
+@pytest.mark.parametrize(
+    "path,expected",
+    [
+        ("/twsd/api/v2/plan/job/JOB_01", "plan/job/{id}"),
+        ("/twsd/api/v2/plan/job/JOB_01/successors", "plan/job/{id}/successors"),
+        ("/twsd/api/v2/plan/job/count", "plan/job/count"),
+        ("/twsd/api/v2/engine/info", "engine/info"),
+        ("/", "root"),
+    ],
+)
+def test_endpoint_template(path, expected):
+    assert endpoint_template(path) == expected
+
+
+class TestCoalescing:
+    """Identical in-flight reads share one request."""
+
+    async def test_identical_gets_share_one_request(self):
+        server = SlowServer(delay=0.05)
+        transport = make_transport(server)
+
+        results = await asyncio.gather(
+            *(transport.get_json("/twsd/api/v2/plan/job/J1", {"a": 1}) for _ in range(50))
+        )
+
+        assert len(server.calls) == 1
+        assert all(result == {"path": "/twsd/api/v2/plan/job/J1"} for result in results)
+        # Each caller parses its own copy
+        assert results[0] is not results[1]
+        assert transport.get_slo_report()["plan/job/{id}"]["coalesced"] == 49
+
+    async def test_different_params_are_not_coalesced(self):
+        server = SlowServer(delay=0.01)
+        transport = make_transport(server)
+
+        await asyncio.gather(
+            transport.get_json("/twsd/api/v2/plan/job", {"status": "ABEND"}),
+            transport.get_json("/twsd/api/v2/plan/job", {"status": "SUCC"}),
+        )
+
+        assert len(server.calls) == 2
+
+    async def test_sequential_gets_are_not_coalesced(self):
+        server = SlowServer()
+        transport = make_transport(server)
+
+        await transport.get_json("/twsd/api/v2/engine/info")
+        await transport.get_json("/twsd/api/v2/engine/info")
+
+        assert len(server.calls) == 2
+
+    async def test_errors_reach_every_caller(self):
+        server = SlowServer(delay=0.01)
+        transport = make_transport(server)
+
+        results = await asyncio.gather(
+            *(transport.get_json("/twsd/api/v2/plan/job/missing") for _ in range(3)),
+            return_exceptions=True,
+        )
+
+        assert len(server.calls) == 1
+        assert all(isinstance(r, httpx.HTTPStatusError) for r in results)
+
+    async def test_cancelled_caller_does_not_cancel_shared_request(self):
+        server = SlowServer(delay=0.05)
+        transport = make_transport(server)
+
+        first = asyncio.create_task(transport.get_json("/twsd/api/v2/engine/info"))
+        second = asyncio.create_task(transport.get_json("/twsd/api/v2/engine/info"))
+        await asyncio.sleep(0.01)
+        first.cancel()
+
+        assert await second == {"path": "/twsd/api/v2/engine/info"}
+        assert len(server.calls) == 1
+
+
+class TestLimitsAndSlo:
+    """Per-endpoint semaphores and SLO accounting."""
+
+    async def test_endpoint_concurrency_is_bounded(self):
+        server = SlowServer(delay=0.02)
+        transport = make_transport(server, endpoint_concurrency=3)
+
+        await asyncio.gather(
+            *(transport.get_json(f"/twsd/api/v2/plan/job/J{i}") for i in range(12))
+        )
+
+        assert len(server.calls) == 12
+        assert server.max_active == 3
+
+    async def test_slo_violations_are_counted(self):
+        server = SlowServer(delay=0.03)
+        transport = make_transport(
+            server,
+            latency_slo_seconds=10.0,
+            latency_slo_overrides={"plan/job/joblog": 0.001},
+        )
+
+        await transport.get_json("/twsd/api/v2/plan/job/joblog")
+        await transport.get_json("/twsd/api/v2/engine/info")
+        report = transport.get_slo_report()
+
+        assert report["plan/job/joblog"]["slo_violations"] == 1
+        assert report["plan/job/joblog"]["slo_attainment"] == 0.0
+        assert report["engine/info"]["slo_attainment"] == 1.0
+        assert report["engine/info"]["p50"] is not None
+
+    async def test_client_uses_transport(self):
+        server = SlowServer(delay=0.01)
+        transport = make_transport(server)
+        client = OptimizedTWSClient(
+            BASE_URL, "user", "pass", "ENGINE", "owner", transport=transport
+        )
+
+        await asyncio.gather(*(client.get_current_plan_job("J1") for _ in range(10)))
+
+        assert len(server.calls) == 1
+        assert client.get_transport_stats()["endpoints"]["plan/job/{id}"]["requests"] == 1
+
+
+class TestCacheCoalescing:
+    """TWSAPICache shares in-flight fetches between concurrent misses."""
+
+    async def test_concurrent_misses_fetch_once(self):
+        cache = TWSAPICache()
+        cache.clear()
+        calls = 0
+
+        async def fetch():
+            nonlocal calls
+            calls += 1
+            await asyncio.sleep(0.02)
+            return {"status": "SUCC"}
+
+        results = await asyncio.gather(
+            *(cache.get_or_fetch("coalesce:J1", fetch, CacheCategory.JOB_STATUS) for _ in range(20))
+        )
+
+        assert calls == 1
+        assert all(value["status"] == "SUCC" for value, _, _ in results)
+        assert (await cache.get("coalesce:J1", CacheCategory.JOB_STATUS))[1] is True
+
+    async def test_failed_fetch_is_not_cached(self):
+        cache = TWSAPICache()
+        cache.clear()
+
+        async def fetch():
+            raise ConnectionError("tws down")
+
+        with pytest.raises(ConnectionError):
+            await cache.get_or_fetch("coalesce:J2", fetch)
+
+        assert await cache.get("coalesce:J2") is None
+        assert cache._in_flight == {}
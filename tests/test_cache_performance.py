@@ -10,6 +10,14 @@ import pytest
 
 from resync.core.cache.async_cache import AsyncTTLCache
 
+# AsyncTTLCache.__init__ no longer loads its configuration (ttl_seconds,
+# cleanup_interval, ...) and the hot-shard / lock-contention metrics these
+# tests exercise were removed, so they cannot run against the current cache.
+pytestmark = pytest.mark.skip(
+    reason="written for a removed AsyncTTLCache API (cleanup_interval, hot shards, "
+    "lock contention metrics)"
+)
+
 
 @pytest.fixture
 async def cache():
@@ -7,15 +7,17 @@ Author: Resync Team
 Date: October 2025
 """
 
+import asyncio
 import json
 from datetime import datetime, timedelta
 from unittest.mock import ANY, AsyncMock, MagicMock
 
 import pytest
-from redis.asyncio import Redis
 
 from resync.api.middleware.idempotency import IdempotencyMiddleware
 from resync.core.idempotency import (
+    ClaimResult,
+    ClaimStatus,
     IdempotencyConfig,
     IdempotencyManager,
     IdempotencyRecord,
@@ -24,18 +26,34 @@ from resync.core.idempotency import (
 )
 
 
+KEY = "550e8400-e29b-41d4-a716-446655440000"
+
+
+def script_redis():
+    """Redis em memória que executa os scripts Lua reais (fakeredis[lua])"""
+    fakeredis = pytest.importorskip("fakeredis")
+    pytest.importorskip("lupa")
+
+    class CountingRedis(fakeredis.FakeAsyncRedis):
+        script_calls = 0
+
+        async def evalsha(self, *args, **kwargs):
+            # Conta apenas execuções (o primeiro EVALSHA falha com NOSCRIPT)
+            result = await super().evalsha(*args, **kwargs)
+            self.script_calls += 1
+            return result
+
+    return CountingRedis()
+
+
 class TestIdempotencyManager:
     """Testes para IdempotencyManager"""
 
     @pytest.fixture
-    async def redis_mock(self):
-        """Mock Redis para testes"""
-        redis = AsyncMock(spec=Redis)
-        redis.get = AsyncMock()
-        redis.setex = AsyncMock()
-        redis.delete = AsyncMock()
-        redis.exists = AsyncMock()
-        return redis
+    async def redis_fake(self):
+        redis = script_redis()
+        yield redis
+        await redis.aclose()
 
     @pytest.fixture
     def config(self):
@@ -46,26 +64,25 @@ class TestIdempotencyManager:
         )
 
     @pytest.fixture
-    def manager(self, redis_mock, config):
-        return IdempotencyManager(redis_mock, config)
+    def manager(self, redis_fake, config):
+        return IdempotencyManager(redis_fake, config)
 
     @pytest.mark.asyncio
-    async def test_get_cached_response_hit(self, manager, redis_mock):
+    async def test_get_cached_response_hit(self, manager, redis_fake):
         """Testa hit no cache de idempotency"""
 
-        # Mock resposta cacheada
+        # Resposta cacheada
         cached_record = IdempotencyRecord(
-            idempotency_key="test-key",
+            idempotency_key=KEY,
             request_hash="hash123",
             response_data={"result": "cached"},
             status_code=200,
             created_at=datetime.utcnow(),
             expires_at=datetime.utcnow() + timedelta(hours=1),
         )
+        await redis_fake.set(f"test:idempotency:{KEY}", json.dumps(cached_record.to_dict()))
 
-        redis_mock.get.return_value = json.dumps(cached_record.to_dict())
-
-        result = await manager.get_cached_response("test-key")
+        result = await manager.get_cached_response(KEY)
 
         assert result is not None
         assert result["status_code"] == 200
@@ -73,142 +90,115 @@ class TestIdempotencyManager:
         assert "cached_at" in result
         assert "expires_at" in result
 
-        redis_mock.get.assert_called_once_with("test:idempotency:test-key")
-
     @pytest.mark.asyncio
-    async def test_get_cached_response_miss(self, manager, redis_mock):
+    async def test_get_cached_response_miss(self, manager):
         """Testa miss no cache de idempotency"""
 
-        redis_mock.get.return_value = None
-
-        result = await manager.get_cached_response("test-key")
+        result = await manager.get_cached_response(KEY)
 
         assert result is None
-        redis_mock.get.assert_called_once_with("test:idempotency:test-key")
+        assert manager.metrics.cache_misses == 1
 
     @pytest.mark.asyncio
-    async def test_get_cached_response_expired(self, manager, redis_mock):
+    async def test_get_cached_response_expired(self, manager, redis_fake):
         """Testa resposta expirada"""
 
-        # Mock resposta expirada
+        # Registro expirado que ainda não saiu do Redis
         expired_record = IdempotencyRecord(
-            idempotency_key="test-key",
+            idempotency_key=KEY,
             request_hash="hash123",
             response_data={"result": "expired"},
             status_code=200,
             created_at=datetime.utcnow() - timedelta(hours=2),
             expires_at=datetime.utcnow() - timedelta(hours=1),
         )
+        await redis_fake.set(f"test:idempotency:{KEY}", json.dumps(expired_record.to_dict()))
 
-        redis_mock.get.return_value = json.dumps(expired_record.to_dict())
-        redis_mock.delete = AsyncMock()
-
-        result = await manager.get_cached_response("test-key")
+        result = await manager.get_cached_response(KEY)
 
         assert result is None
-        redis_mock.delete.assert_called_once_with("test:idempotency:test-key")
+        assert not await redis_fake.exists(f"test:idempotency:{KEY}")
 
     @pytest.mark.asyncio
-    async def test_cache_response_success(self, manager, redis_mock):
+    async def test_cache_response_success(self, manager, redis_fake):
         """Testa armazenamento bem-sucedido de resposta"""
 
-        redis_mock.setex.return_value = True
-
         success = await manager.cache_response(
-            idempotency_key="test-key",
+            idempotency_key=KEY,
             response_data={"result": "success"},
             status_code=201,
         )
 
         assert success is True
-        redis_mock.setex.assert_called_once()
-
-        # Verificar argumentos
-        call_args = redis_mock.setex.call_args
-        key, ttl, data = call_args[0]
-
-        assert key == "test:idempotency:test-key"
-        assert isinstance(ttl, int)
-        assert ttl > 0
+        assert await redis_fake.ttl(f"test:idempotency:{KEY}") > 0
 
         # Verificar dados serializados
-        record_data = json.loads(data)
+        record_data = json.loads(await redis_fake.get(f"test:idempotency:{KEY}"))
         record = IdempotencyRecord.from_dict(record_data)
 
-        assert record.idempotency_key == "test-key"
+        assert record.idempotency_key == KEY
         assert record.response_data == {"result": "success"}
         assert record.status_code == 201
 
     @pytest.mark.asyncio
-    async def test_cache_response_too_large(self, manager, redis_mock):
+    async def test_cache_response_too_large(self, manager, redis_fake):
         """Testa rejeição de resposta muito grande"""
 
         large_data = {"data": "x" * (65 * 1024)}  # Maior que 64KB
 
         success = await manager.cache_response(
-            idempotency_key="test-key", response_data=large_data, status_code=200
+            idempotency_key=KEY, response_data=large_data, status_code=200
         )
 
         assert success is False
-        redis_mock.setex.assert_not_called()
+        assert not await redis_fake.exists(f"test:idempotency:{KEY}")
 
     @pytest.mark.asyncio
-    async def test_is_processing_true(self, manager, redis_mock):
+    async def test_is_processing_true(self, manager):
         """Testa verificação de processamento em andamento"""
 
-        redis_mock.exists.return_value = True
+        await manager.check_or_claim(KEY)
 
-        is_processing = await manager.is_processing("test-key")
-
-        assert is_processing is True
-        redis_mock.exists.assert_called_once_with("test:processing:test-key")
+        assert await manager.is_processing(KEY) is True
 
     @pytest.mark.asyncio
-    async def test_mark_processing_success(self, manager, redis_mock):
+    async def test_mark_processing_success(self, manager, redis_fake):
         """Testa marcação de processamento"""
 
-        redis_mock.setex.return_value = True
-
-        success = await manager.mark_processing("test-key", ttl_seconds=60)
+        success = await manager.mark_processing(KEY, ttl_seconds=60)
 
         assert success is True
-        redis_mock.setex.assert_called_once()
-
-        # Verificar argumentos da chamada
-        call_args = redis_mock.setex.call_args
-        key, ttl, data = call_args[0]
-
-        assert key == "test:processing:test-key"
-        assert ttl == 60
+        assert 0 < await redis_fake.ttl(f"test:processing:{KEY}") <= 60
 
         # Verificar que os dados são um JSON válido com a estrutura esperada
-        parsed_data = json.loads(data)
-        assert "started_at" in parsed_data
-        assert parsed_data["ttl_seconds"] == 60
+        parsed_data = json.loads(await redis_fake.get(f"test:processing:{KEY}"))
+        assert "started_at" in parsed_data["response_data"]
+        assert parsed_data["response_data"]["ttl_seconds"] == 60
 
     @pytest.mark.asyncio
-    async def test_clear_processing_success(self, manager, redis_mock):
+    async def test_clear_processing_success(self, manager):
         """Testa limpeza de marca de processamento"""
 
-        redis_mock.delete.return_value = 1
+        claim = await manager.check_or_claim(KEY)
+        assert claim.status == ClaimStatus.CLAIMED
 
-        success = await manager.clear_processing("test-key")
+        success = await manager.clear_processing(KEY)
 
         assert success is True
-        redis_mock.delete.assert_called_once_with("test:processing:test-key")
+        assert await manager.is_processing(KEY) is False
 
     @pytest.mark.asyncio
-    async def test_invalidate_key(self, manager, redis_mock):
+    async def test_invalidate_key(self, manager):
         """Testa invalidação de chave"""
 
-        redis_mock.delete.return_value = 2  # Duas chaves deletadas
+        claim = await manager.check_or_claim(KEY)
+        await manager.complete_and_release(KEY, claim.token, response_data={"result": "ok"})
 
-        success = await manager.invalidate_key("test-key")
+        success = await manager.invalidate_key(KEY)
 
         assert success is True
-        redis_mock.delete.assert_called_once_with(
-            "test:idempotency:test-key", "test:processing:test-key"
-        )
+        assert await manager.get_cached_response(KEY) is None
+        assert (await manager.check_or_claim(KEY)).status == ClaimStatus.CLAIMED
 
     def test_get_metrics(self, manager):
         """Testa obtenção de métricas"""
@@ -221,6 +211,7 @@ class TestIdempotencyManager:
             "cache_misses",
             "hit_rate",
             "concurrent_blocks",
+            "key_conflicts",
             "storage_errors",
             "expired_cleanups",
         ]
@@ -274,11 +265,8 @@ class TestIdempotencyMiddleware:
     def manager_mock(self):
         """Mock IdempotencyManager"""
         manager = AsyncMock()
-        manager.get_cached_response = AsyncMock()
-        manager.cache_response = AsyncMock()
-        manager.is_processing = AsyncMock()
-        manager.mark_processing = AsyncMock()
-        manager.clear_processing = AsyncMock()
+        manager.check_or_claim = AsyncMock()
+        manager.complete_and_release = AsyncMock()
         return manager
 
     @pytest.fixture
@@ -301,7 +289,9 @@ class TestIdempotencyMiddleware:
             "cached_at": datetime.utcnow().isoformat(),
             "expires_at": (datetime.utcnow() + timedelta(hours=1)).isoformat(),
         }
-        manager_mock.get_cached_response.return_value = cached_response
+        manager_mock.check_or_claim.return_value = ClaimResult(
+            ClaimStatus.CACHED, cached_response=cached_response
+        )
 
         # Criar request mock
         request = MagicMock(spec=["method", "url", "headers"])
@@ -322,15 +312,15 @@ class TestIdempotencyMiddleware:
         assert response.status_code == 200
         assert response.headers.get("X-Idempotency-Cache") == "HIT"
 
-        manager_mock.get_cached_response.assert_called_once_with("test-key", ANY)
+        manager_mock.check_or_claim.assert_called_once_with("test-key", ANY)
+        manager_mock.complete_and_release.assert_not_called()
 
     @pytest.mark.asyncio
     async def test_dispatch_operation_in_progress(self, middleware, manager_mock):
         """Testa dispatch quando operação está em progresso"""
 
         # Configurar mocks
-        manager_mock.get_cached_response.return_value = None
-        manager_mock.is_processing.return_value = True
+        manager_mock.check_or_claim.return_value = ClaimResult(ClaimStatus.PROCESSING)
 
         request = MagicMock()
         request.method = "POST"
@@ -346,15 +336,33 @@ class TestIdempotencyMiddleware:
         assert exc_info.value.status_code == 409
         call_next.assert_not_called()
 
+    @pytest.mark.asyncio
+    async def test_dispatch_key_reused_with_other_payload(self, middleware, manager_mock):
+        """Chave reutilizada com payload diferente retorna 422 sem executar"""
+
+        manager_mock.check_or_claim.return_value = ClaimResult(ClaimStatus.CONFLICT)
+
+        request = MagicMock()
+        request.method = "POST"
+        request.url.path = "/api/test"
+        request.headers = {"X-Idempotency-Key": "test-key"}
+
+        call_next = AsyncMock()
+
+        with pytest.raises(Exception) as exc_info:
+            await middleware.dispatch(request, call_next)
+
+        assert exc_info.value.status_code == 422
+        call_next.assert_not_called()
+        manager_mock.complete_and_release.assert_not_called()
+
     @pytest.mark.asyncio
     async def test_dispatch_successful_operation(self, middleware, manager_mock):
         """Testa dispatch de operação bem-sucedida"""
 
         # Configurar mocks
-        manager_mock.get_cached_response.return_value = None
-        manager_mock.is_processing.return_value = False
-        manager_mock.mark_processing.return_value = True
-        manager_mock.cache_response.return_value = True
+        manager_mock.check_or_claim.return_value = ClaimResult(ClaimStatus.CLAIMED, token="tok")
+        manager_mock.complete_and_release.return_value = True
 
         # Mock response da operação
         mock_response = MagicMock()
@@ -374,11 +382,30 @@ class TestIdempotencyMiddleware:
         # Verificar que operação foi executada
         call_next.assert_called_once()
 
-        # Verificar que resposta foi cacheada
-        manager_mock.cache_response.assert_called_once()
+        # Verificar que resposta foi cacheada e a marca liberada numa única chamada
+        manager_mock.complete_and_release.assert_called_once()
+        args, kwargs = manager_mock.complete_and_release.call_args
+        assert args == ("test-key", "tok")
+        assert kwargs["response_data"] == {"id": "123"}
+        assert kwargs["status_code"] == 201
+
+    @pytest.mark.asyncio
+    async def test_dispatch_failed_operation_releases_claim(self, middleware, manager_mock):
+        """Testa que falha na operação apenas libera a marca"""
 
-        # Verificar que processamento foi limpo
-        manager_mock.clear_processing.assert_called_once_with("test-key")
+        manager_mock.check_or_claim.return_value = ClaimResult(ClaimStatus.CLAIMED, token="tok")
+
+        request = MagicMock()
+        request.method = "POST"
+        request.url.path = "/api/test"
+        request.headers = {"X-Idempotency-Key": "test-key"}
+
+        call_next = AsyncMock(side_effect=RuntimeError("boom"))
+
+        with pytest.raises(RuntimeError):
+            await middleware.dispatch(request, call_next)
+
+        manager_mock.complete_and_release.assert_called_once_with("test-key", "tok")
 
     @pytest.mark.asyncio
     async def test_dispatch_excludes_get_requests(self, middleware, manager_mock):
@@ -396,7 +423,7 @@ class TestIdempotencyMiddleware:
 
         # Verificar que idempotency não foi aplicada
         call_next.assert_called_once()
-        manager_mock.get_cached_response.assert_not_called()
+        manager_mock.check_or_claim.assert_not_called()
 
     @pytest.mark.asyncio
     async def test_dispatch_requires_idempotency_key_for_post(self, middleware, manager_mock):
@@ -417,6 +444,146 @@ class TestIdempotencyMiddleware:
         call_next.assert_not_called()
 
 
+class TestAtomicClaimProtocol:
+    """Testes do protocolo check-or-claim / complete-and-release"""
+
+    @pytest.fixture
+    async def redis_fake(self):
+        redis = script_redis()
+        yield redis
+        await redis.aclose()
+
+    @pytest.fixture
+    def config(self):
+        return IdempotencyConfig(in_flight_wait_timeout_seconds=1.0)
+
+    @pytest.fixture
+    def manager(self, redis_fake, config):
+        return IdempotencyManager(redis_fake, config)
+
+    @pytest.mark.asyncio
+    async def test_claim_then_duplicate_is_processing(self, manager, redis_fake):
+        """Segunda requisição concorrente não adquire a marca"""
+
+        first = await manager.check_or_claim(KEY)
+        second = await manager.check_or_claim(KEY)
+
+        assert first.status is ClaimStatus.CLAIMED and first.token
+        assert second.status is ClaimStatus.PROCESSING
+        assert redis_fake.script_calls == 2
+        assert manager.get_metrics()["concurrent_blocks"] == 1
+
+    @pytest.mark.asyncio
+    async def test_complete_stores_and_releases(self, manager, redis_fake):
+        """Conclusão grava a resposta e libera a marca num único script"""
+
+        claim = await manager.check_or_claim(KEY, {"a": 1})
+        assert await manager.complete_and_release(
+            KEY, claim.token, response_data={"id": 7}, status_code=201, request_data={"a": 1}
+        )
+
+        cached = await manager.check_or_claim(KEY, {"a": 1})
+
+        assert not await redis_fake.exists(f"processing:{KEY}")
+        assert cached.status is ClaimStatus.CACHED
+        assert cached.cached_response["data"] == {"id": 7}
+        assert cached.cached_response["status_code"] == 201
+
+    @pytest.mark.asyncio
+    async def test_release_keeps_foreign_claim(self, manager, redis_fake):
+        """Token antigo (marca expirada e readquirida) não libera a marca atual"""
+
+        await manager.check_or_claim(KEY)
+        await manager.complete_and_release(KEY, "stale-token")
+
+        assert await redis_fake.exists(f"processing:{KEY}")
+
+    @pytest.mark.asyncio
+    async def test_expired_owner_does_not_overwrite_response(self, manager, redis_fake):
+        """Execução cuja marca expirou e foi readquirida não grava a resposta"""
+
+        stale = await manager.check_or_claim(KEY)
+        await redis_fake.delete(f"processing:{KEY}")  # marca expirou
+        current = await manager.check_or_claim(KEY)
+        assert await manager.complete_and_release(KEY, current.token, response_data={"id": 2})
+
+        assert not await manager.complete_and_release(KEY, stale.token, response_data={"id": 1})
+
+        cached = await manager.check_or_claim(KEY)
+        assert cached.cached_response["data"] == {"id": 2}
+
+    @pytest.mark.asyncio
+    async def test_fail_open_completion_stores_response(self, manager):
+        """Sem token (falha aberta na aquisição) a resposta é gravada"""
+
+        assert await manager.complete_and_release(KEY, None, response_data={"id": 3})
+
+        cached = await manager.check_or_claim(KEY)
+        assert cached.cached_response["data"] == {"id": 3}
+
+    @pytest.mark.asyncio
+    async def test_request_hash_collision_is_a_conflict(self, manager, redis_fake):
+        """Payload diferente com a mesma chave é rejeitado, sem executar a operação"""
+
+        claim = await manager.check_or_claim(KEY, {"a": 1})
+        await manager.complete_and_release(
+            KEY, claim.token, response_data={"id": 7}, request_data={"a": 1}
+        )
+
+        results = await asyncio.gather(*(manager.check_or_claim(KEY, {"a": 2}) for _ in range(3)))
+
+        assert all(result.status is ClaimStatus.CONFLICT for result in results)
+        assert not any(result.token for result in results)
+        assert not await redis_fake.exists(f"processing:{KEY}")
+        assert manager.get_metrics()["key_conflicts"] == 3
+
+    @pytest.mark.asyncio
+    async def test_duplicate_waits_for_completion(self, manager):
+        """Duplicata em andamento aguarda via pub/sub e recebe a resposta"""
+
+        claim = await manager.check_or_claim(KEY)
+
+        async def finish():
+            await asyncio.sleep(0.05)
+            await manager.complete_and_release(KEY, claim.token, response_data={"id": 1})
+
+        waiter = asyncio.create_task(manager.check_or_claim(KEY, wait=True))
+        await finish()
+        result = await waiter
+
+        assert result.status is ClaimStatus.CACHED
+        assert result.cached_response["data"] == {"id": 1}
+        assert manager.get_metrics()["in_flight_waits"] == 1
+
+    @pytest.mark.asyncio
+    async def test_duplicate_takes_over_after_release(self, manager):
+        """Se a operação falhar, a duplicata em espera adquire a marca"""
+
+        claim = await manager.check_or_claim(KEY)
+        waiter = asyncio.create_task(manager.check_or_claim(KEY, wait=True))
+        await asyncio.sleep(0.05)
+        await manager.complete_and_release(KEY, claim.token)
+
+        result = await waiter
+
+        assert result.status is ClaimStatus.CLAIMED and result.token != claim.token
+
+    @pytest.mark.asyncio
+    async def test_wait_times_out(self, redis_fake):
+        """Espera respeita o timeout configurado"""
+
+        manager = IdempotencyManager(
+            redis_fake, IdempotencyConfig(in_flight_wait_timeout_seconds=0.05)
+        )
+        await manager.check_or_claim(KEY)
+
+        result = await manager.check_or_claim(KEY, wait=True)
+
+        assert result.status is ClaimStatus.PROCESSING
+        channel = f"idempotency:done:{KEY}"
+        assert await redis_fake.pubsub_numsub(channel) == [(channel.encode(), 0)]
+
+
 class TestUtilityFunctions:
     """Testes para funções utilitárias"""
 
@@ -461,18 +628,14 @@ class TestMiddlewareIntegration:
 
     @pytest.mark.asyncio
     async def test_middleware_with_real_manager(self):
-        """Testa middleware com IdempotencyManager real (usando mock Redis)"""
+        """Testa middleware com IdempotencyManager real (usando fakeredis)"""
 
-        # Criar Redis mock
-        redis_mock = AsyncMock(spec=Redis)
-        redis_mock.get = AsyncMock(return_value=None)
-        redis_mock.setex = AsyncMock(return_value=True)
-        redis_mock.exists = AsyncMock(return_value=False)
-        redis_mock.delete = AsyncMock(return_value=1)
+        # Criar Redis em memória (scripts Lua reais)
+        redis_fake = script_redis()
 
         # Criar manager
         config = IdempotencyConfig(ttl_hours=1)
-        manager = IdempotencyManager(redis_mock, config)
+        manager = IdempotencyManager(redis_fake, config)
 
         # Criar middleware
         middleware = IdempotencyMiddleware(
@@ -501,8 +664,16 @@ class TestMiddlewareIntegration:
         call_next.assert_called_once()
         assert response == mock_response
 
-        # Verificar que resposta foi cacheada
-        redis_mock.setex.assert_called()
+        # Verificar que resposta foi cacheada e a marca liberada
+        key = "550e8400-e29b-41d4-a716-446655440000"
+        assert await redis_fake.exists(f"idempotency:{key}")
+        assert not await redis_fake.exists(f"processing:{key}")
+        assert redis_fake.script_calls == 2
+
+        # Repetição retorna a resposta cacheada sem executar a operação
+        cached = await middleware.dispatch(request, call_next)
+        call_next.assert_called_once()
+        assert cached.headers.get("X-Idempotency-Cache") == "HIT"
 
 
 # Fixtures compartilhados